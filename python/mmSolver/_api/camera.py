@@ -366,20 +366,30 @@ class Camera(object):
         mkr_list = []
         ver = maya.cmds.about(apiVersion=True)
         if ver < 201600:
+            obj_types = api_utils.get_object_types(below_nodes)
             mkr_list = [mmSolver._api.marker.Marker(node=n)
-                        for n in below_nodes
-                        if api_utils.get_object_type(n) == const.OBJECT_TYPE_MARKER]
+                        for n, obj_type in zip(below_nodes, obj_types)
+                        if obj_type == const.OBJECT_TYPE_MARKER]
         else:
             # Note: Use UUIDs to cache nodes, this is only supported
             # on Maya 2016 and above.
+            uncached_nodes = []
             for n in below_nodes:
                 uids = maya.cmds.ls(node, uuid=True) or []
                 mkr = self._cache_marker_list.get(uids[0])
                 if mkr is None:
-                    if api_utils.get_object_type(n) == const.OBJECT_TYPE_MARKER:
-                        mkr = mmSolver._api.marker.Marker(node=n)
-                if mkr is not None:
+                    uncached_nodes.append(n)
+                    mkr_list.append(None)
+                else:
                     mkr_list.append(mkr)
+            # Classify all nodes not in the cache at once.
+            obj_types = iter(api_utils.get_object_types(uncached_nodes))
+            for i, n in enumerate(below_nodes):
+                if mkr_list[i] is not None:
+                    continue
+                if next(obj_types) == const.OBJECT_TYPE_MARKER:
+                    mkr_list[i] = mmSolver._api.marker.Marker(node=n)
+            mkr_list = [mkr for mkr in mkr_list if mkr is not None]
 
         return mkr_list
 
@@ -23,6 +23,7 @@ import warnings
 
 import maya.cmds
 import maya.mel
+import maya.OpenMaya as OpenMaya
 import maya.OpenMayaAnim as OpenMayaAnim
 
 import mmSolver.logger
@@ -45,6 +46,19 @@ import mmSolver._api.execute as execute
 
 LOG = mmSolver.logger.get_logger()
 
+# The members of each Collection set node (by UUID), with the object
+# type of each member. The cache is used while the members of the set
+# are unchanged.
+__COLLECTION_MEMBERS_CACHE = dict()
+
+# The object type of Maya nodes, by node UUID.
+__NODE_OBJECT_TYPE_CACHE = dict()
+
+# The Maya callbacks that clear the caches when the scene changes.
+__MEMBER_CACHE_STATE = {
+    'callback_ids': [],
+}
+
 
 def _create_collection_attributes(node):
     """
@@ -213,6 +227,124 @@ def _set_auxiliary_attr(col, attr, key, value):
     return
 
 
+def _get_node_uuid(node):
+    obj = node_utils.get_as_object(node)
+    if obj is None:
+        return None
+    node_fn = OpenMaya.MFnDependencyNode(obj)
+    return node_fn.uuid().asString()
+
+
+def _get_member_object_types(members):
+    """
+    Get the object type of each set member, using the cached type of
+    the member node, if possible.
+
+    All members without a cached type are classified at once.
+    """
+    object_types = [None] * len(members)
+    uncached = []
+    for i, member in enumerate(members):
+        if '.' in member:
+            object_types[i] = const.OBJECT_TYPE_ATTRIBUTE
+            continue
+        node_uuid = _get_node_uuid(member)
+        object_type = __NODE_OBJECT_TYPE_CACHE.get(node_uuid)
+        if object_type is None:
+            uncached.append((i, node_uuid))
+        object_types[i] = object_type
+
+    if len(uncached) > 0:
+        uncached_types = api_utils.get_object_types(
+            [members[i] for i, _ in uncached])
+        for (i, node_uuid), object_type in zip(uncached, uncached_types):
+            object_types[i] = object_type
+            if node_uuid is not None:
+                __NODE_OBJECT_TYPE_CACHE[node_uuid] = object_type
+    return object_types
+
+
+def _get_cached_members_with_object_types(col_uuid, members):
+    """
+    Get the object type of each member of a Collection.
+
+    The member list is compared with the last members seen for the
+    Collection; if the members are unchanged the cached object types
+    are returned without querying Maya.
+
+    :param col_uuid: The UUID of the Collection set node.
+    :type col_uuid: str
+
+    :param members: The set members, as full paths.
+    :type members: [str, ..]
+
+    :returns: The members and object types.
+    :rtype: [(str, str), ..]
+    """
+    _add_member_cache_callbacks()
+    members_key = tuple(members)
+    cache = __COLLECTION_MEMBERS_CACHE.get(col_uuid)
+    if cache is not None and cache[0] == members_key:
+        return cache[1]
+    members_types = list(zip(members, _get_member_object_types(members)))
+    if col_uuid is not None:
+        __COLLECTION_MEMBERS_CACHE[col_uuid] = (members_key, members_types)
+    return members_types
+
+
+def _scene_changed_func(client_data):
+    clear_member_cache()
+    return
+
+
+def _add_member_cache_callbacks():
+    """
+    Add the Maya callbacks that clear the member cache before a new
+    scene is created or opened (node UUIDs may be re-used in another
+    scene).
+    """
+    if len(__MEMBER_CACHE_STATE['callback_ids']) > 0:
+        return
+    __MEMBER_CACHE_STATE['callback_ids'] = [
+        OpenMaya.MSceneMessage.addCallback(
+            OpenMaya.MSceneMessage.kBeforeNew,
+            _scene_changed_func),
+        OpenMaya.MSceneMessage.addCallback(
+            OpenMaya.MSceneMessage.kBeforeOpen,
+            _scene_changed_func),
+    ]
+    return
+
+
+def _clear_member_cache_nodes(col_uuid, nodes):
+    """
+    Remove the cached members of a Collection, and the cached object
+    types of the nodes (members added or removed).
+    """
+    __COLLECTION_MEMBERS_CACHE.pop(col_uuid, None)
+    for node in nodes:
+        if '.' in node:
+            continue
+        node_uuid = _get_node_uuid(node)
+        __NODE_OBJECT_TYPE_CACHE.pop(node_uuid, None)
+    return
+
+
+def clear_member_cache():
+    """
+    Remove all cached Collection members and object types.
+
+    This is called automatically before a new Maya scene is created
+    or opened, and the members of a Collection are removed from the
+    cache when members are added or removed with the Collection
+    class. Members changed outside of the Collection class are found
+    by comparing the cache with the Collection set members.
+    """
+    __COLLECTION_MEMBERS_CACHE.clear()
+    __NODE_OBJECT_TYPE_CACHE.clear()
+    return
+
+
 class Collection(object):
     """
     Holds all data needed for a mmSolver run.
@@ -509,11 +641,31 @@ class Collection(object):
 
     ############################################################################
 
+    def _get_members_with_object_types(self):
+        """
+        Get the members of the Collection set, and the object type of
+        each member (cached until the set members change).
+
+        :rtype: [(str, str), ..]
+        """
+        members = self._set.get_all_members(flatten=False, full_path=True)
+        if len(members) == 0:
+            return []
+        col_uuid = self.get_node_uid()
+        return _get_cached_members_with_object_types(col_uuid, members)
+
+    def _clear_member_cache(self, nodes):
+        """
+        Remove the cached members, after 'nodes' are added to or
+        removed from the Collection set.
+        """
+        _clear_member_cache_nodes(self.get_node_uid(), nodes)
+        return
+
     def get_marker_list(self):
         result = []
-        members = self._set.get_all_members(flatten=False, full_path=True)
-        for member in members:
-            object_type = api_utils.get_object_type(member)
+        members = self._get_members_with_object_types()
+        for member, object_type in members:
             if object_type == const.OBJECT_TYPE_MARKER:
                 mkr = marker.Marker(member)
                 result.append(mkr)
@@ -529,6 +681,7 @@ class Collection(object):
         assert len(node) > 0
         if self._set.member_in_set(node) is False:
             self._set.add_member(node)
+            self._clear_member_cache([node])
             self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_MARKERS_CHANGED,
@@ -542,6 +695,7 @@ class Collection(object):
             if isinstance(mkr, marker.Marker):
                 node_list.append(mkr.get_node())
         self._set.add_members(node_list)
+        self._clear_member_cache(node_list)
         self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_MARKERS_CHANGED,
@@ -553,6 +707,7 @@ class Collection(object):
         node = mkr.get_node()
         if self._set.member_in_set(node):
             self._set.remove_member(node)
+            self._clear_member_cache([node])
             self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_MARKERS_CHANGED,
@@ -566,6 +721,7 @@ class Collection(object):
             if isinstance(mkr, marker.Marker):
                 node_list.append(mkr.get_node())
         self._set.remove_members(node_list)
+        self._clear_member_cache(node_list)
         self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_MARKERS_CHANGED,
@@ -591,14 +747,14 @@ class Collection(object):
         return
 
     def clear_marker_list(self):
-        members = self._set.get_all_members(flatten=False, full_path=True)
+        members = self._get_members_with_object_types()
         rm_list = []
-        for member in members:
-            object_type = api_utils.get_object_type(member)
+        for member, object_type in members:
             if object_type == const.OBJECT_TYPE_MARKER:
                 rm_list.append(member)
         if len(rm_list) > 0:
             self._set.remove_members(rm_list)
+            self._clear_member_cache(rm_list)
             self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_MARKERS_CHANGED,
@@ -609,9 +765,8 @@ class Collection(object):
 
     def get_attribute_list(self):
         result = []
-        members = self._set.get_all_members(flatten=False, full_path=True)
-        for member in members:
-            object_type = api_utils.get_object_type(member)
+        members = self._get_members_with_object_types()
+        for member, object_type in members:
             if object_type == const.OBJECT_TYPE_ATTRIBUTE:
                 attr = attribute.Attribute(name=member)
                 result.append(attr)
@@ -626,6 +781,7 @@ class Collection(object):
         assert isinstance(name, (str, unicode))
         if not self._set.member_in_set(name):
             self._set.add_member(name)
+            self._clear_member_cache([name])
             self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_ATTRS_CHANGED,
@@ -639,6 +795,7 @@ class Collection(object):
             if isinstance(attr, attribute.Attribute):
                 name_list.append(attr.get_name())
         self._set.add_members(name_list)
+        self._clear_member_cache(name_list)
         self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_ATTRS_CHANGED,
@@ -650,6 +807,7 @@ class Collection(object):
         name = attr.get_name()
         if self._set.member_in_set(name):
             self._set.remove_member(name)
+            self._clear_member_cache([name])
             self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_ATTRS_CHANGED,
@@ -663,6 +821,7 @@ class Collection(object):
             if isinstance(attr, attribute.Attribute):
                 name_list.append(attr.get_name())
         self._set.remove_members(name_list)
+        self._clear_member_cache(name_list)
         self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_ATTRS_CHANGED,
@@ -687,14 +846,14 @@ class Collection(object):
         return
 
     def clear_attribute_list(self):
-        members = self._set.get_all_members(flatten=False, full_path=True)
+        members = self._get_members_with_object_types()
         rm_list = []
-        for member in members:
-            object_type = api_utils.get_object_type(member)
+        for member, object_type in members:
             if object_type == const.OBJECT_TYPE_ATTRIBUTE:
                 rm_list.append(member)
         if len(rm_list) > 0:
             self._set.remove_members(rm_list)
+            self._clear_member_cache(rm_list)
             self._actions_list = []  # reset argument flag cache.
         event_utils.trigger_event(
             const.EVENT_NAME_COLLECTION_ATTRS_CHANGED,
@@ -77,6 +77,7 @@ SOLVER_TYPE_LEVMAR = 0
 SOLVER_TYPE_CMINPACK_LM = 1
 SOLVER_TYPE_CMINPACK_LMDIF = 1
 SOLVER_TYPE_CMINPACK_LMDER = 2
+SOLVER_TYPE_SCHUR_LM = 3
 SOLVER_TYPE_DEFAULT = SOLVER_TYPE_CMINPACK_LMDER
 
 
@@ -178,11 +179,15 @@ ROOT_FRAME_STRATEGY_DEFAULT_VALUE = ROOT_FRAME_STRATEGY_GLOBAL_VALUE
 ROBUST_LOSS_TYPE_TRIVIAL_VALUE = 0
 ROBUST_LOSS_TYPE_SOFT_L_ONE_VALUE = 1
 ROBUST_LOSS_TYPE_CAUCHY_VALUE = 2
+ROBUST_LOSS_TYPE_HUBER_VALUE = 3
+ROBUST_LOSS_TYPE_TUKEY_VALUE = 4
 
 ROBUST_LOSS_TYPE_VALUE_LIST = [
     ROBUST_LOSS_TYPE_TRIVIAL_VALUE,
     ROBUST_LOSS_TYPE_SOFT_L_ONE_VALUE,
     ROBUST_LOSS_TYPE_CAUCHY_VALUE,
+    ROBUST_LOSS_TYPE_HUBER_VALUE,
+    ROBUST_LOSS_TYPE_TUKEY_VALUE,
 ]
 
 ROBUST_LOSS_TYPE_DEFAULT_VALUE = ROBUST_LOSS_TYPE_TRIVIAL_VALUE
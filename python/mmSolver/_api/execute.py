@@ -35,6 +35,7 @@ import maya.mel
 
 import mmSolver.logger
 import mmSolver.utils.viewport as viewport_utils
+import mmSolver.utils.trace as trace_utils
 import mmSolver._api.state as api_state
 import mmSolver._api.utils as api_utils
 import mmSolver._api.compile as api_compile
@@ -47,6 +48,10 @@ import mmSolver._api.constant as const
 
 LOG = mmSolver.logger.get_logger()
 
+# The category of the trace spans created while executing a solve,
+# see mmSolver.utils.trace.
+TRACE_CATEGORY = 'execute'
+
 ExecuteOptions = collections.namedtuple(
     'ExecuteOptions',
     ('verbose',
@@ -533,8 +538,9 @@ def _run_validate_action_list(vaction_list):
     """
     assert len(vaction_list) > 0
     state_list = []
-    for vaction in vaction_list:
-        state = _run_validate_action(vaction)
+    for i, vaction in enumerate(vaction_list):
+        with trace_utils.span('validate', category=TRACE_CATEGORY, index=i):
+            state = _run_validate_action(vaction)
         state_list.append(state)
     assert len(vaction_list) == len(state_list)
     return state_list
@@ -660,6 +666,29 @@ def execute(col,
     :return: List of SolveResults from the executed collection.
     :rtype: [SolverResult, ..]
     """
+    with trace_utils.span('execute', category=TRACE_CATEGORY):
+        return _execute(
+            col,
+            options=options,
+            validate_mode=validate_mode,
+            log_level=log_level,
+            prog_fn=prog_fn,
+            status_fn=status_fn,
+            info_fn=info_fn)
+
+
+def _execute(col,
+             options=None,
+             validate_mode=None,
+             log_level=None,
+             prog_fn=None,
+             status_fn=None,
+             info_fn=None):
+    """
+    Compile the collection, then pass that data to the 'mmSolver' command.
+
+    See :py:func:`execute` for details.
+    """
     if options is None:
         options = createExecuteOptions()
     if validate_mode is None:
@@ -675,24 +704,26 @@ def execute(col,
 
     # Ensure the plug-in is loaded, so we (do not) fail before trying
     # to run.
-    api_utils.load_plugin()
-    assert 'mmSolver' in dir(maya.cmds)
-
-    vp2_state = viewport_utils.get_viewport2_active_state()
-    current_eval_manager_mode = maya.cmds.evaluationManager(
-        query=True,
-        mode=True
-    )
+    with trace_utils.span('load_plugin', category=TRACE_CATEGORY):
+        api_utils.load_plugin()
+        assert 'mmSolver' in dir(maya.cmds)
+
+    with trace_utils.span('save_state', category=TRACE_CATEGORY):
+        vp2_state = viewport_utils.get_viewport2_active_state()
+        current_eval_manager_mode = maya.cmds.evaluationManager(
+            query=True,
+            mode=True
+        )
 
-    panels = viewport_utils.get_all_model_panels()
-    panel_objs, panel_node_type_vis = preSolve_queryViewportState(
-        options, panels
-    )
+        panels = viewport_utils.get_all_model_panels()
+        panel_objs, panel_node_type_vis = preSolve_queryViewportState(
+            options, panels
+        )
 
-    # Save scene state, to revert to later on.
-    cur_frame = maya.cmds.currentTime(query=True)
-    prev_auto_key_state = maya.cmds.autoKeyframe(query=True, state=True)
-    prev_cycle_check = maya.cmds.cycleCheck(query=True, evaluation=True)
+        # Save scene state, to revert to later on.
+        cur_frame = maya.cmds.currentTime(query=True)
+        prev_auto_key_state = maya.cmds.autoKeyframe(query=True, state=True)
+        prev_cycle_check = maya.cmds.cycleCheck(query=True, evaluation=True)
 
     # State information needed to revert reconnect animation curves in
     # 'finally' block.
@@ -702,33 +733,40 @@ def execute(col,
     is_single_frame = False
 
     try:
-        if options.disable_viewport_two is True:
-            viewport_utils.set_viewport2_active_state(False)
-        maya.cmds.autoKeyframe(edit=True, state=False)
-        maya.cmds.evaluationManager(mode='off')
-        maya.cmds.cycleCheck(evaluation=False)
-        preSolve_updateProgress(prog_fn, status_fn)
+        with trace_utils.span('set_state', category=TRACE_CATEGORY):
+            if options.disable_viewport_two is True:
+                viewport_utils.set_viewport2_active_state(False)
+            maya.cmds.autoKeyframe(edit=True, state=False)
+            maya.cmds.evaluationManager(mode='off')
+            maya.cmds.cycleCheck(evaluation=False)
+        with trace_utils.span('progress', category=TRACE_CATEGORY):
+            preSolve_updateProgress(prog_fn, status_fn)
 
         # Check for validity and compile actions.
         solres_list = []
         withtest = validate_mode in [const.VALIDATE_MODE_PRE_VALIDATE_VALUE,
                                      const.VALIDATE_MODE_AT_RUNTIME_VALUE]
-        sol_list = col.get_solver_list()
-        mkr_list = col.get_marker_list()
-        attr_list = col.get_attribute_list()
-        try:
-            action_list, vaction_list = api_compile.collection_compile(
-                col,
-                sol_list,
-                mkr_list,
-                attr_list,
-                withtest=withtest,
-                prog_fn=prog_fn,
-                status_fn=status_fn
-            )
-        except excep.NotValid as e:
-            LOG.warn(e)
-            return solres_list
+        with trace_utils.span('compile', category=TRACE_CATEGORY) as span:
+            sol_list = col.get_solver_list()
+            mkr_list = col.get_marker_list()
+            attr_list = col.get_attribute_list()
+            try:
+                action_list, vaction_list = api_compile.collection_compile(
+                    col,
+                    sol_list,
+                    mkr_list,
+                    attr_list,
+                    withtest=withtest,
+                    prog_fn=prog_fn,
+                    status_fn=status_fn
+                )
+            except excep.NotValid as e:
+                LOG.warn(e)
+                return solres_list
+            span.set_args(
+                markers=len(mkr_list),
+                attributes=len(attr_list),
+                actions=len(action_list))
         collectionutils.run_progress_func(prog_fn, 1)
 
         vaction_state_list = []
@@ -737,13 +775,16 @@ def execute(col,
             assert len(vaction_list) == len(vaction_state_list)
 
         # Prepare frame solve
-        preSolve_setIsolatedNodes(action_list, options, panels)
-        preSolve_triggerEvaluation(action_list, cur_frame, options)
+        with trace_utils.span('isolate', category=TRACE_CATEGORY):
+            preSolve_setIsolatedNodes(action_list, options, panels)
+        with trace_utils.span('dg_evaluation', category=TRACE_CATEGORY):
+            preSolve_triggerEvaluation(action_list, cur_frame, options)
 
         # Ensure prediction attributes are created and initialised.
-        collectionutils.set_initial_prediction_attributes(
-            col, attr_list, cur_frame
-        )
+        with trace_utils.span('prediction', category=TRACE_CATEGORY):
+            collectionutils.set_initial_prediction_attributes(
+                col, attr_list, cur_frame
+            )
 
         # Run Solver Actions...
         message_hashes = set()
@@ -757,7 +798,9 @@ def execute(col,
                 state = vaction_state_list[i]
             if isinstance(vaction, api_action.Action) and validate_runtime:
                 # We will calculate the state just-in-time.
-                state = _run_validate_action(vaction)
+                with trace_utils.span('validate', category=TRACE_CATEGORY,
+                                      index=i):
+                    state = _run_validate_action(vaction)
             if state is not None:
                 if state.status != const.ACTION_STATUS_SUCCESS:
                     assert isinstance(state, ActionState)
@@ -768,115 +811,125 @@ def execute(col,
                     # Skip this action, since the test failed.
                     continue
 
-            func, args, kwargs = api_action.action_to_components(action)
-            func_is_mmsolver = api_action.action_func_is_mmSolver(action)
-
-            if func_is_mmsolver is True:
-                frame = kwargs.get('frame')
-                collectionutils.run_status_func(info_fn, 'Evaluating frames %r' % frame)
-                if frame is None or len(frame) == 0:
-                    raise excep.NotValid
-
-                # Write solver flags to a debug file.
-                debug_file_path = kwargs.get('debugFile', None)
-                if debug_file_path is not None:
-                    options_file_path = debug_file_path.replace('.log', '.flags')
-                    text = pprint.pformat(kwargs)
-                    with open(options_file_path, 'w') as file_:
-                        file_.write(text)
-
-                # Overriding the verbosity, irrespective of what the
-                # solver verbosity value is set to.
-                kwargs['verbose'] = False
-                if log_level is not None and log_level.lower() == 'verbose':
-                    kwargs['verbose'] = True
-
-                # HACK for single frame solves.
-                is_single_frame = collectionutils.is_single_frame(kwargs)
-                if is_single_frame is True:
-                    save_node_attrs = collectionutils.disconnect_animcurves(kwargs)
-                else:
-                    # Reset the data structure so in the 'finally'
-                    # block we can detect animcurves are not needing
-                    # to be reset.
-                    save_node_attrs = []
-
-            # Run Solver Maya plug-in command
-            solve_data = func(*args, **kwargs)
-
-            # Revert special HACK for single frame solves
-            if func_is_mmsolver is True:
-                if is_single_frame is True:
-                    collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
-                    # Reset the data structure so in the 'finally'
-                    # block we can detect animcurves are not needing
-                    # to be reset.
-                    save_node_attrs = []
-
-            # Create SolveResult.
-            solres = None
-            if solve_data is not None and func_is_mmsolver is True:
-                solres = solveresult.SolveResult(solve_data)
-                solres_list.append(solres)
-
-            if func_is_mmsolver is True and solres.get_success() is True:
-                frame = kwargs.get('frame')
-                if frame is None or len(frame) == 0:
-                    raise excep.NotValid
-                single_frame = frame[0]
-
-                if number_of_solves == 0:
-                    collectionutils.set_initial_prediction_attributes(
-                        col, attr_list, single_frame
+            action_span = trace_utils.span(
+                'action', category=TRACE_CATEGORY, index=i)
+            with action_span:
+                func, args, kwargs = api_action.action_to_components(action)
+                func_is_mmsolver = api_action.action_func_is_mmSolver(action)
+
+                if func_is_mmsolver is True:
+                    frame = kwargs.get('frame')
+                    collectionutils.run_status_func(info_fn, 'Evaluating frames %r' % frame)
+                    if frame is None or len(frame) == 0:
+                        raise excep.NotValid
+
+                    # Write solver flags to a debug file.
+                    debug_file_path = kwargs.get('debugFile', None)
+                    if debug_file_path is not None:
+                        options_file_path = debug_file_path.replace('.log', '.flags')
+                        text = pprint.pformat(kwargs)
+                        with open(options_file_path, 'w') as file_:
+                            file_.write(text)
+
+                    # Overriding the verbosity, irrespective of what the
+                    # solver verbosity value is set to.
+                    kwargs['verbose'] = False
+                    if log_level is not None and log_level.lower() == 'verbose':
+                        kwargs['verbose'] = True
+
+                    # HACK for single frame solves.
+                    is_single_frame = collectionutils.is_single_frame(kwargs)
+                    if is_single_frame is True:
+                        save_node_attrs = collectionutils.disconnect_animcurves(kwargs)
+                    else:
+                        # Reset the data structure so in the 'finally'
+                        # block we can detect animcurves are not needing
+                        # to be reset.
+                        save_node_attrs = []
+
+                # Run Solver Maya plug-in command
+                with trace_utils.span('solve', category=TRACE_CATEGORY):
+                    solve_data = func(*args, **kwargs)
+
+                # Revert special HACK for single frame solves
+                if func_is_mmsolver is True:
+                    if is_single_frame is True:
+                        collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
+                        # Reset the data structure so in the 'finally'
+                        # block we can detect animcurves are not needing
+                        # to be reset.
+                        save_node_attrs = []
+
+                # Create SolveResult.
+                solres = None
+                if solve_data is not None and func_is_mmsolver is True:
+                    solres = solveresult.SolveResult(solve_data)
+                    solres_list.append(solres)
+                    action_span.set_args(**solres.get_timer_stats())
+
+                if func_is_mmsolver is True and solres.get_success() is True:
+                    frame = kwargs.get('frame')
+                    if frame is None or len(frame) == 0:
+                        raise excep.NotValid
+                    single_frame = frame[0]
+
+                    if number_of_solves == 0:
+                        collectionutils.set_initial_prediction_attributes(
+                            col, attr_list, single_frame
+                        )
+                    # Count number of solves, so we don't need to set the
+                    # initial prediction attributes again.
+                    number_of_solves += 1
+
+                    # Calculate the mean, variance values, and predict the
+                    # next attribute value.
+                    with trace_utils.span('prediction', category=TRACE_CATEGORY):
+                        collectionutils.compute_attribute_value_prediction(
+                            col, attr_list, single_frame,
+                        )
+
+                # Update Progress
+                with trace_utils.span('progress', category=TRACE_CATEGORY):
+                    interrupt = postSolve_setUpdateProgress(
+                        start, i, total, solres,
+                        prog_fn, status_fn
                     )
-                # Count number of solves, so we don't need to set the
-                # initial prediction attributes again.
-                number_of_solves += 1
-
-                # Calculate the mean, variance values, and predict the
-                # next attribute value.
-                collectionutils.compute_attribute_value_prediction(
-                    col, attr_list, single_frame,
-                )
+                if interrupt is True:
+                    break
+
+                # Refresh the Viewport.
+                if func_is_mmsolver is True:
+                    frame = kwargs.get('frame')
+                    with trace_utils.span('viewport_refresh',
+                                          category=TRACE_CATEGORY):
+                        postSolve_refreshViewport(options, frame)
+    finally:
+        with trace_utils.span('restore_state', category=TRACE_CATEGORY):
+            # If something has gone wrong, or the user cancels the solver
+            # without finishing, then we make sure to reconnect animcurves
+            # that were disconnected for single frame solves.
+            if func_is_mmsolver is True and is_single_frame is True:
+                if len(save_node_attrs):
+                    collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
 
-            # Update Progress
-            interrupt = postSolve_setUpdateProgress(
-                start, i, total, solres,
-                prog_fn, status_fn
+            postSolve_setViewportState(
+                options, panel_objs, panel_node_type_vis
+            )
+            collectionutils.run_status_func(status_fn, 'Solve Ended')
+            collectionutils.run_progress_func(prog_fn, 100)
+            maya.cmds.evaluationManager(
+                mode=current_eval_manager_mode[0]
+            )
+            maya.cmds.cycleCheck(evaluation=prev_cycle_check)
+            maya.cmds.autoKeyframe(edit=True, state=prev_auto_key_state)
+            api_state.set_solver_running(False)
+            if options.disable_viewport_two is True:
+                viewport_utils.set_viewport2_active_state(vp2_state)
+            maya.cmds.currentTime(
+                cur_frame,
+                edit=True,
+                update=options.force_update
             )
-            if interrupt is True:
-                break
-
-            # Refresh the Viewport.
-            if func_is_mmsolver is True:
-                frame = kwargs.get('frame')
-                postSolve_refreshViewport(options, frame)
-    finally:
-        # If something has gone wrong, or the user cancels the solver
-        # without finishing, then we make sure to reconnect animcurves
-        # that were disconnected for single frame solves.
-        if func_is_mmsolver is True and is_single_frame is True:
-            if len(save_node_attrs):
-                collectionutils.reconnect_animcurves(kwargs, save_node_attrs)
-
-        postSolve_setViewportState(
-            options, panel_objs, panel_node_type_vis
-        )
-        collectionutils.run_status_func(status_fn, 'Solve Ended')
-        collectionutils.run_progress_func(prog_fn, 100)
-        maya.cmds.evaluationManager(
-            mode=current_eval_manager_mode[0]
-        )
-        maya.cmds.cycleCheck(evaluation=prev_cycle_check)
-        maya.cmds.autoKeyframe(edit=True, state=prev_auto_key_state)
-        api_state.set_solver_running(False)
-        if options.disable_viewport_two is True:
-            viewport_utils.set_viewport2_active_state(vp2_state)
-        maya.cmds.currentTime(
-            cur_frame,
-            edit=True,
-            update=options.force_update
-        )
 
     # Store output information of the solver.
     end_time = time.time()
@@ -499,6 +499,27 @@ class Marker(object):
         :rtype: [float, ..]
         """
         v = None
+        mkr_deviation = self._get_deviation_inputs(times)
+        if mkr_deviation is None:
+            return v
+        dev_list = markerutils.calculate_markers_deviation([mkr_deviation])[0]
+        assert len(dev_list) == len(times)
+        return dev_list
+
+    def _get_deviation_inputs(self, times):
+        """
+        Get the inputs needed to compute the deviation of the marker.
+
+        :param times: The times to query the deviation on.
+        :type times: [float, ..]
+
+        :returns: The arguments for
+                  markerutils.calculate_marker_deviation, or None if
+                  the marker, camera or bundle cannot be found.
+        :rtype: (str, str, str, str, [float, ..], [float, ..],
+                 [int, ..], float, float) or None
+        """
+        v = None
         node = self.get_node()
         if node is None:
             LOG.warn('Could not get Marker node. self=%r', self)
@@ -527,7 +548,7 @@ class Marker(object):
         enabled_list = [self.get_enable(time=t) for t in times]
 
         bnd_node = bnd.get_node()
-        dev_list = markerutils.calculate_marker_deviation(
+        return (
             node, bnd_node,
             cam_tfm, cam_shp,
             times,
@@ -535,10 +556,6 @@ class Marker(object):
             enabled_list,
             image_width, image_height
         )
-        if dev_list is None:
-            dev_list = [-1.0] * times
-        assert len(dev_list) == len(times)
-        return dev_list
 
     def get_enable(self, time=None):
         """
@@ -613,10 +630,23 @@ class Marker(object):
 
         start_frame = int(min(enable_times))
         end_frame = int(max(enable_times))
-        for f in range(start_frame, end_frame + 1):
-            v = self.get_enable(time=f)
-            if v:
-                times.append(f)
+        frames = list(range(start_frame, end_frame + 1))
+        if len(anim_curves) == 0:
+            connections = maya.cmds.listConnections(
+                plug, source=True, destination=False) or []
+            if len(connections) > 0:
+                # The attribute is driven by another node, it must be
+                # evaluated at each frame.
+                times = [f for f in frames if self.get_enable(time=f)]
+            elif self.get_enable():
+                times = frames
+        else:
+            # Evaluate the animCurve for all frames at once, the
+            # values are rounded, the same as the 'short' attribute.
+            values = anim_utils.evaluate_anim_curve_values(
+                anim_curves[0], frames)
+            times = [f for f, v in zip(frames, values)
+                     if int(round(v)) != 0]
         return times
 
     def get_weight(self, time=None):
@@ -1295,40 +1325,53 @@ def update_deviation_on_markers(mkr_list, solres_list):
     frame_list = solveresult.merge_frame_list(solres_list)
     frame_list = [int(x) for x in frame_list]
     frame_list_set = set(frame_list)
+
+    # Compute the deviation for all markers at once.
+    mkr_frames_list = []
+    mkr_deviation_list = []
     for mkr in mkr_list:
         mkr_frames = mkr.get_enabled_frames()
         mkr_frames = [int(x) for x in mkr_frames]
         mkr_frames_set = set(mkr_frames).intersection(frame_list_set)
-        mkr_frames = list(mkr_frames_set)
-        if len(mkr_frames) > 0:
-            deviation_list = mkr.compute_deviation(mkr_frames)
-
-            # Note: Extra frame is given at start and end.
-            frame_range_set = set(range(min(mkr_frames_set) - 1, max(mkr_frames_set) + 2))
-            diff_set = frame_range_set.difference(mkr_frames_set)
-
-            frm_list = list(sorted(frame_range_set))
-            dev_list = [None] * len(frame_range_set)
-            assert len(frm_list) == len(dev_list)
-            idx = 0
-            for i, frm in enumerate(sorted(frame_range_set)):
-                if frm in diff_set:
-                    # Deviation should be zero on a frame that is not
-                    # enabled.
-                    dev_list[i] = -1.0
-                else:
-                    # Look up value from deviation_list.
-                    dev_list[i] = deviation_list[idx]
-                    idx += 1
-            assert idx == (len(deviation_list))
-            mkr.set_deviation(frm_list, dev_list)
-
-            # Average Deviation
-            avg_dev = markerutils.calculate_average_deviation(dev_list)
-            mkr.set_average_deviation(avg_dev)
-
-            # Max Deviation
-            max_dev, max_frm = markerutils.calculate_maximum_deviation(
-                frm_list, dev_list)
-            mkr.set_maximum_deviation(max_dev, int(max_frm))
+        mkr_frames = list(sorted(mkr_frames_set))
+        if len(mkr_frames) == 0:
+            continue
+        mkr_deviation = mkr._get_deviation_inputs(mkr_frames)
+        if mkr_deviation is None:
+            continue
+        mkr_frames_list.append((mkr, mkr_frames_set))
+        mkr_deviation_list.append(mkr_deviation)
+    deviation_lists = markerutils.calculate_markers_deviation(
+        mkr_deviation_list)
+
+    for (mkr, mkr_frames_set), deviation_list in zip(mkr_frames_list,
+                                                     deviation_lists):
+        # Note: Extra frame is given at start and end.
+        frame_range_set = set(range(min(mkr_frames_set) - 1, max(mkr_frames_set) + 2))
+        diff_set = frame_range_set.difference(mkr_frames_set)
+
+        frm_list = list(sorted(frame_range_set))
+        dev_list = [None] * len(frame_range_set)
+        assert len(frm_list) == len(dev_list)
+        idx = 0
+        for i, frm in enumerate(sorted(frame_range_set)):
+            if frm in diff_set:
+                # Deviation should be zero on a frame that is not
+                # enabled.
+                dev_list[i] = -1.0
+            else:
+                # Look up value from deviation_list.
+                dev_list[i] = deviation_list[idx]
+                idx += 1
+        assert idx == (len(deviation_list))
+        mkr.set_deviation(frm_list, dev_list)
+
+        # Average Deviation
+        avg_dev = markerutils.calculate_average_deviation(dev_list)
+        mkr.set_average_deviation(avg_dev)
+
+        # Max Deviation
+        max_dev, max_frm = markerutils.calculate_maximum_deviation(
+            frm_list, dev_list)
+        mkr.set_maximum_deviation(max_dev, int(max_frm))
     return
@@ -19,18 +19,163 @@
 Marker utilities functions; Raw computations to be used without the Marker class.
 """
 
+import collections
 import time
-import math
 
 import maya.cmds
 
 import mmSolver.logger
 import mmSolver._api.attribute as attribute
 import mmSolver.utils.nodeaffects as affects_utils
+import mmSolver.utils.reprojection as reproj_utils
+import mmSolver.utils.transform as tfm_utils
 
 
 LOG = mmSolver.logger.get_logger()
 
+# Camera attributes that may be animated, used to reproject points;
+# focal length, film back width/height and film offset X/Y.
+CAMERA_ANIMATED_ATTRS = [
+    'focalLength',
+    'horizontalFilmAperture',
+    'verticalFilmAperture',
+    'horizontalFilmOffset',
+    'verticalFilmOffset',
+]
+
+
+def _get_attr_values(plug, times):
+    """
+    Get the value of an attribute at many times.
+
+    Attributes without an input connection are only queried once.
+    """
+    conns = maya.cmds.listConnections(
+        plug, source=True, destination=False) or []
+    if len(conns) == 0:
+        value = maya.cmds.getAttr(plug)
+        return [value] * len(times)
+    return [maya.cmds.getAttr(plug, time=t) for t in times]
+
+
+def _get_camera_values(cam_shp, times):
+    """
+    Get the camera values used to reproject points, at many times.
+    """
+    values = {}
+    for attr in CAMERA_ANIMATED_ATTRS:
+        plug = cam_shp + '.' + attr
+        values[attr] = _get_attr_values(plug, times)
+    values['filmFit'] = maya.cmds.getAttr(cam_shp + '.filmFit')
+    values['cameraScale'] = maya.cmds.getAttr(cam_shp + '.cameraScale')
+    return values
+
+
+def calculate_markers_deviation(mkr_deviation_list, eval_mode=None):
+    """
+    Calculate the 2D-to-3D pixel distance for many markers at once.
+
+    All marker, bundle and camera world matrices are evaluated
+    together, then reprojected (matching the 'mmReprojection'
+    command) in one batch.
+
+    :param mkr_deviation_list: A list of the inputs to
+        calculate_marker_deviation, for each marker; (mkr_node,
+        bnd_node, cam_tfm, cam_shp, times, weights_list,
+        enabled_list, image_width, image_height).
+    :type mkr_deviation_list: [(str, str, str, str, [float, ..],
+        [float, ..], [int, ..], float, float), ..]
+
+    :param eval_mode: What type of evaluation method to use?
+    :type eval_mode: mmSolver.utils.constant.EVAL_MODE_*
+
+    :returns: List of pixel deviation values for given times, for
+              each marker.
+    :rtype: [[float, ..], ..]
+    """
+    attr_name = 'worldMatrix[0]'
+    cache = tfm_utils.TransformMatrixCache()
+    cam_times = collections.defaultdict(set)
+    for values in mkr_deviation_list:
+        mkr_node, bnd_node, cam_tfm, cam_shp, times = values[:5]
+        assert len(values[5]) == len(times)
+        assert len(values[6]) == len(times)
+        for node in [mkr_node, bnd_node, cam_tfm]:
+            tfm_node = tfm_utils.TransformNode(node=node)
+            cache.add_node_attr(tfm_node, attr_name, times)
+        cam_times[cam_shp] |= set(times)
+    cache.process(eval_mode=eval_mode)
+
+    cam_values = {}
+    for cam_shp, times in cam_times.items():
+        times = list(sorted(times))
+        values = _get_camera_values(cam_shp, times)
+        for attr in CAMERA_ANIMATED_ATTRS:
+            values[attr] = dict(zip(times, values[attr]))
+        cam_values[cam_shp] = values
+
+    dev_list = []
+    for values in mkr_deviation_list:
+        (mkr_node, bnd_node, cam_tfm, cam_shp, times,
+         weights_list, enabled_list, image_width, image_height) = values
+        times_num = len(times)
+        dev = [None] * times_num
+        if times_num == 0:
+            dev_list.append(dev)
+            continue
+
+        matrices = []
+        for node in [mkr_node, bnd_node, cam_tfm]:
+            tfm_node = tfm_utils.TransformNode(node=node)
+            matrices.append(cache.get_node_attr(tfm_node, attr_name, times))
+        mkr_matrices, bnd_matrices, cam_matrices = matrices
+        valid = [i for i in range(times_num)
+                 if mkr_matrices[i] is not None
+                 and bnd_matrices[i] is not None
+                 and cam_matrices[i] is not None]
+        if len(valid) == 0:
+            dev_list.append(dev)
+            continue
+
+        cam = cam_values[cam_shp]
+        valid_times = [times[i] for i in valid]
+        cam_matrices = [[cam_matrices[i][j] for j in range(16)]
+                        for i in valid]
+        points = []
+        for tfm_matrices in [mkr_matrices, bnd_matrices]:
+            points += [(tfm_matrices[i][12],
+                        tfm_matrices[i][13],
+                        tfm_matrices[i][14]) for i in valid]
+
+        # Compute the pixel values, for the marker and bundle.
+        camera_attr_values = [
+            [cam[attr][t] for t in valid_times] * 2
+            for attr in CAMERA_ANIMATED_ATTRS
+        ]
+        coords = reproj_utils.reproject_points(
+            points, cam_matrices * 2,
+            camera_attr_values[0],
+            camera_attr_values[1], camera_attr_values[2],
+            camera_attr_values[3], camera_attr_values[4],
+            image_width, image_height,
+            film_fit=cam['filmFit'],
+            camera_scale=cam['cameraScale'],
+            as_pixel_coordinate=True,
+        )
+
+        # 2D Distance
+        valid_num = len(valid)
+        valid_dev = reproj_utils.calculate_deviation(
+            coords[:valid_num],
+            coords[valid_num:],
+            weights=[weights_list[i] for i in valid],
+            enabled=[enabled_list[i] for i in valid],
+        )
+        for i, value in zip(valid, valid_dev):
+            dev[i] = value
+        dev_list.append(dev)
+    return dev_list
+
 
 def calculate_marker_deviation(mkr_node,
                                bnd_node,
@@ -67,43 +212,16 @@ def calculate_marker_deviation(mkr_node,
     :returns: List of pixel deviation values for given times.
     :rtype: [float, ..]
     """
-    times_num = len(times)
-    dev = [None] * times_num
-    assert len(weights_list) == times_num
-    assert len(enabled_list) == times_num
-
-    # Compute the pixel values.
-    mkr_pos = maya.cmds.mmReprojection(
-        mkr_node,
-        camera=(cam_tfm, cam_shp),
-        time=times,
-        imageResolution=(image_width, image_height),
-        asPixelCoordinate=True,
-    )
-    bnd_pos = maya.cmds.mmReprojection(
-        bnd_node,
-        camera=(cam_tfm, cam_shp),
-        time=times,
-        imageResolution=(image_width, image_height),
-        asPixelCoordinate=True,
-    )
-    assert len(mkr_pos) == len(bnd_pos)
-
-    # 2D Distance
-    mkr_x = mkr_pos[0:len(mkr_pos):3]
-    mkr_y = mkr_pos[1:len(mkr_pos):3]
-    bnd_x = bnd_pos[0:len(mkr_pos):3]
-    bnd_y = bnd_pos[1:len(mkr_pos):3]
-    iterator = enumerate(zip(
-        mkr_x, mkr_y, bnd_x, bnd_y,
-        enabled_list, weights_list))
-    for i, (mx, my, bx, by, enabled, weight) in iterator:
-        if enabled <= 0 or weight <= 0.0:
-            continue
-        dx = mx - bx
-        dy = my - by
-        dev[int(i)] = math.sqrt((dx * dx) + (dy * dy))
-    return dev
+    mkr_deviation_list = [(
+        mkr_node, bnd_node,
+        cam_tfm, cam_shp,
+        times,
+        weights_list,
+        enabled_list,
+        image_width, image_height
+    )]
+    dev_list = calculate_markers_deviation(mkr_deviation_list)
+    return dev_list[0]
 
 
 def get_markers_start_end_frames(selected_markers):
@@ -58,8 +58,8 @@ def filter_nodes_into_categories(nodes):
         'collection': [],
         'other': []
     }
-    for node in nodes:
-        obj_type = api_utils.get_object_type(node)
+    obj_types = api_utils.get_object_types(nodes)
+    for node, obj_type in zip(nodes, obj_types):
         if obj_type == const.OBJECT_TYPE_MARKER:
             result['marker'].append(node)
         elif obj_type == const.OBJECT_TYPE_MARKER_GROUP:
@@ -47,6 +47,7 @@ Root Frame calculation logic.
 import collections
 
 import mmSolver.logger
+import mmSolver.utils.rootframe as rootframe_utils
 import mmSolver._api.constant as const
 import mmSolver._api.attribute as attribute
 
@@ -126,9 +127,13 @@ def _default_to_regular(d):
 def _markers_to_data_lists(mkr_list,
                            start_frame, end_frame,
                            min_frames_per_marker):
+    """
+    Convert Markers into an enabled bitmap (Markers by frames), and
+    the minimum number of root frames needed by each Marker.
+    """
     mkr_node_list = []
-    mkr_enabled_frames = {}
-    mkr_min_frames_count = {}
+    enabled_frames_list = []
+    min_frames_count_list = []
 
     for mkr in mkr_list:
         mkr_node = mkr.get_node()
@@ -140,10 +145,12 @@ def _markers_to_data_lists(mkr_list,
         min_frames_count = _get_minimum_number_of_root_frames_for_marker(mkr)
         min_frames_count = max(min_frames_per_marker, min_frames_count)
 
-        mkr_enabled_frames[mkr_node] = enabled_frames
-        mkr_min_frames_count[mkr_node] = min_frames_count
+        enabled_frames_list.append(enabled_frames)
+        min_frames_count_list.append(min_frames_count)
 
-    return mkr_node_list, mkr_enabled_frames, mkr_min_frames_count
+    bitmap = rootframe_utils.create_enabled_bitmap(
+        enabled_frames_list, start_frame, end_frame)
+    return mkr_node_list, bitmap, min_frames_count_list
 
 
 def get_root_frames_from_markers(mkr_list, min_frames_per_marker,
@@ -179,82 +186,48 @@ def get_root_frames_from_markers(mkr_list, min_frames_per_marker,
     #
     # https://www.researchgate.net/publication/260616120_Optimal_key-frame_selection_for_video-based_structure-from-motion
     #
-    all_frames = range(start_frame, end_frame + 1)
-    root_frames = list()
-    mkr_root_frames = collections.defaultdict(set)
-    root_frame_mkr_list = collections.defaultdict(set)
-
-    # Convert Markers to data lists.
-    mkr_node_list, mkr_enabled_frames, mkr_min_frames_count = \
+    mkr_node_list, bitmap, min_frames_count_list = \
         _markers_to_data_lists(
             mkr_list, start_frame, end_frame, min_frames_per_marker)
+    root_frames = rootframe_utils.get_root_frames(
+        bitmap, start_frame, min_frames_count_list)
+    return root_frames
+
+
+def get_root_frames_from_markers_greedy(mkr_list, min_frames_per_marker,
+                                        start_frame, end_frame,
+                                        min_markers_per_frame=None):
+    """
+    Get (close to) the fewest root frames numbers from the markers.
+
+    Root frames are chosen greedily; each root frame is the frame
+    with the most Markers still needing root frames. See
+    :py:func:`mmSolver.utils.rootframe.get_root_frames_greedy`.
+
+    :param mkr_list:
+        List of Markers to compute root frames from.
+    :type mkr_list: [Marker, ..]
+
+    :param min_frames_per_marker:
+        The number of frames that are required for each marker.
+    :type min_frames_per_marker: int
 
-    # Create maps for frames and markers.
-    for mkr_node in mkr_node_list:
-        enabled_frames = mkr_enabled_frames[mkr_node]
-        for f in all_frames:
-            if f in enabled_frames:
-                mkr_root_frames[mkr_node].add(f)
-                root_frame_mkr_list[f].add(mkr_node)
-
-    common_nodes = collections.defaultdict(
-        lambda: collections.defaultdict(
-            lambda: collections.defaultdict(set)))
-    for mkr_node in sorted(mkr_node_list):
-        min_frames_count = mkr_min_frames_count[mkr_node] - 1
-        enabled_frames = mkr_enabled_frames[mkr_node]
-
-        for f in enabled_frames:
-            nodes = set(root_frame_mkr_list[f])
-            nodes.discard(mkr_node)
-
-            mkr_counts = len(nodes)
-            if mkr_counts >= min_frames_count:
-                common_nodes[mkr_node][mkr_counts][f] = nodes
-
-    # Controls how close a frame is before it's considered too close
-    # to use. If we choose key-frames that are too close, there will
-    # not be enough paralax in the solve and therefore a degenerate
-    # solve can be created.
-    close_num = 2
-
-    mkr_frames = collections.defaultdict(set)
-    for mkr_node in mkr_node_list:
-        min_frames_count = mkr_min_frames_count[mkr_node]
-
-        mkr_counts = common_nodes[mkr_node].keys()
-        mkr_counts = reversed(sorted(mkr_counts))
-        for mkr_count in mkr_counts:
-            if len(mkr_frames[mkr_node]) >= min_frames_count:
-                break
-
-            frame_map = common_nodes[mkr_node][mkr_count]
-            frame_keys = frame_map.keys()
-            i = 0
-            while len(frame_keys) > 0:
-                if len(mkr_frames[mkr_node]) >= min_frames_count:
-                    break
-                even = (i % 2) == 0
-                if even is True:
-                    f = frame_keys.pop(0)
-                else:
-                    f = frame_keys.pop(-1)
-
-                if len(frame_keys) > 0:
-                    # Only test if a frame is too near if we have a
-                    # choice of more frames.
-                    too_near = False
-                    near_frames = range(f - close_num, f + close_num + 1)
-                    for near_frame in near_frames:
-                        if near_frame in root_frames:
-                            too_near = True
-                    if too_near is True:
-                        # Skip this frame, because it's too close to
-                        # another (already selected) root frame.
-                        continue
-
-                mkr_frames[mkr_node].add(f)
-                if f not in root_frames:
-                    root_frames.append(f)
-                i += 1
-    return list(sorted(root_frames))
+    :param start_frame:
+        The first frame to consider as a root frame.
+    :type start_frame: int
+
+    :param end_frame:
+        The last frame to consider as a root frame.
+    :type end_frame: int
+
+    :param min_markers_per_frame:
+        The minimum number of enabled Markers on a root frame.
+    :type min_markers_per_frame: int or None
+    """
+    mkr_node_list, bitmap, min_frames_count_list = \
+        _markers_to_data_lists(
+            mkr_list, start_frame, end_frame, min_frames_per_marker)
+    root_frames = rootframe_utils.get_root_frames_greedy(
+        bitmap, start_frame, min_frames_count_list,
+        min_markers_per_frame=min_markers_per_frame)
+    return root_frames
@@ -22,11 +22,11 @@ The triangulation solver, used to solve bundles by triangulating.
 import collections
 
 import maya.cmds
-import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 
 import mmSolver.utils.lineintersect as tri_utils
+import mmSolver.utils.triangulate as triangulate_utils
 import mmSolver._api.constant as const
 import mmSolver._api.utils as api_utils
 import mmSolver._api.bundle as bundle
@@ -41,7 +41,7 @@ LOG = mmSolver.logger.get_logger()
 BUNDLE_ATTR_NAMES = ['translateX', 'translateY', 'translateZ']
 
 
-def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
+def _get_marker_frame_list(mkr_node, consider_frame_list):
     """
     Get the list of frames that this marker is enabled for.
     """
@@ -54,6 +54,8 @@ def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
         first_time = max(int(times[0]), first_time)
         last_time = min(int(times[-1]), last_time)
 
+    if consider_frame_list is not None:
+        consider_frame_list = set(consider_frame_list)
     for t in range(first_time, last_time + 1):
         plug = mkr_node + '.enable'
         value = maya.cmds.getAttr(plug, time=t)
@@ -62,59 +64,58 @@ def _get_marker_first_last_frame_list(mkr_node, consider_frame_list):
                 frm_list.append(t)
             elif t in consider_frame_list:
                 frm_list.append(t)
-    first_last_frames = []
-    if len(frm_list) > 0:
-        first_frame = frm_list[0]
-        last_frame = frm_list[-1]
-        first_last_frames = [first_frame, last_frame]
-    return first_last_frames
+    return frm_list
 
 
-def _triangulate_bundle(bnd_node, mkr_cam_node_frm_list):
+def _triangulate_bundles(bnd_node_list, bnd_mkr_cam_node_frm_lists):
     """
-    Triangulate a 3D bundle position.
+    Triangulate many 3D bundle positions at once.
 
-    :param bnd_node: Bundle node to be triangulated.
-    :type bnd_node: str
+    The camera and marker positions of all markers and frames are
+    evaluated together, then each bundle is solved as the least-squares
+    intersection of all rays from the cameras through the markers.
 
-    :param mkr_cam_node_frm_list: Marker and Camera transform to be considered for triangulation.
-    :type mkr_cam_node_frm_list: [(str, stc, (int, int)), ..]
+    :param bnd_node_list: Bundle nodes to be triangulated.
+    :type bnd_node_list: [str, ..]
+
+    :param bnd_mkr_cam_node_frm_lists: For each bundle, the Marker and
+        Camera transform and frames to be considered for triangulation.
+    :type bnd_mkr_cam_node_frm_lists: [[(str, str, [int, ..]), ..], ..]
     """
-    LOG.debug('triangulate_bundle: %r %r', bnd_node, mkr_cam_node_frm_list)
-    prev_frame = maya.cmds.currentTime(query=True)
-    try:
-        for mkr_node, cam_tfm, frm_list in mkr_cam_node_frm_list:
+    LOG.debug('triangulate_bundles: %r %r',
+              bnd_node_list, bnd_mkr_cam_node_frm_lists)
+    assert len(bnd_node_list) == len(bnd_mkr_cam_node_frm_lists)
+    mkr_cam_node_frm_list = []
+    bnd_ray_indices = []
+    for bnd_mkr_cam_node_frm_list in bnd_mkr_cam_node_frm_lists:
+        indices = []
+        for mkr_node, cam_tfm, frm_list in bnd_mkr_cam_node_frm_list:
             if len(frm_list) == 0:
                 continue
-
-            first_frm = frm_list[0]
-            last_frm = frm_list[-1]
-            first_pnt, first_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                first_frm)
-            last_pnt, last_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                last_frm
-            )
-            a_pnt, b_pnt = tri_utils.calculate_approx_intersection_point_between_two_3d_lines(
-                first_pnt, first_dir,
-                last_pnt, last_dir
-            )
-            pnt = OpenMaya.MPoint(
-                (a_pnt.x + b_pnt.x) * 0.5,
-                (a_pnt.y + b_pnt.y) * 0.5,
-                (a_pnt.z + b_pnt.z) * 0.5
-            )
-
-            maya.cmds.xform(
-                bnd_node,
-                translation=(pnt.x, pnt.y, pnt.z),
-                worldSpace=True
-            )
-    finally:
-        maya.cmds.currentTime(prev_frame, update=False)
+            indices.append(len(mkr_cam_node_frm_list))
+            mkr_cam_node_frm_list.append((mkr_node, cam_tfm, frm_list))
+        bnd_ray_indices.append(indices)
+    mkr_rays = tri_utils.get_camera_rays_to_points(mkr_cam_node_frm_list)
+
+    bnd_rays = []
+    for indices in bnd_ray_indices:
+        origins = []
+        directions = []
+        for index in indices:
+            origins += mkr_rays[index][0]
+            directions += mkr_rays[index][1]
+        bnd_rays.append((origins, directions))
+    points = triangulate_utils.triangulate_points(bnd_rays)
+
+    for bnd_node, pnt in zip(bnd_node_list, points):
+        if pnt is None:
+            LOG.debug('Could not triangulate bundle: %r', bnd_node)
+            continue
+        maya.cmds.xform(
+            bnd_node,
+            translation=pnt,
+            worldSpace=True
+        )
     return
 
 
@@ -162,39 +163,44 @@ class SolverTriangulate(solverbase.SolverBase):
             if obj_type == const.OBJECT_TYPE_BUNDLE:
                 valid_node_list[attr_node] += 1
 
+        bnd_node_list = []
+        bnd_mkr_cam_node_frm_lists = []
+        mkr_node_list = [x.get_node() for x in mkr_list]
         for node, count in valid_node_list.items():
             if count != 3:
                 continue
             bnd = bundle.Bundle(node=node)
             bnd_node = bnd.get_node()
-            mkr_node_list = [x.get_node() for x in mkr_list]
             bnd_mkr_list = [x for x in bnd.get_marker_list()
                             if x.get_node() in mkr_node_list]
             bnd_mkr_node_list = [x.get_node() for x in bnd_mkr_list]
             bnd_cam_node_list = [x.get_camera().get_transform_node()
                                  for x in bnd_mkr_list]
-            bnd_mkr_frm_list = [_get_marker_first_last_frame_list(x, self.root_frame_list)
+            bnd_mkr_frm_list = [_get_marker_frame_list(x, self.root_frame_list)
                                 for x in bnd_mkr_node_list]
-            bnd_mkr_cam_frm_list = zip(
+            bnd_mkr_cam_frm_list = list(zip(
                 bnd_mkr_node_list,
                 bnd_cam_node_list,
                 bnd_mkr_frm_list
-            )
-
-            # TODO: We must detect if the newly calculated position is
-            #  behind the camera, if so, we reject the new values.
-            args = [bnd_node, bnd_mkr_cam_frm_list]
-            kwargs = {}
-            action = api_action.Action(
-                _triangulate_bundle,
-                args=args,
-                kwargs=kwargs
-            )
-            LOG.debug('adding _triangulate_bundle: func=%r',
-                      _triangulate_bundle,
-                      args,
-                      kwargs
-            )
-            # actions.append(action)
-            yield action, None
+            ))
+            bnd_node_list.append(bnd_node)
+            bnd_mkr_cam_node_frm_lists.append(bnd_mkr_cam_frm_list)
+
+        if len(bnd_node_list) == 0:
+            return
+
+        # All bundles are triangulated together, with a single action.
+        args = [bnd_node_list, bnd_mkr_cam_node_frm_lists]
+        kwargs = {}
+        action = api_action.Action(
+            _triangulate_bundles,
+            args=args,
+            kwargs=kwargs
+        )
+        LOG.debug('adding _triangulate_bundles: func=%r %r %r',
+                  _triangulate_bundles,
+                  args,
+                  kwargs
+        )
+        yield action, None
         return
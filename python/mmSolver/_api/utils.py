@@ -26,6 +26,7 @@ this module.
 import warnings
 
 import maya.cmds
+import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 import mmSolver.utils.configmaya as configmaya
@@ -59,6 +60,76 @@ def load_plugin():
     return
 
 
+# Attributes that must be locked and non-keyable on a Bundle.
+BUNDLE_LOCKED_ATTRS = [
+    'rotateX', 'rotateY', 'rotateZ',
+    'scaleX', 'scaleY', 'scaleZ',
+    'shearXY', 'shearXZ', 'shearYZ',
+]
+
+
+def _classify_object_type(node_type, shape_node_types,
+                          has_attr_func, locked_func, keyable_func):
+    """
+    Classify a node from the queried details of the node.
+
+    :param node_type: The Maya node type of the node.
+    :type node_type: str
+
+    :param shape_node_types: The node types of the shape nodes
+                             directly below the node.
+    :type shape_node_types: [str, ..]
+
+    :param has_attr_func: Function returning True if the node has the
+                          given attribute name.
+    :param locked_func: Function returning True if the given attribute
+                        name is locked.
+    :param keyable_func: Function returning True if the given
+                         attribute name is keyable.
+
+    :return: The object type string; One of the values in OBJECT_TYPE_LIST
+    :rtype: OBJECT_TYPE_*
+    """
+    object_type = const.OBJECT_TYPE_UNKNOWN
+    if ((node_type == 'transform')
+          and ('locator' in shape_node_types)
+          and has_attr_func('enable')
+          and has_attr_func('weight')
+          and has_attr_func('bundle')):
+        object_type = const.OBJECT_TYPE_MARKER
+
+    elif ((node_type == 'transform')
+          and ('locator' in shape_node_types)
+          and all([has_attr_func(a)
+                   and locked_func(a)
+                   and not keyable_func(a)
+                   for a in BUNDLE_LOCKED_ATTRS])):
+        object_type = const.OBJECT_TYPE_BUNDLE
+
+    elif ((node_type == 'transform') and
+          ('camera' in shape_node_types)):
+        object_type = const.OBJECT_TYPE_CAMERA
+
+    elif node_type == 'camera':
+        object_type = const.OBJECT_TYPE_CAMERA
+
+    elif ((node_type == 'transform') and
+          ('imagePlane' in shape_node_types)):
+        object_type = const.OBJECT_TYPE_IMAGE_PLANE
+
+    elif node_type == 'imagePlane':
+        object_type = const.OBJECT_TYPE_IMAGE_PLANE
+
+    elif node_type == 'mmMarkerGroupTransform':
+        object_type = const.OBJECT_TYPE_MARKER_GROUP
+
+    elif ((node_type == 'objectSet')
+          and has_attr_func('solver_list')):
+        object_type = const.OBJECT_TYPE_COLLECTION
+
+    return object_type
+
+
 def get_object_type(node):
     """
     The canonical function to interpret a node as an MM Solver object type.
@@ -84,6 +155,9 @@ def get_object_type(node):
         - Marker Group - transform 'mmMarkerGroupTransform' node
         - Collection - set node
 
+    .. note:: To get the object type of many nodes, use
+        get_object_types, which is much faster.
+
     :param node: Maya node path to get type of.
     :type node: str
 
@@ -116,58 +190,111 @@ def get_object_type(node):
     keyable_attrs = [plug.split('.')[-1] for plug in plugs
                      if maya.cmds.getAttr(plug, keyable=True)]
 
-    object_type = const.OBJECT_TYPE_UNKNOWN
-    if ((node_type == 'transform')
-          and ('locator' in shape_node_types)
-          and ('enable' in attrs)
-          and ('weight' in attrs)
-          and ('bundle' in attrs)):
-        object_type = const.OBJECT_TYPE_MARKER
+    object_type = _classify_object_type(
+        node_type,
+        shape_node_types,
+        lambda x: x in attrs,
+        lambda x: x in locked_attrs,
+        lambda x: x in keyable_attrs)
+    return object_type
 
-    elif ((node_type == 'transform')
-          and ('locator' in shape_node_types)
-          and ('rotateX' in locked_attrs)
-          and ('rotateY' in locked_attrs)
-          and ('rotateZ' in locked_attrs)
-          and ('rotateX' not in keyable_attrs)
-          and ('rotateY' not in keyable_attrs)
-          and ('rotateZ' not in keyable_attrs)
-          and ('scaleX' in locked_attrs)
-          and ('scaleY' in locked_attrs)
-          and ('scaleZ' in locked_attrs)
-          and ('scaleX' not in keyable_attrs)
-          and ('scaleY' not in keyable_attrs)
-          and ('scaleZ' not in keyable_attrs)
-          and ('shearXY' in locked_attrs)
-          and ('shearXZ' in locked_attrs)
-          and ('shearYZ' in locked_attrs)
-          and ('shearXY' not in keyable_attrs)
-          and ('shearXZ' not in keyable_attrs)
-          and ('shearYZ' not in keyable_attrs)):
-        object_type = const.OBJECT_TYPE_BUNDLE
 
-    elif ((node_type == 'transform') and
-          ('camera' in shape_node_types)):
-        object_type = const.OBJECT_TYPE_CAMERA
+def _get_object_type_from_selection_list(sel_list, index):
+    """
+    Get the object type of an item in a selection list.
 
-    elif node_type == 'camera':
-        object_type = const.OBJECT_TYPE_CAMERA
+    Uses the Maya API only, no Maya commands are run.
+    """
+    obj = OpenMaya.MObject()
+    sel_list.getDependNode(index, obj)
+    node_fn = OpenMaya.MFnDependencyNode(obj)
+    node_type = node_fn.typeName()
 
-    elif ((node_type == 'transform') and
-          ('imagePlane' in shape_node_types)):
-        object_type = const.OBJECT_TYPE_IMAGE_PLANE
+    shape_node_types = []
+    if obj.hasFn(OpenMaya.MFn.kDagNode):
+        dag_fn = OpenMaya.MFnDagNode(obj)
+        for i in range(dag_fn.childCount()):
+            child = dag_fn.child(i)
+            if child.hasFn(OpenMaya.MFn.kShape):
+                child_fn = OpenMaya.MFnDependencyNode(child)
+                shape_node_types.append(child_fn.typeName())
 
-    elif node_type == 'imagePlane':
-        object_type = const.OBJECT_TYPE_IMAGE_PLANE
+    def has_attr_func(name):
+        return node_fn.hasAttribute(name)
 
-    elif node_type == 'mmMarkerGroupTransform':
-        object_type = const.OBJECT_TYPE_MARKER_GROUP
+    def locked_func(name):
+        return node_fn.findPlug(name, True).isLocked()
 
-    elif ((node_type == 'objectSet')
-          and ('solver_list' in attrs)):
-        object_type = const.OBJECT_TYPE_COLLECTION
+    def keyable_func(name):
+        return node_fn.findPlug(name, True).isKeyable()
 
-    return object_type
+    return _classify_object_type(
+        node_type,
+        shape_node_types,
+        has_attr_func,
+        locked_func,
+        keyable_func)
+
+
+def get_object_types(nodes):
+    """
+    Interpret many nodes as MM Solver object types, at once.
+
+    Gives the same results as calling get_object_type on each node,
+    but all nodes are added to a single Maya API selection list and
+    classified with the Maya API, without running Maya commands for
+    each node.
+
+    :param nodes: Maya node paths (or plug paths) to get the type of.
+    :type nodes: [str, ..]
+
+    :return: The object type of each node, in the same order as
+             'nodes'. Nodes that do not exist (or match many nodes)
+             are OBJECT_TYPE_UNKNOWN.
+    :rtype: [OBJECT_TYPE_*, ..]
+    """
+    assert isinstance(nodes, (list, tuple))
+    result = [const.OBJECT_TYPE_UNKNOWN] * len(nodes)
+    sel_list = OpenMaya.MSelectionList()
+    sel_indices = []
+    duplicate_indices = []
+    for i, node in enumerate(nodes):
+        assert isinstance(node, basestring)
+        if '.' in node:
+            result[i] = const.OBJECT_TYPE_ATTRIBUTE
+            continue
+        before_num = sel_list.length()
+        try:
+            sel_list.add(node)
+        except RuntimeError:
+            # The node does not exist.
+            continue
+        added_num = sel_list.length() - before_num
+        if added_num == 1:
+            sel_indices.append(i)
+        elif added_num == 0:
+            # The node is already in the selection list.
+            duplicate_indices.append(i)
+        else:
+            # The name matches many nodes, the node is ambiguous.
+            for j in range(added_num):
+                sel_list.remove(before_num)
+
+    for sel_index, i in enumerate(sel_indices):
+        result[i] = _get_object_type_from_selection_list(sel_list, sel_index)
+
+    if len(duplicate_indices) > 0:
+        node_to_type = dict()
+        for i in sel_indices:
+            node_to_type[nodes[i]] = result[i]
+        for i in duplicate_indices:
+            node = nodes[i]
+            object_type = node_to_type.get(node)
+            if object_type is None:
+                # The same node, with a different name.
+                object_type = get_object_types([node])[0]
+            result[i] = object_type
+    return result
 
 
 def get_marker_group_above_node(node):
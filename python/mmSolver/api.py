@@ -43,6 +43,7 @@ from mmSolver._api.execute import (
 from mmSolver._api.frame import Frame
 from mmSolver._api.rootframe import (
     get_root_frames_from_markers,
+    get_root_frames_from_markers_greedy,
 )
 from mmSolver._api.action import (
     Action,
@@ -146,6 +147,7 @@ from mmSolver._api.constant import (
     SOLVER_TYPE_CMINPACK_LM,
     SOLVER_TYPE_CMINPACK_LMDIF,
     SOLVER_TYPE_CMINPACK_LMDER,
+    SOLVER_TYPE_SCHUR_LM,
     SOLVER_TYPE_DEFAULT,
 
     TIME_EVAL_MODE_DG_CONTEXT,
@@ -167,6 +169,8 @@ from mmSolver._api.constant import (
     ROBUST_LOSS_TYPE_TRIVIAL_VALUE,
     ROBUST_LOSS_TYPE_SOFT_L_ONE_VALUE,
     ROBUST_LOSS_TYPE_CAUCHY_VALUE,
+    ROBUST_LOSS_TYPE_HUBER_VALUE,
+    ROBUST_LOSS_TYPE_TUKEY_VALUE,
     ROBUST_LOSS_TYPE_VALUE_LIST,
     ROBUST_LOSS_TYPE_DEFAULT_VALUE,
 
@@ -213,6 +217,7 @@ from mmSolver._api.state import (
 from mmSolver._api.utils import (
     load_plugin,
     get_object_type,
+    get_object_types,
     get_data_on_node_attr,
     set_data_on_node_attr,
     get_value_on_node_attr,
@@ -271,6 +276,7 @@ __all__ = [
     'SOLVER_TYPE_CMINPACK_LM',
     'SOLVER_TYPE_CMINPACK_LMDIF',
     'SOLVER_TYPE_CMINPACK_LMDER',
+    'SOLVER_TYPE_SCHUR_LM',
     'SOLVER_TYPE_DEFAULT',
     'TIME_EVAL_MODE_DG_CONTEXT',
     'TIME_EVAL_MODE_SET_TIME',
@@ -288,6 +294,8 @@ __all__ = [
     'ROBUST_LOSS_TYPE_TRIVIAL_VALUE',
     'ROBUST_LOSS_TYPE_SOFT_L_ONE_VALUE',
     'ROBUST_LOSS_TYPE_CAUCHY_VALUE',
+    'ROBUST_LOSS_TYPE_HUBER_VALUE',
+    'ROBUST_LOSS_TYPE_TUKEY_VALUE',
     'ROBUST_LOSS_TYPE_VALUE_LIST',
     'ROBUST_LOSS_TYPE_DEFAULT_VALUE',
     'VALIDATE_MODE_PRE_VALIDATE_VALUE',
@@ -376,6 +384,7 @@ __all__ = [
 
     # Root Frame
     'get_root_frames_from_markers',
+    'get_root_frames_from_markers_greedy',
 
     # Node Conversion
     'get_bundle_nodes_from_marker_nodes',
@@ -393,6 +402,7 @@ __all__ = [
     # Utilities Functions
     'load_plugin',
     'get_object_type',
+    'get_object_types',
     'undo_chunk',
     'undo_chunk_context',
     'create_anim_curve_node',
@@ -29,6 +29,7 @@ import mmSolver.logger
 
 import mmSolver.api as mmapi
 import mmSolver.utils.animcurve as anim_utils
+import mmSolver.utils.event as event_utils
 import mmSolver.utils.node as node_utils
 import mmSolver.tools.loadmarker.lib.fieldofview as fieldofview
 import mmSolver.tools.loadmarker.lib.interface as interface
@@ -380,25 +381,27 @@ def create_nodes(mkr_data_list,
 
     mkr_nodes = []
     mkr_list = []
-    for mkr_data in mkr_data_list:
-        # Create the nodes
-        mkr, bnd = __create_node(
-            mkr_data, cam, mkr_grp,
-            with_bundles,
-        )
-        mkr_nodes.append(mkr.get_node())
-        if mkr is not None:
-            # Set attributes and add into list
-            __set_node_data(
-                mkr, bnd, mkr_data,
-                load_bundle_position,
-                overscan_x, overscan_y
+    # Events for all the created nodes are sent once, at the end.
+    with event_utils.batch():
+        for mkr_data in mkr_data_list:
+            # Create the nodes
+            mkr, bnd = __create_node(
+                mkr_data, cam, mkr_grp,
+                with_bundles,
             )
-            mkr_list.append(mkr)
-
-    if len(mkr_list) > 0 and col is not None:
-        assert isinstance(col, mmapi.Collection)
-        col.add_marker_list(mkr_list)
+            mkr_nodes.append(mkr.get_node())
+            if mkr is not None:
+                # Set attributes and add into list
+                __set_node_data(
+                    mkr, bnd, mkr_data,
+                    load_bundle_position,
+                    overscan_x, overscan_y
+                )
+                mkr_list.append(mkr)
+
+        if len(mkr_list) > 0 and col is not None:
+            assert isinstance(col, mmapi.Collection)
+            col.add_marker_list(mkr_list)
 
     if len(mkr_nodes) > 0:
         maya.cmds.select(mkr_nodes, replace=True)
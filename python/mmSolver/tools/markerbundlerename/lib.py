@@ -23,6 +23,7 @@ import maya.cmds
 
 import mmSolver.logger
 import mmSolver.api as mmapi
+import mmSolver.utils.event as event_utils
 
 
 LOG = mmSolver.logger.get_logger()
@@ -108,24 +109,26 @@ def rename_markers_and_bundles(mkr_nodes, bnd_nodes,
 
     # Rename the bundles.
     renamed_nodes = []
-    for i, bnd_node in enumerate(bnd_nodes):
-        num_str = number_format % (i + 1)
-        bnd = mmapi.Bundle(node=bnd_node)
-
-        new_bnd_name = mmapi.get_new_bundle_name(
-            num_str,
-            prefix=bnd_name,
-            suffix=bnd_suffix
-        )
-        bnd_node = bnd.get_node()
-        maya.cmds.rename(bnd_node, new_bnd_name)
-        renamed_nodes.append(bnd.get_node())
-
-        new_mkr_name = new_bnd_name.replace(bnd_name, mkr_name)
-        new_mkr_name = new_mkr_name.replace(bnd_suffix, mkr_suffix)
-        mkr_list = bnd.get_marker_list()
-        for mkr in mkr_list:
-            mkr_node = mkr.get_node()
-            maya.cmds.rename(mkr_node, new_mkr_name)
-            renamed_nodes.append(mkr.get_node())
+    # Node name changed events are sent once, at the end.
+    with event_utils.batch():
+        for i, bnd_node in enumerate(bnd_nodes):
+            num_str = number_format % (i + 1)
+            bnd = mmapi.Bundle(node=bnd_node)
+
+            new_bnd_name = mmapi.get_new_bundle_name(
+                num_str,
+                prefix=bnd_name,
+                suffix=bnd_suffix
+            )
+            bnd_node = bnd.get_node()
+            maya.cmds.rename(bnd_node, new_bnd_name)
+            renamed_nodes.append(bnd.get_node())
+
+            new_mkr_name = new_bnd_name.replace(bnd_name, mkr_name)
+            new_mkr_name = new_mkr_name.replace(bnd_suffix, mkr_suffix)
+            mkr_list = bnd.get_marker_list()
+            for mkr in mkr_list:
+                mkr_node = mkr.get_node()
+                maya.cmds.rename(mkr_node, new_mkr_name)
+                renamed_nodes.append(mkr.get_node())
     return renamed_nodes
@@ -116,41 +116,55 @@ def _do_raycast(node_list, mesh_nodes, frame_range, max_dist, use_smooth_mesh):
         frame_range = time_utils.FrameRange(int(cur_frame), int(cur_frame))
     frames = range(frame_range.start, frame_range.end + 1)
     is_multi_frame = len(frames) > 1
-    for frame in frames:
-        maya.cmds.currentTime(frame, edit=True, update=True)
-        for mkr_node, bnd_node, cam_tfm in node_list:
-            assert bnd_node is not None
-            assert cam_tfm is not None
-
-            direction = reproject_utils.get_camera_direction_to_point(
-                cam_tfm, mkr_node
-            )
-            origin_point = maya.cmds.xform(
-                mkr_node, query=True,
-                translation=True,
-                worldSpace=True)
-            hit_point = raytrace_utils.closest_intersect(
-                origin_point,
-                direction,
-                mesh_nodes,
-                test_both_directions=False,
-                max_dist=max_dist,
-                use_smooth_mesh=use_smooth_mesh)
-            if hit_point is None:
-                if is_multi_frame is False:
-                    LOG.warn("%s didn't hit the mesh.", mkr_node)
-                continue
-
-            hit_xyz = (hit_point.x, hit_point.y, hit_point.z)
-            maya.cmds.xform(
-                bnd_node,
-                translation=hit_xyz,
-                worldSpace=True,
-            )
-            if is_multi_frame is True:
-                maya.cmds.setKeyframe(bnd_node, attribute=BND_ATTRS)
-            bnd_nodes.add(bnd_node)
-    maya.cmds.currentTime(cur_frame, edit=True, update=True)
+    if len(mesh_nodes) == 0:
+        LOG.warning('No mesh objects found in the scene')
+        return bnd_nodes
+
+    intersector = raytrace_utils.MeshIntersector(
+        mesh_nodes,
+        use_smooth_mesh=use_smooth_mesh)
+    try:
+        for frame in frames:
+            maya.cmds.currentTime(frame, edit=True, update=True)
+            intersector.update()
+
+            # Intersect the rays of all markers at once.
+            origin_points = []
+            directions = []
+            for mkr_node, bnd_node, cam_tfm in node_list:
+                assert bnd_node is not None
+                assert cam_tfm is not None
+                direction = reproject_utils.get_camera_direction_to_point(
+                    cam_tfm, mkr_node
+                )
+                origin_point = maya.cmds.xform(
+                    mkr_node, query=True,
+                    translation=True,
+                    worldSpace=True)
+                origin_points.append(origin_point)
+                directions.append(direction)
+            hit_points = intersector.closest_intersect_many(
+                origin_points,
+                directions,
+                max_dist=max_dist)
+
+            for (mkr_node, bnd_node, cam_tfm), hit_xyz in zip(node_list,
+                                                             hit_points):
+                if hit_xyz is None:
+                    if is_multi_frame is False:
+                        LOG.warn("%s didn't hit the mesh.", mkr_node)
+                    continue
+                maya.cmds.xform(
+                    bnd_node,
+                    translation=hit_xyz,
+                    worldSpace=True,
+                )
+                if is_multi_frame is True:
+                    maya.cmds.setKeyframe(bnd_node, attribute=BND_ATTRS)
+                bnd_nodes.add(bnd_node)
+    finally:
+        intersector.clear()
+        maya.cmds.currentTime(cur_frame, edit=True, update=True)
     return bnd_nodes
 
 
@@ -36,6 +36,7 @@ import mmSolver.utils.animcurve as animcurve_utils
 #  to the 'solver' tool.
 import mmSolver.tools.solver.constant as solver_const
 import mmSolver.tools.solver.lib.scene_data as scene_data
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 
 import mmSolver.tools.setattributedetails.constant as const
 
@@ -592,3 +593,7 @@ def set_attribute_details(col, attr, values):
     col.set_attribute_smoothness_enable(attr, values.smoothness_enable)
     col.set_attribute_smoothness_variance(attr, values.smoothness_variance)
     col.set_attribute_smoothness_weight(attr, values.smoothness_weight)
+
+    # The Solver UI displays the values from a snapshot.
+    lib_snapshot.invalidate_snapshots(col)
+    return
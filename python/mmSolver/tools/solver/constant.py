@@ -72,6 +72,7 @@ SCENE_DATA_AUTO_UPDATE_SOLVER_VALIDATION = 'auto_update_solver_validation'
 SCENE_DATA_PRE_SOLVE_FORCE_EVAL = 'pre_solve_force_eval'
 SCENE_DATA_REFRESH_VIEWPORT = 'refresh_viewport_state'
 SCENE_DATA_FORCE_DG_UPDATE = 'force_dg_update_state'
+SCENE_DATA_AUTO_ROOT_FRAMES_FEWEST = 'auto_root_frames_fewest'
 SCENE_DATA_DISPLAY_IMAGE_PLANE_WHILE_SOLVING = 'display_image_plane_while_solving'
 SCENE_DATA_DISPLAY_MESHES_WHILE_SOLVING = 'display_meshes_while_solving'
 SCENE_DATA_ISOLATE_OBJECT_WHILE_SOLVING = 'isolate_object_while_solving'
@@ -88,6 +89,7 @@ SCENE_DATA_AUTO_UPDATE_SOLVER_VALIDATION_DEFAULT = False
 SCENE_DATA_PRE_SOLVE_FORCE_EVAL_DEFAULT = True
 SCENE_DATA_REFRESH_VIEWPORT_DEFAULT = True
 SCENE_DATA_FORCE_DG_UPDATE_DEFAULT = True
+SCENE_DATA_AUTO_ROOT_FRAMES_FEWEST_DEFAULT = False
 SCENE_DATA_ISOLATE_OBJECT_WHILE_SOLVING_DEFAULT = False
 SCENE_DATA_DISPLAY_IMAGE_PLANE_WHILE_SOLVING_DEFAULT = False
 SCENE_DATA_DISPLAY_MESHES_WHILE_SOLVING_DEFAULT = False
@@ -152,6 +154,17 @@ SOLVER_STEP_DATA_DEFAULT = {
     'use_static_attrs': False,
 }
 
+# Collection State (stored on Collection node)
+#
+# The Solver UI options are stored together in a single (JSON)
+# document on the Collection node. Increment the version when the
+# document structure changes, so old documents can be migrated.
+COLLECTION_STATE_ATTR = 'solver_ui_state'
+COLLECTION_STATE_ATTR_TYPE = 'string'
+COLLECTION_STATE_VERSION = 1
+COLLECTION_STATE_VERSION_KEY = 'version'
+COLLECTION_STATE_VALUES_KEY = 'values'
+
 # Override Current Frame (stored on Collection node)
 OVERRIDE_CURRENT_FRAME_ATTR = 'override_current_frame'
 OVERRIDE_CURRENT_FRAME_ATTR_TYPE = 'bool'
@@ -229,22 +229,61 @@ def reset_values_on_selected_attributes(attr_list):
     return
 
 
-def add_callbacks_to_attributes(attr_list, callback_manager):
-    s = time.time()
+def _get_attribute_node_uuids(attr_list):
     msg = 'Node UUID has multiple paths: node=%r node_uuids=%r'
-    callback_type = maya_callbacks.TYPE_ATTRIBUTE
+    node_uuids = dict()
+    node_paths = set()
     for attr_obj in attr_list:
         node_path = attr_obj.get_node(full_path=True)
-        node_uuids = maya.cmds.ls(node_path, uuid=True) or []
-        if len(node_uuids) != 1:
-            LOG.debug(msg, node_path, node_uuids)
+        if node_path in node_paths:
             continue
-        node_uuid = node_uuids[0]
+        node_paths.add(node_path)
+        uuids = maya.cmds.ls(node_path, uuid=True) or []
+        if len(uuids) != 1:
+            LOG.debug(msg, node_path, uuids)
+            continue
+        node_uuids[uuids[0]] = node_path
+    return node_uuids
+
+
+def add_callbacks_to_attributes(attr_list, callback_manager, replace=False):
+    """
+    Add Attribute callbacks to a callback manager.
+
+    The nodes of the attributes are watched by the global callbacks of
+    the callback manager (for name changes and deletion), and each
+    node gets one attribute changed callback. The per-node callbacks
+    are removed when the node is no longer watched.
+
+    :param attr_list: List of attributes to add callbacks to.
+    :type attr_list: [Attribute, ..]
+
+    :param callback_manager:
+        The callback manager class which holds all references to the
+        callbacks.
+    :type callback_manager: CallbackManager
+
+    :param replace: If True, only the nodes of 'attr_list' are
+                    watched, otherwise the nodes are added to the
+                    nodes already watched.
+    :type replace: bool
+    """
+    s = time.time()
+    callback_type = maya_callbacks.TYPE_ATTRIBUTE
+    node_uuids = _get_attribute_node_uuids(attr_list)
+    if replace is True:
+        callback_manager.set_watched_nodes(callback_type, node_uuids.keys())
+        maya_callbacks.remove_unwatched_callbacks(
+            callback_manager, callback_type)
+    else:
+        callback_manager.add_watched_nodes(callback_type, node_uuids.keys())
+    for node_uuid, node_path in node_uuids.items():
         if callback_manager.type_has_node(callback_type, node_uuid) is True:
             continue
         callback_ids = maya_callbacks.add_callbacks_attribute(
             node_uuid,
             node_path,
+            callback_manager,
         )
         callback_manager.add_node_ids(
             callback_type,
@@ -260,6 +299,9 @@ def remove_callbacks_from_attributes(attr_list, callback_manager):
     """
     Remove Attribute callbacks from a callback manager.
 
+    The nodes are no longer watched, and the Maya callbacks of the
+    nodes are removed.
+
     :param attr_list: List of attributes to remove callbacks from.
     :type attr_list: [Attribute, ..]
 
@@ -268,19 +310,8 @@ def remove_callbacks_from_attributes(attr_list, callback_manager):
         callbacks.
     :type callback_manager: CallbackManager
     """
-    msg = 'Node UUID has multiple paths: node=%r node_uuids=%r'
     callback_type = maya_callbacks.TYPE_ATTRIBUTE
-    for attr_obj in attr_list:
-        node_path = attr_obj.get_node(full_path=True)
-        node_uuids = maya.cmds.ls(node_path, uuid=True) or []
-        if len(node_uuids) != 1:
-            LOG.debug(msg, node_path, node_uuids)
-            continue
-        node_uuid = node_uuids[0]
-        if callback_manager.type_has_node(callback_type, node_uuid) is False:
-            continue
-        callback_manager.remove_type_node_ids(
-            callback_type,
-            node_uuid,
-        )
+    node_uuids = _get_attribute_node_uuids(attr_list)
+    callback_manager.remove_watched_nodes(callback_type, node_uuids.keys())
+    maya_callbacks.remove_unwatched_callbacks(callback_manager, callback_type)
     return
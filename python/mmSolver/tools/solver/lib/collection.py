@@ -31,12 +31,14 @@ import mmSolver.api as mmapi
 import mmSolver.ui.uiutils as uiutils
 import mmSolver.utils.time as utils_time
 import mmSolver.utils.converttypes as converttypes
+import mmSolver.utils.configmaya as configmaya
 import mmSolver.tools.userpreferences.constant as userprefs_const
 import mmSolver.tools.userpreferences.lib as userprefs_lib
 import mmSolver.tools.solver.lib.state as lib_state
 import mmSolver.tools.solver.lib.collectionstate as col_state
 import mmSolver.tools.solver.lib.solver as solver_utils
 import mmSolver.tools.solver.lib.solver_step as solver_step
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 import mmSolver.tools.solver.lib.maya_utils as lib_maya_utils
 import mmSolver.tools.solver.constant as const
 
@@ -672,6 +674,7 @@ def execute_collection(col,
 
     # Set keyframe data on the collection for the solver
     mmapi.update_deviation_on_collection(col, solres_list)
+    lib_snapshot.invalidate_snapshots(col)
     return
 
 
@@ -788,6 +791,8 @@ def run_solve_ui(col,
             LOG.error(msg)
             return
 
+        # Write pending UI state to the Maya nodes before solving.
+        configmaya.flush_node_options()
         compile_collection(col)
         prog_fn = LOG.warning
         status_fn = LOG.warning
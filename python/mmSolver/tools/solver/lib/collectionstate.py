@@ -139,6 +139,18 @@ def __set_value_on_node(node, attr_name, value,
     """
     assert isinstance(node, basestring)
     assert isinstance(attr_name, basestring)
+    _check_value_type(value, attr_type)
+    ensure_attr_exists(node, attr_name, attr_type, default_value)
+    set_value_func(node, attr_name, value)
+    return
+
+
+def _check_value_type(value, attr_type):
+    """
+    Check the value is valid to be set for an attribute type.
+
+    :raises TypeError: When the value is not valid.
+    """
     integer_attr_types = [
         'long', 'short', 'byte', 'char'
     ]
@@ -169,8 +181,6 @@ def __set_value_on_node(node, attr_name, value,
         msg = 'Value queried is not valid type: attr_type=%r value_type=%r'
         msg = msg % (attr_type, type(value))
         raise TypeError(msg)
-    ensure_attr_exists(node, attr_name, attr_type, default_value)
-    set_value_func(node, attr_name, value)
     return
 
 
@@ -242,6 +252,245 @@ def set_value_structure_on_node(node, attr_name, value,
     return
 
 
+#######################################################################
+
+# The options stored in the Collection state document; each option
+# has a name, an attribute type and a default value.
+#
+# Before the state document (version 0), each option was stored as
+# an individual attribute (of the same name) on the Collection node.
+STATE_OPTION_LIST = [
+    (const.OVERRIDE_CURRENT_FRAME_ATTR,
+     const.OVERRIDE_CURRENT_FRAME_ATTR_TYPE,
+     const.OVERRIDE_CURRENT_FRAME_DEFAULT_VALUE),
+    (const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR,
+     const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR_TYPE,
+     const.ATTRIBUTE_TOGGLE_ANIMATED_DEFAULT_VALUE),
+    (const.ATTRIBUTE_TOGGLE_STATIC_ATTR,
+     const.ATTRIBUTE_TOGGLE_STATIC_ATTR_TYPE,
+     const.ATTRIBUTE_TOGGLE_STATIC_DEFAULT_VALUE),
+    (const.ATTRIBUTE_TOGGLE_LOCKED_ATTR,
+     const.ATTRIBUTE_TOGGLE_LOCKED_ATTR_TYPE,
+     const.ATTRIBUTE_TOGGLE_LOCKED_DEFAULT_VALUE),
+    (const.OBJECT_TOGGLE_CAMERA_ATTR,
+     const.OBJECT_TOGGLE_CAMERA_ATTR_TYPE,
+     const.OBJECT_TOGGLE_CAMERA_DEFAULT_VALUE),
+    (const.OBJECT_TOGGLE_MARKER_ATTR,
+     const.OBJECT_TOGGLE_MARKER_ATTR_TYPE,
+     const.OBJECT_TOGGLE_MARKER_DEFAULT_VALUE),
+    (const.OBJECT_TOGGLE_BUNDLE_ATTR,
+     const.OBJECT_TOGGLE_BUNDLE_ATTR_TYPE,
+     const.OBJECT_TOGGLE_BUNDLE_DEFAULT_VALUE),
+    (const.SOLVER_TAB_ATTR,
+     const.SOLVER_TAB_ATTR_TYPE,
+     const.SOLVER_TAB_DEFAULT_VALUE),
+    (const.SOLVER_RANGE_TYPE_ATTR,
+     const.SOLVER_RANGE_TYPE_ATTR_TYPE,
+     const.SOLVER_RANGE_TYPE_DEFAULT_VALUE),
+    (const.SOLVER_FRAMES_ATTR,
+     const.SOLVER_FRAMES_ATTR_TYPE,
+     const.SOLVER_FRAMES_DEFAULT_VALUE),
+    (const.SOLVER_INCREMENT_BY_FRAME_ATTR,
+     const.SOLVER_INCREMENT_BY_FRAME_ATTR_TYPE,
+     const.SOLVER_INCREMENT_BY_FRAME_DEFAULT_VALUE),
+    (const.SOLVER_ROOT_FRAMES_ATTR,
+     const.SOLVER_ROOT_FRAMES_ATTR_TYPE,
+     const.SOLVER_ROOT_FRAMES_DEFAULT_VALUE),
+    (const.SOLVER_ONLY_ROOT_FRAMES_ATTR,
+     const.SOLVER_ONLY_ROOT_FRAMES_ATTR_TYPE,
+     const.SOLVER_ONLY_ROOT_FRAMES_DEFAULT_VALUE),
+    (const.SOLVER_GLOBAL_SOLVE_ATTR,
+     const.SOLVER_GLOBAL_SOLVE_ATTR_TYPE,
+     const.SOLVER_GLOBAL_SOLVE_DEFAULT_VALUE),
+    (const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR,
+     const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR_TYPE,
+     const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_DEFAULT_VALUE),
+    (const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR,
+     const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR_TYPE,
+     const.SOLVER_EVAL_COMPLEX_GRAPHS_DEFAULT_VALUE),
+]
+
+__STATE_OPTIONS = dict([(name, (attr_type, default_value))
+                        for name, attr_type, default_value
+                        in STATE_OPTION_LIST])
+
+
+def __migrate_state_document(node, data):
+    """
+    Convert a state document, of any older version, into the current
+    version.
+
+    :param node: The Collection node the document was read from.
+    :type node: str
+
+    :param data: The state document, or None if the node has no
+                 state document.
+    :type data: dict or None
+
+    :returns: The state document in the current version.
+    :rtype: dict
+    """
+    version = 0
+    if isinstance(data, dict):
+        version = data.get(const.COLLECTION_STATE_VERSION_KEY)
+    if not isinstance(version, (int, long)):
+        version = 0
+
+    if version == 0:
+        # Read the options from the individual attributes; options
+        # without an attribute use the default value.
+        values = dict()
+        attrs = maya.cmds.listAttr(node) or []
+        for name, attr_type, default_value in STATE_OPTION_LIST:
+            if name not in attrs:
+                continue
+            value = configmaya.get_node_option(node, name)
+            if value is None:
+                continue
+            try:
+                _check_value_type(value, attr_type)
+            except TypeError:
+                msg = 'Ignoring invalid Collection option: node=%r attr=%r'
+                LOG.warning(msg, node, name)
+                continue
+            values[name] = value
+        data = {
+            const.COLLECTION_STATE_VERSION_KEY: 1,
+            const.COLLECTION_STATE_VALUES_KEY: values,
+        }
+    return data
+
+
+def __get_state_document(node):
+    """
+    Get the state document of a Collection node, migrating older
+    documents to the current version.
+
+    The migrated document is not written to the node; it is written
+    the next time an option is set, so reading options never changes
+    the Maya scene (or adds to the undo stack).
+
+    A document that cannot be read (such as invalid JSON) is ignored,
+    the options are read as if the node has no state document.
+    """
+    assert isinstance(node, basestring)
+    try:
+        data = configmaya.get_node_option_structure(
+            node, const.COLLECTION_STATE_ATTR)
+    except ValueError:
+        msg = 'Ignoring invalid Collection state document: node=%r'
+        LOG.warning(msg, node)
+        data = None
+    version = None
+    if isinstance(data, dict):
+        version = data.get(const.COLLECTION_STATE_VERSION_KEY)
+    if not isinstance(version, (int, long)):
+        version = None
+    if version is None or version < const.COLLECTION_STATE_VERSION:
+        data = __migrate_state_document(node, data)
+    return data
+
+
+def __get_state_document_values(data):
+    """
+    Get the option values stored in a state document.
+    """
+    values = data.get(const.COLLECTION_STATE_VALUES_KEY)
+    if not isinstance(values, dict):
+        values = dict()
+    return values
+
+
+def get_state_from_collection(col):
+    """
+    Get all the option values stored in a Collection's state.
+
+    Options that have not been set use the default value.
+
+    :param col: The Collection to query.
+    :type col: Collection
+
+    :returns: Option names and values.
+    :rtype: dict
+    """
+    data = __get_state_document(col.get_node())
+    stored_values = __get_state_document_values(data)
+    values = dict()
+    for name, attr_type, default_value in STATE_OPTION_LIST:
+        value = stored_values.get(name, default_value)
+        if value is not None:
+            try:
+                _check_value_type(value, attr_type)
+            except TypeError:
+                msg = 'Invalid Collection option, using default: name=%r value=%r'
+                LOG.warning(msg, name, value)
+                value = default_value
+        values[name] = value
+    return values
+
+
+def set_state_on_collection(col, values):
+    """
+    Set many option values in a Collection's state, at once.
+
+    :param col: The Collection to change.
+    :type col: Collection
+
+    :param values: Option names and values to set. Options not given
+                   are not changed.
+    :type values: dict
+    """
+    for name, value in values.items():
+        if name not in __STATE_OPTIONS:
+            raise ValueError('Collection option is not valid: %r' % name)
+        attr_type, default_value = __STATE_OPTIONS[name]
+        _check_value_type(value, attr_type)
+    node = col.get_node()
+    data = __get_state_document(node)
+    stored_values = dict(__get_state_document_values(data))
+    stored_values.update(values)
+    data = dict(data)
+    data[const.COLLECTION_STATE_VALUES_KEY] = stored_values
+    configmaya.set_node_option_structure(
+        node, const.COLLECTION_STATE_ATTR, data,
+        add_attr=True)
+    return
+
+
+def get_state_value(col, name):
+    """
+    Get an option value from a Collection's state.
+
+    :param col: The Collection to query.
+    :type col: Collection
+
+    :param name: The option name, one of the names in STATE_OPTION_LIST.
+    :type name: str
+
+    :returns: The option value, or the default value if not set.
+    """
+    if name not in __STATE_OPTIONS:
+        raise ValueError('Collection option is not valid: %r' % name)
+    values = get_state_from_collection(col)
+    return values[name]
+
+
+def set_state_value(col, name, value):
+    """
+    Set an option value in a Collection's state.
+
+    :param col: The Collection to change.
+    :type col: Collection
+
+    :param name: The option name, one of the names in STATE_OPTION_LIST.
+    :type name: str
+
+    :param value: Value to set to.
+    """
+    set_state_on_collection(col, {name: value})
+    return
+
+
 #######################################################################
 
 
@@ -255,12 +504,7 @@ def get_override_current_frame_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.OVERRIDE_CURRENT_FRAME_ATTR,
-        attr_type=const.OVERRIDE_CURRENT_FRAME_ATTR_TYPE,
-        default_value=const.OVERRIDE_CURRENT_FRAME_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.OVERRIDE_CURRENT_FRAME_ATTR)
     return value
 
 
@@ -274,13 +518,7 @@ def set_override_current_frame_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.OVERRIDE_CURRENT_FRAME_ATTR,
-        value,
-        attr_type=const.OVERRIDE_CURRENT_FRAME_ATTR_TYPE,
-        default_value=const.OVERRIDE_CURRENT_FRAME_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.OVERRIDE_CURRENT_FRAME_ATTR, value)
     return
 
 
@@ -297,12 +535,7 @@ def get_attribute_toggle_animated_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR,
-        attr_type=const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR_TYPE,
-        default_value=const.ATTRIBUTE_TOGGLE_ANIMATED_DEFAULT_VALUE
-    )
+    value = get_state_value(col, const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR)
     return value
 
 
@@ -316,13 +549,7 @@ def set_attribute_toggle_animated_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR,
-        value,
-        attr_type=const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR_TYPE,
-        default_value=const.ATTRIBUTE_TOGGLE_ANIMATED_DEFAULT_VALUE
-    )
+    set_state_value(col, const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR, value)
     return
 
 
@@ -339,12 +566,7 @@ def get_attribute_toggle_static_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.ATTRIBUTE_TOGGLE_STATIC_ATTR,
-        attr_type=const.ATTRIBUTE_TOGGLE_STATIC_ATTR_TYPE,
-        default_value=const.ATTRIBUTE_TOGGLE_STATIC_DEFAULT_VALUE
-    )
+    value = get_state_value(col, const.ATTRIBUTE_TOGGLE_STATIC_ATTR)
     return value
 
 
@@ -358,13 +580,7 @@ def set_attribute_toggle_static_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.ATTRIBUTE_TOGGLE_STATIC_ATTR,
-        value,
-        attr_type=const.ATTRIBUTE_TOGGLE_STATIC_ATTR_TYPE,
-        default_value=const.ATTRIBUTE_TOGGLE_STATIC_DEFAULT_VALUE
-    )
+    set_state_value(col, const.ATTRIBUTE_TOGGLE_STATIC_ATTR, value)
     return
 
 
@@ -381,12 +597,7 @@ def get_attribute_toggle_locked_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.ATTRIBUTE_TOGGLE_LOCKED_ATTR,
-        attr_type=const.ATTRIBUTE_TOGGLE_LOCKED_ATTR_TYPE,
-        default_value=const.ATTRIBUTE_TOGGLE_LOCKED_DEFAULT_VALUE
-    )
+    value = get_state_value(col, const.ATTRIBUTE_TOGGLE_LOCKED_ATTR)
     return value
 
 
@@ -400,13 +611,7 @@ def set_attribute_toggle_locked_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.ATTRIBUTE_TOGGLE_LOCKED_ATTR,
-        value,
-        attr_type=const.ATTRIBUTE_TOGGLE_LOCKED_ATTR_TYPE,
-        default_value=const.ATTRIBUTE_TOGGLE_LOCKED_DEFAULT_VALUE
-    )
+    set_state_value(col, const.ATTRIBUTE_TOGGLE_LOCKED_ATTR, value)
     return
 
 
@@ -423,12 +628,7 @@ def get_object_toggle_camera_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.OBJECT_TOGGLE_CAMERA_ATTR,
-        attr_type=const.OBJECT_TOGGLE_CAMERA_ATTR_TYPE,
-        default_value=const.OBJECT_TOGGLE_CAMERA_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.OBJECT_TOGGLE_CAMERA_ATTR)
     return value
 
 
@@ -442,13 +642,7 @@ def set_object_toggle_camera_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.OBJECT_TOGGLE_CAMERA_ATTR,
-        value,
-        attr_type=const.OBJECT_TOGGLE_CAMERA_ATTR_TYPE,
-        default_value=const.OBJECT_TOGGLE_CAMERA_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.OBJECT_TOGGLE_CAMERA_ATTR, value)
     return
 
 
@@ -465,12 +659,7 @@ def get_object_toggle_marker_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.OBJECT_TOGGLE_MARKER_ATTR,
-        attr_type=const.OBJECT_TOGGLE_MARKER_ATTR_TYPE,
-        default_value=const.OBJECT_TOGGLE_MARKER_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.OBJECT_TOGGLE_MARKER_ATTR)
     return value
 
 
@@ -484,13 +673,7 @@ def set_object_toggle_marker_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.OBJECT_TOGGLE_MARKER_ATTR,
-        value,
-        attr_type=const.OBJECT_TOGGLE_MARKER_ATTR_TYPE,
-        default_value=const.OBJECT_TOGGLE_MARKER_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.OBJECT_TOGGLE_MARKER_ATTR, value)
     return
 
 
@@ -507,12 +690,7 @@ def get_object_toggle_bundle_from_collection(col):
     :returns: True or False.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.OBJECT_TOGGLE_BUNDLE_ATTR,
-        attr_type=const.OBJECT_TOGGLE_BUNDLE_ATTR_TYPE,
-        default_value=const.OBJECT_TOGGLE_BUNDLE_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.OBJECT_TOGGLE_BUNDLE_ATTR)
     return value
 
 
@@ -526,13 +704,7 @@ def set_object_toggle_bundle_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.OBJECT_TOGGLE_BUNDLE_ATTR,
-        value,
-        attr_type=const.OBJECT_TOGGLE_BUNDLE_ATTR_TYPE,
-        default_value=const.OBJECT_TOGGLE_BUNDLE_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.OBJECT_TOGGLE_BUNDLE_ATTR, value)
     return
 
 
@@ -549,12 +721,7 @@ def get_solver_tab_from_collection(col):
     :returns: The tab name.
     :rtype: str
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_TAB_ATTR,
-        attr_type=const.SOLVER_TAB_ATTR_TYPE,
-        default_value=const.SOLVER_TAB_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_TAB_ATTR)
     return value
 
 
@@ -568,13 +735,7 @@ def set_solver_tab_on_collection(col, value):
     :param value: Value to set to.
     :type value: str
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_TAB_ATTR,
-        value,
-        attr_type=const.SOLVER_TAB_ATTR_TYPE,
-        default_value=const.SOLVER_TAB_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_TAB_ATTR, value)
     return
 
 
@@ -591,12 +752,7 @@ def get_solver_range_type_from_collection(col):
     :returns: An integer value in const.RANGE_TYPE_VALUE_LIST.
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_RANGE_TYPE_ATTR,
-        attr_type=const.SOLVER_RANGE_TYPE_ATTR_TYPE,
-        default_value=const.SOLVER_RANGE_TYPE_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_RANGE_TYPE_ATTR)
     return value
 
 
@@ -610,13 +766,7 @@ def set_solver_range_type_on_collection(col, value):
     :param value: Value to set to.
     :type value: int
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_RANGE_TYPE_ATTR,
-        value,
-        attr_type=const.SOLVER_RANGE_TYPE_ATTR_TYPE,
-        default_value=const.SOLVER_RANGE_TYPE_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_RANGE_TYPE_ATTR, value)
     return
 
 
@@ -633,12 +783,7 @@ def get_solver_frames_from_collection(col):
     :returns: The string representation of the frames.
     :rtype: str
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_FRAMES_ATTR,
-        attr_type=const.SOLVER_FRAMES_ATTR_TYPE,
-        default_value=const.SOLVER_FRAMES_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_FRAMES_ATTR)
     return value
 
 
@@ -652,13 +797,7 @@ def set_solver_frames_on_collection(col, value):
     :param value: Value to set to.
     :type value: str
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_FRAMES_ATTR,
-        value,
-        attr_type=const.SOLVER_FRAMES_ATTR_TYPE,
-        default_value=const.SOLVER_FRAMES_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_FRAMES_ATTR, value)
     return
 
 
@@ -675,12 +814,7 @@ def get_solver_increment_by_frame_from_collection(col):
     :returns: The frame number value.
     :rtype: int
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_INCREMENT_BY_FRAME_ATTR,
-        attr_type=const.SOLVER_INCREMENT_BY_FRAME_ATTR_TYPE,
-        default_value=const.SOLVER_INCREMENT_BY_FRAME_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_INCREMENT_BY_FRAME_ATTR)
     return value
 
 
@@ -694,13 +828,7 @@ def set_solver_increment_by_frame_on_collection(col, value):
     :param value: Value to set to.
     :type value: int
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_INCREMENT_BY_FRAME_ATTR,
-        value,
-        attr_type=const.SOLVER_INCREMENT_BY_FRAME_ATTR_TYPE,
-        default_value=const.SOLVER_INCREMENT_BY_FRAME_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_INCREMENT_BY_FRAME_ATTR, value)
     return
 
 
@@ -717,12 +845,7 @@ def get_solver_root_frames_from_collection(col):
     :returns: The string representation of the frames.
     :rtype: str
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_ROOT_FRAMES_ATTR,
-        attr_type=const.SOLVER_ROOT_FRAMES_ATTR_TYPE,
-        default_value=const.SOLVER_ROOT_FRAMES_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_ROOT_FRAMES_ATTR)
     return value
 
 
@@ -736,13 +859,7 @@ def set_solver_root_frames_on_collection(col, value):
     :param value: Value to set to.
     :type value: str
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_ROOT_FRAMES_ATTR,
-        value,
-        attr_type=const.SOLVER_ROOT_FRAMES_ATTR_TYPE,
-        default_value=const.SOLVER_ROOT_FRAMES_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_ROOT_FRAMES_ATTR, value)
     return
 
 
@@ -759,12 +876,7 @@ def get_solver_only_root_frames_from_collection(col):
     :returns: A boolean, do we solve only root frames, or not?
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_ONLY_ROOT_FRAMES_ATTR,
-        attr_type=const.SOLVER_ONLY_ROOT_FRAMES_ATTR_TYPE,
-        default_value=const.SOLVER_ONLY_ROOT_FRAMES_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_ONLY_ROOT_FRAMES_ATTR)
     return value
 
 
@@ -778,13 +890,7 @@ def set_solver_only_root_frames_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_ONLY_ROOT_FRAMES_ATTR,
-        value,
-        attr_type=const.SOLVER_ONLY_ROOT_FRAMES_ATTR_TYPE,
-        default_value=const.SOLVER_ONLY_ROOT_FRAMES_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_ONLY_ROOT_FRAMES_ATTR, value)
     return
 
 
@@ -801,12 +907,7 @@ def get_solver_global_solve_from_collection(col):
     :returns: A boolean, do we solve all frames and attributes together, or not?
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_GLOBAL_SOLVE_ATTR,
-        attr_type=const.SOLVER_GLOBAL_SOLVE_ATTR_TYPE,
-        default_value=const.SOLVER_GLOBAL_SOLVE_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_GLOBAL_SOLVE_ATTR)
     return value
 
 
@@ -820,13 +921,7 @@ def set_solver_global_solve_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_GLOBAL_SOLVE_ATTR,
-        value,
-        attr_type=const.SOLVER_GLOBAL_SOLVE_ATTR_TYPE,
-        default_value=const.SOLVER_GLOBAL_SOLVE_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_GLOBAL_SOLVE_ATTR, value)
     return
 
 
@@ -844,12 +939,7 @@ def get_solver_eval_object_relationships_from_collection(col):
         A boolean, should the solver evaluate object relationships (relationships)?
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR,
-        attr_type=const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR_TYPE,
-        default_value=const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR)
     return value
 
 
@@ -863,13 +953,7 @@ def set_solver_eval_object_relationships_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR,
-        value,
-        attr_type=const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR_TYPE,
-        default_value=const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_EVAL_OBJECT_RELATIONSHIPS_ATTR, value)
     return
 
 
@@ -887,12 +971,7 @@ def get_solver_eval_complex_graphs_from_collection(col):
         A boolean, should the solver try extra hard to evaluate complex node graphs?
     :rtype: bool
     """
-    value = get_value_from_node(
-        col.get_node(),
-        const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR,
-        attr_type=const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR_TYPE,
-        default_value=const.SOLVER_EVAL_COMPLEX_GRAPHS_DEFAULT_VALUE,
-    )
+    value = get_state_value(col, const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR)
     return value
 
 
@@ -906,11 +985,5 @@ def set_solver_eval_complex_graphs_on_collection(col, value):
     :param value: Value to set to.
     :type value: bool
     """
-    set_value_on_node(
-        col.get_node(),
-        const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR,
-        value,
-        attr_type=const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR_TYPE,
-        default_value=const.SOLVER_EVAL_COMPLEX_GRAPHS_DEFAULT_VALUE,
-    )
+    set_state_value(col, const.SOLVER_EVAL_COMPLEX_GRAPHS_ATTR, value)
     return
@@ -57,6 +57,7 @@ def _add_callback_to_any_node(callback_manager, callback_type, node_path,
     callback_ids = add_callbacks_func(
         node_uuid,
         node_path,
+        callback_manager,
     )
     callback_manager.add_node_ids(
         callback_type,
@@ -66,84 +67,79 @@ def _add_callback_to_any_node(callback_manager, callback_type, node_path,
     return
 
 
+def get_marker_node_uuids(mkr_list):
+    """
+    Get the UUIDs of the Maya nodes related to the Markers; the
+    Markers, Bundles, Marker Groups and Cameras.
+
+    :param mkr_list: Markers to get nodes from.
+    :type mkr_list: [Marker, ..]
+
+    :rtype: set of str
+    """
+    node_uuids = set()
+    cam_uuids = dict()
+    mkrgrp_nodes = set()
+    for mkr_obj in mkr_list:
+        node_uuids.add(mkr_obj.get_node_uid())
+        bnd_obj = mkr_obj.get_bundle()
+        if bnd_obj is not None:
+            node_uuids.add(bnd_obj.get_node_uid())
+        mkrgrp_obj = mkr_obj.get_marker_group()
+        if mkrgrp_obj is not None:
+            mkrgrp_nodes.add(mkrgrp_obj.get_node())
+        cam_obj = mkr_obj.get_camera()
+        if cam_obj is None:
+            continue
+        cam_tfm_uuid = cam_obj.get_transform_uid()
+        if cam_tfm_uuid not in cam_uuids:
+            cam_uuids[cam_tfm_uuid] = cam_obj.get_shape_uid()
+    node_uuids |= set(cam_uuids.keys())
+    node_uuids |= set(cam_uuids.values())
+    mkrgrp_nodes.discard(None)
+    if len(mkrgrp_nodes) > 0:
+        node_uuids |= set(maya.cmds.ls(list(mkrgrp_nodes), uuid=True) or [])
+    node_uuids.discard(None)
+    return node_uuids
+
+
+def set_watched_markers(mkr_list, callback_manager):
+    """
+    Watch only the nodes related to the given Markers, with the global
+    callbacks of the callback manager.
+
+    This does not add any Maya callbacks, it is fast to change the
+    watched Markers, such as when switching Collections. The per-node
+    callbacks of Markers no longer watched are removed.
+    """
+    callback_type = maya_callbacks.TYPE_MARKER
+    node_uuids = get_marker_node_uuids(mkr_list)
+    callback_manager.set_watched_nodes(callback_type, node_uuids)
+    maya_callbacks.remove_unwatched_callbacks(callback_manager, callback_type)
+    return
+
+
 def add_callbacks_to_markers(mkr_list, callback_manager):
     callback_type = maya_callbacks.TYPE_MARKER
+    node_uuids = get_marker_node_uuids(mkr_list)
+    callback_manager.add_watched_nodes(callback_type, node_uuids)
+
+    # Only Markers have a callback per-node (for attribute value
+    # changes). The callbacks are removed when the Marker is no
+    # longer watched.
     for mkr_obj in mkr_list:
-        # Marker
         mkr_node_path = mkr_obj.get_node()
         _add_callback_to_any_node(
             callback_manager,
             callback_type,
             mkr_node_path,
             maya_callbacks.add_callbacks_to_marker)
-
-        # Bundle
-        bnd_obj = mkr_obj.get_bundle()
-        bnd_node_path = bnd_obj.get_node()
-        _add_callback_to_any_node(
-            callback_manager,
-            callback_type,
-            bnd_node_path,
-            maya_callbacks.add_callbacks_to_bundle)
-
-        # Marker Group
-        mkrgrp_obj = mkr_obj.get_marker_group()
-        mkrgrp_node_path = mkrgrp_obj.get_node()
-        _add_callback_to_any_node(
-            callback_manager,
-            callback_type,
-            mkrgrp_node_path,
-            maya_callbacks.add_callbacks_to_marker_group)
-
-        # Camera Transform
-        cam_obj = mkr_obj.get_camera()
-        cam_tfm_node_path = cam_obj.get_transform_node()
-        _add_callback_to_any_node(
-            callback_manager,
-            callback_type,
-            cam_tfm_node_path, maya_callbacks.add_callbacks_to_camera)
-
-        # Camera Shape
-        cam_shp_node_path = cam_obj.get_shape_node()
-        _add_callback_to_any_node(
-            callback_manager,
-            callback_type,
-            cam_shp_node_path,
-            maya_callbacks.add_callbacks_to_camera)
     return
 
 
 def remove_callbacks_from_markers(mkr_list, callback_manager):
-    msg = 'Node UUID has multiple paths: node=%r node_uuids=%r'
     callback_type = maya_callbacks.TYPE_MARKER
-    for mkr_obj in mkr_list:
-        bnd_obj = mkr_obj.get_bundle()
-        cam_obj = mkr_obj.get_camera()
-        mkrgrp_obj = mkr_obj.get_marker_group()
-
-        mkr_node_path = mkr_obj.get_node()
-        bnd_node_path = bnd_obj.get_node()
-        mkrgrp_node_path = mkrgrp_obj.get_node()
-        cam_tfm_node_path = cam_obj.get_transform_node()
-        cam_shp_node_path = cam_obj.get_shape_node()
-        node_path_list = [
-            mkr_node_path,
-            bnd_node_path,
-            mkrgrp_node_path,
-            cam_tfm_node_path,
-            cam_shp_node_path,
-        ]
-        for node_path in node_path_list:
-            node_uuids = maya.cmds.ls(node_path, uuid=True) or []
-            if len(node_uuids) != 1:
-                LOG.warning(msg, node_path, node_uuids)
-                continue
-            node_uuid = node_uuids[0]
-            have_type = callback_manager.type_has_node(callback_type, node_uuid)
-            if have_type is False:
-                continue
-            callback_manager.remove_type_node_ids(
-                callback_type,
-                node_uuid,
-            )
+    node_uuids = get_marker_node_uuids(mkr_list)
+    callback_manager.remove_watched_nodes(callback_type, node_uuids)
+    maya_callbacks.remove_unwatched_callbacks(callback_manager, callback_type)
     return
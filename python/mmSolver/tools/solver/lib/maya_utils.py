@@ -304,9 +304,9 @@ def get_node_default_attributes(nodes):
     :rtype: [Attribute, ..]
     """
     attr_list = []
-    for node in nodes:
+    obj_types = mmapi.get_object_types(nodes)
+    for node, obj_type in zip(nodes, obj_types):
         node_type = maya.cmds.nodeType(node)
-        obj_type = mmapi.get_object_type(node)
         attr_names = []
         if obj_type == mmapi.OBJECT_TYPE_BUNDLE:
             # Default bundle attributes.
@@ -368,9 +368,9 @@ def input_attributes_filter(attr_list):
     :rtype: [Attribute, ..]
     """
     result = []
-    for attr_obj in attr_list:
-        node = attr_obj.get_node()
-        obj_type = mmapi.get_object_type(node)
+    nodes = [attr_obj.get_node() for attr_obj in attr_list]
+    obj_types = mmapi.get_object_types(nodes)
+    for attr_obj, obj_type in zip(attr_list, obj_types):
         if obj_type in const.ATTR_INVALID_OBJECT_TYPES:
             continue
         result.append(attr_obj)
@@ -0,0 +1,413 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Snapshot caches of the values displayed in the Solver UI tables.
+
+Qt models ask for the value of each visible cell on every repaint,
+scroll or hover. Rather than querying Maya for every cell, all values
+displayed in a table are fetched at once into a snapshot, and the UI
+nodes read from the snapshot.
+
+A snapshot is invalidated after a solve, or when a Maya node callback
+detects a change, and is re-fetched (for all rows at once) the next
+time a value is read. When only some values are out of date (such as
+the current frame deviation, when the Maya time changes) only those
+values are invalidated and re-fetched.
+
+Example usage::
+
+  >>> import mmSolver.tools.solver.lib.snapshot as lib_snapshot
+  >>> snapshot = lib_snapshot.get_object_snapshot(col)
+  >>> snapshot.set_markers(mkr_list)
+  >>> snapshot.get_value(mkr_uuid, lib_snapshot.OBJECT_VALUE_WEIGHT)
+  1.0
+  >>> lib_snapshot.invalidate_snapshots()
+  >>> lib_snapshot.invalidate_snapshots(
+  ...     value_names=[lib_snapshot.OBJECT_VALUE_DEVIATION])
+
+"""
+
+import mmSolver.logger
+
+
+LOG = mmSolver.logger.get_logger()
+
+# Marker values stored in an ObjectSnapshot.
+OBJECT_VALUE_USED_HINT = 'used_hint'
+OBJECT_VALUE_ENABLE = 'enable'
+OBJECT_VALUE_WEIGHT = 'weight'
+OBJECT_VALUE_DEVIATION = 'deviation'
+OBJECT_VALUE_AVERAGE_DEVIATION = 'average_deviation'
+OBJECT_VALUE_MAXIMUM_DEVIATION = 'maximum_deviation'
+OBJECT_VALUE_LIST = [
+    OBJECT_VALUE_USED_HINT,
+    OBJECT_VALUE_ENABLE,
+    OBJECT_VALUE_WEIGHT,
+    OBJECT_VALUE_DEVIATION,
+    OBJECT_VALUE_AVERAGE_DEVIATION,
+    OBJECT_VALUE_MAXIMUM_DEVIATION,
+]
+
+# Attribute values stored in an AttrSnapshot.
+ATTR_VALUE_USED_HINT = 'used_hint'
+ATTR_VALUE_STATE = 'state'
+ATTR_VALUE_MIN_ENABLE = 'min_enable'
+ATTR_VALUE_MAX_ENABLE = 'max_enable'
+ATTR_VALUE_MIN_VALUE = 'min_value'
+ATTR_VALUE_MAX_VALUE = 'max_value'
+ATTR_VALUE_STIFFNESS_ENABLE = 'stiffness_enable'
+ATTR_VALUE_STIFFNESS_VARIANCE = 'stiffness_variance'
+ATTR_VALUE_SMOOTHNESS_ENABLE = 'smoothness_enable'
+ATTR_VALUE_SMOOTHNESS_VARIANCE = 'smoothness_variance'
+ATTR_VALUE_LIST = [
+    ATTR_VALUE_USED_HINT,
+    ATTR_VALUE_STATE,
+    ATTR_VALUE_MIN_ENABLE,
+    ATTR_VALUE_MAX_ENABLE,
+    ATTR_VALUE_MIN_VALUE,
+    ATTR_VALUE_MAX_VALUE,
+    ATTR_VALUE_STIFFNESS_ENABLE,
+    ATTR_VALUE_STIFFNESS_VARIANCE,
+    ATTR_VALUE_SMOOTHNESS_ENABLE,
+    ATTR_VALUE_SMOOTHNESS_VARIANCE,
+]
+
+# Snapshots for each Collection node, see get_object_snapshot and
+# get_attr_snapshot.
+__OBJECT_SNAPSHOTS = dict()
+__ATTR_SNAPSHOTS = dict()
+
+
+def get_marker_value(mkr, name):
+    """
+    Query a value of a Marker from Maya.
+
+    :param mkr: The Marker to query.
+    :type mkr: Marker
+
+    :param name: The value to query, one of OBJECT_VALUE_LIST.
+    :type name: str
+
+    :returns: The value queried, or None.
+    """
+    assert name in OBJECT_VALUE_LIST
+    value = None
+    if name == OBJECT_VALUE_USED_HINT:
+        value = mkr.get_used_hint()
+    elif name == OBJECT_VALUE_ENABLE:
+        value = mkr.get_enable()
+    elif name == OBJECT_VALUE_WEIGHT:
+        value = mkr.get_weight()
+    elif name == OBJECT_VALUE_DEVIATION:
+        # The deviation on the current frame.
+        if mkr.get_enable():
+            dev_values = mkr.get_deviation(times=None)
+            if dev_values is not None:
+                value = dev_values[0]
+    elif name == OBJECT_VALUE_AVERAGE_DEVIATION:
+        value = mkr.get_average_deviation()
+    elif name == OBJECT_VALUE_MAXIMUM_DEVIATION:
+        value = mkr.get_maximum_deviation()
+    return value
+
+
+def get_attribute_value(col, attr, name):
+    """
+    Query a value of an Attribute (in a Collection) from Maya.
+
+    :param col: The Collection the Attribute belongs to.
+    :type col: Collection
+
+    :param attr: The Attribute to query.
+    :type attr: Attribute
+
+    :param name: The value to query, one of ATTR_VALUE_LIST.
+    :type name: str
+
+    :returns: The value queried, or None.
+    """
+    assert name in ATTR_VALUE_LIST
+    value = None
+    if name == ATTR_VALUE_USED_HINT:
+        value = col.get_attribute_used_hint(attr)
+    elif name == ATTR_VALUE_STATE:
+        value = attr.get_state()
+    elif name == ATTR_VALUE_MIN_ENABLE:
+        value = col.get_attribute_min_enable(attr)
+    elif name == ATTR_VALUE_MAX_ENABLE:
+        value = col.get_attribute_max_enable(attr)
+    elif name == ATTR_VALUE_MIN_VALUE:
+        value = col.get_attribute_min_value(attr)
+    elif name == ATTR_VALUE_MAX_VALUE:
+        value = col.get_attribute_max_value(attr)
+    elif name == ATTR_VALUE_STIFFNESS_ENABLE:
+        value = col.get_attribute_stiffness_enable(attr)
+    elif name == ATTR_VALUE_STIFFNESS_VARIANCE:
+        value = col.get_attribute_stiffness_variance(attr)
+    elif name == ATTR_VALUE_SMOOTHNESS_ENABLE:
+        value = col.get_attribute_smoothness_enable(attr)
+    elif name == ATTR_VALUE_SMOOTHNESS_VARIANCE:
+        value = col.get_attribute_smoothness_variance(attr)
+    return value
+
+
+class Snapshot(object):
+    """
+    Base class for a table of values, fetched for all rows at once.
+
+    Each value name is stored as a flat list, with one value per row.
+    Rows are looked up with a unique key, such as a node UUID.
+    """
+
+    def __init__(self, value_names):
+        self._value_names = list(value_names)
+        self._keys = []
+        self._key_to_row = dict()
+        self._values = dict()
+        self._valid = False
+        self._stale_names = set()
+
+    def is_valid(self):
+        return self._valid
+
+    def invalidate(self, value_names=None):
+        """
+        Mark the snapshot as out of date; the values will be fetched
+        again the next time a value is read.
+
+        :param value_names: The value names to invalidate, or None to
+                            invalidate all values. Names not stored
+                            in this snapshot are ignored.
+        :type value_names: [str, ..] or None
+        """
+        if value_names is None:
+            self._valid = False
+            self._stale_names = set()
+            return
+        for name in value_names:
+            if name in self._value_names:
+                self._stale_names.add(name)
+        return
+
+    def get_keys(self):
+        return list(self._keys)
+
+    def _set_keys(self, keys):
+        self._keys = list(keys)
+        self._key_to_row = dict([(k, i) for i, k in enumerate(self._keys)])
+        self._values = dict()
+        self._valid = False
+        self._stale_names = set()
+
+    def _fetch_rows(self, value_names):
+        """
+        Fetch the values for all rows, returned as a dict of value
+        names to lists of values (one per row).
+
+        Must be overridden by sub-classes.
+
+        :param value_names: The value names to fetch.
+        :type value_names: [str, ..]
+        """
+        raise NotImplementedError
+
+    def update(self):
+        """
+        Fetch all values, for all rows, now.
+        """
+        values = self._fetch_rows(self._value_names)
+        num = len(self._keys)
+        for name in self._value_names:
+            assert len(values.get(name, [])) == num
+        self._values = values
+        self._valid = True
+        self._stale_names = set()
+        return
+
+    def _update_stale(self):
+        """
+        Fetch the invalidated values, for all rows, now.
+        """
+        names = [n for n in self._value_names if n in self._stale_names]
+        values = self._fetch_rows(names)
+        num = len(self._keys)
+        for name in names:
+            assert len(values.get(name, [])) == num
+        self._values.update(values)
+        self._stale_names = set()
+        return
+
+    def get_value(self, key, name, default=None):
+        """
+        Get the value for a row and a value name.
+
+        If the snapshot is not valid, all values are fetched first.
+
+        :param key: The row to look up, such as a node UUID.
+        :type key: str
+
+        :param name: The name of the value to look up.
+        :type name: str
+
+        :param default: The value returned if the key is not in the
+                        snapshot.
+
+        :returns: The value stored in the snapshot.
+        """
+        row = self._key_to_row.get(key)
+        if row is None:
+            return default
+        if self._valid is False:
+            self.update()
+        elif name in self._stale_names:
+            self._update_stale()
+        values = self._values.get(name)
+        if values is None:
+            return default
+        return values[row]
+
+
+class ObjectSnapshot(Snapshot):
+    """
+    Values displayed for the Markers in the Solver UI objects table.
+    """
+
+    def __init__(self):
+        super(ObjectSnapshot, self).__init__(OBJECT_VALUE_LIST)
+        self._mkr_list = []
+
+    def set_markers(self, mkr_list):
+        """
+        Set the Markers to store values for; the values are fetched
+        lazily.
+
+        :param mkr_list: Markers in the table.
+        :type mkr_list: [Marker, ..]
+        """
+        self._mkr_list = list(mkr_list)
+        self._set_keys([mkr.get_node_uid() for mkr in self._mkr_list])
+        return
+
+    def _fetch_rows(self, value_names):
+        values = dict()
+        for name in value_names:
+            values[name] = [get_marker_value(mkr, name)
+                            for mkr in self._mkr_list]
+        return values
+
+
+class AttrSnapshot(Snapshot):
+    """
+    Values displayed for the Attributes in the Solver UI attributes
+    table.
+    """
+
+    def __init__(self):
+        super(AttrSnapshot, self).__init__(ATTR_VALUE_LIST)
+        self._col = None
+        self._attr_list = []
+
+    def set_attributes(self, col, attr_list):
+        """
+        Set the Attributes to store values for; the values are
+        fetched lazily.
+
+        :param col: The Collection the Attributes belong to.
+        :type col: Collection
+
+        :param attr_list: Attributes in the table.
+        :type attr_list: [Attribute, ..]
+        """
+        self._col = col
+        self._attr_list = list(attr_list)
+        self._set_keys([attr.get_name() for attr in self._attr_list])
+        return
+
+    def _fetch_rows(self, value_names):
+        values = dict()
+        for name in value_names:
+            values[name] = [get_attribute_value(self._col, attr, name)
+                            for attr in self._attr_list]
+        return values
+
+
+def get_object_snapshot(col):
+    """
+    Get the ObjectSnapshot for a Collection.
+
+    :param col: The Collection to get the snapshot for.
+    :type col: Collection
+
+    :rtype: ObjectSnapshot
+    """
+    key = col.get_node_uid()
+    snapshot = __OBJECT_SNAPSHOTS.get(key)
+    if snapshot is None:
+        snapshot = ObjectSnapshot()
+        __OBJECT_SNAPSHOTS[key] = snapshot
+    return snapshot
+
+
+def get_attr_snapshot(col):
+    """
+    Get the AttrSnapshot for a Collection.
+
+    :param col: The Collection to get the snapshot for.
+    :type col: Collection
+
+    :rtype: AttrSnapshot
+    """
+    key = col.get_node_uid()
+    snapshot = __ATTR_SNAPSHOTS.get(key)
+    if snapshot is None:
+        snapshot = AttrSnapshot()
+        __ATTR_SNAPSHOTS[key] = snapshot
+    return snapshot
+
+
+def invalidate_snapshots(col=None, value_names=None):
+    """
+    Invalidate the snapshots, so values are fetched from Maya again.
+
+    :param col: The Collection to invalidate, or None to invalidate
+                the snapshots of all Collections.
+    :type col: Collection or None
+
+    :param value_names: The values to invalidate (from
+                        OBJECT_VALUE_LIST or ATTR_VALUE_LIST), or None
+                        to invalidate all values.
+    :type value_names: [str, ..] or None
+    """
+    snapshots = list(__OBJECT_SNAPSHOTS.items())
+    snapshots += list(__ATTR_SNAPSHOTS.items())
+    key = None
+    if col is not None:
+        key = col.get_node_uid()
+    for snapshot_key, snapshot in snapshots:
+        if key is None or snapshot_key == key:
+            snapshot.invalidate(value_names=value_names)
+    return
+
+
+def clear_snapshots():
+    """
+    Remove all snapshots, for example when the Maya scene is closed.
+    """
+    __OBJECT_SNAPSHOTS.clear()
+    __ATTR_SNAPSHOTS.clear()
+    return
@@ -185,6 +185,15 @@ def set_force_dg_update_state(value):
     return set_state_bool(const.SCENE_DATA_FORCE_DG_UPDATE, value)
 
 
+def get_auto_root_frames_fewest_state():
+    return get_state_bool(const.SCENE_DATA_AUTO_ROOT_FRAMES_FEWEST,
+                          const.SCENE_DATA_AUTO_ROOT_FRAMES_FEWEST_DEFAULT)
+
+
+def set_auto_root_frames_fewest_state(value):
+    return set_state_bool(const.SCENE_DATA_AUTO_ROOT_FRAMES_FEWEST, value)
+
+
 def get_isolate_object_while_solving_state():
     return get_state_bool(const.SCENE_DATA_ISOLATE_OBJECT_WHILE_SOLVING,
                           const.SCENE_DATA_ISOLATE_OBJECT_WHILE_SOLVING_DEFAULT)
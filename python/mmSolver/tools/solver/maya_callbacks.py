@@ -20,6 +20,7 @@ Set up callbacks for Maya events.
 """
 
 import time
+import weakref
 import collections
 
 import maya.cmds
@@ -30,15 +31,20 @@ import mmSolver.api as mmapi
 import mmSolver.ui.uiutils as uiutils
 import mmSolver.utils.node as node_utils
 import mmSolver.utils.event as event_utils
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 
 TYPE_NEW_SCENE = 'new_scene'
 TYPE_SELECTION_CHANGED = 'selection_changed'
+TYPE_TIME_CHANGED = 'time_changed'
+TYPE_GLOBAL = 'global'
 TYPE_ATTRIBUTE = 'attribute'
 TYPE_COLLECTION = 'collection'
 TYPE_MARKER = 'marker'
 TYPE_LIST = [
     TYPE_NEW_SCENE,
     TYPE_SELECTION_CHANGED,
+    TYPE_TIME_CHANGED,
+    TYPE_GLOBAL,
     TYPE_ATTRIBUTE,
     TYPE_MARKER,
     TYPE_COLLECTION,
@@ -55,6 +61,11 @@ class CallbackManager(object):
     data structure, but does not perform any operations such as adding
     or removing Maya callbacks.
 
+    The Callback Manager also stores the set of Maya nodes (UUIDs)
+    watched by the global callbacks (see add_global_callbacks). Global
+    callbacks are called for all nodes in the Maya scene, and ignore
+    nodes that are not watched.
+
     .. note::
         The relative order of Callback Ids is not guaranteed!
     """
@@ -72,6 +83,12 @@ class CallbackManager(object):
             lambda: collections.defaultdict(set)
         )
 
+        # Nodes watched by the global callbacks.
+        #
+        # key = callback_type
+        # value = Set of node UUIDs.
+        self._watched_nodes = collections.defaultdict(set)
+
     def __del__(self):
         callback_ids = list(self.get_all_ids())
         remove_callbacks(callback_ids)
@@ -109,6 +126,56 @@ class CallbackManager(object):
         callback_ids = self.get_type_node_ids(callback_type, node_uuid)
         return len(callback_ids) > 0
 
+    def get_watched_nodes(self, callback_type):
+        return set(self._watched_nodes[callback_type])
+
+    def set_watched_nodes(self, callback_type, node_uuids):
+        """
+        Replace the nodes watched for a callback type.
+        """
+        assert callback_type in TYPE_LIST
+        self._watched_nodes[callback_type] = set(node_uuids)
+        return
+
+    def add_watched_nodes(self, callback_type, node_uuids):
+        assert callback_type in TYPE_LIST
+        self._watched_nodes[callback_type] |= set(node_uuids)
+        return
+
+    def remove_watched_nodes(self, callback_type, node_uuids):
+        self._watched_nodes[callback_type] -= set(node_uuids)
+        return
+
+    def pop_unwatched_node_ids(self, callback_type):
+        """
+        Forget the callback ids of the nodes (for the callback type)
+        that are no longer watched.
+
+        :returns: The callback ids of the nodes that are not watched;
+                  the Maya callbacks must be removed by the caller.
+        :rtype: [maya.OpenMaya.MCallbackId, ..]
+        """
+        watched_nodes = self._watched_nodes[callback_type]
+        callback_ids = []
+        nodes = self._callbacks[callback_type]
+        for node_uuid in list(nodes.keys()):
+            if node_uuid in watched_nodes:
+                continue
+            callback_ids += list(nodes.pop(node_uuid))
+        return callback_ids
+
+    def is_watched_node(self, node_uuid, callback_type=None):
+        """
+        Is the node watched (for the given callback type, or any
+        callback type if None)?
+        """
+        if callback_type is not None:
+            return node_uuid in self._watched_nodes[callback_type]
+        for node_uuids in self._watched_nodes.values():
+            if node_uuid in node_uuids:
+                return True
+        return False
+
 
 def remove_callbacks(callback_ids):
     """
@@ -125,6 +192,26 @@ def remove_callbacks(callback_ids):
     return
 
 
+def remove_unwatched_callbacks(callback_manager, callback_type):
+    """
+    Remove the per-node Maya callbacks of nodes that are no longer
+    watched by the callback manager.
+
+    :param callback_manager: The callback manager with the watched
+                             nodes.
+    :type callback_manager: CallbackManager
+
+    :param callback_type: The type of callbacks to remove.
+    :type callback_type: str
+
+    :return: Nothing.
+    :rtype: None
+    """
+    callback_ids = callback_manager.pop_unwatched_node_ids(callback_type)
+    remove_callbacks(callback_ids)
+    return
+
+
 def add_callbacks_new_scene(obj_UI):
     """
     Create callback to be run just before a new Maya scene is created.
@@ -153,11 +240,12 @@ def add_callbacks_new_scene(obj_UI):
     return callback_ids
 
 
-def add_callbacks_attribute(node_uuid, node_path):
+def add_callbacks_attribute(node_uuid, node_path, callback_manager):
     """
     Add all callbacks for a node from a 'Attribute' class.
 
-    Many callbacks are created for the node given.
+    Name changes and deletion of the node are detected by the global
+    callbacks, see add_global_callbacks.
 
     :param node_uuid: An 'unchanging' unique id for a node, we can
                       refer back to the node without holding a
@@ -167,6 +255,11 @@ def add_callbacks_attribute(node_uuid, node_path):
     :param node_path: The full node path for the node.
     :type node_path: str
 
+    :param callback_manager: The callback manager watching the node;
+                             events are only sent while the node is
+                             watched.
+    :type callback_manager: CallbackManager
+
     :return: List of callback ids created.
     :rtype: list of maya.OpenMaya.MCallbackId
     """
@@ -174,31 +267,13 @@ def add_callbacks_attribute(node_uuid, node_path):
     node_mobj = node_utils.get_as_object(node_path)
 
     # Attribute Changed
-    clientData = node_uuid
+    clientData = (node_uuid, weakref.ref(callback_manager))
     callback_id = OpenMaya.MNodeMessage.addAttributeChangedCallback(
         node_mobj,
         attribute_changed_func,
         clientData,
     )
     callback_ids.append(callback_id)
-
-    # Node Name Change
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNameChangedCallback(
-        node_mobj,
-        node_name_changed_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
-
-    # Node Has Been Deleted
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNodeDestroyedCallback(
-        node_mobj,
-        node_deleted_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
     return callback_ids
 
 
@@ -222,10 +297,14 @@ def add_callbacks_to_collection(node_uuid, node_path):
     return callback_ids
 
 
-def add_callbacks_to_marker(node_uuid, node_path):
+def add_callbacks_to_marker(node_uuid, node_path, callback_manager):
     """
     Add all callbacks for a node from a 'Marker' class.
 
+    Name changes, deletion and connection changes (if a marker/bundle
+    relationship is changed) are detected by the global callbacks, see
+    add_global_callbacks.
+
     .. todo::
 
         - Add callback when parenting changes (marker may
@@ -238,121 +317,58 @@ def add_callbacks_to_marker(node_uuid, node_path):
     callback_ids = []
     node_mobj = node_utils.get_as_object(node_path)
 
-    # Attribute Changed (if a marker/bundle relationship is changed.)
-    clientData = node_uuid
+    # Attribute Changed (if the marker weight or enable is changed.)
+    clientData = (node_uuid, weakref.ref(callback_manager))
     callback_id = OpenMaya.MNodeMessage.addAttributeChangedCallback(
         node_mobj,
-        attribute_connection_changed_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
-
-    # Node Name Change
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNameChangedCallback(
-        node_mobj,
-        node_name_changed_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
-
-    # Node Has Been Deleted
-    # TODO: This callback does not seem to be doing anything.
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNodeDestroyedCallback(
-        node_mobj,
-        node_deleted_func,
+        marker_attribute_changed_func,
         clientData,
     )
     callback_ids.append(callback_id)
     return callback_ids
 
 
-def add_callbacks_to_marker_group(node_uuid, node_path):
+def add_global_callbacks(callback_manager):
     """
-    Add all callbacks for a node from a 'MarkerGroup' class.
+    Add callbacks for all nodes in the Maya scene.
 
-    :return: List of callback ids created.
-    :rtype: list of maya.OpenMaya.MCallbackId
-    """
-    callback_ids = []
-    node_mobj = node_utils.get_as_object(node_path)
+    The callbacks are triggered for any node, but only nodes watched by
+    'callback_manager' (see CallbackManager.set_watched_nodes) send
+    events. Changing the watched nodes does not add or remove any Maya
+    callbacks.
 
-    # Node Has Been Deleted
-    # TODO: This callback does not seem to be doing anything.
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNodeDestroyedCallback(
-        node_mobj,
-        node_deleted_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
-    return callback_ids
-
-
-def add_callbacks_to_bundle(node_uuid, node_path):
-    """
-    Add all callbacks for a node from a 'Bundle' class.
+    :param callback_manager: The callback manager with the watched
+                             nodes.
+    :type callback_manager: CallbackManager
 
     :return: List of callback ids created.
     :rtype: list of maya.OpenMaya.MCallbackId
     """
     callback_ids = []
-    node_mobj = node_utils.get_as_object(node_path)
 
-    # Attribute Changed (if a marker/bundle relationship is changed.)
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addAttributeChangedCallback(
-        node_mobj,
-        attribute_connection_changed_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
+    # A weak reference is used, so the callback manager can be deleted
+    # (and remove the callbacks) while Maya holds the client data.
+    clientData = weakref.ref(callback_manager)
 
-    # Node Name Change
-    clientData = node_uuid
+    # Node Name Change; a null MObject watches all nodes.
     callback_id = OpenMaya.MNodeMessage.addNameChangedCallback(
-        node_mobj,
-        node_name_changed_func,
+        OpenMaya.MObject(),
+        global_node_name_changed_func,
         clientData,
     )
     callback_ids.append(callback_id)
 
     # Node Has Been Deleted
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNodeDestroyedCallback(
-        node_mobj,
-        node_deleted_func,
+    callback_id = OpenMaya.MDGMessage.addNodeRemovedCallback(
+        global_node_removed_func,
+        'dependNode',
         clientData,
     )
     callback_ids.append(callback_id)
-    return callback_ids
-
-
-def add_callbacks_to_camera(node_uuid, node_path):
-    """
-    Add all callbacks for a node from a 'Camera' class.
-
-    :return: List of callback ids created.
-    :rtype: list of maya.OpenMaya.MCallbackId
-    """
-    callback_ids = []
-    node_mobj = node_utils.get_as_object(node_path)
 
-    # Node Name Change
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNameChangedCallback(
-        node_mobj,
-        node_name_changed_func,
-        clientData,
-    )
-    callback_ids.append(callback_id)
-
-    # Node Has Been Deleted
-    clientData = node_uuid
-    callback_id = OpenMaya.MNodeMessage.addNodeDestroyedCallback(
-        node_mobj,
-        node_deleted_func,
+    # Connection Made or Broken
+    callback_id = OpenMaya.MDGMessage.addConnectionCallback(
+        global_connection_changed_func,
         clientData,
     )
     callback_ids.append(callback_id)
@@ -393,6 +409,33 @@ def add_selection_changed_callback(obj_UI):
     return callback_ids
 
 
+def add_time_changed_callback(obj_UI):
+    """
+    Add a time changed callback to Maya.
+
+    Values displayed in the Solver UI (such as the Marker weight and
+    deviation) are for the current frame, so the UI snapshots must be
+    re-fetched when the time changes.
+
+    :param obj_UI: Expected to be an instance of the Solver UI
+                   window class (Qt).
+    :type obj_UI: SolverWindow
+
+    :return: List of callback ids created.
+    :rtype: list of maya.OpenMaya.MCallbackId
+    """
+    callback_ids = []
+
+    clientData = obj_UI
+    func = time_changed_func
+    callback_id = OpenMaya.MDGMessage.addTimeChangeCallback(
+        func,
+        clientData)
+
+    callback_ids.append(callback_id)
+    return callback_ids
+
+
 def attribute_changed_func(callback_msg, plugA, plugB, clientData):
     """
     Callback triggered when an event happens to an attribute on a node.
@@ -410,12 +453,16 @@ def attribute_changed_func(callback_msg, plugA, plugB, clientData):
                   not relevant to callback type.
     :type plugB: OpenMaya.MPlug
 
-    :param clientData: node_uuid given to the function.
-    :type clientData: str
+    :param clientData: node_uuid and a weak reference to a
+                       CallbackManager, given to the function.
+    :type clientData: (str, weakref.ref)
 
     :return: Nothing.
     :rtype: None
     """
+    node_uuid = _get_watched_node_uuid(clientData, TYPE_ATTRIBUTE)
+    if node_uuid is None:
+        return
     if (callback_msg & OpenMaya.MNodeMessage.kConnectionMade
             or callback_msg & OpenMaya.MNodeMessage.kConnectionBroken
             or callback_msg & OpenMaya.MNodeMessage.kAttributeLocked
@@ -424,9 +471,9 @@ def attribute_changed_func(callback_msg, plugA, plugB, clientData):
             or callback_msg & OpenMaya.MNodeMessage.kAttributeUnkeyable
             or callback_msg & OpenMaya.MNodeMessage.kAttributeRemoved
             or callback_msg & OpenMaya.MNodeMessage.kAttributeRenamed):
+        lib_snapshot.invalidate_snapshots()
         if mmapi.is_solver_running() is True:
             return
-        node_uuid = clientData
         event_utils.trigger_event(
             mmapi.EVENT_NAME_ATTRIBUTE_STATE_CHANGED,
             node=node_uuid,
@@ -434,12 +481,9 @@ def attribute_changed_func(callback_msg, plugA, plugB, clientData):
     return
 
 
-def attribute_connection_changed_func(callback_msg, plugA, plugB, clientData):
+def marker_attribute_changed_func(callback_msg, plugA, plugB, clientData):
     """
-    Callback triggered when an event happens to an attribute on a node.
-
-    One callback handles many attributes and event types for one node.
-    The callback is linked to the node, not the attribute.
+    Callback triggered when an attribute value on a Marker is changed.
 
     :param callback_msg: The type of callback message.
     :type callback_msg: OpenMaya.MNodeMessage.AttributeMessage
@@ -447,24 +491,136 @@ def attribute_connection_changed_func(callback_msg, plugA, plugB, clientData):
     :param plugA: First plug related to callback.
     :type plugA: OpenMaya.MPlug
 
-    :param plugB: Second plug related to callback, may not be used if
-                  not relevant to callback type.
+    :param plugB: Second plug related to callback, may not be used
+                  if not relevant to callback type.
     :type plugB: OpenMaya.MPlug
 
-    :param clientData: node_uuid given to the function.
-    :type clientData: str
+    :param clientData: node_uuid and a weak reference to a
+                       CallbackManager, given to the callback.
+    :type clientData: (str, weakref.ref)
 
     :return: Nothing.
     :rtype: None
     """
-    node_uuid = clientData
-    if (callback_msg & OpenMaya.MNodeMessage.kConnectionMade
-            or callback_msg & OpenMaya.MNodeMessage.kConnectionBroken
-            or callback_msg & OpenMaya.MNodeMessage.kAttributeRemoved):
+    node_uuid = _get_watched_node_uuid(clientData, TYPE_MARKER)
+    if node_uuid is None:
+        return
+    if callback_msg & OpenMaya.MNodeMessage.kAttributeSet:
+        # Marker values (such as weight or enable) have changed.
+        lib_snapshot.invalidate_snapshots()
+    return
+
+
+def _get_watched_node_uuid(clientData, callback_type):
+    """
+    Get the node UUID from per-node callback client data, or None if
+    the node is not watched (any more).
+    """
+    node_uuid, manager_ref = clientData
+    callback_manager = manager_ref()
+    if callback_manager is None:
+        return None
+    watched = callback_manager.is_watched_node(
+        node_uuid, callback_type=callback_type)
+    if watched is False:
+        return None
+    return node_uuid
+
+
+def _get_node_uuid(node_mobj):
+    node_fn = OpenMaya.MFnDependencyNode(node_mobj)
+    return node_fn.uuid().asString()
+
+
+def global_node_name_changed_func(node, prevName, clientData):
+    """
+    Callback triggered when any node is renamed.
+
+    :param node: The node that has been renamed.
+    :type node: OpenMaya.MObject
+
+    :param prevName: The previous node name.
+    :type prevName: str
+
+    :param clientData: Weak reference to a CallbackManager.
+    :type clientData: weakref.ref
+
+    :return: Nothing.
+    :rtype: None
+    """
+    callback_manager = clientData()
+    if callback_manager is None:
+        return
+    node_uuid = _get_node_uuid(node)
+    if callback_manager.is_watched_node(node_uuid) is False:
+        return
+    node_name_changed_func(node, prevName, node_uuid)
+    return
+
+
+def global_node_removed_func(node, clientData):
+    """
+    Callback triggered when any node is deleted.
+
+    :param node: The node being deleted.
+    :type node: OpenMaya.MObject
+
+    :param clientData: Weak reference to a CallbackManager.
+    :type clientData: weakref.ref
+
+    :return: Nothing.
+    :rtype: None
+    """
+    callback_manager = clientData()
+    if callback_manager is None:
+        return
+    node_uuid = _get_node_uuid(node)
+    if callback_manager.is_watched_node(node_uuid) is False:
+        return
+    node_deleted_func(node_uuid)
+    return
+
+
+def global_connection_changed_func(srcPlug, dstPlug, made, clientData):
+    """
+    Callback triggered when any connection is made or broken.
+
+    Only nodes related to Markers are considered (if a marker/bundle
+    relationship is changed).
+
+    :param srcPlug: The source plug of the connection.
+    :type srcPlug: OpenMaya.MPlug
+
+    :param dstPlug: The destination plug of the connection.
+    :type dstPlug: OpenMaya.MPlug
+
+    :param made: True if the connection is made, False if broken.
+    :type made: bool
+
+    :param clientData: Weak reference to a CallbackManager.
+    :type clientData: weakref.ref
+
+    :return: Nothing.
+    :rtype: None
+    """
+    callback_manager = clientData()
+    if callback_manager is None:
+        return
+    node_uuids = set()
+    for plug in [srcPlug, dstPlug]:
+        node_uuid = _get_node_uuid(plug.node())
+        watched = callback_manager.is_watched_node(
+            node_uuid, callback_type=TYPE_MARKER)
+        if watched is True:
+            node_uuids.add(node_uuid)
+    if len(node_uuids) == 0:
+        return
+    lib_snapshot.invalidate_snapshots()
+    for node_uuid in sorted(node_uuids):
         event_utils.trigger_event(
             mmapi.EVENT_NAME_ATTRIBUTE_CONNECTION_CHANGED,
             node=node_uuid,
-            plug=plugA)
+        )
     return
 
 
@@ -486,6 +642,7 @@ def node_name_changed_func(node, prevName, clientData):
     """
     node_uuid = clientData
     LOG.debug('node_name_changed: %r', node_uuid)
+    lib_snapshot.invalidate_snapshots()
     event_utils.trigger_event(
         mmapi.EVENT_NAME_NODE_NAME_CHANGED,
         node=node_uuid,
@@ -505,6 +662,7 @@ def node_deleted_func(clientData):
     """
     node_uuid = clientData
     LOG.debug('node_deleted: %r', node_uuid)
+    lib_snapshot.invalidate_snapshots()
     event_utils.trigger_event(
         mmapi.EVENT_NAME_NODE_DELETED,
         node=node_uuid)
@@ -514,6 +672,7 @@ def node_deleted_func(clientData):
 def membership_change_func(node_obj, clientData):
     node_uuid = clientData
     LOG.debug('membership_changed: %r', node_uuid)
+    lib_snapshot.invalidate_snapshots()
     event_utils.trigger_event(
         mmapi.EVENT_NAME_MEMBERSHIP_CHANGED,
         node=node_uuid)
@@ -532,6 +691,7 @@ def new_scene_func(clientData):
     :return: Nothing.
     :rtype: None
     """
+    lib_snapshot.clear_snapshots()
     try:
         valid = uiutils.isValidQtObject(clientData)
         if clientData is not None and valid is True:
@@ -559,3 +719,28 @@ def selection_changed_func(clientData):
     if clientData is not None and valid is True:
         clientData.setNodeSelection(sel_uuids)
     return
+
+
+def time_changed_func(time, clientData):
+    """
+    The Maya current time has changed, the values displayed in the
+    Solver UI must be updated.
+
+    :param time: The new current time.
+    :type time: maya.OpenMaya.MTime
+
+    :param clientData: The Qt window object class.
+    :type clientData: SolverWindow
+
+    :return: Nothing.
+    :rtype: None
+    """
+    if mmapi.is_solver_running() is True:
+        return
+    # Only the deviation on the current frame depends on the time.
+    lib_snapshot.invalidate_snapshots(
+        value_names=[lib_snapshot.OBJECT_VALUE_DEVIATION])
+    valid = uiutils.isValidQtObject(clientData)
+    if clientData is not None and valid is True:
+        clientData.triggerSnapshotUpdate()
+    return
@@ -30,6 +30,7 @@ import mmSolver.logger
 import mmSolver.api as mmapi
 import mmSolver.ui.uimodels as uimodels
 import mmSolver.ui.nodes as nodes
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 import mmSolver.tools.solver.constant as const
 
 
@@ -145,14 +146,24 @@ class AttrNode(PlugNode):
             neverHasChildren=True)
         self.typeInfo = 'attr'
 
-    def status(self):
-        value = const.ATTR_DEFAULT_STATUS_UI_VALUE
+    def attrValue(self, name):
+        """
+        Get a value of the attribute, from the snapshot (if the node
+        has one), otherwise the value is queried from Maya.
+        """
         d = self.data()
         col = d.get('collection')
         attr = d.get('data')
         if attr is None or col is None:
-            return value
-        used = col.get_attribute_used_hint(attr)
+            return None
+        snapshot = d.get('snapshot')
+        if snapshot is not None:
+            return snapshot.get_value(attr.get_name(), name)
+        return lib_snapshot.get_attribute_value(col, attr, name)
+
+    def status(self):
+        value = const.ATTR_DEFAULT_STATUS_UI_VALUE
+        used = self.attrValue(lib_snapshot.ATTR_VALUE_USED_HINT)
         if used == mmapi.ATTRIBUTE_USED_HINT_USED_VALUE:
             value = u'\u2714'  # "Heavy Check Mark"
         elif used == mmapi.ATTRIBUTE_USED_HINT_NOT_USED_VALUE:
@@ -160,15 +171,13 @@ class AttrNode(PlugNode):
         return value
 
     def state(self):
-        d = self.data().get('data')
         state = const.ATTR_STATE_INVALID
-        if d is None:
-            pass
-        elif d.is_static() is True:
+        value = self.attrValue(lib_snapshot.ATTR_VALUE_STATE)
+        if value == mmapi.ATTR_STATE_STATIC:
             state = const.ATTR_STATE_STATIC
-        elif d.is_animated() is True:
+        elif value == mmapi.ATTR_STATE_ANIMATED:
             state = const.ATTR_STATE_ANIMATED
-        elif d.is_locked() is True:
+        elif value == mmapi.ATTR_STATE_LOCKED:
             state = const.ATTR_STATE_LOCKED
         return state
 
@@ -182,10 +191,10 @@ class AttrNode(PlugNode):
             value = const.ATTR_DEFAULT_MIN_MAX_UI_VALUE
             value = value.format(min=min_value, max=max_value)
             return value
-        min_enable = col.get_attribute_min_enable(attr)
-        max_enable = col.get_attribute_max_enable(attr)
-        min_value = col.get_attribute_min_value(attr)
-        max_value = col.get_attribute_max_value(attr)
+        min_enable = self.attrValue(lib_snapshot.ATTR_VALUE_MIN_ENABLE)
+        max_enable = self.attrValue(lib_snapshot.ATTR_VALUE_MAX_ENABLE)
+        min_value = self.attrValue(lib_snapshot.ATTR_VALUE_MIN_VALUE)
+        max_value = self.attrValue(lib_snapshot.ATTR_VALUE_MAX_VALUE)
         if min_enable is False:
             min_value = const.ATTR_DEFAULT_MIN_UI_VALUE
         if max_enable is False:
@@ -200,8 +209,9 @@ class AttrNode(PlugNode):
         attr = d.get('data')
         if attr is None or col is None:
             return const.ATTR_DEFAULT_STIFFNESS_UI_VALUE
-        stiff_enable = col.get_attribute_stiffness_enable(attr)
-        stiff_value = col.get_attribute_stiffness_variance(attr)
+        stiff_enable = self.attrValue(lib_snapshot.ATTR_VALUE_STIFFNESS_ENABLE)
+        stiff_value = self.attrValue(
+            lib_snapshot.ATTR_VALUE_STIFFNESS_VARIANCE)
         if stiff_enable is False or stiff_value is None:
             stiff_value = const.ATTR_DEFAULT_STIFFNESS_UI_VALUE
         if isinstance(stiff_value, float):
@@ -214,8 +224,10 @@ class AttrNode(PlugNode):
         attr = d.get('data')
         if attr is None or col is None:
             return const.ATTR_DEFAULT_SMOOTHNESS_UI_VALUE
-        smooth_enable = col.get_attribute_smoothness_enable(attr)
-        smooth_value = col.get_attribute_smoothness_variance(attr)
+        smooth_enable = self.attrValue(
+            lib_snapshot.ATTR_VALUE_SMOOTHNESS_ENABLE)
+        smooth_value = self.attrValue(
+            lib_snapshot.ATTR_VALUE_SMOOTHNESS_VARIANCE)
         if smooth_enable is False or smooth_value is None:
             smooth_value = const.ATTR_DEFAULT_SMOOTHNESS_UI_VALUE
         if isinstance(smooth_value, float):
@@ -247,6 +259,13 @@ class MayaNode(PlugNode):
             neverHasChildren=False)
         self.typeInfo = 'node'
 
+    def key(self):
+        # Different Maya nodes may have the same short name.
+        attr_list = self.data().get('data')
+        if not attr_list:
+            return super(MayaNode, self).key()
+        return (self.typeInfo, attr_list[0].get_node(full_path=True))
+
     def mayaNodeName(self):
         return 'node'
 
@@ -23,6 +23,7 @@ import mmSolver.logger
 
 import mmSolver.api as mmapi
 import mmSolver.tools.solver.lib.solver_step as solver_step
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 import mmSolver.tools.solver.ui.attr_nodes as attr_nodes
 import mmSolver.tools.solver.ui.object_nodes as object_nodes
 import mmSolver.tools.solver.ui.solver_nodes as solver_nodes
@@ -31,7 +32,7 @@ import mmSolver.tools.solver.ui.solver_nodes as solver_nodes
 LOG = mmSolver.logger.get_logger()
 
 
-def markersToUINodes(mkr_list, show_cam, show_mkr, show_bnd):
+def markersToUINodes(mkr_list, show_cam, show_mkr, show_bnd, snapshot=None):
     """
     Convert a list of markers into a hierarchy to show the user.
 
@@ -47,6 +48,10 @@ def markersToUINodes(mkr_list, show_cam, show_mkr, show_bnd):
     :param show_bnd: Should we show bundles?
     :type show_bnd: bool
 
+    :param snapshot: The snapshot of Marker values to display, or None
+                     to query values from Maya directly.
+    :type snapshot: ObjectSnapshot or None
+
     :return: A list of UI MarkerNode objects.
     :rtype: [MarkerNode, ..]
     """
@@ -90,6 +95,7 @@ def markersToUINodes(mkr_list, show_cam, show_mkr, show_bnd):
                 'uuid': mkr_uuid,
                 'marker': mkr,
                 'camera': cam,
+                'snapshot': snapshot,
             }
             mkr_node = object_nodes.MarkerNode(mkr_name, data=data, parent=cam_node)
 
@@ -112,7 +118,8 @@ def markersToUINodes(mkr_list, show_cam, show_mkr, show_bnd):
     return root
 
 
-def attributesToUINodes(col, attr_list, show_anm, show_stc, show_lck):
+def attributesToUINodes(col, attr_list, show_anm, show_stc, show_lck,
+                        snapshot=None):
     """
     Convert a list of mmSolver API Attributes into classes to be used
     in the Solver UI.
@@ -132,13 +139,21 @@ def attributesToUINodes(col, attr_list, show_anm, show_stc, show_lck):
     :param show_lck: Should the locked attributes be visible?
     :type show_lck: bool
 
+    :param snapshot: The snapshot of Attribute values to display, or
+                     None to query values from Maya directly.
+    :type snapshot: AttrSnapshot or None
+
     :returns: A hierarchy of UI nodes to be viewed in a 'tree view'.
     :rtype: PlugNode
     """
     root = attr_nodes.PlugNode('root')
     maya_nodes = dict()
     for attr in attr_list:
-        attr_state = attr.get_state()
+        if snapshot is not None:
+            attr_state = snapshot.get_value(
+                attr.get_name(), lib_snapshot.ATTR_VALUE_STATE)
+        else:
+            attr_state = attr.get_state()
         is_animated = attr_state == mmapi.ATTR_STATE_ANIMATED
         is_static = attr_state == mmapi.ATTR_STATE_STATIC
         is_locked = attr_state == mmapi.ATTR_STATE_LOCKED
@@ -150,7 +165,7 @@ def attributesToUINodes(col, attr_list, show_anm, show_stc, show_lck):
             continue
         full_name = attr.get_node(full_path=True)
         maya_node = maya_nodes.get(full_name)
-        data = {'data': attr, 'collection': col}
+        data = {'data': attr, 'collection': col, 'snapshot': snapshot}
         if maya_node is None:
             node_data = dict()
             # Add only the first attribute to the MayaNode
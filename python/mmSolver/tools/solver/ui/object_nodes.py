@@ -29,6 +29,7 @@ import mmSolver.logger
 import mmSolver.api as mmapi
 import mmSolver.ui.uimodels as uimodels
 import mmSolver.ui.nodes as uinodes
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 import mmSolver.tools.solver.constant as const
 
 
@@ -69,6 +70,13 @@ class ObjectNode(uinodes.Node):
             return uuid
         return d.get('uuid', '')
 
+    def key(self):
+        # Nodes are matched by UUID, so renamed nodes keep their row.
+        uuid = self.uuid()
+        if not uuid:
+            return super(ObjectNode, self).key()
+        return (self.typeInfo, uuid)
+
     def weight(self):
         return const.OBJECT_DEFAULT_WEIGHT_UI_VALUE
 
@@ -96,13 +104,25 @@ class MarkerNode(ObjectNode):
             editable=False)
         self.typeInfo = 'marker'
 
-    def status(self):
-        value = const.OBJECT_DEFAULT_STATUS_UI_VALUE
+    def markerValue(self, name):
+        """
+        Get a value of the marker, from the snapshot (if the node has
+        one), otherwise the value is queried from Maya.
+        """
         d = self.data()
+        if not d:
+            return None
+        snapshot = d.get('snapshot')
+        if snapshot is not None:
+            return snapshot.get_value(self.uuid(), name)
         mkr = d.get('marker')
         if mkr is None:
-            return color
-        used = mkr.get_used_hint()
+            return None
+        return lib_snapshot.get_marker_value(mkr, name)
+
+    def status(self):
+        value = const.OBJECT_DEFAULT_STATUS_UI_VALUE
+        used = self.markerValue(lib_snapshot.OBJECT_VALUE_USED_HINT)
         if used == mmapi.MARKER_USED_HINT_USED_VALUE:
             value = u'\u2714'  # "Heavy Check Mark"
         elif used == mmapi.MARKER_USED_HINT_NOT_USED_VALUE:
@@ -111,12 +131,10 @@ class MarkerNode(ObjectNode):
 
     def objectColor(self):
         color = None
-        d = self.data()
-        mkr = d.get('marker')
-        if mkr is None:
+        enable = self.markerValue(lib_snapshot.OBJECT_VALUE_ENABLE)
+        if enable is None:
             return color
-        enable = bool(mkr.get_enable())
-        if enable is False:
+        if bool(enable) is False:
             color = QtGui.QColor(QtCore.Qt.darkGray)
         return color
 
@@ -124,12 +142,9 @@ class MarkerNode(ObjectNode):
         """
         Get the current weight value of the marker.
         """
-        weight = const.OBJECT_DEFAULT_WEIGHT_UI_VALUE
-        d = self.data()
-        mkr = d.get('marker')
-        if mkr is None:
-            return weight
-        weight = mkr.get_weight()
+        weight = self.markerValue(lib_snapshot.OBJECT_VALUE_WEIGHT)
+        if weight is None:
+            return const.OBJECT_DEFAULT_WEIGHT_UI_VALUE
         return str(weight)
 
     def avgDeviation(self):
@@ -137,13 +152,8 @@ class MarkerNode(ObjectNode):
         Get the current deviation value of the marker.
         """
         dev = const.OBJECT_DEFAULT_DEVIATION_UI_VALUE
-        d = self.data()
-        if not d:
-            return dev
-        mkr = d.get('marker')
-        if mkr is None:
-            return dev
-        dev_value = mkr.get_average_deviation()
+        dev_value = self.markerValue(
+            lib_snapshot.OBJECT_VALUE_AVERAGE_DEVIATION)
         if dev_value is None:
             return dev
         if dev_value < 0:
@@ -155,34 +165,22 @@ class MarkerNode(ObjectNode):
         Get the current deviation value of the marker.
         """
         dev = const.OBJECT_DEFAULT_DEVIATION_UI_VALUE
-        d = self.data()
-        if not d:
-            return dev
-        mkr = d.get('marker')
-        if mkr is None:
-            return dev
-        enable = mkr.get_enable()
-        if not enable:
-            return dev
-        dev_values = mkr.get_deviation(times=None)
-        if dev_values is None:
+        dev_value = self.markerValue(lib_snapshot.OBJECT_VALUE_DEVIATION)
+        if dev_value is None:
             return dev
-        if dev_values[0] < 0:
+        if dev_value < 0:
             return dev
-        return '%.2f' % dev_values[0]
+        return '%.2f' % dev_value
 
     def maxDeviation(self):
         """
         Get the current deviation value of the marker.
         """
         dev = const.OBJECT_DEFAULT_DEVIATION_UI_VALUE
-        d = self.data()
-        if not d:
-            return dev
-        mkr = d.get('marker')
-        if mkr is None:
+        value = self.markerValue(lib_snapshot.OBJECT_VALUE_MAXIMUM_DEVIATION)
+        if value is None:
             return dev
-        dev_value, dev_frame = mkr.get_maximum_deviation()
+        dev_value, dev_frame = value
         if dev_value is None:
             return dev
         if dev_value < 0:
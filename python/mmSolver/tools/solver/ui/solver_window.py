@@ -102,6 +102,14 @@ class SolverWindow(BaseWindow):
             callback_ids,
         )
 
+        # Add Maya callback to track the current time.
+        callback_ids = maya_callbacks.add_time_changed_callback(self)
+        self.callback_manager.add_node_ids(
+            maya_callbacks.TYPE_TIME_CHANGED,
+            None,
+            callback_ids,
+        )
+
         # Add Maya callbacks for the UI
         callback_ids = maya_callbacks.add_callbacks_new_scene(self)
         self.callback_manager.add_node_ids(
@@ -243,6 +251,21 @@ class SolverWindow(BaseWindow):
         action.toggled.connect(type(self).forceDgUpdateActionToggledCB)
         edit_menu.addAction(action)
 
+        if Qt.IsPySide2 or Qt.IsPyQt5:
+            edit_menu.addSection('Root Frames')
+
+        # Auto Root Frames method.
+        label = 'Auto Root Frames Use Fewest Frames'
+        tooltip = ('Set Auto root frames with the fewest frames that '
+                   'cover all markers (greedy selection).')
+        fewest_value = lib_state.get_auto_root_frames_fewest_state()
+        action = QtWidgets.QAction(label, edit_menu)
+        action.setStatusTip(tooltip)
+        action.setCheckable(True)
+        action.setChecked(fewest_value)
+        action.toggled.connect(type(self).autoRootFramesFewestActionToggledCB)
+        edit_menu.addAction(action)
+
         menubar.addMenu(edit_menu)
 
         # View Menu
@@ -523,6 +546,15 @@ class SolverWindow(BaseWindow):
         self.subForm.attribute_browser.dataChanged.emit()
         return
 
+    def triggerSnapshotUpdate(self):
+        """
+        Repaint the Solver UI tables, so the (invalidated) snapshot
+        values are fetched again.
+        """
+        self.subForm.object_browser.treeView.viewport().update()
+        self.subForm.attribute_browser.treeView.viewport().update()
+        return
+
     def undoTriggeredCB(self):
         LOG.debug('undoTriggeredCB')
         import mmSolver.tools.undoredoscene.tool as undoredoscene_tool
@@ -563,6 +595,11 @@ class SolverWindow(BaseWindow):
         lib_state.set_force_dg_update_state(value)
         return
 
+    @staticmethod
+    def autoRootFramesFewestActionToggledCB(value):
+        lib_state.set_auto_root_frames_fewest_state(value)
+        return
+
     @staticmethod
     def preSolveForceEvalActionToggledCB(value):
         lib_state.set_pre_solve_force_eval_state(value)
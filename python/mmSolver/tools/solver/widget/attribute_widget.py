@@ -34,6 +34,7 @@ import mmSolver.ui.uiutils as uiutils
 import mmSolver.api as mmapi
 import mmSolver.tools.solver.maya_callbacks as maya_callbacks
 import mmSolver.tools.solver.lib.attr as lib_attr
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 import mmSolver.tools.solver.lib.collection as lib_col
 import mmSolver.tools.solver.lib.state as lib_state
 import mmSolver.tools.solver.lib.uiquery as lib_uiquery
@@ -108,6 +109,13 @@ class AttributeBrowserWidget(nodebrowser_widget.NodeBrowserWidget):
         self.createTreeView()
 
         self.callback_manager = maya_callbacks.CallbackManager()
+        callback_ids = maya_callbacks.add_global_callbacks(
+            self.callback_manager)
+        self.callback_manager.add_node_ids(
+            maya_callbacks.TYPE_GLOBAL,
+            None,
+            callback_ids,
+        )
         e = time.time()
         LOG.debug('AttributeBrowserWidget init: %r seconds', e - s)
         return
@@ -203,14 +211,20 @@ class AttributeBrowserWidget(nodebrowser_widget.NodeBrowserWidget):
             lib_attr.add_callbacks_to_attributes(
                 attr_list,
                 callback_manager,
+                replace=True,
             )
+        snapshot = None
+        if col is not None:
+            snapshot = lib_snapshot.get_attr_snapshot(col)
+            snapshot.set_attributes(col, attr_list)
         root = convert_to_ui.attributesToUINodes(
             col,
             attr_list,
             show_anm,
             show_stc,
-            show_lck)
-        model.setRootNode(root)
+            show_lck,
+            snapshot=snapshot)
+        model.updateRootNode(root)
 
         e = time.time()
         LOG.debug('populateModel: %r', e - s)
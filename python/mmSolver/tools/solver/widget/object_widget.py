@@ -37,6 +37,7 @@ import mmSolver.tools.solver.lib.collection as lib_col
 import mmSolver.tools.solver.lib.state as lib_state
 import mmSolver.tools.solver.lib.uiquery as lib_uiquery
 import mmSolver.tools.solver.lib.marker as lib_marker
+import mmSolver.tools.solver.lib.snapshot as lib_snapshot
 import mmSolver.tools.solver.lib.maya_utils as lib_maya_utils
 import mmSolver.tools.solver.ui.object_nodes as object_nodes
 import mmSolver.tools.solver.ui.convert_to_ui as convert_to_ui
@@ -84,6 +85,13 @@ class ObjectBrowserWidget(nodebrowser_widget.NodeBrowserWidget):
         self.createTreeView()
 
         self.callback_manager = maya_callbacks.CallbackManager()
+        callback_ids = maya_callbacks.add_global_callbacks(
+            self.callback_manager)
+        self.callback_manager.add_node_ids(
+            maya_callbacks.TYPE_GLOBAL,
+            None,
+            callback_ids,
+        )
         e = time.time()
         LOG.debug('ObjectWidget init: %r seconds', e - s)
         return
@@ -162,13 +170,23 @@ class ObjectBrowserWidget(nodebrowser_widget.NodeBrowserWidget):
         show_cam = const.OBJECT_TOGGLE_CAMERA_DEFAULT_VALUE
         show_mkr = const.OBJECT_TOGGLE_MARKER_DEFAULT_VALUE
         show_bnd = const.OBJECT_TOGGLE_BUNDLE_DEFAULT_VALUE
+        snapshot = None
         if col is not None:
             mkr_list = lib_marker.get_markers_from_collection(col)
             show_cam = lib_col.get_object_toggle_camera_from_collection(col)
             show_mkr = lib_col.get_object_toggle_marker_from_collection(col)
             show_bnd = lib_col.get_object_toggle_bundle_from_collection(col)
-        root = convert_to_ui.markersToUINodes(mkr_list, show_cam, show_mkr, show_bnd)
-        model.setRootNode(root)
+            snapshot = lib_snapshot.get_object_snapshot(col)
+            snapshot.set_markers(mkr_list)
+
+        # Watch the nodes of the Markers shown.
+        callback_manager = self.callback_manager
+        if callback_manager is not None:
+            lib_marker.set_watched_markers(mkr_list, callback_manager)
+        root = convert_to_ui.markersToUINodes(
+            mkr_list, show_cam, show_mkr, show_bnd,
+            snapshot=snapshot)
+        model.updateRootNode(root)
         return
 
     def updateInfo(self):
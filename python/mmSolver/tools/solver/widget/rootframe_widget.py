@@ -210,7 +210,10 @@ class RootFrameWidget(QtWidgets.QWidget, ui_rootframe_widget.Ui_Form):
         mkr_list = col.get_marker_list()
         start_frame, end_frame = utils_time.get_maya_timeline_range_inner()
         min_frames_per_marker = 2
-        frame_nums = mmapi.get_root_frames_from_markers(
+        get_root_frames_func = mmapi.get_root_frames_from_markers
+        if lib_state.get_auto_root_frames_fewest_state() is True:
+            get_root_frames_func = mmapi.get_root_frames_from_markers_greedy
+        frame_nums = get_root_frames_func(
             mkr_list, min_frames_per_marker, start_frame, end_frame)
         if len(frame_nums) < 2:
             LOG.warn('Auto Root Frames failed to calculate - not enough markers.')
@@ -20,10 +20,10 @@ Position Bundle under the Marker.
 """
 
 import maya.cmds
-import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
 import mmSolver.utils.lineintersect as tri_utils
+import mmSolver.utils.triangulate as triangulate_utils
 
 
 LOG = mmSolver.logger.get_logger()
@@ -50,78 +50,106 @@ def get_marker_frame_list(mkr_node):
     return frm_list
 
 
-def triangulate_bundle(bnd, relock=None):
+def _set_bundle_position(bnd_node, pnt, relock):
+    plugs = [
+        '%s.translateX' % bnd_node,
+        '%s.translateY' % bnd_node,
+        '%s.translateZ' % bnd_node
+    ]
+    lock_state = {}
+    for plug in plugs:
+        value = maya.cmds.getAttr(plug, lock=True)
+        lock_state[plug] = value
+        maya.cmds.setAttr(plug, lock=False)
+
+    maya.cmds.xform(
+        bnd_node,
+        translation=pnt,
+        worldSpace=True
+    )
+
+    if relock is True:
+        for plug in plugs:
+            value = lock_state.get(plug)
+            maya.cmds.setAttr(plug, lock=value)
+    return
+
+
+def triangulate_bundles(bnd_list, relock=None):
     """
-    Triangulate a 3D bundle position.
+    Triangulate many 3D bundle positions at once.
 
-    :param bnd: Bundle to be triangulated.
-    :type bnd: Bundle
+    Each bundle is triangulated using every frame that every connected
+    marker is enabled on; all the camera and marker positions are
+    evaluated together, then all bundles are solved at once.
+
+    :param bnd_list: Bundles to be triangulated.
+    :type bnd_list: [Bundle, ..]
 
     :param relock: If True any bundle translate attributes will be
                    unlocked, changed then relocked.
     :type relock: bool
+
+    :returns: The Bundle nodes that were triangulated.
+    :rtype: [str, ..]
     """
     if relock is None:
         relock = False
     assert isinstance(relock, bool) is True
 
-    prev_frame = maya.cmds.currentTime(query=True)
-    try:
+    bnd_node_list = []
+    mkr_cam_node_frm_list = []
+    bnd_ray_indices = []
+    for bnd in bnd_list:
+        indices = []
         mkr_list = bnd.get_marker_list()
         for mkr in mkr_list:
             mkr_node = mkr.get_node()
             frm_list = get_marker_frame_list(mkr_node)
             if len(frm_list) == 0:
                 continue
-
-            bnd_node = bnd.get_node()
             cam = mkr.get_camera()
+            if cam is None:
+                continue
             cam_tfm = cam.get_transform_node()
+            indices.append(len(mkr_cam_node_frm_list))
+            mkr_cam_node_frm_list.append((mkr_node, cam_tfm, frm_list))
+        bnd_node_list.append(bnd.get_node())
+        bnd_ray_indices.append(indices)
+
+    mkr_rays = tri_utils.get_camera_rays_to_points(mkr_cam_node_frm_list)
+
+    # Combine the rays of all markers on each bundle.
+    bnd_rays = []
+    for indices in bnd_ray_indices:
+        origins = []
+        directions = []
+        for index in indices:
+            origins += mkr_rays[index][0]
+            directions += mkr_rays[index][1]
+        bnd_rays.append((origins, directions))
+    points = triangulate_utils.triangulate_points(bnd_rays)
+
+    adjusted_bnd_node_list = []
+    for bnd_node, pnt in zip(bnd_node_list, points):
+        if pnt is None:
+            LOG.warning('Could not triangulate Bundle: %r', bnd_node)
+            continue
+        _set_bundle_position(bnd_node, pnt, relock)
+        adjusted_bnd_node_list.append(bnd_node)
+    return adjusted_bnd_node_list
+
 
-            first_frm = frm_list[0]
-            last_frm = frm_list[-1]
-            first_pnt, first_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                first_frm
-            )
-            last_pnt, last_dir = tri_utils.get_point_and_direction(
-                cam_tfm,
-                mkr_node,
-                last_frm
-            )
-
-            a_pnt, b_pnt = tri_utils.calculate_approx_intersection_point_between_two_3d_lines(
-                first_pnt, first_dir,
-                last_pnt, last_dir
-            )
-            pnt = OpenMaya.MPoint(
-                (a_pnt.x + b_pnt.x) * 0.5,
-                (a_pnt.y + b_pnt.y) * 0.5,
-                (a_pnt.z + b_pnt.z) * 0.5
-            )
-
-            plugs = [
-                '%s.translateX' % bnd_node,
-                '%s.translateY' % bnd_node,
-                '%s.translateZ' % bnd_node
-            ]
-            lock_state = {}
-            for plug in plugs:
-                value = maya.cmds.getAttr(plug, lock=True)
-                lock_state[plug] = value
-                maya.cmds.setAttr(plug, lock=False)
-
-            maya.cmds.xform(
-                bnd_node,
-                translation=(pnt.x, pnt.y, pnt.z),
-                worldSpace=True
-            )
-
-            if relock is True:
-                for plug in plugs:
-                    value = lock_state.get(plug)
-                    maya.cmds.setAttr(plug, lock=value)
-    finally:
-        maya.cmds.currentTime(prev_frame, update=False)
+def triangulate_bundle(bnd, relock=None):
+    """
+    Triangulate a 3D bundle position.
+
+    :param bnd: Bundle to be triangulated.
+    :type bnd: Bundle
+
+    :param relock: If True any bundle translate attributes will be
+                   unlocked, changed then relocked.
+    :type relock: bool
+    """
+    triangulate_bundles([bnd], relock=relock)
     return
@@ -61,10 +61,7 @@ def main():
     bnd_list = [mmapi.Bundle(node=node) for node in bnd_nodes]
 
     # Triangulate
-    adjusted_bnd_node_list = []
-    for bnd in bnd_list:
-        lib.triangulate_bundle(bnd)
-        adjusted_bnd_node_list.append(bnd.get_node())
+    adjusted_bnd_node_list = lib.triangulate_bundles(bnd_list)
 
     # Select all bundle nodes.
     if len(adjusted_bnd_node_list) > 0:
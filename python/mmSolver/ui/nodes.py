@@ -102,6 +102,35 @@ class Node(object):
     def setColor(self, color):
         self._color = color
 
+    def key(self):
+        """
+        A value identifying the node amongst its siblings.
+
+        Used to match nodes between two trees, when updating a tree
+        model incrementally.
+        """
+        return (self.typeInfo, self.name())
+
+    def copyFrom(self, other):
+        """
+        Copy the values of another node onto this node, leaving the
+        parent and children of this node unchanged.
+        """
+        self._name = other._name
+        self._toolTip = other._toolTip
+        self._statusTip = other._statusTip
+        self._color = other._color
+        self._data = other._data
+        self._enabled = other._enabled
+        self._checkable = other._checkable
+        self._editable = other._editable
+        self._selectable = other._selectable
+        self._neverHasChildren = other._neverHasChildren
+        if self._iconPath != other._iconPath:
+            self._iconPath = other._iconPath
+            self._icon = None
+        self.typeInfo = other.typeInfo
+
     def data(self):
         if self._data is None:
             return {}
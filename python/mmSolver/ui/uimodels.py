@@ -198,6 +198,131 @@ class ItemModel(QtCore.QAbstractItemModel, uiutils.QtInfoMixin):
         self.endResetModel()
         return
 
+    def updateRootNode(self, rootNode):
+        """
+        Update the model to match the nodes under 'rootNode', changing
+        only the rows that differ.
+
+        Unlike setRootNode, the model is not reset. Nodes are matched
+        to the existing nodes with Node.key(); new rows are inserted,
+        missing rows are removed, and matched nodes are updated
+        in-place, so the selection and expanded state of any views
+        are kept.
+
+        :param rootNode: The root of the new node hierarchy. The
+                         children of this node are moved into the
+                         model, the node itself is not used.
+        :type rootNode: Node
+        """
+        if self._rootNode is None or rootNode is None:
+            self.setRootNode(rootNode)
+            return
+        self._updateChildren(QtCore.QModelIndex(), self._rootNode, rootNode)
+        return
+
+    def _emitDataChanged(self, topLeft, bottomRight):
+        if Qt.__binding__ in ['PySide', 'PyQt4']:
+            self.dataChanged.emit(topLeft, bottomRight)
+        elif Qt.__binding__ in ['PySide2', 'PyQt5']:
+            self.dataChanged.emit(topLeft, bottomRight, [])
+        else:
+            msg = 'Qt binding not supported: %s' % Qt.__binding__
+            raise ValueError(msg)
+        return
+
+    def _insertChildNodes(self, parentIndex, parentNode, position, nodes):
+        if len(nodes) == 0:
+            return
+        self.beginInsertRows(parentIndex, position, position + len(nodes) - 1)
+        for i, node in enumerate(nodes):
+            parentNode.insertChild(position + i, node)
+        self.endInsertRows()
+        return
+
+    def _removeChildNodes(self, parentIndex, parentNode, position, count):
+        if count == 0:
+            return
+        self.beginRemoveRows(parentIndex, position, position + count - 1)
+        for i in range(count):
+            parentNode.removeChild(position)
+        self.endRemoveRows()
+        return
+
+    def _updateChildren(self, parentIndex, oldParent, newParent):
+        """
+        Change the children of 'oldParent' to match 'newParent'.
+        """
+        newChildren = newParent.children()
+        newKeys = [n.key() for n in newChildren]
+        oldKeys = [n.key() for n in oldParent.children()]
+        newKeySet = set(newKeys)
+        oldKeySet = set(oldKeys)
+        if len(newKeySet) != len(newKeys) or len(oldKeySet) != len(oldKeys):
+            # Nodes cannot be matched, replace all of the children.
+            self._removeChildNodes(
+                parentIndex, oldParent, 0, oldParent.childCount())
+            self._insertChildNodes(parentIndex, oldParent, 0, newChildren)
+            return
+
+        # Remove rows that no longer exist, as contiguous blocks,
+        # starting from the end so the row numbers stay valid.
+        row = len(oldKeys) - 1
+        while row >= 0:
+            if oldKeys[row] in newKeySet:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and oldKeys[row] not in newKeySet:
+                row -= 1
+            self._removeChildNodes(parentIndex, oldParent, row + 1, last - row)
+
+        # Walk the new children in order; rows before 'row' already
+        # match the new children.
+        firstChanged = None
+        lastChanged = None
+        row = 0
+        numNew = len(newChildren)
+        while row < numNew:
+            key = newKeys[row]
+            if key not in oldKeySet:
+                # Insert contiguous new nodes all at once.
+                end = row
+                while end < numNew and newKeys[end] not in oldKeySet:
+                    end += 1
+                self._insertChildNodes(
+                    parentIndex, oldParent, row, newChildren[row:end])
+                row = end
+                continue
+
+            oldNode = oldParent.child(row)
+            if oldNode.key() != key:
+                # The node has moved, it can only be further down.
+                position = row + 1
+                while oldParent.child(position).key() != key:
+                    position += 1
+                self.beginMoveRows(
+                    parentIndex, position, position, parentIndex, row)
+                node = oldParent._children.pop(position)
+                oldParent._children.insert(row, node)
+                self.endMoveRows()
+                oldNode = node
+
+            newNode = newChildren[row]
+            oldNode.copyFrom(newNode)
+            if firstChanged is None:
+                firstChanged = row
+            lastChanged = row
+            index = self.createIndex(row, 0, oldNode)
+            self._updateChildren(index, oldNode, newNode)
+            row += 1
+
+        if firstChanged is not None:
+            lastColumn = max(self.columnCount() - 1, 0)
+            topLeft = self.index(firstChanged, 0, parentIndex)
+            bottomRight = self.index(lastChanged, lastColumn, parentIndex)
+            self._emitDataChanged(topLeft, bottomRight)
+        return
+
     def getNode(self, index):
         node = None
         if index.isValid():
@@ -32,6 +32,7 @@ import maya.OpenMaya as OpenMaya1
 import maya.OpenMayaAnim as OpenMayaAnim1
 
 import mmSolver.utils.node as node_utils
+import mmSolver.utils.eulerfilter as eulerfilter_utils
 
 
 def create_anim_curve_node_apione(times, values,
@@ -124,6 +125,69 @@ def create_anim_curve_node(*args, **kwargs):
     return create_anim_curve_node_apione(*args, **kwargs)
 
 
+def set_anim_curve_keys(node_attr, times, values):
+    """
+    Set keyframes on an attribute at many times, with Maya commands.
+
+    Keyframes are created at all times with one 'setKeyframe' command,
+    then the keyframe values are set on the animCurve with one
+    'setAttr' command per run of consecutive keyframes. Unlike
+    setting keys with the Maya API, all changes are recorded on the
+    undo stack.
+
+    Existing keyframes at other times are kept.
+
+    :param node_attr: The 'plug' to set keyframes on.
+    :type node_attr: str
+
+    :param times: Time values for the keyframes, in the current UI
+                  time unit.
+    :type times: [int or float, ..]
+
+    :param values: Values for the keyframes, in the current UI units
+                   (for example, rotations are in degrees).
+    :type values: [float, ..]
+
+    :rtype: None
+    """
+    if len(times) != len(values):
+        raise ValueError('Number of times and values does not match.')
+    if len(times) == 0:
+        return
+    times = [float(t) for t in times]
+    maya.cmds.setKeyframe(node_attr, time=times, value=values[0])
+    anim_curves = maya.cmds.keyframe(node_attr, query=True, name=True) or []
+    if len(anim_curves) == 0:
+        msg = 'Could not find animCurve for keyframes; node_attr=%r'
+        raise RuntimeError(msg % node_attr)
+    anim_curve = anim_curves[0]
+
+    # Find the keyframe index of each time.
+    key_times = maya.cmds.keyframe(
+        anim_curve,
+        query=True,
+        timeChange=True) or []
+    index_map = dict([(round(t, 6), i) for i, t in enumerate(key_times)])
+    keys = sorted([(index_map[round(t, 6)], t, float(v))
+                   for t, v in zip(times, values)])
+
+    # Set the values of each run of consecutive keyframe indices.
+    start = 0
+    while start < len(keys):
+        end = start
+        while (end + 1 < len(keys)
+               and keys[end + 1][0] == keys[end][0] + 1):
+            end += 1
+        flat_values = []
+        for _, t, v in keys[start:end + 1]:
+            flat_values += [t, v]
+        attr = '{0}.keyTimeValue[{1}:{2}]'.format(
+            anim_curve, keys[start][0], keys[end][0])
+        maya.cmds.setAttr(attr, *flat_values)
+        start = end + 1
+    return
+
+
 def get_anim_curves_from_nodes(nodes_or_plugs, attrs=None):
     """
     Get all animCurve nodes connected to the given nodes.
@@ -143,37 +207,53 @@ def get_anim_curves_from_nodes(nodes_or_plugs, attrs=None):
     return anim_curve_nodes
 
 
+def evaluate_anim_curve_values(anim_curve, times):
+    """
+    Evaluate an animCurve node at many times, at once.
+
+    The animCurve is evaluated directly with the Maya API, rather than
+    querying the connected attribute at each time.
+
+    :param anim_curve: The animCurve node to evaluate.
+    :type anim_curve: str
+
+    :param times: The times to evaluate, in the current UI time unit.
+    :type times: [int or float, ..]
+
+    :returns: The value of the animCurve at each time.
+    :rtype: [float, ..]
+    """
+    obj = node_utils.get_as_object(anim_curve)
+    animfn = OpenMayaAnim1.MFnAnimCurve(obj)
+    unit = OpenMaya1.MTime.uiUnit()
+    values = [animfn.evaluate(OpenMaya1.MTime(float(t), unit))
+              for t in times]
+    return values
+
+
 def euler_filter_plug(node_name, attr_name):
     """
     Perform Euler filter for the given node attribute.
+
+    All keyframe values are queried at once, filtered together and
+    only the keyframes with changed values are edited.
     """
     plug_name = '{0}.{1}'.format(node_name, attr_name)
-    num_keys = maya.cmds.keyframe(
+    values = maya.cmds.keyframe(
         plug_name,
         query=True,
-        keyframeCount=True) or 0
-    if num_keys <= 0:
+        valueChange=True) or []
+    if len(values) == 0:
         return
 
     # Perform Euler filter for the entire animation curve.
-    prev_value = 0.0
-    for key_index in range(num_keys):
-        values = maya.cmds.keyframe(
-            node_name,
-            query=True,
-            attribute=attr_name,
-            index=(key_index,),
-            valueChange=True) or None
-        assert values is not None
-        # Modulo the keyframe value to ensure the starting value is
-        # not too high to begin with, causing Maximum Recursion
-        # exceptions if the value is too large.
-        value = values[0] % 360.0
-        new_value = euler_filter_value(prev_value, value)
+    new_values = eulerfilter_utils.euler_filter_values(values)
+    for key_index, (value, new_value) in enumerate(zip(values, new_values)):
+        if value == new_value:
+            continue
         maya.cmds.keyframe(
-            node_name,
-            query=True,
-            attribute=attr_name,
+            plug_name,
+            edit=True,
             index=(key_index,),
             valueChange=new_value)
     return
@@ -188,6 +268,9 @@ def euler_filter_value(prev_value, value):
 
     Each axis (X, Y and Z) must be filtered individuality.
 
+    To filter many values at once, use
+    :func:`mmSolver.utils.eulerfilter.euler_filter_values`.
+
     .. note::
         This function is called recursively when a rotation is
         more/less than 360 degrees.
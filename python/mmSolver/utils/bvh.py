@@ -0,0 +1,575 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Bounding Volume Hierarchy (BVH) for ray-triangle intersection.
+
+This module is software agnostic and should not rely on any thirdparty
+software, however if numpy is available, an numpy-accelerated
+code-path will be used.
+
+The BVH is built once for a set of triangles, then many rays can be
+intersected against it at once. With numpy, all rays are traversed
+through the hierarchy together, one level at a time; all (ray, node)
+bounding box tests, and all (ray, triangle) tests, on a level are
+computed in one vectorized operation.
+
+Example usage::
+
+  import mmSolver.utils.bvh as bvh_utils
+  points = [(-1.0, -1.0, 0.0), (1.0, -1.0, 0.0), (0.0, 1.0, 0.0)]
+  triangles = [(0, 1, 2)]
+  bvh = bvh_utils.BVH(points, triangles)
+  origins = [(0.0, 0.0, 10.0)]
+  directions = [(0.0, 0.0, -1.0)]
+  hits = bvh.intersect_rays(origins, directions)
+  # [(0.0, 0.0, 0.0)]
+
+"""
+
+import sys
+
+import mmSolver.utils.constant as const
+
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Optimal 'range' function for Python 2
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+# The maximum number of triangles stored in a leaf node.
+BVH_LEAF_SIZE = 8
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _dot(a, b):
+    return (a[0] * b[0]) + (a[1] * b[1]) + (a[2] * b[2])
+
+
+def _cross(a, b):
+    return (
+        (a[1] * b[2]) - (a[2] * b[1]),
+        (a[2] * b[0]) - (a[0] * b[2]),
+        (a[0] * b[1]) - (a[1] * b[0]),
+    )
+
+
+def intersect_ray_triangle(origin, direction, v0, v1, v2, tolerance=None):
+    """
+    Intersect a single ray with a single triangle.
+
+    Uses the Moller-Trumbore algorithm, with standard python
+    functions only.
+
+    :param origin: Origin point of the ray.
+    :type origin: (float, float, float)
+
+    :param direction: Direction of the ray.
+    :type direction: (float, float, float)
+
+    :param v0: First triangle vertex.
+    :type v0: (float, float, float)
+
+    :param v1: Second triangle vertex.
+    :type v1: (float, float, float)
+
+    :param v2: Third triangle vertex.
+    :type v2: (float, float, float)
+
+    :param tolerance: Tolerance for the triangle edges, given as a
+                      barycentric coordinate; default is
+                      RAYTRACE_EPSILON.
+    :type tolerance: float
+
+    :returns: The ray parameter 't' of the hit, in units of the
+              direction length, or None if there is no hit in front of
+              the origin.
+    :rtype: float or None
+    """
+    if tolerance is None:
+        tolerance = const.RAYTRACE_EPSILON
+    e1 = _sub(v1, v0)
+    e2 = _sub(v2, v0)
+    pvec = _cross(direction, e2)
+    det = _dot(e1, pvec)
+    if abs(det) < 1e-12:
+        return None
+    inv_det = 1.0 / det
+    tvec = _sub(origin, v0)
+    u = _dot(tvec, pvec) * inv_det
+    if u < -tolerance or u > 1.0 + tolerance:
+        return None
+    qvec = _cross(tvec, e1)
+    v = _dot(direction, qvec) * inv_det
+    if v < -tolerance or (u + v) > 1.0 + tolerance:
+        return None
+    t = _dot(e2, qvec) * inv_det
+    if t <= 0.0:
+        return None
+    return t
+
+
+class BVH(object):
+    """
+    A Bounding Volume Hierarchy over triangles.
+
+    The hierarchy is stored as flat lists (or numpy arrays), with each
+    node holding an axis-aligned bounding box, and either two child
+    node indices, or a range of (re-ordered) triangle indices.
+
+    >>> bvh = BVH(points, triangles)
+    >>> hits = bvh.intersect_rays(origins, directions, max_dist=100.0)
+
+    """
+
+    def __init__(self, points, triangles, leaf_size=None):
+        """
+        Build a BVH from triangles.
+
+        :param points: The vertex positions.
+        :type points: [(float, float, float), ..]
+
+        :param triangles: Three vertex indices per triangle.
+        :type triangles: [(int, int, int), ..]
+
+        :param leaf_size: The maximum number of triangles in a leaf
+                          node; default is BVH_LEAF_SIZE.
+        :type leaf_size: int
+        """
+        if leaf_size is None:
+            leaf_size = BVH_LEAF_SIZE
+        assert leaf_size > 0
+        self._leaf_size = leaf_size
+        self._tri_v0 = [tuple(points[t[0]]) for t in triangles]
+        self._tri_v1 = [tuple(points[t[1]]) for t in triangles]
+        self._tri_v2 = [tuple(points[t[2]]) for t in triangles]
+        self._build()
+
+    def get_triangle_count(self):
+        """
+        :returns: The number of triangles in the BVH.
+        :rtype: int
+        """
+        return len(self._tri_v0)
+
+    def get_node_count(self):
+        """
+        :returns: The number of nodes in the BVH.
+        :rtype: int
+        """
+        return len(self._node_min)
+
+    def _build_nodes_raw(self):
+        """
+        Build the hierarchy nodes.
+
+        Uses standard python functions only.
+        """
+        num_tris = len(self._tri_v0)
+        tri_min = []
+        tri_max = []
+        centroids = []
+        for v0, v1, v2 in zip(self._tri_v0, self._tri_v1, self._tri_v2):
+            tri_min.append(tuple(map(min, v0, v1, v2)))
+            tri_max.append(tuple(map(max, v0, v1, v2)))
+            centroids.append((
+                (v0[0] + v1[0] + v2[0]) / 3.0,
+                (v0[1] + v1[1] + v2[1]) / 3.0,
+                (v0[2] + v1[2] + v2[2]) / 3.0,
+            ))
+
+        def get_bounds(indices):
+            bmin = tuple(map(min, *[tri_min[i] for i in indices])) \
+                if len(indices) > 1 else tri_min[indices[0]]
+            bmax = tuple(map(max, *[tri_max[i] for i in indices])) \
+                if len(indices) > 1 else tri_max[indices[0]]
+            return bmin, bmax
+
+        def split(indices):
+            extents = []
+            for axis in range(3):
+                values = [centroids[i][axis] for i in indices]
+                extents.append(max(values) - min(values))
+            axis = extents.index(max(extents))
+            indices = sorted(indices, key=lambda i: centroids[i][axis])
+            mid = len(indices) // 2
+            return indices[:mid], indices[mid:]
+
+        return self._build_nodes(
+            list(range(num_tris)), get_bounds, split, list)
+
+    def _build_nodes_numpy(self):
+        """
+        Build the hierarchy nodes.
+
+        Uses the numpy module.
+        """
+        assert np is not None
+        v0 = np.array(self._tri_v0, dtype=np.float64).reshape(-1, 3)
+        v1 = np.array(self._tri_v1, dtype=np.float64).reshape(-1, 3)
+        v2 = np.array(self._tri_v2, dtype=np.float64).reshape(-1, 3)
+        tri_min = np.minimum(np.minimum(v0, v1), v2)
+        tri_max = np.maximum(np.maximum(v0, v1), v2)
+        centroids = (v0 + v1 + v2) / 3.0
+
+        def get_bounds(indices):
+            bmin = tuple(tri_min[indices].min(axis=0).tolist())
+            bmax = tuple(tri_max[indices].max(axis=0).tolist())
+            return bmin, bmax
+
+        def split(indices):
+            values = centroids[indices]
+            extents = values.max(axis=0) - values.min(axis=0)
+            axis = int(np.argmax(extents))
+            mid = len(indices) // 2
+            order = np.argpartition(values[:, axis], mid)
+            indices = indices[order]
+            return indices[:mid], indices[mid:]
+
+        def to_list(indices):
+            return indices.tolist()
+
+        num_tris = len(self._tri_v0)
+        return self._build_nodes(
+            np.arange(num_tris), get_bounds, split, to_list)
+
+    def _build_nodes(self, indices, get_bounds, split, to_list):
+        """
+        Build the hierarchy, splitting nodes at the median triangle
+        centroid along the axis with the largest centroid extent.
+        """
+        node_min = []
+        node_max = []
+        node_left = []
+        node_right = []
+        node_start = []
+        node_count = []
+        tri_order = []
+
+        def add_node():
+            node_min.append(None)
+            node_max.append(None)
+            node_left.append(-1)
+            node_right.append(-1)
+            node_start.append(0)
+            node_count.append(0)
+            return len(node_min) - 1
+
+        root = add_node()
+        stack = [(root, indices)]
+        while len(stack) > 0:
+            node, indices = stack.pop()
+            if len(indices) == 0:
+                node_min[node] = (0.0, 0.0, 0.0)
+                node_max[node] = (0.0, 0.0, 0.0)
+                continue
+            node_min[node], node_max[node] = get_bounds(indices)
+
+            if len(indices) <= self._leaf_size:
+                node_start[node] = len(tri_order)
+                node_count[node] = len(indices)
+                tri_order += to_list(indices)
+                continue
+
+            left_indices, right_indices = split(indices)
+            left = add_node()
+            right = add_node()
+            node_left[node] = left
+            node_right[node] = right
+            stack.append((left, left_indices))
+            stack.append((right, right_indices))
+
+        nodes = (node_min, node_max, node_left, node_right,
+                 node_start, node_count, tri_order)
+        return nodes
+
+    def _build(self):
+        """
+        Build the hierarchy.
+        """
+        if np is not None:
+            nodes = self._build_nodes_numpy()
+        else:
+            nodes = self._build_nodes_raw()
+        (node_min, node_max, node_left, node_right,
+         node_start, node_count, tri_order) = nodes
+        self._node_min = node_min
+        self._node_max = node_max
+        self._node_left = node_left
+        self._node_right = node_right
+        self._node_start = node_start
+        self._node_count = node_count
+        self._tri_order = tri_order
+
+        if np is not None:
+            self._np_node_min = np.array(node_min, dtype=np.float64)
+            self._np_node_max = np.array(node_max, dtype=np.float64)
+            self._np_node_left = np.array(node_left, dtype=np.int64)
+            self._np_node_right = np.array(node_right, dtype=np.int64)
+            self._np_node_count = np.array(node_count, dtype=np.int64)
+            v0 = np.array(self._tri_v0, dtype=np.float64).reshape(-1, 3)
+            v1 = np.array(self._tri_v1, dtype=np.float64).reshape(-1, 3)
+            v2 = np.array(self._tri_v2, dtype=np.float64).reshape(-1, 3)
+            self._np_tri_v0 = v0
+            self._np_tri_e1 = v1 - v0
+            self._np_tri_e2 = v2 - v0
+
+            # Triangle indices for each leaf node, padded with -1.
+            leaf_tris = np.full(
+                (len(node_min), self._leaf_size), -1, dtype=np.int64)
+            for node, (start, count) in enumerate(zip(node_start, node_count)):
+                leaf_tris[node, :count] = tri_order[start:start + count]
+            self._np_leaf_tris = leaf_tris
+        return
+
+    def _intersect_rays_raw(self, origins, directions, max_dist, tolerance):
+        """
+        Intersect rays, one ray at a time.
+
+        Uses standard python functions only.
+        """
+        hits = []
+        inf = float('inf')
+        for origin, direction in zip(origins, directions):
+            inv_dir = [(1.0 / d) if d != 0.0 else inf for d in direction]
+            best_t = max_dist
+            best_hit = False
+            stack = [0]
+            while len(stack) > 0:
+                node = stack.pop()
+                # Ray vs bounding box 'slab' test.
+                t_near = -inf
+                t_far = inf
+                bmin = self._node_min[node]
+                bmax = self._node_max[node]
+                for axis in range(3):
+                    if inv_dir[axis] == inf:
+                        if origin[axis] < bmin[axis] or origin[axis] > bmax[axis]:
+                            t_near = inf
+                        continue
+                    t0 = (bmin[axis] - origin[axis]) * inv_dir[axis]
+                    t1 = (bmax[axis] - origin[axis]) * inv_dir[axis]
+                    if t0 > t1:
+                        t0, t1 = t1, t0
+                    t_near = max(t_near, t0)
+                    t_far = min(t_far, t1)
+                if t_near > t_far or t_far < 0.0 or t_near > best_t:
+                    continue
+
+                count = self._node_count[node]
+                if count == 0:
+                    if self._node_left[node] >= 0:
+                        stack.append(self._node_left[node])
+                        stack.append(self._node_right[node])
+                    continue
+
+                start = self._node_start[node]
+                for tri_index in self._tri_order[start:start + count]:
+                    t = intersect_ray_triangle(
+                        origin, direction,
+                        self._tri_v0[tri_index],
+                        self._tri_v1[tri_index],
+                        self._tri_v2[tri_index],
+                        tolerance=tolerance)
+                    if t is not None and t <= best_t:
+                        best_t = t
+                        best_hit = True
+            hits.append(best_t if best_hit is True else None)
+        return hits
+
+    def _intersect_rays_numpy(self, origins, directions, max_dist, tolerance):
+        """
+        Intersect all rays at once.
+
+        The hierarchy is traversed one level at a time, as a 'wavefront'
+        of (ray, node) pairs; every pair on a level is tested in one
+        vectorized operation.
+
+        Uses the numpy module.
+        """
+        assert np is not None
+        origins = np.array(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.array(directions, dtype=np.float64).reshape(-1, 3)
+        num_rays = origins.shape[0]
+        if num_rays == 0:
+            return []
+        best_t = np.full(num_rays, max_dist, dtype=np.float64)
+        best_hit = np.zeros(num_rays, dtype=bool)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            inv_dir = 1.0 / directions
+
+            pair_rays = np.arange(num_rays)
+            pair_nodes = np.zeros(num_rays, dtype=np.int64)
+            while pair_rays.size > 0:
+                # Ray vs bounding box 'slab' test, for all pairs. NaN
+                # values (from a zero direction and an origin on the
+                # slab) are ignored by fmin/fmax.
+                o = origins[pair_rays]
+                inv = inv_dir[pair_rays]
+                t0 = (self._np_node_min[pair_nodes] - o) * inv
+                t1 = (self._np_node_max[pair_nodes] - o) * inv
+                t_near = np.fmax.reduce(np.fmin(t0, t1), axis=1)
+                t_far = np.fmin.reduce(np.fmax(t0, t1), axis=1)
+                inside = ((t_near <= t_far)
+                          & (t_far >= 0.0)
+                          & (t_near <= best_t[pair_rays]))
+                pair_rays = pair_rays[inside]
+                pair_nodes = pair_nodes[inside]
+
+                is_leaf = self._np_node_count[pair_nodes] > 0
+                leaf_rays = pair_rays[is_leaf]
+                leaf_nodes = pair_nodes[is_leaf]
+                if leaf_rays.size > 0:
+                    self._intersect_leaves_numpy(
+                        origins, directions, leaf_rays, leaf_nodes,
+                        tolerance, best_t, best_hit)
+
+                # Step down to the children of the inner nodes.
+                inner_rays = pair_rays[~is_leaf]
+                inner_nodes = pair_nodes[~is_leaf]
+                left = self._np_node_left[inner_nodes]
+                right = self._np_node_right[inner_nodes]
+                has_children = left >= 0
+                inner_rays = inner_rays[has_children]
+                pair_rays = np.concatenate([inner_rays, inner_rays])
+                pair_nodes = np.concatenate([
+                    left[has_children], right[has_children]])
+
+        hits = [float(t) if hit else None
+                for t, hit in zip(best_t.tolist(), best_hit.tolist())]
+        return hits
+
+    def _intersect_leaves_numpy(self, origins, directions,
+                                leaf_rays, leaf_nodes,
+                                tolerance, best_t, best_hit):
+        """
+        Intersect (ray, leaf node) pairs with all triangles in the
+        leaf, updating 'best_t' and 'best_hit' in-place.
+
+        Uses the numpy module, with the Moller-Trumbore algorithm.
+        """
+        assert np is not None
+        # Expand into (ray, triangle) pairs.
+        tris = self._np_leaf_tris[leaf_nodes]
+        rays = np.repeat(leaf_rays, tris.shape[1])
+        tris = tris.ravel()
+        valid_tris = tris >= 0
+        rays = rays[valid_tris]
+        tris = tris[valid_tris]
+
+        v0 = self._np_tri_v0[tris]
+        e1 = self._np_tri_e1[tris]
+        e2 = self._np_tri_e2[tris]
+        o = origins[rays]
+        d = directions[rays]
+
+        pvec = np.cross(d, e2)
+        det = np.einsum('ij,ij->i', e1, pvec)
+        inv_det = 1.0 / det
+        tvec = o - v0
+        u = np.einsum('ij,ij->i', tvec, pvec) * inv_det
+        qvec = np.cross(tvec, e1)
+        v = np.einsum('ij,ij->i', d, qvec) * inv_det
+        t = np.einsum('ij,ij->i', e2, qvec) * inv_det
+        valid = ((np.abs(det) >= 1e-12)
+                 & (u >= -tolerance)
+                 & (u <= 1.0 + tolerance)
+                 & (v >= -tolerance)
+                 & ((u + v) <= 1.0 + tolerance)
+                 & (t > 0.0))
+        valid &= t <= best_t[rays]
+        rays = rays[valid]
+        np.minimum.at(best_t, rays, t[valid])
+        best_hit[rays] = True
+        return
+
+    def intersect_rays_param(self, origins, directions,
+                             max_dist=None,
+                             tolerance=None):
+        """
+        Intersect many rays with the triangles.
+
+        :param origins: Origin point of each ray.
+        :type origins: [(float, float, float), ..]
+
+        :param directions: Direction of each ray.
+        :type directions: [(float, float, float), ..]
+
+        :param max_dist: The maximum ray parameter to consider a hit
+                         for; default is RAYTRACE_MAX_DIST.
+        :type max_dist: float
+
+        :param tolerance: Tolerance for the triangle edges; default is
+                          RAYTRACE_EPSILON.
+        :type tolerance: float
+
+        :returns: The closest ray parameter 't' for each ray (the hit
+                  point is 'origin + (direction * t)'), or None if the
+                  ray did not hit.
+        :rtype: [float or None, ..]
+        """
+        assert len(origins) == len(directions)
+        if max_dist is None:
+            max_dist = const.RAYTRACE_MAX_DIST
+        if tolerance is None:
+            tolerance = const.RAYTRACE_EPSILON
+        if len(self._tri_v0) == 0:
+            return [None] * len(origins)
+        if np is not None:
+            return self._intersect_rays_numpy(
+                origins, directions, max_dist, tolerance)
+        return self._intersect_rays_raw(
+            origins, directions, max_dist, tolerance)
+
+    def intersect_rays(self, origins, directions,
+                       max_dist=None,
+                       tolerance=None):
+        """
+        Intersect many rays with the triangles.
+
+        Same as :meth:`intersect_rays_param`, except the hit points
+        are returned.
+
+        :returns: The closest hit point for each ray, or None if the
+                  ray did not hit.
+        :rtype: [(float, float, float) or None, ..]
+        """
+        params = self.intersect_rays_param(
+            origins, directions,
+            max_dist=max_dist,
+            tolerance=tolerance)
+        hits = []
+        for origin, direction, t in zip(origins, directions, params):
+            if t is None:
+                hits.append(None)
+                continue
+            hits.append((
+                origin[0] + (direction[0] * t),
+                origin[1] + (direction[1] * t),
+                origin[2] + (direction[2] * t),
+            ))
+        return hits
@@ -33,16 +33,56 @@ The levels are (in ascending order):
 - Maya Scene
 - Maya Session
 - Maya Preferences
+
+Node options are cached in memory, per node and attribute. Reads of a
+cached option do not query Maya or decode JSON. Writes update the
+cache and are written to the Maya node once, when Maya is idle (or
+when flush_node_options is called). The cache is invalidated when the
+attribute is changed outside of this module, on undo/redo and when
+the Maya scene changes.
+
+Because writes are deferred, they are not recorded in the undo chunk
+of the caller, and any error writing a value is logged (with the node
+and attribute) when Maya is idle, rather than raised to the caller.
+An undo or redo before the write discards the pending value, so the
+node keeps the value restored by the undo. Callers that need the
+write recorded in their undo chunk, or need errors raised, must call
+flush_node_options before the chunk is closed.
 """
 
 import json
 
 import maya.cmds
+import maya.utils
+import maya.OpenMaya as OpenMaya
 import mmSolver.logger
 import mmSolver.utils.constant as const
 
 LOG = mmSolver.logger.get_logger()
 
+# The cache of node options, keyed by (node UUID, attribute name).
+#
+# Each entry is a dict with the keys:
+#
+# - 'node' - The node name last used to access the option.
+# - 'value' - The raw attribute value, or None if not yet encoded.
+# - 'structure' - The decoded data structure, if 'has_structure'.
+# - 'has_structure' - Is 'structure' valid?
+# - 'dirty' - Must the value be written to the node?
+__NODE_OPTION_CACHE = dict()
+
+# State of the node option cache.
+__NODE_OPTION_STATE = {
+    # Callback ids for global (scene and undo) Maya callbacks.
+    'callback_ids': [],
+    # Callback ids for each node UUID with cached options.
+    'node_callback_ids': dict(),
+    # Has a flush been requested when Maya is idle?
+    'flush_pending': False,
+    # Are dirty options being written to nodes now?
+    'flushing': False,
+}
+
 
 def __add_node_option_attr(node_name, attr_name, value):
     """
@@ -82,6 +122,248 @@ def __add_node_option_attr(node_name, attr_name, value):
     return
 
 
+def _copy_structure(data):
+    """
+    Copy a Plain-Old-Data structure, so the cached structure cannot
+    be changed by the caller.
+    """
+    if isinstance(data, dict):
+        return dict([(k, _copy_structure(v)) for k, v in data.items()])
+    elif isinstance(data, list):
+        return [_copy_structure(v) for v in data]
+    return data
+
+
+def _get_node_uuid(node_name):
+    """
+    Get the UUID of a node, or None if the node does not exist.
+    """
+    sel_list = OpenMaya.MSelectionList()
+    try:
+        sel_list.add(node_name)
+    except RuntimeError:
+        return None
+    if sel_list.length() != 1:
+        return None
+    obj = OpenMaya.MObject()
+    sel_list.getDependNode(0, obj)
+    node_fn = OpenMaya.MFnDependencyNode(obj)
+    return node_fn.uuid().asString()
+
+
+def _attribute_changed_func(msg, plug, other_plug, client_data):
+    """
+    Invalidate the cached option of an attribute changed outside of
+    this module.
+    """
+    if __NODE_OPTION_STATE['flushing'] is True:
+        return
+    node_uuid = client_data
+    attr_name = plug.partialName(False, False, False, False, False, True)
+    __NODE_OPTION_CACHE.pop((node_uuid, attr_name), None)
+    return
+
+
+def _node_removed_func(node, client_data):
+    """
+    Forget all the cached options of a node being deleted.
+    """
+    node_uuid = client_data
+    for key in list(__NODE_OPTION_CACHE.keys()):
+        if key[0] == node_uuid:
+            __NODE_OPTION_CACHE.pop(key, None)
+    callback_ids = __NODE_OPTION_STATE['node_callback_ids'].pop(node_uuid, [])
+    # Callbacks cannot be removed while they are running.
+    maya.utils.executeDeferred(
+        lambda: _remove_callback_ids(callback_ids))
+    return
+
+
+def _undo_func(client_data):
+    """
+    Forget all cached options, because undo/redo may have changed
+    them.
+
+    Options not yet written to the nodes are discarded, otherwise the
+    pending value would overwrite the value restored by undo/redo.
+    """
+    for (_, attr_name), entry in __NODE_OPTION_CACHE.items():
+        if entry['dirty'] is True:
+            msg = 'Discarding unwritten node option: node=%r attr=%r'
+            LOG.debug(msg, entry['node'], attr_name)
+    __NODE_OPTION_CACHE.clear()
+    return
+
+
+def _scene_before_save_func(client_data):
+    flush_node_options()
+    return
+
+
+def _scene_changed_func(client_data):
+    flush_node_options()
+    clear_node_option_cache()
+    return
+
+
+def _remove_callback_ids(callback_ids):
+    for callback_id in callback_ids:
+        try:
+            OpenMaya.MMessage.removeCallback(callback_id)
+        except RuntimeError:
+            pass
+    return
+
+
+def _add_callbacks(node_name, node_uuid):
+    """
+    Add the Maya callbacks needed to invalidate the cached options of
+    a node.
+    """
+    if len(__NODE_OPTION_STATE['callback_ids']) == 0:
+        callback_ids = [
+            OpenMaya.MEventMessage.addEventCallback('Undo', _undo_func),
+            OpenMaya.MEventMessage.addEventCallback('Redo', _undo_func),
+            OpenMaya.MSceneMessage.addCallback(
+                OpenMaya.MSceneMessage.kBeforeSave,
+                _scene_before_save_func),
+            OpenMaya.MSceneMessage.addCallback(
+                OpenMaya.MSceneMessage.kBeforeNew,
+                _scene_changed_func),
+            OpenMaya.MSceneMessage.addCallback(
+                OpenMaya.MSceneMessage.kBeforeOpen,
+                _scene_changed_func),
+        ]
+        __NODE_OPTION_STATE['callback_ids'] = callback_ids
+
+    node_callback_ids = __NODE_OPTION_STATE['node_callback_ids']
+    if node_uuid in node_callback_ids:
+        return
+    sel_list = OpenMaya.MSelectionList()
+    sel_list.add(node_name)
+    obj = OpenMaya.MObject()
+    sel_list.getDependNode(0, obj)
+    node_callback_ids[node_uuid] = [
+        OpenMaya.MNodeMessage.addAttributeChangedCallback(
+            obj, _attribute_changed_func, node_uuid),
+        OpenMaya.MNodeMessage.addNodePreRemovalCallback(
+            obj, _node_removed_func, node_uuid),
+    ]
+    return
+
+
+def _get_cache_entry(node_name, attr_name):
+    """
+    Get the cache entry of a node option, or None.
+    """
+    node_uuid = _get_node_uuid(node_name)
+    if node_uuid is None:
+        return None
+    return __NODE_OPTION_CACHE.get((node_uuid, attr_name))
+
+
+def _set_cache_entry(node_name, attr_name, value=None,
+                     structure=None, has_structure=False,
+                     dirty=False):
+    """
+    Store a node option in the cache.
+
+    :returns: True if the option was cached, False if the node does
+              not exist.
+    :rtype: bool
+    """
+    node_uuid = _get_node_uuid(node_name)
+    if node_uuid is None:
+        return False
+    _add_callbacks(node_name, node_uuid)
+    __NODE_OPTION_CACHE[(node_uuid, attr_name)] = {
+        'node': node_name,
+        'value': value,
+        'structure': structure,
+        'has_structure': has_structure,
+        'dirty': dirty,
+    }
+    if dirty is True and __NODE_OPTION_STATE['flush_pending'] is False:
+        __NODE_OPTION_STATE['flush_pending'] = True
+        maya.utils.executeDeferred(flush_node_options)
+    return True
+
+
+def _get_entry_value(entry):
+    if entry['value'] is None and entry['has_structure'] is True:
+        entry['value'] = json.dumps(entry['structure'])
+    return entry['value']
+
+
+def _set_node_option_value(node_attr, value):
+    """
+    Write a value to a node.attr path.
+    """
+    maya.cmds.setAttr(node_attr, lock=False)
+    if isinstance(value, (bool, float, int)):
+        maya.cmds.setAttr(node_attr, value)
+    elif isinstance(value, basestring):
+        maya.cmds.setAttr(node_attr, value, type='string')
+    maya.cmds.setAttr(node_attr, lock=True)
+    return
+
+
+def flush_node_options():
+    """
+    Write all changed (cached) node options to the Maya nodes.
+
+    This is run automatically when Maya is idle, after an option is
+    set. Call this function when the Maya node attributes must be up
+    to date immediately, or inside an undo chunk to record the writes
+    in that chunk.
+
+    Options that fail to be written are logged, with the node and
+    attribute name, and removed from the cache.
+
+    :rtype: None
+    """
+    __NODE_OPTION_STATE['flush_pending'] = False
+    __NODE_OPTION_STATE['flushing'] = True
+    try:
+        for (node_uuid, attr_name), entry in list(__NODE_OPTION_CACHE.items()):
+            if entry['dirty'] is False:
+                continue
+            entry['dirty'] = False
+            node_name = entry['node']
+            if _get_node_uuid(node_name) != node_uuid:
+                # The node was renamed, find the new node name.
+                node_names = maya.cmds.ls(node_uuid, long=True) or []
+                if len(node_names) == 0:
+                    __NODE_OPTION_CACHE.pop((node_uuid, attr_name), None)
+                    continue
+                node_name = node_names[0]
+                entry['node'] = node_name
+            node_attr = node_name + '.' + attr_name
+            try:
+                _set_node_option_value(node_attr, _get_entry_value(entry))
+            except RuntimeError as e:
+                msg = 'Could not write node option: node=%r attr=%r error=%s'
+                LOG.error(msg, node_name, attr_name, e)
+                __NODE_OPTION_CACHE.pop((node_uuid, attr_name), None)
+    finally:
+        __NODE_OPTION_STATE['flushing'] = False
+    return
+
+
+def clear_node_option_cache():
+    """
+    Forget all cached node options, without writing changed values.
+
+    :rtype: None
+    """
+    __NODE_OPTION_CACHE.clear()
+    node_callback_ids = __NODE_OPTION_STATE['node_callback_ids']
+    for callback_ids in node_callback_ids.values():
+        _remove_callback_ids(callback_ids)
+    node_callback_ids.clear()
+    return
+
+
 def get_node_option(node_name, attr_name, default=None):
     """
     Get value from an node attribute.
@@ -99,6 +381,11 @@ def get_node_option(node_name, attr_name, default=None):
     :return: A value from the node.
     :rtype: bool, float, int or str
     """
+    entry = _get_cache_entry(node_name, attr_name)
+    if entry is not None:
+        entry['node'] = node_name
+        return _get_entry_value(entry)
+
     attrs = maya.cmds.listAttr(node_name)
     if attr_name not in attrs:
         msg = 'attr_name not found on node: attr=%r node=%r'
@@ -106,6 +393,7 @@ def get_node_option(node_name, attr_name, default=None):
         return default
     node_attr = node_name + '.' + attr_name
     ret = maya.cmds.getAttr(node_attr)
+    _set_cache_entry(node_name, attr_name, value=ret)
     return ret
 
 
@@ -118,6 +406,10 @@ def set_node_option(node_name, attr_name, value,
         type will determine the attribute automatically created.
         Once created the attribute type cannot be changed.
 
+    .. note: The value is written to the node when Maya is idle, and
+        is not part of the current undo chunk. Use flush_node_options
+        to write the value immediately.
+
     :param node_name: Node to store value on.
     :type node_name: str
 
@@ -138,23 +430,51 @@ def set_node_option(node_name, attr_name, value,
     if add_attr is None:
         add_attr = False
     assert isinstance(add_attr, bool)
-    node_attr = node_name + '.' + attr_name
+    _set_node_option(node_name, attr_name, add_attr,
+                     value=value)
+    return
 
-    attrs = maya.cmds.listAttr(node_name)
-    if attr_name not in attrs:
-        if add_attr is False:
-            msg = 'attr_name not found on node: attr=%r node=%r'
-            LOG.debug(msg, attr_name, node_name)
-        else:
-            __add_node_option_attr(node_name, attr_name, value)
 
-    # Set value
-    maya.cmds.setAttr(node_attr, lock=False)
-    if isinstance(value, (bool, float, int)):
-        maya.cmds.setAttr(node_attr, value)
-    elif isinstance(value, basestring):
-        maya.cmds.setAttr(node_attr, value, type='string')
-    maya.cmds.setAttr(node_attr, lock=True)
+def _set_node_option(node_name, attr_name, add_attr,
+                     value=None, structure=None, has_structure=False):
+    """
+    Set a value, or data structure, into the node option cache.
+
+    If the attribute does not exist, it is created (if 'add_attr' is
+    True), otherwise setting the value will fail.
+    """
+    if has_structure is True:
+        value = None
+    cached = False
+    entry = _get_cache_entry(node_name, attr_name)
+    attr_exists = entry is not None
+    if attr_exists is False:
+        attrs = maya.cmds.listAttr(node_name)
+        attr_exists = attr_name in attrs
+        if attr_exists is False:
+            if add_attr is False:
+                msg = 'attr_name not found on node: attr=%r node=%r'
+                LOG.debug(msg, attr_name, node_name)
+            else:
+                if has_structure is True:
+                    value = json.dumps(structure)
+                __add_node_option_attr(node_name, attr_name, value)
+                attr_exists = True
+
+    if attr_exists is True:
+        cached = _set_cache_entry(
+            node_name, attr_name,
+            value=value,
+            structure=structure,
+            has_structure=has_structure,
+            dirty=True)
+    if cached is False:
+        # The attribute (or node) does not exist, this will fail with
+        # a useful error message.
+        if has_structure is True:
+            value = json.dumps(structure)
+        node_attr = node_name + '.' + attr_name
+        _set_node_option_value(node_attr, value)
     return
 
 
@@ -172,11 +492,21 @@ def get_node_option_structure(node_name, attr_name):
              dictionary.
     :rtype: dict or list or None
     """
+    entry = _get_cache_entry(node_name, attr_name)
+    if entry is not None and entry['has_structure'] is True:
+        entry['node'] = node_name
+        return _copy_structure(entry['structure'])
+
     ret = None
     attr_data = get_node_option(node_name, attr_name)
     if attr_data is None:
         return ret
     ret = json.loads(attr_data)
+    entry = _get_cache_entry(node_name, attr_name)
+    if entry is not None:
+        entry['structure'] = ret
+        entry['has_structure'] = True
+        ret = _copy_structure(ret)
     return ret
 
 
@@ -188,6 +518,10 @@ def set_node_option_structure(node_name, attr_name, data_struct, add_attr=None):
         type will determine the attribute automatically created.
         Once created the attribute type cannot be changed.
 
+    .. note: The data is written to the node when Maya is idle, and
+        is not part of the current undo chunk. Use flush_node_options
+        to write the data immediately.
+
     :param node_name: Node to store data on.
     :type node_name: str
 
@@ -205,15 +539,18 @@ def set_node_option_structure(node_name, attr_name, data_struct, add_attr=None):
     """
     assert isinstance(attr_name, (str, unicode))
     assert isinstance(data_struct, (list, dict))
+    if add_attr is None:
+        add_attr = False
+    assert isinstance(add_attr, bool)
 
-    new_attr_data = json.dumps(data_struct)
-    old_attr_data = get_node_option(node_name, attr_name)
-    if old_attr_data == new_attr_data:
+    old_data_struct = get_node_option_structure(node_name, attr_name)
+    if old_data_struct == data_struct:
         # No change is needed.
         return
 
-    set_node_option(node_name, attr_name, new_attr_data,
-                    add_attr=add_attr)
+    _set_node_option(node_name, attr_name, add_attr,
+                     structure=_copy_structure(data_struct),
+                     has_structure=True)
     return
 
 
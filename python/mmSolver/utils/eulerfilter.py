@@ -0,0 +1,306 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Array based Euler Filter for rotation values.
+
+This module is software agnostic and should not rely on any thirdparty
+software, however if numpy is available, an numpy-accelerated
+code-path will be used.
+
+The filter gives the same results as running
+:func:`mmSolver.utils.animcurve.euler_filter_value` sequentially over
+each value, but operates on whole arrays at once. Rotation values are
+given in degrees.
+
+Example usage::
+
+  import mmSolver.utils.eulerfilter as eulerfilter
+  # One rotation curve.
+  values = eulerfilter.euler_filter_values([170.0, -170.0, -150.0])
+  # [170.0, 190.0, 210.0]
+
+  # N nodes x T frames x 3 axes.
+  rotations = [
+      [(0.0, 0.0, 170.0), (0.0, 0.0, -170.0)],
+      [(10.0, 0.0, 0.0), (380.0, 0.0, 0.0)],
+  ]
+  rotations = eulerfilter.euler_filter_rotations(
+      rotations, rotate_orders=['xyz', 'zxy'])
+
+"""
+
+import math
+import sys
+
+import mmSolver.utils.constant as const
+
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Optimal 'range' function for Python 2
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+AXIS_CHAR_TO_INDEX = {'x': 0, 'y': 1, 'z': 2}
+
+
+def _wrap_count(diff):
+    """
+    Number of 360 degree turns to remove from a value, so that the
+    difference to the previous value is with-in +/-180 degrees.
+    """
+    if diff > 180.0:
+        return math.ceil((diff - 180.0) / 360.0)
+    elif diff < -180.0:
+        return math.floor((diff + 180.0) / 360.0)
+    return 0.0
+
+
+def _euler_filter_values_raw(values):
+    """
+    Euler filter a single list of rotation values.
+
+    Uses standard python functions only.
+    """
+    new_values = list(values)
+    for i in range(1, len(values)):
+        turns = _wrap_count(values[i] - new_values[i - 1])
+        new_values[i] = values[i] - (360.0 * turns)
+    return new_values
+
+
+def _euler_filter_values_numpy(values):
+    """
+    Euler filter rotation values along the last axis of an array.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    values = np.array(values, dtype=np.float64)
+    if values.shape[-1] < 2:
+        return values
+
+    # The number of turns to remove between each value only depends
+    # on the difference between the (un-filtered) values, so all turns
+    # can be accumulated at once.
+    diff = np.diff(values, axis=-1)
+    step = np.where(
+        np.abs(diff) <= 180.0,
+        diff,
+        np.mod(diff + 180.0, 360.0) - 180.0)
+    turns = np.round((diff - step) / 360.0)
+    new_values = values.copy()
+    new_values[..., 1:] -= 360.0 * np.cumsum(turns, axis=-1)
+
+    # A step of exactly +/-180 degrees is ambiguous; the filter keeps
+    # the sign of the difference to the previous filtered value,
+    # which is only known after the previous values are filtered.
+    ambiguous = np.abs(step) == 180.0
+    for index in np.unique(np.nonzero(ambiguous)[-1]):
+        i = index + 1
+        prv_values = new_values[..., i - 1]
+        diff_filtered = values[..., i] - prv_values
+        want_step = np.where(diff_filtered > 0.0, 180.0, -180.0)
+        have_step = new_values[..., i] - prv_values
+        offset = np.where(
+            ambiguous[..., index],
+            np.round((want_step - have_step) / 360.0) * 360.0,
+            0.0)
+        new_values[..., i:] += offset[..., np.newaxis]
+    return new_values
+
+
+def euler_filter_values(values):
+    """
+    Perform a 'Euler Filter' on a sequence of rotation values.
+
+    Each sequential rotation value will be with-in +/-180 degrees of
+    the previous (filtered) value. The first value is never changed.
+
+    :param values: Rotation values, in degrees, in time order.
+    :type values: [float, ..]
+
+    :returns: Filtered copy of 'values'.
+    :rtype: [float, ..]
+    """
+    if np is not None:
+        return _euler_filter_values_numpy(values).tolist()
+    return _euler_filter_values_raw(values)
+
+
+def _get_axis_indices(rotate_order):
+    """
+    Get the indices of the first, middle and last axes of a rotate
+    order.
+    """
+    assert rotate_order in const.ROTATE_ORDER_STR_LIST
+    first, middle, last = [AXIS_CHAR_TO_INDEX[c] for c in rotate_order]
+    return first, middle, last
+
+
+def _flip_rotation(rot, rotate_order):
+    """
+    Get the alternate Euler rotation that gives the same orientation.
+
+    For any rotate order, adding 180 degrees to the first and last
+    axes and negating (and adding 180 degrees to) the middle axis
+    produces the same orientation.
+    """
+    first, middle, last = _get_axis_indices(rotate_order)
+    new_rot = list(rot)
+    new_rot[first] = rot[first] + 180.0
+    new_rot[middle] = 180.0 - rot[middle]
+    new_rot[last] = rot[last] + 180.0
+    return new_rot
+
+
+def _euler_filter_rotations_flip_raw(rotations, rotate_orders):
+    """
+    Euler filter N x T x 3 rotations, also considering the flipped
+    (alternate) Euler rotation on each frame.
+
+    Uses standard python functions only.
+    """
+    new_rotations = []
+    for node_rots, rotate_order in zip(rotations, rotate_orders):
+        new_node_rots = []
+        prv_rot = None
+        for rot in node_rots:
+            rot = list(rot)
+            if prv_rot is not None:
+                candidates = []
+                for r in (rot, _flip_rotation(rot, rotate_order)):
+                    r = [v - (360.0 * _wrap_count(v - p))
+                         for v, p in zip(r, prv_rot)]
+                    dist = sum([abs(v - p) for v, p in zip(r, prv_rot)])
+                    candidates.append((dist, r))
+                rot = candidates[0][1]
+                if candidates[1][0] < candidates[0][0]:
+                    rot = candidates[1][1]
+            new_node_rots.append(tuple(rot))
+            prv_rot = rot
+        new_rotations.append(new_node_rots)
+    return new_rotations
+
+
+def _euler_filter_rotations_flip_numpy(rotations, rotate_orders):
+    """
+    Euler filter N x T x 3 rotations, also considering the flipped
+    (alternate) Euler rotation on each frame.
+
+    Each frame depends on the previously chosen rotation, so frames
+    are walked in sequence, but all nodes are computed at once.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    rotations = np.array(rotations, dtype=np.float64)
+    num_nodes = rotations.shape[0]
+    num_times = rotations.shape[1]
+
+    # Per-node scale and offset to convert into the flipped rotation.
+    flip_scale = np.ones((num_nodes, 3), dtype=np.float64)
+    flip_offset = np.full((num_nodes, 3), 180.0, dtype=np.float64)
+    for i, rotate_order in enumerate(rotate_orders):
+        first, middle, last = _get_axis_indices(rotate_order)
+        flip_scale[i, middle] = -1.0
+
+    def unwrap(rot, prv_rot):
+        diff = rot - prv_rot
+        turns = np.where(
+            diff > 180.0,
+            np.ceil((diff - 180.0) / 360.0),
+            np.where(diff < -180.0, np.floor((diff + 180.0) / 360.0), 0.0))
+        return rot - (360.0 * turns)
+
+    new_rotations = rotations.copy()
+    for t in range(1, num_times):
+        prv_rot = new_rotations[:, t - 1, :]
+        rot = rotations[:, t, :]
+        rot_a = unwrap(rot, prv_rot)
+        rot_b = unwrap((rot * flip_scale) + flip_offset, prv_rot)
+        dist_a = np.abs(rot_a - prv_rot).sum(axis=-1)
+        dist_b = np.abs(rot_b - prv_rot).sum(axis=-1)
+        use_flip = (dist_b < dist_a)[:, np.newaxis]
+        new_rotations[:, t, :] = np.where(use_flip, rot_b, rot_a)
+    return new_rotations
+
+
+def euler_filter_rotations(rotations, rotate_orders=None, flip=False):
+    """
+    Perform a 'Euler Filter' on many rotation curves at once.
+
+    By default each axis is filtered individually, exactly the same
+    as :func:`euler_filter_values`. When 'flip' is True, the
+    alternate Euler rotation (for the node's rotate order) is also
+    considered on each frame, and whichever rotation is closest to
+    the previous frame is used.
+
+    :param rotations: Rotation values, in degrees, shaped as N nodes,
+                      by T times, by 3 axes (X, Y and Z).
+    :type rotations: [[(float, float, float), ..], ..]
+
+    :param rotate_orders: The rotate order of each node, or None to
+                          use 'xyz' for all nodes. Only used when
+                          'flip' is True.
+    :type rotate_orders: [str, ..] or None
+
+    :param flip: Consider flipped Euler rotations?
+    :type flip: bool
+
+    :returns: Filtered copy of 'rotations'. If 'rotations' is a numpy
+              array, a numpy array is returned, otherwise nested lists
+              (of tuples) are returned.
+    :rtype: [[(float, float, float), ..], ..]
+    """
+    assert isinstance(flip, bool)
+    is_array = np is not None and isinstance(rotations, np.ndarray)
+    num_nodes = len(rotations)
+    if rotate_orders is None:
+        rotate_orders = ['xyz'] * num_nodes
+    assert len(rotate_orders) == num_nodes
+    if num_nodes == 0:
+        return rotations
+
+    if np is not None:
+        if flip is True:
+            new_rotations = _euler_filter_rotations_flip_numpy(
+                rotations, rotate_orders)
+        else:
+            # Filter along the time axis, for each node and axis.
+            values = np.swapaxes(np.array(rotations, dtype=np.float64), 1, 2)
+            values = _euler_filter_values_numpy(values)
+            new_rotations = np.swapaxes(values, 1, 2)
+        if is_array is True:
+            return new_rotations
+        return [[tuple(rot) for rot in node_rots]
+                for node_rots in new_rotations.tolist()]
+
+    if flip is True:
+        return _euler_filter_rotations_flip_raw(rotations, rotate_orders)
+    new_rotations = []
+    for node_rots in rotations:
+        axis_values = [_euler_filter_values_raw([r[i] for r in node_rots])
+                       for i in range(3)]
+        new_rotations.append(list(zip(*axis_values)))
+    return new_rotations
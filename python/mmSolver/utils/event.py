@@ -22,13 +22,20 @@ The event system modelled is a 'publish/subscribe' pattern.
 https://en.wikipedia.org/wiki/Publish%E2%80%93subscribe_pattern
 
 This module does not use any external python dependencies, but does
-rely on Maya's in-built 'maya.utils.executeDeferred()' function.
+rely on Maya's in-built 'maya.utils.executeDeferred()' function and a
+Qt timer (see set_deferred_function() and set_timer_function() to run
+outside of Maya). All functions are called on Maya's main thread.
 
 This event system automatically combines multiple functions with
 single objects into a function that is run once with multiple
 arguments. The reason for this, is to reduce function calls and
 improve performance when operating on many arguments at once.
 
+All events triggered before Maya is idle are flushed together, with a
+single deferred function call. Events can also be throttled, so the
+functions of an event are called at most once per time interval, and
+bulk operations can use the batch() context manager, so events are
+only flushed once the bulk operation is finished.
 
 Example usage::
 
@@ -45,18 +52,131 @@ Example usage::
    ...
    >>>
    {'number': [0, 1, 2]}
+   >>> with event_utils.batch():
+   ...     for i in range(3):
+   ...         event_utils.trigger_event('my_event', number=i)
+   ...
+   >>>
+   {'number': [0, 1, 2]}
+   >>> # Call functions at most once every 0.5 seconds.
+   >>> event_utils.set_event_throttle('my_event', 0.5)
 
 """
 
+from __future__ import absolute_import
+
 import collections
-import maya.utils
+import contextlib
+import math
+import time
+
 import mmSolver.logger
 
 
 LOG = mmSolver.logger.get_logger()
-__EVENT_ARGUMENTS = collections.defaultdict(list)
+__EVENT_ARGUMENTS = collections.OrderedDict()
 __EVENT_FUNCTIONS = collections.defaultdict(list)
 __EVENT_UNIQUE_FUNCTION_HASHES = collections.defaultdict(set)
+__EVENT_THROTTLE_INTERVALS = dict()
+__EVENT_LAST_CALL_TIMES = dict()
+__EVENT_STATE = {
+    'batch_depth': 0,
+    'flush_scheduled': False,
+    'timer_event_names': set(),
+    'deferred_function': None,
+    'timer_function': None,
+}
+
+
+def _maya_execute_deferred(func):
+    import maya.utils
+    maya.utils.executeDeferred(func)
+    return
+
+
+def set_deferred_function(func):
+    """
+    Set the function used to run functions when Maya is idle.
+
+    By default 'maya.utils.executeDeferred' is used. Setting another
+    function allows events to be used outside of Maya, for example in
+    tests.
+
+    :param func: A function taking a single function argument, or
+                 None to use the default.
+    :type func: callable or None
+    """
+    assert func is None or callable(func) is True
+    __EVENT_STATE['deferred_function'] = func
+    return
+
+
+def _execute_deferred(func):
+    deferred_func = __EVENT_STATE['deferred_function']
+    if deferred_func is None:
+        deferred_func = _maya_execute_deferred
+    deferred_func(func)
+    return
+
+
+def _qt_single_shot_timer(delay, func):
+    import mmSolver.ui.Qt.QtCore as QtCore
+    if QtCore.QCoreApplication.instance() is None:
+        # There is no Qt event loop, such as in Maya batch mode.
+        return False
+    msec = int(math.ceil(delay * 1000.0))
+    QtCore.QTimer.singleShot(msec, func)
+    return True
+
+
+def set_timer_function(func):
+    """
+    Set the function used to run a function after a delay, on the
+    main thread.
+
+    By default a single-shot Qt timer is used. Setting another
+    function allows throttled events to be used outside of Maya, for
+    example in tests.
+
+    :param func: A function taking a delay (in seconds) and a
+                 function argument, returning True if the function
+                 will be called, or False if it cannot be (events are
+                 then not throttled). Or None to use the default.
+    :type func: callable or None
+    """
+    assert func is None or callable(func) is True
+    __EVENT_STATE['timer_function'] = func
+    return
+
+
+def _execute_timer(delay, func):
+    timer_func = __EVENT_STATE['timer_function']
+    if timer_func is None:
+        timer_func = _qt_single_shot_timer
+    return timer_func(delay, func)
+
+
+def set_event_throttle(event_name, interval):
+    """
+    Limit how often the functions of an event are called.
+
+    Events triggered with-in the interval are held back and combined,
+    then the functions are called once the interval has passed.
+
+    :param event_name: The event to throttle.
+    :type event_name: str
+
+    :param interval: The minimum number of seconds between function
+                     calls, or None (or 0.0) to disable throttling.
+    :type interval: float or None
+    """
+    assert isinstance(event_name, basestring)
+    if not interval:
+        __EVENT_THROTTLE_INTERVALS.pop(event_name, None)
+    else:
+        assert interval > 0.0
+        __EVENT_THROTTLE_INTERVALS[event_name] = float(interval)
+    return
 
 
 def trigger_event(event_name, **kwargs):
@@ -66,25 +186,116 @@ def trigger_event(event_name, **kwargs):
     LOG.debug('trigger_event: event_name=%r kwargs=%r',
               event_name, kwargs)
     assert isinstance(event_name, basestring)
+    if event_name not in __EVENT_ARGUMENTS:
+        __EVENT_ARGUMENTS[event_name] = []
     __EVENT_ARGUMENTS[event_name].append(kwargs)
+    if __EVENT_STATE['batch_depth'] == 0:
+        __schedule_flush()
+    return
+
+
+@contextlib.contextmanager
+def batch():
+    """
+    Hold back all events triggered inside the context, then flush them
+    (combined) once the outer-most batch is finished.
+
+    Example::
+
+       >>> with event_utils.batch():
+       ...     for mkr_data in mkr_data_list:
+       ...         mmapi.Marker().create_node()
+       ...
+    """
+    __EVENT_STATE['batch_depth'] += 1
+    try:
+        yield
+    finally:
+        __EVENT_STATE['batch_depth'] -= 1
+        if __EVENT_STATE['batch_depth'] == 0 and len(__EVENT_ARGUMENTS) > 0:
+            __schedule_flush()
+    return
+
+
+def __schedule_flush():
+    if __EVENT_STATE['flush_scheduled'] is True:
+        return
+    __EVENT_STATE['flush_scheduled'] = True
+    _execute_deferred(__deferred_flush)
+    return
+
 
-    deferred_func = lambda: __call_functions(event_name)
-    maya.utils.executeDeferred(deferred_func)
+def __deferred_flush():
+    __EVENT_STATE['flush_scheduled'] = False
+    flush_events()
     return
 
 
+def __schedule_timer(event_name, delay):
+    """
+    Call the functions of a throttled event after 'delay' seconds.
+
+    :returns: True if the functions will be called, False if no timer
+              can be used.
+    """
+    timer_event_names = __EVENT_STATE['timer_event_names']
+    if event_name in timer_event_names:
+        return True
+
+    def timer_func():
+        timer_event_names.discard(event_name)
+        if __EVENT_STATE['batch_depth'] > 0:
+            # The batch flushes the event once finished.
+            return
+        __EVENT_LAST_CALL_TIMES[event_name] = time.time()
+        __call_functions(event_name)
+
+    timer_event_names.add(event_name)
+    ok = _execute_timer(delay, timer_func)
+    if ok is False:
+        timer_event_names.discard(event_name)
+    return ok
+
+
+def flush_events():
+    """
+    Call the functions of all events triggered so far.
+
+    This is called automatically when Maya is idle, it only needs to
+    be called to force the functions to run now.
+
+    Events inside a batch() are not flushed, and throttled events are
+    only flushed once the throttle interval has passed.
+
+    :returns: The names of the events that were flushed.
+    :rtype: [str, ..]
+    """
+    if __EVENT_STATE['batch_depth'] > 0:
+        return []
+    now = time.time()
+    event_names = []
+    for event_name in list(__EVENT_ARGUMENTS.keys()):
+        interval = __EVENT_THROTTLE_INTERVALS.get(event_name)
+        last_time = __EVENT_LAST_CALL_TIMES.get(event_name)
+        if interval is not None and last_time is not None:
+            remaining = (last_time + interval) - now
+            if remaining > 0.0 and __schedule_timer(event_name, remaining):
+                continue
+        event_names.append(event_name)
+
+    for event_name in event_names:
+        __EVENT_LAST_CALL_TIMES[event_name] = now
+        __call_functions(event_name)
+    return event_names
+
+
 def __call_functions(event_name):
     LOG.debug('call_functions: event_name=%r', event_name)
-    global __EVENT_ARGUMENTS
-    global __EVENT_FUNCTIONS
-    global __EVENT_UNIQUE_FUNCTION_HASHES
-
-    kwargs_list = __EVENT_ARGUMENTS[event_name]
+    # Remove all the arguments, so we cannot run the functions again.
+    kwargs_list = __EVENT_ARGUMENTS.pop(event_name, [])
     if len(kwargs_list) == 0:
         # Don't run if there are no arguments to use.
         return
-    # Clear all the arguments, so we cannot run the functions again.
-    __EVENT_ARGUMENTS[event_name] = []
 
     # Combine keyword arguments.
     kwargs = collections.defaultdict(list)
@@ -92,7 +303,7 @@ def __call_functions(event_name):
         for key, value in kw.items():
             if isinstance(value, list):
                 kwargs[key] += value
-            if isinstance(value, (tuple, set)):
+            elif isinstance(value, (tuple, set)):
                 kwargs[key] += list(value)
             else:
                 kwargs[key].append(value)
@@ -117,14 +328,12 @@ def add_function_to_event(event_name, func, deferred=True):
 
     def deferred_func(**kwargs):
         wrapper_func = lambda: func(**kwargs)
-        maya.utils.executeDeferred(wrapper_func)
+        _execute_deferred(wrapper_func)
 
     run_func = func
     if deferred is True:
         run_func = deferred_func
 
-    global __EVENT_FUNCTIONS
-    global __EVENT_UNIQUE_FUNCTION_HASHES
     func_hash = hash(func)
     func_hashes = __EVENT_UNIQUE_FUNCTION_HASHES.get(event_name, set())
     if func_hash not in func_hashes:
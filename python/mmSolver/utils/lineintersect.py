@@ -47,12 +47,22 @@ Utility functions for 3D line intersection (for triangulating 3D points).
     )
     # Use 'pnt' as the 'intersection' point of the two lines.
 
+    # Example usage, for many markers and frames at once.
+    import mmSolver.utils.triangulate as triangulate
+    mkr_cam_node_frm_list = [
+        (mkr_node, cam_tfm, list(range(first_frm_num, last_frm_num + 1))),
+    ]
+    rays = tri_utils.get_camera_rays_to_points(mkr_cam_node_frm_list)
+    points = triangulate.triangulate_points(rays)
+
 """
 
 import maya.cmds
 import maya.OpenMaya as OpenMaya
 
 import mmSolver.logger
+import mmSolver.utils.constant as const
+import mmSolver.utils.transform as tfm_utils
 
 LOG = mmSolver.logger.get_logger()
 
@@ -98,6 +108,64 @@ def get_point_and_direction(camera_node, point_node, frame):
     return pnt, direction
 
 
+def get_camera_rays_to_points(mkr_cam_node_frm_list, eval_mode=None):
+    """
+    Get the camera positions and directions toward points, for many
+    points, cameras and frames at once.
+
+    All world matrices are evaluated together, without changing the
+    current Maya scene time (by default). A camera shared by many
+    points is only evaluated once per frame.
+
+    :param mkr_cam_node_frm_list: Point (marker) transform node,
+                                  camera transform node and the
+                                  frames to query at.
+    :type mkr_cam_node_frm_list: [(str, str, [int, ..]), ..]
+
+    :param eval_mode: What type of evaluation method to use?
+    :type eval_mode: mmSolver.utils.constant.EVAL_MODE_*
+
+    :return: For each item in mkr_cam_node_frm_list, a tuple of the
+             camera positions and the (un-normalized) directions from
+             the camera toward the point, for each frame.
+    :rtype: [([(float, float, float), ..], [(float, float, float), ..]), ..]
+    """
+    if eval_mode is None:
+        eval_mode = const.EVAL_MODE_DEFAULT
+    attr_name = 'worldMatrix[0]'
+
+    cache = tfm_utils.TransformMatrixCache()
+    tfm_nodes = []
+    for mkr_node, cam_tfm, frm_list in mkr_cam_node_frm_list:
+        mkr_tfm_node = tfm_utils.TransformNode(node=mkr_node)
+        cam_tfm_node = tfm_utils.TransformNode(node=cam_tfm)
+        frm_list = list(frm_list)
+        cache.add_node_attr(mkr_tfm_node, attr_name, frm_list)
+        cache.add_node_attr(cam_tfm_node, attr_name, frm_list)
+        tfm_nodes.append((mkr_tfm_node, cam_tfm_node, frm_list))
+    cache.process(eval_mode=eval_mode)
+
+    rays = []
+    for mkr_tfm_node, cam_tfm_node, frm_list in tfm_nodes:
+        mkr_matrices = cache.get_node_attr(mkr_tfm_node, attr_name, frm_list)
+        cam_matrices = cache.get_node_attr(cam_tfm_node, attr_name, frm_list)
+        origins = []
+        directions = []
+        for mkr_mat, cam_mat in zip(mkr_matrices, cam_matrices):
+            if mkr_mat is None or cam_mat is None:
+                continue
+            cam_pos = (cam_mat[12], cam_mat[13], cam_mat[14])
+            mkr_pos = (mkr_mat[12], mkr_mat[13], mkr_mat[14])
+            origins.append(cam_pos)
+            directions.append((
+                mkr_pos[0] - cam_pos[0],
+                mkr_pos[1] - cam_pos[1],
+                mkr_pos[2] - cam_pos[2],
+            ))
+        rays.append((origins, directions))
+    return rays
+
+
 def calculate_approx_intersection_point_between_two_3d_lines(a_pnt, a_dir,
                                                              b_pnt, b_dir,
                                                              eps=None):
@@ -19,9 +19,12 @@
 Raytracing functions.
 """
 
+import math
+
 import maya.cmds
 import maya.OpenMaya as OpenMaya
 import mmSolver.logger
+import mmSolver.utils.bvh as bvh_utils
 import mmSolver.utils.constant as const
 
 LOG = mmSolver.logger.get_logger()
@@ -149,3 +152,222 @@ def closest_intersect(source,
     assert closest_point is None or isinstance(closest_point,
                                                OpenMaya.MFloatPoint)
     return closest_point
+
+
+def get_mesh_triangles(mesh):
+    """
+    Get the triangulated points of a mesh, in object space.
+
+    :param mesh: Mesh shape node.
+    :type mesh: str
+
+    :returns: Tuple of the point positions and the three point
+              indices of each triangle.
+    :rtype: ([(float, float, float), ..], [(int, int, int), ..])
+    """
+    sel = OpenMaya.MSelectionList()
+    dag = OpenMaya.MDagPath()
+    sel.add(mesh)
+    sel.getDagPath(0, dag)
+    mesh_fn = OpenMaya.MFnMesh(dag)
+
+    point_array = OpenMaya.MFloatPointArray()
+    mesh_fn.getPoints(point_array, OpenMaya.MSpace.kObject)
+    points = []
+    for i in range(point_array.length()):
+        pt = point_array[i]
+        points.append((pt.x, pt.y, pt.z))
+
+    tri_counts = OpenMaya.MIntArray()
+    tri_verts = OpenMaya.MIntArray()
+    mesh_fn.getTriangles(tri_counts, tri_verts)
+    triangles = []
+    for i in range(0, tri_verts.length(), 3):
+        triangles.append((tri_verts[i], tri_verts[i + 1], tri_verts[i + 2]))
+    return points, triangles
+
+
+def _is_deforming_mesh(mesh):
+    """
+    Can the mesh change over time?
+
+    Any mesh with an input connection (construction history, a
+    deformer, an Alembic or geometry cache, etc) may change, not only
+    meshes with deformers.
+    """
+    conns = maya.cmds.listConnections(
+        mesh + '.inMesh',
+        source=True,
+        destination=False) or []
+    return len(conns) > 0
+
+
+def _transform_point(p, m):
+    return (
+        (p[0] * m[0]) + (p[1] * m[4]) + (p[2] * m[8]) + m[12],
+        (p[0] * m[1]) + (p[1] * m[5]) + (p[2] * m[9]) + m[13],
+        (p[0] * m[2]) + (p[1] * m[6]) + (p[2] * m[10]) + m[14],
+    )
+
+
+def _transform_vector(v, m):
+    return (
+        (v[0] * m[0]) + (v[1] * m[4]) + (v[2] * m[8]),
+        (v[0] * m[1]) + (v[1] * m[5]) + (v[2] * m[9]),
+        (v[0] * m[2]) + (v[1] * m[6]) + (v[2] * m[10]),
+    )
+
+
+class MeshIntersector(object):
+    """
+    Intersect many rays with many meshes at once.
+
+    A Bounding Volume Hierarchy (BVH) is built for each mesh, in
+    object space. Meshes without any history are only built once;
+    rays are transformed into each mesh's object space, so animated
+    transforms do not require a re-build. Meshes with history are
+    re-built when :meth:`update` is called and the mesh points or
+    triangles have changed.
+
+    >>> intersector = MeshIntersector(mesh_nodes)
+    >>> for frame in frames:
+    ...     maya.cmds.currentTime(frame, update=True)
+    ...     intersector.update()
+    ...     hits = intersector.closest_intersect_many(sources, directions)
+    >>> intersector.clear()
+
+    """
+
+    def __init__(self, mesh_nodes, use_smooth_mesh=None):
+        """
+        Create the intersector for the given mesh nodes.
+
+        :param mesh_nodes: Mesh nodes
+        :type mesh_nodes: [str, ..]
+
+        :param use_smooth_mesh: Use smooth preview mesh for intersection.
+        :type use_smooth_mesh: bool
+        """
+        assert isinstance(mesh_nodes, (list, tuple))
+        self._meshes = []
+        self._smooth_meshes = []
+        for mesh in mesh_nodes:
+            deforming = _is_deforming_mesh(mesh)
+            if use_smooth_mesh is True:
+                smooth_mesh = _create_smooth_mesh(mesh)
+                if smooth_mesh is not None:
+                    self._smooth_meshes.append(smooth_mesh)
+                    mesh = smooth_mesh
+            self._meshes.append({
+                'mesh': mesh,
+                'deforming': deforming,
+                'bvh': None,
+                'points': None,
+                'triangles': None,
+                'inverse_matrix': None,
+            })
+
+    def clear(self):
+        """
+        Remove any temporary nodes, and clear all built data.
+        """
+        if len(self._smooth_meshes) > 0:
+            maya.cmds.delete(self._smooth_meshes)
+        self._smooth_meshes = []
+        self._meshes = []
+        return
+
+    def update(self):
+        """
+        Update the meshes for the current time.
+
+        This function must be called each time the current time
+        changes, and before :meth:`closest_intersect_many` is first
+        called.
+        """
+        for data in self._meshes:
+            mesh = data['mesh']
+            if data['bvh'] is None or data['deforming'] is True:
+                points, triangles = get_mesh_triangles(mesh)
+                changed = (points != data['points']
+                           or triangles != data['triangles'])
+                if data['bvh'] is None or changed is True:
+                    data['bvh'] = bvh_utils.BVH(points, triangles)
+                    data['points'] = points
+                    data['triangles'] = triangles
+            data['inverse_matrix'] = maya.cmds.getAttr(
+                mesh + '.worldInverseMatrix[0]')
+        return
+
+    def closest_intersect_many(self, sources, directions,
+                               max_dist=None,
+                               tolerance=None):
+        """
+        Get the closest intersection point on all meshes, for many
+        rays.
+
+        This function is similar to :func:`closest_intersect`, but
+        for many rays at once.
+
+        :param sources: Origin point of each ray.
+        :type sources: [[float, float, float], ..]
+
+        :param directions: The direction each ray will travel.
+        :type directions: [[float, float, float], ..]
+
+        :param max_dist: The maximum distance the ray will travel
+                         before stopping; default is RAYTRACE_MAX_DIST.
+        :type max_dist: float
+
+        :param tolerance: The minimum ray trace tolerance; default is
+                          RAYTRACE_EPSILON.
+        :type tolerance: float
+
+        :return: The closest world space intersection point for each
+                 ray, over all mesh nodes, or None if no point was
+                 found for a ray.
+        :rtype: [(float, float, float) or None, ..]
+        """
+        assert len(sources) == len(directions)
+        if max_dist is None:
+            max_dist = const.RAYTRACE_MAX_DIST
+        if tolerance is None:
+            tolerance = const.RAYTRACE_EPSILON
+
+        # Normalise directions, so the ray parameter is a world-space
+        # distance.
+        world_dirs = []
+        for d in directions:
+            length = math.sqrt((d[0] * d[0]) + (d[1] * d[1]) + (d[2] * d[2]))
+            if length > 0.0:
+                d = (d[0] / length, d[1] / length, d[2] / length)
+            world_dirs.append(tuple(d[:3]))
+
+        best_params = [None] * len(sources)
+        for data in self._meshes:
+            inv_mat = data['inverse_matrix']
+            bvh = data['bvh']
+            assert bvh is not None and inv_mat is not None
+            obj_sources = [_transform_point(p, inv_mat) for p in sources]
+            obj_dirs = [_transform_vector(d, inv_mat) for d in world_dirs]
+            params = bvh.intersect_rays_param(
+                obj_sources, obj_dirs,
+                max_dist=max_dist,
+                tolerance=tolerance)
+            for i, t in enumerate(params):
+                if t is None:
+                    continue
+                if best_params[i] is None or t < best_params[i]:
+                    best_params[i] = t
+
+        hits = []
+        for p, d, t in zip(sources, world_dirs, best_params):
+            if t is None:
+                hits.append(None)
+                continue
+            hits.append((
+                p[0] + (d[0] * t),
+                p[1] + (d[1] * t),
+                p[2] + (d[2] * t),
+            ))
+        return hits
@@ -0,0 +1,515 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Reproject 3D points onto a camera film back, and compute the 2D pixel
+deviation between points.
+
+This module is software agnostic and should not rely on any thirdparty
+software, however if numpy is available, an numpy-accelerated
+code-path will be used.
+
+The computations mirror the 'mmReprojection' command (see
+'src/core/reprojection.cpp' and 'src/Camera.cpp'), so the results
+match the command, but many points, cameras and frames are computed
+at once, without calling a Maya command for each node.
+
+Matrices are given as 16 floats, in the same (row-major) order as a
+Maya MMatrix, with the translation at index 12, 13 and 14.
+
+Example usage::
+
+  import mmSolver.utils.reprojection as reproj_utils
+  # A camera at the origin, looking down -Z.
+  cam_matrix = [1.0, 0.0, 0.0, 0.0,
+                0.0, 1.0, 0.0, 0.0,
+                0.0, 0.0, 1.0, 0.0,
+                0.0, 0.0, 0.0, 1.0]
+  points = reproj_utils.reproject_points(
+      [(0.0, 0.0, -10.0), (1.0, 0.0, -10.0)],
+      [cam_matrix, cam_matrix],
+      focal_lengths=35.0,
+      film_back_widths=1.417,
+      film_back_heights=0.945,
+      film_offset_xs=0.0,
+      film_offset_ys=0.0,
+      image_width=1920.0,
+      image_height=1080.0,
+      as_pixel_coordinate=True)
+  # [(960.0, 540.0), (1146.709..., 540.0)]
+
+"""
+
+import math
+import sys
+
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Optimal 'range' function for Python 2
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+INCH_TO_MM = 25.4
+MM_TO_CM = 0.1
+
+# Film Fit values, matching the Maya camera 'filmFit' attribute.
+FILM_FIT_FILL = 0
+FILM_FIT_HORIZONTAL = 1
+FILM_FIT_VERTICAL = 2
+FILM_FIT_OVERSCAN = 3
+FILM_FIT_LIST = [
+    FILM_FIT_FILL,
+    FILM_FIT_HORIZONTAL,
+    FILM_FIT_VERTICAL,
+    FILM_FIT_OVERSCAN,
+]
+
+# Default camera values. The 'mmReprojection' command always uses
+# DEFAULT_NEAR_CLIP_PLANE, but reads the film fit and camera scale
+# from the camera, so pass the camera's 'filmFit' and 'cameraScale'
+# values to match it.
+DEFAULT_FILM_FIT = FILM_FIT_HORIZONTAL
+DEFAULT_NEAR_CLIP_PLANE = 0.1
+DEFAULT_CAMERA_SCALE = 1.0
+
+
+def _get_projection_values(focal_length,
+                           film_back_width, film_back_height,
+                           film_offset_x, film_offset_y,
+                           image_width, image_height,
+                           film_fit, near_clip_plane, camera_scale,
+                           film_wider=None):
+    """
+    Compute the values of the camera projection matrix that affect
+    the 2D screen-space position of a point.
+
+    A camera-space point (x, y, z) is projected to screen-space with;
+    'x * scale_x / -z - offset_x' and 'y * scale_y / -z - offset_y'.
+
+    Works for floats, or numpy arrays of values. With numpy arrays,
+    'film_wider' must be given, and must be the same for all values.
+
+    :returns: Tuple of scale_x, scale_y, offset_x, offset_y.
+    """
+    film_aspect = film_back_width / film_back_height
+    image_aspect = float(image_width) / float(image_height)
+    if film_wider is None:
+        film_wider = film_aspect > image_aspect
+
+    # Frustum coordinates, matching 'computeFrustumCoordinates'.
+    film_width = film_back_width * INCH_TO_MM
+    film_height = film_back_height * INCH_TO_MM
+    offset_x = film_offset_x * INCH_TO_MM
+    offset_y = film_offset_y * INCH_TO_MM
+    focal_to_near = (near_clip_plane / focal_length) * camera_scale
+    right = focal_to_near * ((0.5 * film_width) + offset_x)
+    left = focal_to_near * ((-0.5 * film_width) + offset_x)
+    top = focal_to_near * ((0.5 * film_height) + offset_y)
+    bottom = focal_to_near * ((-0.5 * film_height) + offset_y)
+
+    # Film Fit, matching 'applyFilmFitLogic'.
+    if film_fit == FILM_FIT_VERTICAL:
+        fit_scale_x = 1.0 / (image_aspect / film_aspect)
+        fit_scale_y = 1.0
+        size_y = top - bottom
+        size_x = size_y * image_aspect
+    elif film_fit == FILM_FIT_FILL:
+        if film_wider:
+            fit_scale_x = film_aspect / image_aspect
+            fit_scale_y = 1.0
+            size_y = top - bottom
+            size_x = size_y * image_aspect
+        else:
+            fit_scale_x = 1.0
+            fit_scale_y = image_aspect / film_aspect
+            size_x = right - left
+            size_y = (size_x * (film_aspect / image_aspect)) / film_aspect
+    elif film_fit == FILM_FIT_OVERSCAN:
+        if film_wider:
+            fit_scale_x = 1.0
+            fit_scale_y = image_aspect / film_aspect
+            size_x = right - left
+            size_y = (right - left) / image_aspect
+        else:
+            fit_scale_x = film_aspect / image_aspect
+            fit_scale_y = 1.0
+            size_x = (right - left) * (image_aspect / film_aspect)
+            size_y = top - bottom
+    else:
+        # Horizontal (and the default).
+        fit_scale_x = 1.0
+        fit_scale_y = image_aspect / film_aspect
+        size_x = right - left
+        size_y = size_x / image_aspect
+
+    # Projection matrix, matching 'computeProjectionMatrix'.
+    #
+    # Scaling the frustum coordinates by the film fit does not change
+    # '(right + left) / (right - left)', so the un-scaled values are
+    # used.
+    scale_x = 1.0 / (size_x * 0.5) * MM_TO_CM
+    scale_y = 1.0 / (size_y * 0.5) * MM_TO_CM
+    offset_x = (right + left) / (right - left) * fit_scale_x
+    offset_y = (top + bottom) / (top - bottom) * fit_scale_y
+    return scale_x, scale_y, offset_x, offset_y
+
+
+def _invert_matrix_raw(m):
+    """
+    Invert a 4x4 matrix (16 floats), with Gauss-Jordan elimination.
+
+    Uses standard python functions only.
+    """
+    a = [[float(m[(r * 4) + c]) for c in range(4)]
+         + [1.0 if r == c else 0.0 for c in range(4)]
+         for r in range(4)]
+    for col in range(4):
+        pivot = max(range(col, 4), key=lambda r: abs(a[r][col]))
+        if a[pivot][col] == 0.0:
+            raise ValueError('Matrix is not invertible; m=%r' % (m, ))
+        a[col], a[pivot] = a[pivot], a[col]
+        inv_p = 1.0 / a[col][col]
+        a[col] = [v * inv_p for v in a[col]]
+        for r in range(4):
+            if r == col:
+                continue
+            f = a[r][col]
+            if f != 0.0:
+                a[r] = [v - (f * w) for v, w in zip(a[r], a[col])]
+    return [a[r][4 + c] for r in range(4) for c in range(4)]
+
+
+def _broadcast(value, num):
+    """
+    Convert a single value, or a sequence of values, into a list of
+    values, 'num' long.
+    """
+    if isinstance(value, (list, tuple)):
+        assert len(value) == num
+        return list(value)
+    return [value] * num
+
+
+def _reproject_points_raw(points, camera_matrices,
+                          focal_lengths,
+                          film_back_widths, film_back_heights,
+                          film_offset_xs, film_offset_ys,
+                          image_width, image_height,
+                          film_fit, near_clip_plane, camera_scale):
+    """
+    Reproject each point into screen-space (-1.0 to 1.0).
+
+    Uses standard python functions only.
+    """
+    num = len(points)
+    assert len(camera_matrices) == num
+    focal_lengths = _broadcast(focal_lengths, num)
+    film_back_widths = _broadcast(film_back_widths, num)
+    film_back_heights = _broadcast(film_back_heights, num)
+    film_offset_xs = _broadcast(film_offset_xs, num)
+    film_offset_ys = _broadcast(film_offset_ys, num)
+
+    # Cameras are often shared between many points, so only invert
+    # each camera matrix once.
+    inverse_cache = {}
+    coords = []
+    for i in range(num):
+        cam_matrix = tuple(camera_matrices[i])
+        inv = inverse_cache.get(cam_matrix)
+        if inv is None:
+            inv = _invert_matrix_raw(cam_matrix)
+            inverse_cache[cam_matrix] = inv
+        px, py, pz = points[i][0], points[i][1], points[i][2]
+        x = (px * inv[0]) + (py * inv[4]) + (pz * inv[8]) + inv[12]
+        y = (px * inv[1]) + (py * inv[5]) + (pz * inv[9]) + inv[13]
+        z = (px * inv[2]) + (py * inv[6]) + (pz * inv[10]) + inv[14]
+        w = (px * inv[3]) + (py * inv[7]) + (pz * inv[11]) + inv[15]
+        x /= w
+        y /= w
+        z /= w
+
+        scale_x, scale_y, offset_x, offset_y = _get_projection_values(
+            focal_lengths[i],
+            film_back_widths[i], film_back_heights[i],
+            film_offset_xs[i], film_offset_ys[i],
+            image_width, image_height,
+            film_fit, near_clip_plane, camera_scale)
+        coord_x = ((x * scale_x) / -z) - offset_x
+        coord_y = ((y * scale_y) / -z) - offset_y
+        coords.append((coord_x, coord_y))
+    return coords
+
+
+def _reproject_points_numpy(points, camera_matrices,
+                            focal_lengths,
+                            film_back_widths, film_back_heights,
+                            film_offset_xs, film_offset_ys,
+                            image_width, image_height,
+                            film_fit, near_clip_plane, camera_scale):
+    """
+    Reproject all points into screen-space (-1.0 to 1.0) at once.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    camera_matrices = np.asarray(camera_matrices, dtype=np.float64)
+    camera_matrices = camera_matrices.reshape(-1, 4, 4)
+    num = points.shape[0]
+    assert camera_matrices.shape[0] == num
+    if num == 0:
+        return np.zeros((0, 2), dtype=np.float64)
+
+    # Row vector points, multiplied by the inverse camera matrix,
+    # matching Maya's 'point * matrix' convention.
+    inv = np.linalg.inv(camera_matrices)
+    points_h = np.concatenate(
+        [points, np.ones((num, 1), dtype=np.float64)], axis=1)
+    cam_points = np.einsum('ni,nij->nj', points_h, inv)
+    cam_points = cam_points[:, :3] / cam_points[:, 3:4]
+
+    focal_lengths = np.broadcast_to(
+        np.asarray(focal_lengths, dtype=np.float64), (num, ))
+    film_back_widths = np.broadcast_to(
+        np.asarray(film_back_widths, dtype=np.float64), (num, ))
+    film_back_heights = np.broadcast_to(
+        np.asarray(film_back_heights, dtype=np.float64), (num, ))
+    film_offset_xs = np.broadcast_to(
+        np.asarray(film_offset_xs, dtype=np.float64), (num, ))
+    film_offset_ys = np.broadcast_to(
+        np.asarray(film_offset_ys, dtype=np.float64), (num, ))
+
+    # The film fit branches only depend on the film aspect ratio
+    # being wider than the image aspect ratio (or not), so each case
+    # is computed separately.
+    scale_x = np.zeros(num, dtype=np.float64)
+    scale_y = np.zeros(num, dtype=np.float64)
+    offset_x = np.zeros(num, dtype=np.float64)
+    offset_y = np.zeros(num, dtype=np.float64)
+    film_aspects = film_back_widths / film_back_heights
+    image_aspect = float(image_width) / float(image_height)
+    film_wider = film_aspects > image_aspect
+    for wider in (True, False):
+        mask = film_wider == wider
+        if not np.any(mask):
+            continue
+        values = _get_projection_values(
+            focal_lengths[mask],
+            film_back_widths[mask], film_back_heights[mask],
+            film_offset_xs[mask], film_offset_ys[mask],
+            image_width, image_height,
+            film_fit, near_clip_plane, camera_scale,
+            film_wider=wider)
+        scale_x[mask] = values[0]
+        scale_y[mask] = values[1]
+        offset_x[mask] = values[2]
+        offset_y[mask] = values[3]
+
+    z = -cam_points[:, 2]
+    coords = np.empty((num, 2), dtype=np.float64)
+    coords[:, 0] = ((cam_points[:, 0] * scale_x) / z) - offset_x
+    coords[:, 1] = ((cam_points[:, 1] * scale_y) / z) - offset_y
+    return coords
+
+
+def reproject_points(points, camera_matrices,
+                     focal_lengths,
+                     film_back_widths, film_back_heights,
+                     film_offset_xs, film_offset_ys,
+                     image_width, image_height,
+                     film_fit=None,
+                     near_clip_plane=None,
+                     camera_scale=None,
+                     as_pixel_coordinate=None):
+    """
+    Reproject 3D world-space points onto camera film backs.
+
+    Each point is reprojected with the camera matrix and camera
+    attribute values at the same index; for example each point is a
+    Bundle position on a frame, and the camera values are evaluated
+    at the same frame.
+
+    The camera attributes may be given as a single value (used for
+    all points) or as a list of values with one value per point.
+
+    :param points: World-space 3D points.
+    :type points: [(float, float, float), ..]
+
+    :param camera_matrices: Camera world matrix, for each point.
+    :type camera_matrices: [[float, ..], ..]
+
+    :param focal_lengths: Focal length, in millimetres.
+    :type focal_lengths: float or [float, ..]
+
+    :param film_back_widths: Film back width, in inches.
+    :type film_back_widths: float or [float, ..]
+
+    :param film_back_heights: Film back height, in inches.
+    :type film_back_heights: float or [float, ..]
+
+    :param film_offset_xs: Film back offset X, in inches.
+    :type film_offset_xs: float or [float, ..]
+
+    :param film_offset_ys: Film back offset Y, in inches.
+    :type film_offset_ys: float or [float, ..]
+
+    :param image_width: The width of the image, in pixels.
+    :type image_width: float
+
+    :param image_height: The height of the image, in pixels.
+    :type image_height: float
+
+    :param film_fit: The camera Film Fit, one of FILM_FIT_LIST.
+                     Default is DEFAULT_FILM_FIT.
+    :type film_fit: int
+
+    :param near_clip_plane: The camera near clipping plane.
+                            Default is DEFAULT_NEAR_CLIP_PLANE.
+    :type near_clip_plane: float
+
+    :param camera_scale: The camera scale. Default is
+                         DEFAULT_CAMERA_SCALE.
+    :type camera_scale: float
+
+    :param as_pixel_coordinate: Return pixel coordinates (0.0 to
+                                width/height), rather than
+                                screen-space coordinates (-1.0 to
+                                1.0). Lower-left corner is the
+                                minimum value.
+    :type as_pixel_coordinate: bool
+
+    :returns: The 2D coordinate for each point.
+    :rtype: [(float, float), ..]
+    """
+    if film_fit is None:
+        film_fit = DEFAULT_FILM_FIT
+    if near_clip_plane is None:
+        near_clip_plane = DEFAULT_NEAR_CLIP_PLANE
+    if camera_scale is None:
+        camera_scale = DEFAULT_CAMERA_SCALE
+    if as_pixel_coordinate is None:
+        as_pixel_coordinate = False
+    assert film_fit in FILM_FIT_LIST
+    assert isinstance(as_pixel_coordinate, bool)
+    assert len(points) == len(camera_matrices)
+    if len(points) == 0:
+        return []
+
+    args = [points, camera_matrices,
+            focal_lengths,
+            film_back_widths, film_back_heights,
+            film_offset_xs, film_offset_ys,
+            image_width, image_height,
+            film_fit, near_clip_plane, camera_scale]
+    if np is not None:
+        coords = _reproject_points_numpy(*args)
+        if as_pixel_coordinate is True:
+            coords = (coords + 1.0) * 0.5
+            coords *= np.array([image_width, image_height], dtype=np.float64)
+        return [tuple(x) for x in coords.tolist()]
+
+    coords = _reproject_points_raw(*args)
+    if as_pixel_coordinate is True:
+        coords = [((x + 1.0) * 0.5 * image_width,
+                   (y + 1.0) * 0.5 * image_height)
+                  for x, y in coords]
+    return coords
+
+
+def _calculate_deviation_raw(coords_a, coords_b, weights, enabled):
+    """
+    Compute the 2D distance between coordinates.
+
+    Uses standard python functions only.
+    """
+    deviation = []
+    iterator = zip(coords_a, coords_b, weights, enabled)
+    for (ax, ay), (bx, by), weight, enable in iterator:
+        if enable <= 0 or weight <= 0.0:
+            deviation.append(None)
+            continue
+        dx = ax - bx
+        dy = ay - by
+        deviation.append(math.sqrt((dx * dx) + (dy * dy)))
+    return deviation
+
+
+def _calculate_deviation_numpy(coords_a, coords_b, weights, enabled):
+    """
+    Compute the 2D distance between coordinates, all at once.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    coords_a = np.asarray(coords_a, dtype=np.float64).reshape(-1, 2)
+    coords_b = np.asarray(coords_b, dtype=np.float64).reshape(-1, 2)
+    weights = np.asarray(weights, dtype=np.float64)
+    enabled = np.asarray(enabled, dtype=np.float64)
+    dist = np.linalg.norm(coords_a - coords_b, axis=1)
+    valid = (enabled > 0) & (weights > 0.0)
+    deviation = []
+    for is_valid, value in zip(valid.tolist(), dist.tolist()):
+        deviation.append(value if is_valid else None)
+    return deviation
+
+
+def calculate_deviation(coords_a, coords_b, weights=None, enabled=None):
+    """
+    Calculate the 2D distance (deviation) between pairs of coordinates.
+
+    For example, the reprojected pixel coordinate of a Marker and the
+    reprojected pixel coordinate of the Bundle, on each frame.
+
+    :param coords_a: First 2D coordinates.
+    :type coords_a: [(float, float), ..]
+
+    :param coords_b: Second 2D coordinates.
+    :type coords_b: [(float, float), ..]
+
+    :param weights: The weight of each coordinate pair; pairs with a
+                    weight of zero (or less) have no deviation. If
+                    None, all pairs are used.
+    :type weights: [float, ..] or None
+
+    :param enabled: The enabled state of each coordinate pair; pairs
+                    that are not enabled have no deviation. If None,
+                    all pairs are used.
+    :type enabled: [int, ..] or None
+
+    :returns: The deviation of each coordinate pair, or None if the
+              pair is not enabled or has no weight.
+    :rtype: [float or None, ..]
+    """
+    num = len(coords_a)
+    assert len(coords_b) == num
+    if weights is None:
+        weights = [1.0] * num
+    if enabled is None:
+        enabled = [1] * num
+    assert len(weights) == num
+    assert len(enabled) == num
+    if num == 0:
+        return []
+    if np is not None:
+        return _calculate_deviation_numpy(coords_a, coords_b, weights, enabled)
+    return _calculate_deviation_raw(coords_a, coords_b, weights, enabled)
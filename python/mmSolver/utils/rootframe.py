@@ -0,0 +1,406 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Array based Root Frame selection.
+
+This module is software agnostic and should not rely on any thirdparty
+software, however if numpy is available, an numpy-accelerated
+code-path will be used.
+
+Root frames are chosen from an 'enabled bitmap'; a table of Markers
+(rows) by frames (columns), where each value is True if the Marker is
+enabled on the frame. The bitmap is created once, then the frame
+coverage (number of enabled Markers on each frame) and the first and
+last enabled frame of each Marker are computed from the whole table
+at once.
+
+Example usage::
+
+  import mmSolver.utils.rootframe as rootframe_utils
+  enabled_frames_list = [
+      [1, 2, 3, 4, 5],  # Marker A
+      [3, 4, 5, 6, 7],  # Marker B
+  ]
+  bitmap = rootframe_utils.create_enabled_bitmap(
+      enabled_frames_list, 1, 7)
+  rootframe_utils.get_frame_coverage(bitmap)
+  # [1, 1, 2, 2, 2, 1, 1]
+  rootframe_utils.get_root_frames_greedy(
+      bitmap, 1, [2, 2], min_markers_per_frame=2)
+  # [3, 4]
+
+"""
+
+import sys
+
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Optimal 'range' function for Python 2
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+# Controls how close a frame is before it's considered too close to
+# use. If we choose root frames that are too close, there will not be
+# enough parallax in the solve and therefore a degenerate solve can be
+# created.
+ROOT_FRAME_CLOSE_NUM = 2
+
+
+def create_enabled_bitmap(enabled_frames_list, start_frame, end_frame):
+    """
+    Create a bitmap of Markers by frames, with the enabled frames
+    of each Marker set to True.
+
+    :param enabled_frames_list: The enabled frames of each Marker.
+    :type enabled_frames_list: [[int, ..], ..]
+
+    :param start_frame: The first frame of the bitmap.
+    :type start_frame: int
+
+    :param end_frame: The last frame of the bitmap.
+    :type end_frame: int
+
+    :returns: A boolean table, with one row per Marker and one column
+              per frame. Frames outside the start and end frame are
+              ignored. If numpy is available a numpy array is
+              returned, otherwise a list of lists.
+    :rtype: numpy.ndarray or [[bool, ..], ..]
+    """
+    assert end_frame >= start_frame
+    num_frames = (end_frame - start_frame) + 1
+    if np is not None:
+        bitmap = np.zeros((len(enabled_frames_list), num_frames), dtype=bool)
+        for i, enabled_frames in enumerate(enabled_frames_list):
+            indices = np.array(list(enabled_frames), dtype=np.int64)
+            indices -= start_frame
+            indices = indices[(indices >= 0) & (indices < num_frames)]
+            bitmap[i, indices] = True
+        return bitmap
+
+    bitmap = []
+    for enabled_frames in enabled_frames_list:
+        row = [False] * num_frames
+        for f in enabled_frames:
+            index = int(f) - start_frame
+            if 0 <= index < num_frames:
+                row[index] = True
+        bitmap.append(row)
+    return bitmap
+
+
+def _get_frame_coverage_raw(bitmap):
+    """
+    Uses standard python functions only.
+    """
+    if len(bitmap) == 0:
+        return []
+    return [sum(column) for column in zip(*bitmap)]
+
+
+def get_frame_coverage(bitmap):
+    """
+    Count the number of enabled Markers on each frame.
+
+    :param bitmap: Markers by frames enabled bitmap.
+    :type bitmap: numpy.ndarray or [[bool, ..], ..]
+
+    :returns: The number of enabled Markers, for each frame.
+    :rtype: [int, ..]
+    """
+    if np is not None:
+        bitmap = np.asarray(bitmap, dtype=bool)
+        if bitmap.shape[0] == 0:
+            return []
+        return bitmap.sum(axis=0).tolist()
+    return _get_frame_coverage_raw(bitmap)
+
+
+def get_marker_frame_ranges(bitmap, start_frame):
+    """
+    Get the first and last enabled frame of each Marker.
+
+    :param bitmap: Markers by frames enabled bitmap.
+    :type bitmap: numpy.ndarray or [[bool, ..], ..]
+
+    :param start_frame: The frame number of the first bitmap column.
+    :type start_frame: int
+
+    :returns: The first and last enabled frame of each Marker, or None
+              if the Marker is not enabled on any frame.
+    :rtype: [(int, int) or None, ..]
+    """
+    if np is not None:
+        bitmap = np.asarray(bitmap, dtype=bool)
+        if bitmap.shape[0] == 0:
+            return []
+        num_frames = bitmap.shape[1]
+        any_enabled = bitmap.any(axis=1)
+        first = np.argmax(bitmap, axis=1)
+        last = (num_frames - 1) - np.argmax(bitmap[:, ::-1], axis=1)
+        ranges = []
+        for has_frames, s, e in zip(any_enabled.tolist(),
+                                    first.tolist(), last.tolist()):
+            if has_frames is False:
+                ranges.append(None)
+            else:
+                ranges.append((start_frame + s, start_frame + e))
+        return ranges
+
+    ranges = []
+    for row in bitmap:
+        indices = [i for i, v in enumerate(row) if v]
+        if len(indices) == 0:
+            ranges.append(None)
+        else:
+            ranges.append((start_frame + indices[0],
+                           start_frame + indices[-1]))
+    return ranges
+
+
+def _get_enabled_indices(bitmap, marker_index):
+    if np is not None:
+        return np.nonzero(bitmap[marker_index])[0].tolist()
+    return [i for i, v in enumerate(bitmap[marker_index]) if v]
+
+
+def get_root_frames(bitmap, start_frame, min_frames_counts,
+                    close_num=None):
+    """
+    Choose root frames so each Marker is enabled on enough root
+    frames.
+
+    Each Marker (in order) chooses frames from its enabled frames,
+    preferring frames with the most other enabled Markers. Frames
+    are taken alternately from the start and end of the Marker's
+    frames, to get the most parallax, and frames too close to an
+    already chosen root frame are skipped (if other frames can be
+    chosen).
+
+    :param bitmap: Markers by frames enabled bitmap.
+    :type bitmap: numpy.ndarray or [[bool, ..], ..]
+
+    :param start_frame: The frame number of the first bitmap column.
+    :type start_frame: int
+
+    :param min_frames_counts: The minimum number of root frames
+                              needed by each Marker.
+    :type min_frames_counts: [int, ..]
+
+    :param close_num: Frames with-in this number of frames of another
+                      root frame are too close. Default is
+                      ROOT_FRAME_CLOSE_NUM.
+    :type close_num: int or None
+
+    :returns: Sorted root frame numbers.
+    :rtype: [int, ..]
+    """
+    if close_num is None:
+        close_num = ROOT_FRAME_CLOSE_NUM
+    assert len(bitmap) == len(min_frames_counts)
+    if np is not None:
+        bitmap = np.asarray(bitmap, dtype=bool)
+    coverage = get_frame_coverage(bitmap)
+
+    root_frames = set()
+    for marker_index, min_frames_count in enumerate(min_frames_counts):
+        # Group the Marker's enabled frames by the number of other
+        # Markers enabled on the same frame.
+        frames_by_count = dict()
+        for index in _get_enabled_indices(bitmap, marker_index):
+            count = coverage[index] - 1
+            if count >= (min_frames_count - 1):
+                frames_by_count.setdefault(count, []).append(
+                    start_frame + index)
+
+        mkr_frames = set()
+        for count in sorted(frames_by_count.keys(), reverse=True):
+            if len(mkr_frames) >= min_frames_count:
+                break
+            frame_keys = frames_by_count[count]
+            i = 0
+            while len(frame_keys) > 0:
+                if len(mkr_frames) >= min_frames_count:
+                    break
+                if (i % 2) == 0:
+                    f = frame_keys.pop(0)
+                else:
+                    f = frame_keys.pop(-1)
+
+                if len(frame_keys) > 0:
+                    # Only test if a frame is too near if we have a
+                    # choice of more frames.
+                    too_near = False
+                    for near_frame in range(f - close_num, f + close_num + 1):
+                        if near_frame in root_frames:
+                            too_near = True
+                            break
+                    if too_near is True:
+                        continue
+
+                mkr_frames.add(f)
+                root_frames.add(f)
+                i += 1
+    return list(sorted(root_frames))
+
+
+def _get_root_frames_greedy_raw(bitmap, needs, valid_frames, close_num):
+    """
+    Uses standard python functions only.
+    """
+    num_frames = len(valid_frames)
+    gains = [0] * num_frames
+    for row, need in zip(bitmap, needs):
+        if need > 0:
+            for i, v in enumerate(row):
+                if v:
+                    gains[i] += 1
+
+    chosen = [False] * num_frames
+    far = list(valid_frames)
+    root_indices = []
+    while True:
+        best_index = None
+        best_gain = 0
+        for candidates in (far, valid_frames):
+            for i in range(num_frames):
+                if candidates[i] and not chosen[i] and gains[i] > best_gain:
+                    best_index = i
+                    best_gain = gains[i]
+            if best_index is not None:
+                break
+        if best_index is None:
+            break
+
+        chosen[best_index] = True
+        root_indices.append(best_index)
+        start = max(0, best_index - close_num)
+        end = min(num_frames, best_index + close_num + 1)
+        for i in range(start, end):
+            far[i] = False
+        for marker_index, row in enumerate(bitmap):
+            if needs[marker_index] > 0 and row[best_index]:
+                needs[marker_index] -= 1
+                if needs[marker_index] == 0:
+                    # The Marker is satisfied, and no longer adds to
+                    # the gain of any frame.
+                    for i, v in enumerate(row):
+                        if v:
+                            gains[i] -= 1
+    return root_indices
+
+
+def _get_root_frames_greedy_numpy(bitmap, needs, valid_frames, close_num):
+    """
+    Uses the numpy module.
+    """
+    assert np is not None
+    num_frames = bitmap.shape[1]
+    needs = np.array(needs, dtype=np.int64)
+    gains = bitmap[needs > 0].sum(axis=0).astype(np.int64)
+
+    valid_frames = np.array(valid_frames, dtype=bool)
+    chosen = np.zeros(num_frames, dtype=bool)
+    far = valid_frames.copy()
+    root_indices = []
+    while True:
+        best_index = None
+        for candidates in (far, valid_frames):
+            masked_gains = np.where(candidates & ~chosen, gains, 0)
+            index = int(np.argmax(masked_gains))
+            if masked_gains[index] > 0:
+                best_index = index
+                break
+        if best_index is None:
+            break
+
+        chosen[best_index] = True
+        root_indices.append(best_index)
+        start = max(0, best_index - close_num)
+        end = min(num_frames, best_index + close_num + 1)
+        far[start:end] = False
+
+        covered = bitmap[:, best_index] & (needs > 0)
+        needs[covered] -= 1
+        done = covered & (needs == 0)
+        if np.any(done):
+            # Satisfied Markers no longer add to the gain of any frame.
+            gains -= bitmap[done].sum(axis=0)
+    return root_indices
+
+
+def get_root_frames_greedy(bitmap, start_frame, min_frames_counts,
+                           min_markers_per_frame=None,
+                           close_num=None):
+    """
+    Choose (close to) the fewest root frames so each Marker is
+    enabled on enough root frames.
+
+    Frames are chosen greedily; the next root frame is the frame that
+    is enabled for the most Markers still needing root frames.
+    Frames with fewer than 'min_markers_per_frame' enabled Markers are
+    never chosen, and frames too close to an already chosen root frame
+    are only chosen when no other frame adds to the solve.
+
+    :param bitmap: Markers by frames enabled bitmap.
+    :type bitmap: numpy.ndarray or [[bool, ..], ..]
+
+    :param start_frame: The frame number of the first bitmap column.
+    :type start_frame: int
+
+    :param min_frames_counts: The minimum number of root frames
+                              needed by each Marker.
+    :type min_frames_counts: [int, ..]
+
+    :param min_markers_per_frame: The minimum number of enabled
+                                  Markers on a root frame. Default
+                                  is 1.
+    :type min_markers_per_frame: int or None
+
+    :param close_num: Frames with-in this number of frames of another
+                      root frame are too close. Default is
+                      ROOT_FRAME_CLOSE_NUM.
+    :type close_num: int or None
+
+    :returns: Sorted root frame numbers. Markers without enough valid
+              enabled frames may have fewer root frames than needed.
+    :rtype: [int, ..]
+    """
+    if close_num is None:
+        close_num = ROOT_FRAME_CLOSE_NUM
+    if min_markers_per_frame is None:
+        min_markers_per_frame = 1
+    assert len(bitmap) == len(min_frames_counts)
+    if len(bitmap) == 0:
+        return []
+    needs = [max(0, int(x)) for x in min_frames_counts]
+    coverage = get_frame_coverage(bitmap)
+    valid_frames = [c >= min_markers_per_frame for c in coverage]
+    if np is not None:
+        bitmap = np.asarray(bitmap, dtype=bool)
+        root_indices = _get_root_frames_greedy_numpy(
+            bitmap, needs, valid_frames, close_num)
+    else:
+        root_indices = _get_root_frames_greedy_raw(
+            bitmap, needs, valid_frames, close_num)
+    return list(sorted([start_frame + i for i in root_indices]))
@@ -0,0 +1,426 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Lightweight tracing of nested stages, such as the stages of a solve.
+
+This module is software agnostic and should not rely on any thirdparty
+software.
+
+Tracing is disabled by default; when disabled, creating a span costs
+a single function call and returns a shared object that does nothing.
+Tracing can be enabled with :func:`set_enabled`, or by setting the
+'MMSOLVER_TRACE' environment variable to '1' before the module is
+imported.
+
+Recorded spans can be exported as a Chrome trace (open with
+'chrome://tracing' or https://ui.perfetto.dev) or a speedscope file
+(https://www.speedscope.app), or summarised as a table of the time
+spent in each stage.
+
+Example usage::
+
+  import mmSolver.utils.trace as trace
+  trace.set_enabled(True)
+  with trace.span('compile', category='execute'):
+      with trace.span('validate', frames=10):
+          pass
+  trace.write_chrome_trace('/path/to/solve.trace.json')
+  print(trace.format_stage_table())
+  trace.clear()
+
+"""
+
+from __future__ import absolute_import
+
+import os
+import json
+import time
+import threading
+
+# Name of the environment variable used to enable tracing.
+ENV_VAR_NAME_TRACE = 'MMSOLVER_TRACE'
+
+# Default category of a span.
+DEFAULT_CATEGORY = 'mmSolver'
+
+# Timer used to measure spans, in seconds.
+if hasattr(time, 'perf_counter'):
+    _timer = time.perf_counter
+else:
+    _timer = time.time
+
+__TRACE_STATE = {
+    'enabled': os.environ.get(ENV_VAR_NAME_TRACE, '0') == '1',
+    # Recorded spans, in the order they finished.
+    'spans': [],
+    # The time all span start times are relative to.
+    'origin': _timer(),
+}
+
+# The depth of the open spans, per-thread.
+__THREAD_STATE = threading.local()
+
+
+class _NullSpan(object):
+    """
+    A span that does nothing, used when tracing is disabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+    def set_args(self, **kwargs):
+        return
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span(object):
+    """
+    A timed, named, stage; used as a context manager.
+    """
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = None
+        self.duration = None
+        self.depth = None
+        self.thread_id = None
+
+    def __enter__(self):
+        self.depth = _push_depth()
+        self.thread_id = threading.current_thread().ident
+        self.start = _timer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.duration = _timer() - self.start
+        _pop_depth()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        _record_span(self)
+        return False
+
+    def set_args(self, **kwargs):
+        """
+        Add (or replace) arguments stored with the span.
+        """
+        self.args.update(kwargs)
+        return
+
+
+def _push_depth():
+    depth = getattr(__THREAD_STATE, 'depth', 0)
+    __THREAD_STATE.depth = depth + 1
+    return depth
+
+
+def _pop_depth():
+    __THREAD_STATE.depth = getattr(__THREAD_STATE, 'depth', 1) - 1
+    return
+
+
+def _record_span(span_obj):
+    __TRACE_STATE['spans'].append(span_obj)
+    return
+
+
+def is_enabled():
+    """
+    Is tracing enabled?
+
+    :rtype: bool
+    """
+    return __TRACE_STATE['enabled']
+
+
+def set_enabled(value):
+    """
+    Enable or disable tracing.
+
+    :param value: Enable tracing?
+    :type value: bool
+    """
+    assert isinstance(value, bool)
+    __TRACE_STATE['enabled'] = value
+    return
+
+
+def span(name, category=None, **kwargs):
+    """
+    Create a span to time a stage, used as a context manager.
+
+    :param name: Name of the stage.
+    :type name: str
+
+    :param category: Category of the stage, used to group and filter
+                     stages in trace viewers.
+    :type category: str or None
+
+    :param kwargs: Arguments stored with the span, must be JSON
+                   serializable.
+
+    :returns: A context manager; when tracing is disabled the context
+              manager does nothing.
+    :rtype: Span
+    """
+    if __TRACE_STATE['enabled'] is False:
+        return _NULL_SPAN
+    if category is None:
+        category = DEFAULT_CATEGORY
+    return Span(name, category, kwargs)
+
+
+def get_spans():
+    """
+    Get all recorded spans, in the order they finished.
+
+    :rtype: [Span, ..]
+    """
+    return list(__TRACE_STATE['spans'])
+
+
+def clear():
+    """
+    Remove all recorded spans.
+    """
+    __TRACE_STATE['spans'] = []
+    __TRACE_STATE['origin'] = _timer()
+    return
+
+
+def _to_microseconds(value):
+    return value * 1000000.0
+
+
+def get_chrome_trace(spans=None):
+    """
+    Convert spans into the Chrome 'Trace Event Format'.
+
+    :param spans: The spans to convert, or None to use all recorded
+                  spans.
+    :type spans: [Span, ..] or None
+
+    :returns: A JSON serializable Chrome trace.
+    :rtype: dict
+    """
+    if spans is None:
+        spans = get_spans()
+    origin = __TRACE_STATE['origin']
+    pid = os.getpid()
+    events = []
+    for s in spans:
+        events.append({
+            'name': s.name,
+            'cat': s.category,
+            'ph': 'X',
+            'ts': _to_microseconds(s.start - origin),
+            'dur': _to_microseconds(s.duration),
+            'pid': pid,
+            'tid': s.thread_id,
+            'args': s.args,
+        })
+    events.sort(key=lambda x: (x['tid'], x['ts']))
+    return {
+        'traceEvents': events,
+        'displayTimeUnit': 'ms',
+    }
+
+
+def get_speedscope(spans=None, name=None):
+    """
+    Convert spans into the speedscope 'evented' file format.
+
+    Each thread is stored as a separate profile.
+
+    :param spans: The spans to convert, or None to use all recorded
+                  spans.
+    :type spans: [Span, ..] or None
+
+    :param name: The name of the profile.
+    :type name: str or None
+
+    :returns: A JSON serializable speedscope profile.
+    :rtype: dict
+    """
+    if spans is None:
+        spans = get_spans()
+    if name is None:
+        name = DEFAULT_CATEGORY
+    origin = __TRACE_STATE['origin']
+
+    frames = []
+    frame_indices = dict()
+    thread_events = dict()
+    for s in spans:
+        frame_index = frame_indices.get(s.name)
+        if frame_index is None:
+            frame_index = len(frames)
+            frame_indices[s.name] = frame_index
+            frames.append({'name': s.name})
+        start = _to_microseconds(s.start - origin)
+        end = start + _to_microseconds(s.duration)
+        # Sort so that, at the same time, spans are closed before
+        # others are opened, parents open before children and
+        # children close before parents.
+        events = thread_events.setdefault(s.thread_id, [])
+        events.append(((start, 1, s.depth), 'O', frame_index, start))
+        events.append(((end, 0, -s.depth), 'C', frame_index, end))
+
+    profiles = []
+    for thread_id in sorted(thread_events.keys()):
+        events = sorted(thread_events[thread_id])
+        profiles.append({
+            'type': 'evented',
+            'name': '{0} (thread {1})'.format(name, thread_id),
+            'unit': 'microseconds',
+            'startValue': events[0][3],
+            'endValue': events[-1][3],
+            'events': [{'type': t, 'frame': f, 'at': at}
+                       for _, t, f, at in events],
+        })
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': profiles,
+        'name': name,
+        'exporter': 'mmSolver',
+    }
+
+
+def write_chrome_trace(file_path, spans=None):
+    """
+    Write spans to a Chrome trace JSON file.
+
+    :param file_path: The file path to write.
+    :type file_path: str
+
+    :param spans: The spans to write, or None to use all recorded
+                  spans.
+    :type spans: [Span, ..] or None
+    """
+    data = get_chrome_trace(spans=spans)
+    with open(file_path, 'w') as f:
+        json.dump(data, f)
+    return
+
+
+def write_speedscope(file_path, spans=None, name=None):
+    """
+    Write spans to a speedscope JSON file.
+
+    :param file_path: The file path to write.
+    :type file_path: str
+
+    :param spans: The spans to write, or None to use all recorded
+                  spans.
+    :type spans: [Span, ..] or None
+
+    :param name: The name of the profile.
+    :type name: str or None
+    """
+    data = get_speedscope(spans=spans, name=name)
+    with open(file_path, 'w') as f:
+        json.dump(data, f)
+    return
+
+
+def get_stage_table(spans=None):
+    """
+    Aggregate the time spent in each stage (span name).
+
+    The 'self' time of a span is the duration of the span, minus the
+    duration of the (direct) child spans.
+
+    :param spans: The spans to aggregate, or None to use all recorded
+                  spans.
+    :type spans: [Span, ..] or None
+
+    :returns: A row for each stage, sorted by the total time
+              (largest first). Each row is a dict with the keys
+              'name', 'count', 'total', 'self', 'mean', 'min' and
+              'max'. Times are in seconds.
+    :rtype: [dict, ..]
+    """
+    if spans is None:
+        spans = get_spans()
+
+    # Spans finish before their parents, so the duration of
+    # children is accumulated until the parent (one level less deep,
+    # on the same thread) finishes.
+    child_time = dict()
+    rows = dict()
+    for s in spans:
+        key = (s.thread_id, s.depth)
+        children = child_time.pop((s.thread_id, s.depth + 1), 0.0)
+        self_time = s.duration - children
+        child_time[key] = child_time.get(key, 0.0) + s.duration
+
+        row = rows.get(s.name)
+        if row is None:
+            row = {
+                'name': s.name,
+                'count': 0,
+                'total': 0.0,
+                'self': 0.0,
+                'min': s.duration,
+                'max': s.duration,
+            }
+            rows[s.name] = row
+        row['count'] += 1
+        row['total'] += s.duration
+        row['self'] += self_time
+        row['min'] = min(row['min'], s.duration)
+        row['max'] = max(row['max'], s.duration)
+
+    table = []
+    for row in rows.values():
+        row['mean'] = row['total'] / row['count']
+        table.append(row)
+    table.sort(key=lambda x: x['total'], reverse=True)
+    return table
+
+
+def format_stage_table(spans=None):
+    """
+    Format the time spent in each stage as a text table.
+
+    :param spans: The spans to aggregate, or None to use all recorded
+                  spans.
+    :type spans: [Span, ..] or None
+
+    :rtype: str
+    """
+    table = get_stage_table(spans=spans)
+    name_width = max([len('Stage')] + [len(row['name']) for row in table])
+    header = '{0:<{w}} {1:>7} {2:>10} {3:>10} {4:>10} {5:>10} {6:>10}'
+    line = '{0:<{w}} {1:>7d} {2:>10.4f} {3:>10.4f} {4:>10.4f} {5:>10.4f} {6:>10.4f}'
+    lines = [header.format(
+        'Stage', 'Count', 'Total (s)', 'Self (s)',
+        'Mean (s)', 'Min (s)', 'Max (s)', w=name_width)]
+    for row in table:
+        lines.append(line.format(
+            row['name'], row['count'], row['total'], row['self'],
+            row['mean'], row['min'], row['max'], w=name_width))
+    return '\n'.join(lines)
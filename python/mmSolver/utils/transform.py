@@ -39,6 +39,8 @@ import maya.api.OpenMaya as OpenMaya2
 import mmSolver.logger
 import mmSolver.utils.node as node_utils
 import mmSolver.utils.animcurve as animcurve_utils
+import mmSolver.utils.eulerfilter as eulerfilter_utils
+import mmSolver.utils.undo as undo_utils
 import mmSolver.utils.constant as const
 
 
@@ -754,6 +756,11 @@ def set_transform_values(tfm_matrix_cache,
        The function assumes the given destination node has no locked
        attributes.
 
+    .. note::
+       All values are computed first, then each attribute's keyframes
+       are set with animcurve.set_anim_curve_keys, which can be
+       undone. Existing keyframes outside of 'times' are kept.
+
     :param tfm_matrix_cache: A cache holding queried matrix values.
     :type tfm_matrix_cache: TransformMatrixCache
 
@@ -790,7 +797,6 @@ def set_transform_values(tfm_matrix_cache,
     assert eval_mode in const.EVAL_MODE_LIST
 
     current_frame = maya.cmds.currentTime(query=True)
-    space = OpenMaya2.MSpace.kWorld
     attrs = [
         'translateX', 'translateY', 'translateZ',
         'rotateX', 'rotateY', 'rotateZ',
@@ -824,9 +830,9 @@ def set_transform_values(tfm_matrix_cache,
         rotate_order=rotate_order)
     assert len(world_mat_list) == len(times)
 
-    # Set transform
+    # Decompose all transforms into per-attribute value lists.
     dst_node = dst_tfm_node.get_node()
-    prv_rot = None
+    attr_values = [[] for _ in attrs]
     for t, world_mat in zip(times, world_mat_list):
         assert t is not None
         assert world_mat is not None
@@ -851,35 +857,24 @@ def set_transform_values(tfm_matrix_cache,
         local_mat = OpenMaya2.MTransformationMatrix(local_mat)
         local_mat.reorderRotation(rotate_order_api)
 
-        # Decompose matrix into components
-        trans = local_mat.translation(space)
-        scl = local_mat.scale(space)
-        rot = local_mat.rotation(asQuaternion=False)
-
-        # Convert and clean rotation values
-        trans = (trans[0], trans[1], trans[2])
-        scl = (scl[0], scl[1], scl[2])
-        rot = (
-            math.degrees(rot[0]),
-            math.degrees(rot[1]),
-            math.degrees(rot[2])
-        )
-        if prv_rot is not None:
-            rot = (
-                animcurve_utils.euler_filter_value(prv_rot[0], rot[0]),
-                animcurve_utils.euler_filter_value(prv_rot[1], rot[1]),
-                animcurve_utils.euler_filter_value(prv_rot[2], rot[2])
-            )
-        prv_rot = rot
-
-        # Set Keyframes
-        values = trans + rot + scl
+        values = decompose_matrix(local_mat, None)
         assert len(attrs) == len(values)
-        for attr, v in zip(attrs, values):
-            maya.cmds.setKeyframe(dst_node, attribute=attr, time=t, value=v)
-
-    if delete_static_anim_curves is True:
-        maya.cmds.delete(dst_node, staticChannels=True)
+        for i, v in enumerate(values):
+            attr_values[i].append(v)
+
+    # Euler filter the rotation values, for all times at once.
+    for i in range(3, 6):
+        attr_values[i] = eulerfilter_utils.euler_filter_values(attr_values[i])
+
+    # Set Keyframes, with a few (undo-able) commands per attribute.
+    times = list(times)
+    with undo_utils.undo_chunk_context():
+        for attr, values in zip(attrs, attr_values):
+            plug = '{0}.{1}'.format(dst_node, attr)
+            animcurve_utils.set_anim_curve_keys(plug, times, values)
+
+        if delete_static_anim_curves is True:
+            maya.cmds.delete(dst_node, staticChannels=True)
 
     if eval_mode == const.EVAL_MODE_TIME_SWITCH_GET_ATTR:
         maya.cmds.currentTime(current_frame, update=True)
@@ -0,0 +1,323 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Least-squares N-view triangulation of 3D points.
+
+This module is software agnostic and should not rely on any thirdparty
+software, however if numpy is available, an numpy-accelerated
+code-path will be used.
+
+Each 3D point is observed by any number of rays (for example, a camera
+centre and the direction towards a Marker, on every frame the Marker
+is enabled). The triangulated point is the position with the smallest
+sum of squared (perpendicular) distances to all the rays. Rays that
+are much further from the solved point than the others are rejected
+as outliers, and the point is solved again.
+
+With numpy, the rays of all points are solved together in one
+vectorized pass.
+
+Example usage::
+
+  import mmSolver.utils.triangulate as triangulate
+  rays = [
+      # Rays for the first point; origins and directions.
+      ([(0.0, 0.0, 10.0), (10.0, 0.0, 0.0)],
+       [(0.0, 0.0, -1.0), (-1.0, 0.0, 0.0)]),
+  ]
+  points = triangulate.triangulate_points(rays)
+  # [(0.0, 0.0, 0.0)]
+
+"""
+
+import math
+import sys
+
+# NumPy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Optimal 'range' function for Python 2
+if sys.version_info[0] == 2:
+    range = xrange
+
+
+# Rays further than this multiple of the median ray distance from the
+# solved point are rejected as outliers.
+TRIANGULATE_OUTLIER_RATIO = 3.0
+
+# The number of times outliers are rejected and the points re-solved.
+TRIANGULATE_OUTLIER_ITERATIONS = 3
+
+# The smallest ray distance considered for outlier rejection, this
+# stops rays being rejected when all rays (nearly) intersect.
+TRIANGULATE_MIN_OUTLIER_DISTANCE = 1e-6
+
+# Used to detect (nearly) parallel rays, where the point cannot be
+# triangulated.
+TRIANGULATE_EPSILON = 1e-9
+
+
+def _normalize(v):
+    length = math.sqrt((v[0] * v[0]) + (v[1] * v[1]) + (v[2] * v[2]))
+    if length == 0.0:
+        return None
+    return (v[0] / length, v[1] / length, v[2] / length)
+
+
+def _solve_point_raw(origins, directions):
+    """
+    Solve the point closest to all rays.
+
+    The normal equations are 'A * p = b', where 'A = sum(I - d*d^T)'
+    and 'b = sum((I - d*d^T) * o)', for each ray origin 'o' and
+    (normalized) direction 'd'.
+
+    Uses standard python functions only.
+    """
+    a = [[0.0] * 3 for _ in range(3)]
+    b = [0.0] * 3
+    for o, d in zip(origins, directions):
+        for i in range(3):
+            for j in range(3):
+                m = (1.0 if i == j else 0.0) - (d[i] * d[j])
+                a[i][j] += m
+                b[i] += m * o[j]
+
+    # Solve 3x3 linear system with Cramer's rule.
+    det = (a[0][0] * ((a[1][1] * a[2][2]) - (a[1][2] * a[2][1]))
+           - a[0][1] * ((a[1][0] * a[2][2]) - (a[1][2] * a[2][0]))
+           + a[0][2] * ((a[1][0] * a[2][1]) - (a[1][1] * a[2][0])))
+    scale = (a[0][0] + a[1][1] + a[2][2]) ** 3
+    if scale == 0.0 or abs(det) < (TRIANGULATE_EPSILON * scale):
+        return None
+    point = []
+    for k in range(3):
+        m = [list(row) for row in a]
+        for i in range(3):
+            m[i][k] = b[i]
+        det_k = (m[0][0] * ((m[1][1] * m[2][2]) - (m[1][2] * m[2][1]))
+                 - m[0][1] * ((m[1][0] * m[2][2]) - (m[1][2] * m[2][0]))
+                 + m[0][2] * ((m[1][0] * m[2][1]) - (m[1][1] * m[2][0])))
+        point.append(det_k / det)
+    return tuple(point)
+
+
+def _ray_distance_raw(point, origin, direction):
+    """
+    The perpendicular distance from a point to a ray, and the ray
+    parameter of the closest point on the ray.
+    """
+    v = (point[0] - origin[0], point[1] - origin[1], point[2] - origin[2])
+    t = (v[0] * direction[0]) + (v[1] * direction[1]) + (v[2] * direction[2])
+    p = (v[0] - (t * direction[0]),
+         v[1] - (t * direction[1]),
+         v[2] - (t * direction[2]))
+    dist = math.sqrt((p[0] * p[0]) + (p[1] * p[1]) + (p[2] * p[2]))
+    return dist, t
+
+
+def _median(values):
+    values = sorted(values)
+    n = len(values)
+    mid = n // 2
+    if n % 2 == 1:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) * 0.5
+
+
+def _triangulate_points_raw(rays, outlier_ratio, outlier_iterations):
+    """
+    Triangulate each point, one at a time.
+
+    Uses standard python functions only.
+    """
+    points = []
+    for origins, directions in rays:
+        valid = []
+        for o, d in zip(origins, directions):
+            d = _normalize(d)
+            if d is not None:
+                valid.append((tuple(o), d))
+
+        point = None
+        for iteration in range(outlier_iterations + 1):
+            if len(valid) < 2:
+                point = None
+                break
+            point = _solve_point_raw(
+                [x[0] for x in valid],
+                [x[1] for x in valid])
+            if point is None or iteration == outlier_iterations:
+                break
+            dists = [_ray_distance_raw(point, o, d) for o, d in valid]
+            threshold = max(
+                _median([x[0] for x in dists]) * outlier_ratio,
+                TRIANGULATE_MIN_OUTLIER_DISTANCE)
+            inliers = [ray for ray, (dist, t) in zip(valid, dists)
+                       if dist <= threshold and t > 0.0]
+            if len(inliers) == len(valid):
+                break
+            valid = inliers
+        points.append(point)
+    return points
+
+
+def _group_medians(values, group_index, mask, num_groups):
+    """
+    The median of the (masked) values in each group.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    indices = np.nonzero(mask)[0]
+    order = indices[np.lexsort((values[indices], group_index[indices]))]
+    sorted_values = values[order]
+    counts = np.bincount(group_index[order], minlength=num_groups)
+    medians = np.zeros(num_groups, dtype=np.float64)
+    has_values = counts > 0
+    if not np.any(has_values):
+        return medians
+    starts = np.cumsum(counts) - counts
+    low = (starts + ((counts - 1) // 2))[has_values]
+    high = (starts + (counts // 2))[has_values]
+    medians[has_values] = (sorted_values[low] + sorted_values[high]) * 0.5
+    return medians
+
+
+def _triangulate_points_numpy(rays, outlier_ratio, outlier_iterations):
+    """
+    Triangulate all points at once.
+
+    All rays are flattened into a single array, with the index of the
+    point each ray belongs to; the normal equations of all points are
+    accumulated and solved together.
+
+    Uses the numpy module.
+    """
+    assert np is not None
+    num_points = len(rays)
+    ray_counts = [min(len(o), len(d)) for o, d in rays]
+    num_rays = sum(ray_counts)
+    if num_rays == 0:
+        return [None] * num_points
+
+    origins = np.zeros((num_rays, 3), dtype=np.float64)
+    directions = np.zeros((num_rays, 3), dtype=np.float64)
+    offset = 0
+    for (o, d), count in zip(rays, ray_counts):
+        if count == 0:
+            continue
+        origins[offset:offset + count] = np.array(o, dtype=np.float64)[:count, :3]
+        directions[offset:offset + count] = np.array(d, dtype=np.float64)[:count, :3]
+        offset += count
+    point_index = np.repeat(np.arange(num_points), ray_counts)
+
+    lengths = np.linalg.norm(directions, axis=1)
+    active = lengths > 0.0
+    directions[active] /= lengths[active, np.newaxis]
+
+    # Per-ray projection matrices, 'I - d*d^T', and 'b' vectors.
+    proj = np.eye(3)[np.newaxis] - (directions[:, :, np.newaxis]
+                                    * directions[:, np.newaxis, :])
+    proj_origins = np.einsum('nij,nj->ni', proj, origins)
+
+    points = np.zeros((num_points, 3), dtype=np.float64)
+    solved = np.zeros(num_points, dtype=bool)
+    for iteration in range(outlier_iterations + 1):
+        a = np.zeros((num_points, 3, 3), dtype=np.float64)
+        b = np.zeros((num_points, 3), dtype=np.float64)
+        np.add.at(a, point_index[active], proj[active])
+        np.add.at(b, point_index[active], proj_origins[active])
+        counts = np.bincount(point_index[active], minlength=num_points)
+
+        det = np.linalg.det(a)
+        scale = np.trace(a, axis1=1, axis2=2) ** 3
+        solved = ((counts >= 2)
+                  & (scale > 0.0)
+                  & (np.abs(det) >= (TRIANGULATE_EPSILON * scale)))
+        points[:] = 0.0
+        if np.any(solved):
+            points[solved] = np.linalg.solve(
+                a[solved], b[solved][:, :, np.newaxis])[:, :, 0]
+        if iteration == outlier_iterations:
+            break
+
+        # Reject outliers, based on the distance of each ray to the
+        # solved point, and rays with the point behind the origin.
+        vec = points[point_index] - origins
+        t = np.einsum('ni,ni->n', vec, directions)
+        dists = np.linalg.norm(vec - (t[:, np.newaxis] * directions), axis=1)
+        medians = _group_medians(dists, point_index, active, num_points)
+        threshold = np.maximum(
+            medians * outlier_ratio,
+            TRIANGULATE_MIN_OUTLIER_DISTANCE)
+        outlier = (active
+                   & solved[point_index]
+                   & ((dists > threshold[point_index]) | (t <= 0.0)))
+        if not np.any(outlier):
+            break
+        active &= ~outlier
+
+    result = []
+    for is_solved, point in zip(solved.tolist(), points.tolist()):
+        result.append(tuple(point) if is_solved else None)
+    return result
+
+
+def triangulate_points(rays, outlier_ratio=None, outlier_iterations=None):
+    """
+    Triangulate 3D points from rays.
+
+    :param rays: For each point to triangulate, a tuple of the ray
+                 origins and the ray directions. Directions do not
+                 need to be normalized.
+    :type rays: [([(float, float, float), ..], [(float, float, float), ..]), ..]
+
+    :param outlier_ratio: Rays further from the triangulated point than
+                          this multiple of the median ray distance are
+                          rejected, as are rays with the point behind
+                          the origin. Default is
+                          TRIANGULATE_OUTLIER_RATIO.
+    :type outlier_ratio: float
+
+    :param outlier_iterations: The maximum number of times outliers are
+                               rejected and a point re-solved; 0
+                               disables outlier rejection. Default is
+                               TRIANGULATE_OUTLIER_ITERATIONS.
+    :type outlier_iterations: int
+
+    :returns: The triangulated point for each item in 'rays', or None
+              if the point could not be triangulated (less than two
+              rays, parallel rays, or too many outliers).
+    :rtype: [(float, float, float) or None, ..]
+    """
+    if outlier_ratio is None:
+        outlier_ratio = TRIANGULATE_OUTLIER_RATIO
+    if outlier_iterations is None:
+        outlier_iterations = TRIANGULATE_OUTLIER_ITERATIONS
+    assert outlier_iterations >= 0
+    if len(rays) == 0:
+        return []
+    if np is not None:
+        return _triangulate_points_numpy(
+            rays, outlier_ratio, outlier_iterations)
+    return _triangulate_points_raw(rays, outlier_ratio, outlier_iterations)
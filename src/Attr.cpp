@@ -615,6 +615,58 @@ MStatus Attr::setValue(const double value,
     return Attr::setValue(value, time, dgmod, animChange);
 }
 
+MStatus Attr::setValues(const MTimeArray &times,
+                        const MDoubleArray &values,
+                        MDGModifier &dgmod,
+                        MAnimCurveChange *animChange) {
+    MStatus status;
+    assert(times.length() == values.length());
+    const unsigned int count = values.length();
+    if (count == 0) {
+        return MS::kSuccess;
+    }
+    const bool connected = Attr::isConnected();
+    const bool animated = Attr::isAnimated();
+    MPlug plug = Attr::getPlug();
+
+    double factor = 1.0;
+    int attrType = Attr::getAttrType();
+    if (attrType == ATTR_DATA_TYPE_ANGLE) {
+        factor = m_angularFactorInv;
+    }
+
+    if (animated) {
+        MFnAnimCurve curveFn(plug, &status);
+        CHECK_MSTATUS_AND_RETURN_IT(status);
+        MDoubleArray curveValues(count);
+        for (unsigned int i = 0; i < count; ++i) {
+            curveValues[i] = values[i] * factor;
+        }
+        // Set all the keys in one call; keys at existing times are
+        // replaced and the other keys on the curve are kept.
+        const bool keepExistingKeys = true;
+        status = curveFn.addKeys(
+                &times, &curveValues,
+                MFnAnimCurve::kTangentGlobal,
+                MFnAnimCurve::kTangentGlobal,
+                keepExistingKeys,
+                animChange);
+        CHECK_MSTATUS_AND_RETURN_IT(status);
+    } else if (connected) {
+        MString name = Attr::getName();
+        MString plugName = plug.name(&status);
+        ERR("Dynamic attributes that aren't animated cannot be set; "
+                    << "name=" << name << " "
+                    << "plug=" << plugName);
+        CHECK_MSTATUS_AND_RETURN_IT(status);
+    } else {
+        // A static attribute has a single value, at any time.
+        dgmod.newPlugValueDouble(plug, values[count - 1] * factor);
+    }
+    status = MS::kSuccess;
+    return status;
+}
+
 double Attr::getMinimumValue() const {
     return m_minValue;
 }
@@ -27,6 +27,8 @@
 #include <maya/MString.h>
 #include <maya/MPlug.h>
 #include <maya/MTime.h>
+#include <maya/MTimeArray.h>
+#include <maya/MDoubleArray.h>
 #include <maya/MFnAnimCurve.h>
 #include <maya/MAnimControl.h>
 #include <maya/MDGModifier.h>
@@ -190,6 +192,13 @@ public:
     MStatus setValue(const double value,
                      MDGModifier &dgmod, MAnimCurveChange &animChange);
 
+    // Set the values at many times at once. All the keyframes of an
+    // animated attribute are set with a single 'MFnAnimCurve::addKeys'
+    // call, a static attribute is set (once) with 'dgmod'. Changes to keyframes are
+    // not recorded for undo if 'animChange' is NULL.
+    MStatus setValues(const MTimeArray &times, const MDoubleArray &values,
+                      MDGModifier &dgmod, MAnimCurveChange *animChange);
+
     double getMinimumValue() const;
 
     void setMinimumValue(const double value);
@@ -267,12 +267,28 @@ MStatus parseSolveInfoArguments(const MArgDatabase &argData,
         out_supportAutoDiffCentral = LEVMAR_SUPPORT_AUTO_DIFF_CENTRAL_VALUE;
         out_supportParameterBounds = LEVMAR_SUPPORT_PARAMETER_BOUNDS_VALUE;
         out_supportRobustLoss = LEVMAR_SUPPORT_ROBUST_LOSS_VALUE;
+    } else if (out_solverType == SOLVER_TYPE_SCHUR_LM) {
+        out_iterations = SCHUR_LM_ITERATIONS_DEFAULT_VALUE;
+        out_tau = SCHUR_LM_TAU_DEFAULT_VALUE;
+        out_epsilon1 = SCHUR_LM_EPSILON1_DEFAULT_VALUE;
+        out_epsilon2 = SCHUR_LM_EPSILON2_DEFAULT_VALUE;
+        out_epsilon3 = SCHUR_LM_EPSILON3_DEFAULT_VALUE;
+        out_delta = SCHUR_LM_DELTA_DEFAULT_VALUE;
+        out_autoDiffType = SCHUR_LM_AUTO_DIFF_TYPE_DEFAULT_VALUE;
+        out_autoParamScale = SCHUR_LM_AUTO_PARAM_SCALE_DEFAULT_VALUE;
+        out_robustLossType = SCHUR_LM_ROBUST_LOSS_TYPE_DEFAULT_VALUE;
+        out_robustLossScale = SCHUR_LM_ROBUST_LOSS_SCALE_DEFAULT_VALUE;
+        out_supportAutoDiffForward = SCHUR_LM_SUPPORT_AUTO_DIFF_FORWARD_VALUE;
+        out_supportAutoDiffCentral = SCHUR_LM_SUPPORT_AUTO_DIFF_CENTRAL_VALUE;
+        out_supportParameterBounds = SCHUR_LM_SUPPORT_PARAMETER_BOUNDS_VALUE;
+        out_supportRobustLoss = SCHUR_LM_SUPPORT_ROBUST_LOSS_VALUE;
     } else {
         ERR("Solver Type is invalid. "
-            << "Value may be 0 or 1 (0 == levmar, 1 == cminpack_lm);"
+            << "Value may be 0, 1, 2 or 3 (0 == levmar, 1 == cminpack_lmdif, "
+            << "2 == cminpack_lmder, 3 == schur_lm);"
             << "value=" << out_solverType);
         status = MS::kFailure;
-        status.perror("Solver Type is invalid. Value may be 0 or 1 (0 == levmar, 1 == cminpack_lm).");
+        status.perror("Solver Type is invalid. Value may be 0, 1, 2 or 3 (0 == levmar, 1 == cminpack_lmdif, 2 == cminpack_lmder, 3 == schur_lm).");
         return status;
     }
 
@@ -461,6 +477,8 @@ MStatus MMSolverCmd::doIt(const MArgList &args) {
     solverOptions.solverType = m_solverType;
     solverOptions.timeEvalMode = m_timeEvalMode;
     solverOptions.acceptOnlyBetter = m_acceptOnlyBetter;
+    solverOptions.threadCount = THREAD_COUNT_DEFAULT_VALUE;
+    solverOptions.analyticJacobian = ANALYTIC_JACOBIAN_DEFAULT_VALUE;
     solverOptions.solverSupportsAutoDiffForward = m_supportAutoDiffForward;
     solverOptions.solverSupportsAutoDiffCentral = m_supportAutoDiffCentral;
     solverOptions.solverSupportsParameterBounds = m_supportParameterBounds;
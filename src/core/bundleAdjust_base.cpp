@@ -48,6 +48,8 @@
 #include <maya/MObject.h>
 #include <maya/MFnAnimCurve.h>
 #include <maya/MAnimCurveChange.h>
+#include <maya/MTimeArray.h>
+#include <maya/MDoubleArray.h>
 #include <maya/MSelectionList.h>
 #include <maya/MItDependencyGraph.h>
 #include <maya/MFnDependencyNode.h>
@@ -69,11 +71,9 @@
 // Local
 #include <core/bundleAdjust_base.h>
 #include <core/bundleAdjust_relationships.h>
-#include <core/bundleAdjust_levmar_bc_dif.h>
-#include <core/bundleAdjust_cminpack_base.h>
-#include <core/bundleAdjust_cminpack_lmdif.h>
-#include <core/bundleAdjust_cminpack_lmder.h>
 #include <core/bundleAdjust_solveFunc.h>
+#include <core/bundleAdjust_problemSolve.h>
+#include <core/bundleAdjust_mayaProblem.h>
 
 
 
@@ -99,6 +99,12 @@ std::vector<SolverTypePair> getSolverTypes() {
     solverType.second = SOLVER_TYPE_CMINPACK_LM_DER_NAME;
     solverTypes.push_back(solverType);
 #endif
+
+    // The Schur complement solver is built-in, and is always
+    // available.
+    solverType.first = SOLVER_TYPE_SCHUR_LM;
+    solverType.second = SOLVER_TYPE_SCHUR_LM_NAME;
+    solverTypes.push_back(solverType);
     return solverTypes;
 }
 
@@ -140,156 +146,6 @@ SolverTypePair getSolverTypeDefault() {
 };
 
 
-void lossFunctionTrivial(double z,
-                         double &rho0,
-                         double &rho1,
-                         double &rho2) {
-    // Trivial - 'no op' loss function.
-    rho0 = z;
-    rho1 = 1.0;
-    rho2 = 0.0;
-};
-
-
-void lossFunctionSoftL1(double z,
-                        double &rho0,
-                        double &rho1,
-                        double &rho2) {
-    // Soft L1
-    double t = 1.0 + z;
-    rho0 = 2.0 * (std::pow(t, 0.5 - 1.0));
-    rho1 = std::pow(t, -0.5);
-    rho2 = -0.5 * std::pow(t, -1.5);
-};
-
-
-void lossFunctionCauchy(double z,
-                        double &rho0,
-                        double &rho1,
-                        double &rho2) {
-    // Cauchy
-    // TODO: replace with 'std::log1p(z)', with C++11.
-    rho0 = std::log(1.0 + z);
-    double t = 1.0 + z;
-    rho1 = 1.0 / t;
-    rho2 = -1.0 / std::pow(t, 2.0);
-};
-
-
-void applyLossFunctionToErrors(int numberOfErrors,
-                               double *f,
-                               int loss_type,
-                               double loss_scale) {
-    for (int i = 0; i < numberOfErrors; ++i) {
-        // The loss function
-        double z = std::pow(f[i] / loss_scale, 2);
-        double rho0 = z;
-        double rho1 = 1.0;
-        double rho2 = 0.0;
-        if (loss_type == ROBUST_LOSS_TYPE_TRIVIAL) {
-            lossFunctionTrivial(z, rho0, rho1, rho2);
-        } else if (loss_type == ROBUST_LOSS_TYPE_SOFT_L_ONE) {
-            lossFunctionSoftL1(z, rho0, rho1, rho2);
-        } else if (loss_type == ROBUST_LOSS_TYPE_CAUCHY) {
-            lossFunctionCauchy(z, rho0, rho1, rho2);
-        } else {
-            DBG("Invalid Robust Loss Type given; value=" << loss_type);
-        }
-        rho0 *= std::pow(loss_scale, 2.0);
-        rho2 /= std::pow(loss_scale, 2.0);
-
-        double J_scale = rho1 + 2.0 * rho2 * std::pow(f[i], 2.0);
-        const double eps = std::numeric_limits<double>::epsilon();
-        if (J_scale < eps) {
-            J_scale = eps;
-        }
-        J_scale = std::pow(J_scale, 0.5);
-        f[i] *= rho1 / J_scale;
-    }
-    return;
-}
-
-
-// Convert an unbounded parameter value (that has already run through
-// 'parameterBoundFromExternalToInternal') into a bounded value where:
-//    xmin < value < xmax
-//
-// Implements Box Constraints; Issue #64.
-double parameterBoundFromInternalToExternal(double value,
-                                            double xmin, double xmax,
-                                            double offset, double scale) {
-    const double float_max = std::numeric_limits<float>::max();
-    if ((xmin <= -float_max) && (xmax >= float_max)) {
-        // No bounds!
-        value = (value / scale) - offset;
-        value = std::max<double>(value, xmin);
-        value = std::min<double>(value, xmax);
-        return value;
-    }
-    else if (xmax >= float_max) {
-        // Lower bound only.
-        value = xmin - (1.0 + std::sqrt(value * value + 1.0));
-    }
-    else if (xmin <= -float_max) {
-        // Upper bound only.
-        value = xmax + (1.0 - std::sqrt(value * value + 1.0));
-    } else {
-        // Both lower and upper bounds.
-        value = xmin + ((xmax - xmin) / 2.0) * (std::sin(value) + 1.0);
-    }
-
-    value = (value / scale) - offset;
-    value = std::max<double>(value, xmin);
-    value = std::min<double>(value, xmax);
-    return value;
-}
-
-
-// Convert a bounded parameter value, into an unbounded value.
-//
-// Implements Box Constraints; Issue #64.
-double parameterBoundFromExternalToInternal(double value,
-                                            double xmin, double xmax,
-                                            double offset, double scale){
-    double initial_xmin = xmin;
-    double initial_xmax = xmax;
-    double reconvert_value = 0.0;
-
-    value = std::max<double>(value, xmin);
-    value = std::min<double>(value, xmax);
-    value = (value * scale) + offset;
-    xmin = (xmin * scale) + offset;
-    xmax = (xmax * scale) + offset;
-
-    const double float_max = std::numeric_limits<float>::max();
-    if ((xmin <= float_max) && (xmax >= float_max)) {
-        // No bounds!
-        reconvert_value = parameterBoundFromInternalToExternal(
-                value,
-                initial_xmin, initial_xmax,
-                offset, scale);
-        return value;
-    }
-    else if (xmax >= float_max) {
-        // Lower bound only.
-        value = std::sqrt(std::pow(((value - xmin) + 1.0), 2.0) - 1.0);
-    }
-    else if (xmin <= -float_max) {
-        // Upper bound only.
-        value = std::sqrt(std::pow((xmax - value) + 1.0, 2.0) - 1.0);
-    } else {
-        // Both lower and upper bounds.
-        value = std::asin((2.0 * (value - xmin) / (xmax - xmin)) - 1.0);
-    }
-
-    reconvert_value = parameterBoundFromInternalToExternal(
-            value,
-            initial_xmin, initial_xmax,
-            offset, scale);
-    return value;
-}
-
-
 bool get_initial_parameters(int numberOfParameters,
                             std::vector<double> &paramList,
                             std::vector<std::pair<int, int> > &paramToAttrList,
@@ -342,27 +198,47 @@ bool set_maya_attribute_values(int numberOfParameters,
                                MAnimCurveChange &curveChange) {
     MStatus status = MS::kSuccess;
     MTime currentFrame = MAnimControl::currentTime();
+
+    // Group the parameters by attribute, so all the keyframes of an
+    // attribute are set at once.
+    std::vector<std::vector<int> > attrParamList(attrList.size());
     for (int i = 0; i < numberOfParameters; ++i) {
-        IndexPair attrPair = paramToAttrList[i];
-        AttrPtr attr = attrList[attrPair.first];
+        attrParamList[paramToAttrList[i].first].push_back(i);
+    }
 
+    MTimeArray frames;
+    MDoubleArray values;
+    for (size_t j = 0; j < attrParamList.size(); ++j) {
+        const std::vector<int> &paramIndexList = attrParamList[j];
+        if (paramIndexList.empty()) {
+            continue;
+        }
+        AttrPtr attr = attrList[j];
         double xoffset = attr->getOffsetValue();
         double xscale = attr->getScaleValue();
         double xmin = attr->getMinimumValue();
         double xmax = attr->getMaximumValue();
-        double value = paramList[i];
-        value = parameterBoundFromInternalToExternal(
-            value,
-            xmin, xmax,
-            xoffset, xscale);
 
-        // Get frame time
-        MTime frame = currentFrame;
-        if (attrPair.second != -1) {
-            frame = frameList[attrPair.second];
+        frames.clear();
+        values.clear();
+        for (size_t k = 0; k < paramIndexList.size(); ++k) {
+            int i = paramIndexList[k];
+            double value = paramList[i];
+            value = parameterBoundFromInternalToExternal(
+                value,
+                xmin, xmax,
+                xoffset, xscale);
+
+            // Get frame time
+            MTime frame = currentFrame;
+            int frameIndex = paramToAttrList[i].second;
+            if (frameIndex != -1) {
+                frame = frameList[frameIndex];
+            }
+            frames.append(frame);
+            values.append(value);
         }
-
-        status = attr->setValue(value, frame, dgmod, curveChange);
+        status = attr->setValues(frames, values, dgmod, &curveChange);
         CHECK_MSTATUS(status);
     }
     dgmod.doIt();  // Commit changed data into Maya
@@ -427,6 +303,12 @@ void logResultsSolveDetails(
     VRB("Function Evaluations: " << solverResult.functionEvals);
     VRB("Jacobian Evaluations: " << solverResult.jacobianEvals);
 
+    const FrameDataCache &cache = userData.frameDataCache;
+    VRB("Camera Frame Evaluations: " << cache.cameraFrameEvaluations
+        << " (cache hits: " << cache.cameraFrameCacheHits << ")");
+    VRB("Bundle Frame Evaluations: " << cache.bundleFrameEvaluations
+        << " (cache hits: " << cache.bundleFrameCacheHits << ")");
+
     if (verbose == false) {
         if (solverResult.success) {
             MStreamUtils::stdErrorStream() << "Solver returned SUCCESS    | ";
@@ -454,7 +336,7 @@ void logResultsSolveDetails(
     resultStr = "success=" + value;
     outResult.append(MString(resultStr.c_str()));
 
-    resultStr = "reason_string=" + levmarReasons[reasonNum];
+    resultStr = "reason_string=" + solverResult.reason;
     outResult.append(MString(resultStr.c_str()));
 
     value = string::numberToString<int>(reasonNum);
@@ -1083,7 +965,6 @@ bool solve(SolverOptions &solverOptions,
     std::vector<double> errorList(1);
     std::vector<double> paramList(1);
     std::vector<double> previousParamList(1);
-    std::vector<double> jacobianList(1);
 
     int numberOfErrors = 0;
     int numberOfMarkerErrors = 0;
@@ -1159,6 +1040,51 @@ bool solve(SolverOptions &solverOptions,
             status);
     CHECK_MSTATUS(status);
 
+    // The parameters affecting the attribute stiffness and smoothness
+    // errors.
+    BoolList2D attrErrorToParamList;
+    findAttrErrorToParameterRelationship(
+            stiffAttrsList,
+            smoothAttrsList,
+            numberOfParameters,
+            paramToAttrList,
+
+            // Outputs
+            attrErrorToParamList);
+
+    // The unique Camera and Bundle frames used to measure errors.
+    IndexPairList cameraFrameToMarkerList;
+    IndexPairList bundleFrameToMarkerList;
+    std::vector<MarkerErrorData> markerErrorDataList;
+    findErrorToFrameDataRelationship(
+            usedMarkerList,
+            markerPosList,
+            markerWeightList,
+            errorToMarkerList,
+
+            // Outputs
+            cameraFrameToMarkerList,
+            bundleFrameToMarkerList,
+            markerErrorDataList);
+
+    // The Camera and Bundle frames affected by each parameter. Any
+    // attribute may change both Cameras and Bundles (for example, a
+    // Bundle parented under a Camera), so both are invalidated.
+    FrameDataCache frameDataCache;
+    {
+        std::vector<bool> paramCameraList(numberOfParameters, true);
+        std::vector<bool> paramBundleList(numberOfParameters, true);
+        initFrameDataCache(
+                numberOfParameters,
+                static_cast<int>(cameraFrameToMarkerList.size()),
+                static_cast<int>(bundleFrameToMarkerList.size()),
+                errorToParamList,
+                paramCameraList,
+                paramBundleList,
+                markerErrorDataList,
+                frameDataCache);
+    }
+
     if (printStatsInput == true) {
         assert(printStats == true);
         status = logResultsObjectCounts(
@@ -1245,7 +1171,6 @@ bool solve(SolverOptions &solverOptions,
     paramList.resize((unsigned long) numberOfParameters, 0);
     previousParamList.resize((unsigned long) numberOfParameters, 0);
     errorList.resize((unsigned long) numberOfErrors, 0);
-    jacobianList.resize((unsigned long) numberOfParameters * numberOfErrors, 0);
 
     std::vector<double> errorDistanceList;
     errorDistanceList.resize((unsigned long) numberOfMarkerErrors / ERRORS_PER_MARKER, 0);
@@ -1305,17 +1230,26 @@ bool solve(SolverOptions &solverOptions,
     userData.stiffAttrsList = stiffAttrsList;
 
     userData.paramToAttrList = paramToAttrList;
+    userData.attrToParamList.clear();
+    userData.attrToParamList.resize(usedAttrList.size());
+    for (int i = 0; i < numberOfParameters; ++i) {
+        userData.attrToParamList[paramToAttrList[i].first].push_back(i);
+    }
     userData.errorToMarkerList = errorToMarkerList;
     userData.markerPosList = markerPosList;
     userData.markerWeightList = markerWeightList;
-    userData.paramFrameList = paramFrameList;
     userData.errorToParamList = errorToParamList;
+    userData.attrErrorToParamList = attrErrorToParamList;
+
+    userData.cameraFrameToMarkerList = cameraFrameToMarkerList;
+    userData.bundleFrameToMarkerList = bundleFrameToMarkerList;
+    userData.markerErrorDataList = markerErrorDataList;
+    userData.cameraFrameDataList.resize(cameraFrameToMarkerList.size());
+    userData.bundleFrameDataList.resize(bundleFrameToMarkerList.size());
+    userData.frameDataCache = frameDataCache;
 
-    userData.paramList = paramList;
-    userData.previousParamList = previousParamList;
     userData.errorList = errorList;
     userData.errorDistanceList = errorDistanceList;
-    userData.jacobianList = jacobianList;
     userData.funcEvalNum = 0;  // number of function evaluations.
     userData.iterNum = 0;
     userData.jacIterNum = 0;
@@ -1324,17 +1258,12 @@ bool solve(SolverOptions &solverOptions,
     userData.numberOfAttrStiffnessErrors = numberOfAttrStiffnessErrors;
     userData.numberOfAttrSmoothnessErrors = numberOfAttrSmoothnessErrors;
 
-    userData.isJacobianCall = false;
-    userData.isNormalCall = true;
-    userData.isPrintCall = false;
-    userData.doCalcJacobian = false;
-
     userData.solverOptions = &solverOptions;
 
-    userData.timer = timer;
+    ThreadPool threadPool(solverOptions.threadCount);
+    userData.threadPool = &threadPool;
 
-    userData.dgmod = &dgmod;
-    userData.curveChange = &curveChange;
+    userData.timer = timer;
 
     // Allow user to exit out of solve.
     userData.computation = &computation;
@@ -1441,88 +1370,65 @@ bool solve(SolverOptions &solverOptions,
         VRB("-> " << paramList[i]);
     }
 
+    // Set the initial values, recording the changes for undo. Any
+    // keyframes missing on the solved frames are created now, so the
+    // solver itself never needs to record changes (see
+    // 'setParameters').
+    set_maya_attribute_values(
+        numberOfParameters,
+        paramToAttrList,
+        usedAttrList,
+        previousParamList,
+        frameList,
+        dgmod,
+        curveChange);
+
+    // Solve the Maya scene with the same solve loop and solvers as
+    // any other Problem. 'acceptOnlyBetter' is handled below, by
+    // comparing the initial and solved errors.
+    //
+    // Independent components of the Problem (for example, each
+    // Bundle of a Bundle-only solve) are solved as separate
+    // sub-problems, one after another, because the Maya DG must only
+    // be evaluated from the main thread.
+    //
+    // The parameter values currently set in Maya are stored in
+    // 'userData.previousParamList'; only parameters changed from
+    // these values are set, and invalidate the Camera and Bundle
+    // frame data.
+    MayaProblem problem(userData);
+    std::vector<double> initialValueList = userData.previousParamList;
+    SolverOptions problemSolverOptions = solverOptions;
+    problemSolverOptions.acceptOnlyBetter = false;
     SolverResult solveResult;
-    if (solverOptions.solverType == SOLVER_TYPE_LEVMAR) {
-
-#ifndef USE_SOLVER_LEVMAR
-
-        ERR("Solver Type is not supported by this compiled plug-in. "
-            << "solverType=" << solverOptions.solverType);
+    bool solved = solveProblemComponents(
+        problemSolverOptions,
+        problem,
+        verbose,
+        solveResult);
+    userData.funcEvalNum = solveResult.functionEvals + solveResult.jacobianEvals;
+    userData.iterNum = solveResult.functionEvals;
+    userData.jacIterNum = solveResult.jacobianEvals;
+    if (!solved) {
+        timer.solveBenchTicks.stop();
+        timer.solveBenchTimer.stop();
+        computation.endComputation();
         resultStr = "success=0";
         outResult.append(MString(resultStr.c_str()));
         return false;
+    }
 
-#else // USE_SOLVER_LEVMAR is defined.
-
-        solve_3d_levmar_bc_dif(
-                solverOptions,
-                numberOfParameters,
-                numberOfErrors,
-                paramList,
-                errorList,
-                paramLowerBoundList,
-                paramUpperBoundList,
-                paramWeightList,
-                userData,
-                solveResult,
-                outResult);
-
-#endif // USE_SOLVER_LEVMAR
-
-    } else if (solverOptions.solverType == SOLVER_TYPE_CMINPACK_LMDIF) {
-
-#ifndef USE_SOLVER_CMINPACK
-
-        ERR("Solver Type is not supported by this compiled plug-in. "
-            << "solverType=" << solverOptions.solverType);
-        resultStr = "success=0";
-        outResult.append(MString(resultStr.c_str()));
-        return false;
-
-#else // USE_SOLVER_CMINPACK is defined.
-
-        solve_3d_cminpack_lmdif(
-                solverOptions,
-                numberOfParameters,
-                numberOfErrors,
-                paramList,
-                errorList,
-                paramWeightList,
-                userData,
-                solveResult);
-
-#endif // USE_SOLVER_CMINPACK
-
-    } else if (solverOptions.solverType == SOLVER_TYPE_CMINPACK_LMDER) {
-
-#ifndef USE_SOLVER_CMINPACK
-
-        ERR("Solver Type is not supported by this compiled plug-in. "
-            << "solverType=" << solverOptions.solverType);
-        resultStr = "success=0";
-        outResult.append(MString(resultStr.c_str()));
-        return false;
-
-#else // USE_SOLVER_CMINPACK is defined.
-
-        solve_3d_cminpack_lmder(
-                solverOptions,
-                numberOfParameters,
-                numberOfErrors,
-                paramList,
-                errorList,
-                paramWeightList,
-                userData,
-                solveResult);
-
-#endif // USE_SOLVER_CMINPACK
-
-    } else {
-        ERR("Solver Type is invalid. solverType="
-            << solverOptions.solverType);
-        resultStr = "success=0";
-        outResult.append(MString(resultStr.c_str()));
-        return false;
+    // The solved (external) values are set on the Problem.
+    for (int i = 0; i < numberOfParameters; ++i) {
+        double xmin = 0.0;
+        double xmax = 0.0;
+        double xoffset = 0.0;
+        double xscale = 1.0;
+        problem.getParameterBounds(i, xmin, xmax, xoffset, xscale);
+        paramList[i] = parameterBoundFromExternalToInternal(
+            problem.getParameterValue(i),
+            xmin, xmax,
+            xoffset, xscale);
     }
 
     timer.solveBenchTicks.stop();
@@ -1545,8 +1451,11 @@ bool solve(SolverOptions &solverOptions,
         errorIsBetter = errorAvg <= initialErrorAvg;
     }
 
-    // Set the solved parameters
+    // The solver changes are not recorded for undo, so the initial
+    // values are restored (without recording), and the solved
+    // parameters are then set once, recording the changes for undo.
     VRB("Setting Parameters...");
+    problem.setParameters(&initialValueList[0]);
     if (errorIsBetter) {
         set_maya_attribute_values(
             numberOfParameters,
@@ -1556,16 +1465,6 @@ bool solve(SolverOptions &solverOptions,
             frameList,
             dgmod,
             curveChange);
-    } else {
-        // Set the initial parameter values.
-        set_maya_attribute_values(
-            numberOfParameters,
-            paramToAttrList,
-            usedAttrList,
-            previousParamList,
-            frameList,
-            dgmod,
-            curveChange);
     }
     VRB("Solved Parameters:");
     for (int i = 0; i < numberOfParameters; ++i) {
@@ -50,6 +50,7 @@
 #include <Attr.h>
 
 #include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_math.h>
 #include <core/bundleAdjust_data.h>
 #include <core/bundleAdjust_solveFunc.h>
 
@@ -57,7 +58,6 @@
 typedef std::vector<std::vector<bool> > BoolList2D;
 typedef std::pair<int, int> IndexPair;
 typedef std::vector<std::pair<int, int> > IndexPairList;
-typedef std::pair<int, std::string> SolverTypePair;
 
 typedef IndexPairList::iterator IndexPairListIt;
 typedef IndexPairList::const_iterator IndexPairListCIt;
@@ -75,40 +75,6 @@ std::vector<SolverTypePair> getSolverTypes();
 SolverTypePair getSolverTypeDefault();
 
 
-double parameterBoundFromInternalToExternal(double value,
-                                            double xmin, double xmax,
-                                            double offset, double scale);
-
-
-double parameterBoundFromExternalToInternal(double value,
-                                            double xmin, double xmax,
-                                            double offset, double scale);
-
-
-void lossFunctionTrivial(double z,
-                         double &rho0,
-                         double &rho1,
-                         double &rho2);
-
-
-void lossFunctionSoftL1(double z,
-                        double &rho0,
-                        double &rho1,
-                        double &rho2);
-
-
-void lossFunctionCauchy(double z,
-                        double &rho0,
-                        double &rho1,
-                        double &rho2);
-
-
-void applyLossFunctionToErrors(int numberOfErrors,
-                               double *f,
-                               int loss_type,
-                               double loss_scale);
-
-
 bool get_initial_parameters(int numberOfParameters,
                             std::vector<double> &paramList,
                             std::vector<std::pair<int, int> > &paramToAttrList,
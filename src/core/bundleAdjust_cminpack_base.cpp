@@ -1,59 +0,0 @@
-/*
- * Copyright (C) 2018, 2019 David Cattermole.
- *
- * This file is part of mmSolver.
- *
- * mmSolver is free software: you can redistribute it and/or modify it
- * under the terms of the GNU Lesser General Public License as
- * published by the Free Software Foundation, either version 3 of the
- * License, or (at your option) any later version.
- *
- * mmSolver is distributed in the hope that it will be useful,
- * but WITHOUT ANY WARRANTY; without even the implied warranty of
- * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
- * GNU Lesser General Public License for more details.
- *
- * You should have received a copy of the GNU Lesser General Public License
- * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
- * ====================================================================
- *
- * Common functions and data to be used by CMinpack algorithms.
- */
-
-#ifdef USE_SOLVER_CMINPACK
-
-// CMinpack
-#include <cminpack.h>
-
-// STL
-#include <ctime>
-#include <cmath>
-#include <iostream>
-#include <string>
-#include <vector>
-#include <cassert>
-#include <limits>
-#include <math.h>
-
-// Utils
-#include <utilities/debugUtils.h>
-#include <utilities/stringUtils.h>
-
-// Maya
-#include <maya/MPoint.h>
-#include <maya/MString.h>
-#include <maya/MStringArray.h>
-#include <maya/MObject.h>
-#include <maya/MFnAnimCurve.h>
-#include <maya/MAnimCurveChange.h>
-#include <maya/MMatrix.h>
-#include <maya/MComputation.h>
-#include <maya/MProfiler.h>
-
-// Utilities
-#include <mayaUtils.h>
-
-#include <core/bundleAdjust_cminpack_base.h>
-
-
-#endif // USE_SOLVER_CMINPACK
@@ -42,55 +42,14 @@
 #include <maya/MComputation.h>
 
 // Internal Objects
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <core/bundleAdjust_threadPool.h>
 #include <Camera.h>
 #include <Marker.h>
 #include <Bundle.h>
 #include <Attr.h>
 
-// Group all the benchmark timers together.
-struct SolverTimer {
-    debug::TimestampBenchmark solveBenchTimer;
-    debug::TimestampBenchmark jacBenchTimer;
-    debug::TimestampBenchmark funcBenchTimer;
-    debug::TimestampBenchmark errorBenchTimer;
-    debug::TimestampBenchmark paramBenchTimer;
-
-    debug::CPUBenchmark solveBenchTicks;
-    debug::CPUBenchmark jacBenchTicks;
-    debug::CPUBenchmark funcBenchTicks;
-    debug::CPUBenchmark errorBenchTicks;
-    debug::CPUBenchmark paramBenchTicks;
-};
-
-
-struct SolverOptions {
-    int iterMax;
-    double tau;
-    double eps1;
-    double eps2;
-    double eps3;
-    double delta;
-    int autoDiffType;
-    int autoParamScale;
-    int robustLossType;
-    double robustLossScale;
-    int solverType;
-    int timeEvalMode;
-    bool acceptOnlyBetter;
-
-    // Auto-adjust the input solve objects before solving?
-    bool removeUnusedMarkers;
-    bool removeUnusedAttributes;
-
-    // All the different supported features by the currently active
-    // solver type.
-    bool solverSupportsAutoDiffForward;
-    bool solverSupportsAutoDiffCentral;
-    bool solverSupportsParameterBounds;
-    bool solverSupportsRobustLoss;
-};
-
-
 // The user data given to the solve function.
 struct SolverData {
     // Solver Objects.
@@ -104,43 +63,53 @@ struct SolverData {
 
     // Relational mapping indexes.
     std::vector<std::pair<int, int> > paramToAttrList;
+    std::vector<std::vector<int> > attrToParamList;
     std::vector<std::pair<int, int> > errorToMarkerList;
     std::vector<MPoint> markerPosList;
     std::vector<double> markerWeightList;
-    std::vector<std::vector<bool>> paramFrameList;
     std::vector<std::vector<bool>> errorToParamList;
 
+    // The parameters affecting each attribute stiffness and
+    // smoothness error.
+    std::vector<std::vector<bool>> attrErrorToParamList;
+
+    // Camera and Bundle data, evaluated once per (object, frame)
+    // pair, when measuring errors.
+    std::vector<std::pair<int, int> > cameraFrameToMarkerList;
+    std::vector<std::pair<int, int> > bundleFrameToMarkerList;
+    std::vector<MarkerErrorData> markerErrorDataList;
+    std::vector<CameraFrameData> cameraFrameDataList;
+    std::vector<BundleFrameData> bundleFrameDataList;
+
+    // The Camera and Bundle frames that are up-to-date with the
+    // parameters; only frames affected by changed parameters are
+    // evaluated (and dirtied) again.
+    FrameDataCache frameDataCache;
+
     // Internal Solver Data.
-    std::vector<double> paramList;
+    //
+    // 'previousParamList' has the (external) parameter values
+    // currently set in Maya.
     std::vector<double> errorList;
     std::vector<double> errorDistanceList;
-    std::vector<double> jacobianList;
     std::vector<double> previousParamList;
     int funcEvalNum;
     int iterNum;
     int jacIterNum;
-    int solverType;
     double imageWidth;
     int numberOfMarkerErrors;
     int numberOfAttrStiffnessErrors;
     int numberOfAttrSmoothnessErrors;
 
-    // Type of solve function call.
-    bool isNormalCall;
-    bool isJacobianCall;
-    bool isPrintCall;
-    bool doCalcJacobian;
-
     // Solver Options
     SolverOptions *solverOptions;
 
+    // Threads used to compute Marker re-projection errors.
+    ThreadPool *threadPool;
+
     // Benchmarks
     SolverTimer timer;
 
-    // Storing changes for undo/redo.
-    MDGModifier *dgmod;
-    MAnimCurveChange *curveChange;
-
     // Allow user to cancel the solve.
     MComputation *computation;
     bool userInterrupted;
@@ -153,18 +122,4 @@ struct SolverData {
     MString debugFileName;
 };
 
-
-struct SolverResult {
-    bool success;
-    double errorAvg;
-    double errorMin;
-    double errorMax;
-    int reason_number;
-    std::string reason;
-    int iterations;
-    int functionEvals;
-    int jacobianEvals;
-    double errorFinal;
-};
-
 #endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_DATA_H
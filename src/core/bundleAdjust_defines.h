@@ -35,6 +35,10 @@
 // Do not change this definition.
 #define ERRORS_PER_MARKER (2)
 
+// success / failure constants.
+#define SOLVE_FUNC_SUCCESS (0)
+#define SOLVE_FUNC_FAILURE (-1)
+
 // The different solver types to choose from:
 
 // Dense LM solver using 'levmar',
@@ -49,6 +53,11 @@
 #define SOLVER_TYPE_CMINPACK_LMDER 2
 #define SOLVER_TYPE_CMINPACK_LM_DER_NAME "cminpack_lmder"
 
+// Sparse LM solver, eliminating the bundle parameters with the Schur
+// complement; built-in (no external library is needed).
+#define SOLVER_TYPE_SCHUR_LM 3
+#define SOLVER_TYPE_SCHUR_LM_NAME "schur_lm"
+
 // The default solver to use, if all solvers are available.
 #define SOLVER_TYPE_DEFAULT_VALUE SOLVER_TYPE_CMINPACK_LMDER
 
@@ -68,6 +77,10 @@
 #define TIME_EVAL_MODE_DG_CONTEXT  (0)
 #define TIME_EVAL_MODE_SET_TIME  (1)
 
+// The number of threads used to compute Marker re-projection errors;
+// zero uses all hardware threads.
+#define THREAD_COUNT_DEFAULT_VALUE  (0)
+
 // Print Statistics for mmSolver command.
 //
 // These are the possible values:
@@ -82,6 +95,8 @@
 #define ROBUST_LOSS_TYPE_TRIVIAL  (0)
 #define ROBUST_LOSS_TYPE_SOFT_L_ONE  (1)
 #define ROBUST_LOSS_TYPE_CAUCHY  (2)
+#define ROBUST_LOSS_TYPE_HUBER  (3)
+#define ROBUST_LOSS_TYPE_TUKEY  (4)
 
 
 // CMinpack-specific values for recognising forward or central differencing.
@@ -89,6 +104,12 @@
 #define AUTO_DIFF_TYPE_FORWARD (0)
 #define AUTO_DIFF_TYPE_CENTRAL (1)
 
+// Use analytic derivatives for the parameters that support them,
+// rather than finite differences. Only the Maya-independent core
+// Problems support analytic derivatives; Maya attributes may be
+// driven by any DG network, and always use finite differences.
+#define ANALYTIC_JACOBIAN_DEFAULT_VALUE (true)
+
 
 // CMinpack lmdif Solver default flag values
 //
@@ -106,7 +127,7 @@
 #define CMINPACK_LMDIF_SUPPORT_AUTO_DIFF_FORWARD_VALUE true
 #define CMINPACK_LMDIF_SUPPORT_AUTO_DIFF_CENTRAL_VALUE false
 #define CMINPACK_LMDIF_SUPPORT_PARAMETER_BOUNDS_VALUE true
-#define CMINPACK_LMDIF_SUPPORT_ROBUST_LOSS_VALUE false
+#define CMINPACK_LMDIF_SUPPORT_ROBUST_LOSS_VALUE true
 
 // CMinpack lmder Solver default flag values
 //
@@ -124,7 +145,7 @@
 #define CMINPACK_LMDER_SUPPORT_AUTO_DIFF_FORWARD_VALUE true
 #define CMINPACK_LMDER_SUPPORT_AUTO_DIFF_CENTRAL_VALUE true
 #define CMINPACK_LMDER_SUPPORT_PARAMETER_BOUNDS_VALUE true
-#define CMINPACK_LMDER_SUPPORT_ROBUST_LOSS_VALUE  false
+#define CMINPACK_LMDER_SUPPORT_ROBUST_LOSS_VALUE  true
 
 // Levmar Solver default flag values
 //
@@ -144,4 +165,23 @@
 #define LEVMAR_SUPPORT_PARAMETER_BOUNDS_VALUE true
 #define LEVMAR_SUPPORT_ROBUST_LOSS_VALUE false
 
+// Schur complement LM Solver default flag values
+//
+#define SCHUR_LM_ITERATIONS_DEFAULT_VALUE  (100)
+// The initial damping is 'tau' multiplied by the largest
+// (scaled) diagonal value of the normal equations.
+#define SCHUR_LM_TAU_DEFAULT_VALUE  (1E-03)
+#define SCHUR_LM_EPSILON1_DEFAULT_VALUE  (1E-6) // gradient
+#define SCHUR_LM_EPSILON2_DEFAULT_VALUE  (1E-6) // parameter change
+#define SCHUR_LM_EPSILON3_DEFAULT_VALUE  (1E-6) // error
+#define SCHUR_LM_DELTA_DEFAULT_VALUE  (1E-04)
+#define SCHUR_LM_AUTO_DIFF_TYPE_DEFAULT_VALUE  (AUTO_DIFF_TYPE_FORWARD)
+#define SCHUR_LM_AUTO_PARAM_SCALE_DEFAULT_VALUE  (1)
+#define SCHUR_LM_ROBUST_LOSS_TYPE_DEFAULT_VALUE  (ROBUST_LOSS_TYPE_TRIVIAL)
+#define SCHUR_LM_ROBUST_LOSS_SCALE_DEFAULT_VALUE 1.0
+#define SCHUR_LM_SUPPORT_AUTO_DIFF_FORWARD_VALUE true
+#define SCHUR_LM_SUPPORT_AUTO_DIFF_CENTRAL_VALUE true
+#define SCHUR_LM_SUPPORT_PARAMETER_BOUNDS_VALUE true
+#define SCHUR_LM_SUPPORT_ROBUST_LOSS_VALUE true
+
 #endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_DEFINES_H
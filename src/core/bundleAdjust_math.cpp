@@ -0,0 +1,321 @@
+/*
+ * Copyright (C) 2018, 2019 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Parameter bounds and robust loss functions.
+ */
+
+// STL
+#include <cmath>
+#include <limits>
+#include <algorithm>
+
+// Utils
+#include <utilities/debugUtils.h>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_math.h>
+
+
+void lossFunctionTrivial(double z,
+                         double &rho0,
+                         double &rho1,
+                         double &rho2) {
+    // Trivial - 'no op' loss function.
+    rho0 = z;
+    rho1 = 1.0;
+    rho2 = 0.0;
+};
+
+
+void lossFunctionSoftL1(double z,
+                        double &rho0,
+                        double &rho1,
+                        double &rho2) {
+    // Soft L1; '2 * (sqrt(t) - 1)', without cancellation for small
+    // values of 'z'.
+    double t = 1.0 + z;
+    rho0 = (2.0 * z) / (std::sqrt(t) + 1.0);
+    rho1 = std::pow(t, -0.5);
+    rho2 = -0.5 * std::pow(t, -1.5);
+};
+
+
+void lossFunctionCauchy(double z,
+                        double &rho0,
+                        double &rho1,
+                        double &rho2) {
+    // Cauchy
+    rho0 = std::log1p(z);
+    double t = 1.0 + z;
+    rho1 = 1.0 / t;
+    rho2 = -1.0 / std::pow(t, 2.0);
+};
+
+
+void lossFunctionHuber(double z,
+                       double &rho0,
+                       double &rho1,
+                       double &rho2) {
+    // Huber; quadratic below the scale, linear above.
+    if (z <= 1.0) {
+        rho0 = z;
+        rho1 = 1.0;
+        rho2 = 0.0;
+    } else {
+        double t = std::sqrt(z);
+        rho0 = (2.0 * t) - 1.0;
+        rho1 = 1.0 / t;
+        rho2 = -0.5 / (z * t);
+    }
+};
+
+
+void lossFunctionTukey(double z,
+                       double &rho0,
+                       double &rho1,
+                       double &rho2) {
+    // Tukey's biweight; errors above the scale have a constant loss,
+    // and do not affect the solve.
+    if (z <= 1.0) {
+        // '(1 - (1 - z)^3) / 3', without cancellation for small
+        // values of 'z'.
+        double t = 1.0 - z;
+        rho0 = z * (1.0 - z + ((z * z) / 3.0));
+        rho1 = t * t;
+        rho2 = -2.0 * t;
+    } else {
+        rho0 = 1.0 / 3.0;
+        rho1 = 0.0;
+        rho2 = 0.0;
+    }
+};
+
+
+// The scale of an error 'f', and of the derivatives of the error,
+// for a robust loss function.
+static void lossFunctionScale(double f,
+                              int loss_type,
+                              double loss_scale,
+                              double &errorScale,
+                              double &jacobianScale) {
+    double z = std::pow(f / loss_scale, 2);
+    double rho0 = z;
+    double rho1 = 1.0;
+    double rho2 = 0.0;
+    if (loss_type == ROBUST_LOSS_TYPE_TRIVIAL) {
+        lossFunctionTrivial(z, rho0, rho1, rho2);
+    } else if (loss_type == ROBUST_LOSS_TYPE_SOFT_L_ONE) {
+        lossFunctionSoftL1(z, rho0, rho1, rho2);
+    } else if (loss_type == ROBUST_LOSS_TYPE_CAUCHY) {
+        lossFunctionCauchy(z, rho0, rho1, rho2);
+    } else if (loss_type == ROBUST_LOSS_TYPE_HUBER) {
+        lossFunctionHuber(z, rho0, rho1, rho2);
+    } else if (loss_type == ROBUST_LOSS_TYPE_TUKEY) {
+        lossFunctionTukey(z, rho0, rho1, rho2);
+    } else {
+        DBG("Invalid Robust Loss Type given; value=" << loss_type);
+    }
+
+    // The scaled error is 'sign(f) * loss_scale * sqrt(rho0)', so the
+    // sum of the squared (scaled) errors is the loss. All the loss
+    // functions are 'z' near zero.
+    const double eps = std::numeric_limits<double>::epsilon();
+    if ((z < eps) || (rho0 < eps)) {
+        errorScale = 1.0;
+        jacobianScale = rho1;
+        return;
+    }
+    errorScale = std::sqrt(rho0 / z);
+
+    // The derivative of the scaled error with respect to 'f'; the
+    // weight of the error ('rho1') divided by the error scale.
+    jacobianScale = rho1 / errorScale;
+    return;
+}
+
+
+void computeLossFunctionScales(int numberOfErrors,
+                               const double *f,
+                               int loss_type,
+                               double loss_scale,
+                               double *errorScales,
+                               double *jacobianScales) {
+    for (int i = 0; i < numberOfErrors; ++i) {
+        lossFunctionScale(f[i], loss_type, loss_scale,
+                          errorScales[i], jacobianScales[i]);
+    }
+    return;
+}
+
+
+void applyLossFunctionToErrors(int numberOfErrors,
+                               double *f,
+                               int loss_type,
+                               double loss_scale) {
+    double errorScale = 1.0;
+    double jacobianScale = 1.0;
+    for (int i = 0; i < numberOfErrors; ++i) {
+        lossFunctionScale(f[i], loss_type, loss_scale,
+                          errorScale, jacobianScale);
+        f[i] *= errorScale;
+    }
+    return;
+}
+
+
+// Given a specific parameter, calculate the expected 'delta' value of
+// the parameter.
+double calculateParameterDelta(double value,
+                               double delta,
+                               double sign,
+                               double xmin,
+                               double xmax) {
+    // If the value +/- delta would cause the attribute to go
+    // out of box-constraints, then we should only use one
+    // value, or go in the other direction.
+    if ((value + delta) > xmax) {
+        sign = -1;
+    }
+    if ((value - delta) < xmin) {
+        sign = 1;
+    }
+    return delta * sign;
+}
+
+
+// Convert an unbounded parameter value (that has already run through
+// 'parameterBoundFromExternalToInternal') into a bounded value where:
+//    xmin < value < xmax
+//
+// Implements Box Constraints; Issue #64.
+double parameterBoundFromInternalToExternal(double value,
+                                            double xmin, double xmax,
+                                            double offset, double scale) {
+    const double float_max = std::numeric_limits<float>::max();
+    if ((xmin <= -float_max) && (xmax >= float_max)) {
+        // No bounds!
+        value = (value / scale) - offset;
+        value = std::max<double>(value, xmin);
+        value = std::min<double>(value, xmax);
+        return value;
+    }
+    else if (xmax >= float_max) {
+        // Lower bound only.
+        value = xmin - (1.0 + std::sqrt(value * value + 1.0));
+    }
+    else if (xmin <= -float_max) {
+        // Upper bound only.
+        value = xmax + (1.0 - std::sqrt(value * value + 1.0));
+    } else {
+        // Both lower and upper bounds.
+        value = xmin + ((xmax - xmin) / 2.0) * (std::sin(value) + 1.0);
+    }
+
+    value = (value / scale) - offset;
+    value = std::max<double>(value, xmin);
+    value = std::min<double>(value, xmax);
+    return value;
+}
+
+
+// The derivative of 'parameterBoundFromInternalToExternal' with
+// respect to the (internal) value; the chain rule factor to convert
+// a derivative with respect to the external (attribute) value into a
+// derivative with respect to the internal (solver) value.
+//
+// The derivative is zero when the external value is clamped to the
+// bounds.
+double parameterBoundDerivativeInternalToExternal(double value,
+                                                  double xmin, double xmax,
+                                                  double offset, double scale) {
+    const double float_max = std::numeric_limits<float>::max();
+    double external = value;
+    double derivative = 1.0;
+    if ((xmin <= -float_max) && (xmax >= float_max)) {
+        // No bounds!
+    }
+    else if (xmax >= float_max) {
+        // Lower bound only.
+        const double root = std::sqrt(value * value + 1.0);
+        external = xmin - (1.0 + root);
+        derivative = -value / root;
+    }
+    else if (xmin <= -float_max) {
+        // Upper bound only.
+        const double root = std::sqrt(value * value + 1.0);
+        external = xmax + (1.0 - root);
+        derivative = -value / root;
+    } else {
+        // Both lower and upper bounds.
+        external = xmin + ((xmax - xmin) / 2.0) * (std::sin(value) + 1.0);
+        derivative = ((xmax - xmin) / 2.0) * std::cos(value);
+    }
+
+    external = (external / scale) - offset;
+    if ((external < xmin) || (external > xmax)) {
+        return 0.0;
+    }
+    return derivative / scale;
+}
+
+
+// Convert a bounded parameter value, into an unbounded value.
+//
+// Implements Box Constraints; Issue #64.
+double parameterBoundFromExternalToInternal(double value,
+                                            double xmin, double xmax,
+                                            double offset, double scale){
+    double initial_xmin = xmin;
+    double initial_xmax = xmax;
+    double reconvert_value = 0.0;
+
+    value = std::max<double>(value, xmin);
+    value = std::min<double>(value, xmax);
+    value = (value * scale) + offset;
+    xmin = (xmin * scale) + offset;
+    xmax = (xmax * scale) + offset;
+
+    const double float_max = std::numeric_limits<float>::max();
+    if ((xmin <= float_max) && (xmax >= float_max)) {
+        // No bounds!
+        reconvert_value = parameterBoundFromInternalToExternal(
+                value,
+                initial_xmin, initial_xmax,
+                offset, scale);
+        return value;
+    }
+    else if (xmax >= float_max) {
+        // Lower bound only.
+        value = std::sqrt(std::pow(((value - xmin) + 1.0), 2.0) - 1.0);
+    }
+    else if (xmin <= -float_max) {
+        // Upper bound only.
+        value = std::sqrt(std::pow((xmax - value) + 1.0, 2.0) - 1.0);
+    } else {
+        // Both lower and upper bounds.
+        value = std::asin((2.0 * (value - xmin) / (xmax - xmin)) - 1.0);
+    }
+
+    reconvert_value = parameterBoundFromInternalToExternal(
+            value,
+            initial_xmin, initial_xmax,
+            offset, scale);
+    return value;
+}
\ No newline at end of file
@@ -0,0 +1,132 @@
+/*
+ * Copyright (C) 2018, 2019 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Parameter bounds and robust loss functions.
+ *
+ * This file does not depend on Maya, and is shared by the Maya
+ * plug-in and the Maya-independent core solver library.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_MATH_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_MATH_H
+
+// STL
+#include <cmath>
+
+
+inline
+double gaussian(double x, double mean, double sigma) {
+    return std::exp(
+            -(std::pow((x - mean), 2.0) / (2.0 * (std::pow(sigma, 2.0))))
+    );
+}
+
+
+// The derivative of the stiffness and smoothness error,
+// '(1.0 / gaussian(value, mean, variance)) - 1.0', with respect to
+// the value.
+inline
+double inverseGaussianDerivative(double value, double mean, double variance) {
+    const double variance_sq = variance * variance;
+    return ((value - mean) / variance_sq) / gaussian(value, mean, variance);
+}
+
+
+double parameterBoundFromInternalToExternal(double value,
+                                            double xmin, double xmax,
+                                            double offset, double scale);
+
+
+double parameterBoundFromExternalToInternal(double value,
+                                            double xmin, double xmax,
+                                            double offset, double scale);
+
+
+double parameterBoundDerivativeInternalToExternal(double value,
+                                                  double xmin, double xmax,
+                                                  double offset, double scale);
+
+
+double calculateParameterDelta(double value,
+                               double delta,
+                               double sign,
+                               double xmin,
+                               double xmax);
+
+
+void lossFunctionTrivial(double z,
+                         double &rho0,
+                         double &rho1,
+                         double &rho2);
+
+
+void lossFunctionSoftL1(double z,
+                        double &rho0,
+                        double &rho1,
+                        double &rho2);
+
+
+void lossFunctionCauchy(double z,
+                        double &rho0,
+                        double &rho1,
+                        double &rho2);
+
+
+void lossFunctionHuber(double z,
+                       double &rho0,
+                       double &rho1,
+                       double &rho2);
+
+
+void lossFunctionTukey(double z,
+                       double &rho0,
+                       double &rho1,
+                       double &rho2);
+
+
+// Compute the scale of each error 'f[i]', and of the derivatives of
+// each error, for a robust loss function.
+//
+// The scaled errors 'f[i] * errorScales[i]' have a sum of squares
+// equal to the sum of the loss of the errors, so a least squares
+// solver minimises the loss. 'jacobianScales[i]' is the derivative of
+// the scaled error with respect to the error; the Jacobian rows of
+// the errors are multiplied by it.
+//
+// The scales depend on the errors, so they must be computed again
+// each time the errors are measured (iteratively reweighted least
+// squares).
+void computeLossFunctionScales(int numberOfErrors,
+                               const double *f,
+                               int loss_type,
+                               double loss_scale,
+                               double *errorScales,
+                               double *jacobianScales);
+
+
+// Scale the errors 'f' in-place, for a robust loss function (see
+// 'computeLossFunctionScales').
+void applyLossFunctionToErrors(int numberOfErrors,
+                               double *f,
+                               int loss_type,
+                               double loss_scale);
+
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_MATH_H
@@ -0,0 +1,766 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A Problem using the Maya scene.
+ */
+
+// STL
+#include <vector>
+#include <cassert>
+#include <algorithm>
+
+// Utils
+#include <utilities/debugUtils.h>
+
+// Maya
+#include <maya/MTime.h>
+#include <maya/MAnimControl.h>
+#include <maya/MComputation.h>
+#include <maya/MAngle.h>
+#include <maya/MMatrix.h>
+#include <maya/MPoint.h>
+#include <maya/MVector.h>
+#include <maya/MQuaternion.h>
+#include <maya/MPlug.h>
+#include <maya/MPlugArray.h>
+#include <maya/MFnDagNode.h>
+#include <maya/MFnTransform.h>
+#include <maya/MTransformationMatrix.h>
+
+// Utilities
+#include <mayaUtils.h>
+#include <Attr.h>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_data.h>
+#include <core/bundleAdjust_math.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <core/bundleAdjust_solveFunc.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_mayaProblem.h>
+
+
+// The SCENE_ATTR_TYPE_* of an Attribute solver type, or -1 if the
+// attribute does not have analytic derivatives.
+static int getSceneAttrType(const unsigned int solverAttrType) {
+    switch (solverAttrType) {
+        case ATTR_SOLVER_TYPE_BUNDLE_TX:
+        case ATTR_SOLVER_TYPE_CAMERA_TX:
+            return SCENE_ATTR_TYPE_TRANSLATE_X;
+        case ATTR_SOLVER_TYPE_BUNDLE_TY:
+        case ATTR_SOLVER_TYPE_CAMERA_TY:
+            return SCENE_ATTR_TYPE_TRANSLATE_Y;
+        case ATTR_SOLVER_TYPE_BUNDLE_TZ:
+        case ATTR_SOLVER_TYPE_CAMERA_TZ:
+            return SCENE_ATTR_TYPE_TRANSLATE_Z;
+        case ATTR_SOLVER_TYPE_CAMERA_RX:
+            return SCENE_ATTR_TYPE_ROTATE_X;
+        case ATTR_SOLVER_TYPE_CAMERA_RY:
+            return SCENE_ATTR_TYPE_ROTATE_Y;
+        case ATTR_SOLVER_TYPE_CAMERA_RZ:
+            return SCENE_ATTR_TYPE_ROTATE_Z;
+        case ATTR_SOLVER_TYPE_CAMERA_FOCAL:
+            return SCENE_ATTR_TYPE_FOCAL_LENGTH;
+        default:
+            return -1;
+    }
+}
+
+
+// Is the plug (and the compound plug it is part of) not connected to
+// any other node, except an animCurve driving it?
+static bool isPlugDirectlyConnected(const MPlug &plug) {
+    MStatus status;
+    if (plug.isSource(&status)) {
+        return false;
+    }
+    if (plug.isDestination(&status)) {
+        MPlugArray connPlugs;
+        bool asDest = true;
+        bool asSrc = false;
+        plug.connectedTo(connPlugs, asDest, asSrc, &status);
+        CHECK_MSTATUS(status);
+        for (unsigned int i = 0; i < connPlugs.length(); ++i) {
+            MObject connObj = connPlugs[i].node(&status);
+            CHECK_MSTATUS(status);
+            if (!connObj.hasFn(MFn::Type::kAnimCurve)) {
+                return false;
+            }
+        }
+    }
+    if (plug.isChild()) {
+        MPlug parentPlug = plug.parent(&status);
+        CHECK_MSTATUS(status);
+        if (parentPlug.isSource() || parentPlug.isDestination()) {
+            return false;
+        }
+    }
+    return true;
+}
+
+
+// Is the world matrix of the transform node given by the translate
+// and rotate attributes alone? The transform must be directly under
+// the world, with the XYZ rotate order, no pivots, a scale of 1, no
+// shear, and translate and rotate attributes not driven by (or
+// driving) other nodes.
+static bool isStandardTransform(const MObject &node) {
+    MStatus status;
+    MFnDagNode dagFn(node, &status);
+    if (status != MS::kSuccess
+        || dagFn.parentCount() != 1
+        || !dagFn.parent(0).hasFn(MFn::Type::kWorld)) {
+        return false;
+    }
+
+    MFnTransform transformFn(node, &status);
+    if (status != MS::kSuccess) {
+        return false;
+    }
+    if (transformFn.rotationOrder() != MTransformationMatrix::kXYZ) {
+        return false;
+    }
+    double scale[3];
+    double shear[3];
+    transformFn.getScale(scale);
+    transformFn.getShear(shear);
+    for (int i = 0; i < 3; ++i) {
+        if (scale[i] != 1.0 || shear[i] != 0.0) {
+            return false;
+        }
+    }
+    const MSpace::Space space = MSpace::kTransform;
+    if (transformFn.rotatePivot(space) != MPoint::origin
+        || transformFn.scalePivot(space) != MPoint::origin
+        || transformFn.rotatePivotTranslation(space) != MVector::zero
+        || transformFn.scalePivotTranslation(space) != MVector::zero
+        || !transformFn.rotateOrientation(space).isEquivalent(MQuaternion::identity)) {
+        return false;
+    }
+
+    const char *attrNames[6] = {
+        "translateX", "translateY", "translateZ",
+        "rotateX", "rotateY", "rotateZ"
+    };
+    for (int i = 0; i < 6; ++i) {
+        MPlug plug = transformFn.findPlug(attrNames[i], &status);
+        if (status != MS::kSuccess || !isPlugDirectlyConnected(plug)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+
+MayaProblem::MayaProblem(SolverData &userData)
+        : m_userData(userData) {
+    const int numberOfParameters = MayaProblem::getNumberOfParameters();
+    m_userData.previousParamList.resize(numberOfParameters, 0);
+
+    MStatus status;
+    const int timeEvalMode = TIME_EVAL_MODE_DG_CONTEXT;
+    MTime currentFrame = MAnimControl::currentTime();
+    for (int i = 0; i < numberOfParameters; ++i) {
+        IndexPair attrPair = m_userData.paramToAttrList[i];
+        AttrPtr attr = m_userData.attrList[attrPair.first];
+
+        // Get frame time
+        MTime frame = currentFrame;
+        if (attrPair.second != -1) {
+            frame = m_userData.frameList[attrPair.second];
+        }
+
+        double value = 0.0;
+        status = attr->getValue(value, frame, timeEvalMode);
+        CHECK_MSTATUS(status);
+        m_userData.previousParamList[i] = value;
+    }
+
+    // The Cameras and Bundles with a world matrix given by the
+    // standard attributes, and the Camera of each (camera, frame)
+    // pair.
+    const char *rotateAttrNames[3] = {"rotateX", "rotateY", "rotateZ"};
+    std::vector<Camera *> cameraList;
+    std::vector<bool> standardCameraList;
+    std::vector<int> markerToCameraList(m_userData.markerList.size(), -1);
+    std::vector<bool> standardMarkerList(m_userData.markerList.size(), false);
+    for (size_t i = 0; i < m_userData.markerList.size(); ++i) {
+        MarkerPtr marker = m_userData.markerList[i];
+        CameraPtr camera = marker->getCamera();
+        BundlePtr bundle = marker->getBundle();
+
+        const int cameraIndex = static_cast<int>(
+            std::find(cameraList.begin(), cameraList.end(), camera.get())
+            - cameraList.begin());
+        if (cameraIndex == static_cast<int>(cameraList.size())) {
+            cameraList.push_back(camera.get());
+            standardCameraList.push_back(
+                isStandardTransform(camera->getTransformObject()));
+            for (int j = 0; j < 3; ++j) {
+                AttrPtr rotateAttr = AttrPtr(new Attr());
+                rotateAttr->setNodeName(camera->getTransformNodeName());
+                rotateAttr->setAttrName(rotateAttrNames[j]);
+                m_cameraRotateAttrList.push_back(rotateAttr);
+            }
+        }
+        markerToCameraList[i] = cameraIndex;
+        standardMarkerList[i] = standardCameraList[cameraIndex]
+            && isStandardTransform(bundle->getObject());
+    }
+
+    const size_t numberOfCameraFrames = m_userData.cameraFrameToMarkerList.size();
+    m_cameraFrameToCameraList.resize(numberOfCameraFrames, 0);
+    for (size_t i = 0; i < numberOfCameraFrames; ++i) {
+        IndexPair markerPair = m_userData.cameraFrameToMarkerList[i];
+        m_cameraFrameToCameraList[i] = markerToCameraList[markerPair.first];
+    }
+    m_cameraFrameDerivativeDataList.resize(numberOfCameraFrames);
+
+    const int numberOfMarkers = m_userData.numberOfMarkerErrors / ERRORS_PER_MARKER;
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        IndexPair markerPair = m_userData.errorToMarkerList[i];
+        if (standardMarkerList[markerPair.first]) {
+            m_derivativeMeasureList.push_back(i);
+        }
+    }
+    m_markerDerivativeList.resize(numberOfMarkers);
+
+    // Rotate derivatives are computed per degree.
+    m_degreesPerAngleUnit = MAngle(1.0, MAngle::uiUnit()).asDegrees();
+
+    // A parameter has analytic derivatives if it is a standard
+    // attribute, and all the Markers it affects are measured with a
+    // standard Camera and Bundle, that the attribute belongs to.
+    m_paramSceneAttrTypeList.resize(numberOfParameters, -1);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        IndexPair attrPair = m_userData.paramToAttrList[i];
+        AttrPtr attr = m_userData.attrList[attrPair.first];
+        const int sceneAttrType = getSceneAttrType(attr->getSolverAttrType());
+        if (sceneAttrType < 0 || !isPlugDirectlyConnected(attr->getPlug())) {
+            continue;
+        }
+
+        bool analytic = true;
+        for (int j = 0; analytic && j < numberOfMarkers; ++j) {
+            if (!m_userData.errorToParamList[j][i]) {
+                continue;
+            }
+            const int markerIndex = m_userData.errorToMarkerList[j].first;
+            MarkerPtr marker = m_userData.markerList[markerIndex];
+            MObject object;
+            if (attr->getObjectType() == OBJECT_TYPE_BUNDLE) {
+                object = marker->getBundle()->getObject();
+            } else if (sceneAttrType == SCENE_ATTR_TYPE_FOCAL_LENGTH) {
+                object = marker->getCamera()->getShapeObject();
+            } else {
+                object = marker->getCamera()->getTransformObject();
+            }
+            analytic = standardMarkerList[markerIndex]
+                && attr->getObject() == object;
+        }
+
+        // Stiffness and smoothness are measured at the current frame,
+        // which only static attributes are known to affect.
+        if (attrPair.second != -1) {
+            for (size_t j = 0; analytic && j < m_userData.attrErrorToParamList.size(); ++j) {
+                analytic = !m_userData.attrErrorToParamList[j][i];
+            }
+        }
+
+        if (analytic) {
+            m_paramSceneAttrTypeList[i] = sceneAttrType;
+        }
+    }
+}
+
+
+int MayaProblem::getNumberOfParameters() const {
+    return static_cast<int>(m_userData.paramToAttrList.size());
+}
+
+
+int MayaProblem::getNumberOfErrors() const {
+    return m_userData.numberOfMarkerErrors
+        + m_userData.numberOfAttrStiffnessErrors
+        + m_userData.numberOfAttrSmoothnessErrors;
+}
+
+
+int MayaProblem::getNumberOfMarkerErrors() const {
+    return m_userData.numberOfMarkerErrors;
+}
+
+
+void MayaProblem::getParameterBounds(const int index,
+                                     double &xmin, double &xmax,
+                                     double &offset, double &scale) const {
+    IndexPair attrPair = m_userData.paramToAttrList[index];
+    AttrPtr attr = m_userData.attrList[attrPair.first];
+    xmin = attr->getMinimumValue();
+    xmax = attr->getMaximumValue();
+    offset = attr->getOffsetValue();
+    scale = attr->getScaleValue();
+}
+
+
+double MayaProblem::getParameterValue(const int index) const {
+    return m_userData.previousParamList[index];
+}
+
+
+void MayaProblem::setParameters(const double *values) {
+    MStatus status;
+    ::setParameters(MayaProblem::getNumberOfParameters(),
+                    values,
+                    &m_userData,
+                    NULL,
+                    status);
+    CHECK_MSTATUS(status);
+}
+
+
+bool MayaProblem::isPointParameter(const int index) const {
+    IndexPair attrPair = m_userData.paramToAttrList[index];
+    AttrPtr attr = m_userData.attrList[attrPair.first];
+    return attr->getObjectType() == OBJECT_TYPE_BUNDLE;
+}
+
+
+void MayaProblem::measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                                double *errors,
+                                double *errorDistances) {
+    MStatus status;
+    std::vector<bool> frameIndexEnable(m_userData.frameList.length(), true);
+    double error_avg = 0.0;
+    double error_max = 0.0;
+    double error_min = 0.0;
+    ::measureErrors(MayaProblem::getNumberOfErrors(),
+                    m_userData.numberOfMarkerErrors,
+                    m_userData.numberOfAttrStiffnessErrors,
+                    m_userData.numberOfAttrSmoothnessErrors,
+                    frameIndexEnable,
+                    markerErrorMeasurements,
+                    errors,
+                    &m_userData,
+                    error_avg, error_max, error_min,
+                    NULL,
+                    status);
+    CHECK_MSTATUS(status);
+
+    const int numberOfMarkers = m_userData.numberOfMarkerErrors / ERRORS_PER_MARKER;
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        errorDistances[i] = m_userData.errorDistanceList[i];
+    }
+}
+
+
+bool MayaProblem::hasAnalyticDerivatives(const int index) const {
+    return m_paramSceneAttrTypeList[index] >= 0;
+}
+
+
+void MayaProblem::measureErrorDerivatives(const std::vector<int> &paramList,
+                                          const IndexList2D &paramToErrorIndexList,
+                                          const std::vector<int> &derivativeStartList,
+                                          double *derivatives) {
+    MayaProblem::measureDerivatives(m_derivativeMeasureList,
+                                    paramList,
+                                    paramToErrorIndexList,
+                                    derivativeStartList,
+                                    derivatives);
+}
+
+
+void MayaProblem::measureDerivatives(const std::vector<int> &measureList,
+                                     const std::vector<int> &paramList,
+                                     const IndexList2D &paramToErrorIndexList,
+                                     const std::vector<int> &derivativeStartList,
+                                     double *derivatives) {
+    MStatus status;
+    const int timeEvalMode = m_userData.solverOptions->timeEvalMode;
+
+    // Evaluate the Bundle frames, using Maya (unless the cached data
+    // is still valid), and the Camera frames used by the Markers
+    // with analytic derivatives.
+    const size_t numberOfCameraFrames = m_userData.cameraFrameToMarkerList.size();
+    std::vector<bool> cameraFrameEvaluate(numberOfCameraFrames, false);
+    std::vector<bool> bundleFrameEvaluate(m_userData.bundleFrameDataList.size(), false);
+    for (size_t i = 0; i < measureList.size(); ++i) {
+        const MarkerErrorData &markerErrorData =
+            m_userData.markerErrorDataList[measureList[i]];
+        cameraFrameEvaluate[markerErrorData.cameraFrameIndex] = true;
+        bundleFrameEvaluate[markerErrorData.bundleFrameIndex] = true;
+    }
+    const std::vector<bool> noCameraFrameEvaluate(numberOfCameraFrames, false);
+    evaluateFrameData(noCameraFrameEvaluate, bundleFrameEvaluate,
+                      &m_userData, status);
+    CHECK_MSTATUS(status);
+
+    MMatrix worldMatrix;
+    MMatrix projectionMatrix;
+    MVector cam_dir;
+    Matrix44 rotateDerivativeMatrix;
+    for (size_t i = 0; i < numberOfCameraFrames; ++i) {
+        if (cameraFrameEvaluate[i] == false) {
+            continue;
+        }
+        IndexPair markerPair = m_userData.cameraFrameToMarkerList[i];
+        MarkerPtr marker = m_userData.markerList[markerPair.first];
+        MTime frame = m_userData.frameList[markerPair.second];
+
+        CameraPtr camera = marker->getCamera();
+        status = camera->getMatrixAttr().getValue(worldMatrix, frame, timeEvalMode);
+        CHECK_MSTATUS(status);
+        status = camera->getProjMatrix(projectionMatrix, frame, timeEvalMode);
+        CHECK_MSTATUS(status);
+        camera->getForwardDirection(cam_dir, frame, timeEvalMode);
+        double focalLength = camera->getFocalLengthValue(frame, timeEvalMode);
+        double filmBackWidth = camera->getFilmbackWidthValue(frame, timeEvalMode);
+        double filmBackHeight = camera->getFilmbackHeightValue(frame, timeEvalMode);
+
+        const int cameraIndex = m_cameraFrameToCameraList[i];
+        double rotate[3];
+        for (int j = 0; j < 3; ++j) {
+            AttrPtr rotateAttr = m_cameraRotateAttrList[(cameraIndex * 3) + j];
+            status = rotateAttr->getValue(rotate[j], frame, timeEvalMode);
+            CHECK_MSTATUS(status);
+            rotate[j] *= m_degreesPerAngleUnit;
+        }
+
+        CameraFrameDerivativeData &cameraData = m_cameraFrameDerivativeDataList[i];
+        for (int j = 0; j < 3; ++j) {
+            cameraData.translate[j] = worldMatrix[3][j];
+            cameraData.forwardDirection[j] = cam_dir[j];
+            for (int k = 0; k < 3; ++k) {
+                cameraData.rotateMatrix[j][k] = worldMatrix[j][k];
+            }
+        }
+        for (int axis = 0; axis < 3; ++axis) {
+            composeRotateMatrixDerivative(rotate, axis, rotateDerivativeMatrix);
+            for (int j = 0; j < 3; ++j) {
+                for (int k = 0; k < 3; ++k) {
+                    cameraData.rotateDerivativeMatrix[axis][j][k] =
+                        rotateDerivativeMatrix.m[j][k];
+                }
+            }
+        }
+        cameraData.projectionScale[0] = projectionMatrix[0][0];
+        cameraData.projectionScale[1] = projectionMatrix[1][1];
+        cameraData.projectionOffset[0] = projectionMatrix[2][0];
+        cameraData.projectionOffset[1] = projectionMatrix[2][1];
+        cameraData.projectionScaleFocalDerivative[0] = cameraData.projectionScale[0] / focalLength;
+        cameraData.projectionScaleFocalDerivative[1] = cameraData.projectionScale[1] / focalLength;
+
+        // Film offsets are not a solver attribute type (see
+        // 'getSceneAttrType'), and use finite differences.
+        cameraData.projectionOffsetFilmOffsetDerivative[0] = 0.0;
+        cameraData.projectionOffsetFilmOffsetDerivative[1] = 0.0;
+        cameraData.filmBackInvAspect = filmBackHeight / filmBackWidth;
+        cameraData.imageWidth = m_userData.imageWidth;
+    }
+
+    // Compute the Marker error derivatives in parallel, without Maya.
+    measureReprojectionDerivatives(measureList,
+                                   m_userData.markerErrorDataList,
+                                   m_cameraFrameDerivativeDataList,
+                                   m_userData.bundleFrameDataList,
+                                   m_userData.threadPool,
+                                   &m_markerDerivativeList[0]);
+
+    // Copy the derivatives of each parameter.
+    const int numberOfMarkerErrors = m_userData.numberOfMarkerErrors;
+    const int numberOfStiffErrors = m_userData.numberOfAttrStiffnessErrors;
+    for (size_t k = 0; k < paramList.size(); ++k) {
+        const int paramIndex = paramList[k];
+        const int sceneAttrType = m_paramSceneAttrTypeList[paramIndex];
+        IndexPair attrPair = m_userData.paramToAttrList[paramIndex];
+        AttrPtr attr = m_userData.attrList[attrPair.first];
+        const bool isCamera = attr->getObjectType() == OBJECT_TYPE_CAMERA;
+
+        // Angles are in the UI unit.
+        double factor = 1.0;
+        if (sceneAttrType >= SCENE_ATTR_TYPE_ROTATE_X
+            && sceneAttrType <= SCENE_ATTR_TYPE_ROTATE_Z) {
+            factor = m_degreesPerAngleUnit;
+        }
+
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[paramIndex];
+        double *values = derivatives + derivativeStartList[paramIndex];
+        for (size_t e = 0; e < errorIndexList.size(); ++e) {
+            const int errorIndex = errorIndexList[e];
+            if (errorIndex < numberOfMarkerErrors) {
+                const ReprojectionDerivatives &markerDerivatives =
+                    m_markerDerivativeList[errorIndex / ERRORS_PER_MARKER];
+                const int axis = errorIndex % ERRORS_PER_MARKER;
+                if (isCamera) {
+                    values[e] = markerDerivatives.camera[axis][sceneAttrType] * factor;
+                } else {
+                    values[e] = markerDerivatives.bundle[axis][sceneAttrType - SCENE_ATTR_TYPE_TRANSLATE_X];
+                }
+                continue;
+            }
+
+            // Stiffness or smoothness of a static attribute.
+            values[e] = 0.0;
+            const int otherIndex = errorIndex - numberOfMarkerErrors;
+            const double attrValue = m_userData.previousParamList[paramIndex];
+            double weight = 0.0;
+            double variance = 1.0;
+            double value = 0.0;
+            if (otherIndex < numberOfStiffErrors) {
+                StiffAttrsPtr stiffAttrs = m_userData.stiffAttrsList[otherIndex];
+                if (stiffAttrs->attrIndex != attrPair.first) {
+                    continue;
+                }
+                stiffAttrs->weightAttr->getValue(weight, timeEvalMode);
+                stiffAttrs->varianceAttr->getValue(variance, timeEvalMode);
+                stiffAttrs->valueAttr->getValue(value, timeEvalMode);
+            } else {
+                SmoothAttrsPtr smoothAttrs =
+                    m_userData.smoothAttrsList[otherIndex - numberOfStiffErrors];
+                if (smoothAttrs->attrIndex != attrPair.first) {
+                    continue;
+                }
+                smoothAttrs->weightAttr->getValue(weight, timeEvalMode);
+                smoothAttrs->varianceAttr->getValue(variance, timeEvalMode);
+                smoothAttrs->valueAttr->getValue(value, timeEvalMode);
+            }
+            values[e] = weight * inverseGaussianDerivative(attrValue, value, variance);
+        }
+    }
+}
+
+
+void MayaProblem::getErrorToParameterRelationship(BoolList2D &errorToParamList) const {
+    errorToParamList = m_userData.errorToParamList;
+}
+
+
+void MayaProblem::getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const {
+    otherErrorToParamList = m_userData.attrErrorToParamList;
+}
+
+
+Problem *MayaProblem::createSubProblem(const std::vector<int> &paramList,
+                                       const std::vector<int> &markerErrorList,
+                                       const std::vector<int> &otherErrorList,
+                                       const int threadCount) {
+    UNUSED(threadCount);
+    return new MayaSubProblem(*this, paramList, markerErrorList, otherErrorList);
+}
+
+
+bool MayaProblem::isThreadSafe() const {
+    return false;
+}
+
+
+void MayaProblem::setProgress(const int iteration) {
+    m_userData.computation->setProgress(iteration);
+}
+
+
+bool MayaProblem::isInterruptRequested() {
+    if (!m_userData.userInterrupted
+        && m_userData.computation->isInterruptRequested()) {
+        WRN("User wants to cancel the evaluation!");
+        m_userData.userInterrupted = true;
+    }
+    return m_userData.userInterrupted;
+}
+
+
+MayaSubProblem::MayaSubProblem(MayaProblem &problem,
+                               const std::vector<int> &paramList,
+                               const std::vector<int> &markerErrorList,
+                               const std::vector<int> &otherErrorList)
+        : m_problem(problem),
+          m_paramList(paramList),
+          m_markerErrorList(markerErrorList),
+          m_otherErrorList(otherErrorList) {
+    const std::vector<int> &derivativeMeasureList = m_problem.m_derivativeMeasureList;
+    for (size_t i = 0; i < m_markerErrorList.size(); ++i) {
+        if (std::binary_search(derivativeMeasureList.begin(),
+                               derivativeMeasureList.end(),
+                               m_markerErrorList[i])) {
+            m_derivativeMeasureList.push_back(m_markerErrorList[i]);
+        }
+    }
+
+    const int numberOfParameters = m_problem.getNumberOfParameters();
+    const int numberOfMarkers = m_problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    m_problemParamList.resize(numberOfParameters, 0);
+    m_problemMarkerErrorMeasurements.resize(numberOfMarkers, false);
+    m_problemErrorList.resize(m_problem.getNumberOfErrors(), 0);
+    m_problemErrorDistanceList.resize(numberOfMarkers, 0);
+    m_problemParamToErrorIndexList.resize(numberOfParameters);
+    m_problemDerivativeStartList.resize(numberOfParameters + 1, 0);
+}
+
+
+int MayaSubProblem::getNumberOfParameters() const {
+    return static_cast<int>(m_paramList.size());
+}
+
+
+int MayaSubProblem::getNumberOfErrors() const {
+    return MayaSubProblem::getNumberOfMarkerErrors()
+        + static_cast<int>(m_otherErrorList.size());
+}
+
+
+int MayaSubProblem::getNumberOfMarkerErrors() const {
+    return static_cast<int>(m_markerErrorList.size()) * ERRORS_PER_MARKER;
+}
+
+
+int MayaSubProblem::getProblemErrorIndex(const int index) const {
+    const int numberOfMarkerErrors = MayaSubProblem::getNumberOfMarkerErrors();
+    if (index < numberOfMarkerErrors) {
+        return (m_markerErrorList[index / ERRORS_PER_MARKER] * ERRORS_PER_MARKER)
+            + (index % ERRORS_PER_MARKER);
+    }
+    return m_problem.getNumberOfMarkerErrors()
+        + m_otherErrorList[index - numberOfMarkerErrors];
+}
+
+
+void MayaSubProblem::getParameterBounds(const int index,
+                                        double &xmin, double &xmax,
+                                        double &offset, double &scale) const {
+    m_problem.getParameterBounds(m_paramList[index], xmin, xmax, offset, scale);
+}
+
+
+double MayaSubProblem::getParameterValue(const int index) const {
+    return m_problem.getParameterValue(m_paramList[index]);
+}
+
+
+void MayaSubProblem::setParameters(const double *values) {
+    m_problemParamList = m_problem.m_userData.previousParamList;
+    for (size_t i = 0; i < m_paramList.size(); ++i) {
+        m_problemParamList[m_paramList[i]] = values[i];
+    }
+    m_problem.setParameters(&m_problemParamList[0]);
+}
+
+
+bool MayaSubProblem::isPointParameter(const int index) const {
+    return m_problem.isPointParameter(m_paramList[index]);
+}
+
+
+void MayaSubProblem::measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                                   double *errors,
+                                   double *errorDistances) {
+    std::fill(m_problemMarkerErrorMeasurements.begin(),
+              m_problemMarkerErrorMeasurements.end(),
+              false);
+    for (size_t i = 0; i < m_markerErrorList.size(); ++i) {
+        m_problemMarkerErrorMeasurements[m_markerErrorList[i]] = markerErrorMeasurements[i];
+    }
+    m_problem.measureErrors(m_problemMarkerErrorMeasurements,
+                            &m_problemErrorList[0],
+                            &m_problemErrorDistanceList[0]);
+
+    const int numberOfErrors = MayaSubProblem::getNumberOfErrors();
+    for (int i = 0; i < numberOfErrors; ++i) {
+        errors[i] = m_problemErrorList[MayaSubProblem::getProblemErrorIndex(i)];
+    }
+    for (size_t i = 0; i < m_markerErrorList.size(); ++i) {
+        errorDistances[i] = m_problemErrorDistanceList[m_markerErrorList[i]];
+    }
+}
+
+
+bool MayaSubProblem::hasAnalyticDerivatives(const int index) const {
+    return m_problem.hasAnalyticDerivatives(m_paramList[index]);
+}
+
+
+void MayaSubProblem::measureErrorDerivatives(const std::vector<int> &paramList,
+                                             const IndexList2D &paramToErrorIndexList,
+                                             const std::vector<int> &derivativeStartList,
+                                             double *derivatives) {
+    // The derivatives of each parameter are written to the same
+    // place in 'derivatives', using the indices of the MayaProblem.
+    std::vector<int> problemParamList(paramList.size());
+    for (size_t k = 0; k < paramList.size(); ++k) {
+        const int index = paramList[k];
+        const int problemIndex = m_paramList[index];
+        problemParamList[k] = problemIndex;
+        m_problemDerivativeStartList[problemIndex] = derivativeStartList[index];
+
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[index];
+        std::vector<int> &problemErrorIndexList = m_problemParamToErrorIndexList[problemIndex];
+        problemErrorIndexList.resize(errorIndexList.size());
+        for (size_t e = 0; e < errorIndexList.size(); ++e) {
+            problemErrorIndexList[e] = MayaSubProblem::getProblemErrorIndex(errorIndexList[e]);
+        }
+    }
+    m_problem.measureDerivatives(m_derivativeMeasureList,
+                                 problemParamList,
+                                 m_problemParamToErrorIndexList,
+                                 m_problemDerivativeStartList,
+                                 derivatives);
+}
+
+
+void MayaSubProblem::getErrorToParameterRelationship(BoolList2D &errorToParamList) const {
+    const BoolList2D &problemErrorToParamList = m_problem.m_userData.errorToParamList;
+    errorToParamList.clear();
+    errorToParamList.resize(m_markerErrorList.size());
+    for (size_t i = 0; i < m_markerErrorList.size(); ++i) {
+        errorToParamList[i].resize(m_paramList.size(), false);
+        for (size_t j = 0; j < m_paramList.size(); ++j) {
+            errorToParamList[i][j] = problemErrorToParamList[m_markerErrorList[i]][m_paramList[j]];
+        }
+    }
+}
+
+
+void MayaSubProblem::getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const {
+    const BoolList2D &problemErrorToParamList = m_problem.m_userData.attrErrorToParamList;
+    otherErrorToParamList.clear();
+    otherErrorToParamList.resize(m_otherErrorList.size());
+    for (size_t i = 0; i < m_otherErrorList.size(); ++i) {
+        otherErrorToParamList[i].resize(m_paramList.size(), false);
+        for (size_t j = 0; j < m_paramList.size(); ++j) {
+            otherErrorToParamList[i][j] = problemErrorToParamList[m_otherErrorList[i]][m_paramList[j]];
+        }
+    }
+}
+
+
+bool MayaSubProblem::isThreadSafe() const {
+    return false;
+}
+
+
+void MayaSubProblem::setProgress(const int iteration) {
+    m_problem.setProgress(iteration);
+}
+
+
+bool MayaSubProblem::isInterruptRequested() {
+    return m_problem.isInterruptRequested();
+}
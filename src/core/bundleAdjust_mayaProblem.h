@@ -0,0 +1,214 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A Problem using the Cameras, Markers, Bundles and Attributes of the
+ * Maya scene, solved by 'solve' (see bundleAdjust_base.cpp) with
+ * 'solveProblemComponents'.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_MAYA_PROBLEM_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_MAYA_PROBLEM_H
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_data.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <Attr.h>
+
+
+// The parameters, errors and relationships of the Problem are given
+// by 'userData'. The Maya attributes are changed (without recording
+// undo) as the parameters are set.
+//
+// The parameter values are read from Maya when the MayaProblem is
+// created, and are stored (as external values) in
+// 'userData.previousParamList'.
+//
+// The solve reports progress to, and may be cancelled with,
+// 'userData.computation'.
+//
+// Analytic derivatives are computed for the standard attributes of
+// Cameras and Bundles (see 'hasAnalyticDerivatives'); all other
+// attributes may be driven by any DG network, and use finite
+// differences.
+class MayaProblem : public Problem {
+public:
+    MayaProblem(SolverData &userData);
+
+    int getNumberOfParameters() const;
+
+    int getNumberOfErrors() const;
+
+    int getNumberOfMarkerErrors() const;
+
+    void getParameterBounds(const int index,
+                            double &xmin, double &xmax,
+                            double &offset, double &scale) const;
+
+    double getParameterValue(const int index) const;
+
+    void setParameters(const double *values);
+
+    bool isPointParameter(const int index) const;
+
+    void measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                       double *errors,
+                       double *errorDistances);
+
+    // True if the parameter is a translate, rotate or focal length
+    // attribute (see 'computeSolverAttrType') of a Camera or Bundle
+    // transform directly under the world, with default rotate order,
+    // pivots, scale and shear, that is not connected to any other
+    // node (other than an animCurve), and all the errors affected by
+    // the parameter are measured with such Cameras and Bundles.
+    bool hasAnalyticDerivatives(const int index) const;
+
+    void measureErrorDerivatives(const std::vector<int> &paramList,
+                                 const IndexList2D &paramToErrorIndexList,
+                                 const std::vector<int> &derivativeStartList,
+                                 double *derivatives);
+
+    void getErrorToParameterRelationship(BoolList2D &errorToParamList) const;
+
+    void getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const;
+
+    // A MayaSubProblem, using the Maya scene of this Problem.
+    Problem *createSubProblem(const std::vector<int> &paramList,
+                              const std::vector<int> &markerErrorList,
+                              const std::vector<int> &otherErrorList,
+                              const int threadCount);
+
+    // The Maya DG must only be evaluated from the main thread.
+    bool isThreadSafe() const;
+
+    void setProgress(const int iteration);
+
+    bool isInterruptRequested();
+
+private:
+    friend class MayaSubProblem;
+
+    // Compute the derivatives of 'paramList' (as
+    // 'measureErrorDerivatives'), measuring the Marker error
+    // derivatives of the (marker, frame) pairs in 'measureList' only.
+    void measureDerivatives(const std::vector<int> &measureList,
+                            const std::vector<int> &paramList,
+                            const IndexList2D &paramToErrorIndexList,
+                            const std::vector<int> &derivativeStartList,
+                            double *derivatives);
+
+    SolverData &m_userData;
+
+    // The SCENE_ATTR_TYPE_* of each parameter with analytic
+    // derivatives, or -1 for finite differences.
+    std::vector<int> m_paramSceneAttrTypeList;
+
+    // The (index of the) Camera of each (camera, frame) pair, and the
+    // rotate attributes of each Camera.
+    std::vector<int> m_cameraFrameToCameraList;
+    std::vector<AttrPtr> m_cameraRotateAttrList;
+    double m_degreesPerAngleUnit;
+
+    // The (marker, frame) pairs measured with standard Cameras and
+    // Bundles, and the derivative data.
+    std::vector<int> m_derivativeMeasureList;
+    std::vector<CameraFrameDerivativeData> m_cameraFrameDerivativeDataList;
+    std::vector<ReprojectionDerivatives> m_markerDerivativeList;
+};
+
+
+// A subset of the parameters and errors of a MayaProblem (see
+// 'Problem::createSubProblem').
+//
+// The parameters are set, and the errors measured, with the Maya
+// scene of the MayaProblem; only the parameters of the sub-problem
+// are changed, and only its errors are measured.
+class MayaSubProblem : public Problem {
+public:
+    MayaSubProblem(MayaProblem &problem,
+                   const std::vector<int> &paramList,
+                   const std::vector<int> &markerErrorList,
+                   const std::vector<int> &otherErrorList);
+
+    int getNumberOfParameters() const;
+
+    int getNumberOfErrors() const;
+
+    int getNumberOfMarkerErrors() const;
+
+    void getParameterBounds(const int index,
+                            double &xmin, double &xmax,
+                            double &offset, double &scale) const;
+
+    double getParameterValue(const int index) const;
+
+    void setParameters(const double *values);
+
+    bool isPointParameter(const int index) const;
+
+    void measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                       double *errors,
+                       double *errorDistances);
+
+    bool hasAnalyticDerivatives(const int index) const;
+
+    void measureErrorDerivatives(const std::vector<int> &paramList,
+                                 const IndexList2D &paramToErrorIndexList,
+                                 const std::vector<int> &derivativeStartList,
+                                 double *derivatives);
+
+    void getErrorToParameterRelationship(BoolList2D &errorToParamList) const;
+
+    void getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const;
+
+    bool isThreadSafe() const;
+
+    void setProgress(const int iteration);
+
+    bool isInterruptRequested();
+
+private:
+    // The index of an error of this sub-problem, in the MayaProblem.
+    int getProblemErrorIndex(const int index) const;
+
+    MayaProblem &m_problem;
+
+    // Indices of the parameters, (marker, frame) pairs and other
+    // errors in the MayaProblem.
+    std::vector<int> m_paramList;
+    std::vector<int> m_markerErrorList;
+    std::vector<int> m_otherErrorList;
+
+    // The (marker, frame) pairs with analytic derivatives.
+    std::vector<int> m_derivativeMeasureList;
+
+    // Parameters, errors and derivative indices of the MayaProblem.
+    std::vector<double> m_problemParamList;
+    std::vector<bool> m_problemMarkerErrorMeasurements;
+    std::vector<double> m_problemErrorList;
+    std::vector<double> m_problemErrorDistanceList;
+    IndexList2D m_problemParamToErrorIndexList;
+    std::vector<int> m_problemDerivativeStartList;
+};
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_MAYA_PROBLEM_H
@@ -0,0 +1,197 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Group parameters for computing a sparse finite-difference Jacobian.
+ */
+
+// STL
+#include <algorithm>
+#include <cassert>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_parameterGroups.h>
+
+
+void findParameterToErrorIndexList(const int numberOfParameters,
+                                   const BoolList2D &markerErrorToParamList,
+                                   const BoolList2D &otherErrorToParamList,
+                                   IndexList2D &paramToErrorIndexList) {
+    const int numberOfMarkers = static_cast<int>(markerErrorToParamList.size());
+    const int numberOfMarkerErrors = numberOfMarkers * ERRORS_PER_MARKER;
+
+    paramToErrorIndexList.clear();
+    paramToErrorIndexList.resize(numberOfParameters);
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        const std::vector<bool> &paramList = markerErrorToParamList[i];
+        for (int j = 0; j < numberOfParameters; ++j) {
+            if (paramList[j] == false) {
+                continue;
+            }
+            for (int k = 0; k < ERRORS_PER_MARKER; ++k) {
+                paramToErrorIndexList[j].push_back((i * ERRORS_PER_MARKER) + k);
+            }
+        }
+    }
+    for (size_t i = 0; i < otherErrorToParamList.size(); ++i) {
+        const std::vector<bool> &paramList = otherErrorToParamList[i];
+        for (int j = 0; j < numberOfParameters; ++j) {
+            if (paramList[j]) {
+                paramToErrorIndexList[j].push_back(numberOfMarkerErrors + i);
+            }
+        }
+    }
+    return;
+}
+
+
+// Parameters are coloured in order of the number of errors they
+// affect (largest first), each taking the first group that has no
+// parameter affecting the same errors.
+void findParameterGroups(const int numberOfErrors,
+                         const IndexList2D &paramToErrorIndexList,
+                         IndexList2D &paramGroupList) {
+    const int numberOfParameters = static_cast<int>(paramToErrorIndexList.size());
+
+    // The parameters affecting each error.
+    IndexList2D errorToParamIndexList(numberOfErrors);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[i];
+        for (size_t j = 0; j < errorIndexList.size(); ++j) {
+            assert(errorIndexList[j] < numberOfErrors);
+            errorToParamIndexList[errorIndexList[j]].push_back(i);
+        }
+    }
+
+    std::vector<std::pair<int, int> > orderList(numberOfParameters);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const int count = static_cast<int>(paramToErrorIndexList[i].size());
+        orderList[i] = std::pair<int, int>(-count, i);
+    }
+    std::sort(orderList.begin(), orderList.end());
+
+    // 'groupUsedList[k] == i' means group 'k' cannot be used for
+    // parameter 'i'.
+    std::vector<int> paramGroupIndexList(numberOfParameters, -1);
+    std::vector<int> groupUsedList;
+    paramGroupList.clear();
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const int paramIndex = orderList[i].second;
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[paramIndex];
+        for (size_t j = 0; j < errorIndexList.size(); ++j) {
+            const std::vector<int> &otherParamList = errorToParamIndexList[errorIndexList[j]];
+            for (size_t k = 0; k < otherParamList.size(); ++k) {
+                const int groupIndex = paramGroupIndexList[otherParamList[k]];
+                if (groupIndex >= 0) {
+                    groupUsedList[groupIndex] = paramIndex;
+                }
+            }
+        }
+
+        int groupIndex = 0;
+        while ((groupIndex < static_cast<int>(paramGroupList.size()))
+               && (groupUsedList[groupIndex] == paramIndex)) {
+            ++groupIndex;
+        }
+        if (groupIndex == static_cast<int>(paramGroupList.size())) {
+            paramGroupList.push_back(std::vector<int>());
+            groupUsedList.push_back(-1);
+        }
+        paramGroupList[groupIndex].push_back(paramIndex);
+        paramGroupIndexList[paramIndex] = groupIndex;
+    }
+
+    // Keep the parameters of each group in order.
+    for (size_t i = 0; i < paramGroupList.size(); ++i) {
+        std::sort(paramGroupList[i].begin(), paramGroupList[i].end());
+    }
+    return;
+}
+
+
+// Find the root of the component of 'index', and compress the path.
+static int findComponentRoot(std::vector<int> &rootList, int index) {
+    int root = index;
+    while (rootList[root] != root) {
+        root = rootList[root];
+    }
+    while (rootList[index] != root) {
+        const int next = rootList[index];
+        rootList[index] = root;
+        index = next;
+    }
+    return root;
+}
+
+
+// The components are found with a union-find over the parameters,
+// joining all the parameters affecting each error.
+void findParameterComponents(const int numberOfErrors,
+                             const IndexList2D &paramToErrorIndexList,
+                             IndexList2D &componentParamList,
+                             IndexList2D &componentErrorList) {
+    const int numberOfParameters = static_cast<int>(paramToErrorIndexList.size());
+
+    std::vector<int> rootList(numberOfParameters);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        rootList[i] = i;
+    }
+    std::vector<int> errorParamList(numberOfErrors, -1);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[i];
+        for (size_t j = 0; j < errorIndexList.size(); ++j) {
+            const int errorIndex = errorIndexList[j];
+            assert(errorIndex < numberOfErrors);
+            if (errorParamList[errorIndex] < 0) {
+                errorParamList[errorIndex] = i;
+                continue;
+            }
+            const int rootA = findComponentRoot(rootList, errorParamList[errorIndex]);
+            const int rootB = findComponentRoot(rootList, i);
+            if (rootA != rootB) {
+                rootList[std::max(rootA, rootB)] = std::min(rootA, rootB);
+            }
+        }
+    }
+
+    // Components are ordered by their first parameter.
+    std::vector<int> componentIndexList(numberOfParameters, -1);
+    componentParamList.clear();
+    componentErrorList.clear();
+    for (int i = 0; i < numberOfParameters; ++i) {
+        if (paramToErrorIndexList[i].empty()) {
+            continue;
+        }
+        const int root = findComponentRoot(rootList, i);
+        if (componentIndexList[root] < 0) {
+            componentIndexList[root] = static_cast<int>(componentParamList.size());
+            componentParamList.push_back(std::vector<int>());
+        }
+        componentParamList[componentIndexList[root]].push_back(i);
+    }
+    componentErrorList.resize(componentParamList.size());
+    for (int i = 0; i < numberOfErrors; ++i) {
+        if (errorParamList[i] < 0) {
+            continue;
+        }
+        const int root = findComponentRoot(rootList, errorParamList[i]);
+        componentErrorList[componentIndexList[root]].push_back(i);
+    }
+    return;
+}
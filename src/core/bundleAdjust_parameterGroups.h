@@ -0,0 +1,80 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Group parameters for computing a sparse finite-difference Jacobian.
+ *
+ * Most parameters (a bundle position, or a camera attribute on a
+ * single frame) only affect a small number of errors. Parameters
+ * that affect no errors in common can be changed at the same time,
+ * and all of their Jacobian columns computed from a single
+ * evaluation of the errors. The groups are found with a greedy
+ * graph colouring, so the number of evaluations needed for a
+ * Jacobian is reduced from the number of parameters to the number
+ * of groups.
+ *
+ * Parameters that are connected through the errors (directly, or
+ * through other parameters) form a connected component. Components
+ * share no parameters or errors, so each can be solved as an
+ * independent problem.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PARAMETER_GROUPS_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PARAMETER_GROUPS_H
+
+// STL
+#include <vector>
+
+
+typedef std::vector<std::vector<bool> > BoolList2D;
+typedef std::vector<std::vector<int> > IndexList2D;
+
+
+// Find the indices of the errors affected by each parameter.
+//
+// 'markerErrorToParamList' has a row for each (marker, frame) pair,
+// affecting ERRORS_PER_MARKER errors. 'otherErrorToParamList' has a
+// row for each error after the marker errors (such as attribute
+// stiffness and smoothness), affecting a single error.
+void findParameterToErrorIndexList(const int numberOfParameters,
+                                   const BoolList2D &markerErrorToParamList,
+                                   const BoolList2D &otherErrorToParamList,
+                                   IndexList2D &paramToErrorIndexList);
+
+
+// Split the parameters into groups, where no two parameters in a
+// group affect the same error.
+void findParameterGroups(const int numberOfErrors,
+                         const IndexList2D &paramToErrorIndexList,
+                         IndexList2D &paramGroupList);
+
+
+// Split the parameters into connected components; two parameters are
+// in the same component when they affect the same error, or are both
+// connected to another parameter in the component.
+//
+// 'componentErrorList[i]' is the (sorted) errors affected by the
+// parameters of 'componentParamList[i]'. Parameters that affect no
+// errors are not part of any component.
+void findParameterComponents(const int numberOfErrors,
+                             const IndexList2D &paramToErrorIndexList,
+                             IndexList2D &componentParamList,
+                             IndexList2D &componentErrorList);
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PARAMETER_GROUPS_H
@@ -0,0 +1,598 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A bundle adjustment problem using array-based Cameras, Bundles and
+ * Markers.
+ *
+ * The errors are measured the same way as 'measureErrors' in
+ * bundleAdjust_solveFunc.cpp (used by MayaProblem).
+ */
+
+// STL
+#include <cmath>
+#include <cassert>
+#include <map>
+
+// Utils
+#include <utilities/debugUtils.h>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_math.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <core/bundleAdjust_threadPool.h>
+
+
+Problem *Problem::createSubProblem(const std::vector<int> &paramList,
+                                   const std::vector<int> &markerErrorList,
+                                   const std::vector<int> &otherErrorList,
+                                   const int threadCount) {
+    UNUSED(paramList);
+    UNUSED(markerErrorList);
+    UNUSED(otherErrorList);
+    UNUSED(threadCount);
+    return NULL;
+}
+
+
+bool Problem::isThreadSafe() const {
+    return true;
+}
+
+
+void Problem::setProgress(const int iteration) {
+    UNUSED(iteration);
+}
+
+
+bool Problem::isInterruptRequested() {
+    return false;
+}
+
+
+SceneProblem::SceneProblem(Scene &scene,
+                           const SceneAttrList &attrList,
+                           const int threadCount)
+        : m_scene(scene),
+          m_attrList(attrList),
+          m_threadPool(threadCount) {
+    // Parameters.
+    for (int i = 0; i < static_cast<int>(m_attrList.size()); ++i) {
+        const SceneAttr &attr = m_attrList[i];
+        if (!isValidSceneAttr(m_scene, attr)) {
+            ERR("Invalid scene attribute; index=" << i);
+            continue;
+        }
+        if (attr.animated) {
+            for (int j = 0; j < m_scene.numberOfFrames; ++j) {
+                m_paramToAttrList.push_back(IndexPair(i, j));
+            }
+        } else {
+            m_paramToAttrList.push_back(IndexPair(i, -1));
+        }
+
+        if (attr.stiffnessWeight > 0.0) {
+            m_stiffAttrList.push_back(i);
+        }
+        if (attr.smoothnessWeight > 0.0) {
+            m_smoothAttrList.push_back(i);
+        }
+    }
+
+    // Marker errors, for each enabled marker on each frame.
+    std::map<int, double> weightMaxPerFrame;
+    std::vector<double> weightList;
+    for (int i = 0; i < static_cast<int>(m_scene.markers.size()); ++i) {
+        const SceneMarker &marker = m_scene.markers[i];
+        for (int j = 0; j < m_scene.numberOfFrames; ++j) {
+            const MarkerFrame &frame = marker.frames[j];
+            if ((frame.enable == false) || (frame.weight <= 0.0)) {
+                continue;
+            }
+            m_errorToMarkerList.push_back(IndexPair(i, j));
+            weightList.push_back(frame.weight);
+
+            std::map<int, double>::iterator it = weightMaxPerFrame.find(j);
+            if (it == weightMaxPerFrame.end()) {
+                weightMaxPerFrame[j] = frame.weight;
+            } else if (frame.weight > it->second) {
+                it->second = frame.weight;
+            }
+        }
+    }
+
+    // Normalise the weights per-frame, using the weight 'max'.
+    for (size_t i = 0; i < m_errorToMarkerList.size(); ++i) {
+        int frameIndex = m_errorToMarkerList[i].second;
+        weightList[i] /= weightMaxPerFrame[frameIndex];
+    }
+    initMarkerErrors(weightList);
+}
+
+
+// A sub-problem uses the (normalised) marker weights of the parent,
+// so the errors are the same as the errors of the parent.
+SceneProblem::SceneProblem(const SceneProblem &parent,
+                           const std::vector<int> &paramList,
+                           const std::vector<int> &markerErrorList,
+                           const std::vector<int> &otherErrorList,
+                           const int threadCount)
+        : m_scene(parent.m_scene),
+          m_attrList(parent.m_attrList),
+          m_threadPool(threadCount) {
+    for (size_t i = 0; i < paramList.size(); ++i) {
+        m_paramToAttrList.push_back(parent.m_paramToAttrList[paramList[i]]);
+    }
+
+    std::vector<double> weightList;
+    for (size_t i = 0; i < markerErrorList.size(); ++i) {
+        const int index = markerErrorList[i];
+        m_errorToMarkerList.push_back(parent.m_errorToMarkerList[index]);
+        weightList.push_back(parent.m_markerErrorDataList[index].weight);
+    }
+
+    // The other errors are the stiffness errors, followed by the
+    // smoothness errors.
+    const int numberOfStiffErrors = static_cast<int>(parent.m_stiffAttrList.size());
+    for (size_t i = 0; i < otherErrorList.size(); ++i) {
+        const int index = otherErrorList[i];
+        if (index < numberOfStiffErrors) {
+            m_stiffAttrList.push_back(parent.m_stiffAttrList[index]);
+        } else {
+            m_smoothAttrList.push_back(parent.m_smoothAttrList[index - numberOfStiffErrors]);
+        }
+    }
+    initMarkerErrors(weightList);
+}
+
+
+// Initialise the data used to measure the marker errors, from the
+// (marker, frame) pairs and the normalised weight of each pair.
+//
+// Each unique (camera, frame) and (bundle, frame) pair is stored
+// once, so the camera and bundle data is evaluated once, no matter
+// how many markers use it.
+void SceneProblem::initMarkerErrors(const std::vector<double> &weightList) {
+    std::map<IndexPair, int> cameraFrameMap;
+    std::map<IndexPair, int> bundleFrameMap;
+    for (size_t i = 0; i < m_errorToMarkerList.size(); ++i) {
+        const IndexPair &markerPair = m_errorToMarkerList[i];
+        const SceneMarker &marker = m_scene.markers[markerPair.first];
+        const int frameIndex = markerPair.second;
+        const MarkerFrame &frame = marker.frames[frameIndex];
+
+        const IndexPair cameraFrame(marker.cameraIndex, frameIndex);
+        std::map<IndexPair, int>::iterator cameraIt = cameraFrameMap.find(cameraFrame);
+        if (cameraIt == cameraFrameMap.end()) {
+            cameraIt = cameraFrameMap.insert(
+                std::make_pair(cameraFrame, static_cast<int>(m_cameraFrameList.size()))).first;
+            m_cameraFrameList.push_back(cameraFrame);
+        }
+        const IndexPair bundleFrame(marker.bundleIndex, frameIndex);
+        std::map<IndexPair, int>::iterator bundleIt = bundleFrameMap.find(bundleFrame);
+        if (bundleIt == bundleFrameMap.end()) {
+            bundleIt = bundleFrameMap.insert(
+                std::make_pair(bundleFrame, static_cast<int>(m_bundleFrameList.size()))).first;
+            m_bundleFrameList.push_back(bundleFrame);
+        }
+
+        MarkerErrorData markerErrorData;
+        markerErrorData.cameraFrameIndex = cameraIt->second;
+        markerErrorData.bundleFrameIndex = bundleIt->second;
+        markerErrorData.x = frame.x;
+        markerErrorData.y = frame.y;
+        markerErrorData.weight = weightList[i];
+        m_markerErrorDataList.push_back(markerErrorData);
+    }
+    m_cameraFrameDataList.resize(m_cameraFrameList.size());
+    m_bundleFrameDataList.resize(m_bundleFrameList.size());
+    m_cameraFrameDerivativeDataList.resize(m_cameraFrameList.size());
+    m_markerDerivativeList.resize(m_errorToMarkerList.size());
+
+    // The frames affected by each parameter; camera attributes only
+    // change camera data, and bundle attributes only bundle data.
+    const int numberOfParameters = getNumberOfParameters();
+    BoolList2D errorToParamList;
+    getErrorToParameterRelationship(errorToParamList);
+    std::vector<bool> paramCameraList(numberOfParameters, false);
+    std::vector<bool> paramBundleList(numberOfParameters, false);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const SceneAttr &attr = m_attrList[m_paramToAttrList[i].first];
+        paramCameraList[i] = attr.objectType == SCENE_OBJECT_TYPE_CAMERA;
+        paramBundleList[i] = attr.objectType == SCENE_OBJECT_TYPE_BUNDLE;
+    }
+    initFrameDataCache(numberOfParameters,
+                       static_cast<int>(m_cameraFrameList.size()),
+                       static_cast<int>(m_bundleFrameList.size()),
+                       errorToParamList,
+                       paramCameraList,
+                       paramBundleList,
+                       m_markerErrorDataList,
+                       m_frameDataCache);
+    m_parameterValueList.resize(numberOfParameters);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        m_parameterValueList[i] = getParameterValue(i);
+    }
+    return;
+}
+
+
+int SceneProblem::getNumberOfParameters() const {
+    return static_cast<int>(m_paramToAttrList.size());
+}
+
+
+int SceneProblem::getNumberOfErrors() const {
+    return getNumberOfMarkerErrors()
+           + static_cast<int>(m_stiffAttrList.size())
+           + static_cast<int>(m_smoothAttrList.size());
+}
+
+
+int SceneProblem::getNumberOfMarkerErrors() const {
+    return static_cast<int>(m_errorToMarkerList.size()) * ERRORS_PER_MARKER;
+}
+
+
+void SceneProblem::getParameterBounds(const int index,
+                                      double &xmin, double &xmax,
+                                      double &offset, double &scale) const {
+    const SceneAttr &attr = m_attrList[m_paramToAttrList[index].first];
+    xmin = attr.minValue;
+    xmax = attr.maxValue;
+    offset = attr.offset;
+    scale = attr.scale;
+    return;
+}
+
+
+double SceneProblem::getParameterValue(const int index) const {
+    const IndexPair &attrPair = m_paramToAttrList[index];
+    const SceneAttr &attr = m_attrList[attrPair.first];
+    return getSceneAttrValue(m_scene, attr, attrPair.second);
+}
+
+
+void SceneProblem::setParameters(const double *values) {
+    const int numberOfParameters = getNumberOfParameters();
+    if (numberOfParameters == 0) {
+        return;
+    }
+    invalidateFrameDataCache(numberOfParameters, values,
+                             &m_parameterValueList[0],
+                             m_frameDataCache);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        if (values[i] == m_parameterValueList[i]) {
+            continue;
+        }
+        const IndexPair &attrPair = m_paramToAttrList[i];
+        const SceneAttr &attr = m_attrList[attrPair.first];
+        setSceneAttrValue(m_scene, attr, attrPair.second, values[i]);
+        m_parameterValueList[i] = values[i];
+    }
+    return;
+}
+
+
+bool SceneProblem::isPointParameter(const int index) const {
+    const IndexPair &attrPair = m_paramToAttrList[index];
+    return m_attrList[attrPair.first].objectType == SCENE_OBJECT_TYPE_BUNDLE;
+}
+
+
+void SceneProblem::measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                                 double *errors,
+                                 double *errorDistances) {
+    const int numberOfMarkerErrorPairs = static_cast<int>(m_errorToMarkerList.size());
+    assert(markerErrorMeasurements.size() == m_errorToMarkerList.size());
+
+    // Find the camera and bundle frames used by the measured errors.
+    std::vector<int> measureList;
+    measureList.reserve(numberOfMarkerErrorPairs);
+    std::vector<bool> cameraFrameEvaluate(m_cameraFrameList.size(), false);
+    std::vector<bool> bundleFrameEvaluate(m_bundleFrameList.size(), false);
+    for (int i = 0; i < numberOfMarkerErrorPairs; ++i) {
+        if (markerErrorMeasurements[i] == false) {
+            continue;
+        }
+        const MarkerErrorData &markerErrorData = m_markerErrorDataList[i];
+        cameraFrameEvaluate[markerErrorData.cameraFrameIndex] = true;
+        bundleFrameEvaluate[markerErrorData.bundleFrameIndex] = true;
+        measureList.push_back(i);
+    }
+
+    // Evaluate each camera and bundle frame once, unless the cached
+    // data is still valid.
+    FrameDataCache &cache = m_frameDataCache;
+    Matrix44 cameraWorldMatrix;
+    for (size_t i = 0; i < m_cameraFrameList.size(); ++i) {
+        if (cameraFrameEvaluate[i] == false) {
+            continue;
+        }
+        if (cache.cameraFrameValidList[i]) {
+            ++cache.cameraFrameCacheHits;
+            continue;
+        }
+        cache.cameraFrameValidList[i] = true;
+        ++cache.cameraFrameEvaluations;
+        const IndexPair &cameraPair = m_cameraFrameList[i];
+        const SceneCamera &camera = m_scene.cameras[cameraPair.first];
+        const int frameIndex = cameraPair.second;
+        const CameraFrame &cameraFrame = camera.frames[frameIndex];
+
+        CameraFrameData &cameraFrameData = m_cameraFrameDataList[i];
+        computeCameraWorldMatrix(camera, frameIndex, cameraWorldMatrix);
+        computeCameraWorldProjectionMatrix(camera, frameIndex,
+                                           cameraFrameData.worldProjectionMatrix);
+        computeCameraForwardDirection(cameraWorldMatrix,
+                                      cameraFrameData.forwardDirection);
+        for (int j = 0; j < 3; ++j) {
+            cameraFrameData.position[j] = cameraWorldMatrix.m[3][j];
+        }
+        cameraFrameData.filmBackInvAspect = cameraFrame.filmBackHeight / cameraFrame.filmBackWidth;
+        cameraFrameData.imageWidth = camera.imageWidth;
+    }
+    for (size_t i = 0; i < m_bundleFrameList.size(); ++i) {
+        if (bundleFrameEvaluate[i] == false) {
+            continue;
+        }
+        if (cache.bundleFrameValidList[i]) {
+            ++cache.bundleFrameCacheHits;
+            continue;
+        }
+        cache.bundleFrameValidList[i] = true;
+        ++cache.bundleFrameEvaluations;
+        const IndexPair &bundlePair = m_bundleFrameList[i];
+        const BundleFrame &bundleFrame = m_scene.bundles[bundlePair.first].frames[bundlePair.second];
+        BundleFrameData &bundleFrameData = m_bundleFrameDataList[i];
+        for (int j = 0; j < 3; ++j) {
+            bundleFrameData.position[j] = bundleFrame.translate[j];
+        }
+    }
+
+    // Compute the marker errors in parallel.
+    measureReprojectionErrors(measureList,
+                              m_markerErrorDataList,
+                              m_cameraFrameDataList,
+                              m_bundleFrameDataList,
+                              &m_threadPool,
+                              errors,
+                              NULL,
+                              errorDistances);
+
+    // Stiffness is an error weighting back to the previous value.
+    //
+    // Animated attributes are measured on the first frame.
+    const int numberOfMarkerErrors = getNumberOfMarkerErrors();
+    const int stiffIndexOffset = numberOfMarkerErrors;
+    for (size_t i = 0; i < m_stiffAttrList.size(); ++i) {
+        const SceneAttr &attr = m_attrList[m_stiffAttrList[i]];
+        const double attrValue = getSceneAttrValue(m_scene, attr, -1);
+        double error = ((1.0 / gaussian(attrValue,
+                                        attr.stiffnessValue,
+                                        attr.stiffnessVariance)) - 1.0);
+        errors[stiffIndexOffset + i] = error * attr.stiffnessWeight;
+    }
+
+    // Smoothness is an error weighting to the predicted next value
+    // that is smooth.
+    const int smoothIndexOffset = stiffIndexOffset + static_cast<int>(m_stiffAttrList.size());
+    for (size_t i = 0; i < m_smoothAttrList.size(); ++i) {
+        const SceneAttr &attr = m_attrList[m_smoothAttrList[i]];
+        const double attrValue = getSceneAttrValue(m_scene, attr, -1);
+        double error = ((1.0 / gaussian(attrValue,
+                                        attr.smoothnessValue,
+                                        attr.smoothnessVariance)) - 1.0);
+        errors[smoothIndexOffset + i] = error * attr.smoothnessWeight;
+    }
+    return;
+}
+
+
+bool SceneProblem::hasAnalyticDerivatives(const int index) const {
+    UNUSED(index);
+    return true;
+}
+
+
+void SceneProblem::measureErrorDerivatives(const std::vector<int> &paramList,
+                                           const IndexList2D &paramToErrorIndexList,
+                                           const std::vector<int> &derivativeStartList,
+                                           double *derivatives) {
+    // Evaluate each camera and bundle frame once.
+    for (size_t i = 0; i < m_cameraFrameList.size(); ++i) {
+        const IndexPair &cameraPair = m_cameraFrameList[i];
+        computeCameraFrameDerivativeData(m_scene.cameras[cameraPair.first],
+                                         cameraPair.second,
+                                         m_cameraFrameDerivativeDataList[i]);
+    }
+    FrameDataCache &cache = m_frameDataCache;
+    for (size_t i = 0; i < m_bundleFrameList.size(); ++i) {
+        if (cache.bundleFrameValidList[i]) {
+            ++cache.bundleFrameCacheHits;
+            continue;
+        }
+        cache.bundleFrameValidList[i] = true;
+        ++cache.bundleFrameEvaluations;
+        const IndexPair &bundlePair = m_bundleFrameList[i];
+        const BundleFrame &bundleFrame = m_scene.bundles[bundlePair.first].frames[bundlePair.second];
+        for (int j = 0; j < 3; ++j) {
+            m_bundleFrameDataList[i].position[j] = bundleFrame.translate[j];
+        }
+    }
+
+    // Compute the marker error derivatives in parallel.
+    std::vector<int> measureList(m_errorToMarkerList.size());
+    for (size_t i = 0; i < measureList.size(); ++i) {
+        measureList[i] = static_cast<int>(i);
+    }
+    measureReprojectionDerivatives(measureList,
+                                   m_markerErrorDataList,
+                                   m_cameraFrameDerivativeDataList,
+                                   m_bundleFrameDataList,
+                                   &m_threadPool,
+                                   &m_markerDerivativeList[0]);
+
+    // Copy the derivatives of each parameter.
+    //
+    // Stiffness and smoothness are measured on the first frame, so
+    // only static attributes, or the first frame of animated
+    // attributes affect them.
+    const int numberOfMarkerErrors = getNumberOfMarkerErrors();
+    const int numberOfStiffErrors = static_cast<int>(m_stiffAttrList.size());
+    for (size_t k = 0; k < paramList.size(); ++k) {
+        const int paramIndex = paramList[k];
+        const IndexPair &attrPair = m_paramToAttrList[paramIndex];
+        const SceneAttr &attr = m_attrList[attrPair.first];
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[paramIndex];
+        double *values = derivatives + derivativeStartList[paramIndex];
+        for (size_t e = 0; e < errorIndexList.size(); ++e) {
+            const int errorIndex = errorIndexList[e];
+            if (errorIndex < numberOfMarkerErrors) {
+                const ReprojectionDerivatives &markerDerivatives =
+                    m_markerDerivativeList[errorIndex / ERRORS_PER_MARKER];
+                const int axis = errorIndex % ERRORS_PER_MARKER;
+                if (attr.objectType == SCENE_OBJECT_TYPE_CAMERA) {
+                    values[e] = markerDerivatives.camera[axis][attr.attrType];
+                } else {
+                    values[e] = markerDerivatives.bundle[axis][attr.attrType - SCENE_ATTR_TYPE_TRANSLATE_X];
+                }
+                continue;
+            }
+
+            values[e] = 0.0;
+            if (attrPair.second > 0) {
+                continue;
+            }
+            const int otherIndex = errorIndex - numberOfMarkerErrors;
+            const double attrValue = getSceneAttrValue(m_scene, attr, -1);
+            if (otherIndex < numberOfStiffErrors) {
+                if (m_stiffAttrList[otherIndex] == attrPair.first) {
+                    values[e] = attr.stiffnessWeight * inverseGaussianDerivative(
+                        attrValue, attr.stiffnessValue, attr.stiffnessVariance);
+                }
+            } else if (m_smoothAttrList[otherIndex - numberOfStiffErrors] == attrPair.first) {
+                values[e] = attr.smoothnessWeight * inverseGaussianDerivative(
+                    attrValue, attr.smoothnessValue, attr.smoothnessVariance);
+            }
+        }
+    }
+    return;
+}
+
+
+// A (marker, frame) pair is affected by a parameter when the
+// parameter is an attribute of the marker's camera or bundle, and the
+// parameter is static or on the same frame.
+void SceneProblem::getErrorToParameterRelationship(BoolList2D &errorToParamList) const {
+    const int numberOfParameters = getNumberOfParameters();
+    errorToParamList.clear();
+    errorToParamList.resize(m_errorToMarkerList.size());
+    for (size_t i = 0; i < m_errorToMarkerList.size(); ++i) {
+        const IndexPair &markerPair = m_errorToMarkerList[i];
+        const SceneMarker &marker = m_scene.markers[markerPair.first];
+        const int frameIndex = markerPair.second;
+
+        std::vector<bool> &paramList = errorToParamList[i];
+        paramList.resize(numberOfParameters, false);
+        for (int j = 0; j < numberOfParameters; ++j) {
+            const IndexPair &attrPair = m_paramToAttrList[j];
+            const SceneAttr &attr = m_attrList[attrPair.first];
+            bool sameFrame = (attrPair.second == -1) || (attrPair.second == frameIndex);
+            bool sameObject = false;
+            if (attr.objectType == SCENE_OBJECT_TYPE_CAMERA) {
+                sameObject = attr.objectIndex == marker.cameraIndex;
+            } else if (attr.objectType == SCENE_OBJECT_TYPE_BUNDLE) {
+                sameObject = attr.objectIndex == marker.bundleIndex;
+            }
+            paramList[j] = sameFrame && sameObject;
+        }
+    }
+    return;
+}
+
+
+// Stiffness and smoothness errors are affected by all parameters of
+// the attribute.
+void SceneProblem::getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const {
+    const int numberOfParameters = getNumberOfParameters();
+    std::vector<int> attrList(m_stiffAttrList);
+    attrList.insert(attrList.end(), m_smoothAttrList.begin(), m_smoothAttrList.end());
+
+    otherErrorToParamList.clear();
+    otherErrorToParamList.resize(attrList.size());
+    for (size_t i = 0; i < attrList.size(); ++i) {
+        std::vector<bool> &paramList = otherErrorToParamList[i];
+        paramList.resize(numberOfParameters, false);
+        for (int j = 0; j < numberOfParameters; ++j) {
+            paramList[j] = m_paramToAttrList[j].first == attrList[i];
+        }
+    }
+    return;
+}
+
+
+Problem *SceneProblem::createSubProblem(const std::vector<int> &paramList,
+                                        const std::vector<int> &markerErrorList,
+                                        const std::vector<int> &otherErrorList,
+                                        const int threadCount) {
+    return new SceneProblem(*this, paramList, markerErrorList,
+                            otherErrorList, threadCount);
+}
+
+
+const Scene &SceneProblem::getScene() const {
+    return m_scene;
+}
+
+
+const SceneAttrList &SceneProblem::getAttrList() const {
+    return m_attrList;
+}
+
+
+const IndexPairList &SceneProblem::getParameterToAttrList() const {
+    return m_paramToAttrList;
+}
+
+
+const IndexPairList &SceneProblem::getErrorToMarkerList() const {
+    return m_errorToMarkerList;
+}
+
+
+int SceneProblem::getThreadCount() const {
+    return m_threadPool.getThreadCount();
+}
+
+
+const FrameDataCache &SceneProblem::getFrameDataCache() const {
+    return m_frameDataCache;
+}
+
+
+void SceneProblem::clearFrameDataCache() {
+    for (size_t i = 0; i < m_parameterValueList.size(); ++i) {
+        m_parameterValueList[i] = getParameterValue(static_cast<int>(i));
+    }
+    resetFrameDataCache(m_frameDataCache);
+    return;
+}
@@ -0,0 +1,262 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A least-squares problem, independent of Maya, to be solved by
+ * 'solveProblem'.
+ *
+ * A Problem has parameters (the unknowns) and errors (the
+ * residuals). The marker errors are stored first in the error list,
+ * with ERRORS_PER_MARKER errors for each (marker, frame) pair, followed
+ * by any other errors, such as attribute stiffness and smoothness.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PROBLEM_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PROBLEM_H
+
+// STL
+#include <vector>
+#include <utility>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <core/bundleAdjust_parameterGroups.h>
+#include <core/bundleAdjust_threadPool.h>
+
+
+typedef std::vector<std::vector<bool> > BoolList2D;
+typedef std::pair<int, int> IndexPair;
+typedef std::vector<std::pair<int, int> > IndexPairList;
+
+
+class Problem {
+public:
+    virtual ~Problem() {}
+
+    virtual int getNumberOfParameters() const = 0;
+
+    virtual int getNumberOfErrors() const = 0;
+
+    virtual int getNumberOfMarkerErrors() const = 0;
+
+    // The bounds and scaling of a parameter, in the same form as a
+    // Maya solver Attribute.
+    virtual void getParameterBounds(const int index,
+                                    double &xmin, double &xmax,
+                                    double &offset, double &scale) const = 0;
+
+    // Get the current (external) value of a parameter.
+    virtual double getParameterValue(const int index) const = 0;
+
+    // Set all the (external) values of the parameters.
+    virtual void setParameters(const double *values) = 0;
+
+    // Is the parameter part of a 3D point (bundle) position? Point
+    // parameters may be eliminated by the Schur complement solver.
+    virtual bool isPointParameter(const int index) const = 0;
+
+    // Measure the errors.
+    //
+    // 'markerErrorMeasurements' has a value per (marker, frame) pair,
+    // if false the pair is not measured, and the errors and
+    // distances of the pair are unchanged. All other errors (not
+    // from markers) are always measured.
+    //
+    // 'errorDistances' is the un-weighted distance (in pixels)
+    // between each marker and bundle; the deviation shown to the
+    // user.
+    virtual void measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                               double *errors,
+                               double *errorDistances) = 0;
+
+    // Can the derivatives of the errors with respect to the parameter
+    // be measured analytically (with 'measureErrorDerivatives')?
+    // Otherwise the derivatives are computed with finite differences.
+    virtual bool hasAnalyticDerivatives(const int index) const = 0;
+
+    // Measure the derivatives of the errors with respect to the
+    // (external) values of the parameters in 'paramList', at the
+    // current parameter values.
+    //
+    // The derivatives for parameter 'i' are written to 'derivatives',
+    // starting at 'derivativeStartList[i]', for each error in
+    // 'paramToErrorIndexList[i]' (in the same order). The derivatives
+    // are of the errors before a robust loss function is applied.
+    virtual void measureErrorDerivatives(const std::vector<int> &paramList,
+                                         const IndexList2D &paramToErrorIndexList,
+                                         const std::vector<int> &derivativeStartList,
+                                         double *derivatives) = 0;
+
+    // Which parameters affect each (marker, frame) pair?
+    virtual void getErrorToParameterRelationship(BoolList2D &errorToParamList) const = 0;
+
+    // Which parameters affect each of the other (not marker) errors?
+    virtual void getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const = 0;
+
+    // Create a Problem with a subset of the parameters and errors of
+    // this Problem, to be solved on its own; for example a connected
+    // component (see 'findParameterComponents').
+    //
+    // 'paramList' has parameter indices, 'markerErrorList' has
+    // (marker, frame) pair indices, and 'otherErrorList' has indices
+    // of the other (not marker) errors, of this Problem. The errors
+    // must only be affected by the parameters in 'paramList'.
+    //
+    // The caller owns the returned Problem. NULL is returned if
+    // sub-problems are not supported.
+    virtual Problem *createSubProblem(const std::vector<int> &paramList,
+                                      const std::vector<int> &markerErrorList,
+                                      const std::vector<int> &otherErrorList,
+                                      const int threadCount);
+
+    // May sub-problems of this Problem be solved at the same time, on
+    // different threads? The default is true.
+    virtual bool isThreadSafe() const;
+
+    // Report the progress of the solve; 'iteration' is the number of
+    // (normal) evaluations made by the solver so far.
+    virtual void setProgress(const int iteration);
+
+    // Is the solve cancelled, for example by the user? The solver
+    // stops (with a failure) at the next evaluation.
+    virtual bool isInterruptRequested();
+};
+
+
+// A bundle adjustment Problem using array-based Cameras, Bundles and
+// Markers.
+//
+// The parameters are the values of the SceneAttr given; a static
+// attribute is a single parameter, an animated attribute is a
+// parameter per-frame. The Scene is modified as the parameters are
+// set.
+//
+// All the attributes of a SceneProblem have analytic derivatives.
+//
+// The camera and bundle data of each frame is cached, and only the
+// frames affected by the parameters changed with 'setParameters' are
+// evaluated again. If the Scene is changed any other way,
+// 'clearFrameDataCache' must be called.
+//
+// Marker errors are measured using 'threadCount' threads; zero uses
+// all hardware threads.
+//
+// A sub-problem modifies the same Scene. Sub-problems with no
+// parameters or errors in common (such as the connected components
+// of a problem) change and read different Scene values, so they may
+// be solved at the same time in different threads.
+class SceneProblem : public Problem {
+public:
+    SceneProblem(Scene &scene,
+                 const SceneAttrList &attrList,
+                 const int threadCount = THREAD_COUNT_DEFAULT_VALUE);
+
+    int getNumberOfParameters() const;
+
+    int getNumberOfErrors() const;
+
+    int getNumberOfMarkerErrors() const;
+
+    void getParameterBounds(const int index,
+                            double &xmin, double &xmax,
+                            double &offset, double &scale) const;
+
+    double getParameterValue(const int index) const;
+
+    void setParameters(const double *values);
+
+    bool isPointParameter(const int index) const;
+
+    void measureErrors(const std::vector<bool> &markerErrorMeasurements,
+                       double *errors,
+                       double *errorDistances);
+
+    bool hasAnalyticDerivatives(const int index) const;
+
+    void measureErrorDerivatives(const std::vector<int> &paramList,
+                                 const IndexList2D &paramToErrorIndexList,
+                                 const std::vector<int> &derivativeStartList,
+                                 double *derivatives);
+
+    void getErrorToParameterRelationship(BoolList2D &errorToParamList) const;
+
+    void getOtherErrorToParameterRelationship(BoolList2D &otherErrorToParamList) const;
+
+    Problem *createSubProblem(const std::vector<int> &paramList,
+                              const std::vector<int> &markerErrorList,
+                              const std::vector<int> &otherErrorList,
+                              const int threadCount);
+
+    const Scene &getScene() const;
+
+    const SceneAttrList &getAttrList() const;
+
+    // (attribute index, frame index) for each parameter; the frame
+    // index is -1 for static attributes.
+    const IndexPairList &getParameterToAttrList() const;
+
+    // (marker index, frame index) for each marker error pair.
+    const IndexPairList &getErrorToMarkerList() const;
+
+    int getThreadCount() const;
+
+    // The frame data cache, and the number of frames evaluated and
+    // re-used from the cache.
+    const FrameDataCache &getFrameDataCache() const;
+
+    // Invalidate all the cached frame data, and reset the counts.
+    void clearFrameDataCache();
+
+private:
+    SceneProblem(const SceneProblem &parent,
+                 const std::vector<int> &paramList,
+                 const std::vector<int> &markerErrorList,
+                 const std::vector<int> &otherErrorList,
+                 const int threadCount);
+
+    void initMarkerErrors(const std::vector<double> &weightList);
+
+    Scene &m_scene;
+    SceneAttrList m_attrList;
+    IndexPairList m_paramToAttrList;
+    IndexPairList m_errorToMarkerList;
+
+    // The unique (camera index, frame index) and (bundle index,
+    // frame index) pairs used by the Marker errors, and the data
+    // evaluated for each.
+    IndexPairList m_cameraFrameList;
+    IndexPairList m_bundleFrameList;
+    std::vector<MarkerErrorData> m_markerErrorDataList;
+    std::vector<CameraFrameData> m_cameraFrameDataList;
+    std::vector<BundleFrameData> m_bundleFrameDataList;
+    std::vector<CameraFrameDerivativeData> m_cameraFrameDerivativeDataList;
+    std::vector<ReprojectionDerivatives> m_markerDerivativeList;
+    FrameDataCache m_frameDataCache;
+    ThreadPool m_threadPool;
+
+    // The parameter values last set in the Scene.
+    std::vector<double> m_parameterValueList;
+
+    std::vector<int> m_stiffAttrList;
+    std::vector<int> m_smoothAttrList;
+};
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PROBLEM_H
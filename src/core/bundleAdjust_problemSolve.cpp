@@ -0,0 +1,1416 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Solve a Problem.
+ */
+
+// STL
+#include <algorithm>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <functional>
+#include <iostream>
+#include <iomanip>
+#include <string>
+#include <vector>
+#include <cassert>
+#include <limits>
+
+// Solver libraries
+#ifdef USE_SOLVER_CMINPACK
+#include <cminpack.h>
+#endif
+
+#ifdef USE_SOLVER_LEVMAR
+#include <levmar.h>
+#endif
+
+// Utils
+#include <utilities/debugUtils.h>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_math.h>
+#include <core/bundleAdjust_reasons.h>
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_problemSolve.h>
+#include <core/bundleAdjust_schur.h>
+#include <core/bundleAdjust_threadPool.h>
+
+
+// Get a list of all available solver types (index and name).
+//
+// The same as 'getSolverTypes', for the solver libraries compiled
+// into the core library.
+std::vector<SolverTypePair> getProblemSolverTypes() {
+    std::vector<SolverTypePair> solverTypes;
+    SolverTypePair solverType;
+#ifdef USE_SOLVER_LEVMAR
+    solverType.first = SOLVER_TYPE_LEVMAR;
+    solverType.second = SOLVER_TYPE_LEVMAR_NAME;
+    solverTypes.push_back(solverType);
+#endif
+
+#ifdef USE_SOLVER_CMINPACK
+    solverType.first = SOLVER_TYPE_CMINPACK_LMDIF;
+    solverType.second = SOLVER_TYPE_CMINPACK_LM_DIF_NAME;
+    solverTypes.push_back(solverType);
+
+    solverType.first = SOLVER_TYPE_CMINPACK_LMDER;
+    solverType.second = SOLVER_TYPE_CMINPACK_LM_DER_NAME;
+    solverTypes.push_back(solverType);
+#endif
+
+    solverType.first = SOLVER_TYPE_SCHUR_LM;
+    solverType.second = SOLVER_TYPE_SCHUR_LM_NAME;
+    solverTypes.push_back(solverType);
+    return solverTypes;
+}
+
+
+// Set the default options for a solver type, the same defaults as
+// the 'mmSolver' command.
+void setProblemSolverOptionDefaults(const int solverType,
+                                    SolverOptions &solverOptions) {
+    solverOptions.solverType = solverType;
+    solverOptions.timeEvalMode = TIME_EVAL_MODE_DG_CONTEXT;
+    solverOptions.acceptOnlyBetter = true;
+    solverOptions.threadCount = THREAD_COUNT_DEFAULT_VALUE;
+    solverOptions.analyticJacobian = ANALYTIC_JACOBIAN_DEFAULT_VALUE;
+    solverOptions.removeUnusedMarkers = false;
+    solverOptions.removeUnusedAttributes = false;
+    if (solverType == SOLVER_TYPE_CMINPACK_LMDIF) {
+        solverOptions.iterMax = CMINPACK_LMDIF_ITERATIONS_DEFAULT_VALUE;
+        solverOptions.tau = CMINPACK_LMDIF_TAU_DEFAULT_VALUE;
+        solverOptions.eps1 = CMINPACK_LMDIF_EPSILON1_DEFAULT_VALUE;
+        solverOptions.eps2 = CMINPACK_LMDIF_EPSILON2_DEFAULT_VALUE;
+        solverOptions.eps3 = CMINPACK_LMDIF_EPSILON3_DEFAULT_VALUE;
+        solverOptions.delta = CMINPACK_LMDIF_DELTA_DEFAULT_VALUE;
+        solverOptions.autoDiffType = CMINPACK_LMDIF_AUTO_DIFF_TYPE_DEFAULT_VALUE;
+        solverOptions.autoParamScale = CMINPACK_LMDIF_AUTO_PARAM_SCALE_DEFAULT_VALUE;
+        solverOptions.robustLossType = CMINPACK_LMDIF_ROBUST_LOSS_TYPE_DEFAULT_VALUE;
+        solverOptions.robustLossScale = CMINPACK_LMDIF_ROBUST_LOSS_SCALE_DEFAULT_VALUE;
+        solverOptions.solverSupportsAutoDiffForward = CMINPACK_LMDIF_SUPPORT_AUTO_DIFF_FORWARD_VALUE;
+        solverOptions.solverSupportsAutoDiffCentral = CMINPACK_LMDIF_SUPPORT_AUTO_DIFF_CENTRAL_VALUE;
+        solverOptions.solverSupportsParameterBounds = CMINPACK_LMDIF_SUPPORT_PARAMETER_BOUNDS_VALUE;
+        solverOptions.solverSupportsRobustLoss = CMINPACK_LMDIF_SUPPORT_ROBUST_LOSS_VALUE;
+    } else if (solverType == SOLVER_TYPE_CMINPACK_LMDER) {
+        solverOptions.iterMax = CMINPACK_LMDER_ITERATIONS_DEFAULT_VALUE;
+        solverOptions.tau = CMINPACK_LMDER_TAU_DEFAULT_VALUE;
+        solverOptions.eps1 = CMINPACK_LMDER_EPSILON1_DEFAULT_VALUE;
+        solverOptions.eps2 = CMINPACK_LMDER_EPSILON2_DEFAULT_VALUE;
+        solverOptions.eps3 = CMINPACK_LMDER_EPSILON3_DEFAULT_VALUE;
+        solverOptions.delta = CMINPACK_LMDER_DELTA_DEFAULT_VALUE;
+        solverOptions.autoDiffType = CMINPACK_LMDER_AUTO_DIFF_TYPE_DEFAULT_VALUE;
+        solverOptions.autoParamScale = CMINPACK_LMDER_AUTO_PARAM_SCALE_DEFAULT_VALUE;
+        solverOptions.robustLossType = CMINPACK_LMDER_ROBUST_LOSS_TYPE_DEFAULT_VALUE;
+        solverOptions.robustLossScale = CMINPACK_LMDER_ROBUST_LOSS_SCALE_DEFAULT_VALUE;
+        solverOptions.solverSupportsAutoDiffForward = CMINPACK_LMDER_SUPPORT_AUTO_DIFF_FORWARD_VALUE;
+        solverOptions.solverSupportsAutoDiffCentral = CMINPACK_LMDER_SUPPORT_AUTO_DIFF_CENTRAL_VALUE;
+        solverOptions.solverSupportsParameterBounds = CMINPACK_LMDER_SUPPORT_PARAMETER_BOUNDS_VALUE;
+        solverOptions.solverSupportsRobustLoss = CMINPACK_LMDER_SUPPORT_ROBUST_LOSS_VALUE;
+    } else if (solverType == SOLVER_TYPE_LEVMAR) {
+        solverOptions.iterMax = LEVMAR_ITERATIONS_DEFAULT_VALUE;
+        solverOptions.tau = LEVMAR_TAU_DEFAULT_VALUE;
+        solverOptions.eps1 = LEVMAR_EPSILON1_DEFAULT_VALUE;
+        solverOptions.eps2 = LEVMAR_EPSILON2_DEFAULT_VALUE;
+        solverOptions.eps3 = LEVMAR_EPSILON3_DEFAULT_VALUE;
+        solverOptions.delta = LEVMAR_DELTA_DEFAULT_VALUE;
+        solverOptions.autoDiffType = LEVMAR_AUTO_DIFF_TYPE_DEFAULT_VALUE;
+        solverOptions.autoParamScale = LEVMAR_AUTO_PARAM_SCALE_DEFAULT_VALUE;
+        solverOptions.robustLossType = LEVMAR_ROBUST_LOSS_TYPE_DEFAULT_VALUE;
+        solverOptions.robustLossScale = LEVMAR_ROBUST_LOSS_SCALE_DEFAULT_VALUE;
+        solverOptions.solverSupportsAutoDiffForward = LEVMAR_SUPPORT_AUTO_DIFF_FORWARD_VALUE;
+        solverOptions.solverSupportsAutoDiffCentral = LEVMAR_SUPPORT_AUTO_DIFF_CENTRAL_VALUE;
+        solverOptions.solverSupportsParameterBounds = LEVMAR_SUPPORT_PARAMETER_BOUNDS_VALUE;
+        solverOptions.solverSupportsRobustLoss = LEVMAR_SUPPORT_ROBUST_LOSS_VALUE;
+    } else if (solverType == SOLVER_TYPE_SCHUR_LM) {
+        solverOptions.iterMax = SCHUR_LM_ITERATIONS_DEFAULT_VALUE;
+        solverOptions.tau = SCHUR_LM_TAU_DEFAULT_VALUE;
+        solverOptions.eps1 = SCHUR_LM_EPSILON1_DEFAULT_VALUE;
+        solverOptions.eps2 = SCHUR_LM_EPSILON2_DEFAULT_VALUE;
+        solverOptions.eps3 = SCHUR_LM_EPSILON3_DEFAULT_VALUE;
+        solverOptions.delta = SCHUR_LM_DELTA_DEFAULT_VALUE;
+        solverOptions.autoDiffType = SCHUR_LM_AUTO_DIFF_TYPE_DEFAULT_VALUE;
+        solverOptions.autoParamScale = SCHUR_LM_AUTO_PARAM_SCALE_DEFAULT_VALUE;
+        solverOptions.robustLossType = SCHUR_LM_ROBUST_LOSS_TYPE_DEFAULT_VALUE;
+        solverOptions.robustLossScale = SCHUR_LM_ROBUST_LOSS_SCALE_DEFAULT_VALUE;
+        solverOptions.solverSupportsAutoDiffForward = SCHUR_LM_SUPPORT_AUTO_DIFF_FORWARD_VALUE;
+        solverOptions.solverSupportsAutoDiffCentral = SCHUR_LM_SUPPORT_AUTO_DIFF_CENTRAL_VALUE;
+        solverOptions.solverSupportsParameterBounds = SCHUR_LM_SUPPORT_PARAMETER_BOUNDS_VALUE;
+        solverOptions.solverSupportsRobustLoss = SCHUR_LM_SUPPORT_ROBUST_LOSS_VALUE;
+    } else {
+        ERR("Solver Type is invalid; value=" << solverType);
+    }
+    return;
+}
+
+
+void initProblemSolverData(Problem &problem,
+                           SolverOptions &solverOptions,
+                           bool verbose,
+                           ProblemSolverData &userData) {
+    const int numberOfParameters = problem.getNumberOfParameters();
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkerErrors = problem.getNumberOfMarkerErrors();
+    const int numberOfMarkers = numberOfMarkerErrors / ERRORS_PER_MARKER;
+
+    userData.problem = &problem;
+
+    userData.paramLowerBoundList.resize(numberOfParameters, 0);
+    userData.paramUpperBoundList.resize(numberOfParameters, 0);
+    userData.paramOffsetList.resize(numberOfParameters, 0);
+    userData.paramScaleList.resize(numberOfParameters, 1);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        problem.getParameterBounds(i,
+                                   userData.paramLowerBoundList[i],
+                                   userData.paramUpperBoundList[i],
+                                   userData.paramOffsetList[i],
+                                   userData.paramScaleList[i]);
+    }
+
+    // Errors affected by each parameter, the transpose of the
+    // parameters affecting each error.
+    problem.getErrorToParameterRelationship(userData.errorToParamList);
+    assert(userData.errorToParamList.size() == static_cast<size_t>(numberOfMarkers));
+    userData.paramToErrorList.clear();
+    userData.paramToErrorList.resize(numberOfParameters);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        userData.paramToErrorList[i].resize(numberOfMarkers, false);
+        for (int j = 0; j < numberOfMarkers; ++j) {
+            userData.paramToErrorList[i][j] = userData.errorToParamList[j][i];
+        }
+    }
+
+    BoolList2D otherErrorToParamList;
+    problem.getOtherErrorToParameterRelationship(otherErrorToParamList);
+    assert(otherErrorToParamList.size()
+           == static_cast<size_t>(numberOfErrors - numberOfMarkerErrors));
+    findParameterToErrorIndexList(numberOfParameters,
+                                  userData.errorToParamList,
+                                  otherErrorToParamList,
+                                  userData.paramToErrorIndexList);
+
+    // A robust loss function scales the marker errors after they are
+    // measured, and the Jacobian after it is computed (for all
+    // parameters, with analytic derivatives or finite differences).
+    userData.useLossFunction = solverOptions.solverSupportsRobustLoss
+        && (solverOptions.robustLossType != ROBUST_LOSS_TYPE_TRIVIAL);
+    userData.lossParamList.clear();
+    userData.unscaledErrorList.clear();
+    userData.lossErrorScaleList.clear();
+    userData.lossJacobianScaleList.clear();
+    if (userData.useLossFunction) {
+        userData.unscaledErrorList.resize(numberOfErrors, 0);
+        userData.lossErrorScaleList.resize(numberOfMarkerErrors, 1.0);
+        userData.lossJacobianScaleList.resize(numberOfMarkerErrors, 1.0);
+    }
+
+    // Parameters with analytic derivatives are not evaluated with
+    // finite differences.
+    std::vector<bool> analyticParamList(numberOfParameters, false);
+    userData.analyticParamList.clear();
+    if (solverOptions.analyticJacobian) {
+        for (int i = 0; i < numberOfParameters; ++i) {
+            if (problem.hasAnalyticDerivatives(i)) {
+                analyticParamList[i] = true;
+                userData.analyticParamList.push_back(i);
+            }
+        }
+    }
+    userData.derivativeStartList.resize(numberOfParameters + 1, 0);
+    userData.derivativeStartList[0] = 0;
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const int count = static_cast<int>(userData.paramToErrorIndexList[i].size());
+        userData.derivativeStartList[i + 1] = userData.derivativeStartList[i] + count;
+    }
+    userData.derivativeList.resize(userData.derivativeStartList[numberOfParameters], 0);
+
+    IndexList2D paramGroupList;
+    findParameterGroups(numberOfErrors,
+                        userData.paramToErrorIndexList,
+                        paramGroupList);
+    userData.paramGroupList.clear();
+    for (size_t g = 0; g < paramGroupList.size(); ++g) {
+        std::vector<int> paramGroup;
+        for (size_t k = 0; k < paramGroupList[g].size(); ++k) {
+            if (!analyticParamList[paramGroupList[g][k]]) {
+                paramGroup.push_back(paramGroupList[g][k]);
+            }
+        }
+        if (!paramGroup.empty()) {
+            userData.paramGroupList.push_back(paramGroup);
+        }
+    }
+
+    // The Schur complement solver uses a sparse Jacobian, with the
+    // point (bundle) parameters eliminated.
+    if (solverOptions.solverType == SOLVER_TYPE_SCHUR_LM) {
+        std::vector<bool> pointParamList(numberOfParameters, false);
+        for (int i = 0; i < numberOfParameters; ++i) {
+            pointParamList[i] = problem.isPointParameter(i);
+        }
+        findSchurStructure(numberOfErrors,
+                           userData.paramToErrorIndexList,
+                           pointParamList,
+                           userData.schurStructure);
+        userData.jacobianList.resize(userData.schurStructure.rowIndexList.size(), 0);
+    } else {
+        userData.jacobianList.resize(numberOfParameters * numberOfErrors, 0);
+    }
+
+    userData.externalParamList.resize(numberOfParameters, 0);
+    userData.previousParamList.resize(numberOfParameters, 0);
+    userData.errorDistanceList.resize(numberOfMarkers, 0);
+
+    userData.funcEvalNum = 0;  // number of function evaluations
+    userData.iterNum = 0;
+    userData.jacIterNum = 0;
+    userData.solverType = solverOptions.solverType;
+    userData.numberOfMarkerErrors = numberOfMarkerErrors;
+
+    userData.isNormalCall = true;
+    userData.isJacobianCall = false;
+    userData.isPrintCall = false;
+    userData.doCalcJacobian = false;
+
+    userData.solverOptions = &solverOptions;
+    userData.verbose = verbose;
+    return;
+}
+
+
+void getProblemInitialParameters(ProblemSolverData &userData,
+                                 std::vector<double> &paramList) {
+    const int numberOfParameters = userData.problem->getNumberOfParameters();
+    paramList.resize(numberOfParameters, 0);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        double value = userData.problem->getParameterValue(i);
+        paramList[i] = parameterBoundFromExternalToInternal(
+            value,
+            userData.paramLowerBoundList[i],
+            userData.paramUpperBoundList[i],
+            userData.paramOffsetList[i],
+            userData.paramScaleList[i]);
+    }
+    return;
+}
+
+
+// Set the (internal) solver parameters on the Problem.
+void setProblemParameters(const int numberOfParameters,
+                          const double *parameters,
+                          ProblemSolverData *ud) {
+    for (int i = 0; i < numberOfParameters; ++i) {
+        ud->externalParamList[i] = parameterBoundFromInternalToExternal(
+            parameters[i],
+            ud->paramLowerBoundList[i],
+            ud->paramUpperBoundList[i],
+            ud->paramOffsetList[i],
+            ud->paramScaleList[i]);
+    }
+    ud->problem->setParameters(&ud->externalParamList[0]);
+
+    // Save a copy of the parameters.
+    for (int j = 0; j < numberOfParameters; ++j) {
+        ud->previousParamList[j] = parameters[j];
+    }
+    return;
+}
+
+
+// Measure the errors of the Problem, and compute the error statistics
+// of the measured markers.
+void measureProblemErrors(const int numberOfErrors,
+                          const std::vector<bool> &markerErrorMeasurements,
+                          double *errors,
+                          ProblemSolverData *ud,
+                          double &error_avg,
+                          double &error_max,
+                          double &error_min) {
+    UNUSED(numberOfErrors);
+    ud->problem->measureErrors(markerErrorMeasurements,
+                               errors,
+                               &ud->errorDistanceList[0]);
+
+    error_avg = 0.0;
+    error_max = -0.0;
+    error_min = std::numeric_limits<double>::max();
+    int numberOfMeasured = 0;
+    for (size_t i = 0; i < markerErrorMeasurements.size(); ++i) {
+        if (markerErrorMeasurements[i] == false) {
+            continue;
+        }
+        double d = ud->errorDistanceList[i];
+        error_avg += d;
+        if (d > error_max) { error_max = d; }
+        if (d < error_min) { error_min = d; }
+        ++numberOfMeasured;
+    }
+    if (numberOfMeasured > 0) {
+        error_avg /= static_cast<double>(numberOfMeasured);
+    } else {
+        error_min = 0.0;
+    }
+    assert(error_max >= error_min);
+    return;
+}
+
+
+// Store the (unscaled) errors measured at 'parameters', and compute
+// the robust loss function scales of the marker errors.
+static void setProblemLossErrors(const int numberOfParameters,
+                                 const int numberOfErrors,
+                                 const double *parameters,
+                                 const double *errors,
+                                 ProblemSolverData *ud) {
+    ud->lossParamList.assign(parameters, parameters + numberOfParameters);
+    for (int j = 0; j < numberOfErrors; ++j) {
+        ud->unscaledErrorList[j] = errors[j];
+    }
+    computeLossFunctionScales(ud->numberOfMarkerErrors,
+                              errors,
+                              ud->solverOptions->robustLossType,
+                              ud->solverOptions->robustLossScale,
+                              &ud->lossErrorScaleList[0],
+                              &ud->lossJacobianScaleList[0]);
+    return;
+}
+
+
+// Are the stored (unscaled) errors measured at 'parameters'?
+static bool hasProblemLossErrors(const int numberOfParameters,
+                                 const double *parameters,
+                                 const ProblemSolverData *ud) {
+    if (ud->lossParamList.size() != static_cast<size_t>(numberOfParameters)) {
+        return false;
+    }
+    for (int j = 0; j < numberOfParameters; ++j) {
+        if (ud->lossParamList[j] != parameters[j]) {
+            return false;
+        }
+    }
+    return true;
+}
+
+
+// Add another 'normal function' evaluation to the count.
+static void incrementNormalIteration(ProblemSolverData *ud) {
+    ++ud->funcEvalNum;
+    ++ud->iterNum;
+    if (ud->verbose) {
+        std::cerr << "Iteration ";
+        std::cerr << std::right << std::setfill('0') << std::setw(4)
+                  << ud->iterNum;
+        std::cerr << " | Eval ";
+        std::cerr << std::right << std::setfill('0') << std::setw(4)
+                  << ud->funcEvalNum;
+    }
+    return;
+}
+
+
+// Add another 'jacobian function' evaluation to the count.
+static void incrementJacobianIteration(ProblemSolverData *ud) {
+    ++ud->funcEvalNum;
+    ++ud->jacIterNum;
+    if (ud->verbose) {
+        std::cerr << "Jacobian  ";
+        std::cerr << std::right << std::setfill('0') << std::setw(4)
+                  << ud->jacIterNum;
+        std::cerr << " | Eval ";
+        std::cerr << std::right << std::setfill('0') << std::setw(4)
+                  << ud->funcEvalNum;
+        if (ud->doCalcJacobian) {
+            std::cerr << "\n";
+        }
+    }
+    return;
+}
+
+
+// Evaluate the errors after changing a group of parameters, each by
+// its own delta.
+//
+// Only the (marker, frame) pairs affected by the parameters are
+// measured, all other errors are copied from 'errors'.
+static void evaluateParameterGroupDelta(const int numberOfParameters,
+                                        const int numberOfErrors,
+                                        const double *parameters,
+                                        const double *errors,
+                                        const std::vector<int> &paramGroup,
+                                        const std::vector<double> &paramDeltaList,
+                                        ProblemSolverData *ud,
+                                        std::vector<double> &outParamList,
+                                        std::vector<double> &outErrorList) {
+    const int numberOfMarkers = ud->numberOfMarkerErrors / ERRORS_PER_MARKER;
+    std::vector<bool> markerErrorMeasurements(numberOfMarkers, false);
+    for (int j = 0; j < numberOfParameters; ++j) {
+        outParamList[j] = parameters[j];
+    }
+    for (int j = 0; j < numberOfErrors; ++j) {
+        outErrorList[j] = errors[j];
+    }
+    for (size_t i = 0; i < paramGroup.size(); ++i) {
+        const int paramIndex = paramGroup[i];
+        outParamList[paramIndex] = outParamList[paramIndex] + paramDeltaList[paramIndex];
+
+        const std::vector<int> &errorIndexList = ud->paramToErrorIndexList[paramIndex];
+        for (size_t j = 0; j < errorIndexList.size(); ++j) {
+            const int markerIndex = errorIndexList[j] / ERRORS_PER_MARKER;
+            if (markerIndex < numberOfMarkers) {
+                markerErrorMeasurements[markerIndex] = true;
+            }
+        }
+    }
+
+    incrementJacobianIteration(ud);
+    ud->timer.paramBenchTimer.start();
+    ud->timer.paramBenchTicks.start();
+    setProblemParameters(numberOfParameters, &outParamList[0], ud);
+    ud->timer.paramBenchTimer.stop();
+    ud->timer.paramBenchTicks.stop();
+
+    double error_avg_tmp = 0;
+    double error_max_tmp = 0;
+    double error_min_tmp = 0;
+    ud->timer.errorBenchTimer.start();
+    ud->timer.errorBenchTicks.start();
+    measureProblemErrors(numberOfErrors,
+                         markerErrorMeasurements,
+                         &outErrorList[0],
+                         ud,
+                         error_avg_tmp, error_max_tmp, error_min_tmp);
+    ud->timer.errorBenchTimer.stop();
+    ud->timer.errorBenchTicks.stop();
+    return;
+}
+
+
+// Function run by the solver algorithm to test the input parameters,
+// and compute the output errors (and Jacobian, if requested).
+int problemSolveFunc(const int numberOfParameters,
+                     const int numberOfErrors,
+                     const double *parameters,
+                     double *errors,
+                     double *jacobian,
+                     void *userData) {
+    ProblemSolverData *ud = static_cast<ProblemSolverData *>(userData);
+    ud->timer.funcBenchTimer.start();
+    ud->timer.funcBenchTicks.start();
+
+    const int numberOfMarkers = ud->numberOfMarkerErrors / ERRORS_PER_MARKER;
+    assert(ud->errorToParamList.size() == static_cast<size_t>(numberOfMarkers));
+
+    if (ud->isNormalCall) {
+        incrementNormalIteration(ud);
+    } else if (ud->isJacobianCall && !ud->doCalcJacobian) {
+        incrementJacobianIteration(ud);
+    }
+
+    if (ud->isPrintCall) {
+        // insert print statements here when nprint is positive.
+        return SOLVE_FUNC_SUCCESS;
+    }
+
+    if (!ud->doCalcJacobian) {
+        ud->problem->setProgress(ud->iterNum);
+    }
+    if (ud->problem->isInterruptRequested()) {
+        ud->timer.funcBenchTimer.stop();
+        ud->timer.funcBenchTicks.stop();
+        return SOLVE_FUNC_FAILURE;
+    }
+
+    double error_avg = 0;
+    double error_max = 0;
+    double error_min = 0;
+    if (ud->doCalcJacobian == false) {
+        // A normal evaluation of the errors and parameters.
+        std::vector<bool> evalMeasurements(numberOfMarkers, true);
+
+        ud->timer.paramBenchTimer.start();
+        ud->timer.paramBenchTicks.start();
+        setProblemParameters(numberOfParameters, parameters, ud);
+        ud->timer.paramBenchTimer.stop();
+        ud->timer.paramBenchTicks.stop();
+
+        ud->timer.errorBenchTimer.start();
+        ud->timer.errorBenchTicks.start();
+        measureProblemErrors(numberOfErrors,
+                             evalMeasurements,
+                             errors,
+                             ud,
+                             error_avg, error_max, error_min);
+
+        // Scale the marker errors by the loss function, to reduce the
+        // affect outliers have on the solve.
+        if (ud->useLossFunction) {
+            setProblemLossErrors(numberOfParameters, numberOfErrors,
+                                 parameters, errors, ud);
+            for (int j = 0; j < ud->numberOfMarkerErrors; ++j) {
+                errors[j] *= ud->lossErrorScaleList[j];
+            }
+        }
+        ud->timer.errorBenchTimer.stop();
+        ud->timer.errorBenchTicks.stop();
+    } else {
+        // Calculate Jacobian Matrix
+        assert((ud->solverOptions->solverType == SOLVER_TYPE_CMINPACK_LMDER)
+               || (ud->solverOptions->solverType == SOLVER_TYPE_SCHUR_LM));
+        const int autoDiffType = ud->solverOptions->autoDiffType;
+        const double delta = ud->solverOptions->delta;
+        assert(delta > 0.0);
+
+        // The Schur complement solver stores only the errors
+        // affected by each parameter (see 'SchurStructure').
+        const bool sparseJacobian = ud->solverType == SOLVER_TYPE_SCHUR_LM;
+        const std::vector<int> &columnStartList = ud->schurStructure.columnStartList;
+
+        // Get longest dimension for jacobian matrix
+        int ldfjac = numberOfErrors;
+        if (ldfjac < numberOfParameters) {
+            ldfjac = numberOfParameters;
+        }
+
+        // Only the errors affected by a parameter are set in the
+        // parameter's column, all other values are zero.
+        if (!sparseJacobian) {
+            for (int i = 0; i < numberOfParameters; ++i) {
+                for (int j = 0; j < numberOfErrors; ++j) {
+                    size_t num = (i * ldfjac) + j;
+                    ud->jacobianList[num] = 0.0;
+                    jacobian[num] = 0.0;
+                }
+            }
+        }
+
+        // With a loss function, 'errors' are scaled; the finite
+        // differences are computed from the unscaled errors, which
+        // are measured again if the last evaluation was made with
+        // different parameters (for example, a rejected step).
+        const double *unscaledErrors = errors;
+        if (ud->useLossFunction) {
+            if (!hasProblemLossErrors(numberOfParameters, parameters, ud)) {
+                std::vector<bool> evalMeasurements(numberOfMarkers, true);
+                setProblemParameters(numberOfParameters, parameters, ud);
+                measureProblemErrors(numberOfErrors,
+                                     evalMeasurements,
+                                     &ud->unscaledErrorList[0],
+                                     ud,
+                                     error_avg, error_max, error_min);
+                setProblemLossErrors(numberOfParameters, numberOfErrors,
+                                     parameters, &ud->unscaledErrorList[0], ud);
+            }
+            unscaledErrors = &ud->unscaledErrorList[0];
+        }
+
+        // Analytic derivatives, at the current parameter values.
+        if (!ud->analyticParamList.empty()) {
+            setProblemParameters(numberOfParameters, parameters, ud);
+            ud->problem->measureErrorDerivatives(ud->analyticParamList,
+                                                 ud->paramToErrorIndexList,
+                                                 ud->derivativeStartList,
+                                                 &ud->derivativeList[0]);
+            for (size_t k = 0; k < ud->analyticParamList.size(); ++k) {
+                const int i = ud->analyticParamList[k];
+                // Derivative with respect to the internal parameter.
+                const double scale = parameterBoundDerivativeInternalToExternal(
+                    parameters[i],
+                    ud->paramLowerBoundList[i],
+                    ud->paramUpperBoundList[i],
+                    ud->paramOffsetList[i],
+                    ud->paramScaleList[i]);
+                const double *derivatives = &ud->derivativeList[ud->derivativeStartList[i]];
+                const std::vector<int> &errorIndexList = ud->paramToErrorIndexList[i];
+                for (size_t e = 0; e < errorIndexList.size(); ++e) {
+                    const int j = errorIndexList[e];
+                    size_t num = sparseJacobian ? (columnStartList[i] + e) : ((i * ldfjac) + j);
+                    double x = derivatives[e] * scale;
+                    ud->jacobianList[num] = x;
+                    jacobian[num] = x;
+                }
+            }
+        }
+
+        // The parameters in a group affect different errors, so all
+        // the parameters in the group are changed and measured at
+        // once.
+        std::vector<double> paramListA(numberOfParameters, 0);
+        std::vector<double> errorListA(numberOfErrors, 0);
+        std::vector<double> paramListB(numberOfParameters, 0);
+        std::vector<double> errorListB(numberOfErrors, 0);
+        std::vector<double> deltaListA(numberOfParameters, 0);
+        std::vector<double> deltaListB(numberOfParameters, 0);
+        std::vector<int> centralGroup;
+        for (size_t g = 0; g < ud->paramGroupList.size(); ++g) {
+            if (ud->problem->isInterruptRequested()) {
+                ud->timer.funcBenchTimer.stop();
+                ud->timer.funcBenchTicks.stop();
+                return SOLVE_FUNC_FAILURE;
+            }
+
+            const std::vector<int> &paramGroup = ud->paramGroupList[g];
+            centralGroup.clear();
+            for (size_t k = 0; k < paramGroup.size(); ++k) {
+                const int i = paramGroup[k];
+                const double value = parameters[i];
+                const double xmin = ud->paramLowerBoundList[i];
+                const double xmax = ud->paramUpperBoundList[i];
+                deltaListA[i] = calculateParameterDelta(value, delta, 1, xmin, xmax);
+                if (autoDiffType == AUTO_DIFF_TYPE_CENTRAL) {
+                    assert(ud->solverOptions->solverSupportsAutoDiffCentral);
+                    // Get the new delta, from the opposite
+                    // direction. If we don't calculate a different
+                    // delta value, something has gone wrong and a
+                    // second evaluation is not needed.
+                    deltaListB[i] = calculateParameterDelta(value, delta, -1, xmin, xmax);
+                    if (deltaListA[i] != deltaListB[i]) {
+                        centralGroup.push_back(i);
+                    }
+                }
+            }
+
+            evaluateParameterGroupDelta(numberOfParameters, numberOfErrors,
+                                        parameters, unscaledErrors,
+                                        paramGroup, deltaListA, ud,
+                                        paramListA, errorListA);
+            if (!centralGroup.empty()) {
+                evaluateParameterGroupDelta(numberOfParameters, numberOfErrors,
+                                            parameters, unscaledErrors,
+                                            centralGroup, deltaListB, ud,
+                                            paramListB, errorListB);
+            }
+
+            size_t centralIndex = 0;
+            for (size_t k = 0; k < paramGroup.size(); ++k) {
+                const int i = paramGroup[k];
+                bool useCentral = (centralIndex < centralGroup.size())
+                                  && (centralGroup[centralIndex] == i);
+                const std::vector<int> &errorIndexList = ud->paramToErrorIndexList[i];
+                if (useCentral) {
+                    ++centralIndex;
+                    // Set the Jacobian matrix using the calculated
+                    // errors (A and B). The errors are measured at
+                    // 'value + deltaA' and 'value + deltaB' (deltaB
+                    // has the opposite sign), so the derivative is
+                    // the change over the full distance between the
+                    // two, (eA - eB) / (|deltaA| + |deltaB|).
+                    double inv_delta = 1.0 / (std::fabs(deltaListA[i]) + std::fabs(deltaListB[i]));
+                    for (size_t e = 0; e < errorIndexList.size(); ++e) {
+                        const int j = errorIndexList[e];
+                        size_t num = sparseJacobian ? (columnStartList[i] + e) : ((i * ldfjac) + j);
+                        double x = (errorListA[j] - errorListB[j]) * inv_delta;
+                        ud->jacobianList[num] = x;
+                        jacobian[num] = x;
+                    }
+                } else {
+                    assert(ud->solverOptions->solverSupportsAutoDiffForward);
+                    // Set the Jacobian matrix using the previously
+                    // calculated errors (original and A).
+                    double inv_delta = 1.0 / deltaListA[i];
+                    for (size_t e = 0; e < errorIndexList.size(); ++e) {
+                        const int j = errorIndexList[e];
+                        size_t num = sparseJacobian ? (columnStartList[i] + e) : ((i * ldfjac) + j);
+                        double x = (errorListA[j] - unscaledErrors[j]) * inv_delta;
+                        ud->jacobianList[num] = x;
+                        jacobian[num] = x;
+                    }
+                }
+            }
+        }
+
+        // Scale the derivatives of the marker errors by the loss
+        // function, the same as the errors.
+        if (ud->useLossFunction) {
+            for (int i = 0; i < numberOfParameters; ++i) {
+                const std::vector<int> &errorIndexList = ud->paramToErrorIndexList[i];
+                for (size_t e = 0; e < errorIndexList.size(); ++e) {
+                    const int j = errorIndexList[e];
+                    if (j >= ud->numberOfMarkerErrors) {
+                        continue;
+                    }
+                    size_t num = sparseJacobian ? (columnStartList[i] + e) : ((i * ldfjac) + j);
+                    double x = ud->jacobianList[num] * ud->lossJacobianScaleList[j];
+                    ud->jacobianList[num] = x;
+                    jacobian[num] = x;
+                }
+            }
+        }
+    }
+    ud->timer.funcBenchTimer.stop();
+    ud->timer.funcBenchTicks.stop();
+
+    if (ud->verbose) {
+        if (ud->isNormalCall) {
+            char formatBuffer[128];
+            sprintf(
+                formatBuffer,
+                " | error avg %8.4f   min %8.4f   max %8.4f",
+                error_avg,
+                error_min,
+                error_max);
+            std::cerr << std::string(formatBuffer) << "\n";
+        } else if (!ud->doCalcJacobian) {
+            std::cerr << "\n";
+        }
+    }
+    return SOLVE_FUNC_SUCCESS;
+}
+
+
+#ifdef USE_SOLVER_CMINPACK
+
+static int problemSolveFunc_cminpack_lmdif(void *data,
+                                           int m,
+                                           int n,
+                                           const double *x,
+                                           double *fvec,
+                                           int iflag) {
+    ProblemSolverData *ud = static_cast<ProblemSolverData *>(data);
+    ud->isPrintCall = iflag == 0;
+    ud->isNormalCall = iflag == 1;
+    ud->isJacobianCall = iflag == 2;
+
+    // We will not compute a jacobian in 'lmdif'
+    ud->doCalcJacobian = false;
+    double *fjac = NULL;
+
+    int ret = problemSolveFunc(n, m, x, fvec, fjac, data);
+    int info = -1;
+    if (ret == SOLVE_FUNC_SUCCESS) {
+        info = 0;
+    }
+    return info;
+}
+
+
+static int problemSolveFunc_cminpack_lmder(void *data,
+                                           int m,
+                                           int n,
+                                           const double *x,
+                                           double *fvec,
+                                           double *fjac,
+                                           int ldfjac,
+                                           int iflag) {
+    UNUSED(ldfjac);
+    ProblemSolverData *ud = static_cast<ProblemSolverData *>(data);
+    ud->isPrintCall = iflag == 0;
+    ud->isNormalCall = iflag == 1;
+    ud->isJacobianCall = iflag == 2;
+    ud->doCalcJacobian = iflag == 2;
+
+    int ret = problemSolveFunc(n, m, x, fvec, fjac, data);
+    int info = -1;
+    if (ret == SOLVE_FUNC_SUCCESS) {
+        info = 0;
+    }
+    return info;
+}
+
+
+static bool solveProblem_cminpack(SolverOptions &solverOptions,
+                                  int numberOfParameters,
+                                  int numberOfErrors,
+                                  ProblemSolverBuffers &buffers,
+                                  ProblemSolverData &userData,
+                                  SolverResult &solveResult) {
+    const bool useDerivative = solverOptions.solverType == SOLVER_TYPE_CMINPACK_LMDER;
+    std::vector<double> &paramList = buffers.paramList;
+    std::vector<double> &errorList = buffers.errorList;
+    std::vector<double> &paramWeightList = buffers.paramWeightList;
+    std::vector<double> &jacobianList = buffers.jacobianList;
+    std::vector<int> &ipvtList = buffers.pivotList;
+    jacobianList.assign(numberOfParameters * numberOfErrors, 0);
+    ipvtList.assign(numberOfParameters, 0);
+
+    // The 'qtf', 'wa1', 'wa2', 'wa3' and 'wa4' work arrays.
+    buffers.workList.assign((numberOfParameters * 4) + numberOfErrors, 0);
+    double *qtf = &buffers.workList[0];
+    double *wa1 = qtf + numberOfParameters;
+    double *wa2 = wa1 + numberOfParameters;
+    double *wa3 = wa2 + numberOfParameters;
+    double *wa4 = wa3 + numberOfParameters;
+
+    int ldfjac = numberOfErrors;
+    if (numberOfParameters >= numberOfErrors) {
+        ldfjac = numberOfParameters;
+    }
+
+    double ftol = solverOptions.eps1;
+    double xtol = solverOptions.eps2;
+    double gtol = solverOptions.eps3;
+    double epsfcn = std::abs(solverOptions.delta);
+    int mode = 2; // Off
+    if (solverOptions.autoParamScale == 1) {
+        mode = 1; // On
+    }
+    double factor = solverOptions.tau * 100.0;
+    int nprint = 0;  // 0 == don't print anything.
+    int calls = 0;
+    int njev = 0;
+    int info = 0;
+    if (useDerivative) {
+        info = __cminpack_func__(lmder)(
+            problemSolveFunc_cminpack_lmder,
+            (void *) &userData,
+            numberOfErrors, numberOfParameters,
+            &paramList[0], &errorList[0],
+            &jacobianList[0], ldfjac,
+            ftol, xtol, gtol,
+            solverOptions.iterMax,
+            &paramWeightList[0], mode, factor, nprint,
+            &calls, &njev,
+            &ipvtList[0], qtf,
+            wa1, wa2, wa3, wa4);
+    } else {
+        info = __cminpack_func__(lmdif)(
+            problemSolveFunc_cminpack_lmdif,
+            (void *) &userData,
+            numberOfErrors, numberOfParameters,
+            &paramList[0], &errorList[0],
+            ftol, xtol, gtol,
+            solverOptions.iterMax,
+            epsfcn,
+            &paramWeightList[0], mode, factor, nprint,
+            &calls,
+            &jacobianList[0], ldfjac,
+            &ipvtList[0], qtf,
+            wa1, wa2, wa3, wa4);
+    }
+    double error_norm_value = __cminpack_func__(enorm)(numberOfErrors, &errorList[0]);
+
+    int reason_number = info;
+    solveResult.success = userData.iterNum > 0;
+    solveResult.reason_number = reason_number;
+    if ((reason_number >= 0) && (reason_number < 9)) {
+        solveResult.reason = cminpackReasons[reason_number];
+    } else {
+        solveResult.reason = "User requested termination.";
+    }
+    solveResult.iterations = calls;
+    solveResult.functionEvals = userData.iterNum;
+    solveResult.jacobianEvals = userData.jacIterNum;
+    solveResult.errorFinal = error_norm_value;
+    return true;
+}
+
+#endif // USE_SOLVER_CMINPACK
+
+
+#ifdef USE_SOLVER_LEVMAR
+
+static void problemSolveFunc_levmar_bc_dif(double *p,
+                                           double *x,
+                                           int m,
+                                           int n,
+                                           void *data) {
+    ProblemSolverData *ud = static_cast<ProblemSolverData *>(data);
+    ud->doCalcJacobian = false;
+    double *fjac = NULL;
+
+    int ret = problemSolveFunc(m, n, p, x, fjac, data);
+    if (ret == SOLVE_FUNC_FAILURE) {
+        for (int i = 0; i < n; ++i) {
+            x[i] = std::numeric_limits<double>::quiet_NaN();
+        }
+    }
+    return;
+}
+
+
+static bool solveProblem_levmar_bc_dif(SolverOptions &solverOptions,
+                                       int numberOfParameters,
+                                       int numberOfErrors,
+                                       ProblemSolverBuffers &buffers,
+                                       ProblemSolverData &userData,
+                                       SolverResult &solveResult) {
+    std::vector<double> &paramList = buffers.paramList;
+    std::vector<double> &errorList = buffers.errorList;
+    std::vector<double> &paramWeightList = buffers.paramWeightList;
+    double levmar_opts[LM_OPTS_SZ];
+    double levmar_info[LM_INFO_SZ];
+
+    double delta_factor = std::abs(solverOptions.delta);
+    if (solverOptions.autoDiffType == AUTO_DIFF_TYPE_CENTRAL) {
+        delta_factor *= -1;
+    }
+    levmar_opts[0] = solverOptions.tau;
+    levmar_opts[1] = solverOptions.eps1;
+    levmar_opts[2] = solverOptions.eps2;
+    levmar_opts[3] = solverOptions.eps3;
+    levmar_opts[4] = delta_factor;
+
+    // The parameter bounds are given to levmar.
+    std::vector<double> &lowerBoundList = userData.paramLowerBoundList;
+    std::vector<double> &upperBoundList = userData.paramUpperBoundList;
+
+    std::vector<double> &work = buffers.workList;
+    work.assign(LM_BC_DIF_WORKSZ(numberOfParameters, numberOfErrors)
+                + (numberOfParameters * numberOfParameters), 0);
+    double *covar = &work[0] + LM_BC_DIF_WORKSZ(numberOfParameters, numberOfErrors);
+
+    int ret = dlevmar_bc_dif(
+            problemSolveFunc_levmar_bc_dif,
+            &paramList[0], &errorList[0],
+            numberOfParameters, numberOfErrors,
+            &lowerBoundList[0], &upperBoundList[0],
+            &paramWeightList[0],
+            solverOptions.iterMax,
+            levmar_opts, levmar_info,
+            &work[0], covar,
+            (void *) &userData);
+
+    int reason_number = (int) levmar_info[6];
+    solveResult.success = ret > 0;
+    solveResult.reason_number = reason_number;
+    solveResult.reason = levmarReasons[reason_number];
+    solveResult.iterations = (int) levmar_info[5];
+    solveResult.functionEvals = (int) levmar_info[7];
+    solveResult.jacobianEvals = (int) levmar_info[8];
+    solveResult.errorFinal = levmar_info[1];
+    return true;
+}
+
+#endif // USE_SOLVER_LEVMAR
+
+
+static int problemSolveFunc_schur_lm(void *data,
+                                     int m,
+                                     int n,
+                                     const double *x,
+                                     double *fvec,
+                                     double *fjac,
+                                     int iflag) {
+    ProblemSolverData *ud = static_cast<ProblemSolverData *>(data);
+    ud->isPrintCall = false;
+    ud->isNormalCall = iflag == 1;
+    ud->isJacobianCall = iflag == 2;
+    ud->doCalcJacobian = iflag == 2;
+
+    int ret = problemSolveFunc(n, m, x, fvec, fjac, data);
+    int info = -1;
+    if (ret == SOLVE_FUNC_SUCCESS) {
+        info = 0;
+    }
+    return info;
+}
+
+
+static bool solveProblem_schur_lm(SolverOptions &solverOptions,
+                                  int numberOfParameters,
+                                  int numberOfErrors,
+                                  ProblemSolverBuffers &buffers,
+                                  ProblemSolverData &userData,
+                                  SolverResult &solveResult) {
+    ThreadPool threadPool(solverOptions.threadCount);
+    bool ok = solveSchurLevenbergMarquardt(
+        problemSolveFunc_schur_lm,
+        (void *) &userData,
+        numberOfErrors, numberOfParameters,
+        &buffers.paramList[0], &buffers.errorList[0],
+        userData.schurStructure,
+        solverOptions,
+        &threadPool,
+        solveResult);
+    solveResult.functionEvals = userData.iterNum;
+    solveResult.jacobianEvals = userData.jacIterNum;
+    return ok;
+}
+
+
+static void resetSolverResult(SolverResult &solveResult) {
+    solveResult.success = false;
+    solveResult.errorAvg = 0.0;
+    solveResult.errorMin = 0.0;
+    solveResult.errorMax = 0.0;
+    solveResult.reason_number = 0;
+    solveResult.reason = "";
+    solveResult.iterations = 0;
+    solveResult.functionEvals = 0;
+    solveResult.jacobianEvals = 0;
+    solveResult.errorFinal = 0.0;
+}
+
+
+// Can the Problem be solved? Prints the reason if not.
+static bool isSolvableProblem(const Problem &problem) {
+    const int numberOfParameters = problem.getNumberOfParameters();
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkerErrors = problem.getNumberOfMarkerErrors();
+    if (numberOfParameters == 0 || numberOfMarkerErrors == 0) {
+        ERR("Solver failure; cannot solve without parameters and markers; "
+            << "parameters=" << numberOfParameters << " "
+            << "marker errors=" << numberOfMarkerErrors);
+        return false;
+    }
+    if (numberOfParameters > numberOfErrors) {
+        ERR("Solver failure; cannot solve for more attributes (\"parameters\") "
+            << "than number of markers (\"errors\"); "
+            << "parameters=" << numberOfParameters << " "
+            << "errors=" << numberOfErrors);
+        return false;
+    }
+    return true;
+}
+
+
+// Solve the Problem, using the solver type given in
+// 'solverOptions'. The Problem is left with the solved parameter
+// values.
+bool solveProblem(SolverOptions &solverOptions,
+                  Problem &problem,
+                  bool verbose,
+                  SolverResult &solveResult) {
+    resetSolverResult(solveResult);
+    if (!isSolvableProblem(problem)) {
+        return false;
+    }
+
+    ProblemSolverData userData;
+    initProblemSolverData(problem, solverOptions, verbose, userData);
+    ProblemSolverBuffers buffers;
+    return solveProblemData(solverOptions, userData, buffers, solveResult);
+}
+
+
+// Solve the Problem of 'userData' (initialised with
+// 'initProblemSolverData'), starting from the current parameter
+// values of the Problem.
+//
+// The relationships, parameter groups and Jacobian structure in
+// 'userData' are not found again, so the same 'userData' may be used
+// to solve the Problem many times. 'buffers' is resized as needed,
+// and may be used for any number of Problems.
+bool solveProblemData(SolverOptions &solverOptions,
+                      ProblemSolverData &userData,
+                      ProblemSolverBuffers &buffers,
+                      SolverResult &solveResult) {
+    resetSolverResult(solveResult);
+    Problem &problem = *userData.problem;
+    if (!isSolvableProblem(problem)) {
+        return false;
+    }
+    const int numberOfParameters = problem.getNumberOfParameters();
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkerErrors = problem.getNumberOfMarkerErrors();
+    const int numberOfMarkers = numberOfMarkerErrors / ERRORS_PER_MARKER;
+    const bool verbose = userData.verbose;
+
+    userData.funcEvalNum = 0;
+    userData.iterNum = 0;
+    userData.jacIterNum = 0;
+    userData.lossParamList.clear();
+    userData.isNormalCall = true;
+    userData.isJacobianCall = false;
+    userData.isPrintCall = false;
+    userData.doCalcJacobian = false;
+
+    std::vector<double> &paramList = buffers.paramList;
+    std::vector<double> &errorList = buffers.errorList;
+    std::vector<bool> &evalMeasurements = buffers.markerMeasurementList;
+    getProblemInitialParameters(userData, paramList);
+    buffers.initialParamList = paramList;
+    errorList.assign(numberOfErrors, 0);
+    buffers.paramWeightList.assign(numberOfParameters, 1.0);
+    evalMeasurements.assign(numberOfMarkers, true);
+
+    double initialErrorAvg = 0.0;
+    double initialErrorMax = 0.0;
+    double initialErrorMin = 0.0;
+    if (solverOptions.acceptOnlyBetter) {
+        setProblemParameters(numberOfParameters, &paramList[0], &userData);
+        measureProblemErrors(numberOfErrors, evalMeasurements,
+                             &errorList[0], &userData,
+                             initialErrorAvg, initialErrorMax, initialErrorMin);
+    }
+
+    userData.timer.solveBenchTimer.start();
+    userData.timer.solveBenchTicks.start();
+    bool ok = false;
+    if (solverOptions.solverType == SOLVER_TYPE_CMINPACK_LMDIF
+        || solverOptions.solverType == SOLVER_TYPE_CMINPACK_LMDER) {
+#ifdef USE_SOLVER_CMINPACK
+        ok = solveProblem_cminpack(
+            solverOptions,
+            numberOfParameters, numberOfErrors,
+            buffers, userData, solveResult);
+#else
+        ERR("Solver Type is not supported by this build; "
+            << "solverType=" << solverOptions.solverType);
+#endif
+    } else if (solverOptions.solverType == SOLVER_TYPE_LEVMAR) {
+#ifdef USE_SOLVER_LEVMAR
+        ok = solveProblem_levmar_bc_dif(
+            solverOptions,
+            numberOfParameters, numberOfErrors,
+            buffers, userData, solveResult);
+#else
+        ERR("Solver Type is not supported by this build; "
+            << "solverType=" << solverOptions.solverType);
+#endif
+    } else if (solverOptions.solverType == SOLVER_TYPE_SCHUR_LM) {
+        ok = solveProblem_schur_lm(
+            solverOptions,
+            numberOfParameters, numberOfErrors,
+            buffers, userData, solveResult);
+    } else {
+        ERR("Solver Type is invalid; solverType=" << solverOptions.solverType);
+    }
+    userData.timer.solveBenchTimer.stop();
+    userData.timer.solveBenchTicks.stop();
+    if (!ok) {
+        return false;
+    }
+
+    // Measure the errors of the solved parameters; the last
+    // evaluation made by the solver may have been a Jacobian
+    // evaluation.
+    double errorAvg = 0.0;
+    double errorMax = 0.0;
+    double errorMin = 0.0;
+    setProblemParameters(numberOfParameters, &paramList[0], &userData);
+    measureProblemErrors(numberOfErrors, evalMeasurements,
+                         &errorList[0], &userData,
+                         errorAvg, errorMax, errorMin);
+
+    if (solverOptions.acceptOnlyBetter && (errorAvg > initialErrorAvg)) {
+        setProblemParameters(numberOfParameters, &buffers.initialParamList[0], &userData);
+        measureProblemErrors(numberOfErrors, evalMeasurements,
+                             &errorList[0], &userData,
+                             errorAvg, errorMax, errorMin);
+        solveResult.success = false;
+    }
+    solveResult.errorAvg = errorAvg;
+    solveResult.errorMin = errorMin;
+    solveResult.errorMax = errorMax;
+
+    if (verbose) {
+        userData.timer.solveBenchTimer.print("Solve Time", 1);
+        userData.timer.funcBenchTimer.print("Func Time", 1);
+        userData.timer.paramBenchTimer.print("Param Time", (uint) userData.iterNum);
+        userData.timer.errorBenchTimer.print("Error Time", (uint) userData.iterNum);
+    }
+    return true;
+}
+
+
+// Solve the Problem as independent connected components (see
+// 'findParameterComponents'); parameters in different components
+// affect no errors in common, so each component is solved as a
+// separate sub-problem, and the components are solved at the same
+// time using 'solverOptions.threadCount' threads. Each component is
+// solved with a single thread. If the Problem is not thread safe
+// (see 'Problem::isThreadSafe') the components are solved one after
+// another, in the calling thread.
+//
+// The result has the sum of the iterations and evaluations of all
+// components, and the errors of the whole Problem after all
+// components are solved. The solve is successful if all components
+// are solved successfully.
+//
+// If the Problem has a single component, or does not support
+// sub-problems, the whole Problem is solved with 'solveProblem'.
+bool solveProblemComponents(SolverOptions &solverOptions,
+                            Problem &problem,
+                            bool verbose,
+                            SolverResult &solveResult) {
+    const int numberOfParameters = problem.getNumberOfParameters();
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkerErrors = problem.getNumberOfMarkerErrors();
+    const int numberOfMarkers = numberOfMarkerErrors / ERRORS_PER_MARKER;
+
+    BoolList2D errorToParamList;
+    BoolList2D otherErrorToParamList;
+    problem.getErrorToParameterRelationship(errorToParamList);
+    problem.getOtherErrorToParameterRelationship(otherErrorToParamList);
+    IndexList2D paramToErrorIndexList;
+    findParameterToErrorIndexList(numberOfParameters,
+                                  errorToParamList,
+                                  otherErrorToParamList,
+                                  paramToErrorIndexList);
+    IndexList2D componentParamList;
+    IndexList2D componentErrorList;
+    findParameterComponents(numberOfErrors,
+                            paramToErrorIndexList,
+                            componentParamList,
+                            componentErrorList);
+    const int numberOfComponents = static_cast<int>(componentParamList.size());
+    if (numberOfComponents < 2) {
+        return solveProblem(solverOptions, problem, verbose, solveResult);
+    }
+
+    // The (marker, frame) pairs and the other errors of each
+    // component. Components without marker errors (only affected by
+    // stiffness or smoothness) are not solved.
+    std::vector<Problem *> subProblemList(numberOfComponents, NULL);
+    bool supported = true;
+    for (int i = 0; i < numberOfComponents; ++i) {
+        std::vector<int> markerErrorList;
+        std::vector<int> otherErrorList;
+        const std::vector<int> &errorIndexList = componentErrorList[i];
+        for (size_t j = 0; j < errorIndexList.size(); ++j) {
+            const int errorIndex = errorIndexList[j];
+            if (errorIndex >= numberOfMarkerErrors) {
+                otherErrorList.push_back(errorIndex - numberOfMarkerErrors);
+            } else if ((errorIndex % ERRORS_PER_MARKER) == 0) {
+                markerErrorList.push_back(errorIndex / ERRORS_PER_MARKER);
+            }
+        }
+        if (markerErrorList.empty()) {
+            continue;
+        }
+        subProblemList[i] = problem.createSubProblem(componentParamList[i],
+                                                     markerErrorList,
+                                                     otherErrorList,
+                                                     1);
+        if (subProblemList[i] == NULL) {
+            supported = false;
+            break;
+        }
+    }
+    if (!supported) {
+        for (int i = 0; i < numberOfComponents; ++i) {
+            delete subProblemList[i];
+        }
+        return solveProblem(solverOptions, problem, verbose, solveResult);
+    }
+
+    // Solve the largest components first, so the threads finish at
+    // about the same time.
+    std::vector<std::pair<int, int> > orderList(numberOfComponents);
+    for (int i = 0; i < numberOfComponents; ++i) {
+        const int count = static_cast<int>(componentErrorList[i].size());
+        orderList[i] = std::pair<int, int>(-count, i);
+    }
+    std::sort(orderList.begin(), orderList.end());
+
+    SolverTimer timer;
+    timer.solveBenchTimer.start();
+    timer.solveBenchTicks.start();
+    std::vector<SolverResult> componentResultList(numberOfComponents);
+    std::vector<int> componentSolvedList(numberOfComponents, 0);
+    std::function<void(int, int)> func = [&](int begin, int end) {
+        for (int k = begin; k < end; ++k) {
+            const int i = orderList[k].second;
+            if (subProblemList[i] == NULL) {
+                continue;
+            }
+            SolverOptions componentSolverOptions = solverOptions;
+            componentSolverOptions.threadCount = 1;
+            componentSolvedList[i] = solveProblem(componentSolverOptions,
+                                                  *subProblemList[i],
+                                                  false,
+                                                  componentResultList[i]);
+        }
+    };
+    int threadCount = 1;
+    if (problem.isThreadSafe()) {
+        threadCount = solverOptions.threadCount;
+    }
+    ThreadPool threadPool(threadCount);
+    threadPool.parallelFor(numberOfComponents, func);
+    timer.solveBenchTimer.stop();
+    timer.solveBenchTicks.stop();
+
+    // Merge the solved components; the solved parameter values are
+    // set on the whole Problem.
+    std::vector<double> paramList(numberOfParameters, 0);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        paramList[i] = problem.getParameterValue(i);
+    }
+    solveResult.success = true;
+    solveResult.reason_number = 0;
+    solveResult.reason = "";
+    solveResult.iterations = 0;
+    solveResult.functionEvals = 0;
+    solveResult.jacobianEvals = 0;
+    int reasonErrorCount = -1;
+    int numberOfSolved = 0;
+    for (int i = 0; i < numberOfComponents; ++i) {
+        Problem *subProblem = subProblemList[i];
+        if (subProblem == NULL) {
+            continue;
+        }
+        const std::vector<int> &componentParams = componentParamList[i];
+        for (size_t j = 0; j < componentParams.size(); ++j) {
+            paramList[componentParams[j]] = subProblem->getParameterValue(static_cast<int>(j));
+        }
+        delete subProblem;
+        subProblemList[i] = NULL;
+
+        const SolverResult &componentResult = componentResultList[i];
+        const bool solved = (componentSolvedList[i] != 0) && componentResult.success;
+        if (componentSolvedList[i] != 0) {
+            solveResult.iterations += componentResult.iterations;
+            solveResult.functionEvals += componentResult.functionEvals;
+            solveResult.jacobianEvals += componentResult.jacobianEvals;
+            ++numberOfSolved;
+        }
+
+        // The reason of the first failed component, otherwise of the
+        // largest component.
+        const int errorCount = static_cast<int>(componentErrorList[i].size());
+        if (solveResult.success && (!solved || (errorCount > reasonErrorCount))) {
+            solveResult.reason_number = componentResult.reason_number;
+            solveResult.reason = componentResult.reason;
+            reasonErrorCount = errorCount;
+        }
+        if (!solved) {
+            solveResult.success = false;
+        }
+    }
+    problem.setParameters(&paramList[0]);
+
+    std::vector<double> errorList(numberOfErrors, 0);
+    std::vector<double> errorDistanceList(numberOfMarkers, 0);
+    std::vector<bool> evalMeasurements(numberOfMarkers, true);
+    problem.measureErrors(evalMeasurements, &errorList[0], &errorDistanceList[0]);
+    double errorAvg = 0.0;
+    double errorMax = 0.0;
+    double errorMin = std::numeric_limits<double>::max();
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        const double d = errorDistanceList[i];
+        errorAvg += d;
+        if (d > errorMax) { errorMax = d; }
+        if (d < errorMin) { errorMin = d; }
+    }
+    if (numberOfMarkers > 0) {
+        errorAvg /= static_cast<double>(numberOfMarkers);
+    } else {
+        errorMin = 0.0;
+    }
+    double sumOfSquares = 0.0;
+    for (int i = 0; i < numberOfErrors; ++i) {
+        sumOfSquares += errorList[i] * errorList[i];
+    }
+    solveResult.errorAvg = errorAvg;
+    solveResult.errorMin = errorMin;
+    solveResult.errorMax = errorMax;
+    solveResult.errorFinal = std::sqrt(sumOfSquares);
+
+    if (verbose) {
+        std::cerr << "Components: " << numberOfComponents
+                  << " (solved " << numberOfSolved << ")" << std::endl;
+        timer.solveBenchTimer.print("Solve Time", 1);
+    }
+    return numberOfSolved > 0;
+}
@@ -0,0 +1,184 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Solve a Problem.
+ *
+ * The solve loop (parameter bounds, loss functions, residual and
+ * Jacobian evaluation) and the cminpack, levmar and Schur complement
+ * solver drivers are independent of Maya; the Maya solver solves a
+ * MayaProblem (see bundleAdjust_mayaProblem.h) with these functions.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PROBLEM_SOLVE_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PROBLEM_SOLVE_H
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_parameterGroups.h>
+#include <core/bundleAdjust_schur.h>
+
+
+// The user data given to the problem solve function.
+struct ProblemSolverData {
+    Problem *problem;
+
+    // Relational mapping indexes.
+    BoolList2D errorToParamList;
+    BoolList2D paramToErrorList;
+
+    // The errors affected by each parameter, and the groups of
+    // parameters evaluated together with finite differences for the
+    // Jacobian.
+    IndexList2D paramToErrorIndexList;
+    IndexList2D paramGroupList;
+
+    // The parameters with analytic derivatives, and the derivatives
+    // of the errors affected by each parameter (stored from
+    // 'derivativeStartList[i]', in 'paramToErrorIndexList' order).
+    std::vector<int> analyticParamList;
+    std::vector<int> derivativeStartList;
+    std::vector<double> derivativeList;
+
+    // The sparse Jacobian structure, used by the Schur complement
+    // solver; the Jacobian is stored sparse by this solver.
+    SchurStructure schurStructure;
+
+    // Robust loss function; the (unscaled) errors measured at
+    // 'lossParamList', and the scale of each marker error and of its
+    // derivatives (see 'computeLossFunctionScales').
+    bool useLossFunction;
+    std::vector<double> lossParamList;
+    std::vector<double> unscaledErrorList;
+    std::vector<double> lossErrorScaleList;
+    std::vector<double> lossJacobianScaleList;
+
+    // Parameter bounds.
+    std::vector<double> paramLowerBoundList;
+    std::vector<double> paramUpperBoundList;
+    std::vector<double> paramOffsetList;
+    std::vector<double> paramScaleList;
+
+    // Internal Solver Data.
+    std::vector<double> externalParamList;
+    std::vector<double> previousParamList;
+    std::vector<double> errorDistanceList;
+    std::vector<double> jacobianList;
+    int funcEvalNum;
+    int iterNum;
+    int jacIterNum;
+    int solverType;
+    int numberOfMarkerErrors;
+
+    // Type of solve function call.
+    bool isNormalCall;
+    bool isJacobianCall;
+    bool isPrintCall;
+    bool doCalcJacobian;
+
+    // Solver Options
+    SolverOptions *solverOptions;
+
+    // Benchmarks
+    SolverTimer timer;
+
+    // Verbosity.
+    bool verbose;
+};
+
+
+// The buffers used by a solve, that may be re-used by the next solve
+// (of the same or another Problem), rather than allocated again.
+struct ProblemSolverBuffers {
+    std::vector<double> paramList;
+    std::vector<double> initialParamList;
+    std::vector<double> errorList;
+    std::vector<double> paramWeightList;
+    std::vector<bool> markerMeasurementList;
+
+    // The Jacobian and work arrays of the cminpack and levmar
+    // solvers.
+    std::vector<double> jacobianList;
+    std::vector<int> pivotList;
+    std::vector<double> workList;
+};
+
+
+std::vector<SolverTypePair> getProblemSolverTypes();
+
+
+void setProblemSolverOptionDefaults(const int solverType,
+                                    SolverOptions &solverOptions);
+
+
+void initProblemSolverData(Problem &problem,
+                           SolverOptions &solverOptions,
+                           bool verbose,
+                           ProblemSolverData &userData);
+
+
+void getProblemInitialParameters(ProblemSolverData &userData,
+                                 std::vector<double> &paramList);
+
+
+void setProblemParameters(const int numberOfParameters,
+                          const double *parameters,
+                          ProblemSolverData *ud);
+
+
+void measureProblemErrors(const int numberOfErrors,
+                          const std::vector<bool> &markerErrorMeasurements,
+                          double *errors,
+                          ProblemSolverData *ud,
+                          double &error_avg,
+                          double &error_max,
+                          double &error_min);
+
+
+int problemSolveFunc(const int numberOfParameters,
+                     const int numberOfErrors,
+                     const double *parameters,
+                     double *errors,
+                     double *jacobian,
+                     void *userData);
+
+
+bool solveProblem(SolverOptions &solverOptions,
+                  Problem &problem,
+                  bool verbose,
+                  SolverResult &solveResult);
+
+
+bool solveProblemData(SolverOptions &solverOptions,
+                      ProblemSolverData &userData,
+                      ProblemSolverBuffers &buffers,
+                      SolverResult &solveResult);
+
+
+bool solveProblemComponents(SolverOptions &solverOptions,
+                            Problem &problem,
+                            bool verbose,
+                            SolverResult &solveResult);
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_PROBLEM_SOLVE_H
@@ -16,32 +16,18 @@
  * You should have received a copy of the GNU Lesser General Public License
  * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
  * ====================================================================
- * 
+ *
+ * Termination reasons of the solver libraries.
+ *
+ * This file does not depend on Maya.
  */
 
 
-#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_CMINPACK_BASE_H
-#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_CMINPACK_BASE_H
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_REASONS_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_REASONS_H
 
 // STL
 #include <string>
-#include <vector>
-
-// Maya
-#include <maya/MPoint.h>
-#include <maya/MStringArray.h>
-#include <maya/MAnimCurveChange.h>
-#include <maya/MDGModifier.h>
-#include <maya/MComputation.h>
-
-// Internal Objects
-#include <Camera.h>
-#include <Marker.h>
-#include <Bundle.h>
-#include <Attr.h>
-
-#include <core/bundleAdjust_solveFunc.h>
-#include <core/bundleAdjust_base.h>
 
 
 // CMinpack 'lmdif' Termination Reasons:
@@ -80,4 +66,32 @@ const std::string cminpackReasons[9] = {
 };
 
 
-#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_CMINPACK_BASE_H
+// Sparse LM or Lev-Mar Termination Reasons:
+const std::string levmarReasons[8] = {
+        // reason 0
+        "No reason, should not get here!",
+
+        // reason 1
+        "Stopped by small solver gradient.",
+
+        // reason 2
+        "Stopped by small change in parameters.",
+
+        // reason 3
+        "Stopped by reaching maximum iterations.",
+
+        // reason 4
+        "Singular matrix. Restart from current parameters with increased \'Tau Factor\'",
+
+        // reason 5
+        "Too many failed attempts to increase damping. Restart with increased \'Tau Factor\'",
+
+        // reason 6
+        "Stopped by small error",
+
+        // reason 7
+        // "stopped by invalid (i.e. NaN or Inf) \"func\" refPoints (user error)",
+        "User canceled",
+};
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_REASONS_H
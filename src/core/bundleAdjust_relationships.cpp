@@ -62,10 +62,6 @@
 
 // Local
 #include <core/bundleAdjust_base.h>
-#include <core/bundleAdjust_levmar_bc_dif.h>
-#include <core/bundleAdjust_cminpack_base.h>
-#include <core/bundleAdjust_cminpack_lmdif.h>
-#include <core/bundleAdjust_cminpack_lmder.h>
 #include <core/bundleAdjust_solveFunc.h>
 #include <mayaUtils.h>
 
@@ -657,3 +653,104 @@ void findErrorToParameterRelationship(const MarkerPtrList markerList,
     }
     return;
 }
+
+
+/*
+ * Find the parameters affecting each attribute stiffness and
+ * smoothness error.
+ *
+ * The errors are stored after the marker errors, stiffness first,
+ * then smoothness (the same order as 'measureErrors'). Each error is
+ * affected by all the parameters of the attribute, on any frame.
+ */
+void findAttrErrorToParameterRelationship(const StiffAttrsPtrList stiffAttrsList,
+                                          const SmoothAttrsPtrList smoothAttrsList,
+                                          const int numParameters,
+                                          const IndexPairList paramToAttrList,
+                                          BoolList2D &attrErrorToParamList) {
+    std::vector<int> attrIndexList;
+    for (size_t i = 0; i < stiffAttrsList.size(); ++i) {
+        attrIndexList.push_back(stiffAttrsList[i]->attrIndex);
+    }
+    for (size_t i = 0; i < smoothAttrsList.size(); ++i) {
+        attrIndexList.push_back(smoothAttrsList[i]->attrIndex);
+    }
+
+    attrErrorToParamList.clear();
+    attrErrorToParamList.resize(attrIndexList.size());
+    for (size_t i = 0; i < attrIndexList.size(); ++i) {
+        attrErrorToParamList[i].resize(numParameters, false);
+        for (int j = 0; j < numParameters; ++j) {
+            attrErrorToParamList[i][j] = paramToAttrList[j].first == attrIndexList[i];
+        }
+    }
+    return;
+}
+
+
+/*
+ * Find the unique (camera, frame) and (bundle, frame) pairs used by
+ * the errors.
+ *
+ * Many markers share a camera, and a bundle may be viewed by markers
+ * of more than one camera, so the camera and bundle data of a frame
+ * only needs to be evaluated once, rather than once per-marker.
+ *
+ * 'cameraFrameToMarkerList' and 'bundleFrameToMarkerList' contain a
+ * (marker index, frame index) pair for each unique camera and bundle
+ * frame; the camera or bundle is found from the marker. Each entry
+ * of 'markerErrorDataList' refers to the camera and bundle frames
+ * used by the error.
+ */
+void findErrorToFrameDataRelationship(const MarkerPtrList markerList,
+                                      const std::vector<MPoint> markerPosList,
+                                      const std::vector<double> markerWeightList,
+                                      const IndexPairList errorToMarkerList,
+                                      IndexPairList &cameraFrameToMarkerList,
+                                      IndexPairList &bundleFrameToMarkerList,
+                                      std::vector<MarkerErrorData> &markerErrorDataList) {
+    typedef std::pair<void *, int> ObjectFramePair;
+    std::map<ObjectFramePair, int> cameraFrameMap;
+    std::map<ObjectFramePair, int> bundleFrameMap;
+
+    cameraFrameToMarkerList.clear();
+    bundleFrameToMarkerList.clear();
+    markerErrorDataList.clear();
+    markerErrorDataList.resize(errorToMarkerList.size());
+    for (size_t i = 0; i < errorToMarkerList.size(); ++i) {
+        IndexPair markerPair = errorToMarkerList[i];
+        int markerIndex = markerPair.first;
+        int frameIndex = markerPair.second;
+        MarkerPtr marker = markerList[markerIndex];
+
+        ObjectFramePair cameraKey(marker->getCamera().get(), frameIndex);
+        std::map<ObjectFramePair, int>::iterator cameraIt = cameraFrameMap.find(cameraKey);
+        int cameraFrameIndex = 0;
+        if (cameraIt == cameraFrameMap.end()) {
+            cameraFrameIndex = static_cast<int>(cameraFrameToMarkerList.size());
+            cameraFrameMap[cameraKey] = cameraFrameIndex;
+            cameraFrameToMarkerList.push_back(markerPair);
+        } else {
+            cameraFrameIndex = cameraIt->second;
+        }
+
+        ObjectFramePair bundleKey(marker->getBundle().get(), frameIndex);
+        std::map<ObjectFramePair, int>::iterator bundleIt = bundleFrameMap.find(bundleKey);
+        int bundleFrameIndex = 0;
+        if (bundleIt == bundleFrameMap.end()) {
+            bundleFrameIndex = static_cast<int>(bundleFrameToMarkerList.size());
+            bundleFrameMap[bundleKey] = bundleFrameIndex;
+            bundleFrameToMarkerList.push_back(markerPair);
+        } else {
+            bundleFrameIndex = bundleIt->second;
+        }
+
+        MarkerErrorData &markerErrorData = markerErrorDataList[i];
+        markerErrorData.cameraFrameIndex = cameraFrameIndex;
+        markerErrorData.bundleFrameIndex = bundleFrameIndex;
+        markerErrorData.x = markerPosList[i].x;
+        markerErrorData.y = markerPosList[i].y;
+        markerErrorData.weight = markerWeightList[i];
+    }
+    return;
+}
@@ -51,6 +51,8 @@
 #include <core/bundleAdjust_defines.h>
 #include <core/bundleAdjust_data.h>
 #include <core/bundleAdjust_solveFunc.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <core/bundleAdjust_parameterGroups.h>
 
 typedef std::vector<std::vector<bool> > BoolList2D;
 typedef std::pair<int, int> IndexPair;
@@ -108,4 +110,20 @@ void findErrorToParameterRelationship(
     BoolList2D &errorToParamList,
     MStatus &status);
 
+void findAttrErrorToParameterRelationship(
+    const StiffAttrsPtrList stiffAttrsList,
+    const SmoothAttrsPtrList smoothAttrsList,
+    const int numParameters,
+    const IndexPairList paramToAttrList,
+    BoolList2D &attrErrorToParamList);
+
+void findErrorToFrameDataRelationship(
+    const MarkerPtrList markerList,
+    const std::vector<MPoint> markerPosList,
+    const std::vector<double> markerWeightList,
+    const IndexPairList errorToMarkerList,
+    IndexPairList &cameraFrameToMarkerList,
+    IndexPairList &bundleFrameToMarkerList,
+    std::vector<MarkerErrorData> &markerErrorDataList);
+
 #endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_RELATIONSHIPS_H
@@ -0,0 +1,399 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Re-projection errors of (marker, frame) pairs, their derivatives,
+ * and the cache of camera and bundle frame data.
+ */
+
+// STL
+#include <cmath>
+#include <cassert>
+#include <functional>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_threadPool.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+
+
+void initFrameDataCache(const int numberOfParameters,
+                        const int numberOfCameraFrames,
+                        const int numberOfBundleFrames,
+                        const BoolList2D &markerErrorToParamList,
+                        const std::vector<bool> &paramCameraList,
+                        const std::vector<bool> &paramBundleList,
+                        const std::vector<MarkerErrorData> &markerErrorDataList,
+                        FrameDataCache &cache) {
+    assert(markerErrorToParamList.size() == markerErrorDataList.size());
+    assert(paramCameraList.size() == static_cast<size_t>(numberOfParameters));
+    assert(paramBundleList.size() == static_cast<size_t>(numberOfParameters));
+    cache.paramToCameraFrameList.clear();
+    cache.paramToCameraFrameList.resize(numberOfParameters);
+    cache.paramToBundleFrameList.clear();
+    cache.paramToBundleFrameList.resize(numberOfParameters);
+
+    // Each frame is added once per parameter; the frames last added
+    // to each parameter are remembered.
+    std::vector<int> cameraFrameParamList(numberOfCameraFrames, -1);
+    std::vector<int> bundleFrameParamList(numberOfBundleFrames, -1);
+    for (int j = 0; j < numberOfParameters; ++j) {
+        const bool paramCamera = paramCameraList[j];
+        const bool paramBundle = paramBundleList[j];
+        for (size_t i = 0; i < markerErrorDataList.size(); ++i) {
+            if (!markerErrorToParamList[i][j]) {
+                continue;
+            }
+            const MarkerErrorData &markerErrorData = markerErrorDataList[i];
+            const int cameraFrameIndex = markerErrorData.cameraFrameIndex;
+            if (paramCamera && (cameraFrameParamList[cameraFrameIndex] != j)) {
+                cameraFrameParamList[cameraFrameIndex] = j;
+                cache.paramToCameraFrameList[j].push_back(cameraFrameIndex);
+            }
+            const int bundleFrameIndex = markerErrorData.bundleFrameIndex;
+            if (paramBundle && (bundleFrameParamList[bundleFrameIndex] != j)) {
+                bundleFrameParamList[bundleFrameIndex] = j;
+                cache.paramToBundleFrameList[j].push_back(bundleFrameIndex);
+            }
+        }
+    }
+
+    cache.cameraFrameValidList.resize(numberOfCameraFrames);
+    cache.bundleFrameValidList.resize(numberOfBundleFrames);
+    resetFrameDataCache(cache);
+    return;
+}
+
+
+void resetFrameDataCache(FrameDataCache &cache) {
+    cache.cameraFrameValidList.assign(cache.cameraFrameValidList.size(), false);
+    cache.bundleFrameValidList.assign(cache.bundleFrameValidList.size(), false);
+    cache.cameraFrameEvaluations = 0;
+    cache.cameraFrameCacheHits = 0;
+    cache.bundleFrameEvaluations = 0;
+    cache.bundleFrameCacheHits = 0;
+    return;
+}
+
+
+int invalidateFrameDataCache(const int numberOfParameters,
+                             const double *parameters,
+                             const double *previousParameters,
+                             FrameDataCache &cache) {
+    int changedCount = 0;
+    for (int j = 0; j < numberOfParameters; ++j) {
+        if (parameters[j] == previousParameters[j]) {
+            continue;
+        }
+        ++changedCount;
+        const std::vector<int> &cameraFrameList = cache.paramToCameraFrameList[j];
+        for (size_t k = 0; k < cameraFrameList.size(); ++k) {
+            cache.cameraFrameValidList[cameraFrameList[k]] = false;
+        }
+        const std::vector<int> &bundleFrameList = cache.paramToBundleFrameList[j];
+        for (size_t k = 0; k < bundleFrameList.size(); ++k) {
+            cache.bundleFrameValidList[bundleFrameList[k]] = false;
+        }
+    }
+    return changedCount;
+}
+
+
+static void measureReprojectionError(const int errorPairIndex,
+                                     const MarkerErrorData &markerData,
+                                     const CameraFrameData &cameraData,
+                                     const BundleFrameData &bundleData,
+                                     double *errors,
+                                     double *deviations,
+                                     double *errorDistances) {
+    // Re-project Bundle into screen-space.
+    double bnd_x = 0.0;
+    double bnd_y = 0.0;
+    projectPoint(cameraData.worldProjectionMatrix,
+                 cameraData.filmBackInvAspect,
+                 bundleData.position, bnd_x, bnd_y);
+
+    // Is the bundle behind the camera?
+    double bnd_dir[3];
+    double bnd_dir_length = 0.0;
+    for (int j = 0; j < 3; ++j) {
+        bnd_dir[j] = bundleData.position[j] - cameraData.position[j];
+        bnd_dir_length += bnd_dir[j] * bnd_dir[j];
+    }
+    bnd_dir_length = std::sqrt(bnd_dir_length);
+    double cam_dot_bnd = 0.0;
+    if (bnd_dir_length > 0.0) {
+        for (int j = 0; j < 3; ++j) {
+            cam_dot_bnd += cameraData.forwardDirection[j] * (bnd_dir[j] / bnd_dir_length);
+        }
+    }
+    double behind_camera_error_factor = 1.0;
+    if (cam_dot_bnd < 0.0) {
+        behind_camera_error_factor = 1e+6;
+    }
+
+    // 'sqrt' will be NaN if the weight is less than 0.0.
+    assert(markerData.weight > 0.0);
+    const double mkr_weight = std::sqrt(markerData.weight);
+
+    const double imageWidth = cameraData.imageWidth;
+    const double ex = markerData.x - bnd_x;
+    const double ey = markerData.y - bnd_y;
+    const double dx = std::fabs(ex) * imageWidth;
+    const double dy = std::fabs(ey) * imageWidth;
+    const double d = std::sqrt((ex * ex) + (ey * ey)) * imageWidth;
+
+    const int errorIndex = errorPairIndex * ERRORS_PER_MARKER;
+    errors[errorIndex + 0] = dx * mkr_weight * behind_camera_error_factor;
+    errors[errorIndex + 1] = dy * mkr_weight * behind_camera_error_factor;
+    if (deviations != NULL) {
+        deviations[errorIndex + 0] = dx * behind_camera_error_factor;
+        deviations[errorIndex + 1] = dy * behind_camera_error_factor;
+    }
+    errorDistances[errorPairIndex] = d;
+    return;
+}
+
+
+void measureReprojectionErrors(const std::vector<int> &measureList,
+                               const std::vector<MarkerErrorData> &markerErrorDataList,
+                               const std::vector<CameraFrameData> &cameraFrameDataList,
+                               const std::vector<BundleFrameData> &bundleFrameDataList,
+                               ThreadPool *threadPool,
+                               double *errors,
+                               double *deviations,
+                               double *errorDistances) {
+    // Each pair writes to its own indices of the output arrays, so
+    // no locking is needed.
+    std::function<void(int, int)> func = [&](int begin, int end) {
+        for (int i = begin; i < end; ++i) {
+            const int errorPairIndex = measureList[i];
+            const MarkerErrorData &markerData = markerErrorDataList[errorPairIndex];
+            measureReprojectionError(
+                errorPairIndex,
+                markerData,
+                cameraFrameDataList[markerData.cameraFrameIndex],
+                bundleFrameDataList[markerData.bundleFrameIndex],
+                errors,
+                deviations,
+                errorDistances);
+        }
+    };
+
+    const int count = static_cast<int>(measureList.size());
+    if (threadPool == NULL) {
+        func(0, count);
+    } else {
+        threadPool->parallelFor(count, func);
+    }
+    return;
+}
+
+
+void computeCameraFrameDerivativeData(const SceneCamera &camera,
+                                      const int frameIndex,
+                                      CameraFrameDerivativeData &out) {
+    const CameraFrame &frame = camera.frames[frameIndex];
+
+    Matrix44 worldMatrix;
+    computeCameraWorldMatrix(camera, frameIndex, worldMatrix);
+    for (int i = 0; i < 3; ++i) {
+        out.translate[i] = worldMatrix.m[3][i];
+        for (int j = 0; j < 3; ++j) {
+            out.rotateMatrix[i][j] = worldMatrix.m[i][j];
+        }
+    }
+    Matrix44 rotateDerivativeMatrix;
+    for (int axis = 0; axis < 3; ++axis) {
+        composeRotateMatrixDerivative(frame.rotate, axis, rotateDerivativeMatrix);
+        for (int i = 0; i < 3; ++i) {
+            for (int j = 0; j < 3; ++j) {
+                out.rotateDerivativeMatrix[axis][i][j] = rotateDerivativeMatrix.m[i][j];
+            }
+        }
+    }
+    computeCameraForwardDirection(worldMatrix, out.forwardDirection);
+
+    Matrix44 projectionMatrix;
+    computeProjectionMatrix(
+        frame.focalLength,
+        frame.filmBackWidth, frame.filmBackHeight,
+        frame.filmOffsetX, frame.filmOffsetY,
+        camera.imageWidth, camera.imageHeight,
+        camera.filmFit,
+        camera.nearClipPlane, camera.farClipPlane,
+        camera.cameraScale,
+        projectionMatrix);
+    out.projectionScale[0] = projectionMatrix.m[0][0];
+    out.projectionScale[1] = projectionMatrix.m[1][1];
+    out.projectionOffset[0] = projectionMatrix.m[2][0];
+    out.projectionOffset[1] = projectionMatrix.m[2][1];
+
+    // The projection scale is proportional to the focal length, and
+    // the projection offset is proportional to the film offset.
+    double filmFitScaleX = 1.0;
+    double filmFitScaleY = 1.0;
+    computeFilmFitScale(frame.filmBackWidth, frame.filmBackHeight,
+                        camera.imageWidth, camera.imageHeight,
+                        camera.filmFit,
+                        filmFitScaleX, filmFitScaleY);
+    out.projectionScaleFocalDerivative[0] = out.projectionScale[0] / frame.focalLength;
+    out.projectionScaleFocalDerivative[1] = out.projectionScale[1] / frame.focalLength;
+    out.projectionOffsetFilmOffsetDerivative[0] = 2.0 * filmFitScaleX / frame.filmBackWidth;
+    out.projectionOffsetFilmOffsetDerivative[1] = 2.0 * filmFitScaleY / frame.filmBackHeight;
+
+    out.filmBackInvAspect = frame.filmBackHeight / frame.filmBackWidth;
+    out.imageWidth = camera.imageWidth;
+    return;
+}
+
+
+static void measureReprojectionDerivative(const MarkerErrorData &markerData,
+                                          const CameraFrameDerivativeData &cameraData,
+                                          const BundleFrameData &bundleData,
+                                          ReprojectionDerivatives &out) {
+    for (int e = 0; e < ERRORS_PER_MARKER; ++e) {
+        for (int i = 0; i < SCENE_ATTR_TYPE_COUNT; ++i) {
+            out.camera[e][i] = 0.0;
+        }
+        for (int i = 0; i < 3; ++i) {
+            out.bundle[e][i] = 0.0;
+        }
+    }
+
+    // The Bundle in camera-space.
+    double dir[3];
+    double pos[3];
+    for (int i = 0; i < 3; ++i) {
+        dir[i] = bundleData.position[i] - cameraData.translate[i];
+    }
+    for (int i = 0; i < 3; ++i) {
+        pos[i] = (cameraData.rotateMatrix[i][0] * dir[0])
+                 + (cameraData.rotateMatrix[i][1] * dir[1])
+                 + (cameraData.rotateMatrix[i][2] * dir[2]);
+    }
+    if (pos[2] == 0.0) {
+        // The Bundle is on the camera plane, the projection is not
+        // defined.
+        return;
+    }
+    const double inv_z = 1.0 / pos[2];
+    const double u = pos[0] * inv_z;
+    const double v = pos[1] * inv_z;
+    const double aspect = cameraData.filmBackInvAspect;
+    const double bnd_x = -0.5 * ((cameraData.projectionScale[0] * u) + cameraData.projectionOffset[0]);
+    const double bnd_y = -0.5 * aspect * ((cameraData.projectionScale[1] * v) + cameraData.projectionOffset[1]);
+
+    // The same scaling as 'measureReprojectionError'; the error is
+    // the absolute distance, multiplied by the image width, the
+    // marker weight and the behind camera factor.
+    double cam_dot_bnd = 0.0;
+    for (int i = 0; i < 3; ++i) {
+        cam_dot_bnd += cameraData.forwardDirection[i] * dir[i];
+    }
+    double behind_camera_error_factor = 1.0;
+    if (cam_dot_bnd < 0.0) {
+        behind_camera_error_factor = 1e+6;
+    }
+    assert(markerData.weight > 0.0);
+    const double factor = cameraData.imageWidth
+                          * std::sqrt(markerData.weight)
+                          * behind_camera_error_factor;
+    const double ex = markerData.x - bnd_x;
+    const double ey = markerData.y - bnd_y;
+    const double scale[ERRORS_PER_MARKER] = {
+        (ex < 0.0) ? factor : -factor,
+        (ey < 0.0) ? factor : -factor
+    };
+
+    // Derivatives of the projected position with respect to the
+    // camera-space position.
+    const double grad[ERRORS_PER_MARKER][3] = {
+        {-0.5 * cameraData.projectionScale[0] * inv_z,
+         0.0,
+         0.5 * cameraData.projectionScale[0] * u * inv_z},
+        {0.0,
+         -0.5 * aspect * cameraData.projectionScale[1] * inv_z,
+         0.5 * aspect * cameraData.projectionScale[1] * v * inv_z}
+    };
+
+    for (int e = 0; e < ERRORS_PER_MARKER; ++e) {
+        // Translate; the Bundle moves in camera-space the same as
+        // the camera moves in the opposite direction.
+        for (int j = 0; j < 3; ++j) {
+            double value = (grad[e][0] * cameraData.rotateMatrix[0][j])
+                           + (grad[e][1] * cameraData.rotateMatrix[1][j])
+                           + (grad[e][2] * cameraData.rotateMatrix[2][j]);
+            value *= scale[e];
+            out.bundle[e][j] = value;
+            out.camera[e][SCENE_ATTR_TYPE_TRANSLATE_X + j] = -value;
+        }
+
+        // Rotate.
+        for (int axis = 0; axis < 3; ++axis) {
+            double value = 0.0;
+            for (int i = 0; i < 3; ++i) {
+                const double *row = cameraData.rotateDerivativeMatrix[axis][i];
+                value += grad[e][i] * ((row[0] * dir[0])
+                                       + (row[1] * dir[1])
+                                       + (row[2] * dir[2]));
+            }
+            out.camera[e][SCENE_ATTR_TYPE_ROTATE_X + axis] = value * scale[e];
+        }
+    }
+
+    // Focal length and film offset.
+    out.camera[0][SCENE_ATTR_TYPE_FOCAL_LENGTH] =
+        -0.5 * u * cameraData.projectionScaleFocalDerivative[0] * scale[0];
+    out.camera[1][SCENE_ATTR_TYPE_FOCAL_LENGTH] =
+        -0.5 * aspect * v * cameraData.projectionScaleFocalDerivative[1] * scale[1];
+    out.camera[0][SCENE_ATTR_TYPE_FILM_OFFSET_X] =
+        -0.5 * cameraData.projectionOffsetFilmOffsetDerivative[0] * scale[0];
+    out.camera[1][SCENE_ATTR_TYPE_FILM_OFFSET_Y] =
+        -0.5 * aspect * cameraData.projectionOffsetFilmOffsetDerivative[1] * scale[1];
+    return;
+}
+
+
+void measureReprojectionDerivatives(const std::vector<int> &measureList,
+                                    const std::vector<MarkerErrorData> &markerErrorDataList,
+                                    const std::vector<CameraFrameDerivativeData> &cameraFrameDataList,
+                                    const std::vector<BundleFrameData> &bundleFrameDataList,
+                                    ThreadPool *threadPool,
+                                    ReprojectionDerivatives *derivatives) {
+    std::function<void(int, int)> func = [&](int begin, int end) {
+        for (int i = begin; i < end; ++i) {
+            const int errorPairIndex = measureList[i];
+            const MarkerErrorData &markerData = markerErrorDataList[errorPairIndex];
+            measureReprojectionDerivative(
+                markerData,
+                cameraFrameDataList[markerData.cameraFrameIndex],
+                bundleFrameDataList[markerData.bundleFrameIndex],
+                derivatives[errorPairIndex]);
+        }
+    };
+
+    const int count = static_cast<int>(measureList.size());
+    if (threadPool == NULL) {
+        func(0, count);
+    } else {
+        threadPool->parallelFor(count, func);
+    }
+    return;
+}
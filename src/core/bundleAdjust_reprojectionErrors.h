@@ -0,0 +1,221 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Re-projection errors of (marker, frame) pairs, computed from
+ * pre-evaluated camera and bundle data.
+ *
+ * Measuring errors is done in two phases:
+ *
+ * 1) The camera data for each (camera, frame) pair, and the bundle
+ *    position for each (bundle, frame) pair are evaluated once, by
+ *    the caller (for example, with the Maya DG).
+ *
+ * 2) The error of each (marker, frame) pair is computed from the data
+ *    of phase 1, in parallel. This is pure math and does not depend
+ *    on Maya.
+ *
+ * The derivatives of the errors with respect to the standard camera
+ * and bundle attributes are computed the same way, for an analytic
+ * Jacobian.
+ *
+ * The camera and bundle data evaluated in phase 1 is cached between
+ * evaluations (see 'FrameDataCache'), and only the frames affected
+ * by a changed parameter are evaluated again.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_REPROJECTION_ERRORS_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_REPROJECTION_ERRORS_H
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_threadPool.h>
+#include <core/bundleAdjust_parameterGroups.h>
+
+
+// The camera data of a (camera, frame) pair.
+struct CameraFrameData {
+    Matrix44 worldProjectionMatrix;
+    double position[3];
+    double forwardDirection[3];
+    double filmBackInvAspect;
+    double imageWidth;
+};
+
+
+// The world position of a (bundle, frame) pair.
+struct BundleFrameData {
+    double position[3];
+};
+
+
+// A (marker, frame) pair; the indices of the camera and bundle data
+// used to measure the error, and the (pre-computed) marker position
+// and weight.
+struct MarkerErrorData {
+    int cameraFrameIndex;
+    int bundleFrameIndex;
+    double x;
+    double y;
+    double weight;
+};
+
+
+// The camera data of a (camera, frame) pair, used to compute the
+// derivatives of the re-projection errors.
+//
+// The camera-space position of a point 'p' is
+// 'rotateMatrix * (p - translate)', and the projected position is
+// '-0.5 * (projectionScale * (camera xy / camera z) + projectionOffset)',
+// with Y multiplied by 'filmBackInvAspect'.
+struct CameraFrameDerivativeData {
+    double translate[3];
+    double rotateMatrix[3][3];
+
+    // The derivative of 'rotateMatrix' with respect to each rotate
+    // axis, per degree.
+    double rotateDerivativeMatrix[3][3][3];
+
+    // The projection matrix values '[0][0]' and '[1][1]'
+    // (projectionScale), and '[2][0]' and '[2][1]' (projectionOffset).
+    double projectionScale[2];
+    double projectionOffset[2];
+
+    // Derivatives of the projection matrix values with respect to the
+    // focal length and film offsets.
+    double projectionScaleFocalDerivative[2];
+    double projectionOffsetFilmOffsetDerivative[2];
+
+    double forwardDirection[3];
+    double filmBackInvAspect;
+    double imageWidth;
+};
+
+
+// The derivatives of the (weighted) errors of a (marker, frame) pair,
+// with respect to the camera attributes (indexed by
+// SCENE_ATTR_TYPE_*), and the bundle translate attributes.
+struct ReprojectionDerivatives {
+    double camera[ERRORS_PER_MARKER][SCENE_ATTR_TYPE_COUNT];
+    double bundle[ERRORS_PER_MARKER][3];
+};
+
+
+// The camera and bundle frames with data that is up-to-date with the
+// current parameter values.
+//
+// When a parameter changes, only the camera and bundle frames used
+// by the errors affected by the parameter are invalidated, so the
+// data of all other frames is re-used, rather than evaluated again.
+struct FrameDataCache {
+    // The camera and bundle frames used by the errors affected by
+    // each parameter.
+    IndexList2D paramToCameraFrameList;
+    IndexList2D paramToBundleFrameList;
+
+    std::vector<bool> cameraFrameValidList;
+    std::vector<bool> bundleFrameValidList;
+
+    // The number of frames evaluated, and re-used from the cache.
+    int cameraFrameEvaluations;
+    int cameraFrameCacheHits;
+    int bundleFrameEvaluations;
+    int bundleFrameCacheHits;
+};
+
+
+// Initialise the cache with no valid frames, from the (marker,
+// frame) pairs affected by each parameter; 'markerErrorToParamList'
+// has a row for each (marker, frame) pair.
+//
+// 'paramCameraList' and 'paramBundleList' are true if a parameter
+// may change the camera or bundle data of the pairs it affects. When
+// it is not known (for example, a bundle parented under a camera),
+// both must be true.
+void initFrameDataCache(const int numberOfParameters,
+                        const int numberOfCameraFrames,
+                        const int numberOfBundleFrames,
+                        const BoolList2D &markerErrorToParamList,
+                        const std::vector<bool> &paramCameraList,
+                        const std::vector<bool> &paramBundleList,
+                        const std::vector<MarkerErrorData> &markerErrorDataList,
+                        FrameDataCache &cache);
+
+
+// Invalidate all the camera and bundle frames, and reset the counts.
+void resetFrameDataCache(FrameDataCache &cache);
+
+
+// Invalidate the camera and bundle frames affected by the parameters
+// that are different from 'previousParameters'.
+//
+// Returns the number of changed parameters.
+int invalidateFrameDataCache(const int numberOfParameters,
+                             const double *parameters,
+                             const double *previousParameters,
+                             FrameDataCache &cache);
+
+
+// Measure the errors of the (marker, frame) pairs given in
+// 'measureList'.
+//
+// For each pair index 'i' in 'measureList', ERRORS_PER_MARKER values
+// are written to 'errors' (weighted) and 'deviations' (not
+// weighted), starting at 'i * ERRORS_PER_MARKER', and the distance
+// (in pixels) is written to 'errorDistances[i]'. 'deviations' may be
+// NULL.
+//
+// If 'threadPool' is NULL the errors are measured in the calling
+// thread.
+void measureReprojectionErrors(const std::vector<int> &measureList,
+                               const std::vector<MarkerErrorData> &markerErrorDataList,
+                               const std::vector<CameraFrameData> &cameraFrameDataList,
+                               const std::vector<BundleFrameData> &bundleFrameDataList,
+                               ThreadPool *threadPool,
+                               double *errors,
+                               double *deviations,
+                               double *errorDistances);
+
+
+// Compute the derivative data of the (camera, frame) pair of a
+// SceneCamera.
+void computeCameraFrameDerivativeData(const SceneCamera &camera,
+                                      const int frameIndex,
+                                      CameraFrameDerivativeData &out);
+
+
+// Compute the analytic derivatives of the errors of the (marker,
+// frame) pairs given in 'measureList'; the derivatives of the
+// errors written by 'measureReprojectionErrors'.
+//
+// For each pair index 'i' in 'measureList', 'derivatives[i]' is
+// set. The camera data is indexed by 'cameraFrameIndex', the same as
+// 'measureReprojectionErrors'.
+void measureReprojectionDerivatives(const std::vector<int> &measureList,
+                                    const std::vector<MarkerErrorData> &markerErrorDataList,
+                                    const std::vector<CameraFrameDerivativeData> &cameraFrameDataList,
+                                    const std::vector<BundleFrameData> &bundleFrameDataList,
+                                    ThreadPool *threadPool,
+                                    ReprojectionDerivatives *derivatives);
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_REPROJECTION_ERRORS_H
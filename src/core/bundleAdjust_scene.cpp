@@ -0,0 +1,493 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Array-based Cameras, Bundles and Markers, evaluated without Maya.
+ *
+ * The camera projection matches 'getProjectionMatrix' in Camera.cpp.
+ */
+
+// STL
+#include <cmath>
+#include <cassert>
+
+// Utils
+#include <utilities/debugUtils.h>
+#include <utilities/numberUtils.h>
+
+// Local
+#include <core/bundleAdjust_scene.h>
+
+
+void setMatrixIdentity(Matrix44 &out) {
+    for (int i = 0; i < 4; ++i) {
+        for (int j = 0; j < 4; ++j) {
+            out.m[i][j] = (i == j) ? 1.0 : 0.0;
+        }
+    }
+    return;
+}
+
+
+void multiplyMatrix(const Matrix44 &a, const Matrix44 &b, Matrix44 &out) {
+    Matrix44 tmp;
+    for (int i = 0; i < 4; ++i) {
+        for (int j = 0; j < 4; ++j) {
+            tmp.m[i][j] = (a.m[i][0] * b.m[0][j])
+                          + (a.m[i][1] * b.m[1][j])
+                          + (a.m[i][2] * b.m[2][j])
+                          + (a.m[i][3] * b.m[3][j]);
+        }
+    }
+    out = tmp;
+    return;
+}
+
+
+// Create a transform matrix from translate and rotate (in degrees)
+// values, using the XYZ rotate order.
+void composeTransformMatrix(const double translate[3],
+                            const double rotate[3],
+                            Matrix44 &out) {
+    const double rx = rotate[0] * DEGREES_TO_RADIANS;
+    const double ry = rotate[1] * DEGREES_TO_RADIANS;
+    const double rz = rotate[2] * DEGREES_TO_RADIANS;
+    const double cx = std::cos(rx);
+    const double sx = std::sin(rx);
+    const double cy = std::cos(ry);
+    const double sy = std::sin(ry);
+    const double cz = std::cos(rz);
+    const double sz = std::sin(rz);
+
+    // Rotate X, then Y, then Z; 'Rx * Ry * Rz' with row-vectors.
+    out.m[0][0] = cy * cz;
+    out.m[0][1] = cy * sz;
+    out.m[0][2] = -sy;
+    out.m[0][3] = 0.0;
+
+    out.m[1][0] = (sx * sy * cz) - (cx * sz);
+    out.m[1][1] = (sx * sy * sz) + (cx * cz);
+    out.m[1][2] = sx * cy;
+    out.m[1][3] = 0.0;
+
+    out.m[2][0] = (cx * sy * cz) + (sx * sz);
+    out.m[2][1] = (cx * sy * sz) - (sx * cz);
+    out.m[2][2] = cx * cy;
+    out.m[2][3] = 0.0;
+
+    out.m[3][0] = translate[0];
+    out.m[3][1] = translate[1];
+    out.m[3][2] = translate[2];
+    out.m[3][3] = 1.0;
+    return;
+}
+
+
+// The derivative of 'composeTransformMatrix' with respect to one
+// rotate axis (0, 1 or 2), per degree. Only the rotation part is
+// set, the translation part is zero.
+void composeRotateMatrixDerivative(const double rotate[3],
+                                   const int axis,
+                                   Matrix44 &out) {
+    assert((axis >= 0) && (axis < 3));
+    const double rx = rotate[0] * DEGREES_TO_RADIANS;
+    const double ry = rotate[1] * DEGREES_TO_RADIANS;
+    const double rz = rotate[2] * DEGREES_TO_RADIANS;
+    const double cx = std::cos(rx);
+    const double sx = std::sin(rx);
+    const double cy = std::cos(ry);
+    const double sy = std::sin(ry);
+    const double cz = std::cos(rz);
+    const double sz = std::sin(rz);
+
+    for (int i = 0; i < 4; ++i) {
+        for (int j = 0; j < 4; ++j) {
+            out.m[i][j] = 0.0;
+        }
+    }
+    if (axis == 0) {
+        out.m[1][0] = (cx * sy * cz) + (sx * sz);
+        out.m[1][1] = (cx * sy * sz) - (sx * cz);
+        out.m[1][2] = cx * cy;
+        out.m[2][0] = -(sx * sy * cz) + (cx * sz);
+        out.m[2][1] = -(sx * sy * sz) - (cx * cz);
+        out.m[2][2] = -sx * cy;
+    } else if (axis == 1) {
+        out.m[0][0] = -sy * cz;
+        out.m[0][1] = -sy * sz;
+        out.m[0][2] = -cy;
+        out.m[1][0] = sx * cy * cz;
+        out.m[1][1] = sx * cy * sz;
+        out.m[1][2] = -sx * sy;
+        out.m[2][0] = cx * cy * cz;
+        out.m[2][1] = cx * cy * sz;
+        out.m[2][2] = -cx * sy;
+    } else {
+        out.m[0][0] = -cy * sz;
+        out.m[0][1] = cy * cz;
+        out.m[1][0] = -(sx * sy * sz) - (cx * cz);
+        out.m[1][1] = (sx * sy * cz) - (cx * sz);
+        out.m[2][0] = -(cx * sy * sz) + (sx * cz);
+        out.m[2][1] = (cx * sy * cz) + (sx * sz);
+    }
+    for (int i = 0; i < 3; ++i) {
+        for (int j = 0; j < 3; ++j) {
+            out.m[i][j] *= DEGREES_TO_RADIANS;
+        }
+    }
+    return;
+}
+
+
+// Inverse of a transform matrix with only rotation and translation.
+void inverseTransformMatrix(const Matrix44 &in, Matrix44 &out) {
+    Matrix44 tmp;
+    for (int i = 0; i < 3; ++i) {
+        for (int j = 0; j < 3; ++j) {
+            tmp.m[i][j] = in.m[j][i];
+        }
+        tmp.m[i][3] = 0.0;
+    }
+    for (int j = 0; j < 3; ++j) {
+        tmp.m[3][j] = -((in.m[3][0] * in.m[j][0])
+                        + (in.m[3][1] * in.m[j][1])
+                        + (in.m[3][2] * in.m[j][2]));
+    }
+    tmp.m[3][3] = 1.0;
+    out = tmp;
+    return;
+}
+
+
+// Transform a point, returning the homogeneous coordinate.
+void transformPoint(const Matrix44 &matrix,
+                    const double point[3],
+                    double out[4]) {
+    for (int j = 0; j < 4; ++j) {
+        out[j] = (point[0] * matrix.m[0][j])
+                 + (point[1] * matrix.m[1][j])
+                 + (point[2] * matrix.m[2][j])
+                 + matrix.m[3][j];
+    }
+    return;
+}
+
+
+// The scale of the screen window in X and Y, used to fit the film
+// back into the image.
+void computeFilmFitScale(const double filmBackWidth,   // inches
+                         const double filmBackHeight,  // inches
+                         const double imageWidth,      // pixels
+                         const double imageHeight,     // pixels
+                         const short filmFit,
+                         double &outScaleX,
+                         double &outScaleY) {
+    const double filmAspectRatio = filmBackWidth / filmBackHeight;
+    const double imageAspectRatio = imageWidth / imageHeight;
+    outScaleX = 1.0;
+    outScaleY = 1.0;
+    switch (filmFit) {
+        default:
+        case SCENE_FILM_FIT_HORIZONTAL:
+            outScaleY = imageAspectRatio / filmAspectRatio;
+            break;
+        case SCENE_FILM_FIT_VERTICAL:
+            outScaleX = 1.0 / (imageAspectRatio / filmAspectRatio);
+            break;
+        case SCENE_FILM_FIT_FILL:
+            if (filmAspectRatio > imageAspectRatio) {
+                outScaleX = filmAspectRatio / imageAspectRatio;
+            } else {
+                outScaleY = imageAspectRatio / filmAspectRatio;
+            }
+            break;
+        case SCENE_FILM_FIT_OVERSCAN:
+            if (filmAspectRatio > imageAspectRatio) {
+                outScaleY = imageAspectRatio / filmAspectRatio;
+            } else {
+                outScaleX = filmAspectRatio / imageAspectRatio;
+            }
+            break;
+    }
+    return;
+}
+
+
+void computeProjectionMatrix(const double focalLength,     // millimetres
+                             const double filmBackWidth,   // inches
+                             const double filmBackHeight,  // inches
+                             const double filmOffsetX,     // inches
+                             const double filmOffsetY,     // inches
+                             const double imageWidth,      // pixels
+                             const double imageHeight,     // pixels
+                             const short filmFit,
+                             const double nearClipPlane,   // centimetres
+                             const double farClipPlane,    // centimetres
+                             const double cameraScale,
+                             Matrix44 &out) {
+    const double filmAspectRatio = filmBackWidth / filmBackHeight;
+    const double imageAspectRatio = imageWidth / imageHeight;
+
+    // Frustum coordinates, in millimetres.
+    const double filmWidth = filmBackWidth * INCH_TO_MM;
+    const double filmHeight = filmBackHeight * INCH_TO_MM;
+    const double offsetX = filmOffsetX * INCH_TO_MM;
+    const double offsetY = filmOffsetY * INCH_TO_MM;
+    const double focal_to_near = (nearClipPlane / focalLength) * cameraScale;
+    const double right = focal_to_near * (0.5 * filmWidth + offsetX);
+    const double left = focal_to_near * (-0.5 * filmWidth + offsetX);
+    const double top = focal_to_near * (0.5 * filmHeight + offsetY);
+    const double bottom = focal_to_near * (-0.5 * filmHeight + offsetY);
+
+    // Apply 'Film Fit'.
+    double filmFitScaleX = 1.0;
+    double filmFitScaleY = 1.0;
+    computeFilmFitScale(filmBackWidth, filmBackHeight,
+                        imageWidth, imageHeight,
+                        filmFit,
+                        filmFitScaleX, filmFitScaleY);
+    double screenSizeX = 0.0;
+    double screenSizeY = 0.0;
+    switch (filmFit) {
+        default:
+        case SCENE_FILM_FIT_HORIZONTAL:
+            screenSizeX = right - left;
+            screenSizeY = screenSizeX / imageAspectRatio;
+            break;
+        case SCENE_FILM_FIT_VERTICAL:
+            screenSizeY = top - bottom;
+            screenSizeX = screenSizeY * imageAspectRatio;
+            break;
+        case SCENE_FILM_FIT_FILL:
+            if (filmAspectRatio > imageAspectRatio) {
+                screenSizeY = top - bottom;
+                screenSizeX = screenSizeY * imageAspectRatio;
+            } else {
+                screenSizeX = right - left;
+                screenSizeY = (screenSizeX * (filmAspectRatio / imageAspectRatio)) / filmAspectRatio;
+            }
+            break;
+        case SCENE_FILM_FIT_OVERSCAN:
+            if (filmAspectRatio > imageAspectRatio) {
+                screenSizeX = right - left;
+                screenSizeY = (right - left) / imageAspectRatio;
+            } else {
+                screenSizeX = (right - left) * (imageAspectRatio / filmAspectRatio);
+                screenSizeY = top - bottom;
+            }
+            break;
+    }
+    const double screenRight = right * filmFitScaleX;
+    const double screenLeft = left * filmFitScaleX;
+    const double screenTop = top * filmFitScaleY;
+    const double screenBottom = bottom * filmFitScaleY;
+
+    out.m[0][0] = 1.0 / (screenSizeX * 0.5) * MM_TO_CM;
+    out.m[0][1] = 0;
+    out.m[0][2] = 0;
+    out.m[0][3] = 0;
+
+    out.m[1][0] = 0;
+    out.m[1][1] = 1.0 / (screenSizeY * 0.5) * MM_TO_CM;
+    out.m[1][2] = 0;
+    out.m[1][3] = 0;
+
+    out.m[2][0] = (screenRight + screenLeft) / (screenRight - screenLeft) * filmFitScaleX;
+    out.m[2][1] = (screenTop + screenBottom) / (screenTop - screenBottom) * filmFitScaleY;
+    out.m[2][2] = (farClipPlane + nearClipPlane) / (farClipPlane - nearClipPlane);
+    out.m[2][3] = -1;
+
+    out.m[3][0] = 0;
+    out.m[3][1] = 0;
+    out.m[3][2] = 2.0 * farClipPlane * nearClipPlane / (farClipPlane - nearClipPlane);
+    out.m[3][3] = 0;
+    return;
+}
+
+
+void computeCameraWorldMatrix(const SceneCamera &camera,
+                              const int frameIndex,
+                              Matrix44 &out) {
+    assert(frameIndex >= 0);
+    assert(frameIndex < static_cast<int>(camera.frames.size()));
+    const CameraFrame &frame = camera.frames[frameIndex];
+    composeTransformMatrix(frame.translate, frame.rotate, out);
+    return;
+}
+
+
+// The matrix to transform a world-space point into the camera's
+// projected (clip) space, at a frame.
+void computeCameraWorldProjectionMatrix(const SceneCamera &camera,
+                                        const int frameIndex,
+                                        Matrix44 &out) {
+    const CameraFrame &frame = camera.frames[frameIndex];
+
+    Matrix44 worldMatrix;
+    Matrix44 worldInverseMatrix;
+    computeCameraWorldMatrix(camera, frameIndex, worldMatrix);
+    inverseTransformMatrix(worldMatrix, worldInverseMatrix);
+
+    Matrix44 projectionMatrix;
+    computeProjectionMatrix(
+        frame.focalLength,
+        frame.filmBackWidth, frame.filmBackHeight,
+        frame.filmOffsetX, frame.filmOffsetY,
+        camera.imageWidth, camera.imageHeight,
+        camera.filmFit,
+        camera.nearClipPlane, camera.farClipPlane,
+        camera.cameraScale,
+        projectionMatrix);
+
+    multiplyMatrix(worldInverseMatrix, projectionMatrix, out);
+    return;
+}
+
+
+// The camera looks down the negative Z axis.
+void computeCameraForwardDirection(const Matrix44 &cameraWorldMatrix,
+                                   double out[3]) {
+    double length = 0.0;
+    for (int j = 0; j < 3; ++j) {
+        out[j] = -cameraWorldMatrix.m[2][j];
+        length += out[j] * out[j];
+    }
+    length = std::sqrt(length);
+    if (length > 0.0) {
+        for (int j = 0; j < 3; ++j) {
+            out[j] /= length;
+        }
+    }
+    return;
+}
+
+
+// Project a world-space point into the -0.5 to 0.5 range, maintaining
+// the aspect ratio of the film back; the same space Markers are
+// stored in.
+void projectPoint(const Matrix44 &worldProjectionMatrix,
+                  const double filmBackInvAspect,
+                  const double point[3],
+                  double &outX,
+                  double &outY) {
+    double pos[4];
+    transformPoint(worldProjectionMatrix, point, pos);
+    outX = (pos[0] / pos[3]) * 0.5;
+    outY = (pos[1] / pos[3]) * 0.5 * filmBackInvAspect;
+    return;
+}
+
+
+bool isValidSceneAttr(const Scene &scene, const SceneAttr &attr) {
+    if (attr.objectType == SCENE_OBJECT_TYPE_CAMERA) {
+        return (attr.objectIndex >= 0)
+               && (attr.objectIndex < static_cast<int>(scene.cameras.size()))
+               && (attr.attrType >= SCENE_ATTR_TYPE_TRANSLATE_X)
+               && (attr.attrType <= SCENE_ATTR_TYPE_FILM_OFFSET_Y);
+    } else if (attr.objectType == SCENE_OBJECT_TYPE_BUNDLE) {
+        return (attr.objectIndex >= 0)
+               && (attr.objectIndex < static_cast<int>(scene.bundles.size()))
+               && (attr.attrType >= SCENE_ATTR_TYPE_TRANSLATE_X)
+               && (attr.attrType <= SCENE_ATTR_TYPE_TRANSLATE_Z);
+    }
+    return false;
+}
+
+
+static double *getCameraFrameValuePtr(CameraFrame &frame, const int attrType) {
+    double *ptr = NULL;
+    switch (attrType) {
+        case SCENE_ATTR_TYPE_TRANSLATE_X:
+        case SCENE_ATTR_TYPE_TRANSLATE_Y:
+        case SCENE_ATTR_TYPE_TRANSLATE_Z:
+            ptr = &frame.translate[attrType - SCENE_ATTR_TYPE_TRANSLATE_X];
+            break;
+        case SCENE_ATTR_TYPE_ROTATE_X:
+        case SCENE_ATTR_TYPE_ROTATE_Y:
+        case SCENE_ATTR_TYPE_ROTATE_Z:
+            ptr = &frame.rotate[attrType - SCENE_ATTR_TYPE_ROTATE_X];
+            break;
+        case SCENE_ATTR_TYPE_FOCAL_LENGTH:
+            ptr = &frame.focalLength;
+            break;
+        case SCENE_ATTR_TYPE_FILM_OFFSET_X:
+            ptr = &frame.filmOffsetX;
+            break;
+        case SCENE_ATTR_TYPE_FILM_OFFSET_Y:
+            ptr = &frame.filmOffsetY;
+            break;
+        default:
+            ERR("Invalid camera attribute type; value=" << attrType);
+            break;
+    }
+    return ptr;
+}
+
+
+// Get the value of an attribute at a frame index. Static attributes
+// (with the same value on all frames) may use a frame index of -1.
+double getSceneAttrValue(const Scene &scene,
+                         const SceneAttr &attr,
+                         const int frameIndex) {
+    assert(isValidSceneAttr(scene, attr));
+    const int index = (frameIndex < 0) ? 0 : frameIndex;
+    double value = 0.0;
+    if (attr.objectType == SCENE_OBJECT_TYPE_CAMERA) {
+        CameraFrame frame = scene.cameras[attr.objectIndex].frames[index];
+        double *ptr = getCameraFrameValuePtr(frame, attr.attrType);
+        if (ptr != NULL) {
+            value = *ptr;
+        }
+    } else if (attr.objectType == SCENE_OBJECT_TYPE_BUNDLE) {
+        const BundleFrame &frame = scene.bundles[attr.objectIndex].frames[index];
+        value = frame.translate[attr.attrType - SCENE_ATTR_TYPE_TRANSLATE_X];
+    }
+    return value;
+}
+
+
+// Set the value of an attribute at a frame index, or on all frames
+// when the frame index is -1.
+void setSceneAttrValue(Scene &scene,
+                       const SceneAttr &attr,
+                       const int frameIndex,
+                       const double value) {
+    assert(isValidSceneAttr(scene, attr));
+    int startIndex = frameIndex;
+    int endIndex = frameIndex + 1;
+    if (frameIndex < 0) {
+        startIndex = 0;
+        endIndex = scene.numberOfFrames;
+    }
+    if (attr.objectType == SCENE_OBJECT_TYPE_CAMERA) {
+        SceneCamera &camera = scene.cameras[attr.objectIndex];
+        for (int i = startIndex; i < endIndex; ++i) {
+            double *ptr = getCameraFrameValuePtr(camera.frames[i], attr.attrType);
+            if (ptr != NULL) {
+                *ptr = value;
+            }
+        }
+    } else if (attr.objectType == SCENE_OBJECT_TYPE_BUNDLE) {
+        SceneBundle &bundle = scene.bundles[attr.objectIndex];
+        const int axis = attr.attrType - SCENE_ATTR_TYPE_TRANSLATE_X;
+        for (int i = startIndex; i < endIndex; ++i) {
+            bundle.frames[i].translate[axis] = value;
+        }
+    }
+    return;
+}
@@ -0,0 +1,223 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Array-based Cameras, Bundles and Markers, evaluated without Maya.
+ *
+ * Values are stored per-frame (by frame index), using the same units
+ * as Maya; translate in centimetres, rotate in degrees (with the XYZ
+ * rotate order), focal length in millimetres and film back and film
+ * offset in inches.
+ *
+ * Matrices use the Maya convention of row-vectors, a point is
+ * transformed by a matrix with 'point * matrix'.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SCENE_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SCENE_H
+
+// STL
+#include <vector>
+
+
+// Object types a SceneAttr may belong to.
+#define SCENE_OBJECT_TYPE_CAMERA (0)
+#define SCENE_OBJECT_TYPE_BUNDLE (1)
+
+// Attributes of the scene objects that may be solved.
+//
+// Bundles only support the translate attributes.
+#define SCENE_ATTR_TYPE_TRANSLATE_X (0)
+#define SCENE_ATTR_TYPE_TRANSLATE_Y (1)
+#define SCENE_ATTR_TYPE_TRANSLATE_Z (2)
+#define SCENE_ATTR_TYPE_ROTATE_X (3)
+#define SCENE_ATTR_TYPE_ROTATE_Y (4)
+#define SCENE_ATTR_TYPE_ROTATE_Z (5)
+#define SCENE_ATTR_TYPE_FOCAL_LENGTH (6)
+#define SCENE_ATTR_TYPE_FILM_OFFSET_X (7)
+#define SCENE_ATTR_TYPE_FILM_OFFSET_Y (8)
+#define SCENE_ATTR_TYPE_COUNT (9)
+
+// Film Fit values, the same as the Maya camera 'filmFit' attribute.
+#define SCENE_FILM_FIT_FILL (0)
+#define SCENE_FILM_FIT_HORIZONTAL (1)
+#define SCENE_FILM_FIT_VERTICAL (2)
+#define SCENE_FILM_FIT_OVERSCAN (3)
+
+
+struct Matrix44 {
+    double m[4][4];
+};
+
+
+struct CameraFrame {
+    double translate[3];    // centimetres
+    double rotate[3];       // degrees
+    double focalLength;     // millimetres
+    double filmBackWidth;   // inches
+    double filmBackHeight;  // inches
+    double filmOffsetX;     // inches
+    double filmOffsetY;     // inches
+};
+
+
+struct SceneCamera {
+    std::vector<CameraFrame> frames;
+    double imageWidth;      // pixels
+    double imageHeight;     // pixels
+    short filmFit;
+    double nearClipPlane;   // centimetres
+    double farClipPlane;    // centimetres
+    double cameraScale;
+};
+
+
+struct BundleFrame {
+    double translate[3];    // centimetres
+};
+
+
+struct SceneBundle {
+    std::vector<BundleFrame> frames;
+};
+
+
+// A Marker position is stored in the -0.5 to 0.5 range, with the Y
+// axis scaled to maintain the aspect ratio of the film back, the
+// same as the Maya solver measures Markers.
+struct MarkerFrame {
+    double x;
+    double y;
+    double weight;
+    bool enable;
+};
+
+
+struct SceneMarker {
+    int cameraIndex;
+    int bundleIndex;
+    std::vector<MarkerFrame> frames;
+};
+
+
+struct SceneAttr {
+    int objectType;
+    int objectIndex;
+    int attrType;
+
+    // Does the attribute have a different value on each frame?
+    bool animated;
+
+    // Bounds and scaling of the attribute, the same as the Maya
+    // solver Attribute 'min', 'max', 'offset' and 'scale' values.
+    double minValue;
+    double maxValue;
+    double offset;
+    double scale;
+
+    // Stiffness and Smoothness weights; a weight of 0.0 disables the
+    // error term.
+    double stiffnessWeight;
+    double stiffnessVariance;
+    double stiffnessValue;
+    double smoothnessWeight;
+    double smoothnessVariance;
+    double smoothnessValue;
+};
+
+
+struct Scene {
+    int numberOfFrames;
+    std::vector<SceneCamera> cameras;
+    std::vector<SceneBundle> bundles;
+    std::vector<SceneMarker> markers;
+};
+
+
+typedef std::vector<SceneAttr> SceneAttrList;
+
+
+void setMatrixIdentity(Matrix44 &out);
+
+void multiplyMatrix(const Matrix44 &a, const Matrix44 &b, Matrix44 &out);
+
+void composeTransformMatrix(const double translate[3],
+                            const double rotate[3],
+                            Matrix44 &out);
+
+void composeRotateMatrixDerivative(const double rotate[3],
+                                   const int axis,
+                                   Matrix44 &out);
+
+void inverseTransformMatrix(const Matrix44 &in, Matrix44 &out);
+
+void transformPoint(const Matrix44 &matrix,
+                    const double point[3],
+                    double out[4]);
+
+void computeFilmFitScale(const double filmBackWidth,
+                         const double filmBackHeight,
+                         const double imageWidth,
+                         const double imageHeight,
+                         const short filmFit,
+                         double &outScaleX,
+                         double &outScaleY);
+
+void computeProjectionMatrix(const double focalLength,
+                             const double filmBackWidth,
+                             const double filmBackHeight,
+                             const double filmOffsetX,
+                             const double filmOffsetY,
+                             const double imageWidth,
+                             const double imageHeight,
+                             const short filmFit,
+                             const double nearClipPlane,
+                             const double farClipPlane,
+                             const double cameraScale,
+                             Matrix44 &out);
+
+void computeCameraWorldMatrix(const SceneCamera &camera,
+                              const int frameIndex,
+                              Matrix44 &out);
+
+void computeCameraWorldProjectionMatrix(const SceneCamera &camera,
+                                        const int frameIndex,
+                                        Matrix44 &out);
+
+void computeCameraForwardDirection(const Matrix44 &cameraWorldMatrix,
+                                   double out[3]);
+
+void projectPoint(const Matrix44 &worldProjectionMatrix,
+                  const double filmBackInvAspect,
+                  const double point[3],
+                  double &outX,
+                  double &outY);
+
+bool isValidSceneAttr(const Scene &scene, const SceneAttr &attr);
+
+double getSceneAttrValue(const Scene &scene,
+                         const SceneAttr &attr,
+                         const int frameIndex);
+
+void setSceneAttrValue(Scene &scene,
+                       const SceneAttr &attr,
+                       const int frameIndex,
+                       const double value);
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SCENE_H
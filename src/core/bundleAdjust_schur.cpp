@@ -0,0 +1,867 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A sparse Levenberg-Marquardt solver, using the Schur complement to
+ * eliminate the point (bundle) parameters.
+ */
+
+// STL
+#include <algorithm>
+#include <cassert>
+#include <cmath>
+#include <functional>
+#include <limits>
+#include <vector>
+
+// Utils
+#include <utilities/debugUtils.h>
+
+// Local
+#include <core/bundleAdjust_reasons.h>
+#include <core/bundleAdjust_schur.h>
+
+
+// Termination reasons, indices into 'levmarReasons'.
+#define SCHUR_REASON_SMALL_GRADIENT (1)
+#define SCHUR_REASON_SMALL_PARAMETER_CHANGE (2)
+#define SCHUR_REASON_MAXIMUM_ITERATIONS (3)
+#define SCHUR_REASON_SINGULAR_MATRIX (4)
+#define SCHUR_REASON_DAMPING_ATTEMPTS (5)
+#define SCHUR_REASON_SMALL_ERROR (6)
+#define SCHUR_REASON_USER_CANCELED (7)
+
+
+// The normal equations of a block of point parameters, stored
+// row-major. 'V' is the (k by k) block of the point parameters, 'W'
+// the (c by k) block between the reduced parameters and the point
+// parameters, and 'factor' the Cholesky factor of the damped V.
+struct SchurBlockData {
+    std::vector<double> V;
+    std::vector<double> W;
+    std::vector<double> factor;
+
+    // V^-1 multiplied by the (negative) gradient of the block.
+    std::vector<double> rhs;
+    bool factorized;
+};
+
+
+// Find the root of the set containing 'i', flattening the path.
+static int findSetRoot(std::vector<int> &parentList, int i) {
+    while (parentList[i] != i) {
+        parentList[i] = parentList[parentList[i]];
+        i = parentList[i];
+    }
+    return i;
+}
+
+
+// The position of a value in a sorted list, the value must exist.
+static int findSortedIndex(const std::vector<int> &list, const int value) {
+    std::vector<int>::const_iterator it = std::lower_bound(
+        list.begin(), list.end(), value);
+    assert((it != list.end()) && (*it == value));
+    return static_cast<int>(it - list.begin());
+}
+
+
+// Run 'func' over the blocks, in parallel if a thread pool is given.
+static void runBlocks(ThreadPool *threadPool,
+                      const int numberOfBlocks,
+                      const std::function<void(int, int)> &func) {
+    if (threadPool != NULL) {
+        threadPool->parallelFor(numberOfBlocks, func);
+    } else if (numberOfBlocks > 0) {
+        func(0, numberOfBlocks);
+    }
+    return;
+}
+
+
+// In-place Cholesky factorization of the symmetric (n by n,
+// row-major) matrix 'a'; the lower triangle is replaced by L, where
+// a = L * L^T. Returns false if the matrix is not positive-definite.
+static bool choleskyFactorize(const int n, double *a) {
+    for (int j = 0; j < n; ++j) {
+        double *rowJ = a + (j * n);
+        double d = rowJ[j];
+        for (int k = 0; k < j; ++k) {
+            d -= rowJ[k] * rowJ[k];
+        }
+        if (!(d > 0.0) || !std::isfinite(d)) {
+            return false;
+        }
+        d = std::sqrt(d);
+        rowJ[j] = d;
+        const double inv_d = 1.0 / d;
+        for (int i = j + 1; i < n; ++i) {
+            double *rowI = a + (i * n);
+            double s = rowI[j];
+            for (int k = 0; k < j; ++k) {
+                s -= rowI[k] * rowJ[k];
+            }
+            rowI[j] = s * inv_d;
+        }
+    }
+    return true;
+}
+
+
+// Solve (L * L^T) x = b in-place, using the factor from
+// 'choleskyFactorize'.
+static void choleskySolve(const int n, const double *l, double *b) {
+    for (int i = 0; i < n; ++i) {
+        const double *rowI = l + (i * n);
+        double s = b[i];
+        for (int k = 0; k < i; ++k) {
+            s -= rowI[k] * b[k];
+        }
+        b[i] = s / rowI[i];
+    }
+    for (int i = n - 1; i >= 0; --i) {
+        double s = b[i];
+        for (int k = i + 1; k < n; ++k) {
+            s -= l[(k * n) + i] * b[k];
+        }
+        b[i] = s / l[(i * n) + i];
+    }
+    return;
+}
+
+
+static double dotProduct(const std::vector<double> &a,
+                         const std::vector<double> &b) {
+    double value = 0.0;
+    for (size_t i = 0; i < a.size(); ++i) {
+        value += a[i] * b[i];
+    }
+    return value;
+}
+
+
+static double sumOfSquares(const int count, const double *values) {
+    double value = 0.0;
+    for (int i = 0; i < count; ++i) {
+        value += values[i] * values[i];
+    }
+    return value;
+}
+
+
+void findSchurStructure(const int numberOfErrors,
+                        const IndexList2D &paramToErrorIndexList,
+                        const std::vector<bool> &pointParamList,
+                        SchurStructure &structure) {
+    const int numberOfParameters = static_cast<int>(paramToErrorIndexList.size());
+    assert(pointParamList.size() == static_cast<size_t>(numberOfParameters));
+    structure.numberOfParameters = numberOfParameters;
+    structure.numberOfErrors = numberOfErrors;
+
+    // Compressed columns.
+    structure.columnStartList.resize(numberOfParameters + 1, 0);
+    structure.rowIndexList.clear();
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const std::vector<int> &errorIndexList = paramToErrorIndexList[i];
+        structure.columnStartList[i] = static_cast<int>(structure.rowIndexList.size());
+        structure.rowIndexList.insert(structure.rowIndexList.end(),
+                                      errorIndexList.begin(),
+                                      errorIndexList.end());
+    }
+    const int numberOfValues = static_cast<int>(structure.rowIndexList.size());
+    structure.columnStartList[numberOfParameters] = numberOfValues;
+
+    // Compressed rows, with the parameters of each row in order.
+    structure.rowStartList.assign(numberOfErrors + 1, 0);
+    for (int v = 0; v < numberOfValues; ++v) {
+        ++structure.rowStartList[structure.rowIndexList[v] + 1];
+    }
+    for (int j = 0; j < numberOfErrors; ++j) {
+        structure.rowStartList[j + 1] += structure.rowStartList[j];
+    }
+    structure.rowValueList.resize(numberOfValues, 0);
+    structure.rowParamList.resize(numberOfValues, 0);
+    std::vector<int> rowCursorList(structure.rowStartList.begin(),
+                                   structure.rowStartList.end() - 1);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        for (int v = structure.columnStartList[i];
+             v < structure.columnStartList[i + 1]; ++v) {
+            const int cursor = rowCursorList[structure.rowIndexList[v]]++;
+            structure.rowValueList[cursor] = v;
+            structure.rowParamList[cursor] = i;
+        }
+    }
+
+    // Point parameters affecting the same errors are joined into the
+    // same block.
+    std::vector<int> parentList(numberOfParameters, 0);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        parentList[i] = i;
+    }
+    for (int j = 0; j < numberOfErrors; ++j) {
+        int firstRoot = -1;
+        for (int k = structure.rowStartList[j]; k < structure.rowStartList[j + 1]; ++k) {
+            const int paramIndex = structure.rowParamList[k];
+            if (pointParamList[paramIndex] == false) {
+                continue;
+            }
+            const int root = findSetRoot(parentList, paramIndex);
+            if (firstRoot < 0) {
+                firstRoot = root;
+            } else if (root != firstRoot) {
+                parentList[root] = firstRoot;
+            }
+        }
+    }
+    std::vector<int> rootBlockList(numberOfParameters, -1);
+    IndexList2D candidateBlockList;
+    for (int i = 0; i < numberOfParameters; ++i) {
+        if (pointParamList[i] == false) {
+            continue;
+        }
+        const int root = findSetRoot(parentList, i);
+        if (rootBlockList[root] < 0) {
+            rootBlockList[root] = static_cast<int>(candidateBlockList.size());
+            candidateBlockList.push_back(std::vector<int>());
+        }
+        candidateBlockList[rootBlockList[root]].push_back(i);
+    }
+
+    structure.paramBlockList.assign(numberOfParameters, -1);
+    structure.blockParamList.clear();
+    for (size_t b = 0; b < candidateBlockList.size(); ++b) {
+        if (candidateBlockList[b].size() > SCHUR_BLOCK_PARAMETERS_MAX) {
+            continue;
+        }
+        const int blockIndex = static_cast<int>(structure.blockParamList.size());
+        structure.blockParamList.push_back(candidateBlockList[b]);
+        for (size_t k = 0; k < candidateBlockList[b].size(); ++k) {
+            structure.paramBlockList[candidateBlockList[b][k]] = blockIndex;
+        }
+    }
+    const int numberOfBlocks = static_cast<int>(structure.blockParamList.size());
+
+    structure.reducedParamList.clear();
+    structure.paramReducedIndexList.assign(numberOfParameters, -1);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        if (structure.paramBlockList[i] < 0) {
+            structure.paramReducedIndexList[i] = static_cast<int>(
+                structure.reducedParamList.size());
+            structure.reducedParamList.push_back(i);
+        }
+    }
+
+    // The errors of each block, and the reduced parameters coupled
+    // to the block by those errors.
+    structure.blockErrorList.clear();
+    structure.blockErrorList.resize(numberOfBlocks);
+    structure.blockReducedList.clear();
+    structure.blockReducedList.resize(numberOfBlocks);
+    for (int j = 0; j < numberOfErrors; ++j) {
+        int blockIndex = -1;
+        for (int k = structure.rowStartList[j]; k < structure.rowStartList[j + 1]; ++k) {
+            blockIndex = structure.paramBlockList[structure.rowParamList[k]];
+            if (blockIndex >= 0) {
+                break;
+            }
+        }
+        if (blockIndex < 0) {
+            continue;
+        }
+        structure.blockErrorList[blockIndex].push_back(j);
+        std::vector<int> &reducedList = structure.blockReducedList[blockIndex];
+        for (int k = structure.rowStartList[j]; k < structure.rowStartList[j + 1]; ++k) {
+            const int reducedIndex = structure.paramReducedIndexList[structure.rowParamList[k]];
+            if (reducedIndex >= 0) {
+                reducedList.push_back(reducedIndex);
+            }
+        }
+    }
+    for (int b = 0; b < numberOfBlocks; ++b) {
+        std::vector<int> &reducedList = structure.blockReducedList[b];
+        std::sort(reducedList.begin(), reducedList.end());
+        reducedList.erase(std::unique(reducedList.begin(), reducedList.end()),
+                          reducedList.end());
+    }
+
+    structure.denseReducedSystem =
+        structure.reducedParamList.size() <= SCHUR_DENSE_PARAMETERS_MAX;
+    return;
+}
+
+
+// Compute the (undamped) normal equations of each block, and of the
+// reduced system when it is solved densely.
+static void computeNormalEquations(const SchurStructure &structure,
+                                   const std::vector<double> &jacobian,
+                                   ThreadPool *threadPool,
+                                   std::vector<SchurBlockData> &blockDataList,
+                                   std::vector<double> &reducedMatrix) {
+    const int numberOfBlocks = static_cast<int>(structure.blockParamList.size());
+    std::function<void(int, int)> func = [&](int begin, int end) {
+        for (int b = begin; b < end; ++b) {
+            const std::vector<int> &paramList = structure.blockParamList[b];
+            const std::vector<int> &reducedList = structure.blockReducedList[b];
+            const int k = static_cast<int>(paramList.size());
+            SchurBlockData &blockData = blockDataList[b];
+            blockData.V.assign(k * k, 0.0);
+            blockData.W.assign(reducedList.size() * k, 0.0);
+
+            const std::vector<int> &errorList = structure.blockErrorList[b];
+            for (size_t e = 0; e < errorList.size(); ++e) {
+                const int j = errorList[e];
+                const int rowStart = structure.rowStartList[j];
+                const int rowEnd = structure.rowStartList[j + 1];
+                for (int p = rowStart; p < rowEnd; ++p) {
+                    const int paramA = structure.rowParamList[p];
+                    if (structure.paramBlockList[paramA] != b) {
+                        continue;
+                    }
+                    const int a = findSortedIndex(paramList, paramA);
+                    const double valueA = jacobian[structure.rowValueList[p]];
+                    for (int q = rowStart; q < rowEnd; ++q) {
+                        const int paramB = structure.rowParamList[q];
+                        const double value = valueA * jacobian[structure.rowValueList[q]];
+                        if (structure.paramBlockList[paramB] == b) {
+                            blockData.V[(a * k) + findSortedIndex(paramList, paramB)] += value;
+                        } else {
+                            const int c = findSortedIndex(
+                                reducedList, structure.paramReducedIndexList[paramB]);
+                            blockData.W[(c * k) + a] += value;
+                        }
+                    }
+                }
+            }
+        }
+    };
+    runBlocks(threadPool, numberOfBlocks, func);
+
+    if (!structure.denseReducedSystem) {
+        return;
+    }
+    const int numberOfReduced = static_cast<int>(structure.reducedParamList.size());
+    reducedMatrix.assign(numberOfReduced * numberOfReduced, 0.0);
+    for (int j = 0; j < structure.numberOfErrors; ++j) {
+        const int rowStart = structure.rowStartList[j];
+        const int rowEnd = structure.rowStartList[j + 1];
+        for (int p = rowStart; p < rowEnd; ++p) {
+            const int a = structure.paramReducedIndexList[structure.rowParamList[p]];
+            if (a < 0) {
+                continue;
+            }
+            const double valueA = jacobian[structure.rowValueList[p]];
+            double *row = &reducedMatrix[a * numberOfReduced];
+            for (int q = rowStart; q < rowEnd; ++q) {
+                const int c = structure.paramReducedIndexList[structure.rowParamList[q]];
+                if (c >= 0) {
+                    row[c] += valueA * jacobian[structure.rowValueList[q]];
+                }
+            }
+        }
+    }
+    return;
+}
+
+
+// Multiply 'x' by the (implicit) damped reduced system matrix:
+//
+//     S x = (A + mu D) x - sum(W V^-1 W^T x)
+//
+// A x is computed from the Jacobian, as J^T (J x).
+static void multiplyReducedSystem(const SchurStructure &structure,
+                                  const std::vector<double> &jacobian,
+                                  const std::vector<SchurBlockData> &blockDataList,
+                                  const std::vector<double> &reducedDampingList,
+                                  const std::vector<double> &x,
+                                  std::vector<double> &errorWork,
+                                  std::vector<double> &out) {
+    const int numberOfReduced = static_cast<int>(structure.reducedParamList.size());
+    for (int j = 0; j < structure.numberOfErrors; ++j) {
+        double value = 0.0;
+        for (int p = structure.rowStartList[j]; p < structure.rowStartList[j + 1]; ++p) {
+            const int c = structure.paramReducedIndexList[structure.rowParamList[p]];
+            if (c >= 0) {
+                value += jacobian[structure.rowValueList[p]] * x[c];
+            }
+        }
+        errorWork[j] = value;
+    }
+    for (int c = 0; c < numberOfReduced; ++c) {
+        const int paramIndex = structure.reducedParamList[c];
+        double value = reducedDampingList[c] * x[c];
+        for (int v = structure.columnStartList[paramIndex];
+             v < structure.columnStartList[paramIndex + 1]; ++v) {
+            value += jacobian[v] * errorWork[structure.rowIndexList[v]];
+        }
+        out[c] = value;
+    }
+
+    std::vector<double> blockWork;
+    for (size_t b = 0; b < blockDataList.size(); ++b) {
+        const std::vector<int> &reducedList = structure.blockReducedList[b];
+        const SchurBlockData &blockData = blockDataList[b];
+        const int k = static_cast<int>(structure.blockParamList[b].size());
+        blockWork.assign(k, 0.0);
+        for (size_t c = 0; c < reducedList.size(); ++c) {
+            const double value = x[reducedList[c]];
+            for (int a = 0; a < k; ++a) {
+                blockWork[a] += blockData.W[(c * k) + a] * value;
+            }
+        }
+        choleskySolve(k, &blockData.factor[0], &blockWork[0]);
+        for (size_t c = 0; c < reducedList.size(); ++c) {
+            double value = 0.0;
+            for (int a = 0; a < k; ++a) {
+                value += blockData.W[(c * k) + a] * blockWork[a];
+            }
+            out[reducedList[c]] -= value;
+        }
+    }
+    return;
+}
+
+
+// Solve the reduced system with Preconditioned Conjugate Gradients,
+// using the diagonal of the reduced system as the preconditioner.
+static bool solveReducedSystemPCG(const SchurStructure &structure,
+                                  const std::vector<double> &jacobian,
+                                  const std::vector<double> &diagonalList,
+                                  const std::vector<SchurBlockData> &blockDataList,
+                                  const std::vector<double> &reducedDampingList,
+                                  const std::vector<double> &rhs,
+                                  std::vector<double> &solution) {
+    const int numberOfReduced = static_cast<int>(structure.reducedParamList.size());
+
+    std::vector<double> preconditioner(numberOfReduced, 0.0);
+    for (int c = 0; c < numberOfReduced; ++c) {
+        preconditioner[c] = diagonalList[structure.reducedParamList[c]]
+                            + reducedDampingList[c];
+    }
+    std::vector<double> blockWork;
+    for (size_t b = 0; b < blockDataList.size(); ++b) {
+        const std::vector<int> &reducedList = structure.blockReducedList[b];
+        const SchurBlockData &blockData = blockDataList[b];
+        const int k = static_cast<int>(structure.blockParamList[b].size());
+        for (size_t c = 0; c < reducedList.size(); ++c) {
+            const double *w = &blockData.W[c * k];
+            blockWork.assign(w, w + k);
+            choleskySolve(k, &blockData.factor[0], &blockWork[0]);
+            double value = 0.0;
+            for (int a = 0; a < k; ++a) {
+                value += w[a] * blockWork[a];
+            }
+            preconditioner[reducedList[c]] -= value;
+        }
+    }
+    for (int c = 0; c < numberOfReduced; ++c) {
+        double value = preconditioner[c];
+        if (!(value > 0.0)) {
+            value = diagonalList[structure.reducedParamList[c]]
+                    + reducedDampingList[c];
+        }
+        preconditioner[c] = 1.0 / value;
+    }
+
+    solution.assign(numberOfReduced, 0.0);
+    std::vector<double> residual(rhs);
+    const double rhsNorm = std::sqrt(dotProduct(rhs, rhs));
+    if (rhsNorm == 0.0) {
+        return true;
+    }
+    std::vector<double> z(numberOfReduced, 0.0);
+    std::vector<double> direction(numberOfReduced, 0.0);
+    std::vector<double> product(numberOfReduced, 0.0);
+    std::vector<double> errorWork(structure.numberOfErrors, 0.0);
+    for (int c = 0; c < numberOfReduced; ++c) {
+        z[c] = preconditioner[c] * residual[c];
+    }
+    direction = z;
+    double rz = dotProduct(residual, z);
+    for (int iter = 0; iter < SCHUR_PCG_ITERATIONS_MAX; ++iter) {
+        multiplyReducedSystem(structure, jacobian, blockDataList,
+                              reducedDampingList, direction,
+                              errorWork, product);
+        const double curvature = dotProduct(direction, product);
+        if (!(curvature > 0.0)) {
+            // The damped system must be positive-definite.
+            return iter > 0;
+        }
+        const double alpha = rz / curvature;
+        for (int c = 0; c < numberOfReduced; ++c) {
+            solution[c] += alpha * direction[c];
+            residual[c] -= alpha * product[c];
+        }
+        if (std::sqrt(dotProduct(residual, residual)) <= (SCHUR_PCG_TOLERANCE * rhsNorm)) {
+            break;
+        }
+        for (int c = 0; c < numberOfReduced; ++c) {
+            z[c] = preconditioner[c] * residual[c];
+        }
+        const double rzNew = dotProduct(residual, z);
+        const double beta = rzNew / rz;
+        rz = rzNew;
+        for (int c = 0; c < numberOfReduced; ++c) {
+            direction[c] = z[c] + (beta * direction[c]);
+        }
+    }
+    return true;
+}
+
+
+// Solve the damped normal equations (J^T J + mu D) step = -gradient
+// for the parameter step, by eliminating the point blocks.
+static bool solveDampedSystem(const SchurStructure &structure,
+                              const std::vector<double> &jacobian,
+                              const std::vector<double> &gradientList,
+                              const std::vector<double> &diagonalList,
+                              const std::vector<double> &dampingList,
+                              const std::vector<double> &reducedMatrix,
+                              ThreadPool *threadPool,
+                              std::vector<SchurBlockData> &blockDataList,
+                              std::vector<double> &reducedSystem,
+                              std::vector<double> &step) {
+    const int numberOfBlocks = static_cast<int>(structure.blockParamList.size());
+    const int numberOfReduced = static_cast<int>(structure.reducedParamList.size());
+
+    // Factorize each damped point block, and solve the block with
+    // the block's gradient.
+    std::function<void(int, int)> factorizeFunc = [&](int begin, int end) {
+        for (int b = begin; b < end; ++b) {
+            const std::vector<int> &paramList = structure.blockParamList[b];
+            const int k = static_cast<int>(paramList.size());
+            SchurBlockData &blockData = blockDataList[b];
+            blockData.factor = blockData.V;
+            blockData.rhs.resize(k);
+            for (int a = 0; a < k; ++a) {
+                blockData.factor[(a * k) + a] += dampingList[paramList[a]];
+                blockData.rhs[a] = -gradientList[paramList[a]];
+            }
+            blockData.factorized = choleskyFactorize(k, &blockData.factor[0]);
+            if (blockData.factorized) {
+                choleskySolve(k, &blockData.factor[0], &blockData.rhs[0]);
+            }
+        }
+    };
+    runBlocks(threadPool, numberOfBlocks, factorizeFunc);
+    for (int b = 0; b < numberOfBlocks; ++b) {
+        if (!blockDataList[b].factorized) {
+            return false;
+        }
+    }
+
+    // The reduced system right-hand side; -g_c - W V^-1 (-g_p).
+    std::vector<double> reducedRhs(numberOfReduced, 0.0);
+    std::vector<double> reducedDampingList(numberOfReduced, 0.0);
+    for (int c = 0; c < numberOfReduced; ++c) {
+        const int paramIndex = structure.reducedParamList[c];
+        reducedRhs[c] = -gradientList[paramIndex];
+        reducedDampingList[c] = dampingList[paramIndex];
+    }
+    for (int b = 0; b < numberOfBlocks; ++b) {
+        const std::vector<int> &reducedList = structure.blockReducedList[b];
+        const SchurBlockData &blockData = blockDataList[b];
+        const int k = static_cast<int>(structure.blockParamList[b].size());
+        for (size_t c = 0; c < reducedList.size(); ++c) {
+            double value = 0.0;
+            for (int a = 0; a < k; ++a) {
+                value += blockData.W[(c * k) + a] * blockData.rhs[a];
+            }
+            reducedRhs[reducedList[c]] -= value;
+        }
+    }
+
+    std::vector<double> reducedStep(numberOfReduced, 0.0);
+    if (numberOfReduced > 0) {
+        if (structure.denseReducedSystem) {
+            // S = A + mu D - sum(W V^-1 W^T)
+            reducedSystem = reducedMatrix;
+            for (int c = 0; c < numberOfReduced; ++c) {
+                reducedSystem[(c * numberOfReduced) + c] += reducedDampingList[c];
+            }
+            std::vector<double> solvedW;
+            for (int b = 0; b < numberOfBlocks; ++b) {
+                const std::vector<int> &reducedList = structure.blockReducedList[b];
+                const SchurBlockData &blockData = blockDataList[b];
+                const int k = static_cast<int>(structure.blockParamList[b].size());
+                const int count = static_cast<int>(reducedList.size());
+                solvedW = blockData.W;
+                for (int c = 0; c < count; ++c) {
+                    choleskySolve(k, &blockData.factor[0], &solvedW[c * k]);
+                }
+                for (int c = 0; c < count; ++c) {
+                    const double *w = &blockData.W[c * k];
+                    double *row = &reducedSystem[reducedList[c] * numberOfReduced];
+                    for (int d = 0; d < count; ++d) {
+                        const double *y = &solvedW[d * k];
+                        double value = 0.0;
+                        for (int a = 0; a < k; ++a) {
+                            value += w[a] * y[a];
+                        }
+                        row[reducedList[d]] -= value;
+                    }
+                }
+            }
+            if (!choleskyFactorize(numberOfReduced, &reducedSystem[0])) {
+                return false;
+            }
+            reducedStep = reducedRhs;
+            choleskySolve(numberOfReduced, &reducedSystem[0], &reducedStep[0]);
+        } else {
+            bool ok = solveReducedSystemPCG(structure, jacobian, diagonalList,
+                                            blockDataList, reducedDampingList,
+                                            reducedRhs, reducedStep);
+            if (!ok) {
+                return false;
+            }
+        }
+    }
+    for (int c = 0; c < numberOfReduced; ++c) {
+        step[structure.reducedParamList[c]] = reducedStep[c];
+    }
+
+    // Back-substitute the reduced step into each block;
+    // dp = V^-1 (-g_p) - V^-1 W^T dc.
+    std::function<void(int, int)> backSubstituteFunc = [&](int begin, int end) {
+        std::vector<double> blockWork;
+        for (int b = begin; b < end; ++b) {
+            const std::vector<int> &paramList = structure.blockParamList[b];
+            const std::vector<int> &reducedList = structure.blockReducedList[b];
+            const SchurBlockData &blockData = blockDataList[b];
+            const int k = static_cast<int>(paramList.size());
+            blockWork.assign(k, 0.0);
+            for (size_t c = 0; c < reducedList.size(); ++c) {
+                const double value = reducedStep[reducedList[c]];
+                for (int a = 0; a < k; ++a) {
+                    blockWork[a] += blockData.W[(c * k) + a] * value;
+                }
+            }
+            choleskySolve(k, &blockData.factor[0], &blockWork[0]);
+            for (int a = 0; a < k; ++a) {
+                step[paramList[a]] = blockData.rhs[a] - blockWork[a];
+            }
+        }
+    };
+    runBlocks(threadPool, numberOfBlocks, backSubstituteFunc);
+    return true;
+}
+
+
+// The damping is updated with the gain ratio, as described in
+// "Methods for Non-Linear Least Squares Problems" (Madsen, Nielsen
+// and Tingleff, 2004).
+bool solveSchurLevenbergMarquardt(SchurSolveFunc func,
+                                  void *data,
+                                  const int m,
+                                  const int n,
+                                  double *x,
+                                  double *fvec,
+                                  const SchurStructure &structure,
+                                  const SolverOptions &solverOptions,
+                                  ThreadPool *threadPool,
+                                  SolverResult &solveResult) {
+    solveResult.success = false;
+    solveResult.reason_number = 0;
+    solveResult.reason = levmarReasons[0];
+    solveResult.iterations = 0;
+    solveResult.functionEvals = 0;
+    solveResult.jacobianEvals = 0;
+    solveResult.errorFinal = 0.0;
+    if ((n <= 0) || (m < n)
+        || (structure.numberOfParameters != n)
+        || (structure.numberOfErrors != m)) {
+        ERR("Schur solver has invalid inputs; "
+            << "parameters=" << n << " errors=" << m);
+        return false;
+    }
+
+    const int numberOfValues = static_cast<int>(structure.rowIndexList.size());
+    const int numberOfBlocks = static_cast<int>(structure.blockParamList.size());
+    std::vector<double> jacobian(numberOfValues, 0.0);
+    std::vector<double> gradientList(n, 0.0);
+    std::vector<double> diagonalList(n, 0.0);
+    const bool autoParamScale = solverOptions.autoParamScale == 1;
+    std::vector<double> scaleList(n, autoParamScale ? 0.0 : 1.0);
+    std::vector<double> dampingList(n, 0.0);
+    std::vector<double> step(n, 0.0);
+    std::vector<double> paramListNew(n, 0.0);
+    std::vector<double> errorListNew(m, 0.0);
+    std::vector<SchurBlockData> blockDataList(numberOfBlocks);
+    std::vector<double> reducedMatrix;
+    std::vector<double> reducedSystem;
+
+    int iterations = 0;
+    int functionEvals = 0;
+    int jacobianEvals = 0;
+    int reason = 0;
+
+    if (func(data, m, n, x, fvec, NULL, 1) < 0) {
+        reason = SCHUR_REASON_USER_CANCELED;
+    }
+    ++functionEvals;
+    double cost = sumOfSquares(m, fvec);
+    bool evaluatedAtSolution = true;
+
+    double mu = 0.0;
+    double nu = 2.0;
+    while (reason == 0) {
+        if (cost <= solverOptions.eps3) {
+            reason = SCHUR_REASON_SMALL_ERROR;
+            break;
+        }
+        if (iterations >= solverOptions.iterMax) {
+            reason = SCHUR_REASON_MAXIMUM_ITERATIONS;
+            break;
+        }
+        ++iterations;
+
+        evaluatedAtSolution = false;
+        if (func(data, m, n, x, fvec, &jacobian[0], 2) < 0) {
+            reason = SCHUR_REASON_USER_CANCELED;
+            break;
+        }
+        ++jacobianEvals;
+
+        // Gradient (J^T f) and the diagonal of J^T J.
+        double gradientMax = 0.0;
+        for (int i = 0; i < n; ++i) {
+            double gradient = 0.0;
+            double diagonal = 0.0;
+            for (int v = structure.columnStartList[i];
+                 v < structure.columnStartList[i + 1]; ++v) {
+                const double value = jacobian[v];
+                gradient += value * fvec[structure.rowIndexList[v]];
+                diagonal += value * value;
+            }
+            gradientList[i] = gradient;
+            diagonalList[i] = diagonal;
+            gradientMax = std::max(gradientMax, std::fabs(gradient));
+        }
+        if (gradientMax <= solverOptions.eps1) {
+            reason = SCHUR_REASON_SMALL_GRADIENT;
+            break;
+        }
+
+        // With automatic parameter scaling the damping is
+        // proportional to the diagonal of J^T J (Marquardt), so the
+        // step does not depend on the units of the parameters.
+        if (autoParamScale) {
+            for (int i = 0; i < n; ++i) {
+                const double diagonal = diagonalList[i] > 0.0 ? diagonalList[i] : 1.0;
+                scaleList[i] = std::max(scaleList[i], diagonal);
+            }
+        }
+        if (iterations == 1) {
+            double ratioMax = 0.0;
+            for (int i = 0; i < n; ++i) {
+                ratioMax = std::max(ratioMax, diagonalList[i] / scaleList[i]);
+            }
+            mu = solverOptions.tau * ratioMax;
+            if (!(mu > 0.0)) {
+                mu = std::max(solverOptions.tau, std::numeric_limits<double>::epsilon());
+            }
+        }
+
+        computeNormalEquations(structure, jacobian, threadPool,
+                               blockDataList, reducedMatrix);
+
+        int attempts = 0;
+        bool accepted = false;
+        while (!accepted && (reason == 0)) {
+            for (int i = 0; i < n; ++i) {
+                dampingList[i] = mu * scaleList[i];
+            }
+            bool ok = solveDampedSystem(structure, jacobian,
+                                        gradientList, diagonalList,
+                                        dampingList, reducedMatrix,
+                                        threadPool, blockDataList,
+                                        reducedSystem, step);
+            if (!ok) {
+                mu *= nu;
+                nu *= 2.0;
+                ++attempts;
+                if (attempts >= SCHUR_DAMPING_ATTEMPTS_MAX) {
+                    reason = SCHUR_REASON_SINGULAR_MATRIX;
+                }
+                continue;
+            }
+
+            double stepNorm = 0.0;
+            double paramNorm = 0.0;
+            double predicted = 0.0;
+            for (int i = 0; i < n; ++i) {
+                stepNorm += step[i] * step[i];
+                paramNorm += x[i] * x[i];
+                predicted += step[i] * ((dampingList[i] * step[i]) - gradientList[i]);
+                paramListNew[i] = x[i] + step[i];
+            }
+            stepNorm = std::sqrt(stepNorm);
+            paramNorm = std::sqrt(paramNorm);
+            if (stepNorm <= (solverOptions.eps2 * (paramNorm + solverOptions.eps2))) {
+                reason = SCHUR_REASON_SMALL_PARAMETER_CHANGE;
+                break;
+            }
+
+            if (func(data, m, n, &paramListNew[0], &errorListNew[0], NULL, 1) < 0) {
+                reason = SCHUR_REASON_USER_CANCELED;
+                break;
+            }
+            ++functionEvals;
+            const double costNew = sumOfSquares(m, &errorListNew[0]);
+            const double ratio = (cost - costNew) / predicted;
+            if ((predicted > 0.0) && std::isfinite(costNew) && (ratio > 0.0)) {
+                for (int i = 0; i < n; ++i) {
+                    x[i] = paramListNew[i];
+                }
+                for (int j = 0; j < m; ++j) {
+                    fvec[j] = errorListNew[j];
+                }
+                cost = costNew;
+                evaluatedAtSolution = true;
+                const double factor = (2.0 * ratio) - 1.0;
+                mu *= std::max(1.0 / 3.0, 1.0 - (factor * factor * factor));
+                nu = 2.0;
+                accepted = true;
+            } else {
+                mu *= nu;
+                nu *= 2.0;
+                ++attempts;
+                if (attempts >= SCHUR_DAMPING_ATTEMPTS_MAX) {
+                    reason = SCHUR_REASON_DAMPING_ATTEMPTS;
+                }
+            }
+        }
+    }
+
+    // The last evaluation may have been for a Jacobian or a rejected
+    // step, so the errors are evaluated at the solution, leaving the
+    // caller's state the same as the solved parameters.
+    if (!evaluatedAtSolution && (reason != SCHUR_REASON_USER_CANCELED)) {
+        func(data, m, n, x, fvec, NULL, 1);
+        ++functionEvals;
+    }
+
+    solveResult.success = (reason != SCHUR_REASON_USER_CANCELED)
+                          && (reason != SCHUR_REASON_SINGULAR_MATRIX);
+    solveResult.reason_number = reason;
+    solveResult.reason = levmarReasons[reason];
+    solveResult.iterations = iterations;
+    solveResult.functionEvals = functionEvals;
+    solveResult.jacobianEvals = jacobianEvals;
+    solveResult.errorFinal = std::sqrt(sumOfSquares(m, fvec));
+    return true;
+}
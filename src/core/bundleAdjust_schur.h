@@ -0,0 +1,163 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A sparse Levenberg-Marquardt solver, using the Schur complement to
+ * eliminate the point (bundle) parameters.
+ *
+ * Each marker error depends on a single bundle, so the normal
+ * equations of bundle adjustment have a block structure:
+ *
+ *     [ A    W ] [ dc ]   [ rc ]
+ *     [ W^T  V ] [ dp ] = [ rp ]
+ *
+ * where 'c' are the camera (and any other) parameters, 'p' are the
+ * point parameters, and V is block-diagonal, with a small block for
+ * each bundle. The point parameters are eliminated, leaving the
+ * "reduced camera system":
+ *
+ *     (A - W V^-1 W^T) dc = rc - W V^-1 rp
+ *
+ * which is solved with a dense Cholesky factorization, or with
+ * Preconditioned Conjugate Gradients (without forming the matrix)
+ * when there are many camera parameters. The point parameters are
+ * then found by back-substitution, one block at a time.
+ *
+ * The Jacobian is stored sparse (only the errors affected by each
+ * parameter are stored), so memory use is not the number of
+ * parameters multiplied by the number of errors.
+ *
+ * This file does not depend on Maya.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SCHUR_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SCHUR_H
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_parameterGroups.h>
+#include <core/bundleAdjust_threadPool.h>
+
+
+// Reduced camera systems with more parameters than this are solved
+// with Preconditioned Conjugate Gradients, rather than a dense
+// Cholesky factorization.
+#define SCHUR_DENSE_PARAMETERS_MAX (1000)
+
+// Blocks of point parameters larger than this (for example an
+// animated bundle with smoothness) are not eliminated, and are
+// solved in the reduced system.
+#define SCHUR_BLOCK_PARAMETERS_MAX (32)
+
+// Preconditioned Conjugate Gradients stopping conditions.
+#define SCHUR_PCG_ITERATIONS_MAX (500)
+#define SCHUR_PCG_TOLERANCE (1E-10)
+
+// The number of times the damping may be increased, without
+// reducing the error, before the solver gives up.
+#define SCHUR_DAMPING_ATTEMPTS_MAX (20)
+
+
+// The structure of the sparse Jacobian, and the blocks of point
+// parameters to eliminate.
+struct SchurStructure {
+    int numberOfParameters;
+    int numberOfErrors;
+
+    // The Jacobian values of parameter 'i' are stored from
+    // 'columnStartList[i]' to 'columnStartList[i + 1]' (exclusive),
+    // for the errors in 'rowIndexList' (the same order as the
+    // parameter's 'paramToErrorIndexList').
+    std::vector<int> columnStartList;
+    std::vector<int> rowIndexList;
+
+    // The Jacobian values of error 'j' are at the indices
+    // 'rowValueList[rowStartList[j]]' to
+    // 'rowValueList[rowStartList[j + 1] - 1]', for the parameters in
+    // 'rowParamList'.
+    std::vector<int> rowStartList;
+    std::vector<int> rowValueList;
+    std::vector<int> rowParamList;
+
+    // The parameters solved in the reduced system, and the index of
+    // each parameter in the reduced system (-1 if eliminated).
+    std::vector<int> reducedParamList;
+    std::vector<int> paramReducedIndexList;
+
+    // The blocks of eliminated parameters; no error is affected by
+    // the parameters of two different blocks. The block of each
+    // parameter is -1 if the parameter is not eliminated.
+    std::vector<int> paramBlockList;
+    IndexList2D blockParamList;
+
+    // The errors affected by each block, and the reduced system
+    // indices of the parameters that affect the same errors.
+    IndexList2D blockErrorList;
+    IndexList2D blockReducedList;
+
+    // Solve the reduced system with a dense Cholesky factorization,
+    // otherwise Preconditioned Conjugate Gradients are used.
+    bool denseReducedSystem;
+};
+
+
+// Function called to compute the errors (iflag=1), or the sparse
+// Jacobian values (iflag=2) at the parameters 'x'. When computing
+// the Jacobian 'fvec' contains the errors at 'x'.
+//
+// A negative return value cancels the solve.
+typedef int (*SchurSolveFunc)(void *data,
+                              int m,
+                              int n,
+                              const double *x,
+                              double *fvec,
+                              double *fjac,
+                              int iflag);
+
+
+// Find the Jacobian structure and the blocks of parameters to
+// eliminate; only parameters in 'pointParamList' are eliminated.
+void findSchurStructure(const int numberOfErrors,
+                        const IndexList2D &paramToErrorIndexList,
+                        const std::vector<bool> &pointParamList,
+                        SchurStructure &structure);
+
+
+// Minimise the sum of squared errors, starting from the parameters
+// 'x', using the 'iterMax', 'tau', 'eps1' (gradient), 'eps2'
+// (parameter change), 'eps3' (error) and 'autoParamScale' solver
+// options.
+//
+// 'threadPool' is used to compute the point blocks in parallel, and
+// may be NULL. The termination reason is one of 'levmarReasons'.
+bool solveSchurLevenbergMarquardt(SchurSolveFunc func,
+                                  void *data,
+                                  const int m,
+                                  const int n,
+                                  double *x,
+                                  double *fvec,
+                                  const SchurStructure &structure,
+                                  const SolverOptions &solverOptions,
+                                  ThreadPool *threadPool,
+                                  SolverResult &solveResult);
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SCHUR_H
@@ -17,21 +17,10 @@
  * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
  * ====================================================================
  *
- * The universal solving function, works with any solver.
- *
- * The functions contain the essential core of a minimization solver.
+ * Set the parameters and measure the errors of the Maya scene, used by
+ * MayaProblem to solve the scene with 'solveProblem'.
  */
 
-// cminpack
-#ifdef USE_SOLVER_CMINPACK
-#include <cminpack.h>
-#endif
-
-// Lev-Mar
-#ifdef USE_SOLVER_LEVMAR
-#include <levmar.h>
-#endif
-
 // STL
 #include <ctime>
 #include <cmath>
@@ -75,8 +64,7 @@
 #include <core/bundleAdjust_base.h>
 #include <core/bundleAdjust_data.h>
 #include <core/bundleAdjust_solveFunc.h>
-#include <core/bundleAdjust_cminpack_base.h>
-#include <core/bundleAdjust_levmar_bc_dif.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
 
 
 // NOTE: There is a very strange bug in Maya. After setting a number
@@ -106,11 +94,21 @@ int getStringArrayIndexOfValue(MStringArray &array, MString &value) {
 /*
  * Generate a 'dgdirty' MEL command listing all nodes that may be
  * changed by our solve function.
+ *
+ * Only the nodes of the Markers with Camera or Bundle frame data
+ * that is not valid (see 'FrameDataCache') are listed. An empty
+ * string is returned if no nodes need to be dirtied.
  */
 MString generateDirtyCommand(int numberOfMarkerErrors, SolverData *ud) {
     MString dgDirtyCmd = "dgdirty ";
     MStringArray dgDirtyNodeNames;
+    const FrameDataCache &cache = ud->frameDataCache;
     for (int i = 0; i < (numberOfMarkerErrors / ERRORS_PER_MARKER); ++i) {
+        const MarkerErrorData &markerErrorData = ud->markerErrorDataList[i];
+        if (cache.cameraFrameValidList[markerErrorData.cameraFrameIndex]
+            && cache.bundleFrameValidList[markerErrorData.bundleFrameIndex]) {
+            continue;
+        }
         IndexPair markerPair = ud->errorToMarkerList[i];
 
         MarkerPtr marker = ud->markerList[markerPair.first];
@@ -159,34 +157,15 @@ MString generateDirtyCommand(int numberOfMarkerErrors, SolverData *ud) {
             dgDirtyNodeNames.append(bundleName);
         }
     }
+    if (dgDirtyNodeNames.length() == 0) {
+        return MString();
+    }
     dgDirtyCmd += ";";
     return dgDirtyCmd;
 }
 
 
-// Given a specific parameter, calculate the expected 'delta' value of
-// the parameter.
-double calculateParameterDelta(double value,
-                               double delta,
-                               double sign,
-                               AttrPtr attr) {
-    double xmin = attr->getMinimumValue();
-    double xmax = attr->getMaximumValue();
-
-    // If the value +/- delta would cause the attribute to go
-    // out of box-constraints, then we should only use one
-    // value, or go in the other direction.
-    if ((value + delta) > xmax) {
-        sign = -1;
-    }
-    if ((value - delta) < xmin) {
-        sign = 1;
-    }
-    return delta * sign;
-}
-
-
-// Set Parameter values
+// Set the (external) parameter values on the Maya attributes.
 void setParameters(
         const int numberOfParameters,
         const double *parameters,
@@ -202,37 +181,59 @@ void setParameters(
     UNUSED(debugFile);
 #endif
 
+    // Only the Camera and Bundle frames affected by the changed
+    // parameters must be evaluated again.
+    invalidateFrameDataCache(numberOfParameters,
+                             parameters,
+                             &ud->previousParamList[0],
+                             ud->frameDataCache);
+
+    // Set all the changed values of an attribute at once; the
+    // keyframes of an animated attribute with one anim curve, and all
+    // static attributes with one modifier.
+    //
+    // The changes are not recorded for undo; the final values are
+    // set (and recorded) once the solve has finished.
+    MDGModifier dgmod;
+    MTimeArray frames;
+    MDoubleArray values;
     MTime currentFrame = MAnimControl::currentTime();
-    for (int i = 0; i < numberOfParameters; ++i) {
-        IndexPair attrPair = ud->paramToAttrList[i];
-        AttrPtr attr = ud->attrList[attrPair.first];
-
-        double offset = attr->getOffsetValue();
-        double scale = attr->getScaleValue();
-        double xmin = attr->getMinimumValue();
-        double xmax = attr->getMaximumValue();
-        double value = parameters[i];
-        value = parameterBoundFromInternalToExternal(
-            value,
-            xmin, xmax,
-            offset, scale);
-
-        // Get frame time
-        MTime frame = currentFrame;
-        if (attrPair.second != -1) {
-            frame = ud->frameList[attrPair.second];
-        }
+    for (size_t j = 0; j < ud->attrToParamList.size(); ++j) {
+        const std::vector<int> &paramIndexList = ud->attrToParamList[j];
+        AttrPtr attr = ud->attrList[j];
+
+        frames.clear();
+        values.clear();
+        for (size_t k = 0; k < paramIndexList.size(); ++k) {
+            int i = paramIndexList[k];
+            if (parameters[i] == ud->previousParamList[i]) {
+                continue;
+            }
+            double value = parameters[i];
+
+            // Get frame time
+            MTime frame = currentFrame;
+            int frameIndex = ud->paramToAttrList[i].second;
+            if (frameIndex != -1) {
+                frame = ud->frameList[frameIndex];
+            }
 
 #ifdef WITH_DEBUG_FILE
-        if (debugFileIsOpen && debugFile != NULL) {
-            (*debugFile) << "i=" << i << " v=" << value << "\n";
-        }
+            if (debugFileIsOpen && debugFile != NULL) {
+                (*debugFile) << "i=" << i << " v=" << value << "\n";
+            }
 #endif
-        attr->setValue(value, frame, *ud->dgmod, *ud->curveChange);
+            frames.append(frame);
+            values.append(value);
+        }
+        if (values.length() > 0) {
+            status = attr->setValues(frames, values, dgmod, NULL);
+            CHECK_MSTATUS(status);
+        }
     }
 
     // Commit changed data into Maya
-    ud->dgmod->doIt();
+    dgmod.doIt();
 
     // Save a copy of the parameters - to be used for determining the
     // the difference between the previous and next parameters to be
@@ -241,74 +242,127 @@ void setParameters(
         ud->previousParamList[j] = parameters[j];
     }
 
-    // Invalidate the Camera Matrix cache.
-    //
-    // In future we might be able to auto-detect if the camera
-    // will change based on the current solve and not invalidate
-    // the cache but for now we cannot take the risk of an
-    // incorrect solve; we clear the cache.
-    for (int i = 0; i < (int) ud->cameraList.size(); ++i) {
-        ud->cameraList[i]->clearAttrValueCache();
+    // Invalidate the Camera Matrix cache, of the Cameras with frames
+    // affected by the changed parameters.
+    const FrameDataCache &cache = ud->frameDataCache;
+    std::vector<Camera *> clearedCameraList;
+    for (size_t i = 0; i < ud->cameraFrameToMarkerList.size(); ++i) {
+        if (cache.cameraFrameValidList[i]) {
+            continue;
+        }
+        IndexPair markerPair = ud->cameraFrameToMarkerList[i];
+        CameraPtr camera = ud->markerList[markerPair.first]->getCamera();
+        if (std::find(clearedCameraList.begin(),
+                      clearedCameraList.end(),
+                      camera.get()) == clearedCameraList.end()) {
+            camera->clearAttrValueCache();
+            clearedCameraList.push_back(camera.get());
+        }
+    }
+
+    // Dirty the nodes that will be evaluated again, so Maya does not
+    // use stale values in an interactive session.
+    bool interactive = ud->mayaSessionState == MGlobal::MMayaState::kInteractive;
+    if (interactive) {
+        MString dgDirtyCmd = generateDirtyCommand(ud->numberOfMarkerErrors, ud);
+        if (dgDirtyCmd.length() > 0) {
+            MGlobal::executeCommand(dgDirtyCmd);
+        }
     }
 
     status = MStatus::kSuccess;
 }
 
 
-inline
-double gaussian(double x, double mean, double sigma) {
-    return std::exp(
-            -(std::pow((x - mean), 2.0) / (2.0 * (std::pow(sigma, 2.0))))
-    );
-}
+void evaluateFrameData(
+        const std::vector<bool> &cameraFrameEvaluate,
+        const std::vector<bool> &bundleFrameEvaluate,
+        SolverData *ud,
+        MStatus &status) {
+    const int timeEvalMode = ud->solverOptions->timeEvalMode;
+    assert(ud->errorToMarkerList.size() > 0);
+    assert(ud->frameList.length() > 0);
+
+    // Trigger an DG Evaluation at a different time, to help Maya
+    // evaluate at the correct frame.
+#if FORCE_TRIGGER_EVAL == 1
+    {
+        MPoint pos;
+        int i = 0;
+        IndexPair markerPair = ud->errorToMarkerList[i];
+        MarkerPtr marker = ud->markerList[markerPair.first];
+        MTime frame = ud->frameList[markerPair.second];
+        status = marker->getPos(pos, frame + 1, TIME_EVAL_MODE_DG_CONTEXT);
+        CHECK_MSTATUS(status);
+    }
+#endif
 
+    // Evaluate each Camera frame once, using Maya, unless the cached
+    // data is still valid.
+    FrameDataCache &cache = ud->frameDataCache;
+    MMatrix cameraWorldProjectionMatrix;
+    MVector cam_dir;
+    MPoint cam_pos;
+    for (size_t i = 0; i < ud->cameraFrameToMarkerList.size(); ++i) {
+        if (cameraFrameEvaluate[i] == false) {
+            continue;
+        }
+        if (cache.cameraFrameValidList[i]) {
+            ++cache.cameraFrameCacheHits;
+            continue;
+        }
+        cache.cameraFrameValidList[i] = true;
+        ++cache.cameraFrameEvaluations;
+        IndexPair markerPair = ud->cameraFrameToMarkerList[i];
+        MarkerPtr marker = ud->markerList[markerPair.first];
+        MTime frame = ud->frameList[markerPair.second];
 
-/*
- * Compare the previous and new parameters to see which parameters
- * have changed. This allows us to only update and measure the changed
- * markers and attributes - speeding up the evaluation.
- */
-void determineMarkersToBeEvaluated(int numberOfParameters,
-                                   int numberOfMarkers,
-                                   double delta,
-                                   std::vector<double> previousParamList,
-                                   const double *parameters,
-                                   std::vector<std::vector<bool>> errorToParamList,
-                                   std::vector<bool> &evalMeasurements) {
-    std::vector<int> evalCount(numberOfMarkers, 0);
-
-    // Get all parameters that have changed.
-    double approxDelta = fabs(delta) * 0.5;
-    bool noneChanged = true;
-    std::vector<bool> paramChangedList(numberOfParameters, false);
-    for (int i = 0; i < numberOfParameters; ++i) {
-        bool changed = !number::isApproxEqual<double>(
-            parameters[i], previousParamList[i], approxDelta);
-        paramChangedList[i] = changed;
-        if (changed) {
-            noneChanged = false;
+        CameraPtr camera = marker->getCamera();
+        status = camera->getWorldProjMatrix(cameraWorldProjectionMatrix, frame,
+                                            timeEvalMode);
+        CHECK_MSTATUS(status);
+        camera->getWorldPosition(cam_pos, frame, timeEvalMode);
+        camera->getForwardDirection(cam_dir, frame, timeEvalMode);
+        double filmBackWidth = camera->getFilmbackWidthValue(frame, timeEvalMode);
+        double filmBackHeight = camera->getFilmbackHeightValue(frame, timeEvalMode);
+
+        CameraFrameData &cameraFrameData = ud->cameraFrameDataList[i];
+        cameraWorldProjectionMatrix.get(cameraFrameData.worldProjectionMatrix.m);
+        for (int j = 0; j < 3; ++j) {
+            cameraFrameData.position[j] = cam_pos[j];
+            cameraFrameData.forwardDirection[j] = cam_dir[j];
         }
+        cameraFrameData.filmBackInvAspect = filmBackHeight / filmBackWidth;
+        cameraFrameData.imageWidth = ud->imageWidth;
     }
 
-    // Find if a marker does not need to be updated at all.
-    for (int i = 0; i < numberOfParameters; ++i) {
-        bool changed = paramChangedList[i];
-        if (noneChanged == true) {
-            changed = true;
+    // Evaluate each Bundle frame once, using Maya, unless the cached
+    // data is still valid.
+    MPoint bnd_mpos;
+    for (size_t i = 0; i < ud->bundleFrameToMarkerList.size(); ++i) {
+        if (bundleFrameEvaluate[i] == false) {
+            continue;
         }
-        for (int j = 0; j < numberOfMarkers; ++j) {
-            if (changed && errorToParamList[j][i]) {
-                evalCount[j] = evalCount[j] + 1;
-            }
+        if (cache.bundleFrameValidList[i]) {
+            ++cache.bundleFrameCacheHits;
+            continue;
         }
-    }
+        cache.bundleFrameValidList[i] = true;
+        ++cache.bundleFrameEvaluations;
+        IndexPair markerPair = ud->bundleFrameToMarkerList[i];
+        MarkerPtr marker = ud->markerList[markerPair.first];
+        MTime frame = ud->frameList[markerPair.second];
 
-    // Convert evalCount to list of bools
-    evalMeasurements.resize((unsigned long) numberOfMarkers, false);
-    for (size_t i = 0; i < evalCount.size(); ++i) {
-        evalMeasurements[i] = static_cast<bool>(evalCount[i] > 0);
+        BundlePtr bnd = marker->getBundle();
+        status = bnd->getPos(bnd_mpos, frame, timeEvalMode);
+        CHECK_MSTATUS(status);
+
+        BundleFrameData &bundleFrameData = ud->bundleFrameDataList[i];
+        bundleFrameData.position[0] = bnd_mpos.x;
+        bundleFrameData.position[1] = bnd_mpos.y;
+        bundleFrameData.position[2] = bnd_mpos.z;
     }
-    return;
+    status = MStatus::kSuccess;
 }
 
 
@@ -337,32 +391,17 @@ void measureErrors(
     error_avg = 0.0;
     error_max = -0.0;
     error_min = std::numeric_limits<double>::max();
-
-    // Trigger an DG Evaluation at a different time, to help Maya
-    // evaluate at the correct frame.
     const int timeEvalMode = ud->solverOptions->timeEvalMode;
-    assert(ud->errorToMarkerList.size() > 0);
-    assert(ud->frameList.length() > 0);
-#if FORCE_TRIGGER_EVAL == 1
-    {
-        MPoint pos;
-        int i = 0;
-        IndexPair markerPair = ud->errorToMarkerList[i];
-        MarkerPtr marker = ud->markerList[markerPair.first];
-        MTime frame = ud->frameList[markerPair.second];
-        status = marker->getPos(pos, frame + 1, TIME_EVAL_MODE_DG_CONTEXT);
-        CHECK_MSTATUS(status);
-    }
-#endif
 
-    // Compute Marker Errors
-    MMatrix cameraWorldProjectionMatrix;
-    MPoint mkr_mpos;
-    MPoint bnd_mpos;
-    int numberOfErrorsMeasured = 0;
-    for (int i = 0; i < (numberOfMarkerErrors / ERRORS_PER_MARKER); ++i) {
+    // Find the Marker errors to measure, and the Camera and Bundle
+    // frames needed to measure them.
+    const int numberOfMarkerErrorPairs = numberOfMarkerErrors / ERRORS_PER_MARKER;
+    std::vector<int> measureList;
+    measureList.reserve(numberOfMarkerErrorPairs);
+    std::vector<bool> cameraFrameEvaluate(ud->cameraFrameDataList.size(), false);
+    std::vector<bool> bundleFrameEvaluate(ud->bundleFrameDataList.size(), false);
+    for (int i = 0; i < numberOfMarkerErrorPairs; ++i) {
         IndexPair markerPair = ud->errorToMarkerList[i];
-        int markerIndex = markerPair.first;
         int frameIndex = markerPair.second;
         bool skipFrame = frameIndexEnable[frameIndex] == false;
         bool skipMarker = errorMeasurements[i] == false;
@@ -378,108 +417,67 @@ void measureErrors(
             // not about the greater structure of the solving problem.
             continue;
         }
+        const MarkerErrorData &markerErrorData = ud->markerErrorDataList[i];
+        cameraFrameEvaluate[markerErrorData.cameraFrameIndex] = true;
+        bundleFrameEvaluate[markerErrorData.bundleFrameIndex] = true;
+        measureList.push_back(i);
+    }
 
-        MarkerPtr marker = ud->markerList[markerIndex];
-        MTime frame = ud->frameList[frameIndex];
-
-        CameraPtr camera = marker->getCamera();
-        status = camera->getWorldProjMatrix(cameraWorldProjectionMatrix, frame,
-                                            timeEvalMode);
-        CHECK_MSTATUS(status);
-
-        MVector cam_dir;
-        MPoint cam_pos;
-        camera->getWorldPosition(cam_pos, frame, timeEvalMode);
-        camera->getForwardDirection(cam_dir, frame, timeEvalMode);
-        double filmBackWidth = camera->getFilmbackWidthValue(frame, timeEvalMode);
-        double filmBackHeight = camera->getFilmbackHeightValue(frame, timeEvalMode);
-        double filmBackInvAspect = filmBackHeight / filmBackWidth;
-
-        BundlePtr bnd = marker->getBundle();
+    evaluateFrameData(cameraFrameEvaluate, bundleFrameEvaluate, ud, status);
+    CHECK_MSTATUS(status);
 
-        // Use pre-computed marker position and weight
-        mkr_mpos = ud->markerPosList[i];
-        double mkr_weight = ud->markerWeightList[i];
-        assert(mkr_weight > 0.0);  // 'sqrt' will be NaN if the weight is less than 0.0.
-        mkr_weight = std::sqrt(mkr_weight);
+    // Compute Marker Errors, in parallel, without Maya.
+    //
+    // 'ud->errorList' is the deviation shown to the user, it
+    // should not have any loss functions or scaling applied to it.
+    measureReprojectionErrors(
+        measureList,
+        ud->markerErrorDataList,
+        ud->cameraFrameDataList,
+        ud->bundleFrameDataList,
+        ud->threadPool,
+        errors,
+        &ud->errorList[0],
+        &ud->errorDistanceList[0]);
 
-        // Re-project Bundle into screen-space.
-        MVector bnd_dir;
-        status = bnd->getPos(bnd_mpos, frame, timeEvalMode);
-        CHECK_MSTATUS(status);
-        MPoint bnd_mpos_tmp(bnd_mpos);
-        bnd_dir = bnd_mpos_tmp - cam_pos;
-        bnd_dir.normalize();
-        bnd_mpos = bnd_mpos * cameraWorldProjectionMatrix;
-        bnd_mpos.cartesianize();
-        // Convert to -0.5 to 0.5, maintaining the aspect ratio of the
-        // film back.
-        bnd_mpos[0] *= 0.5;
-        bnd_mpos[1] *= 0.5 * filmBackInvAspect;
-
-        // Is the bundle behind the camera?
-        bool behind_camera = false;
-        double behind_camera_error_factor = 1.0;
-        double cam_dot_bnd = cam_dir * bnd_dir;
-        // WRN("Camera DOT Bundle: " << cam_dot_bnd);
-        if (cam_dot_bnd < 0.0) {
-            behind_camera = true;
-            behind_camera_error_factor = 1e+6;
-        }
+    int numberOfErrorsMeasured = 0;
+    for (size_t i = 0; i < measureList.size(); ++i) {
+        int errorPairIndex = measureList[i];
+        double d = ud->errorDistanceList[errorPairIndex];
+        error_avg += d;
+        if (d > error_max) { error_max = d; }
+        if (d < error_min) { error_min = d; }
+        ++numberOfErrorsMeasured;
 
 #ifdef WITH_DEBUG_FILE
         if (debugIsOpen && debugFile != NULL) {
-            (*debugFile) << "Bundle: " << bnd->getNodeName()
-                         << "\n";
-            (*debugFile) << "Behind Camera: " << behind_camera
-                         << "\n";
-            (*debugFile) << "Cam DOT Bnd: " << cam_dot_bnd
+            const MarkerErrorData &markerErrorData = ud->markerErrorDataList[errorPairIndex];
+            const CameraFrameData &cameraFrameData =
+                ud->cameraFrameDataList[markerErrorData.cameraFrameIndex];
+            const BundleFrameData &bundleFrameData =
+                ud->bundleFrameDataList[markerErrorData.bundleFrameIndex];
+            MarkerPtr marker = ud->markerList[ud->errorToMarkerList[errorPairIndex].first];
+            (*debugFile) << "Bundle: " << marker->getBundle()->getNodeName()
                          << "\n";
             (*debugFile) << "bnd_mpos: "
-                         << bnd_mpos_tmp.x << ", "
-                         << bnd_mpos_tmp.y << ", "
-                         << bnd_mpos_tmp.z
+                         << bundleFrameData.position[0] << ", "
+                         << bundleFrameData.position[1] << ", "
+                         << bundleFrameData.position[2]
                          << "\n";
             (*debugFile) << "cam_pos: "
-                         << cam_pos.x << ", "
-                         << cam_pos.y << ", "
-                         << cam_pos.z
+                         << cameraFrameData.position[0] << ", "
+                         << cameraFrameData.position[1] << ", "
+                         << cameraFrameData.position[2]
                          << "\n";
             (*debugFile) << "cam_dir: "
-                         << cam_dir.x << ", "
-                         << cam_dir.y << ", "
-                         << cam_dir.z
+                         << cameraFrameData.forwardDirection[0] << ", "
+                         << cameraFrameData.forwardDirection[1] << ", "
+                         << cameraFrameData.forwardDirection[2]
                          << "\n";
-            (*debugFile) << "bnd_dir: "
-                         << bnd_dir.x << ", "
-                         << bnd_dir.y << ", "
-                         << bnd_dir.z
+            (*debugFile) << "distance: " << d
                          << "\n";
         }
 #endif
-
-        // According to the Ceres solver 'circle_fit.cc'
-        // example, using the 'sqrt' distance error function is a
-        // bad idea as it will introduce non-linearities, we are
-        // better off using something like 'x*x - y*y'. It would
-        // be best to test this detail.
-        double dx = fabs(mkr_mpos.x - bnd_mpos.x) * ud->imageWidth;
-        double dy = fabs(mkr_mpos.y - bnd_mpos.y) * ud->imageWidth;
-        double d = distance_2d(mkr_mpos, bnd_mpos) * ud->imageWidth;
-
-        int errorIndex = i * ERRORS_PER_MARKER;
-        errors[errorIndex + 0] = dx * mkr_weight * behind_camera_error_factor;
-        errors[errorIndex + 1] = dy * mkr_weight * behind_camera_error_factor;
-
-        // 'ud->errorList' is the deviation shown to the user, it
-        // should not have any loss functions or scaling applied to it.
-        ud->errorList[errorIndex + 0] = dx * behind_camera_error_factor;
-        ud->errorList[errorIndex + 1] = dy * behind_camera_error_factor;
-        ud->errorDistanceList[i] = d;
-        error_avg += d;
-        if (d > error_max) { error_max = d; }
-        if (d < error_min) { error_min = d; }
-        ++numberOfErrorsMeasured;
     }
     if (numberOfErrorsMeasured == 0) {
         error_max = 0.0;
@@ -544,15 +542,6 @@ void measureErrors(
         ud->errorList[indexIntoErrorArray] = error * smoothWeight;
         errors[indexIntoErrorArray] = error * smoothWeight;
     }
-
-    // Changes the errors to be scaled by the loss function.
-    // This will reduce the affect outliers have on the solve.
-    if (ud->solverOptions->solverSupportsRobustLoss) {
-        // TODO: Scale the jacobian by the loss function too?
-        applyLossFunctionToErrors(numberOfErrors, errors,
-                                  ud->solverOptions->robustLossType,
-                                  ud->solverOptions->robustLossScale);
-    }
     assert(error_max >= error_min);
     assert(error_min <= error_max);
 
@@ -577,425 +566,5 @@ void measureErrors(
 }
 
 
-// Add another 'normal function' evaluation to the count.
-void incrementNormalIteration(SolverData *ud,
-                              bool debugIsOpen,
-                              std::ofstream *debugFile) {
-    ++ud->funcEvalNum;
-    ++ud->iterNum;
-    MStreamUtils::stdErrorStream() << "Iteration ";
-    MStreamUtils::stdErrorStream() << std::right << std::setfill ('0') << std::setw(4)
-                                   << ud->iterNum;
-    MStreamUtils::stdErrorStream() << " | Eval ";
-    MStreamUtils::stdErrorStream() << std::right << std::setfill ('0') << std::setw(4)
-                                   << ud->funcEvalNum;
-#ifdef WITH_DEBUG_FILE
-    if (debugIsOpen && debugFile != NULL) {
-        (*debugFile) << "\n"
-                     << "iteration normal: " << ud->iterNum
-                     << "\n";
-    }
-#else
-    UNUSED(debugIsOpen);
-    UNUSED(debugFile);
-#endif
-    return;
-}
-
-
-// Add another 'jacobian function' evaluation to the count.
-void incrementJacobianIteration(SolverData *ud,
-                                bool debugIsOpen,
-                                std::ofstream *debugFile) {
-    ++ud->funcEvalNum;
-    ++ud->jacIterNum;
-    if (ud->verbose) {
-        MStreamUtils::stdErrorStream() << "Jacobian  ";
-        MStreamUtils::stdErrorStream() << std::right << std::setfill ('0') << std::setw (4)
-                                       << ud->jacIterNum;
-        MStreamUtils::stdErrorStream() << " | Eval ";
-        MStreamUtils::stdErrorStream() << std::right << std::setfill ('0') << std::setw (4)
-                                       << ud->funcEvalNum;
-        if (ud->doCalcJacobian) {
-            MStreamUtils::stdErrorStream() << "\n";
-        }
-    }
-#ifdef WITH_DEBUG_FILE
-    if (debugIsOpen && debugFile != NULL) {
-        (*debugFile) << "\n"
-                  << "iteration jacobian: " << ud->jacIterNum
-                  << "\n";
-    }
-#else
-    UNUSED(debugIsOpen);
-    UNUSED(debugFile);
-#endif
-    return;
-}
-
-
-// Function run by cminpack algorithm to test the input parameters, p,
-// and compute the output errors, x.
-int solveFunc(const int numberOfParameters,
-              const int numberOfErrors,
-              const double *parameters,
-              double *errors,
-              double *jacobian,
-              void *userData) {
-    SolverData *ud = static_cast<SolverData *>(userData);
-    ud->timer.funcBenchTimer.start();
-    ud->timer.funcBenchTicks.start();
-    if (!ud->doCalcJacobian) {
-        ud->computation->setProgress(ud->iterNum);
-    }
-
-    int numberOfMarkerErrors = ud->numberOfMarkerErrors;
-    int numberOfAttrStiffnessErrors = ud->numberOfAttrStiffnessErrors;
-    int numberOfAttrSmoothnessErrors = ud->numberOfAttrSmoothnessErrors;
-    int numberOfMarkers = numberOfMarkerErrors / ERRORS_PER_MARKER;
-    assert(ud->errorToParamList.size() == static_cast<size_t>(numberOfMarkers));
-
-    std::ofstream *debugFile = NULL;
-    bool debugIsOpen = false;
-#ifdef WITH_DEBUG_FILE
-    if (ud->debugFileName.length() > 0) {
-        const char *debugFileChar = ud->debugFileName.asChar();
-        debugFile->open(debugFileChar, std::ios_base::app);
-    }
-    debugIsOpen = debugFile->is_open();
-#endif
-
-    if (ud->isNormalCall) {
-        incrementNormalIteration(ud, debugIsOpen, debugFile);
-    } else if (ud->isJacobianCall && !ud->doCalcJacobian) {
-        incrementJacobianIteration(ud, debugIsOpen, debugFile);
-    }
-
-    if (ud->isPrintCall) {
-        // insert print statements here when nprint is positive.
-        //
-        // if the nprint parameter to 'lmdif' or 'lmder' is positive,
-        // the function is called every nprint iterations with iflag=0,
-        // so that the function may perform special operations, such as
-        // printing residuals.
-        return SOLVE_FUNC_SUCCESS;
-    }
-
-    if (ud->computation->isInterruptRequested()) {
-        WRN("User wants to cancel the evaluation!");
-        ud->userInterrupted = true;
-        return SOLVE_FUNC_FAILURE;
-    }
-
-#ifdef MAYA_PROFILE
-    int profileCategory = MProfiler::getCategoryIndex("mmSolver");
-    MProfilingScope iterScope(profileCategory,
-                              MProfiler::kColorC_L1,
-                              "iteration");
-#endif
-
-    bool interactive = ud->mayaSessionState == MGlobal::MMayaState::kInteractive;
-    if (interactive) {
-        MString dgDirtyCmd = generateDirtyCommand(numberOfMarkerErrors, ud);
-        MGlobal::executeCommand(dgDirtyCmd);
-    }
-
-    // Calculate residual errors, or jacobian matrix?
-    double error_avg = 0;
-    double error_max = 0;
-    double error_min = 0;
-    if (ud->doCalcJacobian == false) {
-        // A normal evaluation of the errors and parameters.
-        std::vector<bool> evalMeasurements(numberOfMarkers, true);
-        std::vector<bool> frameIndexEnable(ud->frameList.length(), 1);
-
-        // Set Parameters
-        MStatus status;
-        {
-            ud->timer.paramBenchTimer.start();
-            ud->timer.paramBenchTicks.start();
-#ifdef MAYA_PROFILE
-            MProfilingScope setParamScope(profileCategory,
-                                          MProfiler::kColorA_L2,
-                                          "set parameters");
-#endif
-            setParameters(
-                    numberOfParameters,
-                    parameters,
-                    ud,
-                    debugFile,
-                    status);
-            ud->timer.paramBenchTimer.stop();
-            ud->timer.paramBenchTicks.stop();
-        }
-
-        // Measure Errors
-        {
-            ud->timer.errorBenchTimer.start();
-            ud->timer.errorBenchTicks.start();
-#ifdef MAYA_PROFILE
-            MProfilingScope setParamScope(profileCategory,
-                                          MProfiler::kColorA_L1,
-                                          "measure errors");
-#endif
-            measureErrors(numberOfErrors,
-                          numberOfMarkerErrors,
-                          numberOfAttrStiffnessErrors,
-                          numberOfAttrSmoothnessErrors,
-                          frameIndexEnable,
-                          evalMeasurements,
-                          errors,
-                          ud,
-                          error_avg, error_max, error_min,
-                          debugFile,
-                          status);
-            ud->timer.errorBenchTimer.stop();
-            ud->timer.errorBenchTicks.stop();
-        }
-    } else {
-        // Calculate Jacobian Matrix
-        MStatus status;
-        assert(ud->solverOptions->solverType == SOLVER_TYPE_CMINPACK_LMDER);
-        int autoDiffType = ud->solverOptions->autoDiffType;
-
-        // Get longest dimension for jacobian matrix
-        int ldfjac = numberOfErrors;
-        if (ldfjac < numberOfParameters) {
-            ldfjac = numberOfParameters;
-        }
-
-        int progressMin = ud->computation->progressMin();
-        int progressMax = ud->computation->progressMax();
-        ud->computation->setProgress(progressMin);
-
-        std::vector<bool> evalMeasurements(numberOfMarkers, false);
-        determineMarkersToBeEvaluated(
-                numberOfParameters,
-                numberOfMarkers,
-                ud->solverOptions->delta,
-                ud->previousParamList,
-                parameters,
-                ud->errorToParamList,
-                evalMeasurements);
-
-        // Calculate the jacobian matrix.
-        for (int i = 0; i < numberOfParameters; ++i) {
-            double ratio = (double) i / (double) numberOfParameters;
-            int progressNum = progressMin + static_cast<int>(ratio * progressMax);
-            ud->computation->setProgress(progressNum);
-
-            if (ud->computation->isInterruptRequested()) {
-                WRN("User wants to cancel the evaluation!");
-                ud->userInterrupted = true;
-                return SOLVE_FUNC_FAILURE;
-            }
-
-            // Create a copy of the parameters and errors.
-            std::vector<double> paramListA(numberOfParameters, 0);
-            for (int j = 0; j < numberOfParameters; ++j) {
-                paramListA[j] = parameters[j];
-            }
-            std::vector<double> errorListA(numberOfErrors, 0);
-            for (int j = 0; j < numberOfErrors; ++j) {
-                errorListA[j] = errors[j];
-            }
-
-            // Calculate the relative delta for each parameter.
-            double delta = ud->solverOptions->delta;
-            assert(delta > 0.0);
-
-            // 'analytically' calculate the deviation of markers as
-            //  will be affected by the new calculated delta value.
-            //  This will give us a jacobian matrix, without needing
-            //  to set attribute values and re-evaluate them in Maya's
-            //  DG.
-            IndexPair attrPair = ud->paramToAttrList[i];
-            AttrPtr attr = ud->attrList[attrPair.first];
-            // TODO: Get the camera that is best for the attribute,
-            //  not just index 0.
-            MarkerPtr mkr = ud->markerList[0];
-            CameraPtr cam = mkr->getCamera();
-
-            double value = parameters[i];
-            double deltaA = calculateParameterDelta(
-                    value, delta, 1, attr);
-
-            std::vector<bool> frameIndexEnabled = ud->paramFrameList[i];
-
-            incrementJacobianIteration(ud, debugIsOpen, debugFile);
-            paramListA[i] = paramListA[i] + deltaA;
-            {
-                ud->timer.paramBenchTimer.start();
-                ud->timer.paramBenchTicks.start();
-#ifdef MAYA_PROFILE
-                MProfilingScope setParamScope(profileCategory,
-                                              MProfiler::kColorA_L2,
-                                              "set parameters");
-#endif
-                setParameters(
-                        numberOfParameters,
-                        &paramListA[0],
-                        ud,
-                        debugFile,
-                        status);
-                ud->timer.paramBenchTimer.stop();
-                ud->timer.paramBenchTicks.stop();
-            }
-
-            double error_avg_tmp = 0;
-            double error_max_tmp = 0;
-            double error_min_tmp = 0;
-            {
-                ud->timer.errorBenchTimer.start();
-                ud->timer.errorBenchTicks.start();
-#ifdef MAYA_PROFILE
-                MProfilingScope setParamScope(profileCategory,
-                                              MProfiler::kColorA_L1,
-                                              "measure errors");
-#endif
-                // Based on only the changed attribute value only
-                // measure the markers that can modify the attribute -
-                // we do this using 'frameIndexEnabled' and
-                // 'evalMeasurements'.
-                measureErrors(numberOfErrors,
-                              numberOfMarkerErrors,
-                              numberOfAttrStiffnessErrors,
-                              numberOfAttrSmoothnessErrors,
-                              frameIndexEnabled,
-                              evalMeasurements,
-                              &errorListA[0],
-                              ud,
-                              error_avg_tmp,
-                              error_max_tmp,
-                              error_min_tmp,
-                              debugFile,
-                              status);
-                ud->timer.errorBenchTimer.stop();
-                ud->timer.errorBenchTicks.stop();
-            }
-
-            if (autoDiffType == AUTO_DIFF_TYPE_FORWARD) {
-                assert(ud->solverOptions->solverSupportsAutoDiffForward);
-                // Set the Jacobian matrix using the previously
-                // calculated errors (original and A).
-                double inv_delta = 1.0 / deltaA;
-                for (size_t j = 0; j < errorListA.size(); ++j) {
-                    size_t num = (i * ldfjac) + j;
-                    double x = (errorListA[j] - errors[j]) * inv_delta;
-                    ud->jacobianList[num] = x;
-                    jacobian[num] = x;
-                }
-
-            } else if (autoDiffType == AUTO_DIFF_TYPE_CENTRAL) {
-                assert(ud->solverOptions->solverSupportsAutoDiffCentral);
-                // Create another copy of parameters and errors.
-                std::vector<double> paramListB(numberOfParameters, 0);
-                for (int j = 0; j < numberOfParameters; ++j) {
-                    paramListB[j] = parameters[j];
-                }
-                std::vector<double> errorListB(numberOfErrors, 0);
-
-                // Get the new delta, from the oposite direction. If
-                // we don't calculate a different delta value, we
-                // something has gone wrong and a second evaluation is
-                // not needed.
-                double deltaB = calculateParameterDelta(
-                        value, delta, -1, attr);
-                if (deltaA == deltaB) {
-                    // Set the Jacobian matrix using the previously
-                    // calculated errors (original and A).
-                    double inv_delta = 1.0 / deltaA;
-                    for (size_t j = 0; j < errorListA.size(); ++j) {
-                        size_t num = (i * ldfjac) + j;
-                        double x = (errorListA[j] - errors[j]) * inv_delta;
-                        ud->jacobianList[num] = x;
-                        jacobian[num] = x;
-                    }
-                } else {
-
-                    incrementJacobianIteration(ud, debugIsOpen, debugFile);
-                    paramListB[i] = paramListB[i] + deltaB;
-                    {
-                        ud->timer.paramBenchTimer.start();
-                        ud->timer.paramBenchTicks.start();
-#ifdef MAYA_PROFILE
-                        MProfilingScope setParamScope(profileCategory,
-                                                      MProfiler::kColorA_L2,
-                                                      "set parameters");
-#endif
-                        setParameters(numberOfParameters,
-                                      &paramListB[0],
-                                      ud,
-                                      debugFile,
-                                      status);
-                        ud->timer.paramBenchTimer.stop();
-                        ud->timer.paramBenchTicks.stop();
-                    }
-
-                    error_avg_tmp = 0;
-                    error_max_tmp = 0;
-                    error_min_tmp = 0;
-                    {
-                        ud->timer.errorBenchTimer.start();
-                        ud->timer.errorBenchTicks.start();
-#ifdef MAYA_PROFILE
-                        MProfilingScope setParamScope(profileCategory,
-                                                      MProfiler::kColorA_L1,
-                                                      "measure errors");
-#endif
-                        measureErrors(numberOfErrors,
-                                      numberOfMarkerErrors,
-                                      numberOfAttrStiffnessErrors,
-                                      numberOfAttrSmoothnessErrors,
-                                      frameIndexEnabled,
-                                      evalMeasurements,
-                                      &errorListB[0],
-                                      ud,
-                                      error_avg_tmp,
-                                      error_max_tmp,
-                                      error_min_tmp,
-                                      debugFile,
-                                      status);
-                        ud->timer.errorBenchTimer.stop();
-                        ud->timer.errorBenchTicks.stop();
-                    }
-
-                    // Set the Jacobian matrix using the previously
-                    // calculated errors (A and B).
-                    assert(errorListA.size() == errorListB.size());
-                    double inv_delta = 0.5 / (fabs(deltaA) + fabs(deltaB));
-                    for (size_t j = 0; j < errorListA.size(); ++j) {
-                        size_t num = (i * ldfjac) + j;
-                        double x = (errorListA[j] - errorListB[j]) * inv_delta;
-                        ud->jacobianList[num] = x;
-                        jacobian[num] = x;
-                    }
-                }
-            }
-        }
-    }
-    ud->timer.funcBenchTimer.stop();
-    ud->timer.funcBenchTicks.stop();
-
-    if (ud->isNormalCall) {
-        char formatBuffer[128];
-        sprintf(
-            formatBuffer,
-            " | error avg %8.4f   min %8.4f   max %8.4f",
-            error_avg,
-            error_min,
-            error_max);
-        MStreamUtils::stdErrorStream() << std::string(formatBuffer) << "\n";
-    } else {
-        if (ud->verbose) {
-            if (!ud->doCalcJacobian) {
-                std::cerr << "\n";
-            }
-        }
-    }
-    return SOLVE_FUNC_SUCCESS;
-}
-
-
 // Clean up #define
 #undef FORCE_TRIGGER_EVAL
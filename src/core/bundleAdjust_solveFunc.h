@@ -17,7 +17,7 @@
  * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
  * ====================================================================
  *
- * Universal solver functions, to be used by any library.
+ * Set the parameters and measure the errors of the Maya scene.
  */
 
 
@@ -25,12 +25,30 @@
 #define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SOLVE_FUNC_H
 
 
+#include <core/bundleAdjust_defines.h>
 #include <core/bundleAdjust_data.h>
 
 
-// success / failure constants.
-#define SOLVE_FUNC_SUCCESS (0)
-#define SOLVE_FUNC_FAILURE (-1)
+// Set the (external) values of the parameters, as given by
+// 'SolverData::paramToAttrList'.
+void setParameters(
+        const int numberOfParameters,
+        const double *parameters,
+        SolverData *ud,
+        std::ofstream *debugFile,
+        MStatus &status);
+
+
+// Evaluate the Camera and Bundle frames given by
+// 'cameraFrameEvaluate' and 'bundleFrameEvaluate' (indexed the same
+// as 'SolverData::cameraFrameDataList' and
+// 'SolverData::bundleFrameDataList'), unless the data in
+// 'SolverData::frameDataCache' is still valid.
+void evaluateFrameData(
+        const std::vector<bool> &cameraFrameEvaluate,
+        const std::vector<bool> &bundleFrameEvaluate,
+        SolverData *ud,
+        MStatus &status);
 
 
 void measureErrors(
@@ -49,12 +67,4 @@ void measureErrors(
         MStatus &status);
 
 
-int solveFunc(const int numberOfParameters,
-              const int numberOfErrors,
-              const double *parameters,
-              double *errors,
-              double *jacobian,
-              void *userData);
-
-
 #endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_SOLVE_FUNC_H
@@ -0,0 +1,147 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A small pool of worker threads.
+ */
+
+// STL
+#include <algorithm>
+#include <cassert>
+
+// Local
+#include <core/bundleAdjust_threadPool.h>
+
+
+// Each thread takes this many ranges (on average), so threads that
+// finish early can take more work.
+#define RANGES_PER_THREAD (4)
+
+
+int getThreadCount(const int threadCount) {
+    if (threadCount > 0) {
+        return threadCount;
+    }
+    int hardwareCount = static_cast<int>(std::thread::hardware_concurrency());
+    return std::max(hardwareCount, 1);
+}
+
+
+ThreadPool::ThreadPool(const int threadCount)
+        : m_stop(false),
+          m_generation(0),
+          m_activeWorkers(0),
+          m_func(NULL),
+          m_count(0),
+          m_rangeSize(1),
+          m_nextIndex(0) {
+    const int count = ::getThreadCount(threadCount);
+    for (int i = 1; i < count; ++i) {
+        m_workers.push_back(std::thread(&ThreadPool::workerLoop, this));
+    }
+}
+
+
+ThreadPool::~ThreadPool() {
+    {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        m_stop = true;
+    }
+    m_workCondition.notify_all();
+    for (size_t i = 0; i < m_workers.size(); ++i) {
+        m_workers[i].join();
+    }
+}
+
+
+int ThreadPool::getThreadCount() const {
+    return static_cast<int>(m_workers.size()) + 1;
+}
+
+
+void ThreadPool::runRanges() {
+    while (true) {
+        const int begin = m_nextIndex.fetch_add(m_rangeSize);
+        if (begin >= m_count) {
+            break;
+        }
+        const int end = std::min(begin + m_rangeSize, m_count);
+        (*m_func)(begin, end);
+    }
+}
+
+
+void ThreadPool::workerLoop() {
+    unsigned int generation = 0;
+    while (true) {
+        {
+            std::unique_lock<std::mutex> lock(m_mutex);
+            while (!m_stop && (m_generation == generation)) {
+                m_workCondition.wait(lock);
+            }
+            if (m_stop) {
+                return;
+            }
+            generation = m_generation;
+        }
+
+        runRanges();
+
+        {
+            std::lock_guard<std::mutex> lock(m_mutex);
+            --m_activeWorkers;
+            if (m_activeWorkers == 0) {
+                m_doneCondition.notify_one();
+            }
+        }
+    }
+}
+
+
+void ThreadPool::parallelFor(const int count,
+                             const std::function<void(int, int)> &func) {
+    if (count <= 0) {
+        return;
+    }
+    if (m_workers.empty() || count == 1) {
+        func(0, count);
+        return;
+    }
+
+    const int ranges = getThreadCount() * RANGES_PER_THREAD;
+    {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        assert(m_activeWorkers == 0);
+        m_func = &func;
+        m_count = count;
+        m_rangeSize = std::max(1, (count + ranges - 1) / ranges);
+        m_nextIndex = 0;
+        m_activeWorkers = static_cast<int>(m_workers.size());
+        ++m_generation;
+    }
+    m_workCondition.notify_all();
+
+    runRanges();
+
+    std::unique_lock<std::mutex> lock(m_mutex);
+    while (m_activeWorkers > 0) {
+        m_doneCondition.wait(lock);
+    }
+    m_func = NULL;
+    return;
+}
@@ -0,0 +1,90 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * A small pool of worker threads, to run loops of independent
+ * (pure-math) work in parallel.
+ *
+ * The worker threads are created once (per-solve) and re-used for
+ * each call to 'parallelFor', so the cost of starting threads is not
+ * paid for each solver iteration.
+ *
+ * This file does not depend on Maya. Functions run by the pool must
+ * not call the Maya API.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_THREAD_POOL_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_THREAD_POOL_H
+
+// STL
+#include <atomic>
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+
+// Get the number of threads to use; a value of zero (or less) means
+// use all hardware threads.
+int getThreadCount(const int threadCount);
+
+
+class ThreadPool {
+public:
+    // 'threadCount' is the total number of threads used, including
+    // the calling thread.
+    explicit ThreadPool(const int threadCount);
+
+    ~ThreadPool();
+
+    int getThreadCount() const;
+
+    // Call 'func(begin, end)' for ranges covering the indices 0 to
+    // 'count' (exclusive), and wait for all to finish.
+    //
+    // The calling thread also runs ranges. Calls must not be nested,
+    // or made from more than one thread at a time.
+    void parallelFor(const int count,
+                     const std::function<void(int, int)> &func);
+
+private:
+    ThreadPool(const ThreadPool &);
+    ThreadPool &operator=(const ThreadPool &);
+
+    void runRanges();
+
+    void workerLoop();
+
+    std::vector<std::thread> m_workers;
+    std::mutex m_mutex;
+    std::condition_variable m_workCondition;
+    std::condition_variable m_doneCondition;
+    bool m_stop;
+    unsigned int m_generation;
+    int m_activeWorkers;
+
+    // The current 'parallelFor' job.
+    const std::function<void(int, int)> *m_func;
+    int m_count;
+    int m_rangeSize;
+    std::atomic<int> m_nextIndex;
+};
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_THREAD_POOL_H
@@ -0,0 +1,105 @@
+/*
+ * Copyright (C) 2019 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Solver options, results and timers, used by all bundle adjustment
+ * algorithms.
+ *
+ * This file does not depend on Maya, and is shared by the Maya
+ * plug-in and the Maya-independent core solver library.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_TYPES_H
+#define MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_TYPES_H
+
+// STL
+#include <string>
+#include <utility>
+
+// Utils
+#include <utilities/debugUtils.h>
+
+typedef std::pair<int, std::string> SolverTypePair;
+
+
+// Group all the benchmark timers together.
+struct SolverTimer {
+    debug::TimestampBenchmark solveBenchTimer;
+    debug::TimestampBenchmark jacBenchTimer;
+    debug::TimestampBenchmark funcBenchTimer;
+    debug::TimestampBenchmark errorBenchTimer;
+    debug::TimestampBenchmark paramBenchTimer;
+
+    debug::CPUBenchmark solveBenchTicks;
+    debug::CPUBenchmark jacBenchTicks;
+    debug::CPUBenchmark funcBenchTicks;
+    debug::CPUBenchmark errorBenchTicks;
+    debug::CPUBenchmark paramBenchTicks;
+};
+
+
+struct SolverOptions {
+    int iterMax;
+    double tau;
+    double eps1;
+    double eps2;
+    double eps3;
+    double delta;
+    int autoDiffType;
+    int autoParamScale;
+    int robustLossType;
+    double robustLossScale;
+    int solverType;
+    int timeEvalMode;
+    bool acceptOnlyBetter;
+
+    // Number of threads used to compute Marker re-projection errors.
+    int threadCount;
+
+    // Use analytic derivatives (when supported) to compute the
+    // Jacobian, other parameters use 'autoDiffType'.
+    bool analyticJacobian;
+
+    // Auto-adjust the input solve objects before solving?
+    bool removeUnusedMarkers;
+    bool removeUnusedAttributes;
+
+    // All the different supported features by the currently active
+    // solver type.
+    bool solverSupportsAutoDiffForward;
+    bool solverSupportsAutoDiffCentral;
+    bool solverSupportsParameterBounds;
+    bool solverSupportsRobustLoss;
+};
+
+
+struct SolverResult {
+    bool success;
+    double errorAvg;
+    double errorMin;
+    double errorMax;
+    int reason_number;
+    std::string reason;
+    int iterations;
+    int functionEvals;
+    int jacobianEvals;
+    double errorFinal;
+};
+
+#endif // MAYA_MM_SOLVER_CORE_BUNDLE_ADJUST_TYPES_H
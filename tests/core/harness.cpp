@@ -0,0 +1,541 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Stand-alone benchmark harness for the core bundle adjustment
+ * library, without Maya.
+ *
+ * A synthetic scene is created, the solved attributes are perturbed,
+ * and the errors, Jacobian and (if the solver type is available) a
+ * full solve are timed. The Schur complement solver ('--solver-type
+ * 3') is always available.
+ *
+ * With '--thread-scaling' the marker errors are measured with 1, 2,
+ * 4, ... threads (up to '--threads', or the number of hardware
+ * threads), and the speed-up over a single thread is printed.
+ *
+ * The camera and bundle frames evaluated during the solve, and
+ * re-used from the frame data cache, are counted.
+ *
+ * The Jacobian is timed with analytic derivatives and with finite
+ * differences, and the speed-up of the analytic Jacobian is
+ * printed. With '--finite-differences' the solve uses finite
+ * differences for the Jacobian, and with '--central-differences' it
+ * uses central finite differences.
+ *
+ * With '--outliers' a fraction of the (marker, frame) pairs are moved
+ * by '--outlier-distance' pixels, and the solve is compared with each
+ * robust loss function (with '--robust-loss-scale'); the solve time,
+ * iterations and the difference to the true attribute values are
+ * printed. '--robust-loss' sets the loss function of the main solve.
+ *
+ * With '--components' the problem is also solved as independent
+ * connected components (for example, each frame of a camera solve,
+ * or each bundle of a bundle solve), with a single thread and with
+ * '--threads' threads, and the speed-up over solving the whole
+ * problem is printed.
+ *
+ * Usage:
+ *   mmSolverCoreHarness [--frames N] [--bundles N] [--solve bundles|camera|all]
+ *                       [--solver-type N] [--iterations N] [--noise PIXELS]
+ *                       [--repeat N] [--seed N] [--threads N]
+ *                       [--thread-scaling] [--finite-differences]
+ *                       [--central-differences]
+ *                       [--outliers FRACTION] [--outlier-distance PIXELS]
+ *                       [--robust-loss N] [--robust-loss-scale PIXELS]
+ *                       [--components] [--verbose]
+ */
+
+// STL
+#include <cstdlib>
+#include <iostream>
+#include <string>
+#include <vector>
+
+// Utils
+#include <utilities/debugUtils.h>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_problemSolve.h>
+#include <core/bundleAdjust_threadPool.h>
+#include "syntheticScene.h"
+
+
+struct HarnessOptions {
+    SyntheticSceneOptions scene;
+    std::string solve;
+    int solverType;
+    int iterations;
+    int repeat;
+    int threads;
+    bool threadScaling;
+    bool finiteDifferences;
+    bool centralDifferences;
+    double outliers;
+    double outlierDistance;
+    int robustLossType;
+    double robustLossScale;
+    bool components;
+    bool verbose;
+};
+
+
+static void printUsage() {
+    std::cerr << "Usage: mmSolverCoreHarness"
+              << " [--frames N] [--bundles N] [--solve bundles|camera|all]"
+              << " [--solver-type N] [--iterations N] [--noise PIXELS]"
+              << " [--repeat N] [--seed N] [--threads N]"
+              << " [--thread-scaling] [--finite-differences]"
+              << " [--central-differences]"
+              << " [--outliers FRACTION] [--outlier-distance PIXELS]"
+              << " [--robust-loss N] [--robust-loss-scale PIXELS]"
+              << " [--components] [--verbose]\n";
+}
+
+
+static bool parseArguments(int argc, char **argv, HarnessOptions &options) {
+    setSyntheticSceneOptionDefaults(options.scene);
+    options.scene.numberOfFrames = 100;
+    options.scene.numberOfBundles = 50;
+    options.solve = "bundles";
+    options.solverType = SOLVER_TYPE_DEFAULT_VALUE;
+    options.iterations = -1;
+    options.repeat = 10;
+    options.threads = THREAD_COUNT_DEFAULT_VALUE;
+    options.threadScaling = false;
+    options.finiteDifferences = false;
+    options.centralDifferences = false;
+    options.outliers = 0.0;
+    options.outlierDistance = 100.0;
+    options.robustLossType = ROBUST_LOSS_TYPE_TRIVIAL;
+    options.robustLossScale = 20.0;
+    options.components = false;
+    options.verbose = false;
+    for (int i = 1; i < argc; ++i) {
+        const std::string arg(argv[i]);
+        const bool hasValue = (i + 1) < argc;
+        if (arg == "--verbose") {
+            options.verbose = true;
+        } else if (arg == "--thread-scaling") {
+            options.threadScaling = true;
+        } else if (arg == "--finite-differences") {
+            options.finiteDifferences = true;
+        } else if (arg == "--central-differences") {
+            options.finiteDifferences = true;
+            options.centralDifferences = true;
+        } else if (arg == "--components") {
+            options.components = true;
+        } else if (arg == "--help" || arg == "-h") {
+            return false;
+        } else if (!hasValue) {
+            ERR("Missing value for argument; arg=" << arg);
+            return false;
+        } else if (arg == "--frames") {
+            options.scene.numberOfFrames = std::atoi(argv[++i]);
+        } else if (arg == "--bundles") {
+            options.scene.numberOfBundles = std::atoi(argv[++i]);
+        } else if (arg == "--seed") {
+            options.scene.seed = static_cast<unsigned int>(std::atoi(argv[++i]));
+        } else if (arg == "--noise") {
+            options.scene.markerNoise = std::atof(argv[++i]);
+        } else if (arg == "--solve") {
+            options.solve = argv[++i];
+        } else if (arg == "--solver-type") {
+            options.solverType = std::atoi(argv[++i]);
+        } else if (arg == "--iterations") {
+            options.iterations = std::atoi(argv[++i]);
+        } else if (arg == "--repeat") {
+            options.repeat = std::atoi(argv[++i]);
+        } else if (arg == "--threads") {
+            options.threads = std::atoi(argv[++i]);
+        } else if (arg == "--outliers") {
+            options.outliers = std::atof(argv[++i]);
+        } else if (arg == "--outlier-distance") {
+            options.outlierDistance = std::atof(argv[++i]);
+        } else if (arg == "--robust-loss") {
+            options.robustLossType = std::atoi(argv[++i]);
+        } else if (arg == "--robust-loss-scale") {
+            options.robustLossScale = std::atof(argv[++i]);
+        } else {
+            ERR("Invalid argument; arg=" << arg);
+            return false;
+        }
+    }
+    if (options.scene.numberOfFrames < 1 || options.scene.numberOfBundles < 1
+        || options.repeat < 1) {
+        ERR("Frames, bundles and repeat must be at least 1.");
+        return false;
+    }
+    return true;
+}
+
+
+// Time measuring all marker errors with an increasing number of
+// threads, up to 'maxThreadCount'.
+static void benchmarkThreadScaling(Scene &scene,
+                                   const SceneAttrList &attrList,
+                                   const int maxThreadCount,
+                                   const int repeat) {
+    std::vector<int> threadCounts;
+    for (int threadCount = 1; threadCount < maxThreadCount; threadCount *= 2) {
+        threadCounts.push_back(threadCount);
+    }
+    threadCounts.push_back(maxThreadCount);
+
+    double singleThreadSeconds = 0.0;
+    for (size_t i = 0; i < threadCounts.size(); ++i) {
+        SceneProblem problem(scene, attrList, threadCounts[i]);
+        const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+        std::vector<bool> markerErrorMeasurements(numberOfMarkers, true);
+        std::vector<double> errorList(problem.getNumberOfErrors(), 0.0);
+        std::vector<double> errorDistanceList(numberOfMarkers, 0.0);
+
+        debug::TimestampBenchmark timer;
+        for (int j = 0; j < repeat; ++j) {
+            problem.clearFrameDataCache();
+            timer.start();
+            problem.measureErrors(markerErrorMeasurements,
+                                  &errorList[0],
+                                  &errorDistanceList[0]);
+            timer.stop();
+        }
+        const double seconds = timer.get_seconds(repeat);
+        if (i == 0) {
+            singleThreadSeconds = seconds;
+        }
+        std::cout << "Measure Errors Threads: " << problem.getThreadCount()
+                  << " Time (per-loop): " << seconds << " seconds"
+                  << " Speed-up: " << (singleThreadSeconds / seconds) << '\n';
+    }
+}
+
+
+// Print the number of camera and bundle frames evaluated, and
+// re-used from the cache.
+static void printFrameDataCacheCounts(const FrameDataCache &cache) {
+    const int cameraFrameTotal = cache.cameraFrameEvaluations + cache.cameraFrameCacheHits;
+    const int bundleFrameTotal = cache.bundleFrameEvaluations + cache.bundleFrameCacheHits;
+    std::cout << "Camera Frames Evaluated: " << cache.cameraFrameEvaluations
+              << " of " << cameraFrameTotal
+              << " (cache hits: " << cache.cameraFrameCacheHits << ")\n";
+    std::cout << "Bundle Frames Evaluated: " << cache.bundleFrameEvaluations
+              << " of " << bundleFrameTotal
+              << " (cache hits: " << cache.bundleFrameCacheHits << ")\n";
+}
+
+
+// Time evaluating the Jacobian matrix, with analytic derivatives or
+// finite differences; returns the seconds per evaluation.
+static double benchmarkJacobian(SceneProblem &problem,
+                                SolverOptions solverOptions,
+                                const bool analyticJacobian,
+                                const int repeat) {
+    solverOptions.analyticJacobian = analyticJacobian;
+    ProblemSolverData userData;
+    initProblemSolverData(problem, solverOptions, false, userData);
+    std::vector<double> paramList;
+    getProblemInitialParameters(userData, paramList);
+
+    const int n = static_cast<int>(paramList.size());
+    const int m = problem.getNumberOfErrors();
+    std::vector<double> errorList(m, 0.0);
+    std::vector<double> jacobianList(userData.jacobianList.size(), 0.0);
+
+    problem.clearFrameDataCache();
+    userData.isNormalCall = true;
+    userData.isJacobianCall = false;
+    userData.doCalcJacobian = false;
+    problemSolveFunc(n, m, &paramList[0], &errorList[0], NULL, &userData);
+
+    debug::TimestampBenchmark jacobianTimer;
+    userData.isNormalCall = false;
+    userData.isJacobianCall = true;
+    userData.doCalcJacobian = true;
+    for (int i = 0; i < repeat; ++i) {
+        jacobianTimer.start();
+        problemSolveFunc(n, m, &paramList[0], &errorList[0],
+                         &jacobianList[0], &userData);
+        jacobianTimer.stop();
+    }
+    std::cout << "Jacobian " << (analyticJacobian ? "Analytic" : "Finite Differences")
+              << " Parameter Groups: " << userData.paramGroupList.size()
+              << " Evaluations: " << (userData.jacIterNum / repeat) << '\n';
+    jacobianTimer.print("Jacobian", repeat);
+    printFrameDataCacheCounts(problem.getFrameDataCache());
+
+    // Restore the initial parameters.
+    setProblemParameters(n, &paramList[0], &userData);
+    return jacobianTimer.get_seconds(repeat);
+}
+
+
+// Solve the scene with each robust loss function, and print the
+// solve time, iterations and the difference to the true attribute
+// values.
+static void compareRobustLoss(const Scene &initialScene,
+                              const Scene &expectedScene,
+                              const SceneAttrList &attrList,
+                              const SolverOptions &solverOptions,
+                              const double robustLossScale,
+                              const int threads) {
+    const int lossTypes[] = {
+        ROBUST_LOSS_TYPE_TRIVIAL,
+        ROBUST_LOSS_TYPE_SOFT_L_ONE,
+        ROBUST_LOSS_TYPE_CAUCHY,
+        ROBUST_LOSS_TYPE_HUBER,
+        ROBUST_LOSS_TYPE_TUKEY
+    };
+    const char *lossNames[] = {
+        "Trivial", "Soft L1", "Cauchy", "Huber", "Tukey"
+    };
+    std::cout << "Robust Loss Comparison (scale " << robustLossScale << "):\n";
+    std::cout << "Initial deviation: "
+              << computeSceneAttrDeviation(attrList, initialScene, expectedScene)
+              << '\n';
+    for (int t = 0; t < 5; ++t) {
+        Scene scene = initialScene;
+        SceneProblem problem(scene, attrList, threads);
+        SolverOptions lossOptions = solverOptions;
+        lossOptions.robustLossType = lossTypes[t];
+        lossOptions.robustLossScale = robustLossScale;
+        // Outliers increase the least squares error, so each solve is
+        // accepted, to be compared.
+        lossOptions.acceptOnlyBetter = false;
+
+        SolverResult solverResult;
+        debug::TimestampBenchmark solveTimer;
+        solveTimer.start();
+        solveProblem(lossOptions, problem, false, solverResult);
+        solveTimer.stop();
+        std::cout << "  " << lossNames[t]
+                  << ": seconds " << solveTimer.get_seconds()
+                  << " iterations " << solverResult.iterations
+                  << " function evals " << solverResult.functionEvals
+                  << " error avg " << solverResult.errorAvg
+                  << " deviation "
+                  << computeSceneAttrDeviation(attrList, scene, expectedScene)
+                  << '\n';
+    }
+}
+
+
+// Solve the scene as independent connected components, with a
+// single thread and with 'threads' threads, and print the solve time
+// and the speed-up over solving the whole problem.
+static void compareComponents(const Scene &initialScene,
+                              const Scene &expectedScene,
+                              const SceneAttrList &attrList,
+                              const SolverOptions &solverOptions,
+                              const double wholeSeconds,
+                              const int threads) {
+    Scene wholeScene = initialScene;
+    SceneProblem wholeProblem(wholeScene, attrList, 1);
+    BoolList2D errorToParamList;
+    BoolList2D otherErrorToParamList;
+    wholeProblem.getErrorToParameterRelationship(errorToParamList);
+    wholeProblem.getOtherErrorToParameterRelationship(otherErrorToParamList);
+    IndexList2D paramToErrorIndexList;
+    findParameterToErrorIndexList(wholeProblem.getNumberOfParameters(),
+                                  errorToParamList,
+                                  otherErrorToParamList,
+                                  paramToErrorIndexList);
+    IndexList2D componentParamList;
+    IndexList2D componentErrorList;
+    findParameterComponents(wholeProblem.getNumberOfErrors(),
+                            paramToErrorIndexList,
+                            componentParamList,
+                            componentErrorList);
+    std::cout << "Components: " << componentParamList.size() << '\n';
+
+    const int threadCounts[] = {1, getThreadCount(threads)};
+    for (int t = 0; t < 2; ++t) {
+        Scene scene = initialScene;
+        SceneProblem problem(scene, attrList, threadCounts[t]);
+        SolverOptions componentOptions = solverOptions;
+        componentOptions.threadCount = threadCounts[t];
+
+        SolverResult solverResult;
+        debug::TimestampBenchmark solveTimer;
+        solveTimer.start();
+        solveProblemComponents(componentOptions, problem, false, solverResult);
+        solveTimer.stop();
+        const double seconds = solveTimer.get_seconds();
+        std::cout << "  Components Threads: " << threadCounts[t]
+                  << ": seconds " << seconds
+                  << " speed-up " << (wholeSeconds / seconds)
+                  << " success " << solverResult.success
+                  << " iterations " << solverResult.iterations
+                  << " error avg " << solverResult.errorAvg
+                  << " deviation "
+                  << computeSceneAttrDeviation(attrList, scene, expectedScene)
+                  << '\n';
+    }
+}
+
+
+int main(int argc, char **argv) {
+    HarnessOptions options;
+    if (!parseArguments(argc, argv, options)) {
+        printUsage();
+        return 1;
+    }
+
+    Scene scene;
+    createSyntheticScene(options.scene, scene);
+    if (options.outliers > 0.0) {
+        addSyntheticSceneOutliers(options.outliers, options.outlierDistance,
+                                  options.scene.seed + 2, scene);
+    }
+    Scene expectedScene = scene;
+
+    SceneAttrList attrList;
+    if (options.solve == "bundles" || options.solve == "all") {
+        createBundleAttrs(scene, attrList);
+    }
+    if (options.solve == "camera" || options.solve == "all") {
+        createCameraAttrs(scene, 0, attrList);
+    }
+    if (attrList.empty()) {
+        ERR("Invalid solve type; value=" << options.solve);
+        printUsage();
+        return 1;
+    }
+    perturbSceneAttrs(attrList, 1.0, options.scene.seed + 1, scene);
+    Scene initialScene = scene;
+    if (options.threadScaling) {
+        benchmarkThreadScaling(scene, attrList,
+                               getThreadCount(options.threads),
+                               options.repeat);
+    }
+    SceneProblem problem(scene, attrList, options.threads);
+
+    SolverOptions solverOptions;
+    setProblemSolverOptionDefaults(options.solverType, solverOptions);
+    if (options.iterations > 0) {
+        solverOptions.iterMax = options.iterations;
+    }
+    if (options.finiteDifferences) {
+        solverOptions.analyticJacobian = false;
+    }
+    if (options.centralDifferences) {
+        if (!solverOptions.solverSupportsAutoDiffCentral) {
+            ERR("Solver type does not support central differences; "
+                << "solverType=" << options.solverType);
+            return 1;
+        }
+        solverOptions.autoDiffType = AUTO_DIFF_TYPE_CENTRAL;
+    }
+    solverOptions.robustLossType = options.robustLossType;
+    solverOptions.robustLossScale = options.robustLossScale;
+
+    const int n = problem.getNumberOfParameters();
+    const int m = problem.getNumberOfErrors();
+    const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    std::cout << "Frames: " << options.scene.numberOfFrames
+              << " Bundles: " << options.scene.numberOfBundles
+              << " Solve: " << options.solve << '\n';
+    std::cout << "Parameters: " << n
+              << " Errors: " << m
+              << " Markers: " << numberOfMarkers
+              << " Threads: " << problem.getThreadCount() << '\n';
+
+    // Benchmark the error evaluation.
+    {
+        ProblemSolverData userData;
+        initProblemSolverData(problem, solverOptions, false, userData);
+        std::vector<double> paramList;
+        getProblemInitialParameters(userData, paramList);
+        std::vector<double> errorList(m, 0.0);
+
+        debug::TimestampBenchmark errorTimer;
+        userData.isNormalCall = true;
+        userData.isJacobianCall = false;
+        userData.doCalcJacobian = false;
+        for (int i = 0; i < options.repeat; ++i) {
+            problem.clearFrameDataCache();
+            errorTimer.start();
+            problemSolveFunc(n, m, &paramList[0], &errorList[0], NULL, &userData);
+            errorTimer.stop();
+        }
+        errorTimer.print("Measure Errors", options.repeat);
+
+        // Restore the initial parameters.
+        setProblemParameters(n, &paramList[0], &userData);
+    }
+
+    // Benchmark the Jacobian evaluation.
+    if ((solverOptions.solverType == SOLVER_TYPE_CMINPACK_LMDER)
+        || (solverOptions.solverType == SOLVER_TYPE_SCHUR_LM)) {
+        const double analyticSeconds = benchmarkJacobian(
+            problem, solverOptions, true, options.repeat);
+        const double finiteSeconds = benchmarkJacobian(
+            problem, solverOptions, false, options.repeat);
+        std::cout << "Jacobian Analytic Speed-up: "
+                  << (finiteSeconds / analyticSeconds) << '\n';
+    }
+
+    // Solve the problem, if a solver is available.
+    std::vector<SolverTypePair> solverTypes = getProblemSolverTypes();
+    bool solverFound = false;
+    for (size_t i = 0; i < solverTypes.size(); ++i) {
+        if (solverTypes[i].first == options.solverType) {
+            solverFound = true;
+        }
+    }
+    if (!solverFound) {
+        WRN("Solver type is not available in this build, skipping solve; "
+            << "solverType=" << options.solverType);
+        return 0;
+    }
+
+    SolverResult solverResult;
+    debug::TimestampBenchmark solveTimer;
+    problem.clearFrameDataCache();
+    solveTimer.start();
+    bool ok = solveProblem(solverOptions, problem, options.verbose, solverResult);
+    solveTimer.stop();
+    solveTimer.print("Solve", 1);
+    printFrameDataCacheCounts(problem.getFrameDataCache());
+    std::cout << "Success: " << solverResult.success
+              << " Reason: " << solverResult.reason << '\n';
+    std::cout << "Iterations: " << solverResult.iterations
+              << " Function Evals: " << solverResult.functionEvals
+              << " Jacobian Evals: " << solverResult.jacobianEvals << '\n';
+    std::cout << "Error avg: " << solverResult.errorAvg
+              << " min: " << solverResult.errorMin
+              << " max: " << solverResult.errorMax << '\n';
+    std::cout << "Deviation: "
+              << computeSceneAttrDeviation(attrList, scene, expectedScene) << '\n';
+
+    if (options.components) {
+        compareComponents(initialScene, expectedScene, attrList,
+                          solverOptions, solveTimer.get_seconds(),
+                          options.threads);
+    }
+
+    if (solverOptions.solverSupportsRobustLoss && (options.outliers > 0.0)) {
+        compareRobustLoss(initialScene, expectedScene, attrList,
+                          solverOptions, options.robustLossScale,
+                          options.threads);
+    }
+    return ok ? 0 : 1;
+}
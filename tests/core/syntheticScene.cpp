@@ -0,0 +1,235 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Deterministic synthetic scenes for the core library tests and
+ * harness.
+ */
+
+// STL
+#include <cmath>
+#include <random>
+#include <limits>
+
+// Local
+#include <core/bundleAdjust_scene.h>
+#include "syntheticScene.h"
+
+
+void setSyntheticSceneOptionDefaults(SyntheticSceneOptions &options) {
+    options.numberOfFrames = 10;
+    options.numberOfBundles = 20;
+    options.seed = 42;
+    options.markerNoise = 0.0;
+}
+
+
+void createSyntheticScene(const SyntheticSceneOptions &options,
+                          Scene &scene) {
+    std::mt19937 generator(options.seed);
+    std::uniform_real_distribution<double> bundleXY(-40.0, 40.0);
+    std::uniform_real_distribution<double> bundleZ(-160.0, -60.0);
+    std::normal_distribution<double> noise(0.0, 1.0);
+
+    const int numberOfFrames = options.numberOfFrames;
+    scene.numberOfFrames = numberOfFrames;
+
+    // A 35mm lens on a 36mm x 24mm film back.
+    SceneCamera camera;
+    camera.imageWidth = 1920.0;
+    camera.imageHeight = 1280.0;
+    camera.filmFit = SCENE_FILM_FIT_HORIZONTAL;
+    camera.nearClipPlane = 0.1;
+    camera.farClipPlane = 10000.0;
+    camera.cameraScale = 1.0;
+    camera.frames.resize(numberOfFrames);
+    for (int i = 0; i < numberOfFrames; ++i) {
+        const double t = static_cast<double>(i);
+        CameraFrame &frame = camera.frames[i];
+        frame.translate[0] = -10.0 + (2.0 * t);
+        frame.translate[1] = 5.0 + (0.25 * t);
+        frame.translate[2] = 0.5 * t;
+        frame.rotate[0] = -2.0;
+        frame.rotate[1] = -5.0 + (1.0 * t);
+        frame.rotate[2] = 0.0;
+        frame.focalLength = 35.0;
+        frame.filmBackWidth = 36.0 / 25.4;
+        frame.filmBackHeight = 24.0 / 25.4;
+        frame.filmOffsetX = 0.0;
+        frame.filmOffsetY = 0.0;
+    }
+    scene.cameras.clear();
+    scene.cameras.push_back(camera);
+
+    scene.bundles.clear();
+    scene.bundles.resize(options.numberOfBundles);
+    for (int i = 0; i < options.numberOfBundles; ++i) {
+        const double x = bundleXY(generator);
+        const double y = bundleXY(generator);
+        const double z = bundleZ(generator);
+        SceneBundle &bundle = scene.bundles[i];
+        bundle.frames.resize(numberOfFrames);
+        for (int j = 0; j < numberOfFrames; ++j) {
+            bundle.frames[j].translate[0] = x;
+            bundle.frames[j].translate[1] = y;
+            bundle.frames[j].translate[2] = z;
+        }
+    }
+
+    // Markers are the projection of the bundles.
+    const int cameraIndex = 0;
+    const double noiseScale = options.markerNoise / camera.imageWidth;
+    scene.markers.clear();
+    scene.markers.resize(options.numberOfBundles);
+    for (int i = 0; i < options.numberOfBundles; ++i) {
+        SceneMarker &marker = scene.markers[i];
+        marker.cameraIndex = cameraIndex;
+        marker.bundleIndex = i;
+        marker.frames.resize(numberOfFrames);
+        for (int j = 0; j < numberOfFrames; ++j) {
+            const CameraFrame &cameraFrame = camera.frames[j];
+            Matrix44 worldProjectionMatrix;
+            computeCameraWorldProjectionMatrix(camera, j, worldProjectionMatrix);
+            const double filmBackInvAspect =
+                cameraFrame.filmBackHeight / cameraFrame.filmBackWidth;
+
+            MarkerFrame &markerFrame = marker.frames[j];
+            projectPoint(worldProjectionMatrix, filmBackInvAspect,
+                         scene.bundles[i].frames[j].translate,
+                         markerFrame.x, markerFrame.y);
+            if (noiseScale > 0.0) {
+                markerFrame.x += noise(generator) * noiseScale;
+                markerFrame.y += noise(generator) * noiseScale;
+            }
+            markerFrame.weight = 1.0;
+            markerFrame.enable = true;
+        }
+    }
+    return;
+}
+
+
+SceneAttr createSceneAttr(const int objectType,
+                          const int objectIndex,
+                          const int attrType,
+                          const bool animated) {
+    SceneAttr attr;
+    attr.objectType = objectType;
+    attr.objectIndex = objectIndex;
+    attr.attrType = attrType;
+    attr.animated = animated;
+    attr.minValue = -std::numeric_limits<float>::max();
+    attr.maxValue = std::numeric_limits<float>::max();
+    attr.offset = 0.0;
+    attr.scale = 1.0;
+    attr.stiffnessWeight = 0.0;
+    attr.stiffnessVariance = 1.0;
+    attr.stiffnessValue = 0.0;
+    attr.smoothnessWeight = 0.0;
+    attr.smoothnessVariance = 1.0;
+    attr.smoothnessValue = 0.0;
+    return attr;
+}
+
+
+void createBundleAttrs(const Scene &scene, SceneAttrList &attrList) {
+    for (int i = 0; i < static_cast<int>(scene.bundles.size()); ++i) {
+        for (int j = SCENE_ATTR_TYPE_TRANSLATE_X; j <= SCENE_ATTR_TYPE_TRANSLATE_Z; ++j) {
+            attrList.push_back(createSceneAttr(SCENE_OBJECT_TYPE_BUNDLE, i, j, false));
+        }
+    }
+    return;
+}
+
+
+void createCameraAttrs(const Scene &scene,
+                       const int cameraIndex,
+                       SceneAttrList &attrList) {
+    (void) scene;
+    for (int j = SCENE_ATTR_TYPE_TRANSLATE_X; j <= SCENE_ATTR_TYPE_ROTATE_Z; ++j) {
+        attrList.push_back(createSceneAttr(SCENE_OBJECT_TYPE_CAMERA, cameraIndex, j, true));
+    }
+    return;
+}
+
+
+void perturbSceneAttrs(const SceneAttrList &attrList,
+                       const double amount,
+                       const unsigned int seed,
+                       Scene &scene) {
+    std::mt19937 generator(seed);
+    std::uniform_real_distribution<double> offset(-amount, amount);
+    for (size_t i = 0; i < attrList.size(); ++i) {
+        const SceneAttr &attr = attrList[i];
+        if (attr.animated) {
+            for (int j = 0; j < scene.numberOfFrames; ++j) {
+                double value = getSceneAttrValue(scene, attr, j);
+                setSceneAttrValue(scene, attr, j, value + offset(generator));
+            }
+        } else {
+            double value = getSceneAttrValue(scene, attr, -1);
+            setSceneAttrValue(scene, attr, -1, value + offset(generator));
+        }
+    }
+    return;
+}
+
+
+void addSyntheticSceneOutliers(const double fraction,
+                               const double distance,
+                               const unsigned int seed,
+                               Scene &scene) {
+    std::mt19937 generator(seed);
+    std::uniform_real_distribution<double> chance(0.0, 1.0);
+    for (size_t i = 0; i < scene.markers.size(); ++i) {
+        SceneMarker &marker = scene.markers[i];
+        const double imageWidth = scene.cameras[marker.cameraIndex].imageWidth;
+        const double offset = distance / imageWidth;
+        for (size_t j = 0; j < marker.frames.size(); ++j) {
+            if (chance(generator) >= fraction) {
+                continue;
+            }
+            const double sign = (chance(generator) < 0.5) ? -1.0 : 1.0;
+            marker.frames[j].x += offset * sign;
+            marker.frames[j].y += offset * sign * chance(generator);
+        }
+    }
+    return;
+}
+
+
+double computeSceneAttrDeviation(const SceneAttrList &attrList,
+                                 const Scene &scene,
+                                 const Scene &expectedScene) {
+    double deviation = 0.0;
+    int count = 0;
+    for (size_t i = 0; i < attrList.size(); ++i) {
+        const SceneAttr &attr = attrList[i];
+        const int numberOfFrames = attr.animated ? scene.numberOfFrames : 1;
+        for (int j = 0; j < numberOfFrames; ++j) {
+            const int frameIndex = attr.animated ? j : -1;
+            deviation += std::fabs(getSceneAttrValue(scene, attr, frameIndex)
+                                   - getSceneAttrValue(expectedScene, attr, frameIndex));
+            ++count;
+        }
+    }
+    if (count == 0) {
+        return 0.0;
+    }
+    return deviation / static_cast<double>(count);
+}
@@ -0,0 +1,96 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Deterministic synthetic scenes for the core library tests and
+ * harness.
+ *
+ * A single camera moves (translating and panning) across the frames,
+ * looking at bundles randomly placed in front of it. Markers are the
+ * exact re-projection of the bundles, with optional noise added.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_TESTS_CORE_SYNTHETIC_SCENE_H
+#define MAYA_MM_SOLVER_TESTS_CORE_SYNTHETIC_SCENE_H
+
+// Local
+#include <core/bundleAdjust_scene.h>
+
+
+struct SyntheticSceneOptions {
+    int numberOfFrames;
+    int numberOfBundles;
+    unsigned int seed;
+
+    // Standard deviation of the noise added to the markers, in
+    // pixels.
+    double markerNoise;
+};
+
+
+void setSyntheticSceneOptionDefaults(SyntheticSceneOptions &options);
+
+
+// Create a scene where the markers exactly match the bundles.
+void createSyntheticScene(const SyntheticSceneOptions &options,
+                          Scene &scene);
+
+
+// Create a SceneAttr with no bounds, stiffness or smoothness.
+SceneAttr createSceneAttr(const int objectType,
+                          const int objectIndex,
+                          const int attrType,
+                          const bool animated);
+
+
+// Static translate attributes of all bundles.
+void createBundleAttrs(const Scene &scene, SceneAttrList &attrList);
+
+
+// Animated translate and rotate attributes of the camera.
+void createCameraAttrs(const Scene &scene,
+                       const int cameraIndex,
+                       SceneAttrList &attrList);
+
+
+// Add a deterministic random offset to each attribute value, on each
+// frame.
+void perturbSceneAttrs(const SceneAttrList &attrList,
+                       const double amount,
+                       const unsigned int seed,
+                       Scene &scene);
+
+
+// Move a fraction of the (marker, frame) pairs by a distance (in
+// pixels) in a random direction, so the markers no longer match the
+// bundles; outliers for robust loss functions.
+void addSyntheticSceneOutliers(const double fraction,
+                               const double distance,
+                               const unsigned int seed,
+                               Scene &scene);
+
+
+// Average absolute difference of attribute values between two
+// scenes, on each frame of animated attributes.
+double computeSceneAttrDeviation(const SceneAttrList &attrList,
+                                 const Scene &scene,
+                                 const Scene &expectedScene);
+
+
+#endif // MAYA_MM_SOLVER_TESTS_CORE_SYNTHETIC_SCENE_H
@@ -0,0 +1,75 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Minimal test macros for the core library tests, so the tests need
+ * no other dependencies.
+ *
+ * Each test executable returns non-zero if any check failed, so it
+ * can be run with 'ctest'.
+ */
+
+
+#ifndef MAYA_MM_SOLVER_TESTS_CORE_TEST_UTILS_H
+#define MAYA_MM_SOLVER_TESTS_CORE_TEST_UTILS_H
+
+// STL
+#include <cmath>
+#include <iostream>
+
+
+static int g_testFailures = 0;
+
+
+#define TEST_CHECK(x)                                                   \
+    do {                                                                \
+        if (!(x)) {                                                     \
+            ++g_testFailures;                                           \
+            std::cerr << __FILE__ << ":" << __LINE__                    \
+                      << ": check failed: " << #x << '\n';              \
+        }                                                               \
+    } while (0)
+
+
+#define TEST_CHECK_NEAR(a, b, tolerance)                                \
+    do {                                                                \
+        const double test_a = (a);                                      \
+        const double test_b = (b);                                      \
+        if (!(std::fabs(test_a - test_b) <= (tolerance))) {             \
+            ++g_testFailures;                                           \
+            std::cerr << __FILE__ << ":" << __LINE__                    \
+                      << ": check failed: " << #a << " == " << #b       \
+                      << " (" << test_a << " != " << test_b             \
+                      << ", tolerance=" << (tolerance) << ")" << '\n';  \
+        }                                                               \
+    } while (0)
+
+
+#define TEST_RUN(func)                                                  \
+    do {                                                                \
+        const int test_failures = g_testFailures;                       \
+        func();                                                         \
+        std::cerr << #func << ": "                                      \
+                  << ((g_testFailures == test_failures) ? "ok" : "FAILED") \
+                  << '\n';                                              \
+    } while (0)
+
+
+#define TEST_RESULT() (g_testFailures > 0 ? 1 : 0)
+
+#endif // MAYA_MM_SOLVER_TESTS_CORE_TEST_UTILS_H
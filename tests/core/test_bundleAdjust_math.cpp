@@ -0,0 +1,176 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test parameter bounds and loss functions.
+ */
+
+// STL
+#include <limits>
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_math.h>
+#include "testUtils.h"
+
+
+void test_parameter_bounds_unbounded() {
+    const double float_max = std::numeric_limits<float>::max();
+    const double values[] = {-1000.0, -1.5, 0.0, 0.25, 42.0};
+    for (int i = 0; i < 5; ++i) {
+        double internal = parameterBoundFromExternalToInternal(
+            values[i], -float_max, float_max, 0.0, 1.0);
+        double external = parameterBoundFromInternalToExternal(
+            internal, -float_max, float_max, 0.0, 1.0);
+        TEST_CHECK_NEAR(external, values[i], 1e-9);
+    }
+}
+
+
+void test_parameter_bounds_lower_and_upper() {
+    const double xmin = -10.0;
+    const double xmax = 25.0;
+    const double values[] = {-9.5, -1.5, 0.0, 0.25, 24.0};
+    for (int i = 0; i < 5; ++i) {
+        double internal = parameterBoundFromExternalToInternal(
+            values[i], xmin, xmax, 0.0, 1.0);
+        double external = parameterBoundFromInternalToExternal(
+            internal, xmin, xmax, 0.0, 1.0);
+        TEST_CHECK_NEAR(external, values[i], 1e-9);
+    }
+
+    // Any internal value must map inside the bounds.
+    for (int i = -50; i <= 50; ++i) {
+        double external = parameterBoundFromInternalToExternal(
+            static_cast<double>(i) * 0.37, xmin, xmax, 0.0, 1.0);
+        TEST_CHECK(external >= xmin);
+        TEST_CHECK(external <= xmax);
+    }
+}
+
+
+void test_parameter_delta() {
+    TEST_CHECK_NEAR(calculateParameterDelta(0.0, 0.1, 1, -1.0, 1.0), 0.1, 1e-12);
+    TEST_CHECK_NEAR(calculateParameterDelta(0.0, 0.1, -1, -1.0, 1.0), -0.1, 1e-12);
+
+    // Near the bounds the delta must step away from the bound.
+    TEST_CHECK_NEAR(calculateParameterDelta(0.95, 0.1, 1, -1.0, 1.0), -0.1, 1e-12);
+    TEST_CHECK_NEAR(calculateParameterDelta(-0.95, 0.1, -1, -1.0, 1.0), 0.1, 1e-12);
+}
+
+
+void test_loss_function_trivial() {
+    std::vector<double> errors;
+    errors.push_back(0.0);
+    errors.push_back(0.5);
+    errors.push_back(-3.0);
+    errors.push_back(100.0);
+    std::vector<double> expected = errors;
+    applyLossFunctionToErrors(static_cast<int>(errors.size()), &errors[0],
+                              ROBUST_LOSS_TYPE_TRIVIAL, 1.0);
+    for (size_t i = 0; i < errors.size(); ++i) {
+        TEST_CHECK_NEAR(errors[i], expected[i], 1e-12);
+    }
+}
+
+
+// The sum of the squared scaled errors is the loss, the scaled errors
+// are never larger than the errors, and the Jacobian scale is the
+// derivative of the scaled error.
+void test_loss_functions() {
+    const int lossTypes[] = {
+        ROBUST_LOSS_TYPE_SOFT_L_ONE,
+        ROBUST_LOSS_TYPE_CAUCHY,
+        ROBUST_LOSS_TYPE_HUBER,
+        ROBUST_LOSS_TYPE_TUKEY
+    };
+    const double lossScale = 2.0;
+    std::vector<double> errors;
+    errors.push_back(0.0);
+    errors.push_back(0.5);
+    errors.push_back(-1.5);
+    errors.push_back(3.0);
+    errors.push_back(100.0);
+    const int count = static_cast<int>(errors.size());
+    for (int t = 0; t < 4; ++t) {
+        std::vector<double> errorScales(count, 0.0);
+        std::vector<double> jacobianScales(count, 0.0);
+        computeLossFunctionScales(count, &errors[0], lossTypes[t], lossScale,
+                                  &errorScales[0], &jacobianScales[0]);
+        std::vector<double> scaledErrors = errors;
+        applyLossFunctionToErrors(count, &scaledErrors[0], lossTypes[t], lossScale);
+        for (int i = 0; i < count; ++i) {
+            const double f = errors[i];
+            TEST_CHECK_NEAR(scaledErrors[i], f * errorScales[i], 1e-12);
+            TEST_CHECK(std::fabs(scaledErrors[i]) <= (std::fabs(f) + 1e-12));
+
+            double rho0 = 0.0;
+            double rho1 = 0.0;
+            double rho2 = 0.0;
+            const double z = (f / lossScale) * (f / lossScale);
+            if (lossTypes[t] == ROBUST_LOSS_TYPE_SOFT_L_ONE) {
+                lossFunctionSoftL1(z, rho0, rho1, rho2);
+            } else if (lossTypes[t] == ROBUST_LOSS_TYPE_CAUCHY) {
+                lossFunctionCauchy(z, rho0, rho1, rho2);
+            } else if (lossTypes[t] == ROBUST_LOSS_TYPE_HUBER) {
+                lossFunctionHuber(z, rho0, rho1, rho2);
+            } else {
+                lossFunctionTukey(z, rho0, rho1, rho2);
+            }
+            const double loss = lossScale * lossScale * rho0;
+            TEST_CHECK_NEAR(scaledErrors[i] * scaledErrors[i], loss,
+                            1e-9 * (1.0 + loss));
+
+            // Central differences of the scaled error.
+            const double h = 1e-6;
+            double errorA = f + h;
+            double errorB = f - h;
+            applyLossFunctionToErrors(1, &errorA, lossTypes[t], lossScale);
+            applyLossFunctionToErrors(1, &errorB, lossTypes[t], lossScale);
+            const double derivative = (errorA - errorB) / (2.0 * h);
+            TEST_CHECK_NEAR(jacobianScales[i], derivative, 1e-5);
+        }
+    }
+
+    // Large errors are reduced; Tukey ignores errors above the scale.
+    double rho0 = 0.0;
+    double rho1 = 0.0;
+    double rho2 = 0.0;
+    lossFunctionTukey(4.0, rho0, rho1, rho2);
+    TEST_CHECK(rho1 == 0.0);
+    std::vector<double> errorScales(count, 0.0);
+    std::vector<double> jacobianScales(count, 0.0);
+    computeLossFunctionScales(count, &errors[0], ROBUST_LOSS_TYPE_TUKEY, lossScale,
+                              &errorScales[0], &jacobianScales[0]);
+    TEST_CHECK(jacobianScales[count - 1] == 0.0);
+    computeLossFunctionScales(count, &errors[0], ROBUST_LOSS_TYPE_CAUCHY, lossScale,
+                              &errorScales[0], &jacobianScales[0]);
+    TEST_CHECK(std::fabs(errors[count - 1] * errorScales[count - 1]) < 10.0);
+    TEST_CHECK(jacobianScales[count - 1] < 0.1);
+}
+
+
+int main() {
+    TEST_RUN(test_parameter_bounds_unbounded);
+    TEST_RUN(test_parameter_bounds_lower_and_upper);
+    TEST_RUN(test_parameter_delta);
+    TEST_RUN(test_loss_function_trivial);
+    TEST_RUN(test_loss_functions);
+    return TEST_RESULT();
+}
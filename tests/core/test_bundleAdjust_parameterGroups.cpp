@@ -0,0 +1,187 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test grouping parameters for the sparse Jacobian.
+ */
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_parameterGroups.h>
+#include "testUtils.h"
+
+
+// Every parameter is in exactly one group, and no two parameters in
+// a group affect the same error.
+static bool isValidParameterGroups(const int numberOfErrors,
+                                   const IndexList2D &paramToErrorIndexList,
+                                   const IndexList2D &paramGroupList) {
+    std::vector<int> paramCount(paramToErrorIndexList.size(), 0);
+    for (size_t i = 0; i < paramGroupList.size(); ++i) {
+        std::vector<bool> errorUsed(numberOfErrors, false);
+        for (size_t j = 0; j < paramGroupList[i].size(); ++j) {
+            const int paramIndex = paramGroupList[i][j];
+            ++paramCount[paramIndex];
+            const std::vector<int> &errorIndexList = paramToErrorIndexList[paramIndex];
+            for (size_t k = 0; k < errorIndexList.size(); ++k) {
+                if (errorUsed[errorIndexList[k]]) {
+                    return false;
+                }
+                errorUsed[errorIndexList[k]] = true;
+            }
+        }
+    }
+    for (size_t i = 0; i < paramCount.size(); ++i) {
+        if (paramCount[i] != 1) {
+            return false;
+        }
+    }
+    return true;
+}
+
+
+void test_parameter_error_indices() {
+    // 3 markers, 3 parameters, and one other error.
+    BoolList2D markerErrorToParamList(3, std::vector<bool>(3, false));
+    markerErrorToParamList[0][0] = true;
+    markerErrorToParamList[1][1] = true;
+    markerErrorToParamList[2][0] = true;
+    markerErrorToParamList[2][2] = true;
+    BoolList2D otherErrorToParamList(1, std::vector<bool>(3, false));
+    otherErrorToParamList[0][1] = true;
+
+    IndexList2D paramToErrorIndexList;
+    findParameterToErrorIndexList(3, markerErrorToParamList,
+                                  otherErrorToParamList,
+                                  paramToErrorIndexList);
+    TEST_CHECK(paramToErrorIndexList.size() == 3);
+    TEST_CHECK(paramToErrorIndexList[0].size() == (2 * ERRORS_PER_MARKER));
+    TEST_CHECK(paramToErrorIndexList[0][0] == 0);
+    TEST_CHECK(paramToErrorIndexList[0][ERRORS_PER_MARKER] == (2 * ERRORS_PER_MARKER));
+    TEST_CHECK(paramToErrorIndexList[1].size() == (ERRORS_PER_MARKER + 1));
+    TEST_CHECK(paramToErrorIndexList[1].back() == (3 * ERRORS_PER_MARKER));
+    TEST_CHECK(paramToErrorIndexList[2].size() == ERRORS_PER_MARKER);
+
+    // Parameter 0 and 2 share marker 2, parameter 1 shares nothing.
+    const int numberOfErrors = (3 * ERRORS_PER_MARKER) + 1;
+    IndexList2D paramGroupList;
+    findParameterGroups(numberOfErrors, paramToErrorIndexList, paramGroupList);
+    TEST_CHECK(paramGroupList.size() == 2);
+    TEST_CHECK(isValidParameterGroups(numberOfErrors, paramToErrorIndexList, paramGroupList));
+}
+
+
+void test_parameter_groups_block_structure() {
+    // Per-frame camera parameters and static bundle parameters, like
+    // a camera and bundle solve.
+    const int numberOfFrames = 20;
+    const int numberOfBundles = 30;
+    const int numberOfCameraAttrs = 6;
+    const int numberOfBundleAttrs = 3;
+    const int numberOfParameters = (numberOfFrames * numberOfCameraAttrs)
+                                   + (numberOfBundles * numberOfBundleAttrs);
+    const int numberOfMarkers = numberOfFrames * numberOfBundles;
+
+    BoolList2D markerErrorToParamList(numberOfMarkers,
+                                      std::vector<bool>(numberOfParameters, false));
+    for (int f = 0; f < numberOfFrames; ++f) {
+        for (int b = 0; b < numberOfBundles; ++b) {
+            std::vector<bool> &paramList = markerErrorToParamList[(f * numberOfBundles) + b];
+            for (int a = 0; a < numberOfCameraAttrs; ++a) {
+                paramList[(f * numberOfCameraAttrs) + a] = true;
+            }
+            for (int a = 0; a < numberOfBundleAttrs; ++a) {
+                paramList[(numberOfFrames * numberOfCameraAttrs)
+                          + (b * numberOfBundleAttrs) + a] = true;
+            }
+        }
+    }
+    BoolList2D otherErrorToParamList;
+
+    IndexList2D paramToErrorIndexList;
+    findParameterToErrorIndexList(numberOfParameters, markerErrorToParamList,
+                                  otherErrorToParamList,
+                                  paramToErrorIndexList);
+    IndexList2D paramGroupList;
+    const int numberOfErrors = numberOfMarkers * ERRORS_PER_MARKER;
+    findParameterGroups(numberOfErrors, paramToErrorIndexList, paramGroupList);
+    TEST_CHECK(isValidParameterGroups(numberOfErrors, paramToErrorIndexList, paramGroupList));
+    TEST_CHECK(paramGroupList.size()
+               == static_cast<size_t>(numberOfCameraAttrs + numberOfBundleAttrs));
+
+    // A parameter that affects nothing is still in a group.
+    paramToErrorIndexList.push_back(std::vector<int>());
+    findParameterGroups(numberOfErrors, paramToErrorIndexList, paramGroupList);
+    TEST_CHECK(isValidParameterGroups(numberOfErrors, paramToErrorIndexList, paramGroupList));
+}
+
+
+void test_parameter_components() {
+    // Parameters 0 and 2 share error 1, parameters 2 and 4 share
+    // error 3, parameters 1 and 3 share error 2. Parameter 5 affects
+    // nothing, and error 5 is affected by nothing.
+    const int numberOfErrors = 6;
+    IndexList2D paramToErrorIndexList(6);
+    paramToErrorIndexList[0].push_back(0);
+    paramToErrorIndexList[0].push_back(1);
+    paramToErrorIndexList[1].push_back(2);
+    paramToErrorIndexList[2].push_back(1);
+    paramToErrorIndexList[2].push_back(3);
+    paramToErrorIndexList[3].push_back(2);
+    paramToErrorIndexList[3].push_back(4);
+    paramToErrorIndexList[4].push_back(3);
+
+    IndexList2D componentParamList;
+    IndexList2D componentErrorList;
+    findParameterComponents(numberOfErrors, paramToErrorIndexList,
+                            componentParamList, componentErrorList);
+    TEST_CHECK(componentParamList.size() == 2);
+    TEST_CHECK(componentErrorList.size() == 2);
+    TEST_CHECK(componentParamList[0].size() == 3);
+    TEST_CHECK(componentParamList[0][0] == 0);
+    TEST_CHECK(componentParamList[0][1] == 2);
+    TEST_CHECK(componentParamList[0][2] == 4);
+    TEST_CHECK(componentErrorList[0].size() == 3);
+    TEST_CHECK(componentErrorList[0][0] == 0);
+    TEST_CHECK(componentErrorList[0][2] == 3);
+    TEST_CHECK(componentParamList[1].size() == 2);
+    TEST_CHECK(componentParamList[1][0] == 1);
+    TEST_CHECK(componentParamList[1][1] == 3);
+    TEST_CHECK(componentErrorList[1].size() == 2);
+    TEST_CHECK(componentErrorList[1][0] == 2);
+    TEST_CHECK(componentErrorList[1][1] == 4);
+
+    // An error shared by both components joins them.
+    paramToErrorIndexList[4].push_back(4);
+    findParameterComponents(numberOfErrors, paramToErrorIndexList,
+                            componentParamList, componentErrorList);
+    TEST_CHECK(componentParamList.size() == 1);
+    TEST_CHECK(componentParamList[0].size() == 5);
+    TEST_CHECK(componentErrorList[0].size() == 5);
+}
+
+
+int main() {
+    TEST_RUN(test_parameter_error_indices);
+    TEST_RUN(test_parameter_groups_block_structure);
+    TEST_RUN(test_parameter_components);
+    return TEST_RESULT();
+}
@@ -0,0 +1,336 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test measuring the errors of a SceneProblem.
+ */
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_problem.h>
+#include "syntheticScene.h"
+#include "testUtils.h"
+
+
+void test_problem_counts() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    SceneProblem problem(scene, attrList);
+
+    const int numberOfBundleParams = options.numberOfBundles * 3;
+    const int numberOfCameraParams = options.numberOfFrames * 6;
+    TEST_CHECK(problem.getNumberOfParameters()
+               == (numberOfBundleParams + numberOfCameraParams));
+    TEST_CHECK(problem.getNumberOfMarkerErrors()
+               == (options.numberOfBundles * options.numberOfFrames * ERRORS_PER_MARKER));
+    TEST_CHECK(problem.getNumberOfErrors() == problem.getNumberOfMarkerErrors());
+
+    // Disabled markers are not measured.
+    scene.markers[0].frames[0].enable = false;
+    scene.markers[1].frames[2].weight = 0.0;
+    SceneProblem problemDisabled(scene, attrList);
+    TEST_CHECK(problemDisabled.getNumberOfMarkerErrors()
+               == (problem.getNumberOfMarkerErrors() - (2 * ERRORS_PER_MARKER)));
+}
+
+
+void test_problem_measure_errors() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    SceneProblem problem(scene, attrList);
+
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    std::vector<bool> measurements(numberOfMarkers, true);
+    std::vector<double> errors(numberOfErrors, -1.0);
+    std::vector<double> distances(numberOfMarkers, -1.0);
+
+    // The markers are exactly on the bundles.
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    for (int i = 0; i < numberOfErrors; ++i) {
+        TEST_CHECK_NEAR(errors[i], 0.0, 1e-6);
+    }
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        TEST_CHECK_NEAR(distances[i], 0.0, 1e-6);
+    }
+
+    // Moving the parameters moves the errors.
+    std::vector<double> values(problem.getNumberOfParameters(), 0.0);
+    for (int i = 0; i < problem.getNumberOfParameters(); ++i) {
+        values[i] = problem.getParameterValue(i) + 1.0;
+    }
+    problem.setParameters(&values[0]);
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        TEST_CHECK(distances[i] > 0.0);
+    }
+
+    // Un-measured pairs are not changed.
+    std::vector<bool> noMeasurements(numberOfMarkers, false);
+    std::vector<double> errorsUnchanged(numberOfErrors, -1.0);
+    problem.measureErrors(noMeasurements, &errorsUnchanged[0], &distances[0]);
+    for (int i = 0; i < numberOfErrors; ++i) {
+        TEST_CHECK(errorsUnchanged[i] == -1.0);
+    }
+}
+
+
+void test_problem_stiffness_error() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    attrList[0].stiffnessWeight = 2.0;
+    attrList[0].stiffnessVariance = 1.0;
+    attrList[0].stiffnessValue = getSceneAttrValue(scene, attrList[0], -1);
+    SceneProblem problem(scene, attrList);
+    TEST_CHECK(problem.getNumberOfErrors() == (problem.getNumberOfMarkerErrors() + 1));
+
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    std::vector<bool> measurements(numberOfMarkers, true);
+    std::vector<double> errors(numberOfErrors, -1.0);
+    std::vector<double> distances(numberOfMarkers, -1.0);
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    TEST_CHECK_NEAR(errors[numberOfErrors - 1], 0.0, 1e-12);
+
+    std::vector<double> values(problem.getNumberOfParameters(), 0.0);
+    for (int i = 0; i < problem.getNumberOfParameters(); ++i) {
+        values[i] = problem.getParameterValue(i);
+    }
+    values[0] += 1.0;
+    problem.setParameters(&values[0]);
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    TEST_CHECK(errors[numberOfErrors - 1] > 0.0);
+}
+
+
+void test_problem_relationship() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 4;
+    options.numberOfBundles = 5;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    SceneProblem problem(scene, attrList);
+
+    BoolList2D errorToParamList;
+    problem.getErrorToParameterRelationship(errorToParamList);
+    const IndexPairList &errorToMarkerList = problem.getErrorToMarkerList();
+    const IndexPairList &paramToAttrList = problem.getParameterToAttrList();
+    TEST_CHECK(errorToParamList.size() == errorToMarkerList.size());
+
+    // Each marker is affected by its bundle (3 parameters) and the
+    // camera on the same frame (6 parameters).
+    for (size_t i = 0; i < errorToParamList.size(); ++i) {
+        int count = 0;
+        for (size_t j = 0; j < errorToParamList[i].size(); ++j) {
+            if (!errorToParamList[i][j]) {
+                continue;
+            }
+            ++count;
+            const SceneAttr &attr = attrList[paramToAttrList[j].first];
+            if (attr.objectType == SCENE_OBJECT_TYPE_BUNDLE) {
+                TEST_CHECK(attr.objectIndex == errorToMarkerList[i].first);
+            } else {
+                TEST_CHECK(paramToAttrList[j].second == errorToMarkerList[i].second);
+            }
+        }
+        TEST_CHECK(count == 9);
+    }
+}
+
+
+// A sub-problem of a single bundle measures the same errors as the
+// whole problem, and changes the same Scene.
+void test_problem_sub_problem() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    attrList[0].stiffnessWeight = 2.0;
+    attrList[0].stiffnessVariance = 1.0;
+    attrList[0].stiffnessValue = getSceneAttrValue(scene, attrList[0], -1) + 0.5;
+    perturbSceneAttrs(attrList, 1.0, 3, scene);
+    SceneProblem problem(scene, attrList);
+
+    const IndexPairList &errorToMarkerList = problem.getErrorToMarkerList();
+    std::vector<int> paramList;
+    paramList.push_back(0);
+    paramList.push_back(1);
+    paramList.push_back(2);
+    std::vector<int> markerErrorList;
+    for (size_t i = 0; i < errorToMarkerList.size(); ++i) {
+        if (errorToMarkerList[i].first == 0) {
+            markerErrorList.push_back(static_cast<int>(i));
+        }
+    }
+    std::vector<int> otherErrorList(1, 0);
+    Problem *subProblem = problem.createSubProblem(paramList, markerErrorList,
+                                                   otherErrorList, 1);
+    TEST_CHECK(subProblem != NULL);
+    if (subProblem == NULL) {
+        return;
+    }
+    const int numberOfSubMarkers = static_cast<int>(markerErrorList.size());
+    TEST_CHECK(subProblem->getNumberOfParameters() == 3);
+    TEST_CHECK(subProblem->getNumberOfMarkerErrors() == (numberOfSubMarkers * ERRORS_PER_MARKER));
+    TEST_CHECK(subProblem->getNumberOfErrors() == (subProblem->getNumberOfMarkerErrors() + 1));
+
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    std::vector<bool> measurements(numberOfMarkers, true);
+    std::vector<double> errors(numberOfErrors, 0.0);
+    std::vector<double> distances(numberOfMarkers, 0.0);
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+
+    std::vector<bool> subMeasurements(numberOfSubMarkers, true);
+    std::vector<double> subErrors(subProblem->getNumberOfErrors(), 0.0);
+    std::vector<double> subDistances(numberOfSubMarkers, 0.0);
+    subProblem->measureErrors(subMeasurements, &subErrors[0], &subDistances[0]);
+    for (int i = 0; i < numberOfSubMarkers; ++i) {
+        const int index = markerErrorList[i];
+        TEST_CHECK_NEAR(subDistances[i], distances[index], 1e-12);
+        for (int k = 0; k < ERRORS_PER_MARKER; ++k) {
+            TEST_CHECK_NEAR(subErrors[(i * ERRORS_PER_MARKER) + k],
+                            errors[(index * ERRORS_PER_MARKER) + k], 1e-12);
+        }
+    }
+    TEST_CHECK(subErrors.back() > 0.0);
+    TEST_CHECK_NEAR(subErrors.back(), errors[numberOfErrors - 1], 1e-12);
+
+    // Setting the sub-problem parameters changes the Scene.
+    std::vector<double> values(3, 0.0);
+    for (int i = 0; i < 3; ++i) {
+        values[i] = subProblem->getParameterValue(i) + 1.0;
+    }
+    subProblem->setParameters(&values[0]);
+    for (int i = 0; i < 3; ++i) {
+        TEST_CHECK(problem.getParameterValue(i) == values[i]);
+    }
+    delete subProblem;
+}
+
+
+// Only the camera and bundle frames affected by changed parameters
+// are evaluated again, and the errors are the same as without the
+// cache.
+void test_problem_frame_data_cache() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 4;
+    options.numberOfBundles = 5;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    SceneProblem problem(scene, attrList);
+    const FrameDataCache &cache = problem.getFrameDataCache();
+
+    const int numberOfParameters = problem.getNumberOfParameters();
+    const int numberOfErrors = problem.getNumberOfErrors();
+    const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    std::vector<bool> measurements(numberOfMarkers, true);
+    std::vector<double> errors(numberOfErrors, 0.0);
+    std::vector<double> expectedErrors(numberOfErrors, 0.0);
+    std::vector<double> distances(numberOfMarkers, 0.0);
+
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    TEST_CHECK(cache.cameraFrameEvaluations == options.numberOfFrames);
+    TEST_CHECK(cache.bundleFrameEvaluations == numberOfMarkers);
+    TEST_CHECK(cache.cameraFrameCacheHits == 0);
+    TEST_CHECK(cache.bundleFrameCacheHits == 0);
+
+    // Nothing has changed, so nothing is evaluated.
+    std::vector<double> values(numberOfParameters, 0.0);
+    for (int i = 0; i < numberOfParameters; ++i) {
+        values[i] = problem.getParameterValue(i);
+    }
+    problem.setParameters(&values[0]);
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    TEST_CHECK(cache.cameraFrameEvaluations == options.numberOfFrames);
+    TEST_CHECK(cache.bundleFrameEvaluations == numberOfMarkers);
+    TEST_CHECK(cache.cameraFrameCacheHits == options.numberOfFrames);
+    TEST_CHECK(cache.bundleFrameCacheHits == numberOfMarkers);
+
+    // A camera parameter on one frame, and a (static) bundle
+    // parameter on all frames.
+    const IndexPairList &paramToAttrList = problem.getParameterToAttrList();
+    int cameraParam = -1;
+    for (int i = 0; i < numberOfParameters; ++i) {
+        const SceneAttr &attr = attrList[paramToAttrList[i].first];
+        if ((attr.objectType == SCENE_OBJECT_TYPE_CAMERA)
+            && (paramToAttrList[i].second == 2)) {
+            cameraParam = i;
+            break;
+        }
+    }
+    TEST_CHECK(cameraParam != -1);
+    values[cameraParam] += 0.5;
+    values[0] += 0.5;
+    problem.setParameters(&values[0]);
+    problem.measureErrors(measurements, &errors[0], &distances[0]);
+    TEST_CHECK(cache.cameraFrameEvaluations == (options.numberOfFrames + 1));
+    TEST_CHECK(cache.bundleFrameEvaluations == (numberOfMarkers + options.numberOfFrames));
+
+    problem.clearFrameDataCache();
+    TEST_CHECK(cache.cameraFrameEvaluations == 0);
+    problem.measureErrors(measurements, &expectedErrors[0], &distances[0]);
+    TEST_CHECK(cache.cameraFrameEvaluations == options.numberOfFrames);
+    for (int i = 0; i < numberOfErrors; ++i) {
+        TEST_CHECK(errors[i] == expectedErrors[i]);
+    }
+}
+
+
+int main() {
+    TEST_RUN(test_problem_counts);
+    TEST_RUN(test_problem_measure_errors);
+    TEST_RUN(test_problem_stiffness_error);
+    TEST_RUN(test_problem_relationship);
+    TEST_RUN(test_problem_sub_problem);
+    TEST_RUN(test_problem_frame_data_cache);
+    return TEST_RESULT();
+}
@@ -0,0 +1,525 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test the solve function and solving a SceneProblem.
+ *
+ * Solving requires the cminpack (or levmar) library; without a
+ * solver library only the solve function is tested.
+ */
+
+// STL
+#include <cmath>
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_math.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_problemSolve.h>
+#include "syntheticScene.h"
+#include "testUtils.h"
+
+
+// Evaluate the Jacobian matrix the same way as 'lmder'.
+static void evaluateJacobian(ProblemSolverData &userData,
+                             const std::vector<double> &paramList,
+                             std::vector<double> &errorList,
+                             std::vector<double> &jacobianList) {
+    const int n = static_cast<int>(paramList.size());
+    const int m = static_cast<int>(errorList.size());
+    jacobianList.resize(n * m, 0.0);
+
+    userData.isNormalCall = true;
+    userData.isJacobianCall = false;
+    userData.doCalcJacobian = false;
+    problemSolveFunc(n, m, &paramList[0], &errorList[0], NULL, &userData);
+
+    userData.isNormalCall = false;
+    userData.isJacobianCall = true;
+    userData.doCalcJacobian = true;
+    problemSolveFunc(n, m, &paramList[0], &errorList[0],
+                     &jacobianList[0], &userData);
+}
+
+
+void test_solve_func_jacobian() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 3;
+    options.numberOfBundles = 6;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    perturbSceneAttrs(attrList, 0.5, 7, scene);
+    SceneProblem problem(scene, attrList);
+
+    const int n = problem.getNumberOfParameters();
+    const int m = problem.getNumberOfErrors();
+
+    SolverOptions forwardOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, forwardOptions);
+    forwardOptions.autoDiffType = AUTO_DIFF_TYPE_FORWARD;
+    forwardOptions.analyticJacobian = false;
+    ProblemSolverData forwardData;
+    initProblemSolverData(problem, forwardOptions, false, forwardData);
+
+    std::vector<double> paramList;
+    getProblemInitialParameters(forwardData, paramList);
+    TEST_CHECK(static_cast<int>(paramList.size()) == n);
+
+    std::vector<double> errorList(m, 0.0);
+    std::vector<double> forwardJacobian;
+    evaluateJacobian(forwardData, paramList, errorList, forwardJacobian);
+    // 3 bundle translate groups, and 6 camera groups (one per
+    // attribute, with all frames in the same group).
+    const int numberOfGroups = static_cast<int>(forwardData.paramGroupList.size());
+    TEST_CHECK(numberOfGroups == 9);
+    TEST_CHECK(forwardData.jacIterNum == numberOfGroups);
+
+    SolverOptions centralOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, centralOptions);
+    centralOptions.autoDiffType = AUTO_DIFF_TYPE_CENTRAL;
+    centralOptions.analyticJacobian = false;
+    ProblemSolverData centralData;
+    initProblemSolverData(problem, centralOptions, false, centralData);
+    std::vector<double> centralJacobian;
+    evaluateJacobian(centralData, paramList, errorList, centralJacobian);
+    TEST_CHECK(centralData.jacIterNum == (2 * numberOfGroups));
+
+    // Forward and central differences agree, and markers not
+    // related to a parameter have no derivative.
+    for (int i = 0; i < n; ++i) {
+        for (int j = 0; j < m; ++j) {
+            const double forward = forwardJacobian[(i * m) + j];
+            const double central = centralJacobian[(i * m) + j];
+            const double tolerance = 1e-2 * (1.0 + std::fabs(central));
+            TEST_CHECK_NEAR(forward, central, tolerance);
+            if (!forwardData.paramToErrorList[i][j / ERRORS_PER_MARKER]) {
+                TEST_CHECK(forward == 0.0);
+                TEST_CHECK(central == 0.0);
+            }
+        }
+    }
+}
+
+
+// The Jacobian computed with groups of parameters is the same as
+// changing each parameter on its own.
+void test_solve_func_jacobian_groups() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 4;
+    options.numberOfBundles = 5;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    perturbSceneAttrs(attrList, 0.5, 5, scene);
+
+    // Add stiffness to a bundle and a camera attribute.
+    const int stiffAttrIndices[] = {0, static_cast<int>(attrList.size()) - 1};
+    for (int i = 0; i < 2; ++i) {
+        SceneAttr &attr = attrList[stiffAttrIndices[i]];
+        attr.stiffnessWeight = 1.0;
+        attr.stiffnessVariance = 1.0;
+        attr.stiffnessValue = getSceneAttrValue(scene, attr, -1) + 0.1;
+    }
+    SceneProblem problem(scene, attrList);
+
+    const int n = problem.getNumberOfParameters();
+    const int m = problem.getNumberOfErrors();
+    const int numberOfMarkers = problem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    TEST_CHECK(m == (problem.getNumberOfMarkerErrors() + 2));
+
+    SolverOptions solverOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, solverOptions);
+    solverOptions.analyticJacobian = false;
+    ProblemSolverData userData;
+    initProblemSolverData(problem, solverOptions, false, userData);
+
+    TEST_CHECK(static_cast<int>(userData.paramGroupList.size()) < n);
+
+    std::vector<double> paramList;
+    getProblemInitialParameters(userData, paramList);
+    std::vector<double> errorList(m, 0.0);
+    std::vector<double> jacobianList;
+    evaluateJacobian(userData, paramList, errorList, jacobianList);
+
+    std::vector<bool> measurements(numberOfMarkers, true);
+    std::vector<double> paramListDelta;
+    std::vector<double> errorListDelta(m, 0.0);
+    double error_avg = 0.0;
+    double error_max = 0.0;
+    double error_min = 0.0;
+    for (int i = 0; i < n; ++i) {
+        paramListDelta = paramList;
+        const double deltaA = calculateParameterDelta(paramList[i],
+                                                      solverOptions.delta, 1,
+                                                      userData.paramLowerBoundList[i],
+                                                      userData.paramUpperBoundList[i]);
+        paramListDelta[i] += deltaA;
+        setProblemParameters(n, &paramListDelta[0], &userData);
+        measureProblemErrors(m, measurements, &errorListDelta[0], &userData,
+                             error_avg, error_max, error_min);
+        for (int j = 0; j < m; ++j) {
+            const double expected = (errorListDelta[j] - errorList[j]) / deltaA;
+            const double actual = jacobianList[(i * m) + j];
+            TEST_CHECK_NEAR(actual, expected, 1e-6 * (1.0 + std::fabs(expected)));
+        }
+    }
+}
+
+
+// The analytic Jacobian is the same as the central differences
+// Jacobian, for camera transform, focal length and film offset
+// attributes, with bounds, stiffness and smoothness.
+void test_solve_func_jacobian_analytic() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 4;
+    options.numberOfBundles = 6;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    const int lensAttrTypes[] = {
+        SCENE_ATTR_TYPE_FOCAL_LENGTH,
+        SCENE_ATTR_TYPE_FILM_OFFSET_X,
+        SCENE_ATTR_TYPE_FILM_OFFSET_Y
+    };
+    for (int i = 0; i < 3; ++i) {
+        attrList.push_back(createSceneAttr(SCENE_OBJECT_TYPE_CAMERA, 0,
+                                           lensAttrTypes[i], false));
+    }
+    perturbSceneAttrs(attrList, 0.2, 3, scene);
+
+    SceneAttr &boundedAttr = attrList[0];
+    const double boundedValue = getSceneAttrValue(scene, boundedAttr, -1);
+    boundedAttr.minValue = boundedValue - 1.0;
+    boundedAttr.maxValue = boundedValue + 2.0;
+    SceneAttr &stiffAttr = attrList[1];
+    stiffAttr.stiffnessWeight = 1.0;
+    stiffAttr.stiffnessVariance = 1.0;
+    stiffAttr.stiffnessValue = getSceneAttrValue(scene, stiffAttr, -1) + 0.3;
+    SceneAttr &smoothAttr = attrList[attrList.size() - 3];
+    smoothAttr.smoothnessWeight = 1.0;
+    smoothAttr.smoothnessVariance = 10.0;
+    smoothAttr.smoothnessValue = getSceneAttrValue(scene, smoothAttr, -1) + 2.0;
+    SceneProblem problem(scene, attrList);
+
+    const int n = problem.getNumberOfParameters();
+    const int m = problem.getNumberOfErrors();
+    TEST_CHECK(m == (problem.getNumberOfMarkerErrors() + 2));
+
+    SolverOptions analyticOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, analyticOptions);
+    TEST_CHECK(analyticOptions.analyticJacobian);
+    ProblemSolverData analyticData;
+    initProblemSolverData(problem, analyticOptions, false, analyticData);
+    TEST_CHECK(static_cast<int>(analyticData.analyticParamList.size()) == n);
+    TEST_CHECK(analyticData.paramGroupList.empty());
+
+    std::vector<double> paramList;
+    getProblemInitialParameters(analyticData, paramList);
+    std::vector<double> errorList(m, 0.0);
+    std::vector<double> analyticJacobian;
+    evaluateJacobian(analyticData, paramList, errorList, analyticJacobian);
+    TEST_CHECK(analyticData.jacIterNum == 0);
+
+    SolverOptions centralOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, centralOptions);
+    centralOptions.autoDiffType = AUTO_DIFF_TYPE_CENTRAL;
+    centralOptions.analyticJacobian = false;
+    ProblemSolverData centralData;
+    initProblemSolverData(problem, centralOptions, false, centralData);
+    TEST_CHECK(centralData.analyticParamList.empty());
+    std::vector<double> centralJacobian;
+    evaluateJacobian(centralData, paramList, errorList, centralJacobian);
+
+    for (int i = 0; i < n; ++i) {
+        for (int j = 0; j < m; ++j) {
+            const double analytic = analyticJacobian[(i * m) + j];
+            const double central = centralJacobian[(i * m) + j];
+            TEST_CHECK_NEAR(analytic, central, 1e-4 * (1.0 + std::fabs(central)));
+        }
+    }
+}
+
+
+// With a robust loss function, the Jacobian (analytic, or forward
+// differences of the unscaled errors) is the derivative of the
+// scaled errors.
+void test_solve_func_jacobian_loss() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 4;
+    options.numberOfBundles = 6;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    perturbSceneAttrs(attrList, 0.2, 11, scene);
+    SceneProblem problem(scene, attrList);
+
+    const int n = problem.getNumberOfParameters();
+    const int m = problem.getNumberOfErrors();
+    const int lossTypes[] = {
+        ROBUST_LOSS_TYPE_SOFT_L_ONE,
+        ROBUST_LOSS_TYPE_CAUCHY,
+        ROBUST_LOSS_TYPE_HUBER,
+        ROBUST_LOSS_TYPE_TUKEY
+    };
+    for (int t = 0; t < 4; ++t) {
+        SolverOptions centralOptions;
+        setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, centralOptions);
+        centralOptions.robustLossType = lossTypes[t];
+        centralOptions.robustLossScale = 20.0;
+        centralOptions.autoDiffType = AUTO_DIFF_TYPE_CENTRAL;
+        centralOptions.analyticJacobian = false;
+        ProblemSolverData centralData;
+        initProblemSolverData(problem, centralOptions, false, centralData);
+        TEST_CHECK(centralData.useLossFunction);
+
+        std::vector<double> paramList;
+        getProblemInitialParameters(centralData, paramList);
+        std::vector<double> errorList(m, 0.0);
+        std::vector<double> centralJacobian;
+        evaluateJacobian(centralData, paramList, errorList, centralJacobian);
+
+        // The scaled errors, and the analytic Jacobian.
+        SolverOptions analyticOptions = centralOptions;
+        analyticOptions.analyticJacobian = true;
+        ProblemSolverData analyticData;
+        initProblemSolverData(problem, analyticOptions, false, analyticData);
+        TEST_CHECK(static_cast<int>(analyticData.analyticParamList.size()) == n);
+        std::vector<double> scaledErrorList(m, 0.0);
+        std::vector<double> analyticJacobian;
+        evaluateJacobian(analyticData, paramList, scaledErrorList, analyticJacobian);
+        for (int j = 0; j < m; ++j) {
+            TEST_CHECK(std::fabs(scaledErrorList[j]) <= (std::fabs(errorList[j]) + 1e-12));
+        }
+
+        // Central differences of the scaled errors.
+        std::vector<double> paramListA;
+        std::vector<double> paramListB;
+        std::vector<double> errorListA(m, 0.0);
+        std::vector<double> errorListB(m, 0.0);
+        analyticData.isNormalCall = true;
+        analyticData.isJacobianCall = false;
+        analyticData.doCalcJacobian = false;
+        for (int i = 0; i < n; ++i) {
+            const double delta = 1e-5;
+            paramListA = paramList;
+            paramListB = paramList;
+            paramListA[i] += delta;
+            paramListB[i] -= delta;
+            problemSolveFunc(n, m, &paramListA[0], &errorListA[0], NULL, &analyticData);
+            problemSolveFunc(n, m, &paramListB[0], &errorListB[0], NULL, &analyticData);
+            for (int j = 0; j < m; ++j) {
+                const double expected = (errorListA[j] - errorListB[j]) / (2.0 * delta);
+                const double analytic = analyticJacobian[(i * m) + j];
+                const double central = centralJacobian[(i * m) + j];
+                const double tolerance = 1e-3 * (1.0 + std::fabs(expected));
+                TEST_CHECK_NEAR(analytic, expected, tolerance);
+                TEST_CHECK_NEAR(central, expected, tolerance);
+            }
+        }
+    }
+}
+
+
+void test_solve_problem_unsupported() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    SceneProblem problem(scene, attrList);
+
+    SolverOptions solverOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, solverOptions);
+    solverOptions.solverType = -1;
+    SolverResult solverResult;
+    TEST_CHECK(!solveProblem(solverOptions, problem, false, solverResult));
+
+    // Nothing to solve.
+    SceneAttrList emptyAttrList;
+    SceneProblem emptyProblem(scene, emptyAttrList);
+    setProblemSolverOptionDefaults(SOLVER_TYPE_CMINPACK_LMDER, solverOptions);
+    TEST_CHECK(!solveProblem(solverOptions, emptyProblem, false, solverResult));
+}
+
+
+// Solve with the default solver, if the solver is compiled in.
+void test_solve_problem_bundles() {
+    std::vector<SolverTypePair> solverTypes = getProblemSolverTypes();
+    for (size_t i = 0; i < solverTypes.size(); ++i) {
+        if (solverTypes[i].first != SOLVER_TYPE_DEFAULT_VALUE) {
+            continue;
+        }
+        SyntheticSceneOptions options;
+        setSyntheticSceneOptionDefaults(options);
+        Scene scene;
+        createSyntheticScene(options, scene);
+        Scene expectedScene = scene;
+
+        SceneAttrList attrList;
+        createBundleAttrs(scene, attrList);
+        perturbSceneAttrs(attrList, 5.0, 3, scene);
+        const double initialDeviation = computeSceneAttrDeviation(attrList, scene, expectedScene);
+        SceneProblem problem(scene, attrList);
+
+        SolverOptions solverOptions;
+        setProblemSolverOptionDefaults(solverTypes[i].first, solverOptions);
+        SolverResult solverResult;
+        bool ok = solveProblem(solverOptions, problem, false, solverResult);
+        TEST_CHECK(ok);
+        TEST_CHECK(solverResult.success);
+        TEST_CHECK(solverResult.errorAvg < 0.1);
+        TEST_CHECK(solverResult.errorMax < 1.0);
+
+        // The depth of the bundles is only weakly measured by the
+        // small camera movement, so the bundles are only expected to
+        // move towards the true positions.
+        const double solvedDeviation = computeSceneAttrDeviation(attrList, scene, expectedScene);
+        TEST_CHECK(solvedDeviation < (initialDeviation * 0.25));
+    }
+}
+
+
+// Solve the camera with outliers added to the markers; a robust loss
+// function solves closer to the true values than least squares, with
+// each solver type that supports robust loss functions.
+void test_solve_problem_outliers() {
+    std::vector<SolverTypePair> solverTypes = getProblemSolverTypes();
+    for (size_t i = 0; i < solverTypes.size(); ++i) {
+        SolverOptions solverOptions;
+        setProblemSolverOptionDefaults(solverTypes[i].first, solverOptions);
+        if (!solverOptions.solverSupportsRobustLoss) {
+            continue;
+        }
+        // Outliers increase the least squares error, so the solve
+        // must be accepted to be compared.
+        solverOptions.acceptOnlyBetter = false;
+
+        SyntheticSceneOptions options;
+        setSyntheticSceneOptionDefaults(options);
+        Scene scene;
+        createSyntheticScene(options, scene);
+        addSyntheticSceneOutliers(0.1, 100.0, 13, scene);
+        Scene expectedScene = scene;
+
+        SceneAttrList attrList;
+        createCameraAttrs(scene, 0, attrList);
+        perturbSceneAttrs(attrList, 0.5, 3, scene);
+        Scene initialScene = scene;
+
+        SceneProblem problem(scene, attrList);
+        SolverResult solverResult;
+        TEST_CHECK(solveProblem(solverOptions, problem, false, solverResult));
+        const double deviation = computeSceneAttrDeviation(attrList, scene, expectedScene);
+
+        // Tukey ignores all errors above the scale, so the scale must
+        // be larger than the initial errors of the inliers.
+        const int lossTypes[] = {
+            ROBUST_LOSS_TYPE_SOFT_L_ONE,
+            ROBUST_LOSS_TYPE_CAUCHY,
+            ROBUST_LOSS_TYPE_HUBER,
+            ROBUST_LOSS_TYPE_TUKEY
+        };
+        const double lossScales[] = {20.0, 20.0, 20.0, 60.0};
+        for (int t = 0; t < 4; ++t) {
+            Scene lossScene = initialScene;
+            SceneProblem lossProblem(lossScene, attrList);
+            SolverOptions lossOptions = solverOptions;
+            lossOptions.robustLossType = lossTypes[t];
+            lossOptions.robustLossScale = lossScales[t];
+            SolverResult lossResult;
+            TEST_CHECK(solveProblem(lossOptions, lossProblem, false, lossResult));
+            const double lossDeviation = computeSceneAttrDeviation(attrList, lossScene, expectedScene);
+            TEST_CHECK(lossDeviation < (deviation * 0.5));
+        }
+    }
+}
+
+
+// Solve the camera, where each frame is an independent component;
+// solving the components separately is as close to the true values
+// as solving the whole problem, with each solver type.
+void test_solve_problem_components() {
+    std::vector<SolverTypePair> solverTypes = getProblemSolverTypes();
+    for (size_t i = 0; i < solverTypes.size(); ++i) {
+        SolverOptions solverOptions;
+        setProblemSolverOptionDefaults(solverTypes[i].first, solverOptions);
+        solverOptions.threadCount = 4;
+
+        SyntheticSceneOptions options;
+        setSyntheticSceneOptionDefaults(options);
+        Scene scene;
+        createSyntheticScene(options, scene);
+        Scene expectedScene = scene;
+
+        SceneAttrList attrList;
+        createCameraAttrs(scene, 0, attrList);
+        perturbSceneAttrs(attrList, 0.5, 3, scene);
+        const double initialDeviation = computeSceneAttrDeviation(attrList, scene, expectedScene);
+        Scene componentScene = scene;
+
+        SceneProblem problem(scene, attrList);
+        SolverResult solverResult;
+        TEST_CHECK(solveProblem(solverOptions, problem, false, solverResult));
+        const double deviation = computeSceneAttrDeviation(attrList, scene, expectedScene);
+
+        SceneProblem componentProblem(componentScene, attrList);
+        SolverResult componentResult;
+        TEST_CHECK(solveProblemComponents(solverOptions, componentProblem, false, componentResult));
+        TEST_CHECK(componentResult.success);
+        TEST_CHECK(componentResult.iterations > 0);
+        TEST_CHECK(componentResult.errorAvg < (solverResult.errorAvg + 0.01));
+        const double componentDeviation = computeSceneAttrDeviation(attrList, componentScene, expectedScene);
+        TEST_CHECK(componentDeviation < (initialDeviation * 0.1));
+        TEST_CHECK(componentDeviation < (deviation + (initialDeviation * 0.01)));
+    }
+}
+
+
+int main() {
+    TEST_RUN(test_solve_func_jacobian);
+    TEST_RUN(test_solve_func_jacobian_groups);
+    TEST_RUN(test_solve_func_jacobian_analytic);
+    TEST_RUN(test_solve_func_jacobian_loss);
+    TEST_RUN(test_solve_problem_unsupported);
+    TEST_RUN(test_solve_problem_bundles);
+    TEST_RUN(test_solve_problem_outliers);
+    TEST_RUN(test_solve_problem_components);
+    return TEST_RESULT();
+}
@@ -0,0 +1,180 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test the thread pool, and measuring re-projection errors in
+ * parallel.
+ */
+
+// STL
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_reprojectionErrors.h>
+#include <core/bundleAdjust_threadPool.h>
+#include "syntheticScene.h"
+#include "testUtils.h"
+
+
+void test_thread_pool_parallel_for() {
+    const int threadCounts[] = {1, 2, 3, 8};
+    const int counts[] = {0, 1, 7, 100, 1001};
+    for (int i = 0; i < 4; ++i) {
+        ThreadPool threadPool(threadCounts[i]);
+        TEST_CHECK(threadPool.getThreadCount() == threadCounts[i]);
+
+        // Every index is visited exactly once, and the pool can be
+        // re-used.
+        for (int j = 0; j < 5; ++j) {
+            std::vector<int> visits(counts[j], 0);
+            threadPool.parallelFor(counts[j], [&](int begin, int end) {
+                for (int k = begin; k < end; ++k) {
+                    visits[k] += 1;
+                }
+            });
+            for (int k = 0; k < counts[j]; ++k) {
+                TEST_CHECK(visits[k] == 1);
+            }
+        }
+    }
+
+    TEST_CHECK(getThreadCount(3) == 3);
+    TEST_CHECK(getThreadCount(0) >= 1);
+}
+
+
+void test_reprojection_errors_threaded() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.markerNoise = 2.0;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    perturbSceneAttrs(attrList, 0.5, 11, scene);
+
+    SceneProblem serialProblem(scene, attrList, 1);
+    SceneProblem threadedProblem(scene, attrList, 4);
+    TEST_CHECK(serialProblem.getThreadCount() == 1);
+    TEST_CHECK(threadedProblem.getThreadCount() == 4);
+
+    const int numberOfErrors = serialProblem.getNumberOfErrors();
+    const int numberOfMarkers = serialProblem.getNumberOfMarkerErrors() / ERRORS_PER_MARKER;
+    std::vector<bool> measurements(numberOfMarkers, true);
+
+    // Skip some markers; their errors must be unchanged.
+    for (int i = 0; i < numberOfMarkers; i += 3) {
+        measurements[i] = false;
+    }
+
+    std::vector<double> serialErrors(numberOfErrors, -1.0);
+    std::vector<double> serialDistances(numberOfMarkers, -1.0);
+    serialProblem.measureErrors(measurements, &serialErrors[0], &serialDistances[0]);
+
+    std::vector<double> threadedErrors(numberOfErrors, -1.0);
+    std::vector<double> threadedDistances(numberOfMarkers, -1.0);
+    threadedProblem.measureErrors(measurements, &threadedErrors[0], &threadedDistances[0]);
+
+    for (int i = 0; i < numberOfMarkers; ++i) {
+        TEST_CHECK(serialDistances[i] == threadedDistances[i]);
+        if (measurements[i] == false) {
+            TEST_CHECK(threadedDistances[i] == -1.0);
+        } else {
+            TEST_CHECK(threadedDistances[i] > 0.0);
+        }
+    }
+    for (int i = 0; i < numberOfErrors; ++i) {
+        TEST_CHECK(serialErrors[i] == threadedErrors[i]);
+    }
+}
+
+
+void test_reprojection_errors_deviations() {
+    // One camera frame looking down -Z, with one bundle in front and
+    // one behind the camera.
+    CameraFrameData cameraFrameData;
+    setMatrixIdentity(cameraFrameData.worldProjectionMatrix);
+    cameraFrameData.worldProjectionMatrix.m[2][3] = -1.0;
+    cameraFrameData.worldProjectionMatrix.m[3][3] = 0.0;
+    for (int i = 0; i < 3; ++i) {
+        cameraFrameData.position[i] = 0.0;
+        cameraFrameData.forwardDirection[i] = 0.0;
+    }
+    cameraFrameData.forwardDirection[2] = -1.0;
+    cameraFrameData.filmBackInvAspect = 1.0;
+    cameraFrameData.imageWidth = 100.0;
+    std::vector<CameraFrameData> cameraFrameDataList(1, cameraFrameData);
+
+    std::vector<BundleFrameData> bundleFrameDataList(2);
+    bundleFrameDataList[0].position[0] = 0.2;
+    bundleFrameDataList[0].position[1] = 0.0;
+    bundleFrameDataList[0].position[2] = -1.0;
+    bundleFrameDataList[1].position[0] = 0.2;
+    bundleFrameDataList[1].position[1] = 0.0;
+    bundleFrameDataList[1].position[2] = 1.0;
+
+    std::vector<MarkerErrorData> markerErrorDataList(2);
+    for (int i = 0; i < 2; ++i) {
+        markerErrorDataList[i].cameraFrameIndex = 0;
+        markerErrorDataList[i].bundleFrameIndex = i;
+        markerErrorDataList[i].x = 0.0;
+        markerErrorDataList[i].y = 0.0;
+        markerErrorDataList[i].weight = 0.25;
+    }
+    std::vector<int> measureList;
+    measureList.push_back(0);
+    measureList.push_back(1);
+
+    std::vector<double> errors(2 * ERRORS_PER_MARKER, 0.0);
+    std::vector<double> deviations(2 * ERRORS_PER_MARKER, 0.0);
+    std::vector<double> distances(2, 0.0);
+    ThreadPool threadPool(2);
+    measureReprojectionErrors(measureList,
+                              markerErrorDataList,
+                              cameraFrameDataList,
+                              bundleFrameDataList,
+                              &threadPool,
+                              &errors[0],
+                              &deviations[0],
+                              &distances[0]);
+
+    // The bundle in front projects to x=0.1; 10 pixels away.
+    TEST_CHECK_NEAR(distances[0], 10.0, 1e-9);
+    TEST_CHECK_NEAR(deviations[0], 10.0, 1e-9);
+    TEST_CHECK_NEAR(deviations[1], 0.0, 1e-9);
+    TEST_CHECK_NEAR(errors[0], 10.0 * 0.5, 1e-9);
+    TEST_CHECK_NEAR(errors[1], 0.0, 1e-9);
+
+    // The bundle behind the camera is penalised.
+    TEST_CHECK_NEAR(distances[1], 10.0, 1e-9);
+    TEST_CHECK_NEAR(deviations[ERRORS_PER_MARKER], 10.0 * 1e+6, 1e-3);
+    TEST_CHECK_NEAR(errors[ERRORS_PER_MARKER], 10.0 * 0.5 * 1e+6, 1e-3);
+}
+
+
+int main() {
+    TEST_RUN(test_thread_pool_parallel_for);
+    TEST_RUN(test_reprojection_errors_threaded);
+    TEST_RUN(test_reprojection_errors_deviations);
+    return TEST_RESULT();
+}
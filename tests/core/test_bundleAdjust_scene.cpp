@@ -0,0 +1,135 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test the array-based scene matrices and projection.
+ */
+
+// Local
+#include <core/bundleAdjust_scene.h>
+#include "syntheticScene.h"
+#include "testUtils.h"
+
+
+void test_inverse_transform_matrix() {
+    const double translate[3] = {1.0, -2.0, 3.5};
+    const double rotate[3] = {10.0, 45.0, -30.0};
+    Matrix44 matrix;
+    Matrix44 inverse;
+    Matrix44 result;
+    composeTransformMatrix(translate, rotate, matrix);
+    inverseTransformMatrix(matrix, inverse);
+    multiplyMatrix(matrix, inverse, result);
+    for (int i = 0; i < 4; ++i) {
+        for (int j = 0; j < 4; ++j) {
+            TEST_CHECK_NEAR(result.m[i][j], (i == j) ? 1.0 : 0.0, 1e-12);
+        }
+    }
+
+    // The translation is the last row, with row-vectors.
+    TEST_CHECK_NEAR(matrix.m[3][0], translate[0], 1e-12);
+    TEST_CHECK_NEAR(matrix.m[3][1], translate[1], 1e-12);
+    TEST_CHECK_NEAR(matrix.m[3][2], translate[2], 1e-12);
+}
+
+
+void test_project_point() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 1;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    // Put the camera at the origin, looking down -Z.
+    SceneCamera &camera = scene.cameras[0];
+    CameraFrame &frame = camera.frames[0];
+    for (int i = 0; i < 3; ++i) {
+        frame.translate[i] = 0.0;
+        frame.rotate[i] = 0.0;
+    }
+
+    Matrix44 worldMatrix;
+    Matrix44 worldProjectionMatrix;
+    computeCameraWorldMatrix(camera, 0, worldMatrix);
+    computeCameraWorldProjectionMatrix(camera, 0, worldProjectionMatrix);
+    const double invAspect = frame.filmBackHeight / frame.filmBackWidth;
+
+    double dir[3];
+    computeCameraForwardDirection(worldMatrix, dir);
+    TEST_CHECK_NEAR(dir[0], 0.0, 1e-12);
+    TEST_CHECK_NEAR(dir[1], 0.0, 1e-12);
+    TEST_CHECK_NEAR(dir[2], -1.0, 1e-12);
+
+    // On the camera axis.
+    double x = 1.0;
+    double y = 1.0;
+    const double centre[3] = {0.0, 0.0, -50.0};
+    projectPoint(worldProjectionMatrix, invAspect, centre, x, y);
+    TEST_CHECK_NEAR(x, 0.0, 1e-12);
+    TEST_CHECK_NEAR(y, 0.0, 1e-12);
+
+    // A pinhole camera; the film back is in inches, the focal length
+    // in millimetres.
+    const double point[3] = {4.0, -3.0, -50.0};
+    projectPoint(worldProjectionMatrix, invAspect, point, x, y);
+    const double filmBackWidthMM = frame.filmBackWidth * 25.4;
+    const double expectedX = (frame.focalLength * (4.0 / 50.0)) / filmBackWidthMM;
+    const double expectedY = (frame.focalLength * (-3.0 / 50.0)) / filmBackWidthMM;
+    TEST_CHECK_NEAR(x, expectedX, 1e-9);
+    TEST_CHECK_NEAR(y, expectedY, 1e-9);
+}
+
+
+void test_scene_attr_values() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 3;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttr animAttr = createSceneAttr(
+        SCENE_OBJECT_TYPE_CAMERA, 0, SCENE_ATTR_TYPE_ROTATE_Y, true);
+    TEST_CHECK(isValidSceneAttr(scene, animAttr));
+    setSceneAttrValue(scene, animAttr, 1, 12.5);
+    TEST_CHECK_NEAR(getSceneAttrValue(scene, animAttr, 1), 12.5, 1e-12);
+    TEST_CHECK_NEAR(scene.cameras[0].frames[1].rotate[1], 12.5, 1e-12);
+    TEST_CHECK(getSceneAttrValue(scene, animAttr, 0) != 12.5);
+
+    // Static values are set on all frames.
+    SceneAttr staticAttr = createSceneAttr(
+        SCENE_OBJECT_TYPE_BUNDLE, 2, SCENE_ATTR_TYPE_TRANSLATE_Z, false);
+    TEST_CHECK(isValidSceneAttr(scene, staticAttr));
+    setSceneAttrValue(scene, staticAttr, -1, -7.0);
+    for (int i = 0; i < scene.numberOfFrames; ++i) {
+        TEST_CHECK_NEAR(scene.bundles[2].frames[i].translate[2], -7.0, 1e-12);
+    }
+    TEST_CHECK_NEAR(getSceneAttrValue(scene, staticAttr, -1), -7.0, 1e-12);
+
+    // Bundles do not have a focal length.
+    SceneAttr invalidAttr = createSceneAttr(
+        SCENE_OBJECT_TYPE_BUNDLE, 0, SCENE_ATTR_TYPE_FOCAL_LENGTH, false);
+    TEST_CHECK(!isValidSceneAttr(scene, invalidAttr));
+}
+
+
+int main() {
+    TEST_RUN(test_inverse_transform_matrix);
+    TEST_RUN(test_project_point);
+    TEST_RUN(test_scene_attr_values);
+    return TEST_RESULT();
+}
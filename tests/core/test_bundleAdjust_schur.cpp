@@ -0,0 +1,306 @@
+/*
+ * Copyright (C) 2020 David Cattermole.
+ *
+ * This file is part of mmSolver.
+ *
+ * mmSolver is free software: you can redistribute it and/or modify it
+ * under the terms of the GNU Lesser General Public License as
+ * published by the Free Software Foundation, either version 3 of the
+ * License, or (at your option) any later version.
+ *
+ * mmSolver is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU Lesser General Public License for more details.
+ *
+ * You should have received a copy of the GNU Lesser General Public License
+ * along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+ * ====================================================================
+ *
+ * Test the Schur complement solver; the Jacobian structure, solving
+ * a small linear problem with the dense and PCG reduced systems, and
+ * solving a SceneProblem.
+ */
+
+// STL
+#include <cmath>
+#include <vector>
+
+// Local
+#include <core/bundleAdjust_defines.h>
+#include <core/bundleAdjust_types.h>
+#include <core/bundleAdjust_schur.h>
+#include <core/bundleAdjust_scene.h>
+#include <core/bundleAdjust_problem.h>
+#include <core/bundleAdjust_problemSolve.h>
+#include "syntheticScene.h"
+#include "testUtils.h"
+
+
+#define LINEAR_POINTS (5)
+#define LINEAR_CAMERAS (3)
+#define LINEAR_PARAMS_PER_OBJECT (2)
+
+
+// A linear least-squares problem, errors = (M * x) - b, with the
+// same structure as bundle adjustment; each pair of errors depends on
+// one point and one camera. One extra error couples two cameras (as
+// smoothness does), and one depends only on a point.
+struct LinearProblem {
+    int numberOfParameters;
+    int numberOfErrors;
+    std::vector<double> matrix;  // row-major, errors by parameters.
+    std::vector<double> rhs;
+    std::vector<double> solution;
+    std::vector<bool> pointParamList;
+    IndexList2D paramToErrorIndexList;
+    SchurStructure structure;
+};
+
+
+static double nextRandom(unsigned int &state) {
+    state = (state * 1103515245u) + 12345u;
+    return (static_cast<double>((state >> 8) & 0xFFFF) / 65535.0) - 0.5;
+}
+
+
+static void createLinearProblem(LinearProblem &problem) {
+    const int pointParams = LINEAR_POINTS * LINEAR_PARAMS_PER_OBJECT;
+    const int n = pointParams + (LINEAR_CAMERAS * LINEAR_PARAMS_PER_OBJECT);
+    const int m = (LINEAR_POINTS * LINEAR_CAMERAS * 2) + 2;
+    problem.numberOfParameters = n;
+    problem.numberOfErrors = m;
+    problem.matrix.assign(m * n, 0.0);
+
+    unsigned int state = 42;
+    int row = 0;
+    for (int p = 0; p < LINEAR_POINTS; ++p) {
+        for (int c = 0; c < LINEAR_CAMERAS; ++c) {
+            for (int k = 0; k < 2; ++k) {
+                double *values = &problem.matrix[row * n];
+                for (int a = 0; a < LINEAR_PARAMS_PER_OBJECT; ++a) {
+                    values[(p * LINEAR_PARAMS_PER_OBJECT) + a] = 1.0 + nextRandom(state);
+                    values[pointParams + (c * LINEAR_PARAMS_PER_OBJECT) + a] = nextRandom(state);
+                }
+                ++row;
+            }
+        }
+    }
+    problem.matrix[(row * n) + pointParams] = 1.0;
+    problem.matrix[(row * n) + pointParams + LINEAR_PARAMS_PER_OBJECT] = -1.0;
+    ++row;
+    problem.matrix[(row * n) + 0] = 2.0;
+    ++row;
+
+    problem.solution.resize(n);
+    for (int i = 0; i < n; ++i) {
+        problem.solution[i] = 4.0 * nextRandom(state);
+    }
+    problem.rhs.assign(m, 0.0);
+    for (int j = 0; j < m; ++j) {
+        for (int i = 0; i < n; ++i) {
+            problem.rhs[j] += problem.matrix[(j * n) + i] * problem.solution[i];
+        }
+    }
+
+    problem.pointParamList.resize(n);
+    problem.paramToErrorIndexList.clear();
+    problem.paramToErrorIndexList.resize(n);
+    for (int i = 0; i < n; ++i) {
+        problem.pointParamList[i] = i < pointParams;
+        for (int j = 0; j < m; ++j) {
+            if (problem.matrix[(j * n) + i] != 0.0) {
+                problem.paramToErrorIndexList[i].push_back(j);
+            }
+        }
+    }
+    findSchurStructure(m, problem.paramToErrorIndexList,
+                       problem.pointParamList, problem.structure);
+}
+
+
+static int linearSolveFunc(void *data,
+                           int m,
+                           int n,
+                           const double *x,
+                           double *fvec,
+                           double *fjac,
+                           int iflag) {
+    const LinearProblem *problem = static_cast<const LinearProblem *>(data);
+    if (iflag == 2) {
+        const SchurStructure &structure = problem->structure;
+        for (int i = 0; i < n; ++i) {
+            for (int v = structure.columnStartList[i];
+                 v < structure.columnStartList[i + 1]; ++v) {
+                fjac[v] = problem->matrix[(structure.rowIndexList[v] * n) + i];
+            }
+        }
+        return 0;
+    }
+    for (int j = 0; j < m; ++j) {
+        double value = -problem->rhs[j];
+        for (int i = 0; i < n; ++i) {
+            value += problem->matrix[(j * n) + i] * x[i];
+        }
+        fvec[j] = value;
+    }
+    return 0;
+}
+
+
+static void solveLinearProblem(LinearProblem &problem) {
+    const int n = problem.numberOfParameters;
+    const int m = problem.numberOfErrors;
+    SolverOptions solverOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_SCHUR_LM, solverOptions);
+    solverOptions.eps1 = 1e-12;
+    solverOptions.eps2 = 1e-12;
+    solverOptions.eps3 = 1e-20;
+
+    std::vector<double> paramList(n, 0.0);
+    std::vector<double> errorList(m, 0.0);
+    SolverResult solveResult;
+    ThreadPool threadPool(2);
+    bool ok = solveSchurLevenbergMarquardt(
+        linearSolveFunc, &problem, m, n,
+        &paramList[0], &errorList[0],
+        problem.structure, solverOptions, &threadPool,
+        solveResult);
+    TEST_CHECK(ok);
+    TEST_CHECK(solveResult.success);
+    TEST_CHECK(solveResult.iterations < 20);
+    TEST_CHECK(solveResult.errorFinal < 1e-8);
+    for (int i = 0; i < n; ++i) {
+        TEST_CHECK_NEAR(paramList[i], problem.solution[i], 1e-6);
+    }
+}
+
+
+void test_schur_structure() {
+    LinearProblem problem;
+    createLinearProblem(problem);
+    const SchurStructure &structure = problem.structure;
+
+    // Each point is a block, the cameras are the reduced system.
+    TEST_CHECK(structure.blockParamList.size() == LINEAR_POINTS);
+    TEST_CHECK(structure.reducedParamList.size()
+               == (LINEAR_CAMERAS * LINEAR_PARAMS_PER_OBJECT));
+    TEST_CHECK(structure.denseReducedSystem);
+    for (size_t b = 0; b < structure.blockParamList.size(); ++b) {
+        TEST_CHECK(structure.blockParamList[b].size() == LINEAR_PARAMS_PER_OBJECT);
+        TEST_CHECK(structure.blockReducedList[b].size()
+                   == (LINEAR_CAMERAS * LINEAR_PARAMS_PER_OBJECT));
+    }
+    TEST_CHECK(structure.blockErrorList[0].size() == ((LINEAR_CAMERAS * 2) + 1));
+    TEST_CHECK(structure.blockErrorList[1].size() == (LINEAR_CAMERAS * 2));
+
+    // The rows contain the same values as the columns.
+    TEST_CHECK(structure.rowValueList.size() == structure.rowIndexList.size());
+    for (int j = 0; j < problem.numberOfErrors; ++j) {
+        for (int k = structure.rowStartList[j]; k < structure.rowStartList[j + 1]; ++k) {
+            const int v = structure.rowValueList[k];
+            const int i = structure.rowParamList[k];
+            TEST_CHECK(structure.rowIndexList[v] == j);
+            TEST_CHECK(v >= structure.columnStartList[i]);
+            TEST_CHECK(v < structure.columnStartList[i + 1]);
+        }
+    }
+}
+
+
+// Point parameters that are all coupled together form a block too
+// large to eliminate, and are solved in the reduced system.
+void test_schur_structure_large_block() {
+    const int n = SCHUR_BLOCK_PARAMETERS_MAX + 1;
+    IndexList2D paramToErrorIndexList(n);
+    for (int i = 0; i < n; ++i) {
+        paramToErrorIndexList[i].push_back(i);
+        paramToErrorIndexList[i].push_back(n);
+    }
+    std::vector<bool> pointParamList(n, true);
+    SchurStructure structure;
+    findSchurStructure(n + 1, paramToErrorIndexList, pointParamList, structure);
+    TEST_CHECK(structure.blockParamList.empty());
+    TEST_CHECK(static_cast<int>(structure.reducedParamList.size()) == n);
+}
+
+
+void test_schur_solve_dense() {
+    LinearProblem problem;
+    createLinearProblem(problem);
+    solveLinearProblem(problem);
+}
+
+
+void test_schur_solve_pcg() {
+    LinearProblem problem;
+    createLinearProblem(problem);
+    problem.structure.denseReducedSystem = false;
+    solveLinearProblem(problem);
+}
+
+
+// With no point parameters the solver is a sparse LM solver.
+void test_schur_solve_no_points() {
+    LinearProblem problem;
+    createLinearProblem(problem);
+    problem.pointParamList.assign(problem.numberOfParameters, false);
+    findSchurStructure(problem.numberOfErrors, problem.paramToErrorIndexList,
+                       problem.pointParamList, problem.structure);
+    TEST_CHECK(problem.structure.blockParamList.empty());
+    solveLinearProblem(problem);
+}
+
+
+// Solve bundles and camera, with bounds and stiffness.
+void test_schur_solve_scene() {
+    SyntheticSceneOptions options;
+    setSyntheticSceneOptionDefaults(options);
+    options.numberOfFrames = 8;
+    options.numberOfBundles = 20;
+    Scene scene;
+    createSyntheticScene(options, scene);
+
+    SceneAttrList attrList;
+    createBundleAttrs(scene, attrList);
+    createCameraAttrs(scene, 0, attrList);
+    SceneAttr &boundedAttr = attrList[0];
+    const double boundedValue = getSceneAttrValue(scene, boundedAttr, -1);
+    boundedAttr.minValue = boundedValue - 0.2;
+    boundedAttr.maxValue = boundedValue + 0.2;
+    SceneAttr &stiffAttr = attrList[1];
+    stiffAttr.stiffnessWeight = 1.0;
+    stiffAttr.stiffnessVariance = 1.0;
+    stiffAttr.stiffnessValue = getSceneAttrValue(scene, stiffAttr, -1);
+    perturbSceneAttrs(attrList, 0.1, 11, scene);
+    SceneProblem problem(scene, attrList);
+
+    SolverOptions solverOptions;
+    setProblemSolverOptionDefaults(SOLVER_TYPE_SCHUR_LM, solverOptions);
+    ProblemSolverData userData;
+    initProblemSolverData(problem, solverOptions, false, userData);
+    TEST_CHECK(static_cast<int>(userData.schurStructure.blockParamList.size())
+               == options.numberOfBundles);
+
+    SolverResult solverResult;
+    bool ok = solveProblem(solverOptions, problem, false, solverResult);
+    TEST_CHECK(ok);
+    TEST_CHECK(solverResult.success);
+    TEST_CHECK(solverResult.errorAvg < 0.1);
+    TEST_CHECK(solverResult.errorMax < 1.0);
+
+    const double value = getSceneAttrValue(scene, boundedAttr, -1);
+    TEST_CHECK(value >= boundedAttr.minValue);
+    TEST_CHECK(value <= boundedAttr.maxValue);
+}
+
+
+int main() {
+    TEST_RUN(test_schur_structure);
+    TEST_RUN(test_schur_structure_large_block);
+    TEST_RUN(test_schur_solve_dense);
+    TEST_RUN(test_schur_solve_pcg);
+    TEST_RUN(test_schur_solve_no_points);
+    TEST_RUN(test_schur_solve_scene);
+    return TEST_RESULT();
+}
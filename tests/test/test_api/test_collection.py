@@ -221,6 +221,69 @@ class TestCollection(test_api_utils.APITestCase):
 
         self.assertEqual(x.get_marker_list_length(), 2)
 
+    def test_get_marker_list_cache(self):
+        """
+        Repeated calls must not query the object type of each member.
+        """
+        x = collection.Collection()
+        x.create_node('mySolve')
+        mkr_list = [marker.Marker().create_node() for i in range(10)]
+        x.add_marker_list(mkr_list)
+
+        classified = []
+        orig_func = api_utils.get_object_types
+
+        def counted_func(nodes):
+            classified.extend(nodes)
+            return orig_func(nodes)
+
+        api_utils.get_object_types = counted_func
+        try:
+            self.assertEqual(len(x.get_marker_list()), 10)
+            self.assertEqual(len(classified), 10)
+
+            # The object types are cached.
+            classified[:] = []
+            self.assertEqual(len(x.get_marker_list()), 10)
+            self.assertEqual(len(x.get_attribute_list()), 0)
+            y = collection.Collection(node=x.get_node())
+            self.assertEqual(len(y.get_marker_list()), 10)
+            self.assertEqual(len(classified), 0)
+
+            # Only the new member is queried.
+            mkr = marker.Marker().create_node()
+            x.add_marker(mkr)
+            classified[:] = []
+            self.assertEqual(len(x.get_marker_list()), 11)
+            self.assertEqual(classified, [mkr.get_node()])
+        finally:
+            api_utils.get_object_types = orig_func
+
+    def test_member_cache_invalidate(self):
+        """
+        The member cache follows set changes made outside of the
+        Collection class, and is cleared with a new Maya scene.
+        """
+        x = collection.Collection()
+        x.create_node('mySolve')
+        mkr_list = [marker.Marker().create_node() for i in range(3)]
+        x.add_marker_list(mkr_list)
+        self.assertEqual(len(x.get_marker_list()), 3)
+
+        # Members changed with Maya commands.
+        maya.cmds.sets(mkr_list[0].get_node(), remove=x.get_node())
+        self.assertEqual(len(x.get_marker_list()), 2)
+        maya.cmds.sets(mkr_list[0].get_node(), add=x.get_node())
+        self.assertEqual(len(x.get_marker_list()), 3)
+
+        members_cache = getattr(collection, '__COLLECTION_MEMBERS_CACHE')
+        types_cache = getattr(collection, '__NODE_OBJECT_TYPE_CACHE')
+        self.assertGreater(len(members_cache), 0)
+        self.assertGreater(len(types_cache), 0)
+        maya.cmds.file(new=True, force=True)
+        self.assertEqual(len(members_cache), 0)
+        self.assertEqual(len(types_cache), 0)
+
     def test_get_marker_list_length(self):
         x = collection.Collection()
         x.create_node('mySolve')
@@ -0,0 +1,175 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for 'uimodels' module.
+
+Only QtCore is used, no widgets are created.
+"""
+
+import unittest
+
+import test.test_api.apiutils as test_api_utils
+import mmSolver.ui.nodes as uinodes
+import mmSolver.ui.uimodels as uimodels
+
+
+class _UUIDNode(uinodes.Node):
+    """
+    A node matched by a UUID, like the Solver UI object nodes.
+    """
+
+    def key(self):
+        return (self.typeInfo, self.data().get('uuid'))
+
+
+def _create_root_node(names_and_uuids):
+    root = uinodes.Node('root')
+    for name, uuid in names_and_uuids:
+        _UUIDNode(name, data={'uuid': uuid}, parent=root)
+    return root
+
+
+def _child_names(node):
+    return [n.name() for n in node.children()]
+
+
+class _SignalRecorder(object):
+    """
+    Record the row change signals emitted by a model.
+    """
+
+    def __init__(self, model):
+        self.inserted = []
+        self.removed = []
+        self.moved = []
+        self.changed = []
+        self.reset = 0
+        model.rowsInserted.connect(self._rows_inserted)
+        model.rowsRemoved.connect(self._rows_removed)
+        model.rowsMoved.connect(self._rows_moved)
+        model.dataChanged.connect(self._data_changed)
+        model.modelReset.connect(self._model_reset)
+
+    def _rows_inserted(self, parent, first, last, *args):
+        self.inserted.append((first, last))
+
+    def _rows_removed(self, parent, first, last, *args):
+        self.removed.append((first, last))
+
+    def _rows_moved(self, parent, start, end, destination, row, *args):
+        self.moved.append((start, end, row))
+
+    def _data_changed(self, top_left, bottom_right, *args):
+        self.changed.append((top_left.row(), bottom_right.row()))
+
+    def _model_reset(self, *args):
+        self.reset += 1
+
+
+# @unittest.skip
+class TestItemModel(test_api_utils.APITestCase):
+
+    def create_model(self, names_and_uuids):
+        model = uimodels.ItemModel(_create_root_node(names_and_uuids))
+        recorder = _SignalRecorder(model)
+        return model, recorder
+
+    def test_update_root_node_insert(self):
+        model, recorder = self.create_model([('a', 1), ('b', 2)])
+        old_children = model.rootNode().children()
+        new_root = _create_root_node(
+            [('a', 1), ('x', 10), ('y', 11), ('b', 2), ('z', 12)])
+        model.updateRootNode(new_root)
+
+        self.assertEqual(
+            _child_names(model.rootNode()), ['a', 'x', 'y', 'b', 'z'])
+        self.assertEqual(model.rowCount(), 5)
+        self.assertIs(model.rootNode().child(0), old_children[0])
+        self.assertIs(model.rootNode().child(3), old_children[1])
+        self.assertEqual(recorder.inserted, [(1, 2), (4, 4)])
+        self.assertEqual(recorder.removed, [])
+        self.assertEqual(recorder.moved, [])
+        self.assertEqual(recorder.changed, [(0, 3)])
+        self.assertEqual(recorder.reset, 0)
+
+    def test_update_root_node_remove(self):
+        model, recorder = self.create_model(
+            [('a', 1), ('b', 2), ('c', 3), ('d', 4), ('e', 5)])
+        new_root = _create_root_node([('a', 1), ('d', 4)])
+        model.updateRootNode(new_root)
+
+        self.assertEqual(_child_names(model.rootNode()), ['a', 'd'])
+        self.assertEqual(model.rowCount(), 2)
+        # Contiguous rows are removed together, from the end.
+        self.assertEqual(recorder.removed, [(4, 4), (1, 2)])
+        self.assertEqual(recorder.inserted, [])
+        self.assertEqual(recorder.moved, [])
+        self.assertEqual(recorder.changed, [(0, 1)])
+        self.assertEqual(recorder.reset, 0)
+
+    def test_update_root_node_reorder(self):
+        model, recorder = self.create_model([('a', 1), ('b', 2), ('c', 3)])
+        old_children = model.rootNode().children()
+        new_root = _create_root_node([('c', 3), ('a', 1), ('b', 2)])
+        model.updateRootNode(new_root)
+
+        self.assertEqual(_child_names(model.rootNode()), ['c', 'a', 'b'])
+        self.assertEqual(
+            model.rootNode().children(),
+            [old_children[2], old_children[0], old_children[1]])
+        self.assertEqual(recorder.moved, [(2, 2, 0)])
+        self.assertEqual(recorder.inserted, [])
+        self.assertEqual(recorder.removed, [])
+        self.assertEqual(recorder.changed, [(0, 2)])
+        self.assertEqual(recorder.reset, 0)
+
+    def test_update_root_node_renamed(self):
+        # Nodes matched by UUID keep their row when renamed.
+        model, recorder = self.create_model([('a', 1), ('b', 2)])
+        old_children = model.rootNode().children()
+        new_root = _create_root_node([('a_renamed', 1), ('b', 2)])
+        model.updateRootNode(new_root)
+
+        self.assertEqual(_child_names(model.rootNode()), ['a_renamed', 'b'])
+        self.assertEqual(model.rootNode().children(), old_children)
+        self.assertEqual(recorder.inserted, [])
+        self.assertEqual(recorder.removed, [])
+        self.assertEqual(recorder.moved, [])
+        self.assertEqual(recorder.changed, [(0, 1)])
+        self.assertEqual(recorder.reset, 0)
+
+    def test_update_root_node_duplicate_keys(self):
+        # Duplicate keys cannot be matched, so all rows are replaced.
+        model, recorder = self.create_model([('a', 1), ('b', 2), ('c', 3)])
+        new_root = _create_root_node([('a', 1), ('b1', 2), ('b2', 2)])
+        new_children = new_root.children()
+        model.updateRootNode(new_root)
+
+        self.assertEqual(_child_names(model.rootNode()), ['a', 'b1', 'b2'])
+        self.assertEqual(model.rootNode().children(), new_children)
+        for node in model.rootNode().children():
+            self.assertIs(node.parent(), model.rootNode())
+        self.assertEqual(recorder.removed, [(0, 2)])
+        self.assertEqual(recorder.inserted, [(0, 2)])
+        self.assertEqual(recorder.moved, [])
+        self.assertEqual(recorder.changed, [])
+        self.assertEqual(recorder.reset, 0)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
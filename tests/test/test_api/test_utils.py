@@ -19,19 +19,26 @@
 Test functions for API utils module.
 """
 
+import time
 import unittest
 
 import maya.cmds
 import maya.OpenMaya as OpenMaya
 
+import mmSolver.logger
 import test.test_api.apiutils as test_api_utils
 import mmSolver.utils.node as node_utils
 import mmSolver._api.naming as api_naming
 import mmSolver._api.utils as api_utils
 import mmSolver._api.marker as marker
+import mmSolver._api.bundle as bundle
+import mmSolver._api.collection as collection
 import mmSolver._api.constant as const
 
 
+LOG = mmSolver.logger.get_logger()
+
+
 # @unittest.skip
 class TestUtils(test_api_utils.APITestCase):
     def test_get_long_name(self):
@@ -184,6 +191,63 @@ class TestUtils(test_api_utils.APITestCase):
         obj_type = api_utils.get_object_type(node_attr)
         self.assertEqual(obj_type, const.OBJECT_TYPE_ATTRIBUTE)
 
+    def test_get_object_types(self):
+        """
+        Classifying many nodes at once must give the same results as
+        classifying each node.
+        """
+        cam_tfm = maya.cmds.createNode('transform')
+        cam_tfm = node_utils.get_long_name(cam_tfm)
+        cam_shp = maya.cmds.createNode('camera', parent=cam_tfm)
+        cam_shp = node_utils.get_long_name(cam_shp)
+        mkr_grp = maya.cmds.createNode('mmMarkerGroupTransform')
+        mkr_grp = node_utils.get_long_name(mkr_grp)
+        col = collection.Collection().create_node('mySolve')
+        loc_tfm = maya.cmds.createNode('transform')
+        loc_tfm = node_utils.get_long_name(loc_tfm)
+        maya.cmds.createNode('locator', parent=loc_tfm)
+
+        nodes = [
+            cam_tfm,
+            cam_shp,
+            mkr_grp,
+            col.get_node(),
+            loc_tfm,
+            loc_tfm + '.translateX',
+        ]
+        for i in range(100):
+            mkr = marker.Marker().create_node()
+            bnd = bundle.Bundle().create_node()
+            nodes += [mkr.get_node(), bnd.get_node()]
+        # The same node given twice.
+        nodes.append(cam_tfm)
+        nodes.append(maya.cmds.ls(cam_tfm)[0])
+
+        s = time.time()
+        obj_types = [api_utils.get_object_type(n) for n in nodes]
+        e = time.time()
+        single_time = e - s
+
+        s = time.time()
+        batch_obj_types = api_utils.get_object_types(nodes)
+        e = time.time()
+        batch_time = e - s
+        LOG.info('get_object_type %r nodes: single=%r batch=%r',
+                 len(nodes), single_time, batch_time)
+
+        self.assertEqual(batch_obj_types, obj_types)
+        self.assertEqual(obj_types[0], const.OBJECT_TYPE_CAMERA)
+        self.assertEqual(obj_types[2], const.OBJECT_TYPE_MARKER_GROUP)
+        self.assertEqual(obj_types[3], const.OBJECT_TYPE_COLLECTION)
+        self.assertEqual(obj_types[4], const.OBJECT_TYPE_UNKNOWN)
+        self.assertEqual(obj_types[5], const.OBJECT_TYPE_ATTRIBUTE)
+        self.assertEqual(obj_types[6], const.OBJECT_TYPE_MARKER)
+        self.assertEqual(obj_types[7], const.OBJECT_TYPE_BUNDLE)
+
+        # Nodes that do not exist are unknown.
+        obj_types = api_utils.get_object_types(['|doesNotExist'])
+        self.assertEqual(obj_types, [const.OBJECT_TYPE_UNKNOWN])
+
     def test_get_camera_above_node(self):
         root = maya.cmds.createNode('transform')
         root = node_utils.get_long_name(root)
@@ -31,6 +31,7 @@ import maya.cmds
 
 
 import test.test_solver.solverutils as solverUtils
+import mmSolver._api.markerutils as markerutils
 
 
 # @unittest.skip
@@ -140,6 +141,55 @@ class TestSolverDeviationCalculation(solverUtils.SolverTestCase):
         self.assertTrue(self.approx_equal(mkr_middleLeft_values[1], 576.0, eps=eps))
         return
 
+    def test_marker_deviation(self):
+        """
+        Compare the deviation computed by 'markerutils' with the
+        mmReprojection command.
+        """
+        file_name = 'solverDeviationCalculation.ma'
+        path = self.get_data_path('scenes', file_name)
+        maya.cmds.file(path, open=True, force=True, ignoreVersion=True)
+
+        cam_tfm = '|camera1'
+        cam_shp = '|camera1|cameraShape1'
+        image_width = 2048.0
+        image_height = 2048.0 / 1.777777777
+        times = [1001.0]
+        mkr_bnd_list = [
+            ('topRight_01_MKR', 'topRight_01_BND'),
+            ('middleLeft_01_MKR', 'middleLeft_01_BND'),
+            ('middleTop_01_MKR', 'middleTop_01_BND'),
+            ('topLeft_01_MKR', 'topLeft_01_BND'),
+        ]
+        mkr_deviation_list = []
+        expected_list = []
+        for mkr_node, bnd_node in mkr_bnd_list:
+            mkr_deviation_list.append((
+                mkr_node, bnd_node,
+                cam_tfm, cam_shp,
+                times, [1.0], [1],
+                image_width, image_height))
+            values = []
+            for node in [mkr_node, bnd_node]:
+                values.append(maya.cmds.mmReprojection(
+                    node,
+                    camera=(cam_tfm, cam_shp),
+                    time=times,
+                    imageResolution=(image_width, image_height),
+                    asPixelCoordinate=True,
+                ))
+            dx = values[0][0] - values[1][0]
+            dy = values[0][1] - values[1][1]
+            expected_list.append(((dx * dx) + (dy * dy)) ** 0.5)
+
+        dev_lists = markerutils.calculate_markers_deviation(
+            mkr_deviation_list)
+        self.assertEqual(len(dev_lists), len(mkr_bnd_list))
+        for dev_list, expected in zip(dev_lists, expected_list):
+            self.assertEqual(len(dev_list), 1)
+            self.assertTrue(self.approx_equal(dev_list[0], expected, eps=0.0001))
+        return
+
     def test_init_levmar(self):
         self.do_solve('levmar', 0)
 
@@ -26,6 +26,7 @@ import maya.cmds
 
 import test.test_solver.solverutils as solverUtils
 import mmSolver.utils.node as node_utils
+import mmSolver.utils.reprojection as reproj_utils
 
 
 # @unittest.skip
@@ -159,6 +160,73 @@ class TestReprojectionNode(solverUtils.SolverTestCase):
         maya.cmds.file(save=True, type='mayaAscii', force=True)
         return
 
+    def test_reprojection_utils(self):
+        """
+        Compare the 'mmSolver.utils.reprojection' module with the
+        mmReprojection command.
+        """
+        start = 1001
+        end = 1005
+        times = list(range(start, end + 1))
+        image_width = 1920.0
+        image_height = 1080.0
+
+        cam_tfm, cam_shp = self.create_camera('camera')
+        maya.cmds.setAttr(cam_tfm + '.translateY', 2.0)
+        maya.cmds.setAttr(cam_tfm + '.translateZ', 5)
+        maya.cmds.setAttr(cam_tfm + '.rotateY', -15.0)
+        maya.cmds.setKeyframe(cam_tfm, attribute='translateX',
+                              time=start, value=-2.0)
+        maya.cmds.setKeyframe(cam_tfm, attribute='translateX',
+                              time=end, value=2.0)
+        maya.cmds.setKeyframe(cam_shp, attribute='focalLength',
+                              time=start, value=35.0)
+        maya.cmds.setKeyframe(cam_shp, attribute='focalLength',
+                              time=end, value=85.0)
+        maya.cmds.setAttr(cam_shp + '.horizontalFilmOffset', 0.1)
+        maya.cmds.setAttr(cam_shp + '.verticalFilmOffset', -0.05)
+
+        in_tfm = maya.cmds.createNode('transform', name='INPUT')
+        pnt = (-0.5, 2.7, -1.0)
+        maya.cmds.setAttr(in_tfm + '.translate', *pnt)
+
+        film_backs = [(1.417, 0.945), (0.980, 0.735), (1.0, 0.25)]
+        for film_fit in reproj_utils.FILM_FIT_LIST:
+            for film_back_width, film_back_height in film_backs:
+                maya.cmds.setAttr(cam_shp + '.filmFit', film_fit)
+                maya.cmds.setAttr(cam_shp + '.horizontalFilmAperture',
+                                  film_back_width)
+                maya.cmds.setAttr(cam_shp + '.verticalFilmAperture',
+                                  film_back_height)
+                values = maya.cmds.mmReprojection(
+                    in_tfm,
+                    camera=(cam_tfm, cam_shp),
+                    time=times,
+                    imageResolution=(image_width, image_height),
+                    asPixelCoordinate=True,
+                )
+
+                cam_matrices = [
+                    maya.cmds.getAttr(cam_tfm + '.worldMatrix', time=t)
+                    for t in times]
+                focal_lengths = [
+                    maya.cmds.getAttr(cam_shp + '.focalLength', time=t)
+                    for t in times]
+                coords = reproj_utils.reproject_points(
+                    [pnt] * len(times),
+                    cam_matrices,
+                    focal_lengths,
+                    film_back_width, film_back_height,
+                    0.1, -0.05,
+                    image_width, image_height,
+                    film_fit=film_fit,
+                    as_pixel_coordinate=True)
+                self.assertEqual(len(coords), len(times))
+                for i, (x, y) in enumerate(coords):
+                    self.assertTrue(self.approx_equal(x, values[(i * 3) + 0]))
+                    self.assertTrue(self.approx_equal(y, values[(i * 3) + 1]))
+        return
+
 
 if __name__ == '__main__':
     prog = unittest.main()
@@ -0,0 +1,155 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for the Solver UI Collection state document.
+"""
+
+import json
+import unittest
+
+import maya.cmds
+
+import test.test_tools.toolsutils as test_tools_utils
+import mmSolver.api as mmapi
+import mmSolver.utils.configmaya as configmaya
+import mmSolver.tools.solver.constant as const
+import mmSolver.tools.solver.lib.collectionstate as lib
+
+
+# @unittest.skip
+class TestCollectionState(test_tools_utils.ToolsTestCase):
+
+    def create_collection(self):
+        col = mmapi.Collection().create_node('mySolve')
+        return col
+
+    def has_state_attr(self, col):
+        return maya.cmds.attributeQuery(
+            const.COLLECTION_STATE_ATTR,
+            node=col.get_node(),
+            exists=True)
+
+    def get_state_document(self, col):
+        configmaya.flush_node_options()
+        plug = col.get_node() + '.' + const.COLLECTION_STATE_ATTR
+        return json.loads(maya.cmds.getAttr(plug))
+
+    def test_defaults(self):
+        """
+        A new Collection uses the default values.
+        """
+        col = self.create_collection()
+        values = lib.get_state_from_collection(col)
+        for name, attr_type, default_value in lib.STATE_OPTION_LIST:
+            self.assertEqual(values[name], default_value)
+            self.assertEqual(lib.get_state_value(col, name), default_value)
+        self.assertFalse(self.has_state_attr(col))
+
+    def test_legacy_migration(self):
+        """
+        A Collection with the options stored in individual attributes
+        (before the state document) is read with the same values, and
+        migrated when an option is set.
+        """
+        col = self.create_collection()
+        node = col.get_node()
+        maya.cmds.addAttr(
+            node,
+            longName=const.OVERRIDE_CURRENT_FRAME_ATTR,
+            attributeType='bool')
+        maya.cmds.setAttr(node + '.' + const.OVERRIDE_CURRENT_FRAME_ATTR, True)
+        maya.cmds.addAttr(
+            node,
+            longName=const.SOLVER_TAB_ATTR,
+            dataType='string')
+        maya.cmds.setAttr(
+            node + '.' + const.SOLVER_TAB_ATTR,
+            const.SOLVER_TAB_STANDARD_VALUE,
+            type='string')
+
+        # Reading does not change the node.
+        values = lib.get_state_from_collection(col)
+        self.assertEqual(values[const.OVERRIDE_CURRENT_FRAME_ATTR], True)
+        self.assertEqual(values[const.SOLVER_TAB_ATTR],
+                         const.SOLVER_TAB_STANDARD_VALUE)
+        self.assertEqual(values[const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR],
+                         const.ATTRIBUTE_TOGGLE_ANIMATED_DEFAULT_VALUE)
+        self.assertFalse(self.has_state_attr(col))
+
+        # Setting a value writes the migrated document.
+        lib.set_state_value(col, const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR, False)
+        data = self.get_state_document(col)
+        self.assertEqual(data[const.COLLECTION_STATE_VERSION_KEY],
+                         const.COLLECTION_STATE_VERSION)
+        stored_values = data[const.COLLECTION_STATE_VALUES_KEY]
+        self.assertEqual(stored_values[const.OVERRIDE_CURRENT_FRAME_ATTR], True)
+        self.assertEqual(stored_values[const.SOLVER_TAB_ATTR],
+                         const.SOLVER_TAB_STANDARD_VALUE)
+        self.assertEqual(stored_values[const.ATTRIBUTE_TOGGLE_ANIMATED_ATTR], False)
+
+        # The legacy attributes are no longer read.
+        maya.cmds.setAttr(node + '.' + const.OVERRIDE_CURRENT_FRAME_ATTR, False)
+        value = lib.get_state_value(col, const.OVERRIDE_CURRENT_FRAME_ATTR)
+        self.assertEqual(value, True)
+
+    def test_invalid_document(self):
+        """
+        Invalid or corrupt state documents fall back to the default
+        values, and can be replaced by setting a value.
+        """
+        col = self.create_collection()
+        node = col.get_node()
+        plug = node + '.' + const.COLLECTION_STATE_ATTR
+        maya.cmds.addAttr(
+            node,
+            longName=const.COLLECTION_STATE_ATTR,
+            dataType='string')
+
+        documents = [
+            '{not valid json',
+            json.dumps([1, 2, 3]),
+            json.dumps({const.COLLECTION_STATE_VERSION_KEY: 'one'}),
+            json.dumps({
+                const.COLLECTION_STATE_VERSION_KEY: const.COLLECTION_STATE_VERSION,
+                const.COLLECTION_STATE_VALUES_KEY: [True],
+            }),
+            json.dumps({
+                const.COLLECTION_STATE_VERSION_KEY: const.COLLECTION_STATE_VERSION,
+                const.COLLECTION_STATE_VALUES_KEY: {
+                    const.OVERRIDE_CURRENT_FRAME_ATTR: 'yes',
+                    const.SOLVER_TAB_ATTR: 42,
+                },
+            }),
+        ]
+        for document in documents:
+            maya.cmds.setAttr(plug, document, type='string')
+            configmaya.clear_node_option_cache()
+            values = lib.get_state_from_collection(col)
+            for name, attr_type, default_value in lib.STATE_OPTION_LIST:
+                self.assertEqual(values[name], default_value)
+
+        lib.set_state_value(col, const.OVERRIDE_CURRENT_FRAME_ATTR, True)
+        data = self.get_state_document(col)
+        self.assertEqual(data[const.COLLECTION_STATE_VERSION_KEY],
+                         const.COLLECTION_STATE_VERSION)
+        value = lib.get_state_value(col, const.OVERRIDE_CURRENT_FRAME_ATTR)
+        self.assertEqual(value, True)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
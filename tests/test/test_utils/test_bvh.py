@@ -0,0 +1,139 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for Bounding Volume Hierarchy utilities module.
+"""
+
+import random
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.bvh as mod
+
+
+def _random_scene(num_points, num_tris, num_rays, seed=42):
+    rand = random.Random(seed)
+    points = []
+    for i in range(num_points):
+        points.append((rand.uniform(-5.0, 5.0),
+                       rand.uniform(-5.0, 5.0),
+                       rand.uniform(-5.0, 5.0)))
+    triangles = []
+    for i in range(num_tris):
+        triangles.append((rand.randrange(num_points),
+                          rand.randrange(num_points),
+                          rand.randrange(num_points)))
+    origins = []
+    directions = []
+    for i in range(num_rays):
+        origins.append((rand.uniform(-6.0, 6.0),
+                        rand.uniform(-6.0, 6.0),
+                        rand.uniform(-6.0, 6.0)))
+        directions.append((rand.uniform(-1.0, 1.0),
+                           rand.uniform(-1.0, 1.0),
+                           rand.uniform(-1.0, 1.0)))
+    # Axis aligned directions, with zero components.
+    directions[0] = (0.0, 0.0, 1.0)
+    directions[1] = (-1.0, 0.0, 0.0)
+    return points, triangles, origins, directions
+
+
+def _brute_force(points, triangles, origins, directions, max_dist):
+    hits = []
+    for origin, direction in zip(origins, directions):
+        best = None
+        for tri in triangles:
+            t = mod.intersect_ray_triangle(
+                origin, direction,
+                points[tri[0]], points[tri[1]], points[tri[2]])
+            if t is None or t > max_dist:
+                continue
+            if best is None or t < best:
+                best = t
+        hits.append(best)
+    return hits
+
+
+# @unittest.skip
+class TestBVH(test_utils.UtilsTestCase):
+    """
+    Test bvh module.
+    """
+
+    def assertHitsEqual(self, hits_a, hits_b):
+        self.assertEqual(len(hits_a), len(hits_b))
+        for a, b in zip(hits_a, hits_b):
+            if a is None or b is None:
+                self.assertIs(a, b)
+            else:
+                self.assertTrue(self.approx_equal(a, b, eps=1e-9))
+
+    def test_intersect_ray_triangle(self):
+        v0 = (-1.0, -1.0, 0.0)
+        v1 = (1.0, -1.0, 0.0)
+        v2 = (0.0, 1.0, 0.0)
+        t = mod.intersect_ray_triangle(
+            (0.0, 0.0, 10.0), (0.0, 0.0, -1.0), v0, v1, v2)
+        self.assertTrue(self.approx_equal(t, 10.0))
+        # Behind the origin.
+        t = mod.intersect_ray_triangle(
+            (0.0, 0.0, 10.0), (0.0, 0.0, 1.0), v0, v1, v2)
+        self.assertIs(t, None)
+        # Misses the triangle.
+        t = mod.intersect_ray_triangle(
+            (5.0, 0.0, 10.0), (0.0, 0.0, -1.0), v0, v1, v2)
+        self.assertIs(t, None)
+        # Parallel to the triangle.
+        t = mod.intersect_ray_triangle(
+            (0.0, 0.0, 10.0), (1.0, 0.0, 0.0), v0, v1, v2)
+        self.assertIs(t, None)
+
+    def test_intersect_rays(self):
+        points = [(-1.0, -1.0, 0.0), (1.0, -1.0, 0.0), (0.0, 1.0, 0.0)]
+        bvh = mod.BVH(points, [(0, 1, 2)])
+        hits = bvh.intersect_rays(
+            [(0.0, 0.0, 10.0), (5.0, 0.0, 10.0)],
+            [(0.0, 0.0, -2.0), (0.0, 0.0, -1.0)])
+        self.assertEqual(len(hits), 2)
+        self.assertIs(hits[1], None)
+        for a, b in zip(hits[0], (0.0, 0.0, 0.0)):
+            self.assertTrue(self.approx_equal(a, b))
+
+        empty = mod.BVH([], [])
+        hits = empty.intersect_rays([(0.0, 0.0, 0.0)], [(1.0, 0.0, 0.0)])
+        self.assertEqual(hits, [None])
+
+    def test_compare_brute_force(self):
+        max_dist = 8.0
+        points, triangles, origins, directions = _random_scene(600, 400, 200)
+        expected = _brute_force(points, triangles, origins, directions, max_dist)
+        self.assertGreater(len([t for t in expected if t is not None]), 0)
+
+        for leaf_size in [1, 3, mod.BVH_LEAF_SIZE, 1000]:
+            bvh = mod.BVH(points, triangles, leaf_size=leaf_size)
+            self.assertEqual(bvh.get_triangle_count(), len(triangles))
+            hits = bvh.intersect_rays_param(
+                origins, directions, max_dist=max_dist)
+            self.assertHitsEqual(hits, expected)
+            hits = bvh._intersect_rays_raw(
+                origins, directions, max_dist, 0.0001)
+            self.assertHitsEqual(hits, expected)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
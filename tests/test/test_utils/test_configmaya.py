@@ -2,6 +2,7 @@
 Test functions for Configuration Maya module.
 """
 
+import json
 import os
 import shutil
 import unittest
@@ -52,6 +53,38 @@ class TestConfigMaya(test_utils.UtilsTestCase):
         self.assertEqual(new_value, value)
         return
 
+    def test_node_option_cache(self):
+        node = maya.cmds.createNode('script', name='my_option_node')
+        name = 'my_data_attr'
+        data = {'key': [1, 2, 3]}
+        configmaya.set_node_option_structure(node, name, data, add_attr=True)
+        configmaya.flush_node_options()
+        node_attr = node + '.' + name
+        self.assertEqual(maya.cmds.getAttr(node_attr), json.dumps(data))
+
+        # Changing the returned data does not change the cache.
+        new_data = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(new_data, data)
+        new_data['key'].append(4)
+        new_data = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(new_data, data)
+
+        # Changes to the attribute, outside of the cache, are seen.
+        data = {'key': [4, 5, 6]}
+        maya.cmds.setAttr(node_attr, lock=False)
+        maya.cmds.setAttr(node_attr, json.dumps(data), type='string')
+        new_data = configmaya.get_node_option_structure(node, name)
+        self.assertEqual(new_data, data)
+
+        # Renaming the node does not lose changes.
+        data = {'key': [7]}
+        configmaya.set_node_option_structure(node, name, data)
+        node = maya.cmds.rename(node, 'my_renamed_option_node')
+        configmaya.flush_node_options()
+        node_attr = node + '.' + name
+        self.assertEqual(maya.cmds.getAttr(node_attr), json.dumps(data))
+        return
+
     # def test_set_node_option(self):
     #     return
 
@@ -0,0 +1,130 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for Euler filter utilities module.
+"""
+
+import random
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.animcurve as animcurve_utils
+import mmSolver.utils.eulerfilter as mod
+
+
+def _euler_filter_sequential(values):
+    """
+    Reference implementation, filtering one value at a time.
+    """
+    new_values = []
+    prev_value = None
+    for value in values:
+        if prev_value is not None:
+            value = animcurve_utils.euler_filter_value(prev_value, value)
+        new_values.append(value)
+        prev_value = value
+    return new_values
+
+
+def _random_rotations(num_nodes, num_times, seed=42):
+    rand = random.Random(seed)
+    rotations = []
+    for i in range(num_nodes):
+        node_rots = []
+        for j in range(num_times):
+            rot = (rand.uniform(-720.0, 720.0),
+                   rand.uniform(-180.0, 180.0),
+                   rand.uniform(-720.0, 720.0))
+            node_rots.append(rot)
+        rotations.append(node_rots)
+    return rotations
+
+
+# @unittest.skip
+class TestEulerFilter(test_utils.UtilsTestCase):
+    """
+    Test eulerfilter module.
+    """
+
+    def assertValuesEqual(self, values_a, values_b):
+        self.assertEqual(len(values_a), len(values_b))
+        for a, b in zip(values_a, values_b):
+            self.assertTrue(self.approx_equal(a, b, eps=1e-6))
+
+    def test_euler_filter_values(self):
+        values = [170.0, -170.0, -150.0, 180.0, 900.0, -900.0, 0.0]
+        expected = _euler_filter_sequential(values)
+        self.assertValuesEqual(mod._euler_filter_values_raw(values), expected)
+        self.assertValuesEqual(mod.euler_filter_values(values), expected)
+        self.assertEqual(mod.euler_filter_values([]), [])
+        self.assertEqual(mod.euler_filter_values([42.0]), [42.0])
+
+        # Boundary values, exactly 180 degrees apart, are not changed.
+        values = [0.0, 180.0, 0.0, -180.0]
+        self.assertValuesEqual(mod.euler_filter_values(values), values)
+
+    def test_euler_filter_values_numpy(self):
+        if mod.np is None:
+            self.skipTest('numpy is not available.')
+        rotations = _random_rotations(1, 500)
+        values = [r[0] for r in rotations[0]]
+        expected = _euler_filter_sequential(values)
+        x = mod._euler_filter_values_numpy(values).tolist()
+        self.assertValuesEqual(x, expected)
+
+    def test_euler_filter_rotations(self):
+        num_nodes = 10
+        num_times = 200
+        rotations = _random_rotations(num_nodes, num_times)
+        rotate_orders = ['xyz', 'xzy', 'yxz', 'yzx', 'zxy', 'zyx']
+        rotate_orders = (rotate_orders * num_nodes)[:num_nodes]
+
+        x = mod.euler_filter_rotations(rotations, rotate_orders=rotate_orders)
+        self.assertEqual(len(x), num_nodes)
+        for node_rots, new_node_rots in zip(rotations, x):
+            self.assertEqual(len(new_node_rots), num_times)
+            for i in range(3):
+                values = [r[i] for r in node_rots]
+                new_values = [r[i] for r in new_node_rots]
+                expected = _euler_filter_sequential(values)
+                self.assertValuesEqual(new_values, expected)
+
+    def test_euler_filter_rotations_flip(self):
+        # (180, 180, 180) is the same orientation as (0, 0, 0) in
+        # 'xyz' rotate order.
+        rotations = [[(0.0, 0.0, 0.0), (180.0, 180.0, 180.0)]]
+        x = mod.euler_filter_rotations(rotations, flip=False)
+        self.assertValuesEqual(x[0][1], (180.0, 180.0, 180.0))
+        x = mod.euler_filter_rotations(rotations, flip=True)
+        self.assertValuesEqual(x[0][1], (0.0, 0.0, 0.0))
+        x = mod._euler_filter_rotations_flip_raw(rotations, ['xyz'])
+        self.assertValuesEqual(x[0][1], (0.0, 0.0, 0.0))
+
+        # Each rotate order flips a different middle axis.
+        rotations = [
+            [(10.0, 20.0, 30.0), (190.0, 160.0, 210.0)],  # xyz
+            [(10.0, 20.0, 30.0), (170.0, 200.0, 210.0)],  # zxy
+        ]
+        x = mod.euler_filter_rotations(
+            rotations, rotate_orders=['xyz', 'zxy'], flip=True)
+        self.assertValuesEqual(x[0][1], (10.0, 20.0, 30.0))
+        self.assertValuesEqual(x[1][1], (10.0, 20.0, 30.0))
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -0,0 +1,197 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for the event utilities module.
+
+The tests do not require Maya; deferred functions and timers are run
+manually.
+"""
+
+import time
+import unittest
+
+import mmSolver.logger
+import mmSolver.utils.event as event_utils
+
+
+LOG = mmSolver.logger.get_logger()
+
+
+# @unittest.skip
+class TestEvent(unittest.TestCase):
+    """
+    Test event module.
+    """
+
+    def setUp(self):
+        self._deferred = []
+        self._timers = []
+        self._calls = []
+        event_utils.set_deferred_function(self._deferred.append)
+        event_utils.set_timer_function(self.add_timer)
+        super(TestEvent, self).setUp()
+
+    def tearDown(self):
+        # Run any remaining deferred functions, so events triggered in
+        # one test do not leak into another.
+        self.run_deferred()
+        self.run_timers()
+        event_utils.set_deferred_function(None)
+        event_utils.set_timer_function(None)
+        super(TestEvent, self).tearDown()
+
+    def run_deferred(self):
+        count = 0
+        while len(self._deferred) > 0:
+            func = self._deferred.pop(0)
+            func()
+            count += 1
+        return count
+
+    def add_timer(self, delay, func):
+        self._timers.append((delay, func))
+        return True
+
+    def run_timers(self):
+        count = 0
+        while len(self._timers) > 0:
+            _, func = self._timers.pop(0)
+            func()
+            count += 1
+        return count
+
+    def record(self, **kwargs):
+        self._calls.append(kwargs)
+
+    def test_trigger_event(self):
+        event_name = 'test_trigger_event'
+        event_utils.add_function_to_event(event_name, self.record, deferred=False)
+        event_utils.trigger_event(event_name, number=42)
+        self.assertEqual(len(self._calls), 0)
+        self.assertEqual(self.run_deferred(), 1)
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual(self._calls[0]['number'], [42])
+        self.assertEqual(self._calls[0]['event_name'], event_name)
+
+    def test_coalesce(self):
+        """
+        Events triggered before the deferred flush are combined.
+        """
+        event_name_a = 'test_coalesce_a'
+        event_name_b = 'test_coalesce_b'
+        event_utils.add_function_to_event(event_name_a, self.record, deferred=False)
+        event_utils.add_function_to_event(event_name_b, self.record, deferred=False)
+        for i in range(3):
+            event_utils.trigger_event(event_name_a, number=i)
+            event_utils.trigger_event(event_name_b, nodes=[i, i + 10])
+        # A single flush for all events.
+        self.assertEqual(len(self._deferred), 1)
+        self.run_deferred()
+        self.assertEqual(len(self._calls), 2)
+        self.assertEqual(self._calls[0]['number'], [0, 1, 2])
+        self.assertEqual(self._calls[1]['nodes'], [0, 10, 1, 11, 2, 12])
+
+    def test_batch(self):
+        event_name = 'test_batch'
+        event_utils.add_function_to_event(event_name, self.record, deferred=False)
+        with event_utils.batch():
+            with event_utils.batch():
+                event_utils.trigger_event(event_name, number=1)
+            event_utils.trigger_event(event_name, number=2)
+            self.assertEqual(len(self._deferred), 0)
+            self.assertEqual(event_utils.flush_events(), [])
+        self.assertEqual(len(self._deferred), 1)
+        self.run_deferred()
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual(self._calls[0]['number'], [1, 2])
+
+    def test_throttle(self):
+        event_name = 'test_throttle'
+        interval = 0.1
+        event_utils.add_function_to_event(event_name, self.record, deferred=False)
+        event_utils.set_event_throttle(event_name, interval)
+        try:
+            event_utils.trigger_event(event_name, number=1)
+            self.run_deferred()
+            self.assertEqual(len(self._calls), 1)
+
+            # Events with-in the interval are held back, until a
+            # timer is run.
+            event_utils.trigger_event(event_name, number=2)
+            self.run_deferred()
+            event_utils.trigger_event(event_name, number=3)
+            self.run_deferred()
+            self.assertEqual(len(self._calls), 1)
+            self.assertEqual(len(self._timers), 1)
+            delay = self._timers[0][0]
+            self.assertTrue(0.0 < delay <= interval)
+
+            self.assertEqual(self.run_timers(), 1)
+            self.assertEqual(len(self._calls), 2)
+            self.assertEqual(self._calls[1]['number'], [2, 3])
+
+            # Without a timer, events are not held back.
+            event_utils.set_timer_function(lambda delay, func: False)
+            event_utils.trigger_event(event_name, number=4)
+            self.run_deferred()
+            self.assertEqual(len(self._calls), 3)
+            self.assertEqual(self._calls[2]['number'], [4])
+        finally:
+            event_utils.set_event_throttle(event_name, None)
+
+    def test_deferred_function(self):
+        event_name = 'test_deferred_function'
+        event_utils.add_function_to_event(event_name, self.record, deferred=True)
+        event_utils.trigger_event(event_name, number=1)
+        self.run_deferred()
+        self.assertEqual(len(self._calls), 1)
+
+    def test_benchmark(self):
+        """
+        Count the number of handler calls when triggering many events,
+        such as creating many Markers.
+        """
+        event_name = 'test_benchmark'
+        num = 500
+        event_utils.add_function_to_event(event_name, self.record, deferred=False)
+
+        s = time.time()
+        for i in range(num):
+            event_utils.trigger_event(event_name, mkr=i)
+        num_flushes = self.run_deferred()
+        e = time.time()
+        LOG.info('trigger %r events: flushes=%r calls=%r time=%r',
+                 num, num_flushes, len(self._calls), e - s)
+        self.assertEqual(num_flushes, 1)
+        self.assertEqual(len(self._calls), 1)
+        self.assertEqual(len(self._calls[0]['mkr']), num)
+
+        s = time.time()
+        with event_utils.batch():
+            for i in range(num):
+                event_utils.trigger_event(event_name, mkr=i)
+        num_flushes = self.run_deferred()
+        e = time.time()
+        LOG.info('trigger %r events in batch: flushes=%r calls=%r time=%r',
+                 num, num_flushes, len(self._calls) - 1, e - s)
+        self.assertEqual(num_flushes, 1)
+        self.assertEqual(len(self._calls), 2)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
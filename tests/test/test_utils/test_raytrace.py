@@ -0,0 +1,147 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for raytrace utilities module.
+"""
+
+import random
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+
+import maya.cmds
+
+import mmSolver.utils.raytrace as mod
+
+
+def _create_rays(num_rays, seed=42):
+    rand = random.Random(seed)
+    sources = []
+    directions = []
+    for i in range(num_rays):
+        sources.append((rand.uniform(-6.0, 6.0),
+                        rand.uniform(-6.0, 6.0),
+                        20.0))
+        directions.append((rand.uniform(-0.3, 0.3),
+                           rand.uniform(-0.3, 0.3),
+                           -1.0))
+    return sources, directions
+
+
+# @unittest.skip
+class TestRaytrace(test_utils.UtilsTestCase):
+    """
+    Test raytrace module.
+    """
+
+    def compare_with_closest_intersect(self, mesh_nodes, sources, directions):
+        intersector = mod.MeshIntersector(mesh_nodes)
+        try:
+            intersector.update()
+            hits = intersector.closest_intersect_many(sources, directions)
+        finally:
+            intersector.clear()
+        self.assertEqual(len(hits), len(sources))
+
+        num_hits = 0
+        for source, direction, hit in zip(sources, directions, hits):
+            expected = mod.closest_intersect(source, direction, mesh_nodes)
+            if expected is None:
+                self.assertIs(hit, None)
+                continue
+            num_hits += 1
+            self.assertIsNot(hit, None)
+            # MFnMesh uses single precision floating point numbers.
+            self.assertTrue(self.approx_equal(hit[0], expected.x, eps=0.001))
+            self.assertTrue(self.approx_equal(hit[1], expected.y, eps=0.001))
+            self.assertTrue(self.approx_equal(hit[2], expected.z, eps=0.001))
+        return num_hits
+
+    def compare_animated_with_closest_intersect(self, mesh_nodes,
+                                                sources, directions,
+                                                frames):
+        num_hits = 0
+        intersector = mod.MeshIntersector(mesh_nodes)
+        try:
+            for frame in frames:
+                maya.cmds.currentTime(frame, update=True)
+                intersector.update()
+                hits = intersector.closest_intersect_many(sources, directions)
+                for source, direction, hit in zip(sources, directions, hits):
+                    expected = mod.closest_intersect(
+                        source, direction, mesh_nodes)
+                    if expected is None:
+                        self.assertIs(hit, None)
+                        continue
+                    num_hits += 1
+                    self.assertIsNot(hit, None)
+                    self.assertTrue(self.approx_equal(hit[0], expected.x, eps=0.001))
+                    self.assertTrue(self.approx_equal(hit[1], expected.y, eps=0.001))
+                    self.assertTrue(self.approx_equal(hit[2], expected.z, eps=0.001))
+        finally:
+            intersector.clear()
+        return num_hits
+
+    def test_get_mesh_triangles(self):
+        tfm, _ = maya.cmds.polyCube()
+        mesh = maya.cmds.listRelatives(tfm, shapes=True, fullPath=True)[0]
+        points, triangles = mod.get_mesh_triangles(mesh)
+        self.assertEqual(len(points), 8)
+        self.assertEqual(len(triangles), 12)
+
+    def test_closest_intersect_many(self):
+        sphere_tfm, _ = maya.cmds.polySphere(
+            radius=3.0, subdivisionsX=40, subdivisionsY=40)
+        maya.cmds.setAttr(sphere_tfm + '.translate', 1.0, -2.0, 0.5)
+        maya.cmds.setAttr(sphere_tfm + '.rotate', 10.0, 20.0, 30.0)
+        maya.cmds.setAttr(sphere_tfm + '.scale', 1.5, 0.5, 1.0)
+        plane_tfm, _ = maya.cmds.polyPlane(width=20.0, height=20.0)
+        maya.cmds.setAttr(plane_tfm + '.rotateX', 90.0)
+        maya.cmds.setAttr(plane_tfm + '.translateZ', -5.0)
+        mesh_nodes = maya.cmds.ls(type='mesh', long=True)
+
+        sources, directions = _create_rays(200)
+        num_hits = self.compare_with_closest_intersect(
+            mesh_nodes, sources, directions)
+        self.assertGreater(num_hits, 0)
+
+    def test_closest_intersect_many_animated(self):
+        sphere_tfm, _ = maya.cmds.polySphere(radius=3.0)
+        maya.cmds.setKeyframe(sphere_tfm, attribute='translateX', time=1, value=-5.0)
+        maya.cmds.setKeyframe(sphere_tfm, attribute='translateX', time=10, value=5.0)
+        maya.cmds.nonLinear(sphere_tfm, type='bend', curvature=45.0)
+        mesh_nodes = maya.cmds.ls(type='mesh', long=True)
+        sources, directions = _create_rays(50)
+        self.compare_animated_with_closest_intersect(
+            mesh_nodes, sources, directions, [1, 5, 10])
+
+    def test_closest_intersect_many_animated_history(self):
+        # The mesh changes over time without any deformer, using
+        # animated construction history.
+        sphere_tfm, sphere_node = maya.cmds.polySphere(radius=1.0)
+        maya.cmds.setKeyframe(sphere_node, attribute='radius', time=1, value=1.0)
+        maya.cmds.setKeyframe(sphere_node, attribute='radius', time=10, value=5.0)
+        mesh_nodes = maya.cmds.ls(type='mesh', long=True)
+        sources, directions = _create_rays(50)
+        num_hits = self.compare_animated_with_closest_intersect(
+            mesh_nodes, sources, directions, [1, 5, 10])
+        self.assertGreater(num_hits, 0)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
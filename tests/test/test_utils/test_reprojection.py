@@ -0,0 +1,147 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for reprojection utilities module.
+"""
+
+import math
+import random
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.reprojection as mod
+
+
+IDENTITY_MATRIX = [
+    1.0, 0.0, 0.0, 0.0,
+    0.0, 1.0, 0.0, 0.0,
+    0.0, 0.0, 1.0, 0.0,
+    0.0, 0.0, 0.0, 1.0,
+]
+
+
+def _random_camera_matrix(rand):
+    """
+    Camera rotated around the Y axis, with a random position.
+    """
+    angle = rand.uniform(-0.5, 0.5)
+    c = math.cos(angle)
+    s = math.sin(angle)
+    return [
+        c, 0.0, -s, 0.0,
+        0.0, 1.0, 0.0, 0.0,
+        s, 0.0, c, 0.0,
+        rand.uniform(-1.0, 1.0), rand.uniform(-1.0, 1.0),
+        rand.uniform(0.0, 3.0), 1.0,
+    ]
+
+
+# @unittest.skip
+class TestReprojection(test_utils.UtilsTestCase):
+    """
+    Test reprojection module.
+    """
+
+    def assertCoordsEqual(self, coords_a, coords_b, eps=1e-6):
+        self.assertEqual(len(coords_a), len(coords_b))
+        for a, b in zip(coords_a, coords_b):
+            self.assertTrue(self.approx_equal(a[0], b[0], eps=eps))
+            self.assertTrue(self.approx_equal(a[1], b[1], eps=eps))
+
+    def test_reproject_points(self):
+        focal_length = 35.0
+        film_back_width = 1.417
+        film_back_height = 0.945
+        image_width = 1920.0
+        image_height = 1080.0
+
+        # A point on the camera axis is in the center of the image,
+        # and a point is offset by 'focal / (film width / 2)'.
+        offset = 0.1 * focal_length / (film_back_width * 25.4 * 0.5)
+        points = [(0.0, 0.0, -10.0), (1.0, 0.0, -10.0)]
+        coords = mod.reproject_points(
+            points, [IDENTITY_MATRIX] * 2,
+            focal_length, film_back_width, film_back_height,
+            0.0, 0.0,
+            image_width, image_height)
+        self.assertCoordsEqual(coords, [(0.0, 0.0), (offset, 0.0)])
+
+        coords = mod.reproject_points(
+            points, [IDENTITY_MATRIX] * 2,
+            focal_length, film_back_width, film_back_height,
+            0.0, 0.0,
+            image_width, image_height,
+            as_pixel_coordinate=True)
+        expected = [(960.0, 540.0), ((offset + 1.0) * 960.0, 540.0)]
+        self.assertCoordsEqual(coords, expected)
+
+        # Moving the camera moves the points the same.
+        cam_matrix = list(IDENTITY_MATRIX)
+        cam_matrix[12] = 1.0
+        coords = mod.reproject_points(
+            [(1.0, 0.0, -10.0)], [cam_matrix],
+            focal_length, film_back_width, film_back_height,
+            0.0, 0.0,
+            image_width, image_height)
+        self.assertCoordsEqual(coords, [(0.0, 0.0)])
+        self.assertEqual(mod.reproject_points(
+            [], [], focal_length, film_back_width, film_back_height,
+            0.0, 0.0, image_width, image_height), [])
+
+    def test_reproject_points_numpy(self):
+        if mod.np is None:
+            self.skipTest('numpy is not available.')
+        rand = random.Random(42)
+        num = 50
+        points = [(rand.uniform(-5.0, 5.0),
+                   rand.uniform(-5.0, 5.0),
+                   rand.uniform(-50.0, -5.0)) for i in range(num)]
+        cam_matrices = [_random_camera_matrix(rand) for i in range(num)]
+        focal_lengths = [rand.uniform(20.0, 80.0) for i in range(num)]
+        film_backs = [(1.417, 0.945), (0.980, 0.735), (1.0, 0.25)]
+        for film_fit in mod.FILM_FIT_LIST:
+            for film_back_width, film_back_height in film_backs:
+                args = [
+                    points, cam_matrices, focal_lengths,
+                    film_back_width, film_back_height,
+                    0.1, -0.05,
+                    1920.0, 1080.0,
+                    film_fit, 0.1, 1.0
+                ]
+                coords_a = mod._reproject_points_raw(*args)
+                coords_b = mod._reproject_points_numpy(*args).tolist()
+                self.assertCoordsEqual(coords_a, coords_b)
+
+    def test_calculate_deviation(self):
+        coords_a = [(0.0, 0.0), (3.0, 4.0), (3.0, 4.0), (3.0, 4.0)]
+        coords_b = [(0.0, 0.0), (0.0, 0.0), (0.0, 0.0), (0.0, 0.0)]
+        weights = [1.0, 1.0, 0.0, 1.0]
+        enabled = [1, 1, 1, 0]
+        expected = [0.0, 5.0, None, None]
+        dev = mod._calculate_deviation_raw(
+            coords_a, coords_b, weights, enabled)
+        self.assertEqual(dev, expected)
+        dev = mod.calculate_deviation(
+            coords_a, coords_b, weights=weights, enabled=enabled)
+        self.assertEqual(dev, expected)
+        dev = mod.calculate_deviation(coords_a, coords_b)
+        self.assertEqual(dev, [0.0, 5.0, 5.0, 5.0])
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
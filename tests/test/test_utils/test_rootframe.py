@@ -0,0 +1,199 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for root frame utilities module.
+"""
+
+import random
+import time
+import unittest
+
+import mmSolver.logger
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.rootframe as mod
+
+
+LOG = mmSolver.logger.get_logger()
+
+
+def _random_enabled_frames(num_markers, start_frame, end_frame, seed=42):
+    """
+    Create Markers enabled for a random (contiguous) range of frames.
+    """
+    rand = random.Random(seed)
+    enabled_frames_list = []
+    for i in range(num_markers):
+        length = rand.randint(1, (end_frame - start_frame) // 4)
+        s = rand.randint(start_frame, end_frame - length)
+        enabled_frames_list.append(list(range(s, s + length + 1)))
+    return enabled_frames_list
+
+
+def _to_lists(bitmap):
+    return [[bool(v) for v in row] for row in bitmap]
+
+
+# @unittest.skip
+class TestRootFrame(test_utils.UtilsTestCase):
+    """
+    Test rootframe module.
+    """
+
+    def test_create_enabled_bitmap(self):
+        enabled_frames_list = [
+            [1, 2, 3],
+            [3, 4, 5, 99],
+            [],
+        ]
+        bitmap = mod.create_enabled_bitmap(enabled_frames_list, 1, 5)
+        self.assertEqual(_to_lists(bitmap), [
+            [True, True, True, False, False],
+            [False, False, True, True, True],
+            [False, False, False, False, False],
+        ])
+        coverage = mod.get_frame_coverage(bitmap)
+        self.assertEqual(coverage, [1, 1, 2, 1, 1])
+        ranges = mod.get_marker_frame_ranges(bitmap, 1)
+        self.assertEqual(ranges, [(1, 3), (3, 5), None])
+
+    def test_get_marker_frame_ranges_raw(self):
+        bitmap = [
+            [False, True, True, False],
+            [False, False, False, False],
+        ]
+        self.assertEqual(mod._get_frame_coverage_raw(bitmap), [0, 1, 1, 0])
+        ranges = mod.get_marker_frame_ranges(bitmap, 10)
+        self.assertEqual(ranges, [(11, 12), None])
+
+    def test_get_root_frames(self):
+        enabled_frames_list = [
+            list(range(1, 11)),
+            list(range(1, 21)),
+            list(range(11, 21)),
+        ]
+        bitmap = mod.create_enabled_bitmap(enabled_frames_list, 1, 20)
+        min_frames_counts = [2, 2, 2]
+        root_frames = mod.get_root_frames(bitmap, 1, min_frames_counts)
+        self.assertGreater(len(root_frames), 0)
+        for enabled_frames, count in zip(enabled_frames_list,
+                                         min_frames_counts):
+            frames = [f for f in root_frames if f in enabled_frames]
+            self.assertGreaterEqual(len(frames), count)
+
+    def test_get_root_frames_greedy(self):
+        enabled_frames_list = [
+            [1, 2, 3, 4, 5],
+            [3, 4, 5, 6, 7],
+        ]
+        bitmap = mod.create_enabled_bitmap(enabled_frames_list, 1, 7)
+
+        # Shared frames cover both Markers.
+        root_frames = mod.get_root_frames_greedy(
+            bitmap, 1, [2, 2], min_markers_per_frame=2)
+        self.assertEqual(root_frames, [3, 4])
+
+        # Frames that are not too close are preferred.
+        root_frames = mod.get_root_frames_greedy(
+            bitmap, 1, [2, 2], min_markers_per_frame=1, close_num=1)
+        self.assertEqual(root_frames, [3, 5])
+
+        # A Marker enabled on no valid frames cannot be satisfied.
+        root_frames = mod.get_root_frames_greedy(
+            bitmap, 1, [2, 2], min_markers_per_frame=3)
+        self.assertEqual(root_frames, [])
+
+        root_frames = mod.get_root_frames_greedy([], 1, [])
+        self.assertEqual(root_frames, [])
+
+    def test_get_root_frames_greedy_cover(self):
+        """
+        Every Marker must have enough root frames, with (many) fewer
+        root frames than Markers.
+        """
+        start_frame = 1001
+        end_frame = 1200
+        enabled_frames_list = _random_enabled_frames(
+            200, start_frame, end_frame, seed=1)
+        bitmap = mod.create_enabled_bitmap(
+            enabled_frames_list, start_frame, end_frame)
+        min_frames_counts = [min(2, len(x)) for x in enabled_frames_list]
+        root_frames = mod.get_root_frames_greedy(
+            bitmap, start_frame, min_frames_counts)
+        root_frames_set = set(root_frames)
+        for enabled_frames, count in zip(enabled_frames_list,
+                                         min_frames_counts):
+            frames = root_frames_set.intersection(enabled_frames)
+            self.assertGreaterEqual(len(frames), count)
+        self.assertLess(len(root_frames), len(enabled_frames_list))
+
+    def test_get_root_frames_greedy_numpy(self):
+        if mod.np is None:
+            self.skipTest('numpy is not available.')
+        start_frame = 1
+        end_frame = 300
+        enabled_frames_list = _random_enabled_frames(
+            100, start_frame, end_frame, seed=2)
+        bitmap = mod.create_enabled_bitmap(
+            enabled_frames_list, start_frame, end_frame)
+        bitmap_lists = _to_lists(bitmap)
+        needs = [3] * len(enabled_frames_list)
+        valid_frames = [c >= 2 for c in mod.get_frame_coverage(bitmap)]
+        indices_a = mod._get_root_frames_greedy_raw(
+            bitmap_lists, list(needs), list(valid_frames), 2)
+        indices_b = mod._get_root_frames_greedy_numpy(
+            bitmap, list(needs), list(valid_frames), 2)
+        self.assertEqual(indices_a, indices_b)
+        self.assertEqual(mod._get_frame_coverage_raw(bitmap_lists),
+                         mod.get_frame_coverage(bitmap))
+
+    def test_benchmark(self):
+        """
+        Root frames for many Markers and frames.
+        """
+        start_frame = 1
+        end_frame = 2000
+        enabled_frames_list = _random_enabled_frames(
+            1000, start_frame, end_frame, seed=3)
+        min_frames_counts = [2] * len(enabled_frames_list)
+
+        s = time.time()
+        bitmap = mod.create_enabled_bitmap(
+            enabled_frames_list, start_frame, end_frame)
+        mod.get_frame_coverage(bitmap)
+        mod.get_marker_frame_ranges(bitmap, start_frame)
+        e = time.time()
+        LOG.info('bitmap, coverage and ranges: time=%r', e - s)
+
+        s = time.time()
+        root_frames = mod.get_root_frames(
+            bitmap, start_frame, min_frames_counts)
+        e = time.time()
+        LOG.info('get_root_frames: frames=%r time=%r',
+                 len(root_frames), e - s)
+
+        s = time.time()
+        greedy_root_frames = mod.get_root_frames_greedy(
+            bitmap, start_frame, min_frames_counts)
+        e = time.time()
+        LOG.info('get_root_frames_greedy: frames=%r time=%r',
+                 len(greedy_root_frames), e - s)
+        self.assertGreater(len(greedy_root_frames), 0)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
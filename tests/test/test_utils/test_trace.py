@@ -0,0 +1,170 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for the trace utilities module.
+"""
+
+import json
+import time
+import unittest
+
+import mmSolver.logger
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.trace as trace
+
+
+LOG = mmSolver.logger.get_logger()
+
+
+# @unittest.skip
+class TestTrace(test_utils.UtilsTestCase):
+    """
+    Test trace module.
+    """
+
+    def setUp(self):
+        self._enabled = trace.is_enabled()
+        trace.clear()
+        super(TestTrace, self).setUp()
+
+    def tearDown(self):
+        trace.set_enabled(self._enabled)
+        trace.clear()
+        super(TestTrace, self).tearDown()
+
+    def record_spans(self):
+        with trace.span('execute', category='test'):
+            with trace.span('compile', markers=10):
+                time.sleep(0.01)
+            for i in range(3):
+                with trace.span('action', index=i) as span:
+                    with trace.span('solve'):
+                        time.sleep(0.005)
+                    span.set_args(solve_seconds=0.005)
+
+    def test_disabled(self):
+        trace.set_enabled(False)
+        self.record_spans()
+        self.assertEqual(trace.get_spans(), [])
+        self.assertEqual(trace.get_chrome_trace()['traceEvents'], [])
+        self.assertEqual(trace.get_stage_table(), [])
+
+    def test_chrome_trace(self):
+        trace.set_enabled(True)
+        self.record_spans()
+        data = trace.get_chrome_trace()
+        events = data['traceEvents']
+        self.assertEqual(len(events), 8)
+        names = [e['name'] for e in events]
+        self.assertEqual(names[0], 'execute')
+        self.assertEqual(names[1], 'compile')
+        self.assertEqual(events[0]['cat'], 'test')
+        self.assertEqual(events[1]['args'], {'markers': 10})
+        for e in events:
+            self.assertEqual(e['ph'], 'X')
+            self.assertGreaterEqual(e['dur'], 0.0)
+            # Children are inside the parent span.
+            self.assertGreaterEqual(e['ts'], events[0]['ts'])
+            self.assertLessEqual(e['ts'] + e['dur'],
+                                 events[0]['ts'] + events[0]['dur'] + 1.0)
+        json.dumps(data)
+
+    def test_speedscope(self):
+        trace.set_enabled(True)
+        self.record_spans()
+        data = trace.get_speedscope(name='test')
+        json.dumps(data)
+        frames = [f['name'] for f in data['shared']['frames']]
+        self.assertEqual(sorted(frames),
+                         ['action', 'compile', 'execute', 'solve'])
+        self.assertEqual(len(data['profiles']), 1)
+        events = data['profiles'][0]['events']
+        self.assertEqual(len(events), 16)
+
+        # Events must be balanced and nested.
+        stack = []
+        for event in events:
+            if event['type'] == 'O':
+                stack.append(event['frame'])
+            else:
+                self.assertEqual(stack.pop(), event['frame'])
+        self.assertEqual(stack, [])
+
+    def test_stage_table(self):
+        trace.set_enabled(True)
+        self.record_spans()
+        table = trace.get_stage_table()
+        rows = dict([(row['name'], row) for row in table])
+        self.assertEqual(table[0]['name'], 'execute')
+        self.assertEqual(rows['action']['count'], 3)
+        self.assertEqual(rows['solve']['count'], 3)
+        self.assertAlmostEqual(
+            rows['action']['total'],
+            rows['action']['self'] + rows['solve']['total'])
+        self.assertAlmostEqual(
+            rows['execute']['total'],
+            rows['execute']['self']
+            + rows['compile']['total']
+            + rows['action']['total'])
+        text = trace.format_stage_table()
+        LOG.info('Stage table:\n%s', text)
+        self.assertEqual(len(text.split('\n')), 5)
+
+    def test_exception(self):
+        trace.set_enabled(True)
+        try:
+            with trace.span('fail'):
+                raise ValueError('test')
+        except ValueError:
+            pass
+        spans = trace.get_spans()
+        self.assertEqual(len(spans), 1)
+        self.assertEqual(spans[0].args['error'], 'ValueError')
+        # The depth is restored after an exception.
+        with trace.span('after'):
+            pass
+        self.assertEqual(trace.get_spans()[-1].depth, 0)
+
+    def test_benchmark(self):
+        """
+        The overhead of a disabled span must be negligible.
+        """
+        num = 100000
+        trace.set_enabled(False)
+        s = time.time()
+        for i in range(num):
+            with trace.span('disabled'):
+                pass
+        e = time.time()
+        disabled_time = e - s
+
+        trace.set_enabled(True)
+        s = time.time()
+        for i in range(num):
+            with trace.span('enabled'):
+                pass
+        e = time.time()
+        enabled_time = e - s
+        LOG.info('trace %r spans: disabled=%r enabled=%r',
+                 num, disabled_time, enabled_time)
+        self.assertEqual(len(trace.get_spans()), num)
+        self.assertLess(disabled_time, enabled_time)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()
@@ -530,6 +530,87 @@ class TestTransform(test_utils.UtilsTestCase):
         )
         return
 
+    def test_set_transform_values_keyframes(self):
+        """
+        Keyframes are set on every time given, with the same values
+        as the source node, and existing keys outside the range are
+        kept.
+        """
+        start_frame = 1001
+        end_frame = 1101
+        node = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(node, attribute='translateX', time=start_frame, value=-100.0)
+        maya.cmds.setKeyframe(node, attribute='translateX', time=end_frame, value=100.0)
+        maya.cmds.setKeyframe(node, attribute='rotateY', time=start_frame, value=170.0)
+        maya.cmds.setKeyframe(node, attribute='rotateY', time=end_frame, value=550.0)
+        frame_range = list(range(start_frame, end_frame + 1))
+        tfm_node = mod.TransformNode(node=node)
+
+        tfm_cache = mod.TransformMatrixCache()
+        tfm_cache.add_node_attr(tfm_node, 'worldMatrix[0]', frame_range)
+        tfm_cache.process()
+
+        dst_node = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(dst_node, attribute='translateX', time=1, value=42.0)
+        dst_tfm_node = mod.TransformNode(node=dst_node)
+        mod.set_transform_values(tfm_cache, frame_range,
+                                 tfm_node, dst_tfm_node,
+                                 delete_static_anim_curves=False)
+
+        num_keys = maya.cmds.keyframe(
+            dst_node, attribute='translateX',
+            query=True, keyframeCount=True)
+        self.assertEqual(num_keys, len(frame_range) + 1)
+        value = maya.cmds.getAttr(dst_node + '.translateX', time=1)
+        self.assertTrue(self.approx_equal(value, 42.0))
+
+        for attr in ['translateX', 'rotateY']:
+            src_plug = '{0}.{1}'.format(node, attr)
+            dst_plug = '{0}.{1}'.format(dst_node, attr)
+            for frame in frame_range:
+                src_value = maya.cmds.getAttr(src_plug, time=frame)
+                dst_value = maya.cmds.getAttr(dst_plug, time=frame)
+                self.assertTrue(self.approx_equal(src_value, dst_value))
+        return
+
+    def test_set_transform_values_undo(self):
+        """
+        Setting keyframes can be undone.
+        """
+        start_frame = 1
+        end_frame = 10
+        node = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(node, attribute='translateY', time=start_frame, value=-10.0)
+        maya.cmds.setKeyframe(node, attribute='translateY', time=end_frame, value=10.0)
+        frame_range = list(range(start_frame, end_frame + 1))
+        tfm_node = mod.TransformNode(node=node)
+
+        tfm_cache = mod.TransformMatrixCache()
+        tfm_cache.add_node_attr(tfm_node, 'worldMatrix[0]', frame_range)
+        tfm_cache.process()
+
+        dst_node = maya.cmds.createNode('transform')
+        maya.cmds.setKeyframe(dst_node, attribute='translateY', time=5, value=42.0)
+        dst_tfm_node = mod.TransformNode(node=dst_node)
+        mod.set_transform_values(tfm_cache, frame_range,
+                                 tfm_node, dst_tfm_node,
+                                 delete_static_anim_curves=False)
+        num_keys = maya.cmds.keyframe(
+            dst_node, attribute='translateY',
+            query=True, keyframeCount=True)
+        self.assertEqual(num_keys, len(frame_range))
+        value = maya.cmds.getAttr(dst_node + '.translateY', time=end_frame)
+        self.assertTrue(self.approx_equal(value, 10.0))
+
+        maya.cmds.undo()
+        num_keys = maya.cmds.keyframe(
+            dst_node, attribute='translateY',
+            query=True, keyframeCount=True)
+        self.assertEqual(num_keys, 1)
+        value = maya.cmds.getAttr(dst_node + '.translateY', time=end_frame)
+        self.assertTrue(self.approx_equal(value, 42.0))
+        return
+
     def test_TransformNode_usage(self):
         start_frame = 1001
         end_frame = 1101
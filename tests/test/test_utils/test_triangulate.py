@@ -0,0 +1,116 @@
+# Copyright (C) 2020 David Cattermole.
+#
+# This file is part of mmSolver.
+#
+# mmSolver is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# mmSolver is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with mmSolver.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""
+Test functions for triangulate utilities module.
+"""
+
+import random
+import unittest
+
+import test.test_utils.utilsutils as test_utils
+import mmSolver.utils.triangulate as mod
+
+
+def _random_rays(point, num_rays, noise=0.0, seed=42):
+    """
+    Create rays from random origins, pointing towards 'point'.
+    """
+    rand = random.Random(seed)
+    origins = []
+    directions = []
+    for i in range(num_rays):
+        o = (rand.uniform(-10.0, 10.0),
+             rand.uniform(-10.0, 10.0),
+             rand.uniform(10.0, 20.0))
+        d = [(p - v) + rand.uniform(-noise, noise)
+             for p, v in zip(point, o)]
+        origins.append(o)
+        directions.append(tuple(d))
+    return origins, directions
+
+
+# @unittest.skip
+class TestTriangulate(test_utils.UtilsTestCase):
+    """
+    Test triangulate module.
+    """
+
+    def assertPointEqual(self, a, b, eps=1e-6):
+        self.assertIsNotNone(a)
+        for x, y in zip(a, b):
+            self.assertTrue(self.approx_equal(x, y, eps=eps))
+
+    def test_triangulate_points(self):
+        rays = [
+            ([(0.0, 0.0, 10.0), (10.0, 0.0, 0.0)],
+             [(0.0, 0.0, -1.0), (-1.0, 0.0, 0.0)]),
+            _random_rays((1.0, 2.0, 3.0), 20),
+        ]
+        points = mod.triangulate_points(rays)
+        self.assertEqual(len(points), 2)
+        self.assertPointEqual(points[0], (0.0, 0.0, 0.0))
+        self.assertPointEqual(points[1], (1.0, 2.0, 3.0))
+        self.assertEqual(mod.triangulate_points([]), [])
+
+    def test_triangulate_points_invalid(self):
+        rays = [
+            # No rays.
+            ([], []),
+            # A single ray.
+            ([(0.0, 0.0, 10.0)], [(0.0, 0.0, -1.0)]),
+            # Parallel rays.
+            ([(0.0, 0.0, 10.0), (1.0, 0.0, 10.0)],
+             [(0.0, 0.0, -1.0), (0.0, 0.0, -1.0)]),
+        ]
+        points = mod._triangulate_points_raw(rays, 3.0, 3)
+        self.assertEqual(points, [None, None, None])
+        points = mod.triangulate_points(rays)
+        self.assertEqual(points, [None, None, None])
+
+    def test_triangulate_points_outliers(self):
+        point = (1.0, 2.0, 3.0)
+        origins, directions = _random_rays(point, 8, noise=0.001)
+        # Rays pointing far away from the point.
+        origins += [(5.0, 5.0, 15.0), (-5.0, 5.0, 15.0)]
+        directions += [(1.0, 0.0, -1.0), (0.0, -1.0, -1.0)]
+        rays = [(origins, directions)]
+
+        points = mod.triangulate_points(rays, outlier_iterations=0)
+        self.assertFalse(self.approx_equal(points[0][0], point[0], eps=0.1))
+
+        points = mod._triangulate_points_raw(rays, 3.0, 3)
+        self.assertPointEqual(points[0], point, eps=0.01)
+        points = mod.triangulate_points(rays)
+        self.assertPointEqual(points[0], point, eps=0.01)
+
+    def test_triangulate_points_numpy(self):
+        if mod.np is None:
+            self.skipTest('numpy is not available.')
+        rays = []
+        for i in range(100):
+            point = (i * 0.1, -i * 0.2, i * 0.05)
+            rays.append(_random_rays(point, 2 + (i % 10), noise=0.5, seed=i))
+        points_a = mod._triangulate_points_raw(rays, 3.0, 3)
+        points_b = mod._triangulate_points_numpy(rays, 3.0, 3)
+        self.assertEqual(len(points_a), len(points_b))
+        for a, b in zip(points_a, points_b):
+            self.assertPointEqual(a, b)
+
+
+if __name__ == '__main__':
+    prog = unittest.main()